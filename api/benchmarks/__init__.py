@@ -0,0 +1,12 @@
+"""
+Tamor benchmarks.
+
+suite.py times the hot paths (retrieval, chat context assembly, ingest)
+on synthetic data at configurable sizes and compares runs against a
+stored baseline; fakes.py and synthetic.py provide the deterministic
+embedder, stub LLM and generated databases it runs on. The bench_*.py
+modules are focused micro-benchmarks for individual optimizations.
+
+Usage:
+    cd api && python -m benchmarks.suite --help
+"""
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk PDF import, item by item vs batched import runs.
+
+Generates a folder of small text PDFs (default 400 files, 3 pages each)
+and imports it into a fresh on-disk database with the bulk-pdf importer:
+
+  - per item: plugin.import_item() in a loop, as /plugins/<id>/import did
+    (copy, INSERT + commit, inline extraction + commit, per file)
+  - import run: services/plugins/bulk_import.run_import() with copies in
+    a thread pool, extraction in-thread or in a process pool, and one
+    transaction per batch
+
+Usage:
+    cd api && python -m benchmarks.bench_bulk_import
+    cd api && python -m benchmarks.bench_bulk_import --files 2000 --extract-workers 0 2 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pdf_extract import write_text_pdf
+from plugins.importers.bulk_pdf import BulkPDFImporter
+from services.plugins import bulk_import
+from utils import db
+
+MIGRATIONS = ("000_baseline.sql", "007_plugins.sql", "027_plugin_import_runs.sql")
+
+
+def make_pdf_folder(root: str, n_files: int, pages: int = 3) -> None:
+    """n_files small PDFs spread over a few subfolders."""
+    for i in range(n_files):
+        folder = os.path.join(root, f"box{i % 8}")
+        os.makedirs(folder, exist_ok=True)
+        write_text_pdf(os.path.join(folder, f"paper_{i:05d}.pdf"), pages, lines_per_page=20, seed=i)
+
+
+def fresh_database(tmp: str, name: str) -> int:
+    """Point utils.db at a new migrated database; returns a project id."""
+    db.DB_PATH = os.path.join(tmp, f"{name}.db")
+    conn = db.get_db()
+    api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for migration in MIGRATIONS:
+        with open(os.path.join(api_dir, "migrations", migration)) as f:
+            conn.executescript(f.read())
+    conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'bench', 'x')")
+    project_id = conn.execute("INSERT INTO projects (user_id, name) VALUES (1, 'Bench')").lastrowid
+    conn.commit()
+    conn.close()
+    return project_id
+
+
+def per_item(plugin, items, project_id: int) -> int:
+    ok = 0
+    for item in items:
+        ok += plugin.import_item(item, project_id, 1).success
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk PDF import")
+    parser.add_argument("--files", type=int, default=400, help="Generated PDFs (default: 400)")
+    parser.add_argument("--pages", type=int, default=3, help="Pages per PDF (default: 3)")
+    parser.add_argument("--batch-size", type=int, default=bulk_import.IMPORT_BATCH_SIZE)
+    parser.add_argument("--copy-workers", type=int, default=bulk_import.COPY_WORKERS)
+    parser.add_argument("--extract-workers", type=int, nargs="+", default=[0, 2],
+                        help="Extraction pool sizes to compare, 0 = in the copy threads (default: 0 2)")
+    args = parser.parse_args()
+
+    saved_db = db.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source")
+        make_pdf_folder(source, args.files, args.pages)
+        plugin = BulkPDFImporter()
+        items = plugin.list_items({"path": source})
+        print(f"{len(items)} PDFs x {args.pages} pages, CPUs: {os.cpu_count()}")
+
+        try:
+            project_id = fresh_database(tmp, "per_item")
+            os.environ["TAMOR_UPLOAD_ROOT"] = os.path.join(tmp, "uploads_per_item")
+            start = time.perf_counter()
+            ok = per_item(plugin, items, project_id)
+            baseline = time.perf_counter() - start
+            print(f"  per item (import_item loop)         {baseline:7.2f} s  "
+                  f"{len(items) / baseline:6.0f} files/s  ({ok} ok)")
+
+            for workers in args.extract_workers:
+                project_id = fresh_database(tmp, f"run_{workers}")
+                run = bulk_import.create_import_run(
+                    plugin, project_id, 1, {"path": source}, items,
+                    upload_root=os.path.join(tmp, f"uploads_run_{workers}"),
+                )
+                start = time.perf_counter()
+                run = bulk_import.run_import(
+                    run.id, plugin=plugin, batch_size=args.batch_size,
+                    copy_workers=args.copy_workers, extract_workers=workers,
+                )
+                elapsed = time.perf_counter() - start
+                label = f"import run, {workers} extract procs" if workers else "import run, extract in threads"
+                print(f"  {label:<36}{elapsed:7.2f} s  {len(items) / elapsed:6.0f} files/s  "
+                      f"({run.succeeded} ok, x{baseline / elapsed:.1f})")
+        finally:
+            db.DB_PATH = saved_db
+            os.environ.pop("TAMOR_UPLOAD_ROOT", None)
+
+
+if __name__ == "__main__":
+    main()
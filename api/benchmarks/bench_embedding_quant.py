@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: float32 vs float16 / int8 embedding search.
+
+Generates N clustered unit vectors (default 20,000 x 1024, the bge-m3
+size) and queries that are noisy copies of stored vectors, then for each
+storage mode reports:
+
+  - bytes per vector
+  - recall@k against the exact float32 top-k
+  - p50 latency of embedding_quant.cosine_scores() over the BLOB lists
+    a search loads (decode + score)
+  - p50 latency of a full search from SQLite (fetch + score), with the
+    float32 column kept or dropped
+
+Usage:
+    cd api && python -m benchmarks.bench_embedding_quant
+    cd api && python -m benchmarks.bench_embedding_quant --vectors 100000 --dim 768 --k 20
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.embedding_quant import cosine_scores, quantize, top_k
+
+MODES = [
+    # label, dtype, keep_float32, rerank
+    ("float32", None, True, 0),
+    ("float16", "float16", False, 0),
+    ("int8", "int8", False, 0),
+    ("int8 + rerank", "int8", True, None),
+]
+
+
+def make_vectors(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vecs = centres[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def build_db(path: str, vecs: np.ndarray, dtype, keep_float32: bool) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE library_chunks (id INTEGER PRIMARY KEY, content TEXT, embedding BLOB, embedding_q BLOB)")
+    conn.executemany(
+        "INSERT INTO library_chunks (content, embedding, embedding_q) VALUES (?, ?, ?)",
+        (
+            (
+                "x" * 1200,
+                v.tobytes() if keep_float32 else None,
+                quantize(v, dtype) if dtype else None,
+            )
+            for v in vecs
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def db_search(path: str, query: np.ndarray, k: int, rerank: int):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT id, embedding, embedding_q FROM library_chunks").fetchall()
+    conn.close()
+    scores = cosine_scores(query, [r[1] for r in rows], [r[2] for r in rows], rerank=rerank)
+    return top_k(scores, k)
+
+
+def p50_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized embedding search")
+    parser.add_argument("--vectors", type=int, default=20_000, help="Stored vectors (default: 20000)")
+    parser.add_argument("--dim", type=int, default=1024, help="Dimensions (default: 1024)")
+    parser.add_argument("--clusters", type=int, default=200, help="Topic clusters (default: 200)")
+    parser.add_argument("--queries", type=int, default=100, help="Recall queries (default: 100)")
+    parser.add_argument("--k", type=int, default=10, help="Recall@k (default: 10)")
+    parser.add_argument("--rerank", type=int, default=100, help="Re-rank candidates (default: 100)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs (default: 5)")
+    args = parser.parse_args()
+
+    vecs = make_vectors(args.vectors, args.dim, args.clusters)
+    rng = np.random.default_rng(1)
+    picks = rng.integers(0, args.vectors, args.queries)
+    queries = vecs[picks] + 0.3 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+    float_blobs = [v.tobytes() for v in vecs]
+    truth = [set(top_k(cosine_scores(q, float_blobs), args.k)) for q in queries]
+
+    print(f"{args.vectors:,} x {args.dim} vectors, {args.queries} queries, recall@{args.k}\n")
+    print(f"{'mode':<16}{'bytes/vec':>10}{f'recall@{args.k}':>11}{'score ms':>10}"
+          f"{'db search ms':>14}{'db MB':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, dtype, keep_float32, rerank in MODES:
+            rerank = args.rerank if rerank is None else rerank
+            quant_blobs = [quantize(v, dtype) for v in vecs] if dtype else None
+            stored = float_blobs if keep_float32 else [None] * len(vecs)
+
+            hits = 0
+            for q, expected in zip(queries, truth):
+                got = top_k(cosine_scores(q, stored, quant_blobs, rerank=rerank), args.k)
+                hits += len(expected & set(got))
+            recall = hits / (args.k * args.queries)
+
+            score_ms = p50_ms(lambda: cosine_scores(queries[0], stored, quant_blobs, rerank=rerank), args.repeat)
+
+            path = os.path.join(tmp, f"{label.replace(' ', '_')}.db")
+            build_db(path, vecs, dtype, keep_float32)
+            search_ms = p50_ms(lambda: db_search(path, queries[0], args.k, rerank), args.repeat)
+
+            per_vec = len(quant_blobs[0]) if quant_blobs else 0
+            per_vec += len(float_blobs[0]) if keep_float32 else 0
+            print(f"{label:<16}{per_vec:>10}{recall:>11.3f}{score_ms:>10.1f}"
+                  f"{search_ms:>14.1f}{os.path.getsize(path) / 1e6:>8.1f}")
+
+    print("\nfloat16 / int8 rows drop the float32 column; 'int8 + rerank' keeps it "
+          f"and re-scores the top {args.rerank} exactly.")
+
+
+if __name__ == "__main__":
+    main()
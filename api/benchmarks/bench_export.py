@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ZIP and JSON project exports, built up front vs streamed.
+
+Creates a project of text files (with cached text) and incompressible
+"photos" (default 200 files of 1 MB) and exports it with a copy of the
+previous exporters (whole ZIP written to a temp file, whole JSON document
+built in memory) and with the streaming exporters. Reports total time,
+time to first byte, peak Python memory (tracemalloc) and output size.
+
+The copies of the previous exporters use the same corrected queries as
+the current ones (no project_files.deleted_at / projects.notes columns,
+transcripts.transcript_text, one file_insights row per file), otherwise
+they fail on a migrated schema.
+
+Usage:
+    cd api && python -m benchmarks.bench_export
+    cd api && python -m benchmarks.bench_export --files 1000 --file-kb 4096
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plugins.exporters import json_export, zip_download
+from plugins.exporters.json_export import JsonExporter
+from plugins.exporters.zip_download import ZipDownloadExporter
+from utils import db
+
+MIGRATIONS = ("000_baseline.sql", "002_file_insights.sql", "005_transcripts.sql")
+
+WORDS = ("alpha", "beta", "gamma", "delta", "project", "export", "stream", "archive",
+         "memory", "chunk", "river", "stone", "light", "paper", "number", "signal")
+
+
+def create_project(tmp: str, n_files: int, file_bytes: int, transcripts: int = 3, seed: int = 7):
+    """Point utils.db at a new database with one project; returns (project_id, upload_root)."""
+    db.DB_PATH = os.path.join(tmp, "export.db")
+    upload_root = os.path.join(tmp, "uploads")
+
+    conn = db.get_db()
+    api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for migration in MIGRATIONS:
+        with open(os.path.join(api_dir, "migrations", migration)) as f:
+            conn.executescript(f.read())
+    conn.execute("INSERT INTO users (id, username) VALUES (1, 'bench')")
+    project_id = conn.execute("INSERT INTO projects (user_id, name) VALUES (1, 'Field Notes')").lastrowid
+    conn.commit()
+    conn.close()
+
+    populate_project(project_id, upload_root, n_files, file_bytes, transcripts, seed)
+    return project_id, upload_root
+
+
+def populate_project(project_id: int, upload_root: str, n_files: int, file_bytes: int,
+                     transcripts: int = 3, seed: int = 7):
+    """
+    Add notes, files (stored under upload_root) and transcripts to a project of user 1.
+
+    Even files are text (with a file_text_cache row and an insight), odd
+    files random bytes stored as image/jpeg.
+    """
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(upload_root, "1"), exist_ok=True)
+
+    conn = db.get_db()
+    conn.execute(
+        "INSERT INTO project_notes (user_id, project_id, content) VALUES (1, ?, 'Notes — café')",
+        (project_id,),
+    )
+
+    for i in range(n_files):
+        stored = f"1/{i:05d}"
+        path = os.path.join(upload_root, stored)
+        if i % 2 == 0:
+            text = " ".join(rng.choice(WORDS) for _ in range(file_bytes // 6))[:file_bytes]
+            with open(path, "w") as f:
+                f.write(text)
+            name, mime = f"notes_{i:05d}.txt", "text/plain"
+        else:
+            with open(path, "wb") as f:
+                f.write(rng.randbytes(file_bytes))
+            name, mime = f"photo_{i:05d}.jpg", "image/jpeg"
+        file_id = conn.execute(
+            """
+            INSERT INTO project_files (user_id, project_id, filename, stored_name, mime_type, size_bytes, created_at)
+            VALUES (1, ?, ?, ?, ?, ?, datetime('2025-01-01', ?))
+            """,
+            (project_id, name, stored, mime, os.path.getsize(path), f"+{i // 3} minutes"),
+        ).lastrowid
+        if i % 2 == 0:
+            conn.execute(
+                "INSERT INTO file_text_cache (file_id, text, parser) VALUES (?, ?, 'text')",
+                (file_id, text),
+            )
+            conn.execute(
+                "INSERT INTO file_insights (file_id, project_id, insights_json, summary) VALUES (?, ?, ?, ?)",
+                (file_id, project_id, json.dumps({"themes": [WORDS[i % 16]]}), f"File {i} ✓"),
+            )
+
+    for t in range(transcripts):
+        conn.execute(
+            """
+            INSERT INTO transcripts (project_id, source_type, title, transcript_text, segments_json)
+            VALUES (?, 'upload', ?, ?, ?)
+            """,
+            (project_id, f"Interview {t}/{transcripts}", f"Speaker {t}: hello",
+             json.dumps([{"start": 0.0, "end": 1.5, "text": "hello"}])),
+        )
+    conn.commit()
+    conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Previous implementations
+# ---------------------------------------------------------------------------
+
+
+def legacy_zip_export(project_id: int, user_id: int, config: dict, upload_root: str, out_dir: str) -> str:
+    include_text_cache = config.get("include_text_cache", False)
+    include_transcripts = config.get("include_transcripts", True)
+
+    conn = db.get_db()
+    cur = conn.cursor()
+    cur.execute("SELECT id, name FROM projects WHERE id = ? AND user_id = ?", (project_id, user_id))
+    row = cur.fetchone()
+    project_name = row[1] or f"project-{project_id}"
+    safe_name = "".join(c if c.isalnum() or c in "-_ " else "_" for c in project_name)
+    safe_name = safe_name.strip()[:50] or "project"
+
+    cur.execute(
+        """
+        SELECT id, filename, stored_name, mime_type, size_bytes, created_at
+        FROM project_files WHERE project_id = ? ORDER BY created_at
+        """,
+        (project_id,),
+    )
+    files = cur.fetchall()
+    transcripts = []
+    if include_transcripts:
+        cur.execute(
+            "SELECT id, title, transcript_text, created_at FROM transcripts WHERE project_id = ? ORDER BY created_at",
+            (project_id,),
+        )
+        transcripts = cur.fetchall()
+
+    zip_path = os.path.join(out_dir, "legacy.zip")
+    manifest = {
+        "project_id": project_id,
+        "project_name": project_name,
+        "exported_at": zip_download._now().isoformat(),
+        "files": [],
+        "transcripts": [],
+        "total_files": 0,
+        "total_size_bytes": 0,
+    }
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        archive_root = f"{safe_name}-export"
+        for file_id, filename, stored_name, mime_type, size_bytes, created_at in files:
+            manifest["files"].append({
+                "id": file_id,
+                "filename": filename,
+                "mime_type": mime_type,
+                "size_bytes": size_bytes,
+                "created_at": created_at,
+            })
+            manifest["total_files"] += 1
+            manifest["total_size_bytes"] += size_bytes or 0
+            if stored_name:
+                source_path = os.path.join(upload_root, stored_name)
+                if os.path.exists(source_path):
+                    zf.write(source_path, f"{archive_root}/files/{filename}")
+            if include_text_cache:
+                cur.execute("SELECT text FROM file_text_cache WHERE file_id = ?", (file_id,))
+                text_row = cur.fetchone()
+                if text_row and text_row[0]:
+                    zf.writestr(f"{archive_root}/text/{filename}.txt", text_row[0])
+        for t_id, title, text, created_at in transcripts:
+            manifest["transcripts"].append({"id": t_id, "title": title, "created_at": created_at})
+            if text:
+                safe_title = "".join(
+                    c if c.isalnum() or c in "-_ " else "_" for c in (title or f"transcript-{t_id}")
+                )[:50]
+                zf.writestr(f"{archive_root}/transcripts/{safe_title}.txt", text)
+        zf.writestr(f"{archive_root}/manifest.json", json.dumps(manifest, indent=2))
+    conn.close()
+    return zip_path
+
+
+def legacy_json_export(project_id: int, user_id: int, config: dict, out_dir: str) -> str:
+    include_file_text = config.get("include_file_text", True)
+    include_insights = config.get("include_insights", True)
+    include_transcripts = config.get("include_transcripts", True)
+    include_notes = config.get("include_notes", True)
+
+    conn = db.get_db()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT p.id, p.name, p.created_at, n.content FROM projects p
+        LEFT JOIN project_notes n ON n.project_id = p.id AND n.user_id = p.user_id
+        WHERE p.id = ? AND p.user_id = ?
+        """,
+        (project_id, user_id),
+    )
+    row = cur.fetchone()
+    project_notes = row[3] if include_notes else None
+    export_data = {
+        "version": "1.0",
+        "exported_at": json_export._now().isoformat(),
+        "project": {"id": project_id, "name": row[1] or f"project-{project_id}", "created_at": row[2]},
+        "files": [],
+        "transcripts": [],
+    }
+    if include_notes and project_notes:
+        export_data["project"]["notes"] = project_notes
+
+    cur.execute(
+        "SELECT id, filename, mime_type, size_bytes, created_at FROM project_files WHERE project_id = ? ORDER BY created_at",
+        (project_id,),
+    )
+    for file_id, filename, mime_type, size_bytes, created_at in cur.fetchall():
+        file_data = {"id": file_id, "filename": filename, "mime_type": mime_type,
+                     "size_bytes": size_bytes, "created_at": created_at}
+        if include_file_text:
+            cur.execute("SELECT text FROM file_text_cache WHERE file_id = ?", (file_id,))
+            text_row = cur.fetchone()
+            if text_row:
+                file_data["text"] = text_row[0]
+        if include_insights:
+            cur.execute("SELECT insights_json, summary FROM file_insights WHERE file_id = ?", (file_id,))
+            insight_row = cur.fetchone()
+            if insight_row:
+                try:
+                    insights = json.loads(insight_row[0]) if insight_row[0] else {}
+                except json.JSONDecodeError:
+                    insights = {"raw": insight_row[0]}
+                if insight_row[1]:
+                    insights["summary"] = insight_row[1]
+                file_data["insights"] = insights
+        export_data["files"].append(file_data)
+
+    if include_transcripts:
+        cur.execute(
+            """
+            SELECT id, title, transcript_text, segments_json, created_at
+            FROM transcripts WHERE project_id = ? ORDER BY created_at
+            """,
+            (project_id,),
+        )
+        for t_id, title, text, segments_json, t_created_at in cur.fetchall():
+            transcript_data = {"id": t_id, "title": title, "text": text, "created_at": t_created_at}
+            if segments_json:
+                try:
+                    transcript_data["segments"] = json.loads(segments_json)
+                except json.JSONDecodeError:
+                    pass
+            export_data["transcripts"].append(transcript_data)
+    conn.close()
+
+    json_path = os.path.join(out_dir, "legacy.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(export_data, f, indent=2, ensure_ascii=False)
+    return json_path
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+def measure_built(fn, *args):
+    """(seconds, first byte seconds, peak MB, size) for an export built up front."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    path = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, elapsed, peak / 2**20, os.path.getsize(path)
+
+
+def measure_streamed(exporter, project_id: int, config: dict):
+    """Same, consuming stream_project() chunks as a response would."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = exporter.stream_project(project_id, 1, config)
+    first = None
+    size = 0
+    for chunk in result.chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, first, peak / 2**20, size
+
+
+def report(label: str, stats) -> None:
+    elapsed, first, peak, size = stats
+    print(f"  {label:<18}{elapsed:7.2f} s  first byte {first:7.3f} s  "
+          f"peak {peak:7.1f} MB  {size / 2**20:8.1f} MB out")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed project exports")
+    parser.add_argument("--files", type=int, default=200, help="Project files (default: 200)")
+    parser.add_argument("--file-kb", type=int, default=1024, help="Size of each file in KB (default: 1024)")
+    args = parser.parse_args()
+
+    saved_db = db.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            project_id, upload_root = create_project(tmp, args.files, args.file_kb * 1024)
+            os.environ["TAMOR_UPLOAD_ROOT"] = upload_root
+            out_dir = os.path.join(tmp, "out")
+            os.makedirs(out_dir)
+            print(f"{args.files} files x {args.file_kb} KB (half text, half JPEG)")
+
+            config = {"include_text_cache": True}
+            print("ZIP (with text cache)")
+            report("built (old)", measure_built(legacy_zip_export, project_id, 1, config, upload_root, out_dir))
+            report("streamed", measure_streamed(ZipDownloadExporter(), project_id, config))
+
+            print("JSON")
+            report("built (old)", measure_built(legacy_json_export, project_id, 1, {}, out_dir))
+            report("streamed", measure_streamed(JsonExporter(), project_id, {}))
+        finally:
+            db.DB_PATH = saved_db
+            os.environ.pop("TAMOR_UPLOAD_ROOT", None)
+            shutil.rmtree(os.path.join(tmp, "out"), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark: project symbol extraction and symbol search.
+
+Builds a synthetic code project (default 5,000 config / source files of
+`key = value` and `key: value` lines drawn from a shared vocabulary) and
+times, against a copy of the previous implementation:
+
+  - full extraction: per-file DELETE / INSERT / commit (old) vs one
+    transaction (new, first run)
+  - re-extraction with nothing changed, and with 1% of files edited
+    (new: size/mtime and content hash skip the rest)
+  - symbol search: loading every row and np.vstack per query (old) vs
+    the cached per-project matrix (new, cold build and warm)
+
+The old extraction is run with project_id filled in, which the baseline
+file_symbols schema requires. Embeddings come from the fake embedder in
+benchmarks/fakes.py.
+
+Usage:
+    cd api && python -m benchmarks.bench_knowledge_graph
+    cd api && python -m benchmarks.bench_knowledge_graph --files 20000 --queries 50
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fakes
+
+KEYS = [
+    f"{a}{b}" for a in ("width", "height", "depth", "offset", "timeout", "retry", "max", "min",
+                        "cache", "buffer", "port", "host", "path", "level", "limit", "scale")
+    for b in ("Mm", "Px", "Ms", "Count", "Size", "Ratio", "Name", "Url", "Dir", "Mode", "Rate", "")
+]
+EXTS = [(".json", "application/json"), (".yaml", "text/yaml"), (".ini", "text/plain"),
+        (".py", "text/x-python"), (".cfg", "text/plain")]
+
+
+def write_code_file(path: str, rng: random.Random, lines: int = 30) -> None:
+    with open(path, "w") as f:
+        for _ in range(lines):
+            key = rng.choice(KEYS) + (rng.choice(("", "", "_" + str(rng.randint(0, 40)))))
+            sep = rng.choice((" = ", ": "))
+            f.write(f"{key}{sep}{rng.randint(0, 10000)}\n")
+
+
+def make_project(conn, upload_root: str, user_id: int, n_files: int, seed: int = 5):
+    """Write n_files code files and register them in two projects (old / new)."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(upload_root, "code"), exist_ok=True)
+    stored = []
+    for i in range(n_files):
+        ext, mime = EXTS[i % len(EXTS)]
+        name = f"module_{i:05d}{ext}"
+        write_code_file(os.path.join(upload_root, "code", name), rng)
+        stored.append((name, os.path.join("code", name), mime))
+
+    project_ids = []
+    for label in ("old", "new"):
+        project_id = conn.execute(
+            "INSERT INTO projects (user_id, name) VALUES (?, ?)", (user_id, f"Code ({label})")
+        ).lastrowid
+        conn.executemany(
+            """
+            INSERT INTO project_files (user_id, project_id, filename, stored_name, mime_type, size_bytes)
+            VALUES (?, ?, ?, ?, ?, 0)
+            """,
+            [(user_id, project_id, name, rel, mime) for name, rel, mime in stored],
+        )
+        project_ids.append(project_id)
+    conn.commit()
+    return project_ids, [rel for _, rel, _ in stored]
+
+
+# ---------------------------------------------------------------------------
+# Previous implementation
+# ---------------------------------------------------------------------------
+
+
+def legacy_extract(project_id: int, user_id: int) -> int:
+    from services import knowledge_graph as kg
+    from utils.db import get_db
+
+    conn = get_db()
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    rows = cur.execute(
+        """
+        SELECT pf.* FROM project_files pf JOIN projects p ON pf.project_id = p.id
+        WHERE pf.project_id = ? AND p.user_id = ? ORDER BY pf.id DESC
+        """,
+        (project_id, user_id),
+    ).fetchall()
+    total = 0
+    for row in rows:
+        if not kg._looks_text_like(row["filename"], row["mime_type"] or ""):
+            continue
+        text = kg._load_file_text_for_row(row)
+        symbols = kg._extract_symbols_from_text(text)
+        if not symbols:
+            continue
+        cur.execute("DELETE FROM file_symbols WHERE file_id = ?", (row["id"],))
+        cur.executemany(
+            "INSERT INTO file_symbols (project_id, file_id, symbol, char_offset, snippet) VALUES (?, ?, ?, ?, ?)",
+            [(project_id, row["id"], n, o, s) for (n, o, s) in symbols],
+        )
+        conn.commit()
+        total += len(symbols)
+    conn.close()
+    return total
+
+
+def legacy_query(project_id: int, user_id: int, symbol: str, embedder, top_k: int = 10):
+    from utils.db import get_db
+
+    q_emb = embedder.encode([symbol])[0]
+    conn = get_db()
+    rows = conn.execute(
+        """
+        SELECT fs.id, fs.file_id, fs.symbol, fs.char_offset, fs.snippet, fs.embedding,
+               pf.filename, pf.mime_type
+        FROM file_symbols fs
+        JOIN project_files pf ON fs.file_id = pf.id
+        JOIN projects p ON pf.project_id = p.id
+        WHERE pf.project_id = ? AND p.user_id = ?
+        """,
+        (project_id, user_id),
+    ).fetchall()
+    conn.close()
+    embs = np.vstack([np.frombuffer(r["embedding"], dtype=np.float32) for r in rows])
+    norms = np.linalg.norm(embs, axis=1) * np.linalg.norm(q_emb)
+    sims = np.dot(embs, q_emb) / np.maximum(norms, 1e-8)
+    return [rows[int(i)]["symbol"] for i in np.argsort(-sims)[:top_k]]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def p50_ms(fn, queries) -> float:
+    times = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark symbol extraction and search")
+    parser.add_argument("--files", type=int, default=5000, help="Code files (default: 5000)")
+    parser.add_argument("--queries", type=int, default=20, help="Search queries (default: 20)")
+    parser.add_argument("--changed", type=float, default=0.01, help="Fraction edited (default: 0.01)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "kg.db")
+        embedder, _llm = fakes.install(db_path)
+
+        from flask import Flask
+        from benchmarks import synthetic
+        from services import knowledge_graph as kg
+        from utils.db import get_db
+
+        global np
+        import numpy as np
+
+        synthetic.create_database(db_path)
+        upload_root = os.path.join(tmp, "uploads")
+        app = Flask("bench_knowledge_graph")
+        app.config["UPLOAD_ROOT"] = upload_root
+
+        conn = get_db()
+        user_id = conn.execute("INSERT INTO users (username) VALUES ('bench')").lastrowid
+        (old_pid, new_pid), stored = make_project(conn, upload_root, user_id, args.files)
+        conn.close()
+
+        rng = random.Random(9)
+        queries = [rng.choice(KEYS).lower() for _ in range(args.queries)]
+
+        with app.app_context():
+            print(f"{args.files} files")
+            old_full, n_old = timed(legacy_extract, old_pid, user_id)
+            new_full, stats = timed(kg.sync_project_symbols, new_pid, user_id)
+            assert stats["symbols_total"] == n_old, (stats, n_old)
+            print(f"  full extraction      old {old_full:7.2f} s   new {new_full:7.2f} s   "
+                  f"({n_old} symbols)")
+
+            old_again, _ = timed(legacy_extract, old_pid, user_id)
+            new_again, stats = timed(kg.sync_project_symbols, new_pid, user_id)
+            assert stats["files_changed"] == 0
+            print(f"  re-run, no changes   old {old_again:7.2f} s   new {new_again:7.2f} s   "
+                  f"(x{old_again / new_again:.0f})")
+
+            edited = rng.sample(stored, max(1, int(len(stored) * args.changed)))
+            for rel in edited:
+                write_code_file(os.path.join(upload_root, rel), rng)
+            conn = get_db()
+            # The text cache would otherwise serve the old text to both; clear
+            # the extraction jobs the first run queued so misses re-queue them
+            conn.execute(
+                f"DELETE FROM file_text_cache WHERE file_id IN "
+                f"(SELECT id FROM project_files WHERE stored_name IN ({','.join('?' * len(edited))}))",
+                edited,
+            )
+            conn.execute("DELETE FROM llm_jobs")
+            conn.commit()
+            conn.close()
+            old_edit, _ = timed(legacy_extract, old_pid, user_id)
+            new_edit, stats = timed(kg.sync_project_symbols, new_pid, user_id)
+            assert stats["files_changed"] == len(edited), stats
+            print(f"  re-run, {len(edited)} edited    old {old_edit:7.2f} s   new {new_edit:7.2f} s   "
+                  f"(x{old_edit / new_edit:.0f})")
+
+            # Both start from the same embedded rows
+            kg.query_symbol(new_pid, user_id, "warmup")
+            conn = get_db()
+            conn.execute(
+                """
+                UPDATE file_symbols SET embedding = (
+                    SELECT n.embedding FROM file_symbols n
+                    WHERE n.project_id = ? AND n.symbol = file_symbols.symbol LIMIT 1)
+                WHERE project_id = ?
+                """,
+                (new_pid, old_pid),
+            )
+            conn.commit()
+            conn.close()
+
+            old_q = p50_ms(lambda q: legacy_query(old_pid, user_id, q, embedder), queries)
+            kg.invalidate_symbol_matrix()
+            cold, _ = timed(kg.query_symbol, new_pid, user_id, queries[0])
+            warm = p50_ms(lambda q: kg.query_symbol(new_pid, user_id, q), queries)
+            print(f"  query p50            old {old_q:7.1f} ms  new {warm:7.1f} ms  "
+                  f"(x{old_q / warm:.0f}; cold build {cold * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
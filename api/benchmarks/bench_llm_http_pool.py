@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bare requests.post vs pooled session (utils/http_retry).
+
+Sends N sequential POSTs each way and reports p50/p95/mean latency and
+the number of TCP connections opened. By default it targets a local
+stub server, which isolates connection setup cost; real providers add a
+TLS handshake per new connection, so the gap there is larger.
+
+Usage:
+    cd api && python -m benchmarks.bench_llm_http_pool
+    cd api && python -m benchmarks.bench_llm_http_pool --calls 100 --server-delay-ms 5
+    cd api && python -m benchmarks.bench_llm_http_pool --url http://host:port/echo
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_retry import close_sessions, get_session, post_with_retry
+
+
+def start_stub_server(delay_s: float):
+    """Keep-alive stub that sleeps delay_s per request. Returns (url, ports, httpd)."""
+    ports = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without this,
+        # Nagle + delayed ACK adds ~40ms to every keep-alive response
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            ports.append(self.client_address[1])
+            if delay_s:
+                time.sleep(delay_s)
+            body = b'{"choices": [{"message": {"content": "4"}}]}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{httpd.server_address[1]}/v1/chat/completions", ports, httpd
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    idx = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def run(url, calls, session):
+    payload = {"model": "bench", "messages": [{"role": "user", "content": "2+2?"}]}
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        post_with_retry(url, json=payload, timeout=30, session=session)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled LLM HTTP sessions")
+    parser.add_argument("--calls", type=int, default=100, help="Sequential calls per run (default: 100)")
+    parser.add_argument("--server-delay-ms", type=float, default=0, help="Stub server latency per call")
+    parser.add_argument("--url", help="POST to this URL instead of the local stub")
+    args = parser.parse_args()
+
+    ports = None
+    httpd = None
+    if args.url:
+        url = args.url
+    else:
+        url, ports, httpd = start_stub_server(args.server_delay_ms / 1000)
+
+    results = []
+    for label, session in (("bare requests.post", None), ("pooled session", get_session("bench"))):
+        start = len(ports) if ports is not None else 0
+        latencies = run(url, args.calls, session)
+        conns = len(set(ports[start:])) if ports is not None else None
+        results.append((label, latencies, conns))
+
+    print(f"{args.calls} sequential calls -> {url}\n")
+    print(f"{'':<22}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'conns':>8}")
+    for label, latencies, conns in results:
+        print(
+            f"{label:<22}"
+            f"{statistics.median(latencies):>10.2f}"
+            f"{percentile(latencies, 95):>10.2f}"
+            f"{statistics.mean(latencies):>10.2f}"
+            f"{conns if conns is not None else '-':>8}"
+        )
+
+    close_sessions()
+    if httpd:
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark: request-timing overhead with metrics on and off.
+
+Runs a chat-shaped Flask endpoint through the test client: the same
+spans as POST /api/chat (context with memory / scripture / library /
+project files / GHM / history, agent router, LLM, GHM enforcement,
+epistemic), --queries SQLite statements through get_db(), and a
+simulated model call of --llm-ms. Times it with metrics off, on, and on
+with the Server-Timing header, and reports time per request, overhead
+in microseconds and overhead as a share of the request. Modes are
+interleaved in rounds and each reports its median round.
+
+Also times the bare primitives (span, counted execute) per call.
+
+Usage:
+    cd api && python -m benchmarks.bench_metrics
+    cd api && python -m benchmarks.bench_metrics --requests 2000 --llm-ms 0
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+
+from utils import db, metrics
+
+CONTEXT_SPANS = ("memory_search", "scripture_context", "library_search",
+                 "project_files", "ghm_prompt", "history")
+
+
+def busy_wait(seconds: float) -> None:
+    """Stand-in for model latency that, unlike sleep(), has no scheduler jitter."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def create_db(tmp: str) -> None:
+    db.DB_PATH = os.path.join(tmp, "metrics.db")
+    conn = db.get_db()
+    conn.execute("CREATE TABLE messages (id INTEGER PRIMARY KEY, conversation_id INTEGER, content TEXT)")
+    conn.executemany(
+        "INSERT INTO messages (conversation_id, content) VALUES (?, ?)",
+        [(i % 50, f"message {i} " * 10) for i in range(5000)],
+    )
+    conn.execute("CREATE INDEX idx_messages_conv ON messages(conversation_id)")
+    conn.commit()
+    conn.close()
+
+
+def build_app(queries: int, llm_seconds: float) -> Flask:
+    app = Flask(__name__)
+    metrics.init_app(app)
+    per_span = max(1, queries // len(CONTEXT_SPANS))
+
+    @app.post("/api/chat")
+    def chat():
+        conn = db.get_db()
+        rows = 0
+        with metrics.span("context"):
+            for i, name in enumerate(CONTEXT_SPANS):
+                with metrics.span(name):
+                    for q in range(per_span):
+                        rows += len(conn.execute(
+                            "SELECT id, content FROM messages WHERE conversation_id = ? ORDER BY id DESC LIMIT 20",
+                            ((i * per_span + q) % 50,),
+                        ).fetchall())
+        with metrics.span("agent_router"):
+            with metrics.llm_call("anthropic", "bench") as call:
+                busy_wait(llm_seconds)
+                call.tokens(1200, 300)
+        with metrics.span("ghm_enforce"):
+            pass
+        with metrics.span("epistemic"):
+            pass
+        conn.close()
+        return jsonify({"rows": rows})
+
+    return app
+
+
+MODES = (
+    ("metrics off", False, False),
+    ("metrics on", True, False),
+    ("metrics on + Server-Timing", True, True),
+)
+
+
+def time_requests(queries: int, llm_seconds: float, n: int, rounds: int = 10):
+    """
+    Median per-request seconds for each of MODES.
+
+    Modes run interleaved in rounds of n / rounds requests, so CPU
+    frequency and cache drift hit every mode alike.
+    """
+    clients = []
+    for _label, enabled, _server_timing in MODES:
+        metrics.set_enabled(enabled)
+        clients.append(build_app(queries, llm_seconds).test_client())
+
+    batch = max(1, n // rounds)
+    means = [[] for _ in MODES]
+    for r in range(rounds + 1):
+        for i, (_label, enabled, server_timing) in enumerate(MODES):
+            metrics.set_enabled(enabled)
+            metrics.SERVER_TIMING_ENABLED = server_timing
+            start = time.perf_counter()
+            for _ in range(batch):
+                response = clients[i].post("/api/chat")
+            elapsed = (time.perf_counter() - start) / batch
+            assert response.status_code == 200
+            assert ("Server-Timing" in response.headers) == (enabled and server_timing)
+            if r:  # round 0 is warm-up
+                means[i].append(elapsed)
+    metrics.reset()
+    return [statistics.median(m) for m in means]
+
+
+def time_primitives(n: int = 100_000):
+    """(span off, span on, execute off, execute on) in microseconds per call."""
+    out = []
+    for enabled in (False, True):
+        metrics.set_enabled(enabled)
+        start = time.perf_counter()
+        for _ in range(n):
+            with metrics.span("x"):
+                pass
+        out.append((time.perf_counter() - start) / n * 1e6)
+    for enabled in (False, True):
+        metrics.set_enabled(enabled)
+        conn = db.get_db()
+        start = time.perf_counter()
+        for _ in range(n // 10):
+            conn.execute("SELECT 1")
+        out.append((time.perf_counter() - start) / (n // 10) * 1e6)
+        conn.close()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark metrics overhead")
+    parser.add_argument("--requests", type=int, default=1000, help="Timed requests per mode (default: 1000)")
+    parser.add_argument("--queries", type=int, default=30, help="SQL statements per request (default: 30)")
+    parser.add_argument("--llm-ms", type=float, default=20.0,
+                        help="Simulated model latency per request, ms (default: 20)")
+    args = parser.parse_args()
+
+    saved = (db.DB_PATH, metrics.METRICS_ENABLED, metrics.SERVER_TIMING_ENABLED)
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            create_db(tmp)
+            print(f"{args.requests} requests, {args.queries} queries, "
+                  f"{len(CONTEXT_SPANS) + 6} spans, {args.llm_ms:g} ms model call each")
+
+            results = time_requests(args.queries, args.llm_ms / 1000, args.requests)
+            off = results[0]
+            for (label, enabled, _server_timing), seconds in zip(MODES, results):
+                line = f"  {label:<28}{seconds * 1000:8.3f} ms/request"
+                if enabled:
+                    delta = seconds - off
+                    line += f"   overhead {delta * 1e6:7.1f} us ({delta / off * 100:+.2f}%)"
+                print(line)
+
+            span_off, span_on, exec_off, exec_on = time_primitives()
+            print("Primitives (per call)")
+            print(f"  span               off {span_off:6.3f} us   on {span_on:6.3f} us")
+            print(f"  execute SELECT 1   off {exec_off:6.3f} us   on {exec_on:6.3f} us")
+        finally:
+            db.DB_PATH, enabled, metrics.SERVER_TIMING_ENABLED = saved
+            metrics.set_enabled(enabled)
+            metrics.reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF text + structure extraction, two passes vs one shared pass.
+
+Generates a text PDF (default 500 pages) with running footers and
+sentences broken across lines and pages, then times:
+
+  - two pypdf passes (the old _parse_pdf + extract_pdf_structure pair)
+  - file_parsing.extract_pdf() cold, sequential and with --workers
+  - the structure lookup afterwards (content-hash cache hit)
+
+Usage:
+    cd api && python -m benchmarks.bench_pdf_extract
+    cd api && python -m benchmarks.bench_pdf_extract --pages 1000 --workers 1 2 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import file_parsing
+from services.structured_parsing import extract_pdf_structure
+
+WORDS = (
+    "the covenant was given at sinai and the people heard the voice of the "
+    "lord from the midst of the fire and the law was written on tablets of stone"
+).split()
+
+
+def _pdf_string(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_text_pdf(path: str, pages: int, lines_per_page: int = 40, seed: int = 0) -> None:
+    """
+    Write a minimal Helvetica text PDF. Each page has a heading line, body
+    lines that wrap mid-sentence (including across the page break) and a
+    'Page N' footer for clean_extracted_text() to strip.
+    """
+    rng = random.Random(seed)
+    objects = []  # Object bodies, numbered from 1
+
+    def add(body: str) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = len(objects) + 1
+    add("")  # Placeholder for the page tree
+    kids = []
+    for n in range(1, pages + 1):
+        lines = [f"Chapter {n}"]
+        for _ in range(lines_per_page):
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 12))))
+        if n % 5:
+            lines[-1] += "."
+        lines.append(f"Page {n}")
+
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        ops += [f"({_pdf_string(line)}) Tj T*" for line in lines]
+        ops.append("ET")
+        stream = "\n".join(ops)
+        content = add(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        kids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {content} 0 R >>"
+        ))
+    objects[pages_id - 1] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>"
+    )
+    catalog = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def two_pass(path: str) -> None:
+    """The previous behaviour: text pass, then a second pass for structure."""
+    from pypdf import PdfReader
+
+    for _ in range(2):
+        with open(path, "rb") as f:
+            reader = PdfReader(f)
+            texts = [page.extract_text() or "" for page in reader.pages]
+    file_parsing.clean_extracted_text("\n".join(texts).strip())
+
+
+def timed(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction")
+    parser.add_argument("--pages", type=int, default=500, help="Generated PDF pages (default: 500)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4],
+                        help="Pool sizes to compare (default: 1 2 4)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        write_text_pdf(path, args.pages)
+        print(f"{args.pages} pages, {os.path.getsize(path) / 1024 / 1024:.1f} MB, "
+              f"{os.cpu_count()} CPUs\n")
+
+        print(f"{'':<34}{'seconds':>9}")
+        print(f"{'two passes (text + structure)':<34}{timed(two_pass, path):>9.2f}")
+
+        for workers in sorted(set(args.workers)):
+            file_parsing._pdf_cache.clear()
+            cold = timed(file_parsing.extract_pdf, path, workers=workers)
+            print(f"{f'one pass, {workers} worker(s)':<34}{cold:>9.2f}")
+
+        warm = timed(extract_pdf_structure, path)
+        print(f"{'structure after text (cache hit)':<34}{warm:>9.3f}")
+
+        pdf = file_parsing.extract_pdf(path)
+        print(f"\n{len(pdf['text']):,} cleaned chars, {len(pdf['page_offsets'])} page offsets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hot queries before and after migration 028's indexes.
+
+Builds a database with every migration, drops the indexes migration 028
+adds, and fills it with project file text, tasks, library files,
+conversation history, reader audio cache rows, scripture refs and
+memory entities. Then:
+
+  1. runs the workload through get_db() with the slow-query log on and
+     prints the index advisor's report (utils/query_log.py), which is
+     where migration 028 comes from
+  2. times each query (median over varied parameters) without the
+     indexes, applies 028 and times them again, printing the plan change
+
+The workload is the app's own SQL: file text lookups (files_api,
+reader_service), the chat task list, the library list's mime filter,
+conversation history, reader audio cache and library chunk lookups, the
+scripture passage lookup and the search-style LIKEs. Queries 028 can't
+help (leading-wildcard LIKE) and ones that were already indexed (audio
+cache, library chunks, passages) are timed as controls.
+
+Usage:
+    cd api && python -m benchmarks.bench_query_indexes
+    cd api && python -m benchmarks.bench_query_indexes --scale 4 --repeat 200
+"""
+
+import argparse
+import logging
+import os
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import synthetic
+from utils import db, query_log
+
+MIGRATION = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations", "028_query_indexes.sql"
+)
+
+USERS = 20
+MIMES = ("application/pdf", "text/plain", "text/markdown", "audio/mpeg", "video/mp4", "application/epub+zip")
+BOOKS = ("Genesis", "Exodus", "Isaiah", "Psalms", "Matthew", "John", "Romans", "Hebrews")
+VOICES = ("en_US-lessac-medium", "en_GB-alan-medium")
+
+# (name, sql, parameter generator)
+WORKLOAD = [
+    (
+        "file text cache lookup",
+        "SELECT text, meta_json, parser FROM file_text_cache WHERE file_id = ?",
+        lambda s, rng: (rng.randint(1, s["project_files"]),),
+    ),
+    (
+        "chat task list",
+        """
+        SELECT id, title, status, task_type, normalized_json
+        FROM detected_tasks
+        WHERE user_id = ? AND status NOT IN ('completed', 'cancelled')
+        ORDER BY created_at DESC
+        LIMIT ?
+        """,
+        lambda s, rng: (rng.randint(1, USERS), 10),
+    ),
+    (
+        "library list, mime filter",
+        """
+        SELECT * FROM library_files
+        WHERE mime_type LIKE ?
+        ORDER BY created_at DESC
+        LIMIT ? OFFSET ?
+        """,
+        lambda s, rng: (rng.choice(("video%", "application/epub%")), 50, 0),
+    ),
+    (
+        "library count, mime filter",
+        "SELECT COUNT(*) as count FROM library_files WHERE mime_type LIKE ?",
+        lambda s, rng: (rng.choice(("audio%", "video%")),),
+    ),
+    (
+        "conversation history",
+        """
+        SELECT id, conversation_id, sender, role, content, created_at
+        FROM messages
+        WHERE conversation_id = ?
+        ORDER BY created_at ASC
+        """,
+        lambda s, rng: (rng.randint(1, s["conversations"]),),
+    ),
+    (
+        "reader audio cache (control)",
+        """
+        SELECT audio_path, duration_seconds
+        FROM reader_audio_cache
+        WHERE library_file_id = ? AND chunk_index = ?
+          AND tts_voice = ? AND tts_speed = ?
+        """,
+        lambda s, rng: (rng.randint(1, s["library_files"]), rng.randint(0, 19), VOICES[0], 1.0),
+    ),
+    (
+        "library first chunks (control)",
+        """
+        SELECT lc.content, lc.page, lf.filename
+        FROM library_chunks lc
+        JOIN library_files lf ON lc.library_file_id = lf.id
+        WHERE lc.library_file_id = ?
+        ORDER BY lc.chunk_index
+        LIMIT ?
+        """,
+        lambda s, rng: (rng.randint(1, s["library_files"]), 5),
+    ),
+    (
+        "scripture passage (control)",
+        """
+        SELECT lc.library_file_id, lc.chunk_index, lc.content, lc.page, lf.filename,
+               MIN(r.verse_end - r.verse_start) AS span
+        FROM library_chunk_refs r
+        JOIN library_chunks lc ON lc.id = r.library_chunk_id
+        JOIN library_files lf ON lf.id = r.library_file_id
+        WHERE r.book = ? AND r.chapter = ? AND r.verse_start <= ? AND r.verse_end >= ?
+        GROUP BY lc.id
+        ORDER BY span ASC, lc.library_file_id ASC, lc.chunk_index ASC
+        LIMIT ?
+        """,
+        lambda s, rng: (rng.choice(BOOKS), rng.randint(1, 20), 10, 10, 10),
+    ),
+    (
+        "library search LIKE (unindexable)",
+        "SELECT COUNT(*) as count FROM library_files WHERE (filename LIKE ? OR metadata_json LIKE ?)",
+        lambda s, rng: ("%covenant%", "%covenant%"),
+    ),
+    (
+        "memory entity LIKE (unindexable)",
+        "SELECT id, name FROM memory_entities WHERE name LIKE ?",
+        lambda s, rng: (f"%{rng.choice(synthetic.TOPIC_NAMES)}%",),
+    ),
+]
+
+
+def migration_indexes():
+    """Names of the indexes migration 028 creates."""
+    with open(MIGRATION) as f:
+        return re.findall(r"CREATE INDEX IF NOT EXISTS (\w+)", f.read())
+
+
+def populate(conn: sqlite3.Connection, scale: int, seed: int = 5) -> dict:
+    rng = random.Random(seed)
+    sizes = {
+        "project_files": 2_000 * scale,
+        "tasks": 25_000 * scale,
+        "library_files": 10_000 * scale,
+        "conversations": 1_000 * scale,
+        "messages": 50_000 * scale,
+        "entities": 5_000 * scale,
+    }
+    words = synthetic.VOCABULARY
+
+    def text(n):
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    conn.executemany("INSERT INTO users (id, username) VALUES (?, ?)", [(u, f"user{u}") for u in range(1, USERS + 1)])
+    conn.execute("INSERT INTO projects (id, user_id, name) VALUES (1, 1, 'bench')")
+
+    conn.executemany(
+        "INSERT INTO project_files (id, user_id, project_id, filename, stored_name, mime_type, size_bytes) "
+        "VALUES (?, 1, 1, ?, ?, 'text/plain', 4000)",
+        [(i, f"notes_{i}.txt", f"stored_{i}.txt") for i in range(1, sizes["project_files"] + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO file_text_cache (file_id, text, meta_json, parser) VALUES (?, ?, '{}', 'text')",
+        [(i, text(600)) for i in range(1, sizes["project_files"] + 1)],
+    )
+
+    statuses = ("confirmed", "completed", "cancelled", "needs_confirmation", "dismissed")
+    conn.executemany(
+        "INSERT INTO detected_tasks (user_id, task_type, title, confidence, normalized_json, status, created_at) "
+        "VALUES (?, 'reminder', ?, 0.9, ?, ?, datetime('2026-01-01', ?))",
+        [
+            (rng.randint(1, USERS), f"task {i}", '{"summary": "' + text(12) + '"}',
+             rng.choice(statuses), f"+{rng.randint(0, 500_000)} minutes")
+            for i in range(sizes["tasks"])
+        ],
+    )
+
+    conn.executemany(
+        "INSERT INTO library_files (id, filename, stored_path, mime_type, size_bytes, source_type, metadata_json, created_at) "
+        "VALUES (?, ?, ?, ?, 1000, 'scan', ?, datetime('2025-01-01', ?))",
+        [
+            (i, f"doc_{i:06d}.txt", f"/library/doc_{i:06d}", MIMES[i % 4] if i % 25 else rng.choice(MIMES[3:]),
+             '{"title": "' + text(4) + '"}', f"+{i} minutes")
+            for i in range(1, sizes["library_files"] + 1)
+        ],
+    )
+    chunks = []
+    for f in range(1, sizes["library_files"] + 1):
+        chunks.extend((f, c, text(40)) for c in range(5))
+    conn.executemany(
+        "INSERT INTO library_chunks (library_file_id, chunk_index, content) VALUES (?, ?, ?)", chunks
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO library_chunk_refs (library_chunk_id, library_file_id, book, chapter, verse_start, verse_end) "
+        "SELECT id, library_file_id, ?, ?, ?, ? FROM library_chunks WHERE id = ?",
+        [
+            (rng.choice(BOOKS), rng.randint(1, 20), v, v + rng.randint(0, 5), rng.randint(1, len(chunks)))
+            for v in (rng.randint(1, 30) for _ in range(len(chunks) // 2))
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO reader_audio_cache (library_file_id, content_type, chunk_index, chunk_start_char, "
+        "chunk_end_char, audio_path, duration_seconds, tts_voice, tts_speed) "
+        "VALUES (?, 'library', ?, 0, 1000, ?, 60.0, ?, 1.0)",
+        [
+            (f, c, f"/audio/{f}_{c}.wav", VOICES[f % 2])
+            for f in range(1, sizes["library_files"] + 1) for c in range(20)
+        ],
+    )
+
+    conn.executemany(
+        "INSERT INTO conversations (id, user_id, project_id, title, mode) VALUES (?, ?, 1, 'bench', 'Scholar')",
+        [(c, rng.randint(1, USERS)) for c in range(1, sizes["conversations"] + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO messages (conversation_id, sender, role, content, created_at) "
+        "VALUES (?, ?, ?, ?, datetime('2026-01-01', ?))",
+        [
+            (rng.randint(1, sizes["conversations"]), "user", "user", text(60), f"+{i} seconds")
+            for i in range(sizes["messages"])
+        ],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO memory_entities (name, entity_type) VALUES (?, 'concept')",
+        [(f"{rng.choice(synthetic.TOPIC_NAMES)} {text(2)} {i}",) for i in range(sizes["entities"])],
+    )
+    conn.commit()
+    return sizes
+
+
+def plan(conn: sqlite3.Connection, sql: str, params) -> str:
+    return " / ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def time_workload(conn: sqlite3.Connection, sizes: dict, repeat: int, seed: int = 9):
+    """{name: (median seconds, plan)} over `repeat` parameter draws per query."""
+    out = {}
+    for name, sql, gen in WORKLOAD:
+        rng = random.Random(seed)
+        samples = []
+        for _ in range(repeat):
+            params = gen(sizes, rng)
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            samples.append(time.perf_counter() - start)
+        out[name] = (statistics.median(samples), plan(conn, sql, gen(sizes, random.Random(seed))))
+    return out
+
+
+def advise(sizes: dict, slow_ms: float) -> str:
+    """Run the workload through get_db() with the slow-query log on; its report."""
+    log = query_log.enable(threshold_ms=slow_ms, log_file="")
+    # The report below has the same content as the per-statement warnings
+    logging.getLogger(query_log.__name__).setLevel(logging.ERROR)
+    try:
+        conn = db.get_db()
+        rng = random.Random(3)
+        for _name, sql, gen in WORKLOAD:
+            for _ in range(5):
+                conn.execute(sql, gen(sizes, rng)).fetchall()
+        conn.close()
+        return query_log.format_report(log)
+    finally:
+        query_log.disable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot queries before/after migration 028")
+    parser.add_argument("--scale", type=int, default=1, help="Row count multiplier (default: 1)")
+    parser.add_argument("--repeat", type=int, default=100, help="Timed runs per query (default: 100)")
+    parser.add_argument("--slow-ms", type=float, default=1.0,
+                        help="Slow-query threshold for the advisor pass, ms (default: 1)")
+    args = parser.parse_args()
+
+    saved_path = db.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "queries.db")
+        try:
+            synthetic.create_database(db.DB_PATH)
+            conn = sqlite3.connect(db.DB_PATH)
+            names = migration_indexes()
+            for name in names:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            start = time.perf_counter()
+            sizes = populate(conn, args.scale)
+            print(f"Populated in {time.perf_counter() - start:.1f}s: "
+                  + ", ".join(f"{v:,} {k.replace('_', ' ')}" for k, v in sizes.items()))
+
+            print(f"\n--- Index advisor (slow >= {args.slow_ms:g} ms, without migration 028) ---")
+            print(advise(sizes, args.slow_ms))
+
+            before = time_workload(conn, sizes, args.repeat)
+            start = time.perf_counter()
+            with open(MIGRATION) as f:
+                conn.executescript(f.read())
+            print(f"\nMigration 028 ({len(names)} indexes) applied in {time.perf_counter() - start:.2f}s")
+            after = time_workload(conn, sizes, args.repeat)
+            conn.close()
+
+            print(f"\n{'query':<36}{'before':>12}{'after':>12}{'speedup':>10}")
+            for name, _sql, _gen in WORKLOAD:
+                b, a = before[name][0], after[name][0]
+                print(f"{name:<36}{b * 1e6:10.1f}us{a * 1e6:10.1f}us{b / a:9.1f}x")
+            print("\nPlans (before -> after)")
+            for name, _sql, _gen in WORKLOAD:
+                if before[name][1] != after[name][1]:
+                    print(f"  {name}\n    {before[name][1]}\n    -> {after[name][1]}")
+        finally:
+            db.DB_PATH = saved_path
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: reader seek, re-chunking per lookup vs the chunk offset index.
+
+Generates a text of N MB (default 2) of sentences and paragraph breaks,
+then times a position lookup the way reader_service did it before (run
+tts_service.chunk_text() over the whole text, scan for the chunk) against
+services/reader_chunk_index.py:
+
+  - cold build (chunker once, boundaries stored in a temp database)
+  - load from reader_chunk_boundaries (new process, same text)
+  - warm lookups by character position and by playback time
+
+Usage:
+    cd api && python -m benchmarks.bench_reader_seek
+    cd api && python -m benchmarks.bench_reader_seek --mb 8 --seeks 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import reader_chunk_index as rci
+from services.tts_service import chunk_text
+from utils import db
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+WORDS = (
+    "and the word of the lord came to the prophet saying go and stand in the "
+    "gate of the house and proclaim there this word to all who enter"
+).split()
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 24)))
+        sentence = sentence.capitalize() + rng.choice(".!?")
+        sep = "\n\n" if rng.random() < 0.1 else " "
+        parts.append(sentence + sep)
+        total += len(sentence) + len(sep)
+    return "".join(parts)
+
+
+def legacy_seek(text: str, position: int):
+    """reader_service.get_chunk_for_position before the index."""
+    for chunk in chunk_text(text):
+        if chunk["start_char"] <= position < chunk["end_char"]:
+            return chunk
+    return None
+
+
+def timed_ms(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reader seek lookups")
+    parser.add_argument("--mb", type=float, default=2.0, help="Text size in MB (default: 2)")
+    parser.add_argument("--seeks", type=int, default=1000, help="Indexed lookups to time (default: 1000)")
+    parser.add_argument("--legacy-seeks", type=int, default=5,
+                        help="Re-chunking lookups to time (default: 5)")
+    args = parser.parse_args()
+
+    text = make_text(int(args.mb * 1024 * 1024))
+    rng = random.Random(1)
+    positions = [rng.randrange(len(text.strip())) for _ in range(args.seeks)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        conn = db.get_db()
+        with open(os.path.join(MIGRATIONS, "021_reader_chunk_index.sql")) as f:
+            conn.executescript(f.read())
+        conn.close()
+
+        legacy = [timed_ms(legacy_seek, text, p) for p in positions[:args.legacy_seeks]]
+
+        rci._cache.clear()
+        cold = timed_ms(rci.get_chunk_index, "library", 1, text)
+        rci._cache.clear()
+        loaded = timed_ms(rci.get_chunk_index, "library", 1, text)
+
+        index = rci.get_chunk_index("library", 1, text)
+        by_char = []
+        for p in positions:
+            start = time.perf_counter()
+            i = rci.get_chunk_index("library", 1, text).find_by_char(p)
+            if i is not None:
+                index.chunk(i, text)
+            by_char.append((time.perf_counter() - start) * 1000)
+
+        total = index.total_seconds
+        by_time = []
+        for p in positions:
+            start = time.perf_counter()
+            index.find_by_seconds(total * p / len(text))
+            by_time.append((time.perf_counter() - start) * 1000)
+
+    print(f"{len(text) / 1024 / 1024:.1f} MB text, {len(index):,} chunks, "
+          f"~{total / 3600:.1f} h estimated audio\n")
+    print(f"{'':<36}{'p50 ms':>10}")
+    print(f"{'re-chunk + scan per seek (old)':<36}{statistics.median(legacy):>10.2f}")
+    print(f"{'index cold build + store (once)':<36}{cold:>10.2f}")
+    print(f"{'index load from table (once)':<36}{loaded:>10.2f}")
+    print(f"{'seek by position (hash + bisect)':<36}{statistics.median(by_char):>10.3f}")
+    print(f"{'seek by seconds (bisect)':<36}{statistics.median(by_time):>10.4f}")
+    print(f"\nspeedup per seek (p50): "
+          f"{statistics.median(legacy) / statistics.median(by_char):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
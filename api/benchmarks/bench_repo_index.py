@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Code Agent file tools with and without the repository index.
+
+Generates a source tree (default 50,000 files of ~2 KB across nested
+packages, plus ignored node_modules / build trees and a .gitignore) and
+times:
+
+- list_directory: the previous recursive walk vs the indexed listing
+- search: `grep -rn` through run_command vs search_code (literal, rare
+  literal, case-insensitive, regex)
+- freshness: a no-change stat sweep, and write_file's incremental update
+
+Index build time and the trigram index size are reported once.
+
+Usage:
+    cd api && python -m benchmarks.bench_repo_index
+    cd api && python -m benchmarks.bench_repo_index --files 5000 --iterations 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.agents import code_tools, repo_index
+from services.agents.code_tools import PathSandbox, tool_run_command, tool_search_code, tool_write_file
+
+WORDS = ("def", "return", "self", "value", "config", "request", "handler", "result",
+         "import", "logger", "items", "parse", "token", "buffer", "index", "cache")
+
+
+def generate_tree(root: str, n_files: int, file_bytes: int, seed: int = 5) -> None:
+    """Nested packages of Python files, with ignored trees beside them."""
+    rng = random.Random(seed)
+    with open(os.path.join(root, ".gitignore"), "w") as f:
+        f.write("*.log\n/generated/\n")
+    for i in range(n_files):
+        rel = f"src/pkg_{i % 40:02d}/sub_{(i // 40) % 25:02d}/module_{i:06d}.py"
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lines = [f"class Module{i}:"]
+        size = len(lines[0])
+        while size < file_bytes:
+            line = "    " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 9)))
+            lines.append(line)
+            size += len(line) + 1
+        if i % 5000 == 1234:
+            lines.append("    rare_marker_value = 42")
+        with open(path, "w") as f:
+            f.write("\n".join(lines))
+    for ignored in ("node_modules/dep", "build/lib", "generated"):
+        os.makedirs(os.path.join(root, ignored), exist_ok=True)
+        for j in range(n_files // 20):
+            with open(os.path.join(root, ignored, f"file_{j}.js"), "w") as f:
+                f.write("return value rare_marker_value\n" * 20)
+
+
+def legacy_list_directory(resolved: Path, max_depth: int) -> str:
+    """tool_list_directory before the index."""
+    lines = []
+
+    def walk(dir_path: Path, depth: int, prefix: str = ""):
+        if depth > max_depth:
+            return
+        try:
+            entries = sorted(dir_path.iterdir(), key=lambda e: (not e.is_dir(), e.name.lower()))
+        except PermissionError:
+            lines.append(f"{prefix}[permission denied]")
+            return
+        for entry in entries:
+            if entry.name in repo_index.IGNORED_NAMES or entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                lines.append(f"{prefix}{entry.name}/")
+                walk(entry, depth + 1, prefix + "  ")
+            else:
+                lines.append(f"{prefix}{entry.name}")
+
+    walk(resolved, 0)
+    return "\n".join(lines)
+
+
+def timed(fn, iterations: int):
+    """(p50 ms, max ms, last result)."""
+    samples = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples), result
+
+
+def report(label: str, stats) -> None:
+    p50, worst, _ = stats
+    print(f"  {label:<40}p50 {p50:9.2f} ms   max {worst:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Code Agent repository index")
+    parser.add_argument("--files", type=int, default=50_000, help="Source files (default: 50000)")
+    parser.add_argument("--file-bytes", type=int, default=2048, help="Approximate file size (default: 2048)")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed runs per case (default: 5)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        generate_tree(root, args.files, args.file_bytes)
+        print(f"Generated {args.files} files in {time.perf_counter() - start:.1f}s")
+
+        sandbox = PathSandbox(root)
+        index = repo_index.get_repo_index(root)
+        start = time.perf_counter()
+        index.rebuild()
+        stats = index.stats()
+        print(f"Index build: {time.perf_counter() - start:.2f}s "
+              f"({stats['indexed_files']} files, {stats['trigrams']} trigrams, "
+              f"{stats['postings']} postings)")
+        n = args.iterations
+
+        print("list_directory (depth 2 / depth 4)")
+        for depth in (2, 4):
+            report(f"walk, depth {depth}", timed(lambda: legacy_list_directory(Path(root), depth), n))
+            report(f"index, depth {depth}", timed(lambda: code_tools.tool_list_directory(".", sandbox, depth), n))
+
+        print("search")
+        queries = [
+            ("common literal 'handler'", "handler", {}),
+            ("rare literal", "rare_marker_value", {}),
+            ("case-insensitive 'MODULE1234:'", "MODULE1234:", {"case_sensitive": False}),
+            ("regex 'class Module12\\d\\d:'", r"class Module12\d\d:", {"regex": True}),
+        ]
+        grep_flags = {"handler": "-F", "rare_marker_value": "-F", "MODULE1234:": "-Fi",
+                      r"class Module12\d\d:": "-P"}
+        for label, query, kwargs in queries:
+            command = (f"grep -rn {grep_flags[query]} --exclude-dir=node_modules "
+                       f"--exclude-dir=build --exclude-dir=generated -m 100 '{query}' . | head -100")
+            report(f"grep, {label}", timed(lambda: tool_run_command(command, root, 120), n))
+            # run_command marks the index stale; sweep before timing search_code
+            index.ensure_fresh()
+            report(f"index, {label}",
+                   timed(lambda: tool_search_code(query, sandbox, **kwargs), n))
+
+        print("freshness")
+        report("stat sweep, nothing changed", timed(lambda: (index.mark_stale(), index.ensure_fresh()), n))
+        report("write_file + incremental update",
+               timed(lambda: tool_write_file("src/pkg_00/new_module.py", "def fresh(): return 1\n", sandbox), n))
+        p50, _, result = timed(lambda: tool_search_code("def fresh", sandbox), 1)
+        assert "new_module.py" in result
+        print(f"  written file searchable after {p50:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
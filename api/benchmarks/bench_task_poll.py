@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark: task executor due-task lookup, json_extract scan vs indexed column.
+
+Fills a temporary database with N detected_tasks (default 100,000) spread
+over a year and a mix of statuses, applies migration 020, then times:
+
+  - the old poll query (json_extract over every confirmed row)
+  - the new due-task query (status, scheduled_for) index range
+  - DeadlineQueue.reload(), which the executor runs after each wakeup
+
+Firing accuracy of the deadline loop is covered by
+tests/test_task_executor.py; the old 30 s poller fired up to 30 s late.
+
+Usage:
+    cd api && python -m benchmarks.bench_task_poll
+    cd api && python -m benchmarks.bench_task_poll --tasks 500000 --repeat 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.task_schedule import scheduled_for_key
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+LEGACY_QUERY = """
+    SELECT *
+    FROM detected_tasks
+    WHERE status='confirmed'
+      AND json_extract(normalized_json, '$.scheduled_for') IS NOT NULL
+      AND json_extract(normalized_json, '$.scheduled_for') != ''
+      AND json_extract(normalized_json, '$.scheduled_for') <= ?
+    ORDER BY id
+    LIMIT 10
+"""
+
+INDEXED_QUERY = """
+    SELECT *
+    FROM detected_tasks
+    WHERE status='confirmed'
+      AND scheduled_for IS NOT NULL
+      AND scheduled_for <= ?
+    ORDER BY scheduled_for, id
+    LIMIT 10
+"""
+
+STATUSES = ["confirmed"] * 3 + ["completed"] * 4 + ["needs_confirmation", "cancelled", "dismissed"]
+
+
+def build_db(path: str, tasks: int, seed: int = 0) -> sqlite3.Connection:
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    with open(os.path.join(MIGRATIONS, "000_baseline.sql")) as f:
+        conn.executescript(f.read())
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(tasks):
+        status = rng.choice(STATUSES)
+        # Confirmed tasks are upcoming; everything else is spread around now
+        offset = rng.uniform(60, 365 * 86400) if status == "confirmed" else rng.uniform(-365 * 86400, 365 * 86400)
+        due = now + timedelta(seconds=offset)
+        normalized = {"scheduled_for": due.isoformat(timespec="minutes"), "time_text": "at some point"}
+        if rng.random() < 0.2:
+            normalized["recurrence"] = {"type": "weekly", "interval": 1}
+        rows.append((1, 1, "reminder", f"Task {i}", json.dumps({"raw": "x" * 80}), json.dumps(normalized), status))
+
+    conn.executemany(
+        """
+        INSERT INTO detected_tasks (user_id, conversation_id, task_type, title,
+                                    payload_json, normalized_json, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    conn.commit()
+    return conn
+
+
+def time_query(conn, sql: str, params: tuple, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def plan(conn, sql: str, params: tuple) -> str:
+    return "; ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def report(label: str, samples: list[float]):
+    print(f"{label:<26}{statistics.median(samples):>10.3f}{max(samples):>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark task executor poll cost")
+    parser.add_argument("--tasks", type=int, default=100_000, help="Rows in detected_tasks (default: 100000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query (default: 20)")
+    args = parser.parse_args()
+
+    from workers.task_executor import DeadlineQueue
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        conn = build_db(path, args.tasks)
+        print(f"{args.tasks:,} tasks built in {time.perf_counter() - start:.1f}s")
+
+        now = scheduled_for_key(datetime.now(timezone.utc))
+        legacy_now = datetime.now(timezone.utc).isoformat()
+        legacy = time_query(conn, LEGACY_QUERY, (legacy_now,), args.repeat)
+
+        start = time.perf_counter()
+        with open(os.path.join(MIGRATIONS, "020_task_scheduled_for.sql")) as f:
+            conn.executescript(f.read())
+        print(f"migration 020 (backfill + index) in {time.perf_counter() - start:.1f}s\n")
+
+        indexed = time_query(conn, INDEXED_QUERY, (now,), args.repeat)
+        queue = DeadlineQueue()
+        reloads = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            queue.reload(conn)
+            reloads.append((time.perf_counter() - start) * 1000)
+
+        print(f"{'per poll':<26}{'p50 ms':>10}{'max ms':>10}")
+        report("json_extract scan", legacy)
+        report("indexed due query", indexed)
+        report("DeadlineQueue.reload", reloads)
+        print(f"\nspeedup (p50): {statistics.median(legacy) / statistics.median(indexed):.0f}x")
+        print(f"\nlegacy plan:  {plan(conn, LEGACY_QUERY, (legacy_now,))}")
+        print(f"indexed plan: {plan(conn, INDEXED_QUERY, (now,))}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
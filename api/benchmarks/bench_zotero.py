@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Zotero reader, per-item queries vs batched detail loading.
+
+Generates a database with the parts of Zotero's schema the reader uses
+(default 20,000 items, each with creators, tags and a PDF attachment)
+and reports p50 latency of:
+
+  - a page of items, loading creators / tags / attachments per item (old,
+    3N+1 queries) and with three itemID IN (...) queries (new)
+  - a deep page by OFFSET vs by keyset (itemID > cursor)
+  - search_items: the old scan of the first 10,000 items in Python vs SQL
+  - opening a connection with the mtime-checked snapshot warm
+
+Usage:
+    cd api && python -m benchmarks.bench_zotero
+    cd api && python -m benchmarks.bench_zotero --items 50000 --page 500
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.integrations import zotero
+from services.integrations.zotero import ZoteroItem, ZoteroReader
+
+# Subset of Zotero 5's schema.sql: the tables and indexes the reader touches
+ZOTERO_SCHEMA = """
+CREATE TABLE itemTypes (itemTypeID INTEGER PRIMARY KEY, typeName TEXT, templateItemTypeID INT, display INT DEFAULT 1);
+CREATE TABLE fields (fieldID INTEGER PRIMARY KEY, fieldName TEXT, fieldFormatID INT);
+CREATE TABLE items (
+    itemID INTEGER PRIMARY KEY, itemTypeID INT NOT NULL,
+    dateAdded TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    dateModified TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    clientDateModified TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    libraryID INT NOT NULL DEFAULT 1, key TEXT NOT NULL,
+    version INT NOT NULL DEFAULT 0, synced INT NOT NULL DEFAULT 0,
+    UNIQUE (libraryID, key)
+);
+CREATE TABLE itemDataValues (valueID INTEGER PRIMARY KEY, value UNIQUE);
+CREATE TABLE itemData (
+    itemID INT, fieldID INT, valueID,
+    PRIMARY KEY (itemID, fieldID)
+);
+CREATE INDEX itemData_fieldID ON itemData(fieldID);
+CREATE TABLE creators (creatorID INTEGER PRIMARY KEY, firstName TEXT, lastName TEXT, fieldMode INT,
+                       UNIQUE (lastName, firstName, fieldMode));
+CREATE TABLE creatorTypes (creatorTypeID INTEGER PRIMARY KEY, creatorType TEXT);
+CREATE TABLE itemCreators (
+    itemID INT NOT NULL, creatorID INT NOT NULL, creatorTypeID INT NOT NULL DEFAULT 1,
+    orderIndex INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (itemID, creatorID, creatorTypeID, orderIndex),
+    UNIQUE (itemID, orderIndex)
+);
+CREATE INDEX itemCreators_creatorTypeID ON itemCreators(creatorTypeID);
+CREATE TABLE tags (tagID INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE itemTags (itemID INT NOT NULL, tagID INT NOT NULL, type INT NOT NULL,
+                       PRIMARY KEY (itemID, tagID));
+CREATE INDEX itemTags_tagID ON itemTags(tagID);
+CREATE TABLE itemAttachments (
+    itemID INTEGER PRIMARY KEY, parentItemID INT, linkMode INT, contentType TEXT,
+    charsetID INT, path TEXT, syncState INT DEFAULT 0
+);
+CREATE INDEX itemAttachments_parentItemID ON itemAttachments(parentItemID);
+CREATE INDEX itemAttachments_contentType ON itemAttachments(contentType);
+CREATE TABLE collections (collectionID INTEGER PRIMARY KEY, collectionName TEXT NOT NULL,
+                          parentCollectionID INT DEFAULT NULL, libraryID INT NOT NULL DEFAULT 1,
+                          key TEXT NOT NULL);
+CREATE TABLE collectionItems (collectionID INT NOT NULL, itemID INT NOT NULL,
+                              orderIndex INT NOT NULL DEFAULT 0, PRIMARY KEY (collectionID, itemID));
+CREATE INDEX collectionItems_itemID ON collectionItems(itemID);
+"""
+
+ITEM_TYPES = ["journalArticle", "book", "bookSection", "thesis", "attachment", "note"]
+FIELDS = ["title", "date", "abstractNote", "url", "DOI", "publisher", "pages"]
+CREATOR_TYPES = ["author", "editor", "translator"]
+WORDS = ("covenant torah sabbath temple prophet psalm gospel epistle exile kingdom "
+         "priest law grace faith israel judah hebrew greek scroll messiah").split()
+_KEY_CHARS = "23456789ABCDEFGHIJKLMNPQRSTUVWXYZ"
+
+
+def make_zotero_db(path: str, n_items: int, seed: int = 0) -> None:
+    """Write a zotero.sqlite with n_items regular items, each with a PDF attachment."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript(ZOTERO_SCHEMA)
+    conn.executemany("INSERT INTO itemTypes (itemTypeID, typeName) VALUES (?, ?)",
+                     list(enumerate(ITEM_TYPES, 1)))
+    conn.executemany("INSERT INTO fields (fieldID, fieldName) VALUES (?, ?)", list(enumerate(FIELDS, 1)))
+    conn.executemany("INSERT INTO creatorTypes (creatorTypeID, creatorType) VALUES (?, ?)",
+                     list(enumerate(CREATOR_TYPES, 1)))
+    conn.executemany("INSERT INTO tags (tagID, name) VALUES (?, ?)", list(enumerate(WORDS, 1)))
+    n_creators = max(10, n_items // 4)
+    conn.executemany(
+        "INSERT INTO creators (creatorID, firstName, lastName, fieldMode) VALUES (?, ?, ?, 0)",
+        [(i, f"First{i}", f"Last{i}") for i in range(1, n_creators + 1)],
+    )
+    conn.executemany("INSERT INTO collections (collectionID, collectionName, key) VALUES (?, ?, ?)",
+                     [(i, f"Collection {i}", f"COLL{i:04d}") for i in range(1, 11)])
+
+    def key():
+        return "".join(rng.choice(_KEY_CHARS) for _ in range(8))
+
+    items, data, creators, tags, attachments, collection_items = [], [], [], [], [], []
+    values = {}  # Zotero stores each distinct value once
+    for n in range(n_items):
+        item_id = 2 * n + 1
+        items.append((item_id, 1 + n % 4, key()))
+        title = " ".join(rng.choice(WORDS) for _ in range(6)).capitalize() + f" {n}"
+        for field_id, value in (
+            (1, title),
+            (2, f"{1950 + n % 70}-00-00 {1950 + n % 70}"),
+            (3, " ".join(rng.choice(WORDS) for _ in range(60))),
+            (4, f"https://example.org/item/{n}"),
+            (5, f"10.1000/item.{n}"),
+            (6, "Example Press"),
+        ):
+            data.append((item_id, field_id, values.setdefault(value, len(values) + 1)))
+        for order in range(rng.randint(1, 4)):
+            creators.append((item_id, rng.randint(1, n_creators), 1 if order < 3 else 2, order))
+        for tag_id in rng.sample(range(1, len(WORDS) + 1), 3):
+            tags.append((item_id, tag_id, 0))
+        items.append((item_id + 1, 5, key()))
+        attachments.append((item_id + 1, item_id, 0, "application/pdf", f"storage:item{n}.pdf"))
+        collection_items.append((1 + n % 10, item_id))
+
+    conn.executemany("INSERT INTO items (itemID, itemTypeID, key) VALUES (?, ?, ?)", items)
+    conn.executemany("INSERT INTO itemDataValues (valueID, value) VALUES (?, ?)",
+                     [(value_id, value) for value, value_id in values.items()])
+    conn.executemany("INSERT INTO itemData (itemID, fieldID, valueID) VALUES (?, ?, ?)", data)
+    conn.executemany(
+        "INSERT INTO itemCreators (itemID, creatorID, creatorTypeID, orderIndex) VALUES (?, ?, ?, ?)", creators
+    )
+    conn.executemany("INSERT INTO itemTags (itemID, tagID, type) VALUES (?, ?, ?)", tags)
+    conn.executemany(
+        "INSERT INTO itemAttachments (itemID, parentItemID, linkMode, contentType, path) VALUES (?, ?, ?, ?, ?)",
+        attachments,
+    )
+    conn.executemany("INSERT INTO collectionItems (collectionID, itemID) VALUES (?, ?)", collection_items)
+    conn.commit()
+    conn.close()
+
+
+# ---------------------------------------------------------------------------
+# The reader as it was: one pivot query, then three queries per item
+# ---------------------------------------------------------------------------
+
+def legacy_get_items(reader: ZoteroReader, limit: int, offset: int = 0):
+    conn = reader._connect()
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT i.itemID, i.key, it.typeName,
+                   MAX(CASE WHEN f.fieldName = 'title' THEN iv.value END) as title,
+                   MAX(CASE WHEN f.fieldName = 'date' THEN iv.value END) as date,
+                   MAX(CASE WHEN f.fieldName = 'abstractNote' THEN iv.value END) as abstract,
+                   MAX(CASE WHEN f.fieldName = 'url' THEN iv.value END) as url,
+                   MAX(CASE WHEN f.fieldName = 'DOI' THEN iv.value END) as doi
+            FROM items i
+            JOIN itemTypes it ON i.itemTypeID = it.itemTypeID
+            LEFT JOIN itemData id ON i.itemID = id.itemID
+            LEFT JOIN itemDataValues iv ON id.valueID = iv.valueID
+            LEFT JOIN fields f ON id.fieldID = f.fieldID
+            WHERE it.typeName != 'attachment' AND it.typeName != 'note'
+            GROUP BY i.itemID
+            LIMIT {limit} OFFSET {offset}
+            """
+        ).fetchall()
+        items = []
+        for row in rows:
+            item_id = row["itemID"]
+            creators = [dict(r) for r in conn.execute(
+                """
+                SELECT c.firstName, c.lastName, ct.creatorType
+                FROM itemCreators ic
+                JOIN creators c ON ic.creatorID = c.creatorID
+                JOIN creatorTypes ct ON ic.creatorTypeID = ct.creatorTypeID
+                WHERE ic.itemID = ? ORDER BY ic.orderIndex
+                """, (item_id,))]
+            tags = [r["name"] for r in conn.execute(
+                "SELECT t.name FROM itemTags it JOIN tags t ON it.tagID = t.tagID WHERE it.itemID = ?",
+                (item_id,))]
+            attachments = [dict(r) for r in conn.execute(
+                """
+                SELECT i.key, ia.contentType, ia.path FROM itemAttachments ia
+                JOIN items i ON ia.itemID = i.itemID WHERE ia.parentItemID = ?
+                """, (item_id,))]
+            items.append(ZoteroItem(key=row["key"], item_type=row["typeName"], title=row["title"],
+                                    creators=creators, abstract=row["abstract"], tags=tags,
+                                    attachments=attachments))
+        return items
+    finally:
+        conn.close()
+
+
+def legacy_search(reader: ZoteroReader, query: str, limit: int):
+    query = query.lower()
+    matches = []
+    for item in legacy_get_items(reader, 10000):
+        if (query in (item.title or "").lower() or query in (item.abstract or "").lower()
+                or any(query in t.lower() for t in item.tags)):
+            matches.append(item)
+            if len(matches) >= limit:
+                break
+    return matches
+
+
+def p50_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Zotero reader item loading")
+    parser.add_argument("--items", type=int, default=20000, help="Regular items (default: 20000)")
+    parser.add_argument("--page", type=int, default=100, help="Page size (default: 100)")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per case (default: 7)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        zotero.SNAPSHOT_DIR = os.path.join(tmp, "snapshots")
+        start = time.perf_counter()
+        make_zotero_db(os.path.join(tmp, "zotero.sqlite"), args.items)
+        print(f"Generated {args.items:,} items in {time.perf_counter() - start:.1f}s\n")
+
+        reader = ZoteroReader(tmp)
+        reader.get_items(limit=1)  # Take the snapshot
+
+        deep_offset = args.items - args.page
+        cursor = reader.get_items(limit=deep_offset)[-1].item_id
+
+        rows = [
+            ("first page, per-item queries (old)", lambda: legacy_get_items(reader, args.page)),
+            ("first page, batched (new)", lambda: reader.get_items(limit=args.page)),
+            ("last page, OFFSET + per-item (old)", lambda: legacy_get_items(reader, args.page, deep_offset)),
+            ("last page, keyset + batched (new)", lambda: reader.get_items(limit=args.page, after_id=cursor)),
+            ("search 'messiah', scan 10k (old)", lambda: legacy_search(reader, "messiah", 50)),
+            ("search 'messiah', SQL (new)", lambda: reader.search_items("messiah", 50)),
+            ("get_item_by_key (new)", lambda: reader.get_item_by_key(reader.get_items(limit=1)[0].key)),
+            ("connect, snapshot warm", lambda: reader._connect().close()),
+        ]
+
+        print(f"{'':<40}{'p50 ms':>10}")
+        results = {}
+        for label, fn in rows:
+            results[label] = p50_ms(fn, args.repeat)
+            print(f"{label:<40}{results[label]:>10.2f}")
+
+        assert [i.key for i in legacy_get_items(reader, args.page)] == \
+            [i.key for i in reader.get_items(limit=args.page)]
+
+        print(f"\nfirst page speedup: "
+              f"{results[rows[0][0]] / results[rows[1][0]]:.1f}x, "
+              f"last page: {results[rows[2][0]] / results[rows[3][0]]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
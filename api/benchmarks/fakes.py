@@ -0,0 +1,150 @@
+"""
+Deterministic stand-ins for the embedding model and LLM providers.
+
+The suite times Tamor's own code, so the embedder and the LLM have to cost
+the same on every machine and every run:
+
+  - FakeEmbedder: bag-of-words over fixed random token vectors. Texts that
+    share words get similar vectors, so retrieval still ranks sensibly,
+    and encoding is a few numpy ops instead of a transformer pass.
+  - StubLLMProvider: an LLMProvider that answers instantly (or after a
+    fixed delay) with a canned reply and counts its calls. Prompts that
+    ask for JSON get an empty-but-valid JSON object, so agents take their
+    normal path instead of their parse-failure fallback.
+
+install() must run before anything imports core.config: that module
+loads the sentence-transformers model and opens MEMORY_DB at import time.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import types
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FAKE_MODEL_ID = "bench/fake-embedder"
+DEFAULT_DIM = 384
+
+STUB_REPLY = "This is a stub reply from the benchmark LLM provider."
+STUB_JSON_REPLY = json.dumps({
+    "summary": STUB_REPLY,
+    "key_findings": [],
+    "themes": [],
+    "contradictions": [],
+    "gaps": [],
+    "open_questions": [],
+    "recommended_structure": [],
+})
+
+
+class FakeEmbedder:
+    """SentenceTransformer-compatible encoder: normalized sum of token vectors."""
+
+    def __init__(self, model_name: str = FAKE_MODEL_ID, dim: int = DEFAULT_DIM, **_kwargs):
+        self.model_name = model_name
+        self.dim = dim
+        self.max_seq_length = 512
+        self._tokens: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def token_vector(self, token: str) -> np.ndarray:
+        vec = self._tokens.get(token)
+        if vec is None:
+            seed = int.from_bytes(hashlib.md5(token.encode()).digest()[:8], "little")
+            vec = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            with self._lock:
+                self._tokens[token] = vec
+        return vec
+
+    def token_matrix(self, vocabulary: Sequence[str]) -> np.ndarray:
+        """(len(vocabulary), dim) token vectors, for generating corpora in bulk."""
+        return np.stack([self.token_vector(t) for t in vocabulary])
+
+    def encode(self, texts: Sequence[str], **_kwargs) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in text.lower().split():
+                out[i] += self.token_vector(token)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+def make_stub_provider(latency_ms: float = 0.0):
+    """StubLLMProvider instance (defined lazily: llm_service imports dotenv)."""
+    from services.llm_service import LLMProvider
+
+    class StubLLMProvider(LLMProvider):
+        """Answers every request with a canned reply after `latency_ms`."""
+
+        DEFAULT_MODEL = "stub"
+
+        def __init__(self):
+            self.latency = latency_ms / 1000.0
+            self.calls = 0
+            self.prompt_chars = 0
+
+        def is_configured(self) -> bool:
+            return True
+
+        def chat_completion(
+            self,
+            messages: List[Dict[str, str]],
+            model: Optional[str] = None,
+            **kwargs: Any,
+        ) -> str:
+            self.calls += 1
+            prompt = " ".join(str(m.get("content") or "") for m in messages)
+            self.prompt_chars += len(prompt)
+            if self.latency:
+                time.sleep(self.latency)
+            return STUB_JSON_REPLY if "JSON" in prompt else STUB_REPLY
+
+        def generate(self, prompt: str, **kwargs: Any) -> str:
+            return self.chat_completion([{"role": "user", "content": prompt}])
+
+    return StubLLMProvider()
+
+
+def install(db_path: str, dim: int = DEFAULT_DIM, llm_latency_ms: float = 0.0):
+    """
+    Point the app at db_path and swap in the fake embedder and stub LLM.
+
+    Returns (embedder, llm).
+    """
+    if "core.config" in sys.modules:
+        raise RuntimeError("benchmarks.fakes.install() must run before core.config is imported")
+
+    os.environ["MEMORY_DB"] = db_path
+    os.environ["TAMOR_DB"] = db_path
+    os.environ["EMBEDDING_MODEL"] = FAKE_MODEL_ID
+    os.environ.setdefault("PERSONALITY_FILE", os.path.join(API_DIR, "config", "personality.json"))
+
+    embedder = FakeEmbedder(FAKE_MODEL_ID, dim)
+
+    # core.config does `SentenceTransformer(EMBEDDING_MODEL)` at import
+    shim = types.ModuleType("sentence_transformers")
+    shim.SentenceTransformer = lambda *_args, **_kwargs: embedder
+    sys.modules["sentence_transformers"] = shim
+
+    from utils import db
+    db.DB_PATH = db_path
+
+    from services import embedding_migration, llm_service
+    embedding_migration.register_encoder(FAKE_MODEL_ID, embedder)
+
+    llm = make_stub_provider(latency_ms=llm_latency_ms)
+    llm_service._openai_instance = llm
+    llm_service._xai_instance = llm
+    llm_service._anthropic_instance = llm
+    llm_service._ollama_instance = llm
+    return embedder, llm
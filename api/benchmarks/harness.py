@@ -0,0 +1,206 @@
+"""
+Timing, memory measurement and baseline comparison for the suite.
+
+Latency iterations run untraced; one extra iteration runs under
+tracemalloc to get the Python/numpy allocation high-water mark, so the
+tracing overhead never shows up in the percentiles.
+"""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Metrics compared against a baseline by default
+COMPARE_METRICS = ("p50_ms", "p95_ms", "peak_alloc_bytes")
+DEFAULT_THRESHOLD = 0.10
+# Latency changes smaller than this are noise, whatever the ratio
+MIN_DELTA_MS = 1.0
+
+
+@dataclass
+class CaseResult:
+    """Timings for one case at one size."""
+    case: str
+    size: int
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    max_ms: float
+    peak_alloc_bytes: int
+    rss_high_water_bytes: int
+    setup_seconds: float = 0.0
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}@{self.size}"
+
+
+def _rss_high_water() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def measure(
+    case: str,
+    size: int,
+    run: Callable[[int], Any],
+    iterations: int,
+    warmup: int = 1,
+    before: Optional[Callable[[int], Any]] = None,
+) -> CaseResult:
+    """
+    Time run(i) for i in range(iterations).
+
+    before(i), if given, runs untimed ahead of each call (resetting state
+    for cases like ingest that mutate the database).
+    """
+    def once(i: int) -> float:
+        if before:
+            before(i)
+        start = time.perf_counter()
+        run(i)
+        return (time.perf_counter() - start) * 1000
+
+    for i in range(warmup):
+        once(i)
+
+    samples = np.array([once(warmup + i) for i in range(iterations)])
+
+    tracemalloc.start()
+    try:
+        once(warmup + iterations)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return CaseResult(
+        case=case,
+        size=size,
+        iterations=iterations,
+        p50_ms=round(float(p50), 3),
+        p95_ms=round(float(p95), 3),
+        p99_ms=round(float(p99), 3),
+        mean_ms=round(float(samples.mean()), 3),
+        max_ms=round(float(samples.max()), 3),
+        peak_alloc_bytes=int(peak),
+        rss_high_water_bytes=_rss_high_water(),
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment(**extra: Any) -> Dict[str, Any]:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        **extra,
+    }
+
+
+def write_results(path: str, results: Sequence[CaseResult], meta: Dict[str, Any]) -> None:
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": [asdict(r) for r in results]}, f, indent=2)
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """Results file as {"case@size": result dict}."""
+    with open(path) as f:
+        data = json.load(f)
+    return {f"{r['case']}@{r['size']}": r for r in data.get("results", [])}
+
+
+def compare(
+    results: Sequence[CaseResult],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+    metrics: Sequence[str] = COMPARE_METRICS,
+    min_delta_ms: float = MIN_DELTA_MS,
+) -> List[Dict[str, Any]]:
+    """
+    One row per (case, size, metric) with the change against baseline.
+
+    status is 'regression' when the metric grew by more than `threshold`
+    (a fraction) and, for latencies, by more than min_delta_ms; 'improved'
+    for the mirror case; 'new' when the baseline has no such case.
+    """
+    rows = []
+    for result in results:
+        base = baseline.get(result.key)
+        for metric in metrics:
+            current = getattr(result, metric)
+            row = {"key": result.key, "metric": metric, "current": current, "baseline": None,
+                   "change": None, "status": "new"}
+            if base is not None and base.get(metric):
+                previous = base[metric]
+                change = (current - previous) / previous
+                significant = not metric.endswith("_ms") or abs(current - previous) >= min_delta_ms
+                status = "ok"
+                if significant and change > threshold:
+                    status = "regression"
+                elif significant and change < -threshold:
+                    status = "improved"
+                row.update(baseline=previous, change=round(change, 4), status=status)
+            rows.append(row)
+    return rows
+
+
+def format_bytes(n: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024 or unit == "GiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return str(n)
+
+
+def print_results(results: Sequence[CaseResult]) -> None:
+    print(f"{'case':<24} {'size':>9} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'peak alloc':>12}")
+    for r in results:
+        print(
+            f"{r.case:<24} {r.size:>9} {r.p50_ms:>10.2f} {r.p95_ms:>10.2f} {r.p99_ms:>10.2f} "
+            f"{format_bytes(r.peak_alloc_bytes):>12}"
+        )
+
+
+def _format_metric(metric: str, value: Any) -> str:
+    if value is None:
+        return "-"
+    if metric.endswith("_bytes"):
+        return format_bytes(value)
+    return f"{value:.2f}"
+
+
+def print_comparison(rows: Sequence[Dict[str, Any]]) -> None:
+    print(f"{'case@size':<32} {'metric':<18} {'baseline':>12} {'current':>12} {'change':>9}  status")
+    for row in rows:
+        base = _format_metric(row["metric"], row["baseline"])
+        current = _format_metric(row["metric"], row["current"])
+        change = "-" if row["change"] is None else f"{row['change'] * 100:+.1f}%"
+        print(f"{row['key']:<32} {row['metric']:<18} {base:>12} {current:>12} {change:>9}  {row['status']}")
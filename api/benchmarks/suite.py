@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: retrieval, chat context assembly and ingest.
+
+For each size (library chunks; memories and ingest files scale with it)
+builds a synthetic database with every migration applied, then times:
+
+  library_search          LibrarySearchService.search, semantic
+  library_search_hybrid   LibrarySearchService.search, keyword + semantic
+  memory_search           memory_service.search_memories
+  chat_context            chat_api.build_router_context (memories, library,
+                          project files, history) for one chat turn
+  chat_request            POST /api/chat end to end, stub LLM
+  ingest                  LibraryIngestService.ingest_directory over a tree
+                          of plain-text files, chunked and embedded
+
+Embeddings come from a deterministic fake embedder and every LLM
+provider is a stub (see benchmarks/fakes.py), so numbers measure Tamor's
+code and are comparable across machines' runs of the same commit.
+
+Each case reports p50/p95/p99 latency and the allocation high-water mark.
+Results are written as JSON; with --baseline the run is compared against
+a previous results file and exits 1 if anything regressed by more than
+--threshold.
+
+Usage:
+    cd api && python -m benchmarks.suite
+    cd api && python -m benchmarks.suite --sizes 1k,100k --out /tmp/bench.json
+    cd api && python -m benchmarks.suite --cases library_search,memory_search --sizes 1M --iterations 10
+    cd api && python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.15
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fakes, harness, synthetic
+
+DEFAULT_SIZES = "1k,10k"
+DEFAULT_ITERATIONS = 20
+INGEST_ITERATIONS = 3
+
+
+@dataclass
+class Context:
+    """Everything a case needs about the database built for one size."""
+    size: int
+    scale: synthetic.Scale
+    user_id: int
+    project_id: int
+    conv_id: int
+    queries: List[str]
+    workdir: str
+
+
+@dataclass
+class Case:
+    run: Callable[[int], object]
+    before: Optional[Callable[[int], object]] = None
+    iterations: Optional[int] = None
+
+
+def _library_search(ctx: Context, mode: str) -> Case:
+    from services.library import LibrarySearchService
+
+    service = LibrarySearchService()
+    return Case(lambda i: service.search(ctx.queries[i % len(ctx.queries)], limit=10, mode=mode))
+
+
+def case_library_search(ctx: Context) -> Case:
+    return _library_search(ctx, "semantic")
+
+
+def case_library_search_hybrid(ctx: Context) -> Case:
+    return _library_search(ctx, "hybrid")
+
+
+def case_memory_search(ctx: Context) -> Case:
+    from services import memory_service
+
+    return Case(
+        lambda i: memory_service.search_memories(
+            ctx.queries[i % len(ctx.queries)], ctx.user_id, limit=10
+        )
+    )
+
+
+def case_chat_context(ctx: Context) -> Case:
+    from routes.chat_api import build_router_context
+
+    return Case(
+        lambda i: build_router_context(
+            ctx.queries[i % len(ctx.queries)], ctx.conv_id, ctx.project_id, ctx.user_id, "Scholar"
+        )
+    )
+
+
+def case_chat_request(ctx: Context) -> Case:
+    from flask import Flask
+    from routes.chat_api import chat_bp
+
+    app = Flask(__name__)
+    app.secret_key = "benchmarks"
+    app.register_blueprint(chat_bp)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = ctx.user_id
+
+    def run(i):
+        resp = client.post("/api/chat", json={
+            "message": ctx.queries[i % len(ctx.queries)],
+            "conversation_id": ctx.conv_id,
+            "project_id": ctx.project_id,
+            "mode": "Scholar",
+        })
+        if resp.status_code != 200:
+            raise RuntimeError(f"/api/chat returned {resp.status_code}: {resp.get_data(as_text=True)[:200]}")
+
+    return Case(run)
+
+
+def case_ingest(ctx: Context) -> Case:
+    from services.library import LibraryIngestService
+    from utils.db import get_db
+
+    root = os.path.join(ctx.workdir, "ingest")
+    synthetic.write_ingest_tree(root, ctx.scale.ingest_files)
+
+    conn = get_db()
+    conn.execute("UPDATE library_config SET value = ? WHERE key = 'mount_path'", (root,))
+    conn.commit()
+    first_new_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM library_files").fetchone()[0]
+    conn.close()
+
+    service = LibraryIngestService()
+
+    def reset(_i):
+        conn = get_db()
+        conn.execute("DELETE FROM library_chunks WHERE library_file_id >= ?", (first_new_id,))
+        conn.execute("DELETE FROM library_text_cache WHERE library_file_id >= ?", (first_new_id,))
+        conn.execute("DELETE FROM library_collection_files WHERE library_file_id >= ?", (first_new_id,))
+        conn.execute("DELETE FROM library_files WHERE id >= ?", (first_new_id,))
+        conn.commit()
+        conn.close()
+
+    def run(_i):
+        progress = service.ingest_directory(root, auto_index=True)
+        if progress.created != ctx.scale.ingest_files:
+            raise RuntimeError(f"ingest created {progress.created}/{ctx.scale.ingest_files}: {progress.error_details}")
+
+    return Case(run, before=reset, iterations=INGEST_ITERATIONS)
+
+
+CASES: Dict[str, Callable[[Context], Case]] = {
+    "library_search": case_library_search,
+    "library_search_hybrid": case_library_search_hybrid,
+    "memory_search": case_memory_search,
+    "chat_context": case_chat_context,
+    "chat_request": case_chat_request,
+    "ingest": case_ingest,
+}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tamor benchmark suite")
+    parser.add_argument(
+        "--sizes", default=DEFAULT_SIZES,
+        help=f"Library sizes in chunks, e.g. 1k,100k,1M (default: {DEFAULT_SIZES})"
+    )
+    parser.add_argument(
+        "--cases", default=",".join(CASES),
+        help=f"Comma-separated cases (default: all of {', '.join(CASES)})"
+    )
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Timed iterations per case")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed iterations per case")
+    parser.add_argument("--dim", type=int, default=fakes.DEFAULT_DIM, help="Fake embedding dimension")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Delay added to each stub LLM call")
+    parser.add_argument("--workdir", help="Where to build databases (default: a temp directory)")
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument(
+        "--threshold", type=float, default=harness.DEFAULT_THRESHOLD,
+        help=f"Allowed fractional slowdown before failing (default: {harness.DEFAULT_THRESHOLD})"
+    )
+    args = parser.parse_args()
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="tamor-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "bench.db")
+    embedder, llm = fakes.install(db_path, dim=args.dim, llm_latency_ms=args.llm_latency_ms)
+
+    results: List[harness.CaseResult] = []
+    try:
+        for size in sizes:
+            scale = synthetic.Scale.for_size(size)
+            print(f"Building {size:,} chunks, {scale.memories:,} memories ...", flush=True)
+            start = time.perf_counter()
+            user_id, project_id, conv_id = synthetic.build(db_path, embedder, scale)
+            build_seconds = time.perf_counter() - start
+            print(f"  built in {build_seconds:.1f}s")
+
+            ctx = Context(
+                size=size,
+                scale=scale,
+                user_id=user_id,
+                project_id=project_id,
+                conv_id=conv_id,
+                queries=synthetic.queries(32),
+                workdir=os.path.join(workdir, f"size_{size}"),
+            )
+            os.makedirs(ctx.workdir, exist_ok=True)
+
+            for name in cases:
+                start = time.perf_counter()
+                case = CASES[name](ctx)
+                setup_seconds = time.perf_counter() - start
+                result = harness.measure(
+                    name,
+                    size,
+                    case.run,
+                    iterations=case.iterations or args.iterations,
+                    warmup=min(args.warmup, 1) if case.iterations else args.warmup,
+                    before=case.before,
+                )
+                result.setup_seconds = round(setup_seconds, 3)
+                results.append(result)
+                print(f"  {name:<24} p50 {result.p50_ms:9.2f} ms   p95 {result.p95_ms:9.2f} ms", flush=True)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    harness.print_results(results)
+
+    if args.out:
+        meta = harness.environment(
+            sizes=sizes,
+            iterations=args.iterations,
+            embedding_dim=args.dim,
+            embedder=fakes.FAKE_MODEL_ID,
+            llm_latency_ms=args.llm_latency_ms,
+            llm_calls=llm.calls,
+        )
+        harness.write_results(args.out, results, meta)
+        print(f"\nResults written to {args.out}")
+
+    if args.baseline:
+        rows = harness.compare(results, harness.load_results(args.baseline), args.threshold)
+        print()
+        harness.print_comparison(rows)
+        regressions = [r for r in rows if r["status"] == "regression"]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Synthetic libraries, memories, projects and ingest trees for the suite.
+
+Text is drawn from a fixed vocabulary of topic words plus filler, with a
+seeded generator, so the same size always produces the same database.
+Library vectors are computed in bulk from the FakeEmbedder's token
+vectors (word counts @ token matrix), which is exactly what encoding the
+text would give, without a Python loop per chunk: 1M chunks is bound by
+SQLite inserts, not by embedding.
+"""
+
+import contextlib
+import io
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import numpy as np
+
+TOPICS = {
+    "covenant": "covenant abraham promise seed oath circumcision blessing land inheritance faithful",
+    "torah": "torah commandment statute judgment moses sinai instruction obedience law teaching",
+    "sabbath": "sabbath rest seventh day holy sanctify work creation remember keep",
+    "feasts": "passover unleavened firstfruits shavuot trumpets atonement tabernacles feast appointed harvest",
+    "temple": "temple priest altar sacrifice offering levite sanctuary incense veil courtyard",
+    "prophets": "prophet isaiah jeremiah ezekiel vision oracle exile return restoration remnant",
+    "psalms": "psalm praise lament david song harp selah worship refuge shepherd",
+    "gospels": "gospel messiah disciple parable kingdom galilee jerusalem crucify resurrection witness",
+    "epistles": "epistle paul gentile grace faith justification church letter apostle corinth",
+    "history": "king judah israel assyria babylon persia rome empire war chronicle",
+    "language": "hebrew greek aramaic manuscript translation word root grammar septuagint lexicon",
+    "home": "garden kitchen recipe bread family children school garage repair weekend",
+    "code": "python function database query index schema migration server endpoint cache",
+    "media": "movie episode season actor director playlist audio podcast transcript video",
+}
+FILLER = (
+    "the of and to in that is was he for it with as his on be at by this had not are but from "
+    "or have an they which one you were her all she there would their we him been has when who "
+    "will more no if out so said what up its about into than them can only other new some could "
+    "time these two may then do first any my now such like our over man me even most made after"
+).split()
+
+TOPIC_NAMES = list(TOPICS)
+TOPIC_WORDS = [TOPICS[t].split() for t in TOPIC_NAMES]
+VOCABULARY = sorted({w for words in TOPIC_WORDS for w in words} | set(FILLER))
+_INDEX = {w: i for i, w in enumerate(VOCABULARY)}
+_TOPIC_IDX = [np.array([_INDEX[w] for w in words]) for words in TOPIC_WORDS]
+_FILLER_IDX = np.array([_INDEX[w] for w in FILLER])
+
+WORDS_PER_CHUNK = 120     # ~800 characters, the chunker's target
+TOPIC_SHARE = 0.4         # Fraction of topic words in a chunk
+CHUNKS_PER_FILE = 50
+INSERT_BATCH = 5_000
+
+
+@dataclass
+class Scale:
+    """Row counts for one benchmark size (size = library chunks)."""
+    chunks: int
+    memories: int
+    project_files: int = 20
+    history_messages: int = 48
+    ingest_files: int = 20
+
+    @classmethod
+    def for_size(cls, size: int) -> "Scale":
+        return cls(
+            chunks=size,
+            memories=max(200, min(size // 10, 50_000)),
+            ingest_files=max(10, min(size // 1000, 200)),
+        )
+
+
+def _word_indices(rng: np.random.Generator, n: int, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(topics, word index matrix) for n texts of `length` words."""
+    topics = rng.integers(0, len(TOPIC_NAMES), n)
+    n_topic = int(length * TOPIC_SHARE)
+    idx = np.empty((n, length), dtype=np.int64)
+    idx[:, n_topic:] = rng.choice(_FILLER_IDX, (n, length - n_topic))
+    for t in range(len(TOPIC_NAMES)):
+        rows = np.nonzero(topics == t)[0]
+        idx[rows, :n_topic] = rng.choice(_TOPIC_IDX[t], (len(rows), n_topic))
+    return topics, rng.permuted(idx, axis=1)
+
+
+def _texts(idx: np.ndarray) -> List[str]:
+    vocab = np.array(VOCABULARY)
+    return [" ".join(row) for row in vocab[idx]]
+
+
+def _vectors(idx: np.ndarray, tokens: np.ndarray) -> np.ndarray:
+    """FakeEmbedder output for the texts in idx, computed in one matmul."""
+    counts = np.zeros((len(idx), len(VOCABULARY)), dtype=np.float32)
+    np.add.at(counts, (np.arange(len(idx))[:, None], idx), 1.0)
+    vecs = counts @ tokens
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs
+
+
+def text(rng: np.random.Generator, words: int) -> str:
+    return _texts(_word_indices(rng, 1, words)[1])[0]
+
+
+def queries(n: int, seed: int = 7) -> List[str]:
+    """Short topical questions, one topic each."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(n):
+        words = rng.choice(TOPIC_WORDS[i % len(TOPIC_WORDS)], 4, replace=False)
+        out.append("what does scripture say about " + " ".join(words))
+    return out
+
+
+def create_database(db_path: str) -> None:
+    """Fresh database with every migration applied."""
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(db_path + suffix)
+
+    from utils import run_migrations
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        ok = run_migrations.run()
+    if not ok:
+        raise RuntimeError(f"Migrations failed:\n{out.getvalue()}")
+
+    # In memory/schema.sql but not in any numbered migration
+    from utils.db import get_db
+    conn = get_db()
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(messages)")}
+    if "epistemic_json" not in columns:
+        conn.execute("ALTER TABLE messages ADD COLUMN epistemic_json TEXT")
+        conn.commit()
+    conn.close()
+
+
+def populate_library(conn, embedder, n_chunks: int, seed: int = 1) -> None:
+    rng = np.random.default_rng(seed)
+    tokens = embedder.token_matrix(VOCABULARY)
+    model, dim = embedder.model_name, embedder.dim
+
+    n_files = max(1, -(-n_chunks // CHUNKS_PER_FILE))
+    conn.executemany(
+        """
+        INSERT INTO library_files (id, filename, stored_path, mime_type, size_bytes, source_type, metadata_json)
+        VALUES (?, ?, ?, 'text/plain', ?, 'scan', ?)
+        """,
+        (
+            (
+                i + 1,
+                f"doc_{i:06d}.txt",
+                f"/library/synthetic/doc_{i:06d}.txt",
+                CHUNKS_PER_FILE * 800,
+                json.dumps({"title": f"Synthetic document {i}"}),
+            )
+            for i in range(n_files)
+        ),
+    )
+
+    for start in range(0, n_chunks, INSERT_BATCH):
+        count = min(INSERT_BATCH, n_chunks - start)
+        _, idx = _word_indices(rng, count, WORDS_PER_CHUNK)
+        vecs = _vectors(idx, tokens)
+        conn.executemany(
+            """
+            INSERT INTO library_chunks
+                (library_file_id, chunk_index, content, embedding, start_offset, embedding_model, embedding_dim)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (n // CHUNKS_PER_FILE + 1, n % CHUNKS_PER_FILE, content, vec.tobytes(),
+                 (n % CHUNKS_PER_FILE) * 800, model, dim)
+                for n, content, vec in zip(range(start, start + count), _texts(idx), vecs)
+            ),
+        )
+        conn.commit()
+
+
+def populate_memories(conn, embedder, n: int, user_id: int, seed: int = 2) -> None:
+    rng = np.random.default_rng(seed)
+    tokens = embedder.token_matrix(VOCABULARY)
+    now = datetime.utcnow()
+    tiers = rng.choice(["core", "long_term", "episodic"], n, p=[0.02, 0.68, 0.30])
+    ages = rng.exponential(30.0, n)
+    _, idx = _word_indices(rng, n, 20)
+    vecs = _vectors(idx, tokens)
+    conn.executemany(
+        """
+        INSERT INTO memories
+            (user_id, category, content, embedding, source, memory_tier, confidence,
+             last_accessed, embedding_model, embedding_dim)
+        VALUES (?, 'knowledge', ?, ?, 'auto', ?, ?, ?, ?, ?)
+        """,
+        (
+            (user_id, content, vec.tobytes(), str(tier), float(conf),
+             (now - timedelta(days=float(age))).isoformat(), embedder.model_name, embedder.dim)
+            for content, vec, tier, conf, age in zip(
+                _texts(idx), vecs, tiers, rng.uniform(0.3, 0.9, n), ages
+            )
+        ),
+    )
+    conn.commit()
+
+
+def populate_project(conn, scale: Scale, seed: int = 3) -> Tuple[int, int, int]:
+    """User, project with files and a conversation with history. Returns ids."""
+    rng = np.random.default_rng(seed)
+    user_id = conn.execute(
+        "INSERT INTO users (username, display_name) VALUES ('bench', 'Bench')"
+    ).lastrowid
+    project_id = conn.execute(
+        "INSERT INTO projects (user_id, name) VALUES (?, 'Benchmark project')", (user_id,)
+    ).lastrowid
+    conv_id = conn.execute(
+        "INSERT INTO conversations (user_id, project_id, title, mode) VALUES (?, ?, 'bench', 'Scholar')",
+        (user_id, project_id),
+    ).lastrowid
+
+    for i in range(scale.project_files):
+        file_id = conn.execute(
+            """
+            INSERT INTO project_files (user_id, project_id, filename, stored_name, mime_type, size_bytes)
+            VALUES (?, ?, ?, ?, 'text/plain', 4000)
+            """,
+            (user_id, project_id, f"notes_{i:02d}.txt", f"stored_{i:02d}.txt"),
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO file_text_cache (file_id, text, parser) VALUES (?, ?, 'text')",
+            (file_id, text(rng, 600)),
+        )
+
+    for i in range(scale.history_messages):
+        role = "user" if i % 2 == 0 else "assistant"
+        conn.execute(
+            "INSERT INTO messages (conversation_id, sender, role, content) VALUES (?, ?, ?, ?)",
+            (conv_id, "user" if role == "user" else "tamor", role, text(rng, 60)),
+        )
+    conn.commit()
+    return user_id, project_id, conv_id
+
+
+def write_ingest_tree(root: str, n_files: int, words: int = 3000, seed: int = 4) -> None:
+    """n_files plain-text documents spread over a few subdirectories."""
+    rng = np.random.default_rng(seed)
+    for i in range(n_files):
+        folder = os.path.join(root, TOPIC_NAMES[i % len(TOPIC_NAMES)])
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"ingest_{i:04d}.txt"), "w") as f:
+            # Paragraphs so the chunker has boundaries to respect
+            for _ in range(words // 150):
+                f.write(text(rng, 150) + ".\n\n")
+
+
+def build(db_path: str, embedder, scale: Scale) -> Tuple[int, int, int]:
+    """Create and fill the database for one size. Returns (user, project, conversation)."""
+    from utils.db import get_db
+
+    create_database(db_path)
+    conn = get_db()
+    try:
+        ids = populate_project(conn, scale)
+        populate_library(conn, embedder, scale.chunks)
+        populate_memories(conn, embedder, scale.memories, user_id=ids[0])
+
+        # Reference a slice of the library from the project (scope='all' boost)
+        conn.execute(
+            "INSERT INTO project_library_refs (project_id, library_file_id) "
+            "SELECT ?, id FROM library_files WHERE id % 10 = 0",
+            (ids[1],),
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+        return ids
+    finally:
+        conn.close()
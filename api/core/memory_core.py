@@ -1,11 +1,18 @@
 import sqlite3
+import time
 import numpy as np
 
-from .config import MEMORY_DB, model
+from services.embedding_migration import embed_query, vector_columns
+from services.embedding_quant import cosine_scores, get_setting, top_k
+from utils import metrics
+
+from .config import EMBEDDING_MODEL, MEMORY_DB, model
 
 
 def embed(text: str) -> bytes:
+    start = time.perf_counter()
     vec = model.encode([text])[0]
+    metrics.record_embedding(1, time.perf_counter() - start, EMBEDDING_MODEL or "")
     return vec.astype(np.float32).tobytes()
 
 
@@ -15,7 +22,9 @@ def embed_many(texts: list[str]) -> list[bytes]:
     """
     if not texts:
         return []
+    start = time.perf_counter()
     vecs = model.encode(texts)
+    metrics.record_embedding(len(texts), time.perf_counter() - start, EMBEDDING_MODEL or "")
     blobs: list[bytes] = []
     for vec in vecs:
         blobs.append(vec.astype(np.float32).tobytes())
@@ -23,25 +32,27 @@ def embed_many(texts: list[str]) -> list[bytes]:
 
 
 def search_memories(query: str, limit: int = 5):
-    q_vec = model.encode([query])[0].astype(np.float32)
-
     conn = sqlite3.connect(MEMORY_DB)
+    q_vec = embed_query("memories", query, conn)
+    setting = get_setting(conn, "memories")
     cursor = conn.cursor()
-    cursor.execute("SELECT id, content, embedding FROM memories")
+    cursor.execute(f"SELECT id, content, {vector_columns(conn, 'memories')} FROM memories")
     rows = cursor.fetchall()
     conn.close()
 
-    scored = []
-    for mid, content, emb_blob in rows:
-        emb = np.frombuffer(emb_blob, dtype=np.float32)
-        denom = np.linalg.norm(q_vec) * np.linalg.norm(emb)
-        if denom == 0:
-            continue
-        score = float(np.dot(q_vec, emb) / denom)
-        scored.append((score, mid, content))
-
-    scored.sort(reverse=True)
-    return scored[:limit]
+    scores = cosine_scores(
+        q_vec,
+        [r[2] for r in rows],
+        [r[3] for r in rows],
+        rerank=setting.rerank if setting else 0,
+    )
+    # Zero vectors score 0.0 and were skipped before
+    scores[scores == 0.0] = np.nan
+
+    return [
+        (float(scores[i]), rows[i][0], rows[i][1])
+        for i in top_k(scores, limit)
+    ]
 
 
 def auto_store_memory_if_relevant(
@@ -0,0 +1,28 @@
+-- Migration 015: Scripture reference index over library chunks
+-- Normalized (book, chapter, verse range) -> chunk index so passage-linked
+-- library material can be found with an indexed lookup instead of a vector scan.
+--
+-- Chapter-only references ("Psalm 23") are stored as verse 1..999 so that a
+-- single range-overlap predicate covers both verse and chapter references.
+-- Populated at ingest time by LibraryChunkService / HarvestImportService;
+-- existing chunks are backfilled with: python -m scripts.backfill_scripture_refs
+
+CREATE TABLE IF NOT EXISTS library_chunk_refs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    library_chunk_id INTEGER NOT NULL,
+    library_file_id INTEGER NOT NULL,
+    book TEXT NOT NULL,                     -- Canonical book name ("Romans", "1 John")
+    chapter INTEGER NOT NULL,
+    verse_start INTEGER NOT NULL,
+    verse_end INTEGER NOT NULL,             -- Equal to verse_start for single verses
+    ref_text TEXT,                          -- Normalized reference string
+    FOREIGN KEY (library_chunk_id) REFERENCES library_chunks(id) ON DELETE CASCADE,
+    FOREIGN KEY (library_file_id) REFERENCES library_files(id) ON DELETE CASCADE,
+    UNIQUE(library_chunk_id, book, chapter, verse_start, verse_end)
+);
+
+-- Range-overlap lookups: book + chapter equality, then verse bounds
+CREATE INDEX IF NOT EXISTS idx_library_chunk_refs_passage
+    ON library_chunk_refs(book, chapter, verse_start, verse_end);
+CREATE INDEX IF NOT EXISTS idx_library_chunk_refs_file ON library_chunk_refs(library_file_id);
+CREATE INDEX IF NOT EXISTS idx_library_chunk_refs_chunk ON library_chunk_refs(library_chunk_id);
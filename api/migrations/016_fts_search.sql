@@ -0,0 +1,97 @@
+-- Migration 016: FTS5 full-text search for messages, conversations, projects
+-- Replaces LIKE '%q%' table scans in global/conversation search with
+-- bm25-ranked FTS5 lookups and built-in snippet() extraction.
+--
+-- External-content tables: text lives only in the source tables, the FTS
+-- index is kept in sync by triggers (covers add_message and every other
+-- write path), and existing rows are backfilled with 'rebuild'.
+
+-- ============================================================================
+-- MESSAGES
+-- ============================================================================
+
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content,
+    content='messages',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+    INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+-- ============================================================================
+-- CONVERSATION TITLES
+-- Only title changes touch the index (updated_at bumps on every message).
+-- ============================================================================
+
+CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+    title,
+    content='conversations',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS conversations_fts_ai AFTER INSERT ON conversations BEGIN
+    INSERT INTO conversations_fts(rowid, title) VALUES (new.id, new.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS conversations_fts_ad AFTER DELETE ON conversations BEGIN
+    INSERT INTO conversations_fts(conversations_fts, rowid, title)
+    VALUES ('delete', old.id, old.title);
+END;
+
+CREATE TRIGGER IF NOT EXISTS conversations_fts_au AFTER UPDATE OF title ON conversations BEGIN
+    INSERT INTO conversations_fts(conversations_fts, rowid, title)
+    VALUES ('delete', old.id, old.title);
+    INSERT INTO conversations_fts(rowid, title) VALUES (new.id, new.title);
+END;
+
+-- ============================================================================
+-- PROJECTS (name + description)
+-- ============================================================================
+
+CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+    name,
+    description,
+    content='projects',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+    INSERT INTO projects_fts(rowid, name, description)
+    VALUES (new.id, new.name, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+    INSERT INTO projects_fts(projects_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS projects_fts_au AFTER UPDATE OF name, description ON projects BEGIN
+    INSERT INTO projects_fts(projects_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+    INSERT INTO projects_fts(rowid, name, description)
+    VALUES (new.id, new.name, new.description);
+END;
+
+-- ============================================================================
+-- BACKFILL existing rows
+-- ============================================================================
+
+INSERT INTO messages_fts(messages_fts) VALUES ('rebuild');
+INSERT INTO conversations_fts(conversations_fts) VALUES ('rebuild');
+INSERT INTO projects_fts(projects_fts) VALUES ('rebuild');
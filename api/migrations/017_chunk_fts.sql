@@ -0,0 +1,67 @@
+-- Migration 017: FTS5 keyword index over library and project file chunks
+-- Backs hybrid (keyword + vector) retrieval: exact names, Hebrew
+-- transliterations and Strong's numbers embed poorly but match lexically.
+--
+-- External-content tables kept in sync by triggers; existing chunks are
+-- backfilled with 'rebuild'.
+
+-- ============================================================================
+-- LIBRARY CHUNKS
+-- ============================================================================
+
+CREATE VIRTUAL TABLE IF NOT EXISTS library_chunks_fts USING fts5(
+    content,
+    content='library_chunks',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS library_chunks_fts_ai AFTER INSERT ON library_chunks BEGIN
+    INSERT INTO library_chunks_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS library_chunks_fts_ad AFTER DELETE ON library_chunks BEGIN
+    INSERT INTO library_chunks_fts(library_chunks_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS library_chunks_fts_au AFTER UPDATE OF content ON library_chunks BEGIN
+    INSERT INTO library_chunks_fts(library_chunks_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+    INSERT INTO library_chunks_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+-- ============================================================================
+-- PROJECT FILE CHUNKS
+-- ============================================================================
+
+CREATE VIRTUAL TABLE IF NOT EXISTS file_chunks_fts USING fts5(
+    content,
+    content='file_chunks',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS file_chunks_fts_ai AFTER INSERT ON file_chunks BEGIN
+    INSERT INTO file_chunks_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS file_chunks_fts_ad AFTER DELETE ON file_chunks BEGIN
+    INSERT INTO file_chunks_fts(file_chunks_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS file_chunks_fts_au AFTER UPDATE OF content ON file_chunks BEGIN
+    INSERT INTO file_chunks_fts(file_chunks_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+    INSERT INTO file_chunks_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+CREATE INDEX IF NOT EXISTS idx_file_chunks_project ON file_chunks(project_id);
+
+-- ============================================================================
+-- BACKFILL existing chunks
+-- ============================================================================
+
+INSERT INTO library_chunks_fts(library_chunks_fts) VALUES ('rebuild');
+INSERT INTO file_chunks_fts(file_chunks_fts) VALUES ('rebuild');
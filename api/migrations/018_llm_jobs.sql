@@ -0,0 +1,38 @@
+-- Migration 018: Background queue for LLM post-processing jobs
+-- File insights and multi-file reasoning used to run inline in request
+-- handlers; they are now queued here and processed by a worker process
+-- (scripts/run_llm_job_worker.py). Callers poll job status instead of
+-- blocking on the LLM.
+
+CREATE TABLE IF NOT EXISTS llm_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,                     -- 'insights' | 'reasoning'
+    project_id INTEGER,
+    file_id INTEGER,
+    user_id INTEGER,
+    dedupe_key TEXT NOT NULL,               -- kind + target, one active job each
+    payload_json TEXT,
+    priority INTEGER DEFAULT 5,             -- 1 (highest) to 10 (lowest)
+    status TEXT NOT NULL DEFAULT 'pending', -- pending/processing/completed/failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after DATETIME DEFAULT CURRENT_TIMESTAMP,
+    queued_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME,
+    completed_at DATETIME,
+    result_json TEXT,
+    error_message TEXT,
+    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE,
+    FOREIGN KEY (file_id) REFERENCES project_files(id) ON DELETE CASCADE
+);
+
+-- At most one pending/processing job per (kind, target)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_llm_jobs_active_dedupe
+    ON llm_jobs(dedupe_key) WHERE status IN ('pending', 'processing');
+
+-- Worker claim order
+CREATE INDEX IF NOT EXISTS idx_llm_jobs_claim
+    ON llm_jobs(status, priority, run_after, id);
+
+CREATE INDEX IF NOT EXISTS idx_llm_jobs_project ON llm_jobs(project_id, status);
+CREATE INDEX IF NOT EXISTS idx_llm_jobs_file ON llm_jobs(file_id);
@@ -0,0 +1,25 @@
+-- Migration 019: Content-addressed LLM response cache
+-- Deterministic, low-temperature prompts (insights, reasoning, project
+-- summaries, intent classification) are cached by a hash of
+-- (provider, model, messages, parameters) so repeated analyses over
+-- unchanged content skip the LLM entirely. See
+-- services/cache/llm_response_cache.py.
+
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key TEXT PRIMARY KEY,             -- sha256 of the canonical request
+    provider TEXT NOT NULL,
+    model TEXT,
+    response TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    last_used_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME                     -- NULL = no expiry
+);
+
+-- LRU eviction order
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_lru
+    ON llm_response_cache(last_used_at);
+
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_expires
+    ON llm_response_cache(expires_at) WHERE expires_at IS NOT NULL;
@@ -0,0 +1,21 @@
+-- Migration 020: Indexed due time for detected tasks
+-- The executor used to find due tasks with
+-- json_extract(normalized_json, '$.scheduled_for'), a full table scan on
+-- every poll. scheduled_for is now a real column holding the due time in
+-- UTC as 'YYYY-MM-DD HH:MM:SS.SSS' (see utils/task_schedule.py), kept in
+-- sync with normalized_json by every writer.
+
+ALTER TABLE detected_tasks ADD COLUMN scheduled_for TEXT DEFAULT NULL;
+
+-- strftime() converts any '+HH:MM' / 'Z' offset to UTC and yields NULL
+-- for values it cannot parse, matching scheduled_for_key()
+UPDATE detected_tasks
+SET scheduled_for = strftime('%Y-%m-%d %H:%M:%f', json_extract(normalized_json, '$.scheduled_for'))
+WHERE normalized_json IS NOT NULL
+  AND json_valid(normalized_json)
+  AND json_extract(normalized_json, '$.scheduled_for') IS NOT NULL
+  AND json_extract(normalized_json, '$.scheduled_for') != '';
+
+-- Due-task lookup: WHERE status='confirmed' AND scheduled_for <= ?
+CREATE INDEX IF NOT EXISTS idx_detected_tasks_status_scheduled
+    ON detected_tasks(status, scheduled_for);
@@ -0,0 +1,30 @@
+-- Migration 021: Precomputed reader/TTS chunk boundaries
+-- Seeking used to re-run tts_service.chunk_text() over the whole document
+-- per request. Boundaries are now computed once per (content, chunking
+-- parameters, content hash) and looked up by bisect.
+-- See services/reader_chunk_index.py.
+
+CREATE TABLE IF NOT EXISTS reader_chunk_indexes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_type TEXT NOT NULL,             -- 'file', 'library', 'transcript'
+    content_id INTEGER NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    respect_sentences INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,             -- sha256 of the reader text
+    chunk_count INTEGER NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (content_type, content_id, chunk_size, respect_sentences)
+);
+
+CREATE TABLE IF NOT EXISTS reader_chunk_boundaries (
+    index_id INTEGER NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    start_char INTEGER NOT NULL,            -- as returned by chunk_text()
+    end_char INTEGER NOT NULL,
+    span_start INTEGER NOT NULL,            -- source slice the chunk text is built from
+    span_end INTEGER NOT NULL,
+    sentence_index INTEGER,                 -- first sentence; NULL for character chunking
+    est_seconds REAL NOT NULL,              -- estimated audio at speed 1.0
+    PRIMARY KEY (index_id, chunk_index),
+    FOREIGN KEY (index_id) REFERENCES reader_chunk_indexes(id) ON DELETE CASCADE
+) WITHOUT ROWID;
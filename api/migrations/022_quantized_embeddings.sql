@@ -0,0 +1,17 @@
+-- Migration 022: Optional quantized embedding storage
+-- Each embedding table gets an embedding_q column holding a float16 or
+-- int8 copy of the vector (format in services/embedding_quant.py). Tables
+-- without a row in embedding_quantization keep storing float32 only.
+-- Convert a table with scripts/quantize_embeddings.py.
+
+ALTER TABLE library_chunks ADD COLUMN embedding_q BLOB DEFAULT NULL;
+ALTER TABLE file_chunks ADD COLUMN embedding_q BLOB DEFAULT NULL;
+ALTER TABLE memories ADD COLUMN embedding_q BLOB DEFAULT NULL;
+
+CREATE TABLE IF NOT EXISTS embedding_quantization (
+    table_name TEXT PRIMARY KEY,
+    dtype TEXT NOT NULL CHECK (dtype IN ('float16', 'int8')),
+    keep_float32 INTEGER NOT NULL DEFAULT 1,    -- 0 = float32 column cleared
+    rerank INTEGER NOT NULL DEFAULT 100,        -- Candidates re-scored in float32
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
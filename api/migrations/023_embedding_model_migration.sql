@@ -0,0 +1,37 @@
+-- Migration 023: Embedding model id per vector and online re-embedding
+-- Every embedding row records the model and dimension that produced it.
+-- While services/embedding_migration.py re-embeds a table, the target
+-- model's vector goes to embedding_next and search keeps using embedding;
+-- embedding_migrations.cutover flips reads to the new vectors in one
+-- statement, after which embedding_next is folded back into embedding.
+-- Rows with a NULL embedding_model predate this migration and belong to
+-- the configured EMBEDDING_MODEL.
+
+ALTER TABLE library_chunks ADD COLUMN embedding_model TEXT DEFAULT NULL;
+ALTER TABLE library_chunks ADD COLUMN embedding_dim INTEGER DEFAULT NULL;
+ALTER TABLE library_chunks ADD COLUMN embedding_next BLOB DEFAULT NULL;
+
+ALTER TABLE file_chunks ADD COLUMN embedding_model TEXT DEFAULT NULL;
+ALTER TABLE file_chunks ADD COLUMN embedding_dim INTEGER DEFAULT NULL;
+ALTER TABLE file_chunks ADD COLUMN embedding_next BLOB DEFAULT NULL;
+
+ALTER TABLE memories ADD COLUMN embedding_model TEXT DEFAULT NULL;
+ALTER TABLE memories ADD COLUMN embedding_dim INTEGER DEFAULT NULL;
+ALTER TABLE memories ADD COLUMN embedding_next BLOB DEFAULT NULL;
+
+CREATE TABLE IF NOT EXISTS embedding_migrations (
+    table_name TEXT PRIMARY KEY,
+    source_model TEXT NOT NULL,
+    target_model TEXT NOT NULL,
+    target_dim INTEGER,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, running, paused, ready, finalizing, done, failed
+    cutover INTEGER NOT NULL DEFAULT 0,      -- 1 = reads use the target model
+    auto_cutover INTEGER NOT NULL DEFAULT 1,
+    last_id INTEGER NOT NULL DEFAULT 0,      -- Keyset position of the copy pass
+    processed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    cutover_at DATETIME
+);
@@ -0,0 +1,55 @@
+-- Migration 024: Parallel transcription with leases and partial transcripts
+-- Workers claim queue items with a single UPDATE ... RETURNING that sets
+-- a lease; a worker that dies stops renewing it and the item becomes
+-- claimable again once lease_expires_at passes. Long recordings are
+-- split into VAD windows (services/library/audio_segmentation.py), and each
+-- finished window is stored in transcription_segments straight away, so
+-- readers and search see the transcript grow and a reclaimed item only
+-- re-transcribes the windows that never finished.
+
+ALTER TABLE transcription_queue ADD COLUMN lease_owner TEXT;
+ALTER TABLE transcription_queue ADD COLUMN lease_expires_at DATETIME;
+ALTER TABLE transcription_queue ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE transcription_queue ADD COLUMN duration_seconds REAL;
+ALTER TABLE transcription_queue ADD COLUMN windows_total INTEGER;
+ALTER TABLE transcription_queue ADD COLUMN windows_done INTEGER NOT NULL DEFAULT 0;
+
+-- Claim order, including expired leases
+CREATE INDEX IF NOT EXISTS idx_transcription_queue_claim
+    ON transcription_queue(status, priority, queued_at, id);
+
+CREATE TABLE IF NOT EXISTS transcription_segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue_id INTEGER NOT NULL,
+    library_file_id INTEGER NOT NULL,
+    window_index INTEGER NOT NULL,
+    start_seconds REAL NOT NULL,            -- Window bounds in the recording
+    end_seconds REAL NOT NULL,
+    text TEXT NOT NULL,
+    segments_json TEXT NOT NULL,            -- [{start, end, text}], absolute times
+    language TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (queue_id) REFERENCES transcription_queue(id) ON DELETE CASCADE,
+    FOREIGN KEY (library_file_id) REFERENCES library_files(id) ON DELETE CASCADE,
+    UNIQUE(queue_id, window_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_transcription_segments_file
+    ON transcription_segments(library_file_id, start_seconds);
+
+-- Keyword search over partial transcripts (same setup as migration 017)
+CREATE VIRTUAL TABLE IF NOT EXISTS transcription_segments_fts USING fts5(
+    text,
+    content='transcription_segments',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS transcription_segments_fts_ai AFTER INSERT ON transcription_segments BEGIN
+    INSERT INTO transcription_segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS transcription_segments_fts_ad AFTER DELETE ON transcription_segments BEGIN
+    INSERT INTO transcription_segments_fts(transcription_segments_fts, rowid, text)
+    VALUES ('delete', old.id, old.text);
+END;
@@ -0,0 +1,20 @@
+-- Migration 025: TMDb metadata cache
+-- Replaces the playlist JSON cache (data/playlists/tmdb_cache.json),
+-- which was re-read on every lookup and rewritten whole on every insert.
+-- Keys are IMDb ids ("tt0218967") or normalized queries ("q:the family
+-- man 2000"). Entries past expires_at are refetched; the stale value is
+-- still served if TMDb is unreachable. See services/cache/tmdb_cache.py.
+
+CREATE TABLE IF NOT EXISTS tmdb_cache (
+    cache_key TEXT PRIMARY KEY,
+    info_json TEXT NOT NULL,                -- tmdb_lookup_movie() result
+    fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME                     -- NULL = no expiry
+);
+
+-- Legacy JSON files already imported (each is imported once)
+CREATE TABLE IF NOT EXISTS tmdb_cache_imports (
+    source_path TEXT PRIMARY KEY,
+    entries INTEGER NOT NULL DEFAULT 0,
+    imported_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,26 @@
+-- Migration 026: Reference cache table
+-- Versioned cache of fetched external content, used by
+-- services/cache/reference_cache.py (and the /api/system/cache routes),
+-- which had no table. One row per distinct content version of a URL;
+-- ReferenceCache reads rows positionally, so keep this column order.
+-- web_fetch keeps HTTP validators (ETag, Last-Modified) and the raw
+-- body hash in metadata for conditional GETs.
+
+CREATE TABLE IF NOT EXISTS reference_cache (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    content TEXT NOT NULL,
+    content_type TEXT,
+    fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME,
+    version INTEGER NOT NULL DEFAULT 1,
+    metadata TEXT,
+    UNIQUE(url, version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_reference_cache_url_hash
+    ON reference_cache(url, content_hash);
+
+CREATE INDEX IF NOT EXISTS idx_reference_cache_expires
+    ON reference_cache(expires_at) WHERE expires_at IS NOT NULL;
@@ -0,0 +1,50 @@
+-- Migration 027: Resumable bulk import runs
+-- Importer plugins used to import item by item (copy, INSERT, commit,
+-- extract) inside the request. An import run records the selected items
+-- up front; services/plugins/bulk_import.py then copies files in a thread
+-- pool, extracts text in a process pool and inserts project_files rows in
+-- one transaction per batch, marking items done in the same transaction.
+-- A run that stopped part-way resumes from its pending items.
+
+CREATE TABLE IF NOT EXISTS plugin_import_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL,
+    user_id INTEGER,
+    plugin_id TEXT NOT NULL,
+    config_json TEXT,
+    upload_root TEXT NOT NULL,              -- resolved when the run is created
+    status TEXT NOT NULL DEFAULT 'pending', -- pending/running/paused/completed/failed
+    total INTEGER NOT NULL DEFAULT 0,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    error_message TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME,
+    updated_at DATETIME,
+    completed_at DATETIME,
+    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS plugin_import_run_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL,
+    item_id TEXT NOT NULL,                  -- ImportItem.id from list_items()
+    name TEXT NOT NULL,
+    source_path TEXT NOT NULL,
+    mime_type TEXT,
+    size_bytes INTEGER,
+    item_metadata_json TEXT,
+    status TEXT NOT NULL DEFAULT 'pending', -- pending/done/failed
+    file_id INTEGER,
+    error TEXT,
+    result_json TEXT,
+    FOREIGN KEY (run_id) REFERENCES plugin_import_runs(id) ON DELETE CASCADE,
+    FOREIGN KEY (file_id) REFERENCES project_files(id) ON DELETE SET NULL
+);
+
+-- Next batch of pending items, in selection order
+CREATE INDEX IF NOT EXISTS idx_plugin_import_run_items_run
+    ON plugin_import_run_items(run_id, status, id);
+
+CREATE INDEX IF NOT EXISTS idx_plugin_import_runs_project
+    ON plugin_import_runs(project_id, created_at);
@@ -0,0 +1,21 @@
+-- Migration 028: Indexes recommended by the slow-query advisor
+-- From utils/query_log.py run over the app's hot queries on a populated
+-- database (benchmarks/bench_query_indexes.py, which also times them
+-- before and after). Library chunk joins, reader audio cache lookups and
+-- scripture passage lookups already had usable indexes.
+
+-- File text lookups (files_api, reader_service): WHERE file_id = ?
+-- scanned the whole cache, one row of extracted text per file.
+CREATE INDEX IF NOT EXISTS idx_file_text_cache_file
+    ON file_text_cache(file_id);
+
+-- Chat task list: WHERE user_id = ? ... ORDER BY created_at DESC LIMIT ?
+-- sorted every task of the user to return the newest few.
+CREATE INDEX IF NOT EXISTS idx_detected_tasks_user_created
+    ON detected_tasks(user_id, created_at);
+
+-- Library list / search mime filter: mime_type LIKE 'audio%'.
+-- LIKE is case-insensitive, so only a NOCASE index turns the prefix into
+-- a range; idx_library_files_mime still serves mime_type = ?.
+CREATE INDEX IF NOT EXISTS idx_library_files_mime_nocase
+    ON library_files(mime_type COLLATE NOCASE);
@@ -0,0 +1,13 @@
+-- Migration 029: Exact LRU order for the LLM response cache
+-- last_used_at has one-second resolution, so entries stored or read in
+-- the same second tied and eviction among them was arbitrary; a burst
+-- of puts could evict the entry just stored. last_used_seq is a counter
+-- bumped on every put and hit, and eviction orders by it. Existing rows
+-- start at 0 and keep their last_used_at order among themselves.
+
+ALTER TABLE llm_response_cache ADD COLUMN last_used_seq INTEGER NOT NULL DEFAULT 0;
+
+DROP INDEX IF EXISTS idx_llm_response_cache_lru;
+
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_lru
+    ON llm_response_cache(last_used_seq, last_used_at);
@@ -19,7 +19,7 @@ Constraints:
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 
 # ---------------------------------------------------------------------------
@@ -66,6 +66,11 @@ class ImporterPlugin(ABC):
     # Format: {"field_name": {"type": "string", "required": True, "description": "..."}}
     config_schema: Dict[str, Any] = {}
 
+    # Importers whose import_item() only copies the file into the project
+    # (and optionally caches its text) set this, so bulk imports can copy,
+    # extract and insert in batches instead (services/plugins/bulk_import.py)
+    supports_bulk_import: bool = False
+
     @abstractmethod
     def validate_config(self, config: Dict) -> bool:
         """
@@ -107,6 +112,14 @@ class ImporterPlugin(ABC):
         """
         pass
 
+    def bulk_mime_type(self, item: ImportItem) -> str:
+        """MIME type recorded for an item imported in bulk."""
+        return item.mime_type or ""
+
+    def bulk_extract_text(self, item: ImportItem, config: Dict) -> bool:
+        """Whether a bulk import should extract and cache the item's text."""
+        return False
+
     def get_info(self) -> Dict[str, Any]:
         """Return plugin information for API responses."""
         return {
@@ -133,6 +146,7 @@ class ExportResult:
     size_bytes: Optional[int] = None
     error: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    chunks: Optional[Iterator[bytes]] = None  # Streamed output (stream_project), instead of export_path
 
 
 class ExporterPlugin(ABC):
@@ -152,6 +166,10 @@ class ExporterPlugin(ABC):
     # Configuration schema for this plugin
     config_schema: Dict[str, Any] = {}
 
+    # Exporters that can produce their output while it is being sent set
+    # this and implement stream_project() (see plugins/exporters/streaming.py)
+    supports_streaming: bool = False
+
     @abstractmethod
     def validate_config(self, config: Dict) -> bool:
         """
@@ -180,6 +198,18 @@ class ExporterPlugin(ABC):
         """
         pass
 
+    def stream_project(self, project_id: int, user_id: int, config: Dict) -> ExportResult:
+        """
+        Export project data as a stream of byte chunks.
+
+        Access is checked up front; the data is read as the chunks are
+        consumed. Totals in metadata are filled in once the stream ends.
+
+        Returns:
+            ExportResult with chunks set (no export_path or size_bytes)
+        """
+        raise NotImplementedError(f"{self.id} does not support streaming")
+
     def get_info(self) -> Dict[str, Any]:
         """Return plugin information for API responses."""
         return {
@@ -4,7 +4,8 @@ JSON Export Plugin
 Phase 6.3: Plugin Framework
 
 Exports structured project data as a JSON file including
-files, transcripts, insights, and notes.
+files, transcripts, insights, and notes. The document is streamed one
+file / transcript at a time rather than built in memory.
 """
 
 import json
@@ -12,14 +13,25 @@ import logging
 import os
 import tempfile
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 
 from plugins import ExporterPlugin, ExportResult
+from plugins.exporters.streaming import (
+    coalesce,
+    fetch_one,
+    iter_json_document,
+    iter_rows_by_created_at,
+    write_chunks,
+)
 from utils.db import get_db
 
 logger = logging.getLogger(__name__)
 
 
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class JsonExporter(ExporterPlugin):
     """
     Export structured project data as JSON.
@@ -36,6 +48,7 @@ class JsonExporter(ExporterPlugin):
     name = "JSON Export"
     type = "exporter"
     description = "Export structured project data as JSON"
+    supports_streaming = True
 
     config_schema = {
         "include_file_text": {
@@ -71,6 +84,8 @@ class JsonExporter(ExporterPlugin):
         """
         Export project data as JSON.
 
+        Writes the same bytes as stream_project() to a temp file.
+
         Args:
             project_id: Source project ID
             user_id: User performing the export
@@ -79,24 +94,65 @@ class JsonExporter(ExporterPlugin):
         Returns:
             ExportResult with path to generated JSON file
         """
+        stream = self.stream_project(project_id, user_id, config)
+        if not stream.success:
+            return stream
+
+        # Create temp directory for export
+        export_dir = tempfile.mkdtemp(prefix="tamor_export_")
+        json_path = os.path.join(export_dir, stream.filename)
+
+        try:
+            # Write JSON file
+            json_size = write_chunks(stream.chunks, json_path)
+
+            return ExportResult(
+                success=True,
+                export_path=json_path,
+                filename=stream.filename,
+                mime_type="application/json",
+                size_bytes=json_size,
+                metadata=stream.metadata,
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to create JSON export: {e}")
+            # Clean up on error
+            if os.path.exists(json_path):
+                os.remove(json_path)
+            return ExportResult(
+                success=False,
+                error=str(e),
+            )
+
+    def stream_project(
+        self, project_id: int, user_id: int, config: Dict
+    ) -> ExportResult:
+        """
+        Export project data as JSON streamed in chunks.
+
+        The document is the one json.dump(..., indent=2) would write,
+        emitted one file and one transcript at a time.
+
+        Returns:
+            ExportResult with chunks; metadata totals are filled in once
+            the stream has been consumed
+        """
         include_file_text = config.get("include_file_text", True)
         include_insights = config.get("include_insights", True)
         include_transcripts = config.get("include_transcripts", True)
         include_notes = config.get("include_notes", True)
 
-        conn = get_db()
-        cur = conn.cursor()
-
         # Verify project access and get project details
-        cur.execute(
+        row = fetch_one(
             """
-            SELECT id, name, created_at, notes
-            FROM projects
-            WHERE id = ? AND user_id = ?
+            SELECT p.id, p.name, p.created_at, n.content
+            FROM projects p
+            LEFT JOIN project_notes n ON n.project_id = p.id AND n.user_id = p.user_id
+            WHERE p.id = ? AND p.user_id = ?
             """,
             (project_id, user_id),
         )
-        row = cur.fetchone()
         if not row:
             return ExportResult(
                 success=False,
@@ -111,35 +167,67 @@ class JsonExporter(ExporterPlugin):
         safe_name = "".join(c if c.isalnum() or c in "-_ " else "_" for c in project_name)
         safe_name = safe_name.strip()[:50] or "project"
 
-        # Build export data structure
-        export_data = {
-            "version": "1.0",
-            "exported_at": datetime.now(timezone.utc).isoformat(),
-            "project": {
-                "id": project_id,
-                "name": project_name,
-                "created_at": project_created_at,
-            },
-            "files": [],
-            "transcripts": [],
-        }
+        exported_at = _now()
+        json_filename = f"{safe_name}-export-{exported_at.strftime('%Y%m%d_%H%M%S')}.json"
 
+        project = {
+            "id": project_id,
+            "name": project_name,
+            "created_at": project_created_at,
+        }
         if include_notes and project_notes:
-            export_data["project"]["notes"] = project_notes
+            project["notes"] = project_notes
+
+        metadata = {
+            "project_name": project_name,
+            "total_files": 0,
+            "total_transcripts": 0,
+        }
+        transcripts = (
+            self._iter_transcripts(project_id, metadata) if include_transcripts else iter(())
+        )
+        document = iter_json_document(
+            [
+                ("version", "1.0"),
+                ("exported_at", exported_at.isoformat()),
+                ("project", project),
+                ("files", self._iter_files(project_id, include_file_text, include_insights, metadata)),
+                ("transcripts", transcripts),
+            ]
+        )
+
+        def chunks() -> Iterator[bytes]:
+            for piece in document:
+                yield piece.encode("utf-8")
+            logger.info(
+                f"Streamed JSON export for project {project_id}: "
+                f"{metadata['total_files']} files, "
+                f"{metadata['total_transcripts']} transcripts"
+            )
+
+        return ExportResult(
+            success=True,
+            filename=json_filename,
+            mime_type="application/json",
+            metadata=metadata,
+            chunks=coalesce(chunks()),
+        )
 
-        # Get project files
-        cur.execute(
+    def _iter_files(
+        self,
+        project_id: int,
+        include_file_text: bool,
+        include_insights: bool,
+        metadata: Dict[str, Any],
+    ) -> Iterator[Dict[str, Any]]:
+        for file_row in iter_rows_by_created_at(
             """
             SELECT id, filename, mime_type, size_bytes, created_at
             FROM project_files
-            WHERE project_id = ? AND deleted_at IS NULL
-            ORDER BY created_at
+            WHERE project_id = ?
             """,
             (project_id,),
-        )
-        files = cur.fetchall()
-
-        for file_row in files:
+        ):
             file_id, filename, mime_type, size_bytes, created_at = file_row
 
             file_data = {
@@ -150,111 +238,63 @@ class JsonExporter(ExporterPlugin):
                 "created_at": created_at,
             }
 
-            # Add extracted text if requested
-            if include_file_text:
-                cur.execute(
-                    "SELECT text FROM file_text_cache WHERE file_id = ?",
-                    (file_id,),
-                )
-                text_row = cur.fetchone()
-                if text_row:
-                    file_data["text"] = text_row[0]
-
-            # Add insights if requested
-            if include_insights:
-                cur.execute(
-                    """
-                    SELECT type, data_json, created_at
-                    FROM file_insights
-                    WHERE file_id = ?
-                    ORDER BY type
-                    """,
-                    (file_id,),
-                )
-                insight_rows = cur.fetchall()
-                if insight_rows:
-                    insights = {}
-                    for insight_type, data_json, i_created_at in insight_rows:
+            conn = get_db()
+            try:
+                # Add extracted text if requested
+                if include_file_text:
+                    text_row = conn.execute(
+                        "SELECT text FROM file_text_cache WHERE file_id = ?",
+                        (file_id,),
+                    ).fetchone()
+                    if text_row:
+                        file_data["text"] = text_row[0]
+
+                # Add insights if requested
+                if include_insights:
+                    insight_row = conn.execute(
+                        """
+                        SELECT insights_json, summary
+                        FROM file_insights
+                        WHERE file_id = ?
+                        """,
+                        (file_id,),
+                    ).fetchone()
+                    if insight_row:
+                        insights_json, summary = insight_row
                         try:
-                            insights[insight_type] = json.loads(data_json) if data_json else None
+                            insights = json.loads(insights_json) if insights_json else {}
                         except json.JSONDecodeError:
-                            insights[insight_type] = data_json
-                    file_data["insights"] = insights
-
-            export_data["files"].append(file_data)
-
-        # Get transcripts if requested
-        if include_transcripts:
-            cur.execute(
-                """
-                SELECT id, title, text, segments_json, created_at
-                FROM transcripts
-                WHERE project_id = ?
-                ORDER BY created_at
-                """,
-                (project_id,),
-            )
-            transcripts = cur.fetchall()
-
-            for t_row in transcripts:
-                t_id, title, text, segments_json, t_created_at = t_row
-
-                transcript_data = {
-                    "id": t_id,
-                    "title": title,
-                    "text": text,
-                    "created_at": t_created_at,
-                }
-
-                # Parse segments if available
-                if segments_json:
-                    try:
-                        transcript_data["segments"] = json.loads(segments_json)
-                    except json.JSONDecodeError:
-                        pass
-
-                export_data["transcripts"].append(transcript_data)
-
-        # Create temp directory for export
-        export_dir = tempfile.mkdtemp(prefix="tamor_export_")
-        export_timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        json_filename = f"{safe_name}-export-{export_timestamp}.json"
-        json_path = os.path.join(export_dir, json_filename)
-
-        try:
-            # Write JSON file
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
-
-            # Get file size
-            json_size = os.path.getsize(json_path)
-
-            logger.info(
-                f"Created JSON export for project {project_id}: "
-                f"{len(export_data['files'])} files, "
-                f"{len(export_data['transcripts'])} transcripts, "
-                f"{json_size} bytes"
-            )
+                            insights = {"raw": insights_json}
+                        if summary:
+                            insights["summary"] = summary
+                        file_data["insights"] = insights
+            finally:
+                conn.close()
+
+            metadata["total_files"] += 1
+            yield file_data
+
+    def _iter_transcripts(self, project_id: int, metadata: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        for t_id, title, t_created_at in iter_rows_by_created_at(
+            "SELECT id, title, created_at FROM transcripts WHERE project_id = ?",
+            (project_id,),
+        ):
+            t_row = fetch_one("SELECT transcript_text, segments_json FROM transcripts WHERE id = ?", (t_id,))
+            text, segments_json = t_row if t_row else (None, None)
+
+            transcript_data = {
+                "id": t_id,
+                "title": title,
+                "text": text,
+                "created_at": t_created_at,
+            }
 
-            return ExportResult(
-                success=True,
-                export_path=json_path,
-                filename=json_filename,
-                mime_type="application/json",
-                size_bytes=json_size,
-                metadata={
-                    "project_name": project_name,
-                    "total_files": len(export_data["files"]),
-                    "total_transcripts": len(export_data["transcripts"]),
-                },
-            )
+            # Parse segments if available
+            if segments_json:
+                try:
+                    transcript_data["segments"] = json.loads(segments_json)
+                except json.JSONDecodeError:
+                    pass
 
-        except Exception as e:
-            logger.error(f"Failed to create JSON export: {e}")
-            # Clean up on error
-            if os.path.exists(json_path):
-                os.remove(json_path)
-            return ExportResult(
-                success=False,
-                error=str(e),
-            )
+            metadata["total_transcripts"] += 1
+            yield transcript_data
@@ -0,0 +1,229 @@
+"""
+Streaming helpers for exporter plugins
+
+Exporters that set supports_streaming produce their output as an
+iterator of byte chunks (ExportResult.chunks), so a Flask response can
+send an export while it is being built. Nothing here holds more than one
+read block or one JSON item in memory:
+
+- ZipStream writes ZIP entries into a non-seekable sink (sizes and CRCs
+  go in data descriptors after each entry) and hands the bytes on as
+  they are produced.
+- iter_json_document() yields the same text as json.dumps(..., indent=2),
+  with list members written one item at a time.
+"""
+
+import json
+import mimetypes
+import os
+import sqlite3
+import zipfile
+from collections.abc import Iterator as IteratorABC
+from typing import Any, Iterable, Iterator, Optional, Sequence, Tuple
+
+from utils.db import get_db
+
+# Bytes read from a source file per write into the archive
+READ_CHUNK_BYTES = int(os.getenv("EXPORT_READ_CHUNK_BYTES", str(256 * 1024)))
+
+# Rows fetched per query; no cursor stays open while a stream is paused
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "500"))
+
+# Small pieces are joined until a chunk is at least this large
+STREAM_CHUNK_BYTES = int(os.getenv("EXPORT_STREAM_CHUNK_BYTES", str(64 * 1024)))
+
+# Already-compressed formats gain nothing from deflate
+_STORED_MIME_PREFIXES = ("image/", "audio/", "video/")
+_DEFLATED_IMAGE_TYPES = {"image/svg+xml", "image/bmp", "image/x-ms-bmp", "image/tiff"}
+_STORED_MIME_TYPES = {
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-bzip2",
+    "application/x-xz",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/vnd.rar",
+    "application/zstd",
+    "application/epub+zip",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "application/vnd.oasis.opendocument.text",
+    "application/vnd.oasis.opendocument.spreadsheet",
+    "application/vnd.oasis.opendocument.presentation",
+}
+
+
+def compress_type_for(mime_type: Optional[str], filename: str = "") -> int:
+    """ZIP_STORED for compressed media and archives, ZIP_DEFLATED otherwise."""
+    mime = (mime_type or mimetypes.guess_type(filename)[0] or "").split(";")[0].strip().lower()
+    if mime in _STORED_MIME_TYPES:
+        return zipfile.ZIP_STORED
+    if mime.startswith(_STORED_MIME_PREFIXES) and mime not in _DEFLATED_IMAGE_TYPES:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+class _ChunkSink:
+    """Write-only file object for ZipFile; drain() returns what was written."""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class ZipStream:
+    """
+    A ZIP archive written on the fly.
+
+    Each method yields the archive bytes produced so far; chain them in
+    order and finish with close(). Entries default to ZIP_DEFLATED.
+    """
+
+    def __init__(self, compression: int = zipfile.ZIP_DEFLATED):
+        self._sink = _ChunkSink()
+        self._zf = zipfile.ZipFile(self._sink, "w", compression)
+
+    def write_file(self, path: str, arcname: str, compress_type: Optional[int] = None) -> Iterator[bytes]:
+        """Add a file from disk, read in READ_CHUNK_BYTES blocks."""
+        zinfo = zipfile.ZipInfo.from_file(path, arcname)
+        zinfo.compress_type = self._zf.compression if compress_type is None else compress_type
+        with open(path, "rb") as src, self._zf.open(zinfo, "w") as dest:
+            for block in iter(lambda: src.read(READ_CHUNK_BYTES), b""):
+                dest.write(block)
+                data = self._sink.drain()
+                if data:
+                    yield data
+        yield self._sink.drain()
+
+    def write_str(
+        self,
+        arcname: str,
+        data: str,
+        date_time: Tuple[int, int, int, int, int, int],
+        compress_type: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """Add an in-memory text entry (same attributes as ZipFile.writestr)."""
+        zinfo = zipfile.ZipInfo(arcname, date_time=date_time)
+        zinfo.compress_type = self._zf.compression if compress_type is None else compress_type
+        zinfo.external_attr = 0o600 << 16
+        self._zf.writestr(zinfo, data)
+        yield self._sink.drain()
+
+    def close(self) -> Iterator[bytes]:
+        """Write the central directory."""
+        self._zf.close()
+        yield self._sink.drain()
+
+
+def coalesce(chunks: Iterable[bytes], size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """Join small chunks so each one yielded is at least `size` bytes (bar the last)."""
+    buf = []
+    buffered = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if not buf and len(chunk) >= size:
+            yield chunk
+            continue
+        buf.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield b"".join(buf)
+            buf.clear()
+            buffered = 0
+    if buf:
+        yield b"".join(buf)
+
+
+def iter_rows_by_created_at(
+    select_sql: str, params: Sequence[Any], page_size: Optional[int] = None
+) -> Iterator[sqlite3.Row]:
+    """
+    Yield the rows of `SELECT ... WHERE ...` in (created_at, id) order, a page at a time.
+
+    The query must select id and created_at. Each page is read on its own
+    connection, so a slow client never holds a read lock on the database.
+    """
+    page_size = page_size or EXPORT_PAGE_SIZE
+    sql = (
+        f"{select_sql} AND (COALESCE(created_at, '') > ? OR (COALESCE(created_at, '') = ? AND id > ?))"
+        " ORDER BY COALESCE(created_at, ''), id LIMIT ?"
+    )
+    after: Tuple[str, int] = ("", -1)
+    while True:
+        conn = get_db()
+        try:
+            rows = conn.execute(sql, (*params, after[0], after[0], after[1], page_size)).fetchall()
+        finally:
+            conn.close()
+        yield from rows
+        if len(rows) < page_size:
+            return
+        after = (rows[-1]["created_at"] or "", rows[-1]["id"])
+
+
+def fetch_one(sql: str, params: Sequence[Any]) -> Optional[sqlite3.Row]:
+    """Run a single-row lookup on a short-lived connection."""
+    conn = get_db()
+    try:
+        return conn.execute(sql, params).fetchone()
+    finally:
+        conn.close()
+
+
+def _indent_nested(text: str, prefix: str) -> str:
+    # json.dumps escapes newlines inside strings, so every "\n" is layout
+    return text.replace("\n", "\n" + prefix)
+
+
+def _iter_json_list(items: Iterator[Any], indent: int) -> Iterator[str]:
+    pad = " " * indent
+    empty = True
+    for item in items:
+        yield ("[\n" if empty else ",\n") + pad * 2
+        yield _indent_nested(json.dumps(item, indent=indent, ensure_ascii=False), pad * 2)
+        empty = False
+    yield "[]" if empty else "\n" + pad + "]"
+
+
+def iter_json_document(members: Iterable[Tuple[str, Any]], indent: int = 2) -> Iterator[str]:
+    """
+    Yield json.dumps(dict(members), indent=indent, ensure_ascii=False) in pieces.
+
+    A member whose value is an iterator is written as a JSON list, one
+    item at a time; other values are serialized whole.
+    """
+    pad = " " * indent
+    first = True
+    yield "{"
+    for key, value in members:
+        yield ("\n" if first else ",\n") + pad + json.dumps(key, ensure_ascii=False) + ": "
+        first = False
+        if isinstance(value, IteratorABC):
+            yield from _iter_json_list(value, indent)
+        else:
+            yield _indent_nested(json.dumps(value, indent=indent, ensure_ascii=False), pad)
+    yield "}" if first else "\n}"
+
+
+def write_chunks(chunks: Iterable[bytes], path: str) -> int:
+    """Write a stream to a file; returns the size in bytes."""
+    size = 0
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            size += len(chunk)
+    return size
@@ -4,7 +4,9 @@ ZIP Download Exporter Plugin
 Phase 6.3: Plugin Framework
 
 Downloads all project files as a ZIP archive with optional
-text cache and transcripts.
+text cache and transcripts. The archive is streamed: entries are
+written as files are read, so memory and temp disk use don't grow
+with the project.
 """
 
 import json
@@ -13,10 +15,17 @@ import os
 import tempfile
 import zipfile
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 
 from plugins import ExporterPlugin, ExportResult
-from utils.db import get_db
+from plugins.exporters.streaming import (
+    ZipStream,
+    coalesce,
+    compress_type_for,
+    fetch_one,
+    iter_rows_by_created_at,
+    write_chunks,
+)
 
 # Flask import (may not be available during testing)
 try:
@@ -27,6 +36,10 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class ZipDownloadExporter(ExporterPlugin):
     """
     Download all project files as a ZIP archive.
@@ -42,6 +55,7 @@ class ZipDownloadExporter(ExporterPlugin):
     name = "ZIP Download"
     type = "exporter"
     description = "Download all project files as a ZIP archive"
+    supports_streaming = True
 
     config_schema = {
         "include_text_cache": {
@@ -67,6 +81,8 @@ class ZipDownloadExporter(ExporterPlugin):
         """
         Export project as a ZIP archive.
 
+        Writes the same bytes as stream_project() to a temp file.
+
         Args:
             project_id: Source project ID
             user_id: User performing the export
@@ -75,18 +91,57 @@ class ZipDownloadExporter(ExporterPlugin):
         Returns:
             ExportResult with path to generated ZIP file
         """
+        stream = self.stream_project(project_id, user_id, config)
+        if not stream.success:
+            return stream
+
+        # Create temp directory for export
+        export_dir = tempfile.mkdtemp(prefix="tamor_export_")
+        zip_path = os.path.join(export_dir, stream.filename)
+
+        try:
+            zip_size = write_chunks(stream.chunks, zip_path)
+
+            return ExportResult(
+                success=True,
+                export_path=zip_path,
+                filename=stream.filename,
+                mime_type="application/zip",
+                size_bytes=zip_size,
+                metadata=stream.metadata,
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to create ZIP export: {e}")
+            # Clean up on error
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
+            return ExportResult(
+                success=False,
+                error=str(e),
+            )
+
+    def stream_project(
+        self, project_id: int, user_id: int, config: Dict
+    ) -> ExportResult:
+        """
+        Export project as a ZIP archive streamed in chunks.
+
+        Entries are written as they are read: media and archives stored,
+        everything else deflated. The manifest is the last entry.
+
+        Returns:
+            ExportResult with chunks; metadata totals are filled in once
+            the stream has been consumed
+        """
         include_text_cache = config.get("include_text_cache", False)
         include_transcripts = config.get("include_transcripts", True)
 
-        conn = get_db()
-        cur = conn.cursor()
-
         # Verify project access and get project name
-        cur.execute(
+        row = fetch_one(
             "SELECT id, name FROM projects WHERE id = ? AND user_id = ?",
             (project_id, user_id),
         )
-        row = cur.fetchone()
         if not row:
             return ExportResult(
                 success=False,
@@ -98,149 +153,142 @@ class ZipDownloadExporter(ExporterPlugin):
         safe_name = "".join(c if c.isalnum() or c in "-_ " else "_" for c in project_name)
         safe_name = safe_name.strip()[:50] or "project"
 
-        # Get upload root
-        upload_root = self._get_upload_root()
+        exported_at = _now()
+        zip_filename = f"{safe_name}-export-{exported_at.strftime('%Y%m%d_%H%M%S')}.zip"
+        metadata = {
+            "project_name": project_name,
+            "total_files": 0,
+            "total_transcripts": 0,
+            "original_size_bytes": 0,
+        }
+
+        chunks = self._iter_archive(
+            project_id,
+            project_name,
+            safe_name,
+            self._get_upload_root(),
+            exported_at,
+            include_text_cache,
+            include_transcripts,
+            metadata,
+        )
+        return ExportResult(
+            success=True,
+            filename=zip_filename,
+            mime_type="application/zip",
+            metadata=metadata,
+            chunks=coalesce(chunks),
+        )
 
-        # Get project files
-        cur.execute(
+    def _iter_archive(
+        self,
+        project_id: int,
+        project_name: str,
+        safe_name: str,
+        upload_root: str,
+        exported_at: datetime,
+        include_text_cache: bool,
+        include_transcripts: bool,
+        metadata: Dict[str, Any],
+    ) -> Iterator[bytes]:
+        # Build manifest
+        manifest = {
+            "project_id": project_id,
+            "project_name": project_name,
+            "exported_at": exported_at.isoformat(),
+            "files": [],
+            "transcripts": [],
+            "total_files": 0,
+            "total_size_bytes": 0,
+        }
+        archive_root = f"{safe_name}-export"
+        # Generated entries are dated like ZipFile.writestr() (local time)
+        entry_time = exported_at.astimezone().timetuple()[:6]
+        zs = ZipStream(zipfile.ZIP_DEFLATED)
+
+        # Add files
+        for file_row in iter_rows_by_created_at(
             """
             SELECT id, filename, stored_name, mime_type, size_bytes, created_at
             FROM project_files
-            WHERE project_id = ? AND deleted_at IS NULL
-            ORDER BY created_at
+            WHERE project_id = ?
             """,
             (project_id,),
-        )
-        files = cur.fetchall()
-
-        # Get transcripts if requested
-        transcripts = []
+        ):
+            file_id, filename, stored_name, mime_type, size_bytes, created_at = file_row
+
+            # Add to manifest
+            file_info = {
+                "id": file_id,
+                "filename": filename,
+                "mime_type": mime_type,
+                "size_bytes": size_bytes,
+                "created_at": created_at,
+            }
+            manifest["files"].append(file_info)
+            manifest["total_files"] += 1
+            manifest["total_size_bytes"] += size_bytes or 0
+
+            # Add actual file to ZIP
+            if stored_name:
+                source_path = os.path.join(upload_root, stored_name)
+                if os.path.exists(source_path):
+                    archive_path = f"{archive_root}/files/{filename}"
+                    yield from zs.write_file(
+                        source_path, archive_path, compress_type_for(mime_type, filename)
+                    )
+
+            # Add text cache if requested
+            if include_text_cache:
+                text_row = fetch_one(
+                    "SELECT text FROM file_text_cache WHERE file_id = ?",
+                    (file_id,),
+                )
+                if text_row and text_row[0]:
+                    text_filename = f"{filename}.txt"
+                    archive_path = f"{archive_root}/text/{text_filename}"
+                    yield from zs.write_str(archive_path, text_row[0], entry_time)
+
+        # Add transcripts
         if include_transcripts:
-            cur.execute(
-                """
-                SELECT id, title, text, created_at
-                FROM transcripts
-                WHERE project_id = ?
-                ORDER BY created_at
-                """,
+            for t_id, title, created_at in iter_rows_by_created_at(
+                "SELECT id, title, created_at FROM transcripts WHERE project_id = ?",
                 (project_id,),
-            )
-            transcripts = cur.fetchall()
-
-        # Create temp directory for export
-        export_dir = tempfile.mkdtemp(prefix="tamor_export_")
-        export_timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        zip_filename = f"{safe_name}-export-{export_timestamp}.zip"
-        zip_path = os.path.join(export_dir, zip_filename)
-
-        try:
-            # Build manifest
-            manifest = {
-                "project_id": project_id,
-                "project_name": project_name,
-                "exported_at": datetime.now(timezone.utc).isoformat(),
-                "files": [],
-                "transcripts": [],
-                "total_files": 0,
-                "total_size_bytes": 0,
-            }
-
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-                archive_root = f"{safe_name}-export"
-
-                # Add files
-                for file_row in files:
-                    file_id, filename, stored_name, mime_type, size_bytes, created_at = file_row
-
-                    # Add to manifest
-                    file_info = {
-                        "id": file_id,
-                        "filename": filename,
-                        "mime_type": mime_type,
-                        "size_bytes": size_bytes,
-                        "created_at": created_at,
-                    }
-                    manifest["files"].append(file_info)
-                    manifest["total_files"] += 1
-                    manifest["total_size_bytes"] += size_bytes or 0
-
-                    # Add actual file to ZIP
-                    if stored_name:
-                        source_path = os.path.join(upload_root, stored_name)
-                        if os.path.exists(source_path):
-                            archive_path = f"{archive_root}/files/{filename}"
-                            zf.write(source_path, archive_path)
-
-                    # Add text cache if requested
-                    if include_text_cache:
-                        cur.execute(
-                            "SELECT text FROM file_text_cache WHERE file_id = ?",
-                            (file_id,),
-                        )
-                        text_row = cur.fetchone()
-                        if text_row and text_row[0]:
-                            text_filename = f"{filename}.txt"
-                            archive_path = f"{archive_root}/text/{text_filename}"
-                            zf.writestr(archive_path, text_row[0])
-
-                # Add transcripts
-                if include_transcripts:
-                    for transcript_row in transcripts:
-                        t_id, title, text, created_at = transcript_row
-
-                        # Add to manifest
-                        transcript_info = {
-                            "id": t_id,
-                            "title": title,
-                            "created_at": created_at,
-                        }
-                        manifest["transcripts"].append(transcript_info)
-
-                        # Add transcript text file to ZIP
-                        if text:
-                            safe_title = "".join(
-                                c if c.isalnum() or c in "-_ " else "_"
-                                for c in (title or f"transcript-{t_id}")
-                            )[:50]
-                            text_filename = f"{safe_title}.txt"
-                            archive_path = f"{archive_root}/transcripts/{text_filename}"
-                            zf.writestr(archive_path, text)
-
-                # Add manifest
-                manifest_json = json.dumps(manifest, indent=2)
-                zf.writestr(f"{archive_root}/manifest.json", manifest_json)
-
-            # Get final ZIP size
-            zip_size = os.path.getsize(zip_path)
-
-            logger.info(
-                f"Created ZIP export for project {project_id}: "
-                f"{manifest['total_files']} files, {zip_size} bytes"
-            )
-
-            return ExportResult(
-                success=True,
-                export_path=zip_path,
-                filename=zip_filename,
-                mime_type="application/zip",
-                size_bytes=zip_size,
-                metadata={
-                    "project_name": project_name,
-                    "total_files": manifest["total_files"],
-                    "total_transcripts": len(manifest["transcripts"]),
-                    "original_size_bytes": manifest["total_size_bytes"],
-                },
-            )
-
-        except Exception as e:
-            logger.error(f"Failed to create ZIP export: {e}")
-            # Clean up on error
-            if os.path.exists(zip_path):
-                os.remove(zip_path)
-            return ExportResult(
-                success=False,
-                error=str(e),
-            )
+            ):
+                # Add to manifest
+                transcript_info = {
+                    "id": t_id,
+                    "title": title,
+                    "created_at": created_at,
+                }
+                manifest["transcripts"].append(transcript_info)
+
+                # Add transcript text file to ZIP
+                text_row = fetch_one("SELECT transcript_text FROM transcripts WHERE id = ?", (t_id,))
+                text = text_row[0] if text_row else None
+                if text:
+                    safe_title = "".join(
+                        c if c.isalnum() or c in "-_ " else "_"
+                        for c in (title or f"transcript-{t_id}")
+                    )[:50]
+                    text_filename = f"{safe_title}.txt"
+                    archive_path = f"{archive_root}/transcripts/{text_filename}"
+                    yield from zs.write_str(archive_path, text, entry_time)
+
+        # Add manifest
+        manifest_json = json.dumps(manifest, indent=2)
+        yield from zs.write_str(f"{archive_root}/manifest.json", manifest_json, entry_time)
+        yield from zs.close()
+
+        metadata.update(
+            total_files=manifest["total_files"],
+            total_transcripts=len(manifest["transcripts"]),
+            original_size_bytes=manifest["total_size_bytes"],
+        )
+        logger.info(
+            f"Streamed ZIP export for project {project_id}: "
+            f"{manifest['total_files']} files, {len(manifest['transcripts'])} transcripts"
+        )
 
     def _get_upload_root(self) -> str:
         """Get the upload root directory."""
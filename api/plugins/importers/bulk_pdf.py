@@ -56,6 +56,14 @@ class BulkPDFImporter(ImporterPlugin):
         },
     }
 
+    supports_bulk_import = True
+
+    def bulk_mime_type(self, item: ImportItem) -> str:
+        return "application/pdf"
+
+    def bulk_extract_text(self, item: ImportItem, config: Dict) -> bool:
+        return bool(config.get("extract_text", True))
+
     def validate_config(self, config: Dict) -> bool:
         """Validate configuration."""
         path = config.get("path")
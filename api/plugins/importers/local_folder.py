@@ -57,6 +57,8 @@ class LocalFolderImporter(ImporterPlugin):
         },
     }
 
+    supports_bulk_import = True
+
     def validate_config(self, config: Dict) -> bool:
         """Validate configuration."""
         path = config.get("path")
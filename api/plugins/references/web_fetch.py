@@ -5,20 +5,35 @@ Phase 6.3: Plugin Framework
 
 Fetch and extract content from URLs as reference material.
 Explicit user action only - never silently fetches during chat.
+
+Fetches go through the reference cache: a fresh entry is served without
+a request, a stale one is revalidated with If-None-Match /
+If-Modified-Since, and HTML is only re-extracted when the body changed.
 """
 
+import hashlib
 import logging
+import os
 import re
 import urllib.request
 import urllib.error
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 from html.parser import HTMLParser
 
 from plugins import ReferencePlugin, ReferenceItem, ReferenceResult, FetchResult
+from services.cache.reference_cache import ReferenceCache
+from utils.db import get_db
 
 logger = logging.getLogger(__name__)
 
+# Bodies are read in chunks and cut off at this size
+MAX_BODY_BYTES = int(os.getenv("WEB_FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+READ_CHUNK_BYTES = 64 * 1024
+
+# Cached pages younger than this are served without a request
+DEFAULT_MAX_AGE_HOURS = 24
+
 
 class HTMLTextExtractor(HTMLParser):
     """Simple HTML to text converter."""
@@ -83,6 +98,11 @@ class WebFetchReference(ReferencePlugin):
             "default": True,
             "description": "Extract readable text from HTML",
         },
+        "max_age_hours": {
+            "type": "number",
+            "default": DEFAULT_MAX_AGE_HOURS,
+            "description": "Serve a cached copy younger than this without re-fetching (0 = always revalidate)",
+        },
     }
 
     def validate_config(self, config: Dict) -> bool:
@@ -139,13 +159,16 @@ class WebFetchReference(ReferencePlugin):
 
         Args:
             item_id: Identifier of the item (ignored for web fetch, uses URL from config)
-            config: Plugin configuration with url and extract_text
+            config: Plugin configuration with url, extract_text and max_age_hours
 
         Returns:
-            FetchResult with fetched content
+            FetchResult with fetched content; metadata["cache"] says whether it
+            was served from cache ("fresh"), confirmed unchanged by the server
+            ("not_modified" / "unchanged") or fetched anew ("miss" / "changed")
         """
         url = config.get("url", "")
         extract_text = config.get("extract_text", True)
+        max_age_hours = config.get("max_age_hours", DEFAULT_MAX_AGE_HOURS)
 
         if not self.validate_config(config):
             return FetchResult(
@@ -153,56 +176,126 @@ class WebFetchReference(ReferencePlugin):
                 error="Invalid URL",
             )
 
+        conn = None
+        cache = None
+        cached = None
+        try:
+            conn = get_db()
+            cache = ReferenceCache(conn)
+            cached = cache.get(url)
+            # A copy made with the other extract_text setting can't be reused
+            if cached and cached["metadata"].get("extract_text") != bool(extract_text):
+                cached = None
+        except Exception as e:
+            # A broken cache must never break the fetch
+            logger.warning(f"Reference cache unavailable for {url}: {e}")
+            cache = None
+
         try:
-            # Fetch the URL
+            if cached and max_age_hours and cache.is_fresh(cached, max_age_hours):
+                logger.info(f"Serving cached URL: {url} (version {cached['version']})")
+                return self._cached_result(url, cached, "fresh")
+
+            # Fetch the URL, conditionally if we hold a cached copy
             headers = {
                 "User-Agent": "Mozilla/5.0 (compatible; TamorReference/1.0)",
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             }
+            if cached:
+                meta = cached["metadata"]
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
             request = urllib.request.Request(url, headers=headers)
 
-            with urllib.request.urlopen(request, timeout=30) as response:
-                # Get content type
-                content_type = response.headers.get("Content-Type", "")
-                charset = "utf-8"
-
-                # Extract charset from content-type if present
-                if "charset=" in content_type:
-                    charset = content_type.split("charset=")[-1].split(";")[0].strip()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    # Get content type
+                    content_type = response.headers.get("Content-Type", "")
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    raw_content, truncated = self._read_capped(response)
+            except urllib.error.HTTPError as e:
+                if e.code == 304 and cached:
+                    meta = dict(cached["metadata"])
+                    # A 304 may carry an updated validator
+                    meta["etag"] = e.headers.get("ETag") or meta.get("etag")
+                    self._safe_touch(cache, cached["id"], meta)
+                    logger.info(f"Not modified: {url} (version {cached['version']})")
+                    return self._cached_result(url, cached, "not_modified")
+                raise
+
+            body_hash = hashlib.sha256(raw_content).hexdigest()
+            metadata = {
+                "source": "web_fetch",
+                "content_type": content_type,
+                "extract_text": bool(extract_text),
+                "etag": etag,
+                "last_modified": last_modified,
+                "body_hash": body_hash,
+                "truncated": truncated,
+            }
 
-                # Read and decode content
-                raw_content = response.read()
-                try:
-                    html_content = raw_content.decode(charset, errors="ignore")
-                except (LookupError, UnicodeDecodeError):
-                    html_content = raw_content.decode("utf-8", errors="ignore")
-
-                # Extract title from HTML
-                title = self._extract_title(html_content) or url
-
-                # Extract text if requested
-                if extract_text and "text/html" in content_type.lower():
-                    content = self._extract_text(html_content)
-                else:
-                    content = html_content
-
-                fetched_at = datetime.now(timezone.utc).isoformat()
-
-                logger.info(f"Fetched URL: {url} ({len(content)} chars)")
-
-                return FetchResult(
-                    success=True,
-                    content=content,
-                    title=title,
-                    url=url,
-                    fetched_at=fetched_at,
-                    metadata={
-                        "source": "web_fetch",
-                        "content_type": content_type,
-                        "content_length": len(content),
-                        "raw_html_length": len(html_content),
-                    },
+            # Same bytes as the cached copy: reuse its extracted text
+            if cached and cached["metadata"].get("body_hash") == body_hash:
+                metadata.update(
+                    title=cached["metadata"].get("title"),
+                    raw_html_length=cached["metadata"].get("raw_html_length"),
                 )
+                self._safe_touch(cache, cached["id"], metadata)
+                logger.info(f"Unchanged: {url} (version {cached['version']})")
+                return self._cached_result(url, {**cached, "metadata": metadata}, "unchanged")
+
+            charset = "utf-8"
+
+            # Extract charset from content-type if present
+            if "charset=" in content_type:
+                charset = content_type.split("charset=")[-1].split(";")[0].strip()
+
+            # Decode content
+            try:
+                html_content = raw_content.decode(charset, errors="ignore")
+            except (LookupError, UnicodeDecodeError):
+                html_content = raw_content.decode("utf-8", errors="ignore")
+
+            # Extract title from HTML
+            title = self._extract_title(html_content) or url
+
+            # Extract text if requested
+            if extract_text and "text/html" in content_type.lower():
+                content = self._extract_text(html_content)
+            else:
+                content = html_content
+
+            metadata.update(title=title, raw_html_length=len(html_content))
+            version = None
+            if cache:
+                try:
+                    version = cache.put(url, content, content_type=content_type, metadata=metadata).get("version")
+                except Exception as e:
+                    logger.warning(f"Reference cache write failed for {url}: {e}")
+
+            fetched_at = datetime.now(timezone.utc).isoformat()
+
+            logger.info(f"Fetched URL: {url} ({len(content)} chars)")
+
+            return FetchResult(
+                success=True,
+                content=content,
+                title=title,
+                url=url,
+                fetched_at=fetched_at,
+                metadata={
+                    "source": "web_fetch",
+                    "content_type": content_type,
+                    "content_length": len(content),
+                    "raw_html_length": len(html_content),
+                    "truncated": truncated,
+                    "cache": "changed" if cached else "miss",
+                    "version": version,
+                },
+            )
 
         except urllib.error.HTTPError as e:
             logger.error(f"HTTP error fetching {url}: {e.code} {e.reason}")
@@ -232,6 +325,50 @@ class WebFetchReference(ReferencePlugin):
                 error=str(e),
                 url=url,
             )
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _read_capped(self, response, limit: Optional[int] = None) -> Tuple[bytes, bool]:
+        """Read the body in chunks, stopping at limit bytes. Returns (body, truncated)."""
+        limit = MAX_BODY_BYTES if limit is None else limit
+        chunks = []
+        size = 0
+        while size < limit:
+            chunk = response.read(min(READ_CHUNK_BYTES, limit - size))
+            if not chunk:
+                return b"".join(chunks), False
+            chunks.append(chunk)
+            size += len(chunk)
+        # At the cap: truncated unless the body ends exactly here
+        return b"".join(chunks), bool(response.read(1))
+
+    def _safe_touch(self, cache: ReferenceCache, entry_id: int, metadata: Dict[str, Any]) -> None:
+        try:
+            cache.touch(entry_id, metadata)
+        except Exception as e:
+            logger.warning(f"Reference cache update failed: {e}")
+
+    def _cached_result(self, url: str, cached: Dict[str, Any], status: str) -> FetchResult:
+        """FetchResult for a cached copy."""
+        meta = cached["metadata"]
+        content = cached["content"]
+        return FetchResult(
+            success=True,
+            content=content,
+            title=meta.get("title") or url,
+            url=url,
+            fetched_at=datetime.now(timezone.utc).isoformat() if status != "fresh" else cached["fetched_at"],
+            metadata={
+                "source": "web_fetch",
+                "content_type": cached["content_type"],
+                "content_length": len(content),
+                "raw_html_length": meta.get("raw_html_length"),
+                "truncated": meta.get("truncated", False),
+                "cache": status,
+                "version": cached["version"],
+            },
+        )
 
     def _extract_title(self, html: str) -> str:
         """Extract title from HTML."""
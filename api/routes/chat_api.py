@@ -6,8 +6,10 @@ from typing import Any, Optional, Dict
 
 from flask import Blueprint, jsonify, request, session
 
+from utils import metrics
 from utils.db import get_db
 from utils.auth import require_login, get_current_user_id
+from utils.task_schedule import notify_task_change, scheduled_for_key
 from services.llm_service import get_llm_client, get_model_name
 from core.prompt import build_system_prompt
 from core.task_classifier import classify_task
@@ -21,7 +23,11 @@ from core.deterministic import (
 )
 from services.references.reference_parser import find_references as find_scripture_refs
 from services.references.reference_service import ReferenceService
-from services.library import LibraryContextService, LibrarySettingsService
+from services.library import (
+    LibraryContextService,
+    LibraryScriptureIndexService,
+    LibrarySettingsService,
+)
 from services.epistemic import process_response as epistemic_process, EpistemicResult
 from services.ghm import detect_scripture_content, enforce_ghm, should_challenge_frame, build_ghm_system_prompt
 
@@ -36,6 +42,13 @@ _library_context_service = None
 # Lazy-loaded library settings service
 _library_settings_service = None
 
+# Lazy-loaded scripture reference index over library chunks
+_scripture_index_service = None
+
+# Passage-linked library excerpts injected alongside scripture text
+SCRIPTURE_LIBRARY_PER_REF = 2
+SCRIPTURE_LIBRARY_EXCERPT_CHARS = 600
+
 
 def get_library_settings_service() -> LibrarySettingsService:
     """Get or create library settings service singleton."""
@@ -53,6 +66,14 @@ def get_library_context_service() -> LibraryContextService:
     return _library_context_service
 
 
+def get_scripture_index_service() -> LibraryScriptureIndexService:
+    """Get or create scripture index service singleton."""
+    global _scripture_index_service
+    if _scripture_index_service is None:
+        _scripture_index_service = LibraryScriptureIndexService()
+    return _scripture_index_service
+
+
 def get_reference_service() -> ReferenceService:
     """Get or create reference service singleton."""
     global _reference_service
@@ -61,13 +82,21 @@ def get_reference_service() -> ReferenceService:
     return _reference_service
 
 
-def inject_scripture_context(user_message: str, existing_context: str = "") -> str:
+def inject_scripture_context(
+    user_message: str,
+    existing_context: str = "",
+    project_id: Optional[int] = None,
+) -> str:
     """
     Detect scripture references in user message and inject actual text.
 
+    Also pulls library chunks that cite the same passages via the scripture
+    reference index (indexed lookup, no embedding search).
+
     Args:
         user_message: The user's message to check for references
         existing_context: Existing system prompt context to append to
+        project_id: If set, library excerpts are limited to project refs
 
     Returns:
         Updated context with scripture passages injected
@@ -106,10 +135,14 @@ def inject_scripture_context(user_message: str, existing_context: str = "") -> s
             # Don't fail chat if reference lookup fails
             continue
 
-    if not scripture_blocks:
+    library_blocks = _get_passage_linked_library_blocks(refs, project_id)
+
+    if not scripture_blocks and not library_blocks:
         return existing_context
 
-    scripture_context = """
+    scripture_context = ""
+    if scripture_blocks:
+        scripture_context = """
 [Scripture Context]
 The user's message references the following passages:
 {}
@@ -121,12 +154,56 @@ When discussing these passages:
 [End Scripture Context]
 """.format("\n".join(scripture_blocks))
 
+    if library_blocks:
+        scripture_context += """
+[Library Passages]
+Library sources that cite these passages:
+{}
+[End Library Passages]
+""".format("\n".join(library_blocks))
+
     if existing_context:
         return existing_context + "\n\n" + scripture_context
 
     return scripture_context
 
 
+def _get_passage_linked_library_blocks(refs, project_id: Optional[int] = None) -> list:
+    """Format library chunks citing the given references for prompt injection."""
+    blocks = []
+    seen = set()
+
+    try:
+        index = get_scripture_index_service()
+    except Exception:
+        return blocks
+
+    for parsed in refs:
+        try:
+            hits = index.find_chunks(
+                parsed, project_id=project_id, limit=SCRIPTURE_LIBRARY_PER_REF
+            )
+        except Exception:
+            continue
+
+        for hit in hits:
+            key = (hit.library_file_id, hit.chunk_index)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            excerpt = hit.content or ""
+            if len(excerpt) > SCRIPTURE_LIBRARY_EXCERPT_CHARS:
+                excerpt = excerpt[:SCRIPTURE_LIBRARY_EXCERPT_CHARS] + "..."
+
+            source = hit.filename
+            if hit.page:
+                source += f", p.{hit.page}"
+            blocks.append(f"\n{parsed.normalized} — {source}:\n{excerpt}")
+
+    return blocks
+
+
 def _build_library_context(
     user_message: str,
     project_id: Optional[int],
@@ -564,6 +641,11 @@ def add_message(conversation_id, sender, role, content, epistemic_json=None, ghm
     return mid
 
 
+def insert_system_message(conversation_id, content):
+    """Post a Tamor-authored message into a conversation (task reminders)."""
+    return add_message(conversation_id, "tamor", "assistant", content)
+
+
 def _build_epistemic_context(
     effective_mode: str,
     library_chunks: list = None,
@@ -601,11 +683,12 @@ def _process_epistemic(
         (processed_text, epistemic_metadata_dict)
     """
     try:
-        result = epistemic_process(
-            response_text=response_text,
-            context=epistemic_context,
-            skip_repair=False,
-        )
+        with metrics.span("epistemic"):
+            result = epistemic_process(
+                response_text=response_text,
+                context=epistemic_context,
+                skip_repair=False,
+            )
 
         metadata = {
             "badge": result.metadata.badge,
@@ -722,9 +805,10 @@ def persist_detected_task(
         """
         INSERT INTO detected_tasks (
             user_id, project_id, conversation_id, message_id,
-            task_type, title, confidence, payload_json, normalized_json, status
+            task_type, title, confidence, payload_json, normalized_json, status,
+            scheduled_for
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             user_id,
@@ -737,11 +821,13 @@ def persist_detected_task(
             payload_json,
             normalized_json,
             status,
+            scheduled_for_key(normalized.get("scheduled_for")),
         ),
     )
     task_id = cur.lastrowid
     conn.commit()
     conn.close()
+    notify_task_change()
     return task_id
 
 
@@ -918,6 +1004,79 @@ def _count_project_files(project_id: int, user_id: int) -> DeterministicResult:
         return DeterministicResult.success(f"This project has {count} files.")
 
 
+def build_router_context(
+    user_message: str,
+    conv_id: int,
+    project_id: Optional[int],
+    user_id: Optional[int],
+    effective_mode: str,
+):
+    """
+    Gather the context the agent router sees for one chat turn.
+
+    Memories, scripture, library, project files and GHM framing are each
+    best-effort: a failing source is left empty rather than failing chat.
+    """
+    from services.router import RequestContext as RouterContext
+    import services.memory_service as mem_svc
+
+    # Get memories for context
+    memories = []
+    try:
+        with metrics.span("memory_search"):
+            memories = mem_svc.get_memories_for_context(user_message, user_id, max_memories=5)
+    except Exception:
+        pass
+
+    # Get scripture context if user references passages
+    scripture_ctx = None
+    try:
+        with metrics.span("scripture_context"):
+            scripture_ctx = inject_scripture_context(user_message, project_id=project_id)
+    except Exception:
+        pass
+
+    # Get library context for relevant library content (Phase 7.3)
+    library_ctx = None
+    try:
+        with metrics.span("library_search"):
+            library_ctx = _get_library_context_text(user_message, project_id, user_id)
+    except Exception:
+        pass
+
+    # Get project files context for direct access to project documents
+    project_files_ctx = None
+    try:
+        with metrics.span("project_files"):
+            project_files_ctx = _get_project_files_context(project_id, user_id)
+    except Exception:
+        pass
+
+    # Phase 8.2.7: GHM frame challenge (pre-LLM)
+    ghm_challenge = None
+    try:
+        with metrics.span("ghm_prompt"):
+            ghm_challenge = get_ghm_prompt_addition(user_message, project_id)
+    except Exception:
+        pass
+
+    with metrics.span("history"):
+        history = fetch_chat_history(conv_id, limit=CHAT_HISTORY_LIMIT)
+    return RouterContext(
+        user_message=user_message,
+        conversation_id=conv_id,
+        project_id=project_id,
+        user_id=user_id,
+        history=history,
+        memories=memories,
+        mode=effective_mode,
+        scripture_context=scripture_ctx,
+        library_context=library_ctx,
+        project_files_context=project_files_ctx,
+        ghm_frame_challenge=ghm_challenge,
+    )
+
+
 @chat_bp.get("/mode/<mode_name>")
 @require_login
 def get_mode(mode_name):
@@ -957,14 +1116,16 @@ def chat():
         if sticky:
             effective_mode = sticky
         else:
-            effective_mode, _conf = route_mode(user_message)
+            with metrics.span("mode_routing"):
+                effective_mode, _conf = route_mode(user_message)
             set_conversation_mode(conv_id, effective_mode)
 
     # Timezone from browser (needed to interpret "9am" as 9am local)
     tz_name = (data or {}).get("tz_name")
     tz_offset_minutes = (data or {}).get("tz_offset_minutes")
 
-    detected_raw = classify_task(user_message, tz_name=tz_name, tz_offset_minutes=tz_offset_minutes)
+    with metrics.span("task_detection"):
+        detected_raw = classify_task(user_message, tz_name=tz_name, tz_offset_minutes=tz_offset_minutes)
     detected_tasks = _as_task_list(detected_raw)
 
     normalized_tasks: list[dict] = []
@@ -1043,8 +1204,7 @@ def chat():
     # Phase 6.2: Agent Router - check if multi-agent pipeline should handle this
     router_result = None  # Initialize for fallback path access
     try:
-        from services.router import route_chat, RequestContext as RouterContext
-        import services.memory_service as mem_svc
+        from services.router import route_chat
 
         # Check for debug mode
         include_trace = (
@@ -1052,68 +1212,24 @@ def chat():
             or request.args.get("debug") == "1"
         )
 
-        # Get memories for context
-        memories = []
-        try:
-            memories = mem_svc.get_memories_for_context(user_message, user_id, max_memories=5)
-        except Exception:
-            pass
-
-        # Get scripture context if user references passages
-        scripture_ctx = None
-        try:
-            scripture_ctx = inject_scripture_context(user_message)
-        except Exception:
-            pass
-
-        # Get library context for relevant library content (Phase 7.3)
-        library_ctx = None
-        try:
-            library_ctx = _get_library_context_text(user_message, project_id, user_id)
-        except Exception:
-            pass
-
-        # Get project files context for direct access to project documents
-        project_files_ctx = None
-        try:
-            project_files_ctx = _get_project_files_context(project_id, user_id)
-        except Exception:
-            pass
-
-        # Phase 8.2.7: GHM frame challenge (pre-LLM)
-        ghm_challenge = None
-        try:
-            ghm_challenge = get_ghm_prompt_addition(user_message, project_id)
-        except Exception:
-            pass
-
-        # Build router context
-        history = fetch_chat_history(conv_id, limit=CHAT_HISTORY_LIMIT)
-        router_ctx = RouterContext(
-            user_message=user_message,
-            conversation_id=conv_id,
-            project_id=project_id,
-            user_id=user_id,
-            history=history,
-            memories=memories,
-            mode=effective_mode,
-            scripture_context=scripture_ctx,
-            library_context=library_ctx,
-            project_files_context=project_files_ctx,
-            ghm_frame_challenge=ghm_challenge,
-        )
+        with metrics.span("context"):
+            router_ctx = build_router_context(
+                user_message, conv_id, project_id, user_id, effective_mode
+            )
 
         # Route the request
-        router_result = route_chat(router_ctx, include_trace=include_trace)
+        with metrics.span("agent_router"):
+            router_result = route_chat(router_ctx, include_trace=include_trace)
 
         # If router handled it (not passthrough), return the result
         if router_result.handled_by not in ("llm_single_passthrough", "error"):
             reply_text = router_result.content
 
             # Phase 8.2.7: GHM enforcement
-            reply_text, ghm_metadata, ghm_is_active = apply_ghm_pipeline(
-                user_message, reply_text, project_id
-            )
+            with metrics.span("ghm_enforce"):
+                reply_text, ghm_metadata, ghm_is_active = apply_ghm_pipeline(
+                    user_message, reply_text, project_id
+                )
 
             # Phase 8.2: Epistemic processing
             epistemic_context = _build_epistemic_context(
@@ -1206,7 +1322,8 @@ Capability note (Tamor app):
     # Inject relevant memories into context (Phase 6.1)
     try:
         import services.memory_service as mem_svc
-        memories = mem_svc.get_memories_for_context(user_message, user_id, max_memories=5)
+        with metrics.span("memory_search"):
+            memories = mem_svc.get_memories_for_context(user_message, user_id, max_memories=5)
         memory_context = mem_svc.format_memories_for_prompt(memories)
         if memory_context:
             system_prompt += f"\n\n{memory_context}"
@@ -1215,7 +1332,8 @@ Capability note (Tamor app):
 
     # Inject scripture context (Phase 3.5.5)
     try:
-        scripture_context = inject_scripture_context(user_message)
+        with metrics.span("scripture_context"):
+            scripture_context = inject_scripture_context(user_message, project_id=project_id)
         if scripture_context:
             system_prompt += f"\n\n{scripture_context}"
     except Exception:
@@ -1223,18 +1341,20 @@ Capability note (Tamor app):
 
     # Inject library context (Phase 7.3)
     try:
-        system_prompt = _build_library_context(
-            user_message=user_message,
-            project_id=project_id,
-            existing_system_prompt=system_prompt,
-            user_id=user_id,
-        )
+        with metrics.span("library_search"):
+            system_prompt = _build_library_context(
+                user_message=user_message,
+                project_id=project_id,
+                existing_system_prompt=system_prompt,
+                user_id=user_id,
+            )
     except Exception:
         pass  # Don't fail chat if library context fails
 
     # Inject project files context
     try:
-        project_files_ctx = _get_project_files_context(project_id, user_id)
+        with metrics.span("project_files"):
+            project_files_ctx = _get_project_files_context(project_id, user_id)
         if project_files_ctx:
             system_prompt += f"\n\n{project_files_ctx}"
     except Exception:
@@ -1243,19 +1363,22 @@ Capability note (Tamor app):
     # Phase 8.2.7: GHM frame challenge injection (pre-LLM)
     # Phase 8.2.8: Pass mode for research directive injection
     try:
-        ghm_challenge = get_ghm_prompt_addition(user_message, project_id, mode=effective_mode)
+        with metrics.span("ghm_prompt"):
+            ghm_challenge = get_ghm_prompt_addition(user_message, project_id, mode=effective_mode)
         if ghm_challenge:
             system_prompt += ghm_challenge
     except Exception:
         pass  # Don't fail chat if GHM frame analysis fails
 
-    history = fetch_chat_history(conv_id, limit=CHAT_HISTORY_LIMIT)
+    with metrics.span("history"):
+        history = fetch_chat_history(conv_id, limit=CHAT_HISTORY_LIMIT)
 
     llm = get_llm_client()
-    reply_text = llm.chat_completion(
-        messages=[{"role": "system", "content": system_prompt}, *history, {"role": "user", "content": user_message}],
-        model=get_model_name(),
-    )
+    with metrics.span("llm"):
+        reply_text = llm.chat_completion(
+            messages=[{"role": "system", "content": system_prompt}, *history, {"role": "user", "content": user_message}],
+            model=get_model_name(),
+        )
 
     # Safe cleanup: if already scheduled, strip any confirm/cancel prompting from the LLM text
     if detected_task:
@@ -1315,9 +1438,10 @@ Capability note (Tamor app):
         reply_text = (reply_text or "") + line
 
     # Phase 8.2.7: GHM enforcement
-    reply_text, ghm_metadata, ghm_is_active = apply_ghm_pipeline(
-        user_message, reply_text, project_id
-    )
+    with metrics.span("ghm_enforce"):
+        reply_text, ghm_metadata, ghm_is_active = apply_ghm_pipeline(
+            user_message, reply_text, project_id
+        )
 
     # Phase 8.2: Epistemic processing
     epistemic_context = _build_epistemic_context(
@@ -3,6 +3,7 @@ from flask import Blueprint, jsonify, request
 
 from utils.db import get_db
 from utils.auth import ensure_user
+from services import fulltext_search as fts
 
 conversations_bp = Blueprint("conversations_api", __name__, url_prefix="/api")
 
@@ -267,8 +268,8 @@ def export_conversation(conv_id):
 @conversations_bp.get("/conversations/search")
 def search_conversations():
     """
-    Simple search over conversations (title only) for the current user.
-    Query: /api/conversations/search?q=term
+    Full-text search over conversation titles for the current user.
+    Query: /api/conversations/search?q=term[&limit=20&offset=0]
     """
     user_id, err = ensure_user()
     if err:
@@ -278,22 +279,11 @@ def search_conversations():
     if not query:
         return jsonify({"conversations": []})
 
-    like = f"%{query}%"
-
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT id, title, project_id, mode, created_at, updated_at
-        FROM conversations
-        WHERE user_id = ?
-          AND title LIKE ?
-        ORDER BY updated_at DESC
-        LIMIT 50
-        """,
-        (user_id, like),
+    limit, offset = fts.clamp_page(
+        request.args.get("limit", fts.DEFAULT_PAGE_SIZE),
+        request.args.get("offset", 0),
     )
-    rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
+
+    rows = fts.search_conversation_titles(user_id, query, limit=limit, offset=offset)
 
     return jsonify({"conversations": rows})
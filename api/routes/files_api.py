@@ -1,5 +1,6 @@
 # api/routes/files_api.py
 import os
+import time
 import uuid
 import json
 from typing import Any, Dict, Optional, List
@@ -27,6 +28,9 @@ from services.insights_service import (
     invalidate_insights,
 )
 
+# Background LLM jobs
+from services import llm_job_service as llm_jobs
+
 # File actions service (Phase 5.1)
 from services.file_actions_service import (
     rewrite_file,
@@ -45,6 +49,11 @@ except ImportError:  # still works without this, but PDFs won't be parsed as wel
 
 files_bp = Blueprint("files_api", __name__, url_prefix="/api")
 
+# How long a blocking insights request waits on a job the worker is
+# already running before generating inline
+INSIGHTS_JOB_WAIT_SECONDS = 30
+INSIGHTS_JOB_POLL_SECONDS = 0.5
+
 
 def _get_upload_root():
     """Return the absolute directory where uploaded files are stored."""
@@ -439,20 +448,19 @@ def get_or_extract_file_text_for_row(file_row):
         # Failing to cache should not break the main flow
         pass
 
-    # Phase 4.1: Trigger auto-insights generation (non-blocking)
+    # Phase 4.1: Queue auto-insights generation for the LLM job worker
     try:
-        project_id = file_row.get("project_id")
-        filename = file_row.get("filename", "")
+        row = dict(file_row)
+        project_id = row.get("project_id")
         if project_id and text and len(text.strip()) >= 100:
-            generate_insights(
-                file_id=file_id,
+            llm_jobs.enqueue_job(
+                llm_jobs.JOB_KIND_INSIGHTS,
                 project_id=project_id,
-                text=text,
-                filename=filename,
-                mime_type=mime_type,
+                file_id=file_id,
+                user_id=row.get("user_id"),
             )
     except Exception:
-        # Insights generation failure should not break the main flow
+        # Queueing failure should not break the main flow
         pass
 
     return text, meta, parser
@@ -902,6 +910,17 @@ def _verify_message_belongs_to_user(message_id: int, user_id: int) -> bool:
 # ---------------------------------------------------------------------------
 
 
+def _wait_for_insights_job(job_id: int, file_id: int) -> Optional[Dict[str, Any]]:
+    """Wait for a running insights job; return the cached insights it produced, if any."""
+    deadline = time.monotonic() + INSIGHTS_JOB_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        job = llm_jobs.get_job(job_id)
+        if not job or job["status"] not in ("pending", "processing"):
+            break
+        time.sleep(INSIGHTS_JOB_POLL_SECONDS)
+    return get_cached_insights(file_id)
+
+
 @files_bp.get("/files/<int:file_id>/insights")
 def get_file_insights(file_id: int):
     """
@@ -912,6 +931,13 @@ def get_file_insights(file_id: int):
 
     Query params:
         force=true - Force regeneration even if cached
+        async=true - Queue generation and return 202 with the job to poll
+                     (GET /api/jobs/<id>) instead of blocking on the LLM
+
+    Without async, a job the worker is already running for the file is
+    waited on (up to INSIGHTS_JOB_WAIT_SECONDS) instead of generating a
+    second time; otherwise insights are generated inline, and a queued
+    job then finds them cached.
     """
     user_id, err = ensure_user()
     if err:
@@ -930,6 +956,36 @@ def get_file_insights(file_id: int):
         if cached:
             return jsonify(cached)
 
+    run_async = request.args.get("async", "").lower() == "true"
+    payload = {"force": True} if force else None
+    active_job = llm_jobs.get_active_job(
+        llm_jobs.JOB_KIND_INSIGHTS, file_id=file_id, payload=payload
+    )
+
+    if run_async:
+        if active_job:
+            job = active_job
+        else:
+            queued = llm_jobs.enqueue_job(
+                llm_jobs.JOB_KIND_INSIGHTS,
+                project_id=file_row["project_id"],
+                file_id=file_id,
+                user_id=user_id,
+                payload=payload,
+                priority=1,
+            )
+            job = queued["job"]
+        return jsonify({
+            "file_id": file_id,
+            "insights": None,
+            "job": job,
+        }), 202
+
+    if active_job and active_job["status"] == "processing" and not force:
+        cached = _wait_for_insights_job(active_job["id"], file_id)
+        if cached:
+            return jsonify(cached)
+
     # Try to generate insights
     # First, we need the extracted text
     text, meta, parser = get_or_extract_file_text_for_row(file_row)
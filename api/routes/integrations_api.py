@@ -63,14 +63,16 @@ def zotero_items():
 
     collection_id = request.args.get("collection_id", type=int)
     item_type = request.args.get("type")
-    limit = request.args.get("limit", 100, type=int)
+    limit = min(request.args.get("limit", 100, type=int), 500)  # Cap at 500
+    cursor = request.args.get("cursor", type=int)  # next_cursor of the previous page
 
     try:
         reader = get_zotero_reader()
         items = reader.get_items(
             collection_id=collection_id,
             item_type=item_type,
-            limit=min(limit, 500),  # Cap at 500
+            limit=limit,
+            after_id=cursor,
         )
 
         return jsonify({
@@ -93,6 +95,7 @@ def zotero_items():
                 for item in items
             ],
             "count": len(items),
+            "next_cursor": items[-1].item_id if len(items) == limit else None,
         })
     except FileNotFoundError as e:
         return jsonify({"error": str(e), "available": False}), 404
@@ -0,0 +1,114 @@
+# routes/jobs_api.py
+"""
+Status endpoints for background LLM jobs (file insights, reasoning).
+
+Endpoints that queue work return 202 with a job; clients poll
+GET /api/jobs/<id> until status is 'completed' or 'failed', then re-fetch
+the (now cached) result from the original endpoint.
+"""
+from flask import Blueprint, jsonify, request
+
+from utils.db import get_db
+from utils.auth import ensure_user
+from services import llm_job_service as llm_jobs
+
+jobs_bp = Blueprint("jobs_api", __name__, url_prefix="/api")
+
+
+def _user_owns_project(project_id, user_id) -> bool:
+    if project_id is None:
+        return False
+    conn = get_db()
+    row = conn.execute(
+        "SELECT 1 FROM projects WHERE id = ? AND user_id = ?",
+        (project_id, user_id),
+    ).fetchone()
+    return row is not None
+
+
+def _get_job_for_user(job_id: int, user_id: int):
+    job = llm_jobs.get_job(job_id)
+    if not job:
+        return None
+    if job["user_id"] == user_id or _user_owns_project(job["project_id"], user_id):
+        return job
+    return None
+
+
+@jobs_bp.get("/jobs")
+def list_jobs():
+    """
+    List LLM jobs for the current user.
+
+    Query params:
+        project_id: Restrict to one project
+        status: pending | processing | completed | failed
+        kind: insights | reasoning
+        limit: Max jobs (default: 50, max: 200)
+    """
+    user_id, err = ensure_user()
+    if err:
+        return err
+
+    project_id = request.args.get("project_id", type=int)
+    limit = max(1, min(request.args.get("limit", 50, type=int), 200))
+
+    if project_id is not None:
+        if not _user_owns_project(project_id, user_id):
+            return jsonify({"error": "not_found"}), 404
+        jobs = llm_jobs.list_jobs(
+            project_id=project_id,
+            status=request.args.get("status"),
+            kind=request.args.get("kind"),
+            limit=limit,
+        )
+        stats = llm_jobs.get_queue_stats(project_id)
+    else:
+        jobs = llm_jobs.list_jobs(
+            user_id=user_id,
+            status=request.args.get("status"),
+            kind=request.args.get("kind"),
+            limit=limit,
+        )
+        stats = None
+
+    return jsonify({"jobs": jobs, "stats": stats})
+
+
+@jobs_bp.get("/jobs/stats")
+def job_stats():
+    """Queue statistics across all jobs (for monitoring the worker)."""
+    user_id, err = ensure_user()
+    if err:
+        return err
+    return jsonify(llm_jobs.get_queue_stats())
+
+
+@jobs_bp.get("/jobs/<int:job_id>")
+def get_job(job_id: int):
+    """Get a job's status (poll target for 202 responses)."""
+    user_id, err = ensure_user()
+    if err:
+        return err
+
+    job = _get_job_for_user(job_id, user_id)
+    if not job:
+        return jsonify({"error": "not_found"}), 404
+    return jsonify(job)
+
+
+@jobs_bp.post("/jobs/<int:job_id>/retry")
+def retry_job(job_id: int):
+    """Re-queue a failed job."""
+    user_id, err = ensure_user()
+    if err:
+        return err
+
+    job = _get_job_for_user(job_id, user_id)
+    if not job:
+        return jsonify({"error": "not_found"}), 404
+
+    if not llm_jobs.retry_job(job_id):
+        return jsonify({"error": "not_retryable", "status": job["status"]}), 409
+
+    return jsonify(llm_jobs.get_job(job_id))
@@ -18,6 +18,7 @@ from services.library import (
     LibraryIngestService,
     LibraryReferenceService,
     LibraryScannerService,
+    LibraryScriptureIndexService,
     LibrarySearchService,
     LibraryService,
     LibrarySettingsService,
@@ -30,6 +31,8 @@ from services.library import (
     TRANSCRIBABLE_TYPES,
     IAImportService,
 )
+from services.library.search_service import DEFAULT_KEYWORD_WEIGHT, SEARCH_MODES
+from services.references.reference_parser import parse_reference
 from utils.auth import ensure_user
 from utils.db import get_db
 
@@ -44,6 +47,7 @@ scanner_service = LibraryScannerService()
 ingest_service = LibraryIngestService()
 index_queue_service = LibraryIndexQueueService()
 search_service = LibrarySearchService()
+scripture_index_service = LibraryScriptureIndexService()
 context_service = LibraryContextService()
 settings_service = LibrarySettingsService()
 transcription_service = TranscriptionQueueService()
@@ -808,7 +812,7 @@ def reindex_files():
 @library_bp.get("/api/library/search")
 def search_library():
     """
-    Semantic search across library.
+    Search across library.
 
     Query params:
         q: Search query (required)
@@ -817,6 +821,8 @@ def search_library():
         limit: Max results (default: 10, max: 50)
         min_score: Minimum similarity score 0-1 (default: 0.3)
         file_types: Comma-separated mime type prefixes (e.g., 'application/pdf,application/epub')
+        mode: 'semantic' | 'keyword' | 'hybrid' (default: 'semantic')
+        keyword_weight: Keyword share of hybrid score 0-1 (default: 0.5)
     """
     user_id, err = ensure_user()
     if err:
@@ -852,6 +858,14 @@ def search_library():
     if file_types:
         file_types = [ft.strip() for ft in file_types.split(",")]
 
+    mode = request.args.get("mode", "semantic")
+    if mode not in SEARCH_MODES:
+        return jsonify({"error": "mode must be semantic, keyword, or hybrid"}), 400
+
+    keyword_weight = request.args.get(
+        "keyword_weight", DEFAULT_KEYWORD_WEIGHT, type=float
+    )
+
     try:
         results = search_service.search(
             query=query,
@@ -860,12 +874,15 @@ def search_library():
             limit=limit,
             min_score=min_score,
             file_types=file_types,
+            mode=mode,
+            keyword_weight=keyword_weight,
         )
 
         return jsonify(
             {
                 "query": query,
                 "scope": scope,
+                "mode": mode,
                 "results": [r.to_dict() for r in results],
                 "count": len(results),
             }
@@ -875,6 +892,57 @@ def search_library():
         return jsonify({"error": str(e)}), 500
 
 
+@library_bp.get("/api/library/scripture-refs")
+def search_scripture_refs():
+    """
+    Find library chunks that cite a scripture passage.
+
+    Indexed lookup over extracted references (no embedding search).
+    A query for "Romans 8:28" matches chunks citing Romans 8:26-30 or
+    Romans 8; a chapter query matches any verse within it.
+
+    Query params:
+        ref: Scripture reference, e.g. "Rom 8:28" (required)
+        project_id: Optional, restrict to files referenced by project
+        limit: Max results (default: 10, max: 50)
+    """
+    user_id, err = ensure_user()
+    if err:
+        return err
+
+    ref = request.args.get("ref")
+    if not ref:
+        return jsonify({"error": "ref parameter required"}), 400
+
+    project_id = request.args.get("project_id", type=int)
+    if project_id:
+        conn = get_db()
+        cur = conn.execute(
+            "SELECT id FROM projects WHERE id = ? AND user_id = ?",
+            (project_id, user_id),
+        )
+        if not cur.fetchone():
+            return jsonify({"error": "project not found"}), 404
+
+    limit = min(int(request.args.get("limit", 10)), 50)
+
+    parsed = parse_reference(ref)
+    if not parsed:
+        return jsonify({"error": f"could not parse reference: {ref}"}), 400
+
+    results = scripture_index_service.find_chunks(
+        parsed, project_id=project_id, limit=limit
+    )
+
+    return jsonify(
+        {
+            "ref": parsed.normalized,
+            "results": [r.to_dict() for r in results],
+            "count": len(results),
+        }
+    )
+
+
 @library_bp.get("/api/library/<int:file_id>/search")
 def search_within_file(file_id: int):
     """
@@ -1256,6 +1324,28 @@ def process_transcription_queue():
     return jsonify(result)
 
 
+@library_bp.get("/api/library/transcription/partial/search")
+def search_partial_transcripts():
+    """
+    Keyword search over transcripts that are still being processed.
+
+    Query params:
+        q: Search text
+        limit: Max results (default 20, max 100)
+    """
+    user_id, err = ensure_user()
+    if err:
+        return err
+
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    limit = min(int(request.args.get("limit", 20)), 100)
+
+    results = transcription_service.search_partial_transcripts(query, limit=limit)
+    return jsonify({"query": query, "results": results, "count": len(results)})
+
+
 @library_bp.get("/api/library/<int:file_id>/transcript")
 def get_file_transcript(file_id: int):
     """
@@ -1268,6 +1358,26 @@ def get_file_transcript(file_id: int):
     transcript = library_service.get_transcript_for_source(file_id)
 
     if not transcript:
+        # Still transcribing: serve the windows finished so far
+        partial = transcription_service.get_partial_transcript(file_id)
+        if partial:
+            return jsonify(
+                {
+                    "transcript_id": None,
+                    "source_id": file_id,
+                    "partial": True,
+                    "text": partial["text"],
+                    "segments": partial["segments"],
+                    "metadata": {"language": partial["language"]},
+                    "progress": {
+                        "status": partial["status"],
+                        "windows_done": partial["windows_done"],
+                        "windows_total": partial["windows_total"],
+                        "covered_until": partial["covered_until"],
+                        "duration_seconds": partial["duration_seconds"],
+                    },
+                }
+            )
         return jsonify({"error": "No transcript found"}), 404
 
     # Get the transcript text
@@ -0,0 +1,35 @@
+# routes/metrics_api.py
+"""
+Prometheus-style metrics endpoint.
+
+GET /api/metrics returns the utils.metrics registry in the Prometheus
+text format. 404 unless TAMOR_METRICS=1. If TAMOR_METRICS_TOKEN is set,
+scrapers must send "Authorization: Bearer <token>".
+"""
+import hmac
+import os
+
+from flask import Blueprint, Response, jsonify, request
+
+from utils import metrics
+
+metrics_bp = Blueprint("metrics_api", __name__, url_prefix="/api")
+
+METRICS_TOKEN = os.getenv("TAMOR_METRICS_TOKEN", "")
+
+
+@metrics_bp.get("/metrics")
+def get_metrics():
+    if not metrics.METRICS_ENABLED:
+        return jsonify({"error": "metrics_disabled"}), 404
+
+    if METRICS_TOKEN:
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied, f"Bearer {METRICS_TOKEN}"):
+            return jsonify({"error": "unauthorized"}), 401
+
+    return Response(
+        metrics.render_prometheus(),
+        mimetype="text/plain",
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
@@ -7,7 +7,7 @@ Provides REST API endpoints for managing plugins:
 - List available plugins (importers, exporters, references)
 - Get plugin details and config schema
 - List items available for import
-- Execute imports
+- Execute imports (directly, or as resumable background import runs)
 - Execute exports
 - List and fetch reference items
 - Manage project plugin configurations
@@ -21,11 +21,19 @@ import tempfile
 import uuid
 from typing import Any, Dict, List
 
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, Response, jsonify, request, send_file, stream_with_context
 
 from plugins import ImportItem
 
 from plugins.registry import REGISTRY, load_all_plugins
+from services.plugins.bulk_import import (
+    create_import_run,
+    get_import_run,
+    get_run_items,
+    pause_import_run,
+    run_import,
+    start_import_run,
+)
 from utils.auth import ensure_user
 from utils.db import get_db
 
@@ -252,6 +260,20 @@ def import_plugin_items(plugin_id: str):
                 "summary": {"total": 0, "succeeded": 0, "failed": 0},
             })
 
+        # Copy/extract/insert in batches when the plugin supports it
+        if plugin.supports_bulk_import:
+            run = create_import_run(plugin, project_id, user_id, config, items_to_import)
+            run = run_import(run.id, plugin=plugin)
+            return jsonify({
+                "run_id": run.id,
+                "results": get_run_items(run.id, limit=len(items_to_import)),
+                "summary": {
+                    "total": run.total,
+                    "succeeded": run.succeeded,
+                    "failed": run.failed,
+                },
+            })
+
         # Import each item
         results = []
         succeeded = 0
@@ -312,6 +334,143 @@ def import_plugin_items(plugin_id: str):
         }), 500
 
 
+# ---------------------------------------------------------------------------
+# Import Runs (background, resumable)
+# ---------------------------------------------------------------------------
+
+
+@plugins_bp.post("/plugins/<plugin_id>/import-runs")
+def start_plugin_import_run(plugin_id: str):
+    """
+    Start a background import run.
+
+    Request JSON: same as /plugins/<plugin_id>/import.
+
+    Returns (202):
+        {
+            "run": {"id": 7, "status": "pending", "total": 2000,
+                    "processed": 0, "progress": 0.0, ...}
+        }
+    """
+    user_id, err = ensure_user()
+    if err:
+        return err
+
+    plugin = REGISTRY.get(plugin_id)
+    if not plugin:
+        return jsonify({"error": "plugin_not_found"}), 404
+
+    body = request.json or {}
+    project_id = body.get("project_id")
+    config = body.get("config", {})
+    item_ids = body.get("item_ids")
+
+    if not project_id:
+        return jsonify({"error": "missing_project_id"}), 400
+
+    conn = get_db()
+    try:
+        project = conn.execute(
+            "SELECT id FROM projects WHERE id = ? AND user_id = ?",
+            (project_id, user_id),
+        ).fetchone()
+    finally:
+        conn.close()
+    if not project:
+        return jsonify({"error": "project_not_found"}), 404
+
+    if not plugin.validate_config(config):
+        return jsonify({
+            "error": "invalid_config",
+            "details": "Configuration validation failed.",
+        }), 400
+
+    try:
+        items = plugin.list_items(config)
+        if item_ids:
+            item_ids_set = set(item_ids)
+            items = [i for i in items if i.id in item_ids_set]
+
+        run = create_import_run(plugin, project_id, user_id, config, items)
+        start_import_run(run.id)
+        return jsonify({"run": run.to_dict()}), 202
+
+    except Exception as e:
+        logger.error(f"Error starting import run with plugin {plugin_id}: {e}")
+        return jsonify({
+            "error": "import_failed",
+            "details": str(e),
+        }), 500
+
+
+def _get_user_run(run_id: int, user_id: int):
+    run = get_import_run(run_id)
+    if not run or run.user_id != user_id:
+        return None
+    return run
+
+
+@plugins_bp.get("/plugins/import-runs/<int:run_id>")
+def get_plugin_import_run(run_id: int):
+    """
+    Progress of an import run.
+
+    Query params:
+        items: "all" | "failed" | "done" to include per-item results
+        after: item cursor (the last item "id" seen) for paging items
+        limit: items per page (default 500)
+    """
+    user_id, err = ensure_user()
+    if err:
+        return err
+
+    run = _get_user_run(run_id, user_id)
+    if not run:
+        return jsonify({"error": "run_not_found"}), 404
+
+    response = {"run": run.to_dict()}
+    items = request.args.get("items")
+    if items:
+        page = get_run_items(
+            run_id,
+            status=None if items == "all" else items,
+            after_id=request.args.get("after", 0, type=int),
+            limit=min(request.args.get("limit", 500, type=int), 5000),
+        )
+        response["items"] = page
+        response["next_cursor"] = page[-1]["id"] if page else None
+    return jsonify(response)
+
+
+@plugins_bp.post("/plugins/import-runs/<int:run_id>/resume")
+def resume_plugin_import_run(run_id: int):
+    """Resume a paused, failed or interrupted run from its pending items."""
+    user_id, err = ensure_user()
+    if err:
+        return err
+
+    run = _get_user_run(run_id, user_id)
+    if not run:
+        return jsonify({"error": "run_not_found"}), 404
+
+    run = start_import_run(run_id)
+    return jsonify({"run": run.to_dict()}), 202
+
+
+@plugins_bp.post("/plugins/import-runs/<int:run_id>/pause")
+def pause_plugin_import_run(run_id: int):
+    """Stop a running import after its current batch."""
+    user_id, err = ensure_user()
+    if err:
+        return err
+
+    if not _get_user_run(run_id, user_id):
+        return jsonify({"error": "run_not_found"}), 404
+
+    paused = pause_import_run(run_id)
+    return jsonify({"paused": paused, "run": get_import_run(run_id).to_dict()})
+
+
 # ---------------------------------------------------------------------------
 # Upload and Import (Client-side files)
 # ---------------------------------------------------------------------------
@@ -741,8 +900,12 @@ def export_project(exporter_id: str):
             "filename": "project-export.zip",
             "download_url": "/api/plugins/exporters/zip-download/download/abc123",
             "size_bytes": 12345,
-            "metadata": {...}
+            "metadata": {...},
+            "streamed": false
         }
+
+    Streaming exporters (ZIP, JSON) build nothing here: the download
+    streams the export, so size_bytes is null and metadata has no totals.
     """
     user_id, err = ensure_user()
     if err:
@@ -777,7 +940,13 @@ def export_project(exporter_id: str):
         }), 400
 
     try:
-        result = exporter.export_project(project_id, user_id, config)
+        if exporter.supports_streaming:
+            # Nothing is built here: the download streams the export
+            result = exporter.stream_project(project_id, user_id, config)
+            if result.chunks is not None:
+                result.chunks.close()
+        else:
+            result = exporter.export_project(project_id, user_id, config)
 
         if not result.success:
             return jsonify({
@@ -795,6 +964,8 @@ def export_project(exporter_id: str):
             "user_id": user_id,
             "exporter_id": exporter_id,
         }
+        if exporter.supports_streaming:
+            _export_cache[export_id].update(stream=True, project_id=project_id, config=config)
 
         download_url = f"/api/plugins/exporters/{exporter_id}/download/{export_id}"
 
@@ -806,6 +977,7 @@ def export_project(exporter_id: str):
             "size_bytes": result.size_bytes,
             "mime_type": result.mime_type,
             "metadata": result.metadata,
+            "streamed": exporter.supports_streaming,
         })
 
     except Exception as e:
@@ -821,7 +993,8 @@ def download_export(exporter_id: str, export_id: str):
     """
     Download a generated export file.
 
-    Returns the file as an attachment.
+    Returns the file as an attachment; streaming exporters produce it
+    while it is being sent.
     """
     user_id, err = ensure_user()
     if err:
@@ -840,6 +1013,19 @@ def download_export(exporter_id: str, export_id: str):
     if export_info.get("exporter_id") != exporter_id:
         return jsonify({"error": "exporter_mismatch"}), 400
 
+    if export_info.get("stream"):
+        exporter = REGISTRY.get_exporter(exporter_id)
+        if not exporter:
+            return jsonify({"error": "exporter_not_found"}), 404
+        result = exporter.stream_project(export_info["project_id"], user_id, export_info["config"])
+        if not result.success:
+            return jsonify({"error": "export_failed", "details": result.error}), 404
+        return Response(
+            stream_with_context(result.chunks),
+            mimetype=result.mime_type,
+            headers={"Content-Disposition": f'attachment; filename="{result.filename}"'},
+        )
+
     file_path = export_info.get("path")
     if not file_path or not os.path.exists(file_path):
         return jsonify({"error": "export_file_not_found"}), 404
@@ -6,12 +6,13 @@ from core.config import TMDB_CACHE
 from services.playlists import list_playlist, remove_movie_from_playlist
 from services.tmdb_service import tmdb_lookup_movie
 from services.file_semantic_service import (
+    SEARCH_MODES,
     semantic_search_project_files,
     summarize_project_files,
 )
 from services.knowledge_graph import (
-    extract_symbols_for_project,
     query_symbol,
+    sync_project_symbols,
 )
 from services.embedding_cache import invalidate_cache_for_project
 from services.insights_service import (
@@ -24,9 +25,11 @@ from services.reasoning_service import (
     analyze_file_relationships,
     detect_cross_file_contradictions,
     analyze_logic_flow,
+    get_cached_reasoning,
     get_full_reasoning,
     invalidate_reasoning,
 )
+from services import llm_job_service as llm_jobs
 from services.pipeline_service import (
     get_pipeline,
     start_pipeline,
@@ -273,6 +276,7 @@ def delete_project(project_id):
     invalidate_cache_for_project(project_id)
     invalidate_project_insights(project_id)
     invalidate_reasoning(project_id)
+    llm_jobs.cancel_project_jobs(project_id)
 
     cur.execute(
         """
@@ -386,7 +390,8 @@ def project_files_semantic_search(project_id: int):
     Request JSON:
       {
         "query": "Where do we set the louver spacing?",
-        "top_k": 8   # optional
+        "top_k": 8,          # optional
+        "mode": "hybrid"     # optional: semantic | keyword | hybrid
       }
 
     Response JSON:
@@ -412,6 +417,10 @@ def project_files_semantic_search(project_id: int):
     except (TypeError, ValueError):
         top_k = 8
 
+    mode = data.get("mode") or "semantic"
+    if mode not in SEARCH_MODES:
+        return jsonify({"error": "invalid_mode"}), 400
+
     # Verify project ownership
     conn = get_db()
     cur = conn.cursor()
@@ -431,6 +440,7 @@ def project_files_semantic_search(project_id: int):
             query=query,
             top_k=top_k,
             include_answer=True,
+            mode=mode,
         )
     except Exception as e:
         print("Error during semantic file search:", e)
@@ -510,12 +520,18 @@ def project_summarize(project_id: int):
 def project_knowledge_extract(project_id: int):
     """
     Extract symbols / config keys / parameters from all text-like files
-    in this project and store them in file_symbols.
+    in this project and store them in file_symbols. Files unchanged since
+    the last extraction are skipped.
 
     Response JSON (example):
       {
         "project_id": 1,
-        "symbols_written": 42
+        "symbols_written": 42,       # inserted by this call
+        "symbols_total": 1234,       # stored for the project
+        "files_scanned": 120,
+        "files_changed": 2,
+        "files_unchanged": 118,
+        "files_removed": 0
       }
     """
     user_id, err = ensure_user()
@@ -535,8 +551,7 @@ def project_knowledge_extract(project_id: int):
         return jsonify({"error": "not_found"}), 404
 
     try:
-        # returns an int (total_symbols), not a dict
-        symbols_written = extract_symbols_for_project(
+        stats = sync_project_symbols(
             project_id=project_id,
             user_id=user_id,
         )
@@ -547,12 +562,7 @@ def project_knowledge_extract(project_id: int):
         ), 500
 
     # Build a simple, explicit response
-    return jsonify(
-        {
-            "project_id": project_id,
-            "symbols_written": symbols_written,
-        }
-    )
+    return jsonify({"project_id": project_id, **stats})
 
 
 
@@ -786,6 +796,7 @@ def get_insights_for_project(project_id: int):
             "project_id": project_id,
             "aggregated": True,
             **result,
+            "jobs": llm_jobs.get_queue_stats(project_id),
         })
     else:
         insights_list = get_project_insights(project_id, user_id)
@@ -793,6 +804,7 @@ def get_insights_for_project(project_id: int):
             "project_id": project_id,
             "aggregated": False,
             "files": insights_list,
+            "jobs": llm_jobs.get_queue_stats(project_id),
         })
 
 
@@ -800,6 +812,30 @@ def get_insights_for_project(project_id: int):
 # Multi-File Reasoning (Phase 4.2)
 # ---------------------------------------------------------------------------
 
+# Cache types that make up a full reasoning analysis
+_FULL_REASONING_TYPES = ("relationships", "contradictions", "logic_flow")
+
+
+def _queue_reasoning(project_id: int, user_id: int, analysis: str, force: bool):
+    """
+    Queue a reasoning analysis for the LLM job worker.
+
+    Returns a 202 response with the job to poll (GET /api/jobs/<id>).
+    """
+    queued = llm_jobs.enqueue_job(
+        llm_jobs.JOB_KIND_REASONING,
+        project_id=project_id,
+        user_id=user_id,
+        payload={"analysis": analysis, "force": force},
+        priority=3,
+    )
+    return jsonify({
+        "project_id": project_id,
+        "result": None,
+        "job": queued["job"],
+    }), 202
+
+
 
 @projects_bp.get("/projects/<int:project_id>/reasoning")
 def get_project_reasoning(project_id: int):
@@ -810,6 +846,8 @@ def get_project_reasoning(project_id: int):
 
     Query params:
         force=true - Force regeneration even if cached
+        async=true - On a cache miss, queue the analysis and return 202
+                     with the job to poll instead of blocking on the LLM
     """
     user_id, err = ensure_user()
     if err:
@@ -827,6 +865,11 @@ def get_project_reasoning(project_id: int):
 
     force = request.args.get("force", "").lower() == "true"
 
+    if request.args.get("async", "").lower() == "true":
+        cached = all(get_cached_reasoning(project_id, t) for t in _FULL_REASONING_TYPES)
+        if force or not cached:
+            return _queue_reasoning(project_id, user_id, "full", force)
+
     result = get_full_reasoning(project_id, user_id, force)
     return jsonify(result)
 
@@ -838,6 +881,8 @@ def get_file_relationships(project_id: int):
 
     Query params:
         force=true - Force regeneration even if cached
+        async=true - On a cache miss, queue the analysis and return 202
+                     with the job to poll instead of blocking on the LLM
     """
     user_id, err = ensure_user()
     if err:
@@ -854,6 +899,10 @@ def get_file_relationships(project_id: int):
 
     force = request.args.get("force", "").lower() == "true"
 
+    if request.args.get("async", "").lower() == "true":
+        if force or not get_cached_reasoning(project_id, "relationships"):
+            return _queue_reasoning(project_id, user_id, "relationships", force)
+
     result = analyze_file_relationships(project_id, user_id, force)
     return jsonify({"project_id": project_id, **result})
 
@@ -865,6 +914,8 @@ def get_cross_file_contradictions(project_id: int):
 
     Query params:
         force=true - Force regeneration even if cached
+        async=true - On a cache miss, queue the analysis and return 202
+                     with the job to poll instead of blocking on the LLM
     """
     user_id, err = ensure_user()
     if err:
@@ -881,6 +932,10 @@ def get_cross_file_contradictions(project_id: int):
 
     force = request.args.get("force", "").lower() == "true"
 
+    if request.args.get("async", "").lower() == "true":
+        if force or not get_cached_reasoning(project_id, "contradictions"):
+            return _queue_reasoning(project_id, user_id, "contradictions", force)
+
     result = detect_cross_file_contradictions(project_id, user_id, force)
     return jsonify({"project_id": project_id, **result})
 
@@ -892,6 +947,8 @@ def get_logic_flow_analysis(project_id: int):
 
     Query params:
         force=true - Force regeneration even if cached
+        async=true - On a cache miss, queue the analysis and return 202
+                     with the job to poll instead of blocking on the LLM
     """
     user_id, err = ensure_user()
     if err:
@@ -908,6 +965,10 @@ def get_logic_flow_analysis(project_id: int):
 
     force = request.args.get("force", "").lower() == "true"
 
+    if request.args.get("async", "").lower() == "true":
+        if force or not get_cached_reasoning(project_id, "logic_flow"):
+            return _queue_reasoning(project_id, user_id, "logic_flow", force)
+
     result = analyze_logic_flow(project_id, user_id, force)
     return jsonify({"project_id": project_id, **result})
 
@@ -28,6 +28,7 @@ from services.reader_service import (
     remove_bookmark,
     generate_audio_for_session,
     get_chunk_for_position,
+    get_chunk_for_time,
     get_reading_stats,
     update_session_voice,
 )
@@ -296,17 +297,22 @@ def generate_audio(session_id: int):
 @reader_bp.get("/session/<int:session_id>/chunk")
 def get_chunk(session_id: int):
     """
-    Get chunk info for a character position.
+    Get chunk info for a character position or playback time.
 
     Query params:
         position: int (character position)
+        seconds: float (elapsed audio; used instead of position if given)
 
     Returns chunk info including cached audio if available.
     """
     user_id = get_user_id()
-    position = request.args.get("position", 0, type=int)
+    seconds = request.args.get("seconds", type=float)
 
-    chunk = get_chunk_for_position(session_id, user_id, position)
+    if seconds is not None:
+        chunk = get_chunk_for_time(session_id, user_id, seconds)
+    else:
+        position = request.args.get("position", 0, type=int)
+        chunk = get_chunk_for_position(session_id, user_id, position)
 
     if not chunk:
         return jsonify({"error": "Chunk not found"}), 404
@@ -4,6 +4,7 @@ from flask import Blueprint, jsonify, request
 from utils.db import get_db
 from utils.auth import ensure_user
 from core.memory_core import search_memories
+from services import fulltext_search as fts
 
 search_bp = Blueprint("search_api", __name__, url_prefix="/api")
 
@@ -13,6 +14,14 @@ def global_search():
     """
     Global workspace search.
 
+    Conversations (title + message content) and projects use the FTS5
+    indexes; memories use vector search.
+
+    Query params:
+        q: Search query (required)
+        limit: Page size per section (default: 20, max: 100)
+        offset: Rows to skip per section (default: 0)
+
     Returns:
     {
       "conversations": [...],
@@ -30,81 +39,34 @@ def global_search():
             {"conversations": [], "projects": [], "memories": []}
         )
 
-    like = f"%{query}%"
+    limit, offset = fts.clamp_page(
+        request.args.get("limit", fts.DEFAULT_PAGE_SIZE),
+        request.args.get("offset", 0),
+    )
 
     conn = get_db()
-    cur = conn.cursor()
-
-    # --- Conversation search (title, most recent first) ---
-    cur.execute(
-        """
-        SELECT id, title, project_id, mode, created_at, updated_at
-        FROM conversations
-        WHERE user_id = ?
-          AND title LIKE ?
-        ORDER BY updated_at DESC
-        LIMIT 50
-        """,
-        (user_id, like),
+
+    # --- Conversation search (title, bm25-ranked) ---
+    conversations = fts.search_conversation_titles(
+        user_id, query, limit=limit, offset=offset, conn=conn
     )
-    conversations = [dict(r) for r in cur.fetchall()]
-    title_matched_ids = {c["id"] for c in conversations}
-    for c in conversations:
-        c["match_source"] = "title"
 
     # --- Message content search (exclude title-matched conversations) ---
-    placeholders = ""
-    params = [user_id, like]
-    if title_matched_ids:
-        placeholders = " AND c.id NOT IN ({})".format(
-            ",".join("?" for _ in title_matched_ids)
+    conversations.extend(
+        fts.search_messages(
+            user_id,
+            query,
+            limit=limit,
+            offset=offset,
+            exclude_title_matches=True,
+            conn=conn,
         )
-        params.extend(title_matched_ids)
-
-    cur.execute(
-        f"""
-        SELECT c.id, c.title, c.project_id, c.mode, c.created_at, c.updated_at,
-               m.content AS _match_content
-        FROM messages m
-        JOIN conversations c ON c.id = m.conversation_id
-        WHERE c.user_id = ?
-          AND m.content LIKE ?
-          {placeholders}
-        GROUP BY c.id
-        ORDER BY c.updated_at DESC
-        LIMIT 20
-        """,
-        params,
     )
-    for r in cur.fetchall():
-        row = dict(r)
-        content = row.pop("_match_content", "")
-        # Build a truncated snippet (~150 chars) around the match
-        lower_content = content.lower()
-        idx = lower_content.find(query.lower())
-        if idx >= 0:
-            start = max(0, idx - 40)
-            end = min(len(content), idx + 110)
-            snippet = ("…" if start > 0 else "") + content[start:end].strip() + ("…" if end < len(content) else "")
-        else:
-            snippet = content[:150].strip() + ("…" if len(content) > 150 else "")
-        row["match_source"] = "message"
-        row["match_snippet"] = snippet
-        conversations.append(row)
 
     # --- Project search (name + description) ---
-    cur.execute(
-        """
-        SELECT id, name, description, created_at
-        FROM projects
-        WHERE user_id = ?
-          AND (name LIKE ? OR COALESCE(description, '') LIKE ?)
-        ORDER BY created_at DESC
-        LIMIT 50
-        """,
-        (user_id, like, like),
+    projects = fts.search_projects(
+        user_id, query, limit=limit, offset=offset, conn=conn
     )
-    projects = [dict(r) for r in cur.fetchall()]
 
     conn.close()
 
@@ -125,5 +87,7 @@ def global_search():
             "conversations": conversations,
             "projects": projects,
             "memories": memories,
+            "limit": limit,
+            "offset": offset,
         }
     )
@@ -10,7 +10,7 @@ Phase 8.4: Added /api/system-status for UI indicators.
 import os
 from typing import Dict, Any
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 
 from utils.db import get_db, DB_PATH
 from services.system_status import get_status_dict
@@ -273,12 +273,145 @@ def cleanup_cache():
     """Clean up expired cache entries and old versions."""
     from services.cache.reference_cache import get_reference_cache
 
+    from services.cache.llm_response_cache import get_llm_response_cache
+
     cache = get_reference_cache(get_db())
 
     expired = cache.cleanup_expired()
+    llm_expired = get_llm_response_cache().cleanup_expired()
 
     return jsonify({
         "expired_removed": expired,
+        "llm_expired_removed": llm_expired,
         "stats": cache.get_stats(),
     })
 
+
+# ---------------------------------------------------------------------------
+# LLM Response Cache
+# ---------------------------------------------------------------------------
+
+
+@system_bp.get("/cache/llm/stats")
+def llm_cache_stats():
+    """Get LLM response cache size and hit-rate metrics."""
+    from services.cache.llm_response_cache import get_llm_response_cache
+
+    return jsonify(get_llm_response_cache().get_stats())
+
+
+@system_bp.post("/cache/llm/clear")
+def clear_llm_cache():
+    """Drop all cached LLM responses."""
+    from services.cache.llm_response_cache import get_llm_response_cache
+
+    removed = get_llm_response_cache().clear()
+    return jsonify({"removed": removed})
+
+
+
+# ---------------------------------------------------------------------------
+# Embedding Model Migration
+# ---------------------------------------------------------------------------
+
+
+@system_bp.get("/embeddings/migrations")
+def embedding_migrations():
+    """Active model and migration progress per embedding table."""
+    from services.embedding_migration import migration_status
+
+    return jsonify(migration_status())
+
+
+@system_bp.post("/embeddings/migrations")
+def start_embedding_migration():
+    """
+    Start or resume re-embedding a table in the background.
+
+    Body:
+        table: library_chunks | file_chunks | memories
+        model: target model id (omit to resume)
+        auto_cutover: bool (default true; false waits for /cutover)
+    """
+    from services.embedding_migration import start_migration
+
+    data = request.get_json(silent=True) or {}
+    try:
+        state = start_migration(
+            data.get("table", ""),
+            target_model=data.get("model"),
+            auto_cutover=bool(data.get("auto_cutover", True)),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(state.to_dict()), 202
+
+
+@system_bp.post("/embeddings/migrations/<table>/pause")
+def pause_embedding_migration(table: str):
+    """Stop a table's migration after its current batch (resumable)."""
+    from services.embedding_migration import pause_migration
+
+    return jsonify({"paused": pause_migration(table)})
+
+
+@system_bp.post("/embeddings/migrations/<table>/cutover")
+def cutover_embedding_migration(table: str):
+    """Switch reads to the new model once every row is re-embedded."""
+    from services.embedding_migration import MIGRATABLE_TABLES, cutover, start_migration
+
+    if table not in MIGRATABLE_TABLES:
+        return jsonify({"error": f"unknown table: {table}"}), 400
+
+    conn = get_db()
+    try:
+        switched = cutover(conn, table)
+    finally:
+        conn.close()
+    if not switched:
+        return jsonify({"error": "rows still missing new-model vectors"}), 409
+
+    # Fold the new vectors into the main column
+    state = start_migration(table)
+    return jsonify(state.to_dict())
+
+
+# ---------------------------------------------------------------------------
+# Slow-Query Log
+# ---------------------------------------------------------------------------
+
+
+@system_bp.get("/db/slow-queries")
+def slow_queries():
+    """
+    Statement timings by fingerprint with plans and index suggestions.
+
+    Query params:
+        all: include statements that were never slow (default false)
+        limit: max statements (default 50)
+    """
+    from utils import query_log
+
+    log = query_log.get_query_log()
+    if log is None:
+        return jsonify({"enabled": False, "queries": [], "recommended_indexes": []})
+
+    slow_only = request.args.get("all", "").lower() not in ("1", "true", "yes")
+    limit = request.args.get("limit", 50, type=int)
+    return jsonify({
+        "enabled": True,
+        "threshold_ms": log.threshold * 1000,
+        "queries": log.report(slow_only=slow_only)[:limit],
+        "recommended_indexes": log.recommended_indexes(),
+    })
+
+
+@system_bp.post("/db/slow-queries/reset")
+def reset_slow_queries():
+    """Clear collected statement timings."""
+    from utils import query_log
+
+    log = query_log.get_query_log()
+    if log is not None:
+        log.reset()
+    return jsonify({"reset": log is not None})
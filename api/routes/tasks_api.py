@@ -7,6 +7,7 @@ from flask import Blueprint, jsonify, request
 from utils.db import get_db
 from utils.auth import require_login, get_current_user_id
 from utils.errors import not_found, conflict, invalid_transition as err_invalid_transition
+from utils.task_schedule import notify_task_change, scheduled_for_key
 
 tasks_bp = Blueprint("tasks_api", __name__, url_prefix="/api")
 
@@ -87,6 +88,7 @@ def _update_status_guarded(task_id: int, from_status: str, to_status: str):
         return None
 
     conn.commit()
+    notify_task_change()
 
     cur.execute(
         """
@@ -340,17 +342,23 @@ def edit_task(task_id: int):
             (new_title, task_id, user_id),
         )
 
-    # Update scheduled_for if provided (stored in normalized_json)
+    # Update scheduled_for if provided (normalized_json plus the indexed
+    # column the executor reads)
     if new_scheduled_for is not None:
         normalized = task.get("normalized") or {}
         normalized["scheduled_for"] = new_scheduled_for
 
         cur.execute(
-            "UPDATE detected_tasks SET normalized_json = ? WHERE id = ? AND user_id = ?",
-            (json.dumps(normalized), task_id, user_id),
+            """
+            UPDATE detected_tasks SET normalized_json = ?, scheduled_for = ?
+            WHERE id = ? AND user_id = ?
+            """,
+            (json.dumps(normalized), scheduled_for_key(new_scheduled_for), task_id, user_id),
         )
 
     conn.commit()
+    if new_scheduled_for is not None:
+        notify_task_change()
 
     # Fetch updated task
     cur.execute(
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Backfill the scripture reference index for existing library chunks.
+
+New chunks are indexed at ingest time; this script covers chunks created
+before migration 015. Safe to interrupt and re-run.
+
+Usage:
+    cd api && python -m scripts.backfill_scripture_refs
+    cd api && python -m scripts.backfill_scripture_refs --file-id 42
+    cd api && python -m scripts.backfill_scripture_refs --stats
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.library.scripture_index_service import (
+    BACKFILL_BATCH_SIZE,
+    LibraryScriptureIndexService,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Backfill scripture references for library chunks"
+    )
+    parser.add_argument(
+        "--file-id", type=int, help="Rebuild references for a single library file"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=BACKFILL_BATCH_SIZE,
+        help=f"Chunks per transaction (default: {BACKFILL_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--stats", action="store_true", help="Show index statistics and exit"
+    )
+    args = parser.parse_args()
+
+    index = LibraryScriptureIndexService()
+
+    if args.stats:
+        stats = index.get_stats()
+        print(f"References: {stats['ref_count']}")
+        print(f"Chunks:     {stats['chunk_count']}")
+        print(f"Files:      {stats['file_count']}")
+        return
+
+    if args.file_id:
+        count = index.reindex_file(args.file_id)
+        print(f"File {args.file_id}: {count} reference(s) indexed")
+        return
+
+    def progress(scanned, written):
+        print(f"\r  Scanned {scanned} chunks, {written} references", end="", flush=True)
+
+    print("Backfilling scripture references...")
+    result = index.backfill(batch_size=args.batch_size, progress=progress)
+    print()
+    print(
+        f"Done: {result['chunks_scanned']} chunks scanned, "
+        f"{result['refs_written']} references written"
+    )
+
+
+if __name__ == "__main__":
+    main()
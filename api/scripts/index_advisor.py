@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Summarize a slow-query log and suggest covering indexes.
+
+Reads the JSON lines written with TAMOR_QUERY_LOG=1 and
+TAMOR_QUERY_LOG_FILE set (see utils/query_log.py), groups them by
+fingerprint and prints the statements by total slow time with their
+plans, full scans and index suggestions. --db explains every statement
+again against a database, so indexes added since the log was written
+are taken into account; --sql prints only the CREATE INDEX statements,
+ready to paste into a migration.
+
+Usage:
+    cd api && python -m scripts.index_advisor --log /var/log/tamor/slow.jsonl
+    cd api && python -m scripts.index_advisor --log slow.jsonl --db memory/tamor.db --sql
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.query_log import QueryLog, format_report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Summarize a slow-query log and suggest indexes")
+    parser.add_argument("--log", required=True, help="Slow-query log file (JSON lines)")
+    parser.add_argument("--db", help="Re-explain statements against this database")
+    parser.add_argument("--limit", type=int, default=20, help="Statements to show (default: 20)")
+    parser.add_argument("--sql", action="store_true", help="Print only the recommended CREATE INDEX statements")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.log):
+        print(f"No such log: {args.log}", file=sys.stderr)
+        return 1
+
+    conn = None
+    if args.db:
+        # Read-only: the advisor never changes the database it inspects
+        conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        log = QueryLog.from_file(args.log, conn)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    if args.sql:
+        for entry in log.recommended_indexes():
+            print(entry["sql"])
+    else:
+        print(format_report(log, limit=args.limit))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
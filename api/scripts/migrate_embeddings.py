@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Re-embed a table with a new model in the foreground (migration 023).
+
+Same job the API runs on a background thread (POST
+/api/embeddings/migrations); search keeps using the old vectors until the
+cutover. Safe to interrupt (Ctrl-C) and re-run: progress is checkpointed
+per batch.
+
+Usage:
+    cd api && python -m scripts.migrate_embeddings --status
+    cd api && python -m scripts.migrate_embeddings --table library_chunks --model BAAI/bge-m3
+    cd api && python -m scripts.migrate_embeddings --table memories --model BAAI/bge-m3 --no-auto-cutover
+    cd api && python -m scripts.migrate_embeddings --table memories --cutover
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.embedding_migration import (
+    DUTY_CYCLE,
+    MIGRATABLE_TABLES,
+    MIGRATION_BATCH_SIZE,
+    EmbeddingMigrationJob,
+    Throttle,
+    create_migration,
+    cutover,
+    get_state,
+    migration_status,
+)
+from utils.db import get_db
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed a table with a new embedding model")
+    parser.add_argument("--table", choices=MIGRATABLE_TABLES, help="Table to migrate")
+    parser.add_argument("--model", help="Target model id (omit to resume)")
+    parser.add_argument(
+        "--no-auto-cutover", action="store_true",
+        help="Stop when all rows are re-embedded; switch later with --cutover"
+    )
+    parser.add_argument("--cutover", action="store_true", help="Switch reads to the new model now")
+    parser.add_argument(
+        "--batch-size", type=int, default=MIGRATION_BATCH_SIZE,
+        help=f"Rows per transaction (default: {MIGRATION_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--duty-cycle", type=float, default=DUTY_CYCLE,
+        help=f"Fraction of time spent embedding, 1.0 = no pauses (default: {DUTY_CYCLE})"
+    )
+    parser.add_argument("--status", action="store_true", help="Show migration state and exit")
+    args = parser.parse_args()
+
+    if args.status or not args.table:
+        print(json.dumps(migration_status(), indent=2, default=str))
+        return
+
+    conn = get_db()
+    try:
+        if args.cutover:
+            if not cutover(conn, args.table):
+                print(f"{args.table}: rows still missing new-model vectors; run the migration first")
+                sys.exit(1)
+            print(f"{args.table}: reads switched to {get_state(conn, args.table).target_model}")
+        elif args.model:
+            create_migration(conn, args.table, args.model, auto_cutover=not args.no_auto_cutover)
+        elif get_state(conn, args.table) is None:
+            parser.error("--model is required to start a migration")
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    def progress(state):
+        pct = state.processed / state.total * 100 if state.total else 100
+        print(f"\r  {state.processed}/{state.total} rows ({pct:.1f}%)", end="", flush=True)
+
+    stop = threading.Event()
+    job = EmbeddingMigrationJob(
+        args.table,
+        batch_size=args.batch_size,
+        throttle=Throttle(duty_cycle=args.duty_cycle),
+        stop=stop,
+        progress=progress,
+    )
+    try:
+        state = job.run()
+    except KeyboardInterrupt:
+        stop.set()
+        print("\nInterrupted; re-run to resume")
+        return
+    print()
+    print(f"{args.table}: {state.status} ({state.source_model} -> {state.target_model})")
+
+
+if __name__ == "__main__":
+    main()
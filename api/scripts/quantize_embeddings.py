@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Convert an embedding table to float16 or int8 storage (migration 022).
+
+Writers start encoding new rows as soon as the setting is recorded, and
+the backfill commits in batches, so this is safe to run on a live
+database, to interrupt and to re-run. Dropping the float32 column shrinks
+the table but disables the exact re-rank; run VACUUM afterwards to return
+the freed pages to the filesystem.
+
+Usage:
+    cd api && python -m scripts.quantize_embeddings --stats
+    cd api && python -m scripts.quantize_embeddings --table library_chunks --dtype int8
+    cd api && python -m scripts.quantize_embeddings --table memories --dtype float16 --drop-float32 --vacuum
+    cd api && python -m scripts.quantize_embeddings --table library_chunks --revert
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.embedding_quant import (
+    DEFAULT_RERANK,
+    DTYPES,
+    QUANTIZABLE_TABLES,
+    QUANTIZE_BATCH_SIZE,
+    dequantize_table,
+    get_setting,
+    quantize_table,
+    table_stats,
+)
+from utils.db import get_db
+
+
+def print_stats(conn):
+    print(f"{'table':<16}{'mode':<18}{'rows':>10}{'float32 MB':>12}{'quant MB':>10}")
+    for table in QUANTIZABLE_TABLES:
+        stats = table_stats(conn, table)
+        setting = get_setting(conn, table)
+        mode = "float32"
+        if setting:
+            mode = setting.dtype + ("" if setting.keep_float32 else " only")
+        print(
+            f"{table:<16}{mode:<18}{stats['rows']:>10}"
+            f"{stats['float32_bytes'] / 1e6:>12.1f}{stats['quantized_bytes'] / 1e6:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Quantize stored embeddings to float16 or int8"
+    )
+    parser.add_argument("--table", choices=QUANTIZABLE_TABLES, help="Table to convert")
+    parser.add_argument("--dtype", choices=DTYPES, help="Quantized storage type")
+    parser.add_argument(
+        "--drop-float32", action="store_true",
+        help="Clear the float32 column after encoding (no exact re-rank)"
+    )
+    parser.add_argument(
+        "--rerank", type=int, default=DEFAULT_RERANK,
+        help=f"Top candidates re-scored in float32, 0 to disable (default: {DEFAULT_RERANK})"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=QUANTIZE_BATCH_SIZE,
+        help=f"Rows per transaction (default: {QUANTIZE_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--revert", action="store_true",
+        help="Return the table to float32 only (lossy where float32 was dropped)"
+    )
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the database afterwards")
+    parser.add_argument("--stats", action="store_true", help="Show storage per table and exit")
+    args = parser.parse_args()
+
+    conn = get_db()
+    try:
+        if args.stats or not args.table:
+            print_stats(conn)
+            return
+
+        if args.revert:
+            restored = dequantize_table(conn, args.table, batch_size=args.batch_size)
+            print(f"{args.table}: float32 only, {restored} row(s) restored from quantized values")
+        else:
+            if not args.dtype:
+                parser.error("--dtype is required unless --revert or --stats is given")
+
+            def progress(written):
+                print(f"\r  Encoded {written} rows", end="", flush=True)
+
+            print(f"Quantizing {args.table} to {args.dtype}...")
+            written = quantize_table(
+                conn,
+                args.table,
+                args.dtype,
+                keep_float32=not args.drop_float32,
+                rerank=args.rerank,
+                batch_size=args.batch_size,
+                progress=progress,
+            )
+            print()
+            print(f"Done: {written} rows encoded")
+
+        if args.vacuum:
+            print("Vacuuming...")
+            conn.execute("VACUUM")
+
+        print()
+        print_stats(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+LLM Job Worker Runner
+
+Runs the LLM job worker as a background service.
+Processes queued file insights and reasoning jobs continuously.
+
+Usage:
+    python -m scripts.run_llm_job_worker [--interval SECONDS]
+
+Options:
+    --interval    Poll interval when queue is empty (default: 5)
+    --once        Process one job and exit
+    --batch N     Process N jobs and exit
+    --stats       Show queue statistics and exit
+"""
+
+import sys
+import os
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.llm_job_service import get_queue_stats
+from workers.llm_job_worker import LLMJobWorker
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run LLM job worker')
+    parser.add_argument(
+        '--interval',
+        type=int,
+        default=5,
+        help='Poll interval in seconds when queue is empty (default: 5)'
+    )
+    parser.add_argument(
+        '--once',
+        action='store_true',
+        help='Process one job and exit'
+    )
+    parser.add_argument(
+        '--batch',
+        type=int,
+        default=0,
+        help='Process N jobs and exit'
+    )
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='Show queue statistics and exit'
+    )
+
+    args = parser.parse_args()
+
+    if args.stats:
+        stats = get_queue_stats()
+        for key in ('pending', 'processing', 'completed', 'failed', 'total'):
+            print(f"{key.capitalize():<11} {stats[key]}")
+        return
+
+    worker = LLMJobWorker()
+
+    if args.once:
+        result = worker.process_next()
+        if result:
+            print(f"Result: {result}")
+        else:
+            print("Queue empty")
+        return
+
+    if args.batch > 0:
+        result = worker.process_batch(count=args.batch)
+        print(f"Processed: {result['processed']}, Success: {result['success']}, Failed: {result['failed']}")
+        return
+
+    # Run continuously
+    worker.run_continuous(poll_interval=args.interval)
+
+
+if __name__ == '__main__':
+    main()
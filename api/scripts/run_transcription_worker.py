@@ -6,10 +6,13 @@ Runs the transcription worker as a background service.
 Processes the transcription queue continuously.
 
 Usage:
-    python -m scripts.run_transcription_worker [--interval SECONDS]
+    python -m scripts.run_transcription_worker [--interval SECONDS] [--workers N]
 
 Options:
-    --interval    Poll interval when queue is empty (default: 30)
+    --interval        Poll interval when queue is empty (default: 30)
+    --workers         Queue items transcribed at once (default: TRANSCRIPTION_WORKERS or 1)
+    --window-workers  Windows of one item transcribed at once
+                      (default: TRANSCRIPTION_WINDOW_WORKERS or 2)
 """
 
 import sys
@@ -19,7 +22,11 @@ import argparse
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.library.transcription_worker import TranscriptionWorker
+from services.library.transcription_worker import (
+    POOL_SIZE,
+    WINDOW_WORKERS,
+    TranscriptionWorker,
+)
 
 
 def main():
@@ -42,9 +49,22 @@ def main():
         help='Process N items and exit'
     )
 
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=POOL_SIZE,
+        help=f'Queue items transcribed at once (default: {POOL_SIZE})'
+    )
+    parser.add_argument(
+        '--window-workers',
+        type=int,
+        default=WINDOW_WORKERS,
+        help=f'Windows of one item transcribed at once (default: {WINDOW_WORKERS})'
+    )
+
     args = parser.parse_args()
 
-    worker = TranscriptionWorker()
+    worker = TranscriptionWorker(window_workers=args.window_workers)
 
     if args.once:
         result = worker.process_next()
@@ -60,7 +80,7 @@ def main():
         return
 
     # Run continuously
-    worker.run_continuous(poll_interval=args.interval)
+    worker.run_continuous(poll_interval=args.interval, workers=args.workers)
 
 
 if __name__ == '__main__':
@@ -8,6 +8,7 @@ Usage:
     python3 run_transcriptions.py --max-hours 8    # Run for max 8 hours
     python3 run_transcriptions.py --max-count 50   # Process max 50 files
     python3 run_transcriptions.py --max-hours 6 --max-count 100  # Either limit
+    python3 run_transcriptions.py --window-workers 4   # Windows transcribed in parallel
 """
 
 import sys
@@ -20,6 +21,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.library import TranscriptionWorker, TranscriptionQueueService
+from services.library.transcription_worker import WINDOW_WORKERS
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Process transcription queue')
@@ -27,6 +29,8 @@ def parse_args():
                         help='Maximum hours to run (0 = unlimited)')
     parser.add_argument('--max-count', type=int, default=0,
                         help='Maximum files to process (0 = unlimited)')
+    parser.add_argument('--window-workers', type=int, default=WINDOW_WORKERS,
+                        help=f'Windows of one file transcribed at once (default {WINDOW_WORKERS})')
     return parser.parse_args()
 
 def format_time(seconds):
@@ -56,7 +60,7 @@ def main():
     max_seconds = args.max_hours * 3600 if args.max_hours > 0 else float('inf')
     max_count = args.max_count if args.max_count > 0 else float('inf')
 
-    worker = TranscriptionWorker()
+    worker = TranscriptionWorker(window_workers=args.window_workers)
     queue = TranscriptionQueueService()
 
     # Get initial stats
@@ -90,7 +94,7 @@ def main():
             stop_reason = f"count limit ({args.max_count})"
             break
 
-        item = queue.get_next_pending()
+        item = worker.claim_next()
         if not item:
             break
 
@@ -51,6 +51,8 @@ from routes.system_api import system_bp
 from routes.integrations_api import integrations_bp
 from routes.reader_api import reader_bp
 from routes.harvest_api import harvest_bp
+from routes.jobs_api import jobs_bp
+from routes.metrics_api import metrics_bp
 
 
 
@@ -72,6 +74,12 @@ app.register_blueprint(system_bp)
 app.register_blueprint(integrations_bp)
 app.register_blueprint(reader_bp)
 app.register_blueprint(harvest_bp)
+app.register_blueprint(jobs_bp)
+app.register_blueprint(metrics_bp)
+
+# Request timing hooks (no-op unless TAMOR_METRICS=1)
+from utils import metrics
+metrics.init_app(app)
 
 
 
@@ -24,12 +24,14 @@ Usage:
 """
 
 import os
+import re
 import subprocess
 import logging
 from pathlib import Path
-from typing import Dict, Any, List, Callable
+from typing import Dict, Any, List, Callable, Optional
 
 from services.llm_service import ToolDefinition
+from services.agents.repo_index import IGNORED_NAMES, get_repo_index
 
 logger = logging.getLogger(__name__)
 
@@ -169,6 +171,7 @@ def tool_write_file(
         # Create parent directories if needed
         resolved.parent.mkdir(parents=True, exist_ok=True)
         resolved.write_text(content, encoding="utf-8")
+        get_repo_index(str(sandbox.working_dir)).update_path(str(resolved))
         return f"OK: Wrote {len(content)} bytes to {path}"
     except OSError as e:
         return f"ERROR: {e}"
@@ -220,6 +223,7 @@ def tool_patch_file(
     except OSError as e:
         return f"ERROR: Failed to write file: {e}"
 
+    get_repo_index(str(sandbox.working_dir)).update_path(str(resolved))
     return f"OK: Patched {path} ({len(old_str)} chars → {len(new_str)} chars)"
 
 
@@ -228,7 +232,13 @@ def tool_list_directory(
     sandbox: PathSandbox,
     max_depth: int = 2,
 ) -> str:
-    """List files and directories, respecting depth and common ignores."""
+    """
+    List files and directories, respecting depth and common ignores.
+
+    Paths inside working_dir are served from the repository index (which
+    also honours .gitignore); --allow-read paths and ignored directories
+    are walked directly.
+    """
     try:
         resolved = sandbox.validate_read(path)
     except ValueError as e:
@@ -239,12 +249,14 @@ def tool_list_directory(
     if not resolved.is_dir():
         return f"ERROR: Not a directory: {path}"
 
-    # Common directories to ignore
-    IGNORE = {
-        ".git", "node_modules", "__pycache__", ".venv",
-        "venv", ".pytest_cache", ".mypy_cache", "dist", "build",
-        ".tox", ".eggs", "*.egg-info", ".coverage", "htmlcov",
-    }
+    try:
+        rel_dir = resolved.relative_to(sandbox.working_dir).as_posix()
+    except ValueError:
+        rel_dir = None
+    if rel_dir is not None:
+        lines = get_repo_index(str(sandbox.working_dir)).listing(rel_dir, max_depth)
+        if lines is not None:
+            return "\n".join(lines) if lines else "(empty directory)"
 
     lines = []
 
@@ -262,7 +274,7 @@ def tool_list_directory(
 
         for entry in entries:
             # Skip ignored directories and hidden files
-            if entry.name in IGNORE or entry.name.startswith("."):
+            if entry.name in IGNORED_NAMES or entry.name.startswith("."):
                 continue
             if entry.is_dir():
                 lines.append(f"{prefix}{entry.name}/")
@@ -274,6 +286,46 @@ def tool_list_directory(
     return "\n".join(lines) if lines else "(empty directory)"
 
 
+def tool_search_code(
+    query: str,
+    sandbox: PathSandbox,
+    regex: bool = False,
+    case_sensitive: bool = True,
+    path: str = ".",
+    glob: Optional[str] = None,
+    max_results: int = 100,
+) -> str:
+    """Search file contents in working_dir for a literal string or regex."""
+    if not query:
+        return "ERROR: Empty query"
+    try:
+        resolved = sandbox.validate_read(path)
+        rel_dir = resolved.relative_to(sandbox.working_dir).as_posix()
+    except ValueError:
+        return f"ERROR: search_code only searches inside the working directory: {path}"
+
+    max_results = max(1, min(max_results, 500))
+    try:
+        matches, searched = get_repo_index(str(sandbox.working_dir)).search(
+            query,
+            regex=regex,
+            case_sensitive=case_sensitive,
+            path=rel_dir,
+            glob=glob,
+            max_results=max_results,
+        )
+    except re.error as e:
+        return f"ERROR: Invalid regex: {e}"
+
+    if not matches:
+        return f"No matches ({searched} files searched)"
+
+    lines = [f"{rel}:{line_no}: {line[:300]}" for rel, line_no, line in matches]
+    if len(matches) >= max_results:
+        lines.append(f"[truncated at {max_results} matches]")
+    return "\n".join(lines)
+
+
 def tool_run_command(
     command: str,
     working_dir: str,
@@ -282,6 +334,8 @@ def tool_run_command(
     """Execute a shell command and return stdout + stderr."""
     # Enforce maximum timeout
     timeout = min(timeout, 120)
+    # The command may change files behind the index's back
+    get_repo_index(working_dir).mark_stale()
 
     try:
         result = subprocess.run(
@@ -434,6 +488,44 @@ TOOL_DEFINITIONS: List[ToolDefinition] = [
             "required": ["path"],
         },
     ),
+    ToolDefinition(
+        name="search_code",
+        description=(
+            "Search file contents in the project for a literal string or "
+            "regex. Returns path:line: text for each matching line. "
+            "Skips .gitignore'd files. Prefer this over grep via run_command."
+        ),
+        parameters={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Text to find (a Python regex if regex=true)",
+                },
+                "regex": {
+                    "type": "boolean",
+                    "description": "Treat query as a regular expression (default: false)",
+                },
+                "case_sensitive": {
+                    "type": "boolean",
+                    "description": "Match case exactly (default: true)",
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Directory to search, relative to project root (default: '.')",
+                },
+                "glob": {
+                    "type": "string",
+                    "description": "Only search files matching this glob, e.g. '*.py'",
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum matching lines to return (default 100, max 500)",
+                },
+            },
+            "required": ["query"],
+        },
+    ),
     ToolDefinition(
         name="run_command",
         description=(
@@ -540,6 +632,15 @@ def build_tool_dispatch(
             sandbox,
             args.get("max_depth", 2),
         ),
+        "search_code": lambda args: tool_search_code(
+            args["query"],
+            sandbox,
+            args.get("regex", False),
+            args.get("case_sensitive", True),
+            args.get("path", "."),
+            args.get("glob"),
+            args.get("max_results", 100),
+        ),
         "run_command": lambda args: tool_run_command(
             args["command"],
             working_dir,
@@ -0,0 +1,636 @@
+# api/services/agents/repo_index.py
+"""
+Repository index for the Code Agent's file tools.
+
+Kept per working directory, in memory:
+- the file tree (size / mtime per file, mtime per directory), skipping
+  the same names as list_directory plus anything matched by .gitignore
+- a trigram index over the contents of text files, so search_code only
+  reads the files that can contain the query
+
+Keeping it fresh: write_file / patch_file update the entry for the file
+they touched, run_command and the git tools mark the index stale, and a
+stale index (or one not checked for REPO_INDEX_SWEEP_SECONDS) is brought
+up to date by a stat sweep. The sweep re-lists only directories whose
+mtime changed and re-indexes only files whose size or mtime changed.
+
+Trigrams are taken from ASCII-lowercased bytes, so one index serves
+case-sensitive and case-insensitive searches; candidates are always
+verified against the real text. Postings live in sorted numpy arrays
+(trigram -> file ids); files changed since the last build sit in a
+small delta that is merged in once it grows.
+
+Usage:
+    from services.agents.repo_index import get_repo_index
+
+    index = get_repo_index("/home/user/project")
+    print("\\n".join(index.listing("src", max_depth=2)))
+    matches, searched = index.search("def main")
+"""
+
+import fnmatch
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:  # Python 3.11+
+    from re import _constants as _sre_constants, _parser as _sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants as _sre_constants
+    import sre_parse as _sre_parse
+
+logger = logging.getLogger(__name__)
+
+# Names never listed or indexed (globs allowed); hidden entries are skipped too
+IGNORED_NAMES = {
+    ".git", "node_modules", "__pycache__", ".venv",
+    "venv", ".pytest_cache", ".mypy_cache", "dist", "build",
+    ".tox", ".eggs", "*.egg-info", ".coverage", "htmlcov",
+}
+
+# Larger text files are listed and searched, but not trigram-indexed
+REPO_INDEX_MAX_FILE_BYTES = int(os.getenv("REPO_INDEX_MAX_FILE_BYTES", str(1024 * 1024)))
+
+# An index not marked stale is re-checked at most this often
+REPO_INDEX_SWEEP_SECONDS = float(os.getenv("REPO_INDEX_SWEEP_SECONDS", "2.0"))
+
+# Changed files kept in the delta before postings are rebuilt
+REPO_INDEX_DELTA_FILES = int(os.getenv("REPO_INDEX_DELTA_FILES", "512"))
+
+_BINARY_SNIFF_BYTES = 8192
+_EMPTY_IDS = np.zeros(0, dtype=np.int32)
+
+_IGNORED_EXACT = {n for n in IGNORED_NAMES if not any(c in n for c in "*?[")}
+_IGNORED_GLOBS = [n for n in IGNORED_NAMES if n not in _IGNORED_EXACT]
+
+
+def _trigrams(data: bytes) -> np.ndarray:
+    """Unique trigram codes (b0 << 16 | b1 << 8 | b2) of a byte string."""
+    if len(data) < 3:
+        return np.zeros(0, dtype=np.uint32)
+    b = np.frombuffer(data, dtype=np.uint8).astype(np.uint32)
+    return np.unique((b[:-2] << 16) | (b[1:-1] << 8) | b[2:])
+
+
+def _needle_trigrams(needles: Iterable[str], ignore_case: bool) -> np.ndarray:
+    """Trigrams every match must contain, from literal strings it must contain."""
+    codes = []
+    for needle in needles:
+        data = needle.encode("utf-8").lower()
+        # The index only folds ASCII case; other bytes can't be relied on
+        runs = re.split(rb"[\x80-\xff]+", data) if ignore_case else [data]
+        codes.extend(_trigrams(run) for run in runs)
+    return np.unique(np.concatenate(codes)) if codes else np.zeros(0, dtype=np.uint32)
+
+
+def _required_literals(pattern: str, flags: int = 0) -> Tuple[List[str], bool]:
+    """
+    Literal runs any match of a regex must contain, and whether it ignores case.
+
+    Conservative: only literals in the top-level sequence (and groups or
+    one-or-more repeats inside it) count; alternation yields nothing.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except Exception:
+        return [], bool(flags & re.IGNORECASE)
+
+    runs: List[str] = []
+    current: List[str] = []
+
+    def flush():
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    def walk(seq):
+        for op, av in seq:
+            if op is _sre_constants.LITERAL:
+                current.append(chr(av))
+            elif op is _sre_constants.SUBPATTERN and not av[1] and not av[2]:
+                walk(av[3])
+            elif op in (_sre_constants.MAX_REPEAT, _sre_constants.MIN_REPEAT):
+                flush()
+                if av[0] >= 1:
+                    walk(av[2])
+                flush()
+            else:
+                flush()
+
+    walk(parsed)
+    flush()
+    ignore_case = bool(parsed.state.flags & _sre_constants.SRE_FLAG_IGNORECASE)
+    return runs, ignore_case
+
+
+# ---------------------------------------------------------------------------
+# .gitignore
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _IgnoreRule:
+    regex: re.Pattern
+    negate: bool
+    dir_only: bool
+    anchored: bool
+
+
+def _glob_to_regex(glob: str) -> str:
+    out = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = glob.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_gitignore(text: str) -> List[_IgnoreRule]:
+    """Rules from a .gitignore file, in order."""
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        line = line.lstrip("/")
+        try:
+            regex = re.compile(_glob_to_regex(line) + r"\Z")
+        except re.error:
+            continue
+        rules.append(_IgnoreRule(regex, negate, dir_only, anchored))
+    return rules
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _File:
+    id: int
+    size: int
+    mtime_ns: int
+    kind: str  # "text" (indexed), "large" (text, not indexed) or "binary"
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def _parent(rel: str) -> str:
+    return rel.rsplit("/", 1)[0] if "/" in rel else ""
+
+
+class RepoIndex:
+    """File tree and trigram index for one working directory."""
+
+    def __init__(self, root: str):
+        self.root = os.path.realpath(root)
+        self._lock = threading.RLock()
+        self._built = False
+        self._stale = True
+        self._checked_at = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._files: Dict[str, _File] = {}
+        self._paths: List[Optional[str]] = []
+        self._dirs: Dict[str, int] = {}                    # rel dir -> mtime_ns
+        self._children: Dict[str, Dict[str, bool]] = {}    # rel dir -> {name: is_dir}
+        self._rules: Dict[str, List[_IgnoreRule]] = {}     # rel dir -> its .gitignore rules
+        self._gitignores: Dict[str, int] = {}              # rel .gitignore path -> mtime_ns
+        self._delta: Dict[int, np.ndarray] = {}            # file id -> trigrams, not yet in postings
+        self._large: Set[int] = set()
+        self._codes = np.zeros(0, dtype=np.uint32)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._postings = _EMPTY_IDS
+        self._dead = np.zeros(0, dtype=bool)               # file ids whose postings are out of date
+
+    # -- freshness ----------------------------------------------------------
+
+    def mark_stale(self) -> None:
+        """Something outside the file tools may have changed the tree."""
+        self._stale = True
+
+    def ensure_fresh(self) -> None:
+        with self._lock:
+            if not self._built:
+                self.rebuild()
+            elif self._stale or time.monotonic() - self._checked_at >= REPO_INDEX_SWEEP_SECONDS:
+                self._sweep()
+
+    def rebuild(self) -> None:
+        """Walk the whole tree and index every file."""
+        with self._lock:
+            started = time.perf_counter()
+            self._reset()
+            self._walk("")
+            self._compact()
+            self._built = True
+            self._stale = False
+            self._checked_at = time.monotonic()
+            logger.info(
+                f"Indexed {len(self._files)} files in {self.root} "
+                f"({time.perf_counter() - started:.2f}s)"
+            )
+
+    def _sweep(self) -> None:
+        for rel, mtime_ns in list(self._gitignores.items()):
+            try:
+                changed = os.stat(os.path.join(self.root, rel)).st_mtime_ns != mtime_ns
+            except OSError:
+                changed = True
+            if changed:
+                self.rebuild()
+                return
+
+        for rel_dir, mtime_ns in list(self._dirs.items()):
+            if rel_dir not in self._dirs:
+                continue  # dropped with a parent
+            try:
+                st = os.stat(os.path.join(self.root, rel_dir))
+            except OSError:
+                self._drop_dir(rel_dir)
+                continue
+            if st.st_mtime_ns != mtime_ns:
+                if not self._rescan_dir(rel_dir, st.st_mtime_ns):
+                    self.rebuild()
+                    return
+
+        for rel, entry in list(self._files.items()):
+            try:
+                st = os.stat(os.path.join(self.root, rel))
+            except OSError:
+                self._drop_file(rel)
+                continue
+            if st.st_size != entry.size or st.st_mtime_ns != entry.mtime_ns:
+                self._index_file(rel, st)
+
+        if len(self._delta) > max(REPO_INDEX_DELTA_FILES, len(self._files) // 10):
+            self._compact()
+        self._stale = False
+        self._checked_at = time.monotonic()
+
+    def update_path(self, path: str) -> None:
+        """Re-index one file after the agent wrote it."""
+        rel = os.path.relpath(os.path.realpath(path), self.root).replace(os.sep, "/")
+        if rel.startswith("../") or rel in (".", ".."):
+            return
+        with self._lock:
+            if not self._built:
+                return  # the first use walks everything anyway
+            parts = rel.split("/")
+            for i in range(1, len(parts) + 1):
+                if self._ignored("/".join(parts[:i]), parts[i - 1], is_dir=i < len(parts)):
+                    return
+            try:
+                st = os.stat(os.path.join(self.root, rel))
+            except OSError:
+                self._drop_file(rel)
+                return
+            # New parent directories (write_file creates them)
+            for i in range(1, len(parts)):
+                rel_dir = "/".join(parts[:i])
+                if rel_dir not in self._dirs:
+                    self._children.setdefault(_parent(rel_dir), {})[parts[i - 1]] = True
+                    self._dirs[rel_dir] = 0  # next sweep lists it
+                    self._children[rel_dir] = {}
+            self._children.setdefault(_parent(rel), {})[parts[-1]] = False
+            self._index_file(rel, st)
+
+    # -- tree ---------------------------------------------------------------
+
+    def _ignored(self, rel: str, name: str, is_dir: bool) -> bool:
+        if name.startswith(".") or name in _IGNORED_EXACT:
+            return True
+        if any(fnmatch.fnmatch(name, g) for g in _IGNORED_GLOBS):
+            return True
+        ignored = False
+        base = ""
+        parts = rel.split("/")
+        for depth in range(len(parts)):
+            rules = self._rules.get(base)
+            if rules:
+                sub = "/".join(parts[depth:])
+                for rule in rules:
+                    if rule.dir_only and not is_dir:
+                        continue
+                    if rule.regex.match(sub if rule.anchored else name):
+                        ignored = not rule.negate
+            base = _join(base, parts[depth])
+        return ignored
+
+    def _load_rules(self, rel_dir: str) -> None:
+        rel = _join(rel_dir, ".gitignore")
+        path = os.path.join(self.root, rel)
+        try:
+            st = os.stat(path)
+            with open(path, encoding="utf-8", errors="replace") as f:
+                self._rules[rel_dir] = parse_gitignore(f.read())
+            self._gitignores[rel] = st.st_mtime_ns
+        except OSError:
+            pass
+
+    def _walk(self, rel_dir: str) -> None:
+        path = os.path.join(self.root, rel_dir)
+        try:
+            self._dirs[rel_dir] = os.stat(path).st_mtime_ns
+            entries = list(os.scandir(path))
+        except OSError:
+            self._dirs.pop(rel_dir, None)
+            return
+        if any(e.name == ".gitignore" for e in entries):
+            self._load_rules(rel_dir)
+
+        children = self._children.setdefault(rel_dir, {})
+        for entry in entries:
+            self._add_entry(rel_dir, entry, children)
+
+    def _add_entry(self, rel_dir: str, entry: os.DirEntry, children: Dict[str, bool]) -> None:
+        rel = _join(rel_dir, entry.name)
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            return
+        if self._ignored(rel, entry.name, is_dir):
+            return
+        children[entry.name] = is_dir
+        if is_dir:
+            if not entry.is_symlink():
+                self._walk(rel)
+        else:
+            try:
+                st = entry.stat()
+            except OSError:
+                return
+            self._index_file(rel, st)
+
+    def _rescan_dir(self, rel_dir: str, mtime_ns: int) -> bool:
+        """Pick up added / removed entries; False if a .gitignore appeared."""
+        path = os.path.join(self.root, rel_dir)
+        try:
+            entries = {e.name: e for e in os.scandir(path)}
+        except OSError:
+            self._drop_dir(rel_dir)
+            return True
+        if ".gitignore" in entries and _join(rel_dir, ".gitignore") not in self._gitignores:
+            return False
+
+        self._dirs[rel_dir] = mtime_ns
+        children = self._children.setdefault(rel_dir, {})
+        for name in list(children):
+            if name not in entries:
+                rel = _join(rel_dir, name)
+                if children.pop(name):
+                    self._drop_dir(rel)
+                else:
+                    self._drop_file(rel)
+        for name, entry in entries.items():
+            if name not in children:
+                self._add_entry(rel_dir, entry, children)
+        return True
+
+    def _drop_dir(self, rel_dir: str) -> None:
+        prefix = rel_dir + "/"
+        for rel in [r for r in self._files if r.startswith(prefix)]:
+            self._drop_file(rel)
+        for d in [d for d in self._dirs if d == rel_dir or d.startswith(prefix)]:
+            self._dirs.pop(d, None)
+            self._children.pop(d, None)
+            self._rules.pop(d, None)
+        self._children.get(_parent(rel_dir), {}).pop(rel_dir.rsplit("/", 1)[-1], None)
+
+    # -- content ------------------------------------------------------------
+
+    def _index_file(self, rel: str, st: os.stat_result) -> None:
+        entry = self._files.get(rel)
+        if entry:
+            file_id = entry.id
+            self._forget_content(file_id)
+        else:
+            file_id = len(self._paths)
+            self._paths.append(rel)
+
+        kind = "binary"
+        path = os.path.join(self.root, rel)
+        try:
+            with open(path, "rb") as f:
+                if st.st_size <= REPO_INDEX_MAX_FILE_BYTES:
+                    data = f.read()
+                    if b"\0" not in data[:_BINARY_SNIFF_BYTES]:
+                        kind = "text"
+                        self._delta[file_id] = _trigrams(data.lower())
+                elif b"\0" not in f.read(_BINARY_SNIFF_BYTES):
+                    kind = "large"
+                    self._large.add(file_id)
+        except OSError:
+            pass
+        self._files[rel] = _File(file_id, st.st_size, st.st_mtime_ns, kind)
+
+    def _forget_content(self, file_id: int) -> None:
+        if file_id < len(self._dead):
+            self._dead[file_id] = True
+        self._delta.pop(file_id, None)
+        self._large.discard(file_id)
+
+    def _drop_file(self, rel: str) -> None:
+        entry = self._files.pop(rel, None)
+        if entry:
+            self._forget_content(entry.id)
+            self._paths[entry.id] = None
+        self._children.get(_parent(rel), {}).pop(rel.rsplit("/", 1)[-1], None)
+
+    def _compact(self) -> None:
+        """Merge the delta into the postings arrays."""
+        counts = np.diff(self._offsets)
+        base_codes = np.repeat(self._codes, counts)
+        keep = ~self._dead[self._postings] if len(self._postings) else np.zeros(0, dtype=bool)
+        code_parts = [base_codes[keep]]
+        id_parts = [self._postings[keep]]
+        for file_id, codes in self._delta.items():
+            code_parts.append(codes)
+            id_parts.append(np.full(len(codes), file_id, dtype=np.int32))
+
+        codes = np.concatenate(code_parts)
+        ids = np.concatenate(id_parts)
+        order = np.lexsort((ids, codes))
+        codes, ids = codes[order], ids[order]
+        self._codes, starts = np.unique(codes, return_index=True)
+        self._offsets = np.append(starts, len(codes)).astype(np.int64)
+        self._postings = ids
+        self._dead = np.zeros(len(self._paths), dtype=bool)
+        self._delta = {}
+
+    def _candidates(self, codes: np.ndarray) -> List[int]:
+        """File ids that may contain every trigram (all text files if none)."""
+        if len(codes) == 0:
+            return [e.id for e in self._files.values() if e.kind != "binary"]
+
+        postings = []
+        positions = np.searchsorted(self._codes, codes)
+        for code, pos in zip(codes, positions):
+            if pos < len(self._codes) and self._codes[pos] == code:
+                postings.append(self._postings[self._offsets[pos]:self._offsets[pos + 1]])
+            else:
+                postings.append(_EMPTY_IDS)
+        postings.sort(key=len)
+        ids = postings[0]
+        for other in postings[1:]:
+            if len(ids) == 0:
+                break
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        if len(ids):
+            ids = ids[~self._dead[ids]]
+
+        found = ids.tolist()
+        found.extend(fid for fid, fc in self._delta.items() if np.isin(codes, fc, assume_unique=True).all())
+        found.extend(self._large)
+        return found
+
+    # -- queries ------------------------------------------------------------
+
+    def listing(self, rel_dir: str = "", max_depth: int = 2) -> Optional[List[str]]:
+        """
+        Lines of list_directory output for a directory under the root.
+
+        None if the directory is not in the index (ignored, or gone).
+        """
+        self.ensure_fresh()
+        rel_dir = "" if rel_dir in (".", "") else rel_dir.strip("/")
+        lines: List[str] = []
+        with self._lock:
+            if rel_dir not in self._children:
+                return None
+
+            def walk(d: str, depth: int, prefix: str):
+                if depth > max_depth:
+                    return
+                children = self._children.get(d, {})
+                for name, is_dir in sorted(children.items(), key=lambda e: (not e[1], e[0].lower())):
+                    if is_dir:
+                        lines.append(f"{prefix}{name}/")
+                        walk(_join(d, name), depth + 1, prefix + "  ")
+                    else:
+                        lines.append(f"{prefix}{name}")
+
+            walk(rel_dir, 0, "")
+        return lines
+
+    def search(
+        self,
+        query: str,
+        regex: bool = False,
+        case_sensitive: bool = True,
+        path: str = "",
+        glob: Optional[str] = None,
+        max_results: int = 100,
+    ) -> Tuple[List[Tuple[str, int, str]], int]:
+        """
+        Find lines matching a literal string or regex.
+
+        Returns ([(path, line_number, line), ...], files_searched).
+        Raises re.error for an invalid pattern.
+        """
+        flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+        pattern = re.compile(query if regex else re.escape(query), flags)
+        if regex:
+            needles, ignore_case = _required_literals(query, flags)
+        else:
+            needles, ignore_case = [query], not case_sensitive
+
+        self.ensure_fresh()
+        prefix = "" if path in (".", "") else path.strip("/") + "/"
+        with self._lock:
+            ids = self._candidates(_needle_trigrams(needles, ignore_case))
+            paths = sorted(
+                p for p in (self._paths[i] for i in ids)
+                if p is not None and p.startswith(prefix)
+                and (not glob or fnmatch.fnmatch(p, glob) or fnmatch.fnmatch(p.rsplit("/", 1)[-1], glob))
+            )
+
+        matches: List[Tuple[str, int, str]] = []
+        for rel in paths:
+            try:
+                with open(os.path.join(self.root, rel), "rb") as f:
+                    text = f.read().decode("utf-8", errors="replace")
+            except OSError:
+                continue
+            line_no, counted_to, last_line = 1, 0, -1
+            for m in pattern.finditer(text):
+                line_no += text.count("\n", counted_to, m.start())
+                counted_to = m.start()
+                if line_no == last_line:
+                    continue
+                last_line = line_no
+                start = text.rfind("\n", 0, m.start()) + 1
+                end = text.find("\n", m.start())
+                matches.append((rel, line_no, text[start:end if end != -1 else len(text)]))
+                if len(matches) >= max_results:
+                    return matches, len(paths)
+        return matches, len(paths)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "directories": len(self._dirs),
+                "indexed_files": sum(1 for e in self._files.values() if e.kind == "text"),
+                "trigrams": len(self._codes),
+                "postings": len(self._postings),
+                "delta_files": len(self._delta),
+            }
+
+
+_indexes: Dict[str, RepoIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_repo_index(root: str) -> RepoIndex:
+    """The shared index for a working directory (built on first use)."""
+    key = os.path.realpath(root)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = RepoIndex(key)
+        return index
@@ -21,6 +21,7 @@ from typing import Any, Dict, List, Optional
 from .base import BaseAgent, AgentOutput, Citation, RequestContext
 from services.llm_service import get_agent_llm
 from services.ghm import get_research_directives_prompt
+from services.library.scripture_index_service import LibraryScriptureIndexService
 from services.library.search_service import LibrarySearchService
 
 logger = logging.getLogger(__name__)
@@ -342,6 +343,9 @@ Analyze these sources and provide structured research notes in JSON format."""
             except Exception as e:
                 logger.warning(f"Library search failed: {e}")
 
+        # Chunks that cite passages named in the question (indexed lookup)
+        library_results = self._merge_passage_linked_chunks(ctx, library_results)
+
         # Load Scholar mode persona from modes.json
         system_prompt = self._load_scholar_persona()
 
@@ -420,6 +424,44 @@ Use the library sources above where relevant. Cite them by filename when drawing
                 processing_ms=int((time.time() - start_time) * 1000),
             )
 
+    def _merge_passage_linked_chunks(self, ctx: RequestContext, results: List) -> List:
+        """Prepend library chunks citing scripture referenced in the question.
+
+        Uses the scripture reference index rather than embedding search, so
+        chunks that discuss a passage by reference are found even when they
+        score poorly on semantic similarity. Duplicates are dropped.
+        """
+        try:
+            linked = LibraryScriptureIndexService().find_chunks_for_text(
+                ctx.user_message, project_id=ctx.project_id, max_refs=3, per_ref=3
+            )
+        except Exception as e:
+            logger.warning(f"Scripture reference lookup failed: {e}")
+            return results
+
+        if not linked:
+            return results
+
+        def _key(r):
+            if hasattr(r, "library_file_id"):
+                return (r.library_file_id, r.chunk_index)
+            return (r.get("library_file_id") or r.get("file_id"), r.get("chunk_index"))
+
+        seen = {_key(r) for r in results}
+        passage_results = []
+        for hits in linked.values():
+            for hit in hits:
+                key = (hit.library_file_id, hit.chunk_index)
+                if key in seen:
+                    continue
+                seen.add(key)
+                passage_results.append(hit.to_dict())
+
+        if passage_results:
+            logger.info(f"Added {len(passage_results)} passage-linked library chunks")
+
+        return passage_results + list(results)
+
     def _format_library_sources(self, results) -> str:
         """Format library search results as numbered sources for the prompt.
 
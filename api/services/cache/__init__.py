@@ -3,9 +3,20 @@ Cache Services
 
 Phase 6.4: Plugin Framework Expansion
 
-Services for caching external content with version tracking.
+Services for caching external content with version tracking,
+content-addressed caching of deterministic LLM responses, and TMDb
+metadata for playlists.
 """
 
+from .llm_response_cache import LLMResponseCache, get_llm_response_cache
 from .reference_cache import ReferenceCache, get_reference_cache
+from .tmdb_cache import TMDbCache, get_tmdb_cache
 
-__all__ = ["ReferenceCache", "get_reference_cache"]
+__all__ = [
+    "LLMResponseCache",
+    "ReferenceCache",
+    "TMDbCache",
+    "get_llm_response_cache",
+    "get_reference_cache",
+    "get_tmdb_cache",
+]
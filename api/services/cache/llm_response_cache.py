@@ -0,0 +1,313 @@
+"""
+LLM Response Cache
+
+Content-addressed cache for deterministic LLM calls. The key is a hash of
+(provider, model, messages, parameters), so any change to the prompt or
+its inputs is a miss and unchanged inputs are a hit, regardless of which
+service made the call.
+
+Opt-in per call site via LLMProvider.cached_chat_completion() (and
+OllamaProvider.cached_generate()); plain chat_completion() never caches.
+
+- TTL per entry (LLM_CACHE_TTL_HOURS, overridable per call)
+- Size-bounded LRU eviction (LLM_CACHE_MAX_ENTRIES / LLM_CACHE_MAX_BYTES)
+- Hit/miss metrics per process, hit counts per entry
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Next value of the LRU counter (migration 029); bumped on every put and hit
+_NEXT_SEQ_SQL = "(SELECT COALESCE(MAX(last_used_seq), 0) + 1 FROM llm_response_cache)"
+
+DEFAULT_TTL_HOURS = int(os.getenv("LLM_CACHE_TTL_HOURS", "168"))  # 7 days
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+DEFAULT_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Transport-only kwargs that never change the response
+NON_KEY_PARAMS = frozenset({"timeout"})
+
+
+def _jsonable(value: Any) -> Any:
+    """json.dumps fallback for dataclasses (ToolDefinition) and other objects."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+def make_cache_key(
+    provider: str,
+    model: Optional[str],
+    messages: List[Dict[str, Any]],
+    operation: str = "chat",
+    **params: Any,
+) -> str:
+    """
+    Hash a request into a cache key.
+
+    Args:
+        provider: Provider name (class name)
+        model: Resolved model identifier
+        messages: Chat messages (or a single user message for generate)
+        operation: 'chat' or 'generate'
+        **params: Sampling parameters, tools, etc.
+    """
+    canonical = json.dumps(
+        {
+            "op": operation,
+            "provider": provider,
+            "model": model,
+            "messages": messages,
+            "params": {k: v for k, v in params.items() if k not in NON_KEY_PARAMS},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=_jsonable,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed LRU cache of LLM responses."""
+
+    def __init__(
+        self,
+        ttl_hours: int = DEFAULT_TTL_HOURS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.ttl_hours = ttl_hours
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+
+    # =========================================================================
+    # GET / PUT
+    # =========================================================================
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None if absent/expired."""
+        conn = get_db()
+        try:
+            row = conn.execute(
+                """
+                SELECT response FROM llm_response_cache
+                WHERE cache_key = ?
+                  AND (expires_at IS NULL OR expires_at > datetime('now'))
+                """,
+                (key,),
+            ).fetchone()
+            if row:
+                conn.execute(
+                    f"""
+                    UPDATE llm_response_cache
+                    SET hit_count = hit_count + 1, last_used_at = datetime('now'),
+                        last_used_seq = {_NEXT_SEQ_SQL}
+                    WHERE cache_key = ?
+                    """,
+                    (key,),
+                )
+                conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            if row:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        return row["response"] if row else None
+
+    def put(
+        self,
+        key: str,
+        response: str,
+        provider: str,
+        model: Optional[str],
+        ttl_hours: Optional[int] = None,
+    ) -> None:
+        """Store a response, then evict least-recently-used entries over the bounds."""
+        ttl = self.ttl_hours if ttl_hours is None else ttl_hours
+        expires_sql = "datetime('now', ?)" if ttl and ttl > 0 else "NULL"
+        params: List[Any] = [key, provider, model, response, len(response.encode("utf-8"))]
+        if ttl and ttl > 0:
+            params.append(f"+{int(ttl)} hours")
+
+        conn = get_db()
+        try:
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO llm_response_cache
+                    (cache_key, provider, model, response, size_bytes, expires_at,
+                     last_used_seq)
+                VALUES (?, ?, ?, ?, ?, {expires_sql}, {_NEXT_SEQ_SQL})
+                """,
+                params,
+            )
+            conn.commit()
+            evicted = self._evict(conn)
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._stores += 1
+            self._evictions += evicted
+
+    def _evict(self, conn) -> int:
+        """Drop expired rows, then LRU rows until within max_entries/max_bytes."""
+        cur = conn.execute(
+            "DELETE FROM llm_response_cache WHERE expires_at IS NOT NULL AND expires_at <= datetime('now')"
+        )
+        evicted = cur.rowcount
+
+        row = conn.execute(
+            "SELECT COUNT(*) AS n, COALESCE(SUM(size_bytes), 0) AS bytes FROM llm_response_cache"
+        ).fetchone()
+        over_entries = max(0, row["n"] - self.max_entries)
+        over_bytes = max(0, row["bytes"] - self.max_bytes)
+
+        if over_entries or over_bytes:
+            victims = []
+            freed = 0
+            for victim in conn.execute(
+                """
+                SELECT cache_key, size_bytes FROM llm_response_cache
+                ORDER BY last_used_seq ASC, last_used_at ASC, rowid ASC
+                """
+            ):
+                if len(victims) >= over_entries and freed >= over_bytes:
+                    break
+                victims.append((victim["cache_key"],))
+                freed += victim["size_bytes"]
+            conn.executemany("DELETE FROM llm_response_cache WHERE cache_key = ?", victims)
+            evicted += len(victims)
+
+        conn.commit()
+        return evicted
+
+    def get_or_call(
+        self,
+        key: str,
+        call: Callable[[], str],
+        provider: str,
+        model: Optional[str],
+        ttl_hours: Optional[int] = None,
+        refresh: bool = False,
+    ) -> str:
+        """
+        Return the cached response or run `call` and cache its result.
+
+        With refresh=True the lookup is skipped and the entry overwritten.
+        """
+        cached = None
+        if not refresh:
+            try:
+                cached = self.get(key)
+            except Exception as e:
+                # A broken cache must never break the LLM call
+                logger.warning(f"LLM cache read failed: {e}")
+        if cached is not None:
+            return cached
+
+        response = call()
+
+        # Empty responses are usually failures; don't pin them
+        if response:
+            try:
+                self.put(key, response, provider, model, ttl_hours)
+            except Exception as e:
+                logger.warning(f"LLM cache write failed: {e}")
+
+        return response
+
+    # =========================================================================
+    # MAINTENANCE / METRICS
+    # =========================================================================
+
+    def cleanup_expired(self) -> int:
+        """Remove expired entries."""
+        conn = get_db()
+        try:
+            cur = conn.execute(
+                "DELETE FROM llm_response_cache WHERE expires_at IS NOT NULL AND expires_at <= datetime('now')"
+            )
+            conn.commit()
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def clear(self) -> int:
+        """Remove all entries."""
+        conn = get_db()
+        try:
+            cur = conn.execute("DELETE FROM llm_response_cache")
+            conn.commit()
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Process hit-rate metrics plus stored-entry totals."""
+        conn = get_db()
+        try:
+            row = conn.execute(
+                """
+                SELECT COUNT(*) AS entries,
+                       COALESCE(SUM(size_bytes), 0) AS total_bytes,
+                       COALESCE(SUM(hit_count), 0) AS lifetime_hits
+                FROM llm_response_cache
+                """
+            ).fetchone()
+            by_provider = {
+                r["provider"]: {"entries": r["entries"], "hits": r["hits"]}
+                for r in conn.execute(
+                    """
+                    SELECT provider, COUNT(*) AS entries, SUM(hit_count) AS hits
+                    FROM llm_response_cache GROUP BY provider
+                    """
+                )
+            }
+        finally:
+            conn.close()
+
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": row["entries"],
+                "total_bytes": row["total_bytes"],
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_hours": self.ttl_hours,
+                "lifetime_hits": row["lifetime_hits"],
+                "by_provider": by_provider,
+                "hits": self._hits,
+                "misses": self._misses,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0,
+            }
+
+
+_llm_cache_instance: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Get the process-wide LLM response cache."""
+    global _llm_cache_instance
+    if _llm_cache_instance is None:
+        _llm_cache_instance = LLMResponseCache()
+    return _llm_cache_instance
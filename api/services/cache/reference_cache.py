@@ -52,15 +52,9 @@ class ReferenceCache:
             }
         return None
 
-    def get_if_fresh(
-        self, url: str, max_age_hours: int = 24
-    ) -> Optional[Dict[str, Any]]:
-        """Get cached content only if not expired."""
-        cached = self.get(url)
-
-        if not cached:
-            return None
-
+    @staticmethod
+    def is_fresh(cached: Dict[str, Any], max_age_hours: float = 24) -> bool:
+        """Whether a cached entry was fetched within max_age_hours."""
         fetched_str = cached["fetched_at"]
         if fetched_str:
             try:
@@ -72,13 +66,42 @@ class ReferenceCache:
             except ValueError:
                 fetched = datetime.now()
 
-            age = datetime.now() - fetched
+            age = datetime.now() - fetched.replace(tzinfo=None)
 
             if age > timedelta(hours=max_age_hours):
-                return None
+                return False
+
+        return True
+
+    def get_if_fresh(
+        self, url: str, max_age_hours: int = 24
+    ) -> Optional[Dict[str, Any]]:
+        """Get cached content only if not expired."""
+        cached = self.get(url)
+
+        if not cached or not self.is_fresh(cached, max_age_hours):
+            return None
 
         return cached
 
+    def touch(self, entry_id: int, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Mark an entry as just fetched (e.g. after a 304 Not Modified),
+        optionally replacing its metadata.
+        """
+        cur = self.db.cursor()
+        if metadata is None:
+            cur.execute(
+                "UPDATE reference_cache SET fetched_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), entry_id),
+            )
+        else:
+            cur.execute(
+                "UPDATE reference_cache SET fetched_at = ?, metadata = ? WHERE id = ?",
+                (datetime.now().isoformat(), json.dumps(metadata), entry_id),
+            )
+        self.db.commit()
+
     def put(
         self,
         url: str,
@@ -99,12 +122,8 @@ class ReferenceCache:
         existing = cur.fetchone()
 
         if existing:
-            # Content unchanged, just update fetched_at
-            cur.execute(
-                "UPDATE reference_cache SET fetched_at = ? WHERE id = ?",
-                (datetime.now().isoformat(), existing[0]),
-            )
-            self.db.commit()
+            # Content unchanged, just update fetched_at (and metadata if given)
+            self.touch(existing[0], metadata)
             return {
                 "id": existing[0],
                 "url": existing[1],
@@ -127,16 +146,17 @@ class ReferenceCache:
         if ttl_hours:
             expires_at = (datetime.now() + timedelta(hours=ttl_hours)).isoformat()
 
-        # Insert new version
+        # Insert new version (fetched_at in local time, like get_if_fresh)
         cur.execute(
             """INSERT INTO reference_cache
-               (url, content_hash, content, content_type, version, expires_at, metadata)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+               (url, content_hash, content, content_type, fetched_at, version, expires_at, metadata)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
             (
                 url,
                 content_hash,
                 content,
                 content_type,
+                datetime.now().isoformat(),
                 new_version,
                 expires_at,
                 json.dumps(metadata or {}),
@@ -0,0 +1,210 @@
+"""
+TMDb Metadata Cache
+
+SQLite-backed cache for TMDb movie lookups used by playlist enrichment.
+Each get/set touches one row by primary key, instead of re-reading and
+rewriting a JSON file of the whole cache.
+
+- TTL per entry (TMDB_CACHE_TTL_DAYS); expired entries are refetched,
+  and still served as a fallback when TMDb fails
+- One-time import of the legacy JSON cache files
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from utils.db import get_db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_DAYS = int(os.getenv("TMDB_CACHE_TTL_DAYS", "30"))
+
+
+class TMDbCache:
+    """Key/value cache of TMDb lookup results (key: IMDb id or 'q:<query>')."""
+
+    def __init__(self, ttl_days: int = DEFAULT_TTL_DAYS):
+        self.ttl_days = ttl_days
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._imported: set = set()
+
+    # =========================================================================
+    # GET / SET
+    # =========================================================================
+
+    def get(self, key: str, include_expired: bool = False) -> Optional[Dict[str, Any]]:
+        """Return the cached info for a key, or None if absent (or expired)."""
+        if not key:
+            return None
+
+        conn = get_db()
+        try:
+            row = conn.execute(
+                """
+                SELECT info_json,
+                       expires_at IS NOT NULL AND expires_at <= datetime('now') AS expired
+                FROM tmdb_cache WHERE cache_key = ?
+                """,
+                (key,),
+            ).fetchone()
+        finally:
+            conn.close()
+
+        hit = row is not None and (include_expired or not row["expired"])
+        if not include_expired:
+            with self._lock:
+                if hit:
+                    self._hits += 1
+                else:
+                    self._misses += 1
+
+        return json.loads(row["info_json"]) if hit else None
+
+    def set(self, key: str, info: Dict[str, Any], ttl_days: Optional[int] = None) -> None:
+        """Store (or refresh) an entry."""
+        if not key or not isinstance(info, dict):
+            return
+
+        ttl = self.ttl_days if ttl_days is None else ttl_days
+        expires_sql = "datetime('now', ?)" if ttl and ttl > 0 else "NULL"
+        params = [key, json.dumps(info, ensure_ascii=False)]
+        if ttl and ttl > 0:
+            params.append(f"+{int(ttl)} days")
+
+        conn = get_db()
+        try:
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO tmdb_cache (cache_key, info_json, fetched_at, expires_at)
+                VALUES (?, ?, datetime('now'), {expires_sql})
+                """,
+                params,
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def delete(self, key: str) -> bool:
+        """Drop an entry so the next lookup refetches it."""
+        conn = get_db()
+        try:
+            cur = conn.execute("DELETE FROM tmdb_cache WHERE cache_key = ?", (key,))
+            conn.commit()
+            return cur.rowcount > 0
+        finally:
+            conn.close()
+
+    # =========================================================================
+    # LEGACY IMPORT
+    # =========================================================================
+
+    def import_legacy(self, paths: Iterable[str]) -> int:
+        """
+        Import old JSON cache files ({key: info}) once each.
+
+        Existing rows win over imported ones. Imported entries get the
+        normal TTL, so they are refreshed in due course. Returns the number
+        of entries imported by this call.
+        """
+        imported = 0
+        for path in paths:
+            if not path or path in self._imported:
+                continue
+            self._imported.add(path)
+
+            conn = get_db()
+            try:
+                if conn.execute(
+                    "SELECT 1 FROM tmdb_cache_imports WHERE source_path = ?", (path,)
+                ).fetchone():
+                    continue
+                if not os.path.exists(path):
+                    continue
+
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f) or {}
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable TMDb cache {path}: {e}")
+                    data = {}
+
+                rows = [
+                    (key, json.dumps(info, ensure_ascii=False))
+                    for key, info in (data.items() if isinstance(data, dict) else [])
+                    if key and isinstance(info, dict)
+                ]
+                expires = f"+{int(self.ttl_days)} days" if self.ttl_days and self.ttl_days > 0 else None
+                conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO tmdb_cache (cache_key, info_json, expires_at)
+                    VALUES (?, ?, datetime('now', ?))
+                    """,
+                    [(key, info, expires) for key, info in rows],
+                )
+                conn.execute(
+                    "INSERT INTO tmdb_cache_imports (source_path, entries) VALUES (?, ?)",
+                    (path, len(rows)),
+                )
+                conn.commit()
+                imported += len(rows)
+                logger.info(f"Imported {len(rows)} TMDb cache entries from {path}")
+            finally:
+                conn.close()
+
+        return imported
+
+    # =========================================================================
+    # MAINTENANCE / METRICS
+    # =========================================================================
+
+    def cleanup_expired(self) -> int:
+        """Remove expired entries."""
+        conn = get_db()
+        try:
+            cur = conn.execute(
+                "DELETE FROM tmdb_cache WHERE expires_at IS NOT NULL AND expires_at <= datetime('now')"
+            )
+            conn.commit()
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        conn = get_db()
+        try:
+            row = conn.execute(
+                """
+                SELECT COUNT(*) AS entries,
+                       COALESCE(SUM(expires_at IS NOT NULL AND expires_at <= datetime('now')), 0) AS expired
+                FROM tmdb_cache
+                """
+            ).fetchone()
+        finally:
+            conn.close()
+
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": row["entries"],
+                "expired": row["expired"],
+                "ttl_days": self.ttl_days,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0,
+            }
+
+
+_tmdb_cache_instance: Optional[TMDbCache] = None
+
+
+def get_tmdb_cache() -> TMDbCache:
+    """Get the process-wide TMDb cache."""
+    global _tmdb_cache_instance
+    if _tmdb_cache_instance is None:
+        _tmdb_cache_instance = TMDbCache()
+    return _tmdb_cache_instance
@@ -11,7 +11,8 @@ from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 
 from utils.db import get_db
-from core.memory_core import embed_many
+from services.embedding_migration import active_model, embed_for_table, vector_columns, vector_dim
+from services.embedding_quant import encode_for_table, get_setting, load_embedding
 from routes.files_api import get_or_extract_file_text_for_row
 
 
@@ -83,8 +84,8 @@ def get_cached_chunks_for_file(file_id: int) -> Optional[List[Dict[str, Any]]]:
     """
     conn = get_db()
     cur = conn.execute(
-        """
-        SELECT chunk_index, content, embedding
+        f"""
+        SELECT chunk_index, content, {vector_columns(conn, "file_chunks")}
         FROM file_chunks
         WHERE file_id = ?
         ORDER BY chunk_index ASC
@@ -98,8 +99,7 @@ def get_cached_chunks_for_file(file_id: int) -> Optional[List[Dict[str, Any]]]:
 
     chunks = []
     for row in rows:
-        emb_blob = row["embedding"]
-        emb_array = np.frombuffer(emb_blob, dtype=np.float32)
+        emb_array = load_embedding(row["embedding"], row["embedding_q"])
         chunks.append({
             "chunk_index": row["chunk_index"],
             "content": row["content"],
@@ -121,6 +121,7 @@ def cache_chunks_for_file(
     - chunk_index: int
     - content: str
     - embedding: bytes (BLOB)
+    - embedding_model: model id (optional, defaults to the table's active model)
     """
     if not chunks:
         return
@@ -131,18 +132,29 @@ def cache_chunks_for_file(
     conn.execute("DELETE FROM file_chunks WHERE file_id = ?", (file_id,))
 
     # Insert new chunks
+    quant = get_setting(conn, "file_chunks")
+    default_model = None
     for chunk in chunks:
+        stored, quantized = encode_for_table(conn, "file_chunks", chunk["embedding"], quant)
+        model_id = chunk.get("embedding_model")
+        if model_id is None:
+            default_model = default_model or active_model(conn, "file_chunks")
+            model_id = default_model
         conn.execute(
             """
-            INSERT INTO file_chunks (project_id, file_id, chunk_index, content, embedding)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO file_chunks (project_id, file_id, chunk_index, content, embedding, embedding_q,
+                                     embedding_model, embedding_dim)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 project_id,
                 file_id,
                 chunk["chunk_index"],
                 chunk["content"],
-                chunk["embedding"]
+                stored,
+                quantized,
+                model_id,
+                vector_dim(chunk["embedding"])
             )
         )
 
@@ -253,7 +265,7 @@ def get_or_create_file_chunks(
         return []
 
     # Generate embeddings (batch)
-    embeddings = embed_many(chunks_to_embed)
+    embeddings, model_id = embed_for_table("file_chunks", chunks_to_embed)
 
     # Prepare chunks for caching and return
     chunks_for_cache = []
@@ -267,6 +279,7 @@ def get_or_create_file_chunks(
             "chunk_index": meta["chunk_index"],
             "content": text_content,
             "embedding": emb_blob,  # bytes for DB
+            "embedding_model": model_id,
         })
 
         # For return (with numpy array)
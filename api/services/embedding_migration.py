@@ -0,0 +1,664 @@
+"""
+Online Embedding Model Migration
+
+Re-embeds library_chunks, file_chunks or memories with a new model while
+the app keeps serving search (migration 023). Replaces the offline
+export -> sharded workers -> merge pipeline in harvest/scripts/reembed_*.
+
+Per table, a background thread:
+
+  1. copy:     keyset-paginates rows by id, writes the target model's
+               vector to embedding_next and checkpoints last_id in the same
+               transaction, so it resumes where it stopped
+  2. sweep:    re-embeds rows written or edited during the copy
+  3. cutover:  flips embedding_migrations.cutover in one transaction once
+               no row is missing a target vector; reads switch atomically
+  4. finalize: folds embedding_next into embedding (re-quantizing under
+               the table's embedding_quant setting) and stamps the model
+
+Until cutover, queries embed with the source model and read `embedding`;
+afterwards they embed with the target model and read
+COALESCE(embedding_next, embedding). Every row records the model and
+dimension that produced it. The job yields CPU with a duty cycle and backs
+off further when the load average is high.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.embedding_quant import QUANTIZABLE_TABLES, encode_for_table, get_setting
+from utils import metrics
+from utils.db import get_db
+
+logger = logging.getLogger(__name__)
+
+MIGRATABLE_TABLES = QUANTIZABLE_TABLES
+
+# Rows embedded per transaction
+MIGRATION_BATCH_SIZE = 64
+
+# Fraction of wall time the job spends embedding
+DUTY_CYCLE = 0.5
+
+# 1-minute load average per CPU above which the job backs off
+MAX_LOAD_PER_CPU = 0.8
+MAX_BACKOFF_SECONDS = 30.0
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_PAUSED = "paused"
+STATUS_READY = "ready"            # All rows copied, waiting for manual cutover
+STATUS_FINALIZING = "finalizing"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING, STATUS_PAUSED, STATUS_READY, STATUS_FINALIZING)
+
+# Rows that carry a vector in either storage column
+_HAS_VECTOR = "(embedding IS NOT NULL OR embedding_q IS NOT NULL)"
+
+
+@dataclass
+class MigrationState:
+    """One row of embedding_migrations."""
+    table_name: str
+    source_model: str
+    target_model: str
+    target_dim: Optional[int]
+    status: str
+    cutover: bool
+    auto_cutover: bool
+    last_id: int
+    processed: int
+    total: int
+    error: Optional[str] = None
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    cutover_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+# ---------------------------------------------------------------------------
+# Models
+# ---------------------------------------------------------------------------
+
+_encoders: Dict[str, Any] = {}
+_encoders_lock = threading.Lock()
+
+
+def default_model_id() -> str:
+    from core.config import EMBEDDING_MODEL
+    return EMBEDDING_MODEL
+
+
+def register_encoder(model_id: str, encoder: Any) -> None:
+    """Use an already-loaded model (anything with .encode(texts)) for model_id."""
+    with _encoders_lock:
+        _encoders[model_id] = encoder
+
+
+def get_encoder(model_id: str) -> Any:
+    """Model for model_id, loading a SentenceTransformer on first use."""
+    with _encoders_lock:
+        encoder = _encoders.get(model_id)
+        if encoder is not None:
+            return encoder
+
+        from core.config import EMBEDDING_MODEL, model
+        if model_id == EMBEDDING_MODEL:
+            encoder = model
+        else:
+            from sentence_transformers import SentenceTransformer
+            logger.info(f"Loading embedding model {model_id}")
+            encoder = SentenceTransformer(model_id)
+            encoder.max_seq_length = 512
+        _encoders[model_id] = encoder
+        return encoder
+
+
+def encode(model_id: str, texts: Sequence[str]) -> List[bytes]:
+    """float32 BLOBs for texts under model_id."""
+    if not texts:
+        return []
+    encoder = get_encoder(model_id)
+    start = time.perf_counter()
+    vecs = encoder.encode(list(texts))
+    metrics.record_embedding(len(texts), time.perf_counter() - start, model_id)
+    return [np.asarray(v, dtype=np.float32).tobytes() for v in vecs]
+
+
+# ---------------------------------------------------------------------------
+# Read / write helpers
+# ---------------------------------------------------------------------------
+
+
+def _check_table(table: str) -> None:
+    if table not in MIGRATABLE_TABLES:
+        raise ValueError(f"Table {table!r} has no migratable embedding column")
+
+
+def get_state(conn: sqlite3.Connection, table: str) -> Optional[MigrationState]:
+    """Migration row for a table, or None if it was never migrated."""
+    try:
+        row = conn.execute(
+            """
+            SELECT table_name, source_model, target_model, target_dim, status,
+                   cutover, auto_cutover, last_id, processed, total, error,
+                   started_at, updated_at, cutover_at
+            FROM embedding_migrations WHERE table_name = ?
+            """,
+            (table,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # Migration 023 not applied
+        return None
+    if not row:
+        return None
+    return MigrationState(
+        table_name=row[0],
+        source_model=row[1],
+        target_model=row[2],
+        target_dim=row[3],
+        status=row[4],
+        cutover=bool(row[5]),
+        auto_cutover=bool(row[6]),
+        last_id=row[7],
+        processed=row[8],
+        total=row[9],
+        error=row[10],
+        started_at=row[11],
+        updated_at=row[12],
+        cutover_at=row[13],
+    )
+
+
+def active_model(conn: sqlite3.Connection, table: str) -> str:
+    """Model whose vectors search reads for a table right now."""
+    state = get_state(conn, table)
+    if state is None:
+        return default_model_id()
+    return state.target_model if state.cutover else state.source_model
+
+
+def vector_columns(conn: sqlite3.Connection, table: str, alias: str = "") -> str:
+    """
+    SELECT-list expressions yielding `embedding` and `embedding_q` for the
+    table's active model. After cutover the new vector wins, and a quantized
+    copy is only used once finalize has re-encoded it.
+    """
+    a = f"{alias}." if alias else ""
+    state = get_state(conn, table)
+    if state is None or not state.cutover or state.status == STATUS_DONE:
+        return f"{a}embedding AS embedding, {a}embedding_q AS embedding_q"
+    return (
+        f"COALESCE({a}embedding_next, {a}embedding) AS embedding, "
+        f"CASE WHEN {a}embedding_next IS NULL THEN {a}embedding_q END AS embedding_q"
+    )
+
+
+def embed_for_table(
+    table: str,
+    texts: Sequence[str],
+    conn: Optional[sqlite3.Connection] = None,
+) -> Tuple[List[bytes], str]:
+    """Embed texts with the table's active model. Returns (blobs, model_id)."""
+    own = conn is None
+    conn = conn or get_db()
+    try:
+        model_id = active_model(conn, table)
+    finally:
+        if own:
+            conn.close()
+    return encode(model_id, texts), model_id
+
+
+def embed_query(table: str, text: str, conn: Optional[sqlite3.Connection] = None) -> np.ndarray:
+    """Query vector comparable with the table's active vectors."""
+    blobs, _ = embed_for_table(table, [text], conn)
+    return np.frombuffer(blobs[0], dtype=np.float32)
+
+
+def vector_dim(blob: Optional[bytes]) -> Optional[int]:
+    return len(blob) // 4 if blob else None
+
+
+def same_model(a: Optional[str], b: Optional[str]) -> bool:
+    """Compare model ids, ignoring an org prefix ('BAAI/bge-m3' == 'bge-m3')."""
+    if not a or not b:
+        return False
+    return a.rsplit("/", 1)[-1].lower() == b.rsplit("/", 1)[-1].lower()
+
+
+# ---------------------------------------------------------------------------
+# Throttling
+# ---------------------------------------------------------------------------
+
+
+def load_per_cpu() -> float:
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return 0.0
+
+
+class Throttle:
+    """Sleeps between batches to hold a duty cycle, longer under load."""
+
+    def __init__(
+        self,
+        duty_cycle: float = DUTY_CYCLE,
+        max_load: float = MAX_LOAD_PER_CPU,
+        load_fn: Callable[[], float] = load_per_cpu,
+    ):
+        self.duty_cycle = min(max(duty_cycle, 0.01), 1.0)
+        self.max_load = max_load
+        self.load_fn = load_fn
+        self.backoff = 0.0
+
+    def delay(self, batch_seconds: float) -> float:
+        delay = batch_seconds * (1.0 / self.duty_cycle - 1.0)
+        if self.load_fn() > self.max_load:
+            self.backoff = min(MAX_BACKOFF_SECONDS, max(1.0, self.backoff * 2))
+            delay = max(delay, self.backoff)
+        else:
+            self.backoff = 0.0
+        return delay
+
+
+# ---------------------------------------------------------------------------
+# Job
+# ---------------------------------------------------------------------------
+
+
+def create_migration(
+    conn: sqlite3.Connection,
+    table: str,
+    target_model: str,
+    auto_cutover: bool = True,
+) -> MigrationState:
+    """
+    Record a migration of table to target_model, or return the one already
+    in progress for that target. Starting a different target while one is
+    active raises ValueError.
+    """
+    _check_table(table)
+    state = get_state(conn, table)
+    if state and state.status in _ACTIVE_STATUSES:
+        if state.target_model != target_model:
+            raise ValueError(
+                f"{table} is already migrating to {state.target_model} ({state.status})"
+            )
+        return state
+    if state and state.status == STATUS_FAILED and state.target_model == target_model:
+        # Retry from the checkpoint
+        _set_status(conn, table, STATUS_PENDING)
+        return get_state(conn, table)
+
+    source = active_model(conn, table)
+    if source == target_model:
+        raise ValueError(f"{table} already uses {target_model}")
+
+    total = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {_HAS_VECTOR}").fetchone()[0]
+    conn.execute(
+        f"UPDATE {table} SET embedding_next = NULL WHERE embedding_next IS NOT NULL"
+    )
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO embedding_migrations (
+            table_name, source_model, target_model, status, cutover,
+            auto_cutover, last_id, processed, total, started_at, updated_at
+        ) VALUES (?, ?, ?, ?, 0, ?, 0, 0, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        """,
+        (table, source, target_model, STATUS_PENDING, int(auto_cutover), total),
+    )
+    conn.commit()
+    return get_state(conn, table)
+
+
+def _set_status(conn: sqlite3.Connection, table: str, status: str, error: Optional[str] = None) -> None:
+    conn.execute(
+        """
+        UPDATE embedding_migrations
+        SET status = ?, error = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE table_name = ?
+        """,
+        (status, error, table),
+    )
+    conn.commit()
+
+
+def cutover(conn: sqlite3.Connection, table: str) -> bool:
+    """
+    Switch reads to the target model if every row has its target vector.
+    The check and the flag flip share one write transaction, so no writer
+    can slip an unconverted row in between. Returns True if switched.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        state = get_state(conn, table)
+        if state is None or state.cutover:
+            conn.rollback()
+            return bool(state and state.cutover)
+        missing = conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE embedding_next IS NULL AND {_HAS_VECTOR}"
+        ).fetchone()[0]
+        if missing:
+            conn.rollback()
+            return False
+        conn.execute(
+            """
+            UPDATE embedding_migrations
+            SET cutover = 1, status = ?, cutover_at = CURRENT_TIMESTAMP,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE table_name = ?
+            """,
+            (STATUS_FINALIZING, table),
+        )
+        conn.commit()
+        logger.info(f"Embedding migration cutover: {table} now reads {state.target_model}")
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _embed_rows(conn, state: MigrationState, rows) -> List[Tuple[int, bytes]]:
+    blobs = encode(state.target_model, [r[1] or "" for r in rows])
+    if state.target_dim is None and blobs:
+        state.target_dim = vector_dim(blobs[0])
+        conn.execute(
+            "UPDATE embedding_migrations SET target_dim = ? WHERE table_name = ?",
+            (state.target_dim, state.table_name),
+        )
+    return [(r[0], blob) for r, blob in zip(rows, blobs)]
+
+
+class EmbeddingMigrationJob:
+    """Runs one table's migration; see the module docstring for phases."""
+
+    def __init__(
+        self,
+        table: str,
+        batch_size: int = MIGRATION_BATCH_SIZE,
+        throttle: Optional[Throttle] = None,
+        stop: Optional[threading.Event] = None,
+        progress: Optional[Callable[[MigrationState], None]] = None,
+    ):
+        _check_table(table)
+        self.table = table
+        self.batch_size = batch_size
+        self.throttle = throttle or Throttle()
+        self.stop = stop or threading.Event()
+        self.progress = progress
+
+    def _pause(self, batch_seconds: float) -> bool:
+        """Throttle after a batch. Returns False if the job should stop."""
+        delay = self.throttle.delay(batch_seconds)
+        if delay > 0:
+            return not self.stop.wait(delay)
+        return not self.stop.is_set()
+
+    def run(self) -> MigrationState:
+        conn = get_db()
+        try:
+            state = get_state(conn, self.table)
+            if state is None:
+                raise ValueError(f"No embedding migration recorded for {self.table}")
+            if state.status == STATUS_DONE:
+                return state
+
+            try:
+                if not state.cutover:
+                    _set_status(conn, self.table, STATUS_RUNNING)
+                    if not self._copy(conn, state) or not self._sweep(conn, state):
+                        _set_status(conn, self.table, STATUS_PAUSED)
+                        return get_state(conn, self.table)
+                    if not state.auto_cutover:
+                        _set_status(conn, self.table, STATUS_READY)
+                        return get_state(conn, self.table)
+                    while not cutover(conn, self.table):
+                        # A writer got in between the sweep and the check
+                        if not self._sweep(conn, state):
+                            _set_status(conn, self.table, STATUS_PAUSED)
+                            return get_state(conn, self.table)
+
+                if not self._finalize(conn, state):
+                    return get_state(conn, self.table)
+                _set_status(conn, self.table, STATUS_DONE)
+                logger.info(f"Embedding migration of {self.table} to {state.target_model} done")
+            except Exception as e:
+                logger.error(f"Embedding migration of {self.table} failed: {e}")
+                _set_status(conn, self.table, STATUS_FAILED, str(e))
+                raise
+            return get_state(conn, self.table)
+        finally:
+            conn.close()
+
+    def _copy(self, conn, state: MigrationState) -> bool:
+        """Keyset pass over ids, checkpointing last_id with each batch."""
+        while True:
+            rows = conn.execute(
+                f"""
+                SELECT id, content FROM {self.table}
+                WHERE id > ? AND {_HAS_VECTOR}
+                ORDER BY id LIMIT ?
+                """,
+                (state.last_id, self.batch_size),
+            ).fetchall()
+            if not rows:
+                return True
+
+            started = time.perf_counter()
+            updates = _embed_rows(conn, state, rows)
+            conn.executemany(
+                f"UPDATE {self.table} SET embedding_next = ? WHERE id = ?",
+                [(blob, row_id) for row_id, blob in updates],
+            )
+            state.last_id = rows[-1][0]
+            state.processed += len(rows)
+            conn.execute(
+                """
+                UPDATE embedding_migrations
+                SET last_id = ?, processed = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE table_name = ?
+                """,
+                (state.last_id, state.processed, self.table),
+            )
+            conn.commit()
+
+            if self.progress:
+                self.progress(state)
+            if not self._pause(time.perf_counter() - started):
+                return False
+
+    def _sweep(self, conn, state: MigrationState) -> bool:
+        """Embed rows inserted or edited since the copy pass reached them."""
+        while True:
+            rows = conn.execute(
+                f"""
+                SELECT id, content FROM {self.table}
+                WHERE embedding_next IS NULL AND {_HAS_VECTOR}
+                ORDER BY id LIMIT ?
+                """,
+                (self.batch_size,),
+            ).fetchall()
+            if not rows:
+                return True
+
+            started = time.perf_counter()
+            conn.executemany(
+                f"UPDATE {self.table} SET embedding_next = ? WHERE id = ? AND embedding_next IS NULL",
+                [(blob, row_id) for row_id, blob in _embed_rows(conn, state, rows)],
+            )
+            conn.commit()
+            if not self._pause(time.perf_counter() - started):
+                return False
+
+    def _finalize(self, conn, state: MigrationState) -> bool:
+        """Move embedding_next into embedding and fix up late writes."""
+        quant = get_setting(conn, self.table)
+        while True:
+            rows = conn.execute(
+                f"""
+                SELECT id, embedding_next FROM {self.table}
+                WHERE embedding_next IS NOT NULL
+                LIMIT ?
+                """,
+                (self.batch_size,),
+            ).fetchall()
+            if not rows:
+                break
+
+            started = time.perf_counter()
+            updates = []
+            for row_id, blob in rows:
+                stored, quantized = encode_for_table(conn, self.table, blob, quant)
+                updates.append((stored, quantized, state.target_model, vector_dim(blob), row_id))
+            conn.executemany(
+                f"""
+                UPDATE {self.table}
+                SET embedding = ?, embedding_q = ?, embedding_model = ?,
+                    embedding_dim = ?, embedding_next = NULL
+                WHERE id = ?
+                """,
+                updates,
+            )
+            conn.commit()
+            if not self._pause(time.perf_counter() - started):
+                return False
+
+        # Rows embedded with the source model by a writer that read the
+        # active model just before cutover
+        while True:
+            rows = conn.execute(
+                f"""
+                SELECT id, content FROM {self.table}
+                WHERE {_HAS_VECTOR}
+                  AND COALESCE(embedding_model, ?) != ?
+                LIMIT ?
+                """,
+                (state.source_model, state.target_model, self.batch_size),
+            ).fetchall()
+            if not rows:
+                return True
+
+            updates = []
+            for row_id, blob in _embed_rows(conn, state, rows):
+                stored, quantized = encode_for_table(conn, self.table, blob, quant)
+                updates.append((stored, quantized, state.target_model, vector_dim(blob), row_id))
+            conn.executemany(
+                f"""
+                UPDATE {self.table}
+                SET embedding = ?, embedding_q = ?, embedding_model = ?, embedding_dim = ?
+                WHERE id = ?
+                """,
+                updates,
+            )
+            conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Background threads
+# ---------------------------------------------------------------------------
+
+_threads: Dict[str, Tuple[threading.Thread, threading.Event]] = {}
+_threads_lock = threading.Lock()
+
+
+def start_migration(
+    table: str,
+    target_model: Optional[str] = None,
+    auto_cutover: bool = True,
+    batch_size: int = MIGRATION_BATCH_SIZE,
+) -> MigrationState:
+    """
+    Start (or resume) a table's migration on a daemon thread. Without
+    target_model, resumes the recorded migration.
+    """
+    _check_table(table)
+    conn = get_db()
+    try:
+        if target_model:
+            state = create_migration(conn, table, target_model, auto_cutover)
+        else:
+            state = get_state(conn, table)
+            if state is None:
+                raise ValueError(f"No embedding migration recorded for {table}")
+    finally:
+        conn.close()
+
+    with _threads_lock:
+        running = _threads.get(table)
+        if running and running[0].is_alive():
+            return state
+        if state.status == STATUS_DONE:
+            return state
+
+        stop = threading.Event()
+        job = EmbeddingMigrationJob(table, batch_size=batch_size, stop=stop)
+
+        def target():
+            try:
+                job.run()
+            except Exception:
+                pass  # Recorded as failed by the job
+
+        thread = threading.Thread(target=target, name=f"embedding-migration-{table}", daemon=True)
+        _threads[table] = (thread, stop)
+        thread.start()
+    return state
+
+
+def pause_migration(table: str, timeout: float = 30.0) -> bool:
+    """Stop a table's background job after its current batch."""
+    with _threads_lock:
+        running = _threads.pop(table, None)
+    if not running:
+        return False
+    thread, stop = running
+    stop.set()
+    thread.join(timeout)
+    return True
+
+
+def resume_migrations() -> List[str]:
+    """Restart every unfinished migration (e.g. after a restart)."""
+    conn = get_db()
+    try:
+        tables = [
+            t for t in MIGRATABLE_TABLES
+            if (s := get_state(conn, t)) and s.status in (STATUS_PENDING, STATUS_RUNNING, STATUS_PAUSED, STATUS_FINALIZING)
+        ]
+    finally:
+        conn.close()
+    for table in tables:
+        start_migration(table)
+    return tables
+
+
+def migration_status() -> Dict[str, Any]:
+    """State of every table, for the system API."""
+    conn = get_db()
+    try:
+        out = {}
+        for table in MIGRATABLE_TABLES:
+            state = get_state(conn, table)
+            with _threads_lock:
+                running = _threads.get(table)
+            out[table] = {
+                "active_model": active_model(conn, table),
+                "migration": state.to_dict() if state else None,
+                "thread_alive": bool(running and running[0].is_alive()),
+            }
+        return out
+    finally:
+        conn.close()
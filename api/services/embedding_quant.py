@@ -0,0 +1,364 @@
+"""
+Quantized Embedding Storage
+
+Optional per-table compression of the float32 embedding BLOBs in
+library_chunks, file_chunks and memories (migration 022). A table listed in
+embedding_quantization gets a second column, embedding_q, holding either
+
+  - float16: 'h' + 2 bytes per dimension
+  - int8:    'b' + float32 scale + 1 byte per dimension (v ~= scale * q)
+
+so a 1024-dim vector shrinks from 4 KB to 2 KB or ~1 KB. The leading tag
+byte makes every blob self-describing, so readers never need the setting to
+decode one.
+
+Search scores the quantized matrix directly with numpy; cosine similarity
+is scale invariant, so int8 rows need no dequantization to be ranked. When
+the float32 column is kept, the top `rerank` candidates are re-scored
+exactly. Tables are converted with scripts/quantize_embeddings.py.
+"""
+
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Tables with an embedding / embedding_q column pair
+QUANTIZABLE_TABLES = ("library_chunks", "file_chunks", "memories")
+
+DTYPES = ("float16", "int8")
+
+# Candidates re-scored against float32 when it is kept
+DEFAULT_RERANK = 100
+
+# Rows per UPDATE batch in quantize_table()
+QUANTIZE_BATCH_SIZE = 500
+
+_TAG_FLOAT16 = b"h"
+_TAG_INT8 = b"b"
+
+Vector = Union[np.ndarray, bytes, bytearray, memoryview]
+
+
+@dataclass
+class QuantizationSetting:
+    """One row of embedding_quantization."""
+    table_name: str
+    dtype: str
+    keep_float32: bool = True
+    rerank: int = DEFAULT_RERANK
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+
+def _as_float32(vec: Vector) -> np.ndarray:
+    if isinstance(vec, (bytes, bytearray, memoryview)):
+        return np.frombuffer(vec, dtype=np.float32)
+    return np.asarray(vec, dtype=np.float32).ravel()
+
+
+def quantize(vec: Vector, dtype: str) -> bytes:
+    """Encode a float32 vector (array or BLOB) as an embedding_q blob."""
+    v = _as_float32(vec)
+    if dtype == "float16":
+        return _TAG_FLOAT16 + v.astype(np.float16).tobytes()
+    if dtype == "int8":
+        peak = float(np.max(np.abs(v))) if v.size else 0.0
+        scale = peak / 127.0 if peak > 0 else 1.0
+        q = np.clip(np.rint(v / scale), -127, 127).astype(np.int8)
+        return _TAG_INT8 + np.float32(scale).tobytes() + q.tobytes()
+    raise ValueError(f"Unknown embedding dtype: {dtype}")
+
+
+def dequantize(blob: bytes) -> np.ndarray:
+    """Decode an embedding_q blob back to float32."""
+    tag, body = blob[:1], memoryview(blob)[1:]
+    if tag == _TAG_FLOAT16:
+        return np.frombuffer(body, dtype=np.float16).astype(np.float32)
+    if tag == _TAG_INT8:
+        scale = np.frombuffer(body[:4], dtype=np.float32)[0]
+        return np.frombuffer(body[4:], dtype=np.int8).astype(np.float32) * scale
+    raise ValueError(f"Unknown embedding blob tag: {tag!r}")
+
+
+def load_embedding(
+    embedding: Optional[bytes],
+    embedding_q: Optional[bytes] = None,
+) -> Optional[np.ndarray]:
+    """Float32 vector for a row, from the exact column if it is still kept."""
+    if embedding:
+        return np.frombuffer(embedding, dtype=np.float32)
+    if embedding_q:
+        return dequantize(embedding_q)
+    return None
+
+
+def _decode_matrix(blobs: Sequence[bytes]) -> np.ndarray:
+    """
+    Stack same-format embedding_q blobs into a float32 matrix in one
+    conversion. int8 scales are skipped: cosine does not need them.
+    """
+    width = len(blobs[0])
+    if blobs[0][:1] == _TAG_FLOAT16:
+        row = np.dtype([("tag", "u1"), ("v", "<f2", ((width - 1) // 2,))])
+    else:
+        row = np.dtype([("tag", "u1"), ("scale", "<f4"), ("v", "i1", (width - 5,))])
+    return np.frombuffer(b"".join(blobs), dtype=row)["v"].astype(np.float32)
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+
+def _cosine(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Cosine of query against each row; 0.0 for zero vectors."""
+    dots = matrix @ query
+    norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix)) * np.linalg.norm(query)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(norms > 0, dots / norms, 0.0)
+    return scores.astype(np.float32, copy=False)
+
+
+def cosine_scores(
+    query: Vector,
+    embeddings: Sequence[Optional[bytes]],
+    quantized: Optional[Sequence[Optional[bytes]]] = None,
+    rerank: int = 0,
+) -> np.ndarray:
+    """
+    Cosine similarity of query against rows given as parallel column lists.
+
+    Rows with an embedding_q blob are scored on the quantized values; rows
+    with only float32 are scored exactly. If rerank > 0, the best `rerank`
+    quantized scores are replaced by exact ones where float32 is present.
+    Rows with neither column score NaN.
+    """
+    q = _as_float32(query)
+    n = len(embeddings)
+    scores = np.full(n, np.nan, dtype=np.float32)
+    quantized = quantized if quantized is not None else [None] * n
+
+    exact_rows: List[int] = []
+    groups: Dict[Tuple[bytes, int], List[int]] = {}
+    for i in range(n):
+        qb = quantized[i]
+        if qb:
+            groups.setdefault((qb[:1], len(qb)), []).append(i)
+        elif embeddings[i]:
+            exact_rows.append(i)
+
+    for rows in groups.values():
+        matrix = _decode_matrix([quantized[i] for i in rows])
+        if matrix.shape[1] != q.shape[0]:
+            logger.warning(f"Skipping {len(rows)} quantized rows with dimension {matrix.shape[1]}")
+            continue
+        scores[rows] = _cosine(q, matrix)
+
+    def score_exact(rows: List[int]) -> None:
+        rows = [i for i in rows if len(embeddings[i]) == q.nbytes]
+        if rows:
+            matrix = np.frombuffer(b"".join(embeddings[i] for i in rows), dtype=np.float32)
+            scores[rows] = _cosine(q, matrix.reshape(len(rows), -1))
+
+    score_exact(exact_rows)
+
+    if rerank > 0 and groups:
+        approx = [i for rows in groups.values() for i in rows if embeddings[i]]
+        if approx:
+            approx_scores = scores[approx]
+            if len(approx) > rerank:
+                top = np.argpartition(-np.nan_to_num(approx_scores, nan=-np.inf), rerank - 1)[:rerank]
+                approx = [approx[j] for j in top]
+            score_exact(approx)
+
+    return scores
+
+
+def top_k(scores: np.ndarray, k: int) -> List[int]:
+    """Row indexes of the k best non-NaN scores, best first."""
+    if k <= 0:
+        return []
+    valid = np.flatnonzero(~np.isnan(scores))
+    if k < len(valid):
+        part = np.argpartition(-scores[valid], k - 1)[:k]
+        valid = valid[part]
+    return sorted(valid.tolist(), key=lambda i: -scores[i])
+
+
+# ---------------------------------------------------------------------------
+# Per-table settings
+# ---------------------------------------------------------------------------
+
+
+def _check_table(table: str) -> None:
+    if table not in QUANTIZABLE_TABLES:
+        raise ValueError(f"Table {table!r} has no quantized embedding column")
+
+
+def get_setting(conn: sqlite3.Connection, table: str) -> Optional[QuantizationSetting]:
+    """Quantization setting for a table, or None if it stores float32 only."""
+    try:
+        row = conn.execute(
+            "SELECT dtype, keep_float32, rerank FROM embedding_quantization WHERE table_name = ?",
+            (table,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # Migration 022 not applied
+        return None
+    if not row:
+        return None
+    return QuantizationSetting(table, row[0], bool(row[1]), row[2])
+
+
+def encode_for_table(
+    conn: sqlite3.Connection,
+    table: str,
+    embedding: Optional[bytes],
+    setting: Optional[QuantizationSetting] = None,
+) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """
+    (embedding, embedding_q) column values for a new float32 BLOB under the
+    table's setting. Pass `setting` when writing many rows.
+    """
+    if setting is None:
+        setting = get_setting(conn, table)
+    if not embedding or setting is None:
+        return embedding, None
+    quantized = quantize(embedding, setting.dtype)
+    return (embedding if setting.keep_float32 else None), quantized
+
+
+# ---------------------------------------------------------------------------
+# Table conversion (scripts/quantize_embeddings.py)
+# ---------------------------------------------------------------------------
+
+
+def quantize_table(
+    conn: sqlite3.Connection,
+    table: str,
+    dtype: str,
+    keep_float32: bool = True,
+    rerank: int = DEFAULT_RERANK,
+    batch_size: int = QUANTIZE_BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Record the table's setting, then (re)encode every row's embedding_q.
+
+    The setting is written first so rows inserted during the backfill are
+    already encoded by their writers. Rows whose float32 column was dropped
+    by an earlier run are re-encoded from the old blob. Returns rows written.
+    """
+    _check_table(table)
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown embedding dtype: {dtype}")
+
+    conn.execute(
+        """
+        INSERT INTO embedding_quantization (table_name, dtype, keep_float32, rerank, updated_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(table_name) DO UPDATE SET
+            dtype = excluded.dtype,
+            keep_float32 = excluded.keep_float32,
+            rerank = excluded.rerank,
+            updated_at = excluded.updated_at
+        """,
+        (table, dtype, int(keep_float32), rerank),
+    )
+    conn.commit()
+
+    written = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f"""
+            SELECT id, embedding, embedding_q FROM {table}
+            WHERE id > ? AND (embedding IS NOT NULL OR embedding_q IS NOT NULL)
+            ORDER BY id LIMIT ?
+            """,
+            (last_id, batch_size),
+        ).fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for row_id, embedding, embedding_q in rows:
+            vec = load_embedding(embedding, embedding_q)
+            updates.append((quantize(vec, dtype), embedding if keep_float32 else None, row_id))
+        conn.executemany(
+            f"UPDATE {table} SET embedding_q = ?, embedding = ? WHERE id = ?",
+            updates,
+        )
+        conn.commit()
+
+        written += len(updates)
+        last_id = rows[-1][0]
+        if progress:
+            progress(written)
+
+    return written
+
+
+def dequantize_table(
+    conn: sqlite3.Connection,
+    table: str,
+    batch_size: int = QUANTIZE_BATCH_SIZE,
+) -> int:
+    """
+    Return a table to float32 only. Rows whose float32 column was dropped
+    get the dequantized vector back (lossy). Returns rows restored.
+    """
+    _check_table(table)
+    conn.execute("DELETE FROM embedding_quantization WHERE table_name = ?", (table,))
+    conn.commit()
+
+    restored = 0
+    while True:
+        rows = conn.execute(
+            f"""
+            SELECT id, embedding_q FROM {table}
+            WHERE embedding IS NULL AND embedding_q IS NOT NULL
+            LIMIT ?
+            """,
+            (batch_size,),
+        ).fetchall()
+        if not rows:
+            break
+        conn.executemany(
+            f"UPDATE {table} SET embedding = ?, embedding_q = NULL WHERE id = ?",
+            [(dequantize(blob).tobytes(), row_id) for row_id, blob in rows],
+        )
+        conn.commit()
+        restored += len(rows)
+
+    conn.execute(f"UPDATE {table} SET embedding_q = NULL WHERE embedding_q IS NOT NULL")
+    conn.commit()
+    return restored
+
+
+def table_stats(conn: sqlite3.Connection, table: str) -> Dict[str, int]:
+    """Row counts and stored bytes for both embedding columns."""
+    _check_table(table)
+    row = conn.execute(
+        f"""
+        SELECT COUNT(*),
+               COUNT(embedding), COALESCE(SUM(LENGTH(embedding)), 0),
+               COUNT(embedding_q), COALESCE(SUM(LENGTH(embedding_q)), 0)
+        FROM {table}
+        """
+    ).fetchone()
+    return {
+        "rows": row[0],
+        "float32_rows": row[1],
+        "float32_bytes": row[2],
+        "quantized_rows": row[3],
+        "quantized_bytes": row[4],
+    }
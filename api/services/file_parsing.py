@@ -25,8 +25,13 @@ Design goals:
 
 from __future__ import annotations
 
+import hashlib
+import multiprocessing
 import os
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple
 
 
@@ -48,9 +53,44 @@ def clean_extracted_text(text: str) -> str:
     if not text:
         return text
 
-    lines = text.split("\n")
-    cleaned_lines = []
+    return _clean_lines(text.split("\n"))[0]
 
+
+def clean_pages(page_texts: List[str]) -> Tuple[str, List[int]]:
+    """
+    Join per-page text and clean it, tracking where each page starts.
+
+    Returns (text, page_offsets): text is exactly
+    clean_extracted_text("\n".join(page_texts)), and page_offsets[i] is the
+    offset in that cleaned text where page i+1 begins. A page whose first
+    line was merged into the previous page's last line starts mid-line; a
+    page with nothing left after cleaning gets the next page's offset.
+    """
+    lines: List[str] = []
+    page_first_line: List[int] = []
+    for page_text in page_texts:
+        page_first_line.append(len(lines))
+        lines.extend(page_text.split("\n"))
+
+    text, line_positions = _clean_lines(lines)
+
+    offsets: List[int] = []
+    j = 0
+    for first in page_first_line:
+        while j < len(line_positions) and line_positions[j][0] < first:
+            j += 1
+        offsets.append(line_positions[j][1] if j < len(line_positions) else len(text))
+    return text, offsets
+
+
+def _clean_lines(lines: List[str]) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    The clean_extracted_text() passes over pre-split lines.
+
+    Also returns (input line index, offset in cleaned text) for every input
+    line that survives, in order, so callers can map positions across the
+    cleanup.
+    """
     # Patterns for lines to remove entirely
     page_number_patterns = [
         r"^\s*\d+\s*/\s*\d+\s*$",  # "2/1224", "15 / 200"
@@ -62,12 +102,13 @@ def clean_extracted_text(text: str) -> str:
     page_number_re = re.compile("|".join(page_number_patterns), re.IGNORECASE)
 
     # First pass: remove page number lines
-    for line in lines:
+    cleaned_lines = []  # (line, input index)
+    for idx, line in enumerate(lines):
         stripped = line.strip()
 
         # Skip empty lines for now (we'll handle spacing later)
         if not stripped:
-            cleaned_lines.append("")
+            cleaned_lines.append(("", idx))
             continue
 
         # Skip standalone page numbers
@@ -78,28 +119,30 @@ def clean_extracted_text(text: str) -> str:
         if len(stripped) <= 4 and stripped.isdigit():
             continue
 
-        cleaned_lines.append(line)
+        cleaned_lines.append((line, idx))
 
     # Second pass: merge broken lines
     # A line is "broken" if it doesn't end with sentence punctuation
     # and the next line starts with a lowercase letter
-    merged_lines = []
+    merged_lines = []  # (line, [(input index, position in line)])
     i = 0
     sentence_enders = '.!?:;"\'"\u201d\u2019'  # Include curly quotes
 
     while i < len(cleaned_lines):
-        line = cleaned_lines[i]
+        line, idx = cleaned_lines[i]
         stripped = line.strip()
 
         if not stripped:
             # Preserve paragraph breaks (blank lines)
-            merged_lines.append("")
+            merged_lines.append(("", []))
             i += 1
             continue
 
+        pieces = [(idx, 0)]
+
         # Check if this line should be merged with the next
         while i + 1 < len(cleaned_lines):
-            next_line = cleaned_lines[i + 1].strip()
+            next_line = cleaned_lines[i + 1][0].strip()
 
             # Don't merge if next line is empty (paragraph break)
             if not next_line:
@@ -118,32 +161,40 @@ def clean_extracted_text(text: str) -> str:
                     break
 
             # Merge the lines
+            pieces.append((cleaned_lines[i + 1][1], len(stripped) + 1))
             stripped = stripped + " " + next_line
             i += 1
 
-        merged_lines.append(stripped)
+        merged_lines.append((stripped, pieces))
         i += 1
 
     # Third pass: collapse multiple blank lines to one
     final_lines = []
     prev_blank = False
-    for line in merged_lines:
+    for line, pieces in merged_lines:
         is_blank = not line.strip()
         if is_blank:
             if not prev_blank:
-                final_lines.append("")
+                final_lines.append(("", []))
             prev_blank = True
         else:
-            final_lines.append(line)
+            final_lines.append((line, pieces))
             prev_blank = False
 
     # Remove leading/trailing blank lines
-    while final_lines and not final_lines[0].strip():
+    while final_lines and not final_lines[0][0].strip():
         final_lines.pop(0)
-    while final_lines and not final_lines[-1].strip():
+    while final_lines and not final_lines[-1][0].strip():
         final_lines.pop()
 
-    return "\n".join(final_lines)
+    positions: List[Tuple[int, int]] = []
+    offset = 0
+    for line, pieces in final_lines:
+        for idx, pos in pieces:
+            positions.append((idx, offset + pos))
+        offset += len(line) + 1
+
+    return "\n".join(line for line, _ in final_lines), positions
 
 
 # ---------------------------------------------------------------------------
@@ -198,17 +249,150 @@ def _read_small_text_file(full_path: str) -> str:
 # ---------------------------------------------------------------------------
 
 
+# PDFs with at least this many pages are split into page ranges and
+# extracted in a process pool; smaller ones are not worth the spawn cost
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "96"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "32"))
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+# Recent extractions, keyed by file content hash
+PDF_CACHE_ENTRIES = int(os.getenv("PDF_CACHE_ENTRIES", "16"))
+
+_pdf_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
+
+def _file_sha256(full_path: str) -> str:
+    h = hashlib.sha256()
+    with open(full_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _extract_page_texts(reader, start: int, stop: int) -> List[str]:
+    texts: List[str] = []
+    for i in range(start, stop):
+        try:
+            texts.append(reader.pages[i].extract_text() or "")
+        except Exception:
+            texts.append("")
+    return texts
+
+
+def _extract_page_range(full_path: str, start: int, stop: int) -> List[str]:
+    """Process-pool worker: text of pages [start, stop)."""
+    from pypdf import PdfReader  # type: ignore
+
+    with open(full_path, "rb") as f:
+        return _extract_page_texts(PdfReader(f), start, stop)
+
+
+def _extract_pages_parallel(full_path: str, page_count: int, workers: int) -> List[str]:
+    ranges = [
+        (start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_TASK)
+    ]
+    # spawn: the API process is multi-threaded, so forking it is unsafe
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=ctx) as pool:
+        futures = [pool.submit(_extract_page_range, full_path, a, b) for a, b in ranges]
+        texts: List[str] = []
+        for future in futures:
+            texts.extend(future.result())
+    return texts
+
+
+def _pdf_structure(page_texts: List[str], page_offsets: List[int]) -> Dict[str, Any]:
+    """Page list for structured_parsing.extract_pdf_structure()."""
+    pages: List[Dict[str, Any]] = []
+    for idx, text in enumerate(page_texts, start=1):
+        heading = ""
+        if text:
+            lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+            if lines:
+                heading = lines[0][:120]
+        pages.append(
+            {
+                "index": idx,
+                "heading": heading,
+                "char_count": len(text),
+                "offset": page_offsets[idx - 1],
+            }
+        )
+    return {"type": "pdf", "pages": pages}
+
+
+def extract_pdf(full_path: str, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Single extraction pass over a PDF, shared by text and structure.
+
+    Returns:
+        {
+            "text": "...",            # cleaned text (clean_extracted_text)
+            "raw_empty": bool,        # no extractable text at all
+            "page_count": int,
+            "page_offsets": [...],    # page starts in the cleaned text
+            "structure": {...},       # {"type": "pdf", "pages": [...]}
+        }
+
+    Large PDFs are extracted in page ranges across a process pool. Results
+    are kept in a small LRU keyed by the file's SHA-256, so parsing a file
+    for text and then for structure (or re-importing the same bytes under
+    another name) costs one extraction. Raises ImportError if pypdf is not
+    installed, and whatever pypdf raises for unreadable files.
+
+    Treat the returned dict as read-only; it may be shared with the cache.
+    """
+    from pypdf import PdfReader  # type: ignore
+
+    digest = _file_sha256(full_path)
+    with _pdf_cache_lock:
+        cached = _pdf_cache.get(digest)
+        if cached is not None:
+            _pdf_cache.move_to_end(digest)
+            return cached
+
+    workers = PDF_EXTRACT_WORKERS if workers is None else workers
+    with open(full_path, "rb") as f:
+        reader = PdfReader(f)
+        page_count = len(reader.pages)
+        if workers > 1 and page_count >= PDF_PARALLEL_MIN_PAGES:
+            page_texts = None
+        else:
+            page_texts = _extract_page_texts(reader, 0, page_count)
+
+    if page_texts is None:
+        page_texts = _extract_pages_parallel(full_path, page_count, workers)
+
+    text, page_offsets = clean_pages(page_texts)
+    result = {
+        "text": text,
+        "raw_empty": not any(t.strip() for t in page_texts),
+        "page_count": page_count,
+        "page_offsets": page_offsets,
+        "structure": _pdf_structure(page_texts, page_offsets),
+    }
+
+    with _pdf_cache_lock:
+        _pdf_cache[digest] = result
+        _pdf_cache.move_to_end(digest)
+        while len(_pdf_cache) > PDF_CACHE_ENTRIES:
+            _pdf_cache.popitem(last=False)
+    return result
+
+
 def _parse_pdf(full_path: str) -> Dict[str, Any]:
     """
     Best-effort PDF parsing using pypdf if available.
 
     Preserves the legacy placeholder messages so that other parts
     of the system can continue to detect non-parseable PDFs.
-    Also records per-page character offsets so chunks can be mapped
-    back to page numbers.
+    Also records per-page character offsets (into the cleaned text) so
+    chunks can be mapped back to page numbers.
     """
     try:
-        from pypdf import PdfReader  # type: ignore
+        import pypdf  # type: ignore  # noqa: F401
     except Exception:
         return {
             "text": (
@@ -222,34 +406,15 @@ def _parse_pdf(full_path: str) -> Dict[str, Any]:
         }
 
     try:
-        with open(full_path, "rb") as f:
-            reader = PdfReader(f)
-
-            page_texts: List[str] = []
-            page_offsets: List[int] = []
-            running = 0
-
-            for page in reader.pages:
-                try:
-                    t = page.extract_text() or ""
-                except Exception:
-                    t = ""
-
-                # Record where this page starts in the concatenated text
-                page_offsets.append(running)
-                page_texts.append(t)
+        pdf = extract_pdf(full_path)
 
-                # When we later do "\n".join(page_texts) we add 1 char newline
-                running += len(t) + 1
-
-        raw_text = "\n".join(page_texts).strip()
-        if not raw_text:
+        if pdf["raw_empty"]:
             return {
                 "text": (
                     "This PDF appears to have no extractable text (it may be a scan). "
                     "You can still open it directly from the file list."
                 ),
-                "meta": {"page_count": len(getattr(reader, "pages", []))},
+                "meta": {"page_count": pdf["page_count"]},
                 "warnings": [
                     "No text could be extracted from this PDF. "
                     "It may be a scanned document or image-only file."
@@ -257,16 +422,13 @@ def _parse_pdf(full_path: str) -> Dict[str, Any]:
                 "parser": "pdf-pypdf2-empty",
             }
 
-        # Clean up the extracted text (remove page numbers, merge broken lines)
-        text = clean_extracted_text(raw_text)
-
         meta: Dict[str, Any] = {
-            "page_count": len(getattr(reader, "pages", [])),
-            # Note: page_offsets are based on raw text, may not match cleaned text
-            "page_offsets": page_offsets,
+            "page_count": pdf["page_count"],
+            # Offsets into the cleaned text, which is what gets chunked
+            "page_offsets": list(pdf["page_offsets"]),
         }
         return {
-            "text": text,
+            "text": pdf["text"],
             "meta": meta,
             "warnings": [],
             "parser": "pdf-pypdf2-cleaned",
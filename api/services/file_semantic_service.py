@@ -22,7 +22,8 @@ import sqlite3
 import numpy as np
 
 from utils.db import get_db
-from core.memory_core import embed
+from services.embedding_migration import embed_query
+from services.fulltext_search import build_match_query, reciprocal_rank_fusion
 from services.llm_service import get_llm_client, get_model_name, llm_is_configured
 from services.embedding_cache import get_or_create_file_chunks
 
@@ -30,6 +31,11 @@ from services.embedding_cache import get_or_create_file_chunks
 FILE_CHUNK_SIZE = 1200
 FILE_CHUNK_OVERLAP = 200
 
+# Retrieval modes: cosine only, FTS5 bm25 only, or reciprocal rank fusion
+SEARCH_MODES = ("semantic", "keyword", "hybrid")
+DEFAULT_KEYWORD_WEIGHT = 0.5
+HYBRID_CANDIDATE_FACTOR = 4
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -105,16 +111,8 @@ def _embed_query_and_get_chunk_embeddings(
     if not llm_is_configured():
         return None, None
 
-    # Embed query fresh
-    q_emb_raw = embed(query)
-
-    # Normalize query embedding
-    if isinstance(q_emb_raw, (bytes, bytearray, memoryview)):
-        q_emb = np.frombuffer(q_emb_raw, dtype=np.float32)
-    elif isinstance(q_emb_raw, np.ndarray):
-        q_emb = q_emb_raw.astype(np.float32, copy=False)
-    else:
-        q_emb = np.array(q_emb_raw, dtype=np.float32)
+    # Embed query fresh, with the model the cached vectors currently use
+    q_emb = embed_query("file_chunks", query)
 
     # Extract pre-computed chunk embeddings
     arrs: List[np.ndarray] = []
@@ -128,6 +126,9 @@ def _embed_query_and_get_chunk_embeddings(
             arrs.append(np.frombuffer(emb, dtype=np.float32))
         else:
             arrs.append(np.array(emb, dtype=np.float32))
+        if arrs[-1].shape != q_emb.shape:
+            # Written by the other model mid-migration; finalize re-embeds it
+            arrs[-1] = np.zeros_like(q_emb)
 
     if not arrs:
         return None, None
@@ -136,6 +137,43 @@ def _embed_query_and_get_chunk_embeddings(
     return q_emb, chunk_embs
 
 
+def _keyword_rank_project_chunks(
+    project_id: int, query: str, chunks: List[Dict[str, Any]], limit: int
+) -> List[int]:
+    """
+    Rank a project's cached chunks by FTS5 bm25 (file_chunks_fts).
+
+    Returns indices into `chunks`, best first. Chunks are matched by
+    (file_id, chunk_index) so the result lines up with the embedding order.
+    """
+    match = build_match_query(query, match_all=False)
+    if not match:
+        return []
+
+    position = {(c["file_id"], c["chunk_index"]): i for i, c in enumerate(chunks)}
+
+    conn = get_db()
+    cur = conn.execute(
+        """
+        SELECT fc.file_id, fc.chunk_index
+        FROM file_chunks_fts
+        JOIN file_chunks fc ON fc.id = file_chunks_fts.rowid
+        WHERE file_chunks_fts MATCH ?
+          AND fc.project_id = ?
+        ORDER BY bm25(file_chunks_fts)
+        LIMIT ?
+        """,
+        (match, project_id, limit),
+    )
+    ranked = []
+    for row in cur.fetchall():
+        idx = position.get((row["file_id"], row["chunk_index"]))
+        if idx is not None:
+            ranked.append(idx)
+    conn.close()
+    return ranked
+
+
 # ---------------------------------------------------------------------------
 # Semantic search
 # ---------------------------------------------------------------------------
@@ -147,10 +185,17 @@ def semantic_search_project_files(
     query: str,
     top_k: int = 20,  # a bit higher for "find all specs mentioning X"
     include_answer: bool = True,
+    mode: str = "semantic",
+    keyword_weight: float = DEFAULT_KEYWORD_WEIGHT,
 ) -> Dict[str, Any]:
     """
     Top-level API used by routes.projects_api.
 
+    mode:
+      - "semantic": cosine similarity over cached chunk embeddings
+      - "keyword": FTS5 bm25 over chunk text
+      - "hybrid": reciprocal rank fusion of both (keyword_weight = keyword share)
+
     Returns:
       {
         "query": "...",
@@ -158,6 +203,9 @@ def semantic_search_project_files(
         "answer": "LLM-grounded explanation or None"
       }
     """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(SEARCH_MODES)}")
+
     query = (query or "").strip()
     if not query:
         return {"query": query, "results": [], "answer": None}
@@ -166,18 +214,33 @@ def semantic_search_project_files(
     if not chunks:
         return {"query": query, "results": [], "answer": None}
 
-    q_emb, chunk_embs = _embed_query_and_get_chunk_embeddings(query, chunks)
-    if q_emb is None or chunk_embs is None:
-        return {"query": query, "results": [], "answer": None}
-
-    norms = np.linalg.norm(chunk_embs, axis=1) * np.linalg.norm(q_emb)
-    sims = np.dot(chunk_embs, q_emb) / np.maximum(norms, 1e-8)
-
-    top_indices = np.argsort(-sims)[:top_k]
+    sims = None
+    vector_ranked: List[int] = []
+    if mode != "keyword":
+        q_emb, chunk_embs = _embed_query_and_get_chunk_embeddings(query, chunks)
+        if q_emb is not None and chunk_embs is not None:
+            norms = np.linalg.norm(chunk_embs, axis=1) * np.linalg.norm(q_emb)
+            sims = np.dot(chunk_embs, q_emb) / np.maximum(norms, 1e-8)
+            vector_ranked = [int(i) for i in np.argsort(-sims)]
+        elif mode == "semantic":
+            return {"query": query, "results": [], "answer": None}
+
+    if mode == "semantic":
+        ranked = [(idx, float(sims[idx])) for idx in vector_ranked[:top_k]]
+    else:
+        n_candidates = top_k * HYBRID_CANDIDATE_FACTOR
+        keyword_ranked = _keyword_rank_project_chunks(
+            project_id, query, chunks, n_candidates
+        )
+        fused = reciprocal_rank_fusion(
+            keyword_ranked,
+            vector_ranked[:n_candidates] if mode == "hybrid" else [],
+            keyword_weight=keyword_weight if mode == "hybrid" else 1.0,
+        )
+        ranked = fused[:top_k]
 
     hits: List[Dict[str, Any]] = []
-    for idx in top_indices:
-        idx_int = int(idx)
+    for idx_int, score in ranked:
         c = chunks[idx_int]
         hits.append(
             {
@@ -186,7 +249,7 @@ def semantic_search_project_files(
                 "mime_type": c.get("mime_type"),
                 "chunk_index": c["chunk_index"],
                 "page": c.get("page"),
-                "score": float(sims[idx_int]),
+                "score": score,
                 "text": c["content"],  # Cache uses "content" key
             }
         )
@@ -307,7 +370,8 @@ def summarize_project_files(
 
     llm = get_llm_client()
     model_name = get_model_name()
-    answer = llm.chat_completion(messages=messages, model=model_name)
+    # Unchanged project files + same instructions -> same prompt; reuse it
+    answer = llm.cached_chat_completion(messages=messages, model=model_name)
 
     return {
         "summary": answer,
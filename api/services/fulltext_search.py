@@ -0,0 +1,348 @@
+"""
+Full-Text Search Service
+
+SQLite FTS5 search over conversation titles, message content and projects
+(name + description). Indexes are external-content FTS5 tables kept in sync
+by triggers (see migrations/016_fts_search.sql, 017_chunk_fts.sql).
+
+- bm25 ranking (lower is better, SQLite convention)
+- snippet() extraction with highlight offsets
+- limit/offset pagination
+- reciprocal rank fusion for hybrid keyword + vector retrieval
+"""
+
+import logging
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Pagination limits
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# snippet() parameters: tokens of context around the match
+SNIPPET_TOKENS = 24
+SNIPPET_ELLIPSIS = "…"
+
+# Control characters used as snippet() highlight markers. They never appear
+# in chat text, so they can be stripped unambiguously into offsets.
+_HL_OPEN = "\x02"
+_HL_CLOSE = "\x03"
+
+# Column weights for bm25 on projects_fts: name matches outrank description
+PROJECT_NAME_WEIGHT = 10.0
+PROJECT_DESCRIPTION_WEIGHT = 1.0
+
+# Reciprocal rank fusion constant (Cormack et al. use 60)
+RRF_K = 60
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Dropped from OR-style retrieval queries; they match nearly every chunk
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be but by do does did for from had has have how i if in
+    into is it its me my no not of on or our so than that the their them then
+    there these they this to was we were what when where which who whom why
+    will with would you your about can could should
+    """.split()
+)
+
+
+def build_match_query(query: str, match_all: bool = True) -> Optional[str]:
+    """
+    Convert free user input into a safe FTS5 MATCH expression.
+
+    Each word becomes a quoted term, so FTS5 operators and punctuation in
+    user input can never cause a syntax error. Returns None if the input has
+    no searchable words.
+
+    Args:
+        query: Raw user input
+        match_all: True for search boxes (prefix terms, all must match).
+                   False for retrieval over natural-language questions
+                   (whole terms OR-ed, stopwords dropped, bm25 ranks).
+    """
+    tokens = _TOKEN_RE.findall(query or "")
+    if match_all:
+        if not tokens:
+            return None
+        return " ".join(f'"{t}"*' for t in tokens)
+
+    terms = []
+    for t in tokens:
+        key = t.lower()
+        if key in _STOPWORDS or key in terms:
+            continue
+        terms.append(key)
+    if not terms:
+        return None
+    return " OR ".join(f'"{t}"' for t in terms)
+
+
+def reciprocal_rank_fusion(
+    keyword_keys: List[Any],
+    vector_keys: List[Any],
+    keyword_weight: float = 0.5,
+    k: int = RRF_K,
+) -> List[Tuple[Any, float]]:
+    """
+    Fuse a keyword ranking and a vector ranking with weighted RRF.
+
+    score(d) = w / (k + rank_kw(d)) + (1 - w) / (k + rank_vec(d))
+
+    Args:
+        keyword_keys: Result keys ordered best-first by keyword rank
+        vector_keys: Result keys ordered best-first by vector similarity
+        keyword_weight: 0.0 = pure vector, 1.0 = pure keyword
+        k: RRF damping constant
+
+    Returns:
+        [(key, score), ...] best-first. Scores are normalized so a document
+        ranked first in both lists scores 1.0.
+    """
+    w = max(0.0, min(1.0, keyword_weight))
+    scores: Dict[Any, float] = {}
+
+    for rank, key in enumerate(keyword_keys, 1):
+        scores[key] = scores.get(key, 0.0) + w / (k + rank)
+    for rank, key in enumerate(vector_keys, 1):
+        scores[key] = scores.get(key, 0.0) + (1.0 - w) / (k + rank)
+
+    best = 1.0 / (k + 1)
+    fused = [(key, score / best) for key, score in scores.items()]
+    fused.sort(key=lambda x: x[1], reverse=True)
+    return fused
+
+
+def clamp_page(limit: Any, offset: Any) -> Tuple[int, int]:
+    """Normalize pagination params from request args."""
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        offset = 0
+    return max(1, min(limit, MAX_PAGE_SIZE)), max(0, offset)
+
+
+def split_highlights(marked: str) -> Tuple[str, List[List[int]]]:
+    """
+    Strip highlight markers from a snippet.
+
+    Returns:
+        (plain_text, [[start, end], ...]) with offsets into plain_text
+    """
+    if not marked:
+        return "", []
+
+    plain: List[str] = []
+    spans: List[List[int]] = []
+    pos = 0
+    start = None
+    for ch in marked:
+        if ch == _HL_OPEN:
+            start = pos
+        elif ch == _HL_CLOSE:
+            if start is not None:
+                spans.append([start, pos])
+            start = None
+        else:
+            plain.append(ch)
+            pos += 1
+    return "".join(plain), spans
+
+
+def _snippet_sql(table: str, column: int) -> str:
+    return (
+        f"snippet({table}, {column}, '{_HL_OPEN}', '{_HL_CLOSE}', "
+        f"'{SNIPPET_ELLIPSIS}', {SNIPPET_TOKENS})"
+    )
+
+
+def search_conversation_titles(
+    user_id: int,
+    query: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    offset: int = 0,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Dict[str, Any]]:
+    """Search conversation titles for a user, best matches first."""
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    own_conn = conn is None
+    conn = conn or get_db()
+    try:
+        cur = conn.execute(
+            """
+            SELECT c.id, c.title, c.project_id, c.mode, c.created_at, c.updated_at,
+                   bm25(conversations_fts) AS rank
+            FROM conversations_fts
+            JOIN conversations c ON c.id = conversations_fts.rowid
+            WHERE conversations_fts MATCH ?
+              AND c.user_id = ?
+            ORDER BY rank, c.updated_at DESC
+            LIMIT ? OFFSET ?
+            """,
+            (match, user_id, limit, offset),
+        )
+        results = []
+        for r in cur.fetchall():
+            row = dict(r)
+            row["rank"] = round(row["rank"], 4)
+            row["match_source"] = "title"
+            results.append(row)
+        return results
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def search_messages(
+    user_id: int,
+    query: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    offset: int = 0,
+    exclude_title_matches: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Search message content, returning one row per conversation.
+
+    Each conversation is represented by its best-ranked matching message,
+    with a snippet and highlight offsets for that message. With
+    exclude_title_matches, conversations whose title also matches are
+    skipped (they are already returned by search_conversation_titles), which
+    keeps the two result sets disjoint across every page.
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    exclude_sql = ""
+    params: List[Any] = [match, user_id]
+    if exclude_title_matches:
+        exclude_sql = (
+            "AND c.id NOT IN (SELECT rowid FROM conversations_fts "
+            "WHERE conversations_fts MATCH ?)"
+        )
+        params.append(match)
+    params.extend([limit, offset])
+
+    own_conn = conn is None
+    conn = conn or get_db()
+    try:
+        # bm25()/snippet() only work in the FTS query itself, so hits are
+        # materialized first and the best message per conversation is
+        # picked by a window over the materialized ranks.
+        cur = conn.execute(
+            f"""
+            WITH hits AS MATERIALIZED (
+                SELECT c.id, c.title, c.project_id, c.mode, c.created_at, c.updated_at,
+                       m.id AS message_id,
+                       bm25(messages_fts) AS rank,
+                       {_snippet_sql('messages_fts', 0)} AS _snippet
+                FROM messages_fts
+                JOIN messages m ON m.id = messages_fts.rowid
+                JOIN conversations c ON c.id = m.conversation_id
+                WHERE messages_fts MATCH ?
+                  AND c.user_id = ?
+                  {exclude_sql}
+            )
+            SELECT id, title, project_id, mode, created_at, updated_at,
+                   message_id, rank, _snippet
+            FROM (
+                SELECT hits.*,
+                       ROW_NUMBER() OVER (PARTITION BY id ORDER BY rank) AS rn
+                FROM hits
+            )
+            WHERE rn = 1
+            ORDER BY rank, updated_at DESC
+            LIMIT ? OFFSET ?
+            """,
+            params,
+        )
+        results = []
+        for r in cur.fetchall():
+            row = dict(r)
+            snippet, highlights = split_highlights(row.pop("_snippet") or "")
+            row["rank"] = round(row["rank"], 4)
+            row["match_source"] = "message"
+            row["match_snippet"] = snippet
+            row["match_highlights"] = highlights
+            results.append(row)
+        return results
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def search_projects(
+    user_id: int,
+    query: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    offset: int = 0,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Dict[str, Any]]:
+    """Search project name and description, name matches weighted higher."""
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    own_conn = conn is None
+    conn = conn or get_db()
+    try:
+        cur = conn.execute(
+            f"""
+            SELECT p.id, p.name, p.description, p.created_at,
+                   bm25(projects_fts, ?, ?) AS rank,
+                   {_snippet_sql('projects_fts', 1)} AS _snippet
+            FROM projects_fts
+            JOIN projects p ON p.id = projects_fts.rowid
+            WHERE projects_fts MATCH ?
+              AND p.user_id = ?
+            ORDER BY rank, p.created_at DESC
+            LIMIT ? OFFSET ?
+            """,
+            (
+                PROJECT_NAME_WEIGHT,
+                PROJECT_DESCRIPTION_WEIGHT,
+                match,
+                user_id,
+                limit,
+                offset,
+            ),
+        )
+        results = []
+        for r in cur.fetchall():
+            row = dict(r)
+            snippet, highlights = split_highlights(row.pop("_snippet") or "")
+            row["rank"] = round(row["rank"], 4)
+            if highlights:
+                row["match_snippet"] = snippet
+                row["match_highlights"] = highlights
+            results.append(row)
+        return results
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def rebuild_indexes() -> None:
+    """Rebuild all FTS indexes from their content tables."""
+    conn = get_db()
+    try:
+        for table in ("messages_fts", "conversations_fts", "projects_fts"):
+            conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        conn.commit()
+        logger.info("Rebuilt FTS indexes")
+    finally:
+        conn.close()
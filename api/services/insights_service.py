@@ -214,13 +214,16 @@ def generate_insights(
         client = get_llm_client()
         model = get_model_name()
 
-        response = client.chat_completion(
+        # Identical file text -> identical prompt, so reuse a cached response
+        # unless the caller explicitly asked for regeneration.
+        response = client.cached_chat_completion(
             messages=[
                 {"role": "system", "content": INSIGHTS_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt},
             ],
             model=model,
             temperature=0.3,  # Lower temperature for more consistent analysis
+            cache_refresh=force,
         )
 
         insights = _parse_llm_response(response)
@@ -7,16 +7,98 @@ Reads from local Zotero SQLite database and imports references.
 Supports reading collections, items, and PDF attachments.
 """
 
+import contextlib
+import hashlib
 import json
 import logging
 import os
+import shutil
 import sqlite3
+import tempfile
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
+# Zotero field name -> ZoteroItem / raw_data key
+ITEM_FIELDS = {
+    "title": "title",
+    "date": "date",
+    "abstractNote": "abstract",
+    "url": "url",
+    "DOI": "doi",
+}
+
+# itemIDs per IN (...) query, under SQLite's default variable limit
+IN_BATCH_SIZE = 500
+
+# Where read snapshots of zotero.sqlite are kept
+SNAPSHOT_DIR = os.getenv("ZOTERO_SNAPSHOT_DIR") or os.path.join(tempfile.gettempdir(), "tamor-zotero")
+
+_snapshots: Dict[str, tuple] = {}  # db_path -> (mtime_ns, size, snapshot path)
+_snapshots_lock = threading.Lock()
+
+
+def _snapshot_path(db_path: str) -> str:
+    """
+    Path of a private copy of zotero.sqlite, refreshed when it changes.
+
+    Zotero keeps its database exclusively locked while running, and
+    copying ~100 MB per request would be worse than the queries. The
+    copy is remade only when the source's mtime or size (or its WAL's)
+    changes, so repeated reads of an unchanged library cost one stat.
+    """
+    stamp = []
+    for suffix in ("", "-wal"):
+        try:
+            st = os.stat(db_path + suffix)
+            stamp += [st.st_mtime_ns, st.st_size]
+        except FileNotFoundError:
+            stamp += [0, 0]
+    stamp = tuple(stamp)
+
+    with _snapshots_lock:
+        cached = _snapshots.get(db_path)
+        if cached and cached[0] == stamp and os.path.exists(cached[1]):
+            return cached[1]
+
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        name = hashlib.sha1(os.path.abspath(db_path).encode()).hexdigest()[:16]
+        target = os.path.join(SNAPSHOT_DIR, f"{name}.sqlite")
+        tmp = f"{target}.{os.getpid()}.tmp"
+        for suffix in ("-wal", "-shm"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp + suffix)
+        shutil.copyfile(db_path, tmp)
+        if os.path.exists(db_path + "-wal"):
+            shutil.copyfile(db_path + "-wal", tmp + "-wal")
+        # Fold any WAL in and leave WAL mode, so the copy opens read-only
+        # as a single file
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            conn.close()
+        os.replace(tmp, target)
+
+        _snapshots[db_path] = (stamp, target)
+        return target
+
+
+def _select_in(
+    conn: sqlite3.Connection,
+    sql: str,
+    ids: Sequence[int],
+    params: Sequence[Any] = (),
+) -> Iterator[sqlite3.Row]:
+    """Run sql with its {ids} placeholder bound to ids, in batches."""
+    for start in range(0, len(ids), IN_BATCH_SIZE):
+        batch = list(ids[start:start + IN_BATCH_SIZE])
+        query = sql.format(ids=", ".join("?" * len(batch)))
+        yield from conn.execute(query, [*params, *batch])
+
 
 @dataclass
 class ZoteroItem:
@@ -33,6 +115,7 @@ class ZoteroItem:
     tags: List[str] = field(default_factory=list)
     attachments: List[Dict[str, str]] = field(default_factory=list)
     raw_data: Dict[str, Any] = field(default_factory=dict)
+    item_id: Optional[int] = None  # Zotero itemID (the pagination cursor)
 
 
 class ZoteroReader:
@@ -47,10 +130,11 @@ class ZoteroReader:
     The actual database is in a profile folder like: abc123.default/zotero.sqlite
     """
 
-    def __init__(self, zotero_data_path: Optional[str] = None):
+    def __init__(self, zotero_data_path: Optional[str] = None, use_snapshot: bool = True):
         self.data_path = zotero_data_path or self._find_zotero_path()
         self.db_path = self._find_database()
         self.storage_path = os.path.join(os.path.dirname(self.db_path), "storage")
+        self.use_snapshot = use_snapshot
 
     def _find_zotero_path(self) -> str:
         """Find Zotero data directory."""
@@ -92,9 +176,20 @@ class ZoteroReader:
         raise FileNotFoundError(f"Could not find zotero.sqlite in {self.data_path}")
 
     def _connect(self) -> sqlite3.Connection:
-        """Connect to Zotero database (read-only)."""
-        # Connect in read-only mode to avoid locking issues
-        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        """
+        Connect to the Zotero database (read-only).
+
+        Reads go to a snapshot copy (see _snapshot_path), so a running
+        Zotero's exclusive lock doesn't block us; the live file is the
+        fallback if the snapshot can't be made.
+        """
+        path = self.db_path
+        if self.use_snapshot:
+            try:
+                path = _snapshot_path(self.db_path)
+            except OSError as e:
+                logger.warning(f"Zotero snapshot failed, reading live database: {e}")
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
         conn.row_factory = sqlite3.Row
         return conn
 
@@ -119,23 +214,21 @@ class ZoteroReader:
         collection_id: Optional[int] = None,
         item_type: Optional[str] = None,
         limit: int = 100,
+        after_id: Optional[int] = None,
     ) -> List[ZoteroItem]:
-        """Get items, optionally filtered by collection or type."""
+        """
+        Get items, optionally filtered by collection or type.
+
+        Items come in itemID order. For the next page pass the last
+        item's item_id as after_id (keyset pagination: each page is an
+        index range scan, however deep).
+        """
         conn = self._connect()
         try:
-            # Base query for items
             query = """
-                SELECT i.itemID, i.key, it.typeName,
-                       MAX(CASE WHEN f.fieldName = 'title' THEN iv.value END) as title,
-                       MAX(CASE WHEN f.fieldName = 'date' THEN iv.value END) as date,
-                       MAX(CASE WHEN f.fieldName = 'abstractNote' THEN iv.value END) as abstract,
-                       MAX(CASE WHEN f.fieldName = 'url' THEN iv.value END) as url,
-                       MAX(CASE WHEN f.fieldName = 'DOI' THEN iv.value END) as doi
+                SELECT i.itemID, i.key, it.typeName
                 FROM items i
                 JOIN itemTypes it ON i.itemTypeID = it.itemTypeID
-                LEFT JOIN itemData id ON i.itemID = id.itemID
-                LEFT JOIN itemDataValues iv ON id.valueID = iv.valueID
-                LEFT JOIN fields f ON id.fieldID = f.fieldID
             """
 
             conditions = ["it.typeName != 'attachment'", "it.typeName != 'note'"]
@@ -150,94 +243,137 @@ class ZoteroReader:
                 conditions.append("it.typeName = ?")
                 params.append(item_type)
 
+            if after_id is not None:
+                conditions.append("i.itemID > ?")
+                params.append(after_id)
+
             query += " WHERE " + " AND ".join(conditions)
-            query += " GROUP BY i.itemID"
-            query += f" LIMIT {limit}"
-
-            results = conn.execute(query, params).fetchall()
-
-            items = []
-            for row in results:
-                # Get creators
-                creators = self._get_item_creators(conn, row["itemID"])
-
-                # Get tags
-                tags = self._get_item_tags(conn, row["itemID"])
-
-                # Get attachments
-                attachments = self._get_item_attachments(conn, row["itemID"])
-
-                items.append(
-                    ZoteroItem(
-                        key=row["key"],
-                        item_type=row["typeName"],
-                        title=row["title"] or "Untitled",
-                        creators=creators,
-                        date=row["date"],
-                        abstract=row["abstract"],
-                        url=row["url"],
-                        doi=row["doi"],
-                        tags=tags,
-                        attachments=attachments,
-                        raw_data=dict(row),
-                    )
-                )
+            query += " ORDER BY i.itemID LIMIT ?"
+            params.append(limit)
 
-            return items
+            rows = conn.execute(query, params).fetchall()
+            return self._load_items(conn, rows)
         finally:
             conn.close()
 
-    def _get_item_creators(self, conn, item_id: int) -> List[Dict[str, str]]:
-        """Get creators for an item."""
-        results = conn.execute(
+    def _load_items(self, conn, rows: List[sqlite3.Row]) -> List[ZoteroItem]:
+        """
+        Build ZoteroItems for (itemID, key, typeName) rows.
+
+        Fields, creators, tags and attachments are each loaded for all
+        items with one itemID IN (...) query and grouped in memory.
+        """
+        if not rows:
+            return []
+
+        item_ids = [r["itemID"] for r in rows]
+        fields = self._get_fields(conn, item_ids)
+        creators = self._get_creators(conn, item_ids)
+        tags = self._get_tags(conn, item_ids)
+        attachments = self._get_attachments(conn, item_ids)
+
+        items = []
+        for row in rows:
+            item_id = row["itemID"]
+            values = fields.get(item_id, {})
+            raw_data = {
+                "itemID": item_id,
+                "key": row["key"],
+                "typeName": row["typeName"],
+                **{name: values.get(field_name) for field_name, name in ITEM_FIELDS.items()},
+            }
+            items.append(
+                ZoteroItem(
+                    key=row["key"],
+                    item_type=row["typeName"],
+                    title=raw_data["title"] or "Untitled",
+                    creators=creators.get(item_id, []),
+                    date=raw_data["date"],
+                    abstract=raw_data["abstract"],
+                    url=raw_data["url"],
+                    doi=raw_data["doi"],
+                    tags=tags.get(item_id, []),
+                    attachments=attachments.get(item_id, []),
+                    raw_data=raw_data,
+                    item_id=item_id,
+                )
+            )
+
+        return items
+
+    def _get_fields(self, conn, item_ids: List[int]) -> Dict[int, Dict[str, str]]:
+        """Field values we use, by itemID then Zotero field name."""
+        names = list(ITEM_FIELDS)
+        out: Dict[int, Dict[str, str]] = {}
+        for r in _select_in(
+            conn,
+            f"""
+            SELECT id.itemID, f.fieldName, iv.value
+            FROM itemData id
+            JOIN fields f ON id.fieldID = f.fieldID
+            JOIN itemDataValues iv ON id.valueID = iv.valueID
+            WHERE f.fieldName IN ({", ".join("?" * len(names))})
+              AND id.itemID IN ({{ids}})
+            """,
+            item_ids,
+            names,
+        ):
+            out.setdefault(r["itemID"], {})[r["fieldName"]] = r["value"]
+        return out
+
+    def _get_creators(self, conn, item_ids: List[int]) -> Dict[int, List[Dict[str, str]]]:
+        """Creators by itemID, in author order."""
+        out: Dict[int, List[Dict[str, str]]] = {}
+        for r in _select_in(
+            conn,
             """
-            SELECT c.firstName, c.lastName, ct.creatorType
+            SELECT ic.itemID, c.firstName, c.lastName, ct.creatorType
             FROM itemCreators ic
             JOIN creators c ON ic.creatorID = c.creatorID
             JOIN creatorTypes ct ON ic.creatorTypeID = ct.creatorTypeID
-            WHERE ic.itemID = ?
-            ORDER BY ic.orderIndex
+            WHERE ic.itemID IN ({ids})
+            ORDER BY ic.itemID, ic.orderIndex
             """,
-            (item_id,),
-        ).fetchall()
-
-        return [
-            {
-                "firstName": r["firstName"] or "",
-                "lastName": r["lastName"] or "",
-                "type": r["creatorType"],
-            }
-            for r in results
-        ]
-
-    def _get_item_tags(self, conn, item_id: int) -> List[str]:
-        """Get tags for an item."""
-        results = conn.execute(
+            item_ids,
+        ):
+            out.setdefault(r["itemID"], []).append(
+                {
+                    "firstName": r["firstName"] or "",
+                    "lastName": r["lastName"] or "",
+                    "type": r["creatorType"],
+                }
+            )
+        return out
+
+    def _get_tags(self, conn, item_ids: List[int]) -> Dict[int, List[str]]:
+        """Tag names by itemID."""
+        out: Dict[int, List[str]] = {}
+        for r in _select_in(
+            conn,
             """
-            SELECT t.name
+            SELECT it.itemID, t.name
             FROM itemTags it
             JOIN tags t ON it.tagID = t.tagID
-            WHERE it.itemID = ?
+            WHERE it.itemID IN ({ids})
             """,
-            (item_id,),
-        ).fetchall()
-
-        return [r["name"] for r in results]
-
-    def _get_item_attachments(self, conn, item_id: int) -> List[Dict[str, str]]:
-        """Get attachments for an item."""
-        results = conn.execute(
+            item_ids,
+        ):
+            out.setdefault(r["itemID"], []).append(r["name"])
+        return out
+
+    def _get_attachments(self, conn, item_ids: List[int]) -> Dict[int, List[Dict[str, str]]]:
+        """Attachments by parent itemID."""
+        out: Dict[int, List[Dict[str, str]]] = {}
+        for r in _select_in(
+            conn,
             """
-            SELECT i.key, ia.contentType, ia.path
+            SELECT ia.parentItemID, i.key, ia.contentType, ia.path
             FROM itemAttachments ia
             JOIN items i ON ia.itemID = i.itemID
-            WHERE ia.parentItemID = ?
+            WHERE ia.parentItemID IN ({ids})
             """,
-            (item_id,),
-        ).fetchall()
-
-        attachments = []
-        for r in results:
+            item_ids,
+        ):
             att: Dict[str, Any] = {
                 "key": r["key"],
                 "content_type": r["contentType"],
@@ -251,17 +387,27 @@ class ZoteroReader:
                 if os.path.exists(full_path):
                     att["full_path"] = full_path
 
-            attachments.append(att)
-
-        return attachments
+            out.setdefault(r["parentItemID"], []).append(att)
+        return out
 
     def get_item_by_key(self, key: str) -> Optional[ZoteroItem]:
         """Get a single item by its key."""
-        items = self.get_items(limit=10000)  # Search all items
-        for item in items:
-            if item.key == key:
-                return item
-        return None
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                """
+                SELECT i.itemID, i.key, it.typeName
+                FROM items i
+                JOIN itemTypes it ON i.itemTypeID = it.itemTypeID
+                WHERE i.key = ?
+                  AND it.typeName != 'attachment' AND it.typeName != 'note'
+                """,
+                (key,),
+            ).fetchall()
+            items = self._load_items(conn, rows)
+            return items[0] if items else None
+        finally:
+            conn.close()
 
     def get_pdf_path(self, item: ZoteroItem) -> Optional[str]:
         """Get path to PDF attachment if available."""
@@ -296,22 +442,38 @@ class ZoteroReader:
         return citation
 
     def search_items(self, query: str, limit: int = 50) -> List[ZoteroItem]:
-        """Search items by title or abstract."""
-        all_items = self.get_items(limit=10000)
-        query_lower = query.lower()
-
-        matches = []
-        for item in all_items:
-            title_match = query_lower in (item.title or "").lower()
-            abstract_match = query_lower in (item.abstract or "").lower()
-            tag_match = any(query_lower in tag.lower() for tag in item.tags)
-
-            if title_match or abstract_match or tag_match:
-                matches.append(item)
-                if len(matches) >= limit:
-                    break
-
-        return matches
+        """Search items by title, abstract or tag (case-insensitive substring)."""
+        pattern = "%" + query.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                """
+                SELECT i.itemID, i.key, it.typeName
+                FROM items i
+                JOIN itemTypes it ON i.itemTypeID = it.itemTypeID
+                WHERE it.typeName != 'attachment' AND it.typeName != 'note'
+                  AND i.itemID IN (
+                      SELECT id.itemID
+                      FROM itemData id
+                      JOIN fields f ON id.fieldID = f.fieldID
+                      JOIN itemDataValues iv ON id.valueID = iv.valueID
+                      WHERE f.fieldName IN ('title', 'abstractNote')
+                        AND lower(iv.value) LIKE ? ESCAPE '\\'
+                      UNION
+                      SELECT itg.itemID
+                      FROM itemTags itg
+                      JOIN tags t ON itg.tagID = t.tagID
+                      WHERE lower(t.name) LIKE ? ESCAPE '\\'
+                  )
+                ORDER BY i.itemID
+                LIMIT ?
+                """,
+                (pattern, pattern, limit),
+            ).fetchall()
+            return self._load_items(conn, rows)
+        finally:
+            conn.close()
 
 
 def get_zotero_reader(data_path: Optional[str] = None) -> ZoteroReader:
@@ -7,20 +7,39 @@ Responsibilities:
 - Extract symbols / parameters / config keys from text-like project files.
 - Store one row per symbol occurrence in file_symbols.
 - Provide a fuzzy search API over those symbols using embeddings.
+
+Extraction is incremental: file_symbol_state keeps each file's content
+hash (and size / mtime, so unchanged files on disk are not even read),
+and only new or changed files are re-extracted, all in one transaction.
+Search keeps a per-project matrix of normalized symbol embeddings in
+memory, rebuilt when the project's symbols change.
 """
 
 from __future__ import annotations
 
+import hashlib
+import logging
 import os
 import re
 import sqlite3
-from typing import Any, Dict, List, Tuple
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
 from utils.db import get_db
-from core.memory_core import embed
-from routes.files_api import get_or_extract_file_text_for_row
+from core.memory_core import embed, embed_many
+from routes.files_api import _get_upload_root, get_or_extract_file_text_for_row
+
+logger = logging.getLogger(__name__)
+
+# Symbols embedded per embed_many() call
+SYMBOL_EMBED_BATCH = int(os.getenv("SYMBOL_EMBED_BATCH", "256"))
+
+# Projects whose symbol matrix is kept in memory
+SYMBOL_MATRIX_CACHE_PROJECTS = int(os.getenv("SYMBOL_MATRIX_CACHE_PROJECTS", "8"))
 
 # Reuse the same placeholder detection idea as file_semantic_service
 _PLACEHOLDER_PREFIXES = (
@@ -101,8 +120,16 @@ def ensure_file_symbols_table() -> None:
     Ensure the file_symbols table exists *and* has the columns we expect.
 
     This handles the case where an older version of the table was created
-    without char_offset / snippet / embedding / created_at.
+    without project_id / char_offset / snippet / embedding / created_at.
+    Also creates file_symbol_state (per-file content hashes). Runs the
+    DDL once per database per process.
     """
+    from utils import db as db_module
+
+    db_path = db_module.DB_PATH
+    if db_path in _ensured_dbs:
+        return
+
     conn = get_db()
     cur = conn.cursor()
 
@@ -111,6 +138,7 @@ def ensure_file_symbols_table() -> None:
         """
         CREATE TABLE IF NOT EXISTS file_symbols (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER,
             file_id INTEGER NOT NULL,
             symbol TEXT NOT NULL,
             char_offset INTEGER,
@@ -126,6 +154,9 @@ def ensure_file_symbols_table() -> None:
     cur.execute("PRAGMA table_info(file_symbols)")
     cols = {row[1] for row in cur.fetchall()}  # row[1] = column name
 
+    if "project_id" not in cols:
+        cur.execute("ALTER TABLE file_symbols ADD COLUMN project_id INTEGER")
+
     if "char_offset" not in cols:
         cur.execute("ALTER TABLE file_symbols ADD COLUMN char_offset INTEGER")
 
@@ -140,126 +171,410 @@ def ensure_file_symbols_table() -> None:
             "ALTER TABLE file_symbols ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
         )
 
-    # 3) Index on symbol for faster lookups
+    # Rows written before project_id was filled in
+    cur.execute(
+        """
+        UPDATE file_symbols
+        SET project_id = (SELECT pf.project_id FROM project_files pf WHERE pf.id = file_symbols.file_id)
+        WHERE project_id IS NULL
+        """
+    )
+
+    # 3) Indexes: symbol lookups, per-file replace, per-project search
     cur.execute(
         "CREATE INDEX IF NOT EXISTS idx_file_symbols_symbol ON file_symbols(symbol)"
     )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_file_symbols_file ON file_symbols(file_id)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_file_symbols_project_symbol ON file_symbols(project_id, symbol)"
+    )
+
+    # 4) Per-file content hash of the last extraction
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS file_symbol_state (
+            file_id INTEGER PRIMARY KEY,
+            project_id INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            size_bytes INTEGER,
+            mtime_ns INTEGER,
+            symbol_count INTEGER NOT NULL DEFAULT 0,
+            extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (file_id) REFERENCES project_files(id)
+        )
+        """
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_file_symbol_state_project ON file_symbol_state(project_id)"
+    )
 
     conn.commit()
+    conn.close()
+    _ensured_dbs.add(db_path)
 
 
+_ensured_dbs: set = set()
 
-def extract_symbols_for_project(project_id: int, user_id: int) -> int:
-    """
-    Extract symbols from all text-like files in a project and store them in file_symbols.
 
-    Returns total number of symbols stored.
-    """
-    ensure_file_symbols_table()
-
-    conn = get_db()
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT pf.*
-        FROM project_files pf
-        JOIN projects p ON pf.project_id = p.id
-        WHERE pf.project_id = ? AND p.user_id = ?
-        ORDER BY pf.id DESC
-        """,
-        (project_id, user_id),
-    )
-    rows = cur.fetchall()
+def _stored_file_path(row: sqlite3.Row, upload_root: Optional[str]) -> Optional[str]:
+    if not upload_root or not row["stored_name"]:
+        return None
+    path = os.path.join(upload_root, row["stored_name"])
+    return path if os.path.isfile(path) else None
 
-    total_symbols = 0
 
-    for row in rows:
-        filename = row["filename"]
-        mime_type = row["mime_type"] or ""
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
 
-        if not _looks_text_like(filename, mime_type):
-            continue
 
-        text = _load_file_text_for_row(row)
-        if not text or any(text.startswith(p) for p in _PLACEHOLDER_PREFIXES):
-            continue
+def _drop_cached_text(file_id: int) -> None:
+    conn = get_db()
+    try:
+        conn.execute("DELETE FROM file_text_cache WHERE file_id = ?", (file_id,))
+        conn.commit()
+    finally:
+        conn.close()
 
-        symbols = _extract_symbols_from_text(text)
-        if not symbols:
-            continue
 
-        file_id = row["id"]
+def sync_project_symbols(project_id: int, user_id: int) -> Dict[str, int]:
+    """
+    Bring file_symbols up to date for a project's text-like files.
+
+    A file is skipped when its stored size and mtime match the last
+    extraction, or (if they don't) when its content hash does. New and
+    changed files are re-extracted (changed ones from disk, not the text
+    cache); symbols of files that were removed or
+    are no longer text-like are dropped. All writes happen in a single
+    transaction. Embeddings of symbol names already embedded in the file
+    are carried over.
+
+    Returns counts: files_scanned, files_changed, files_unchanged,
+    files_removed, symbols_written, symbols_total.
+    """
+    ensure_file_symbols_table()
 
-        cur.execute("DELETE FROM file_symbols WHERE file_id = ?", (file_id,))
+    try:
+        upload_root = _get_upload_root()
+    except RuntimeError:
+        upload_root = None  # No app context: hash extracted text instead
 
-        cur.executemany(
+    conn = get_db()
+    conn.row_factory = sqlite3.Row
+    try:
+        cur = conn.cursor()
+        cur.execute(
             """
-            INSERT INTO file_symbols (file_id, symbol, char_offset, snippet)
-            VALUES (?, ?, ?, ?)
+            SELECT pf.*
+            FROM project_files pf
+            JOIN projects p ON pf.project_id = p.id
+            WHERE pf.project_id = ? AND p.user_id = ?
+            ORDER BY pf.id DESC
             """,
-            [(file_id, name, offset, snippet) for (name, offset, snippet) in symbols],
+            (project_id, user_id),
+        )
+        rows = cur.fetchall()
+        state = {
+            r["file_id"]: r
+            for r in cur.execute(
+                "SELECT * FROM file_symbol_state WHERE project_id = ?", (project_id,)
+            )
+        }
+
+        stats = {
+            "files_scanned": 0,
+            "files_changed": 0,
+            "files_unchanged": 0,
+            "files_removed": 0,
+            "symbols_written": 0,
+        }
+        # file_id -> (content_hash, size, mtime_ns, symbols)
+        changed: Dict[int, Tuple[str, Optional[int], Optional[int], List[Tuple[str, int, str]]]] = {}
+        touched: List[Tuple[int, int, int]] = []  # (size, mtime_ns, file_id): same hash, new stat
+        current_ids = set()
+
+        for row in rows:
+            filename = row["filename"]
+            mime_type = row["mime_type"] or ""
+
+            if not _looks_text_like(filename, mime_type):
+                continue
+
+            file_id = row["id"]
+            current_ids.add(file_id)
+            stats["files_scanned"] += 1
+            prev = state.get(file_id)
+
+            path = _stored_file_path(row, upload_root)
+            size = mtime_ns = None
+            content_hash = None
+            if path:
+                st = os.stat(path)
+                size, mtime_ns = st.st_size, st.st_mtime_ns
+                if prev and prev["size_bytes"] == size and prev["mtime_ns"] == mtime_ns:
+                    stats["files_unchanged"] += 1
+                    continue
+                content_hash = _sha256_file(path)
+                if prev and prev["content_hash"] == content_hash:
+                    touched.append((size, mtime_ns, file_id))
+                    stats["files_unchanged"] += 1
+                    continue
+
+            if prev and path:
+                # Edited in place: the text cache still holds the old text
+                _drop_cached_text(file_id)
+            text = _load_file_text_for_row(row)
+            if not path:
+                content_hash = hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+                if prev and prev["content_hash"] == content_hash:
+                    stats["files_unchanged"] += 1
+                    continue
+
+            if not text or any(text.startswith(p) for p in _PLACEHOLDER_PREFIXES):
+                symbols = []
+            else:
+                symbols = _extract_symbols_from_text(text)
+            changed[file_id] = (content_hash, size, mtime_ns, symbols)
+
+        removed = [fid for fid in state if fid not in current_ids]
+        stats["files_changed"] = len(changed)
+        stats["files_removed"] = len(removed)
+
+        if changed or removed or touched:
+            stats["symbols_written"] = _write_symbols(conn, project_id, changed, removed, touched)
+            if changed or removed:
+                invalidate_symbol_matrix(project_id)
+
+        stats["symbols_total"] = conn.execute(
+            "SELECT COUNT(*) FROM file_symbols WHERE project_id = ?", (project_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+    logger.info(
+        f"Symbols for project {project_id}: {stats['files_changed']} files re-extracted, "
+        f"{stats['files_unchanged']} unchanged, {stats['files_removed']} removed, "
+        f"{stats['symbols_total']} symbols"
+    )
+    return stats
+
+
+def _write_symbols(
+    conn: sqlite3.Connection,
+    project_id: int,
+    changed: Dict[int, Tuple[str, Optional[int], Optional[int], List[Tuple[str, int, str]]]],
+    removed: List[int],
+    touched: List[Tuple[int, int, int]],
+) -> int:
+    """Apply one sync in a single transaction; returns symbols inserted."""
+    # Embeddings to carry over, per file, by symbol name
+    kept: Dict[int, Dict[str, bytes]] = {}
+    for file_id in changed:
+        kept[file_id] = {
+            r["symbol"]: r["embedding"]
+            for r in conn.execute(
+                "SELECT symbol, embedding FROM file_symbols WHERE file_id = ? AND embedding IS NOT NULL",
+                (file_id,),
+            )
+        }
+
+    written = 0
+    try:
+        stale = [(fid,) for fid in list(changed) + removed]
+        conn.executemany("DELETE FROM file_symbols WHERE file_id = ?", stale)
+        conn.executemany("DELETE FROM file_symbol_state WHERE file_id = ?", [(fid,) for fid in removed])
+
+        for file_id, (content_hash, size, mtime_ns, symbols) in changed.items():
+            reuse = kept[file_id]
+            conn.executemany(
+                """
+                INSERT INTO file_symbols (project_id, file_id, symbol, char_offset, snippet, embedding)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (project_id, file_id, name, offset, snippet, reuse.get(name))
+                    for (name, offset, snippet) in symbols
+                ],
+            )
+            written += len(symbols)
+
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO file_symbol_state
+                (file_id, project_id, content_hash, size_bytes, mtime_ns, symbol_count, extracted_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """,
+            [
+                (file_id, project_id, content_hash, size, mtime_ns, len(symbols))
+                for file_id, (content_hash, size, mtime_ns, symbols) in changed.items()
+            ],
+        )
+        conn.executemany(
+            "UPDATE file_symbol_state SET size_bytes = ?, mtime_ns = ? WHERE file_id = ?",
+            touched,
         )
         conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return written
 
-        total_symbols += len(symbols)
-
-    return total_symbols
 
+def extract_symbols_for_project(project_id: int, user_id: int) -> int:
+    """
+    Extract symbols from all text-like files in a project and store them in file_symbols.
 
-def _load_symbol_embeddings(symbol_ids: List[int]) -> Dict[int, np.ndarray]:
-    """Load embeddings for a subset of symbols."""
-    if not symbol_ids:
-        return {}
+    Only new or changed files are re-extracted (see sync_project_symbols).
 
-    conn = get_db()
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    placeholders = ",".join("?" for _ in symbol_ids)
-    cur.execute(
-        f"SELECT id, embedding FROM file_symbols WHERE id IN ({placeholders})",
-        symbol_ids,
-    )
-    rows = cur.fetchall()
+    Returns total number of symbols stored.
+    """
+    return sync_project_symbols(project_id, user_id)["symbols_total"]
 
-    embeddings: Dict[int, np.ndarray] = {}
-    for row in rows:
-        emb = np.frombuffer(row["embedding"], dtype=np.float32)
-        embeddings[row["id"]] = emb
 
-    return embeddings
+# ---------------------------------------------------------------------------
+# Embeddings / search
+# ---------------------------------------------------------------------------
 
 
-def _embed_missing_symbols(symbol_ids: List[int]) -> Dict[int, np.ndarray]:
+def _embed_missing_symbols(conn: sqlite3.Connection, project_id: int) -> int:
     """
-    Embed all symbols whose embedding is currently NULL and return embeddings for given IDs.
+    Fill in NULL embeddings for a project's symbols.
+
+    Each distinct name is embedded once, reusing a vector already stored
+    for the same name in the project when there is one; the rest go
+    through embed_many() in batches. Returns the number of names embedded.
     """
-    conn = get_db()
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
+    missing = [
+        r[0] for r in conn.execute(
+            "SELECT DISTINCT symbol FROM file_symbols WHERE project_id = ? AND embedding IS NULL",
+            (project_id,),
+        )
+    ]
+    if not missing:
+        return 0
+
+    known: Dict[str, bytes] = {}
+    for i in range(0, len(missing), 500):
+        batch = missing[i:i + 500]
+        placeholders = ",".join("?" for _ in batch)
+        for name, blob in conn.execute(
+            f"""
+            SELECT symbol, embedding FROM file_symbols
+            WHERE project_id = ? AND embedding IS NOT NULL AND symbol IN ({placeholders})
+            GROUP BY symbol
+            """,
+            [project_id, *batch],
+        ):
+            known[name] = blob
 
-    cur.execute(
-        """
-        SELECT id, symbol
-        FROM file_symbols
-        WHERE embedding IS NULL
+    to_embed = [name for name in missing if name not in known]
+    for i in range(0, len(to_embed), SYMBOL_EMBED_BATCH):
+        batch = to_embed[i:i + SYMBOL_EMBED_BATCH]
+        known.update(zip(batch, embed_many(batch)))
+
+    conn.executemany(
         """
+        UPDATE file_symbols SET embedding = ?
+        WHERE project_id = ? AND symbol = ? AND embedding IS NULL
+        """,
+        [(known[name], project_id, name) for name in missing],
     )
-    rows = cur.fetchall()
-    if not rows:
-        return _load_symbol_embeddings(symbol_ids)
+    conn.commit()
+    return len(to_embed)
 
-    texts = [row["symbol"] for row in rows]
-    embs = embed(texts)
 
-    for row, emb in zip(rows, embs):
-        cur.execute(
-            "UPDATE file_symbols SET embedding = ? WHERE id = ?",
-            (emb.tobytes(), row["id"]),
-        )
-    conn.commit()
+@dataclass
+class _SymbolMatrix:
+    """A project's symbols with unit-normalized embeddings, row-aligned."""
+    fingerprint: Tuple[int, int]
+    rows: List[Dict[str, Any]]
+    matrix: np.ndarray
+
+
+_symbol_matrices: "OrderedDict[int, _SymbolMatrix]" = OrderedDict()
+_symbol_matrices_lock = threading.Lock()
+
+
+def invalidate_symbol_matrix(project_id: Optional[int] = None) -> None:
+    """Drop the cached symbol matrix for a project (or all projects)."""
+    with _symbol_matrices_lock:
+        if project_id is None:
+            _symbol_matrices.clear()
+        else:
+            _symbol_matrices.pop(project_id, None)
+
+
+def _symbol_fingerprint(conn: sqlite3.Connection, project_id: int) -> Tuple[int, int]:
+    # Re-extraction deletes and inserts rows (new AUTOINCREMENT ids), so
+    # count + max id changes whenever another process rewrote the symbols
+    row = conn.execute(
+        "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM file_symbols WHERE project_id = ?",
+        (project_id,),
+    ).fetchone()
+    return (row[0], row[1])
 
-    return _load_symbol_embeddings(symbol_ids)
+
+def _get_symbol_matrix(conn: sqlite3.Connection, project_id: int) -> _SymbolMatrix:
+    fingerprint = _symbol_fingerprint(conn, project_id)
+    with _symbol_matrices_lock:
+        cached = _symbol_matrices.get(project_id)
+        if cached is not None and cached.fingerprint == fingerprint:
+            _symbol_matrices.move_to_end(project_id)
+            return cached
+
+    _embed_missing_symbols(conn, project_id)
+    cur = conn.execute(
+        """
+        SELECT fs.id, fs.file_id, fs.symbol, fs.char_offset, fs.snippet, fs.embedding,
+               pf.filename, pf.mime_type
+        FROM file_symbols fs
+        JOIN project_files pf ON fs.file_id = pf.id
+        WHERE fs.project_id = ? AND fs.embedding IS NOT NULL
+        ORDER BY fs.id
+        """,
+        (project_id,),
+    )
+    rows: List[Dict[str, Any]] = []
+    blobs: List[bytes] = []
+    for r in cur:
+        rows.append(
+            {
+                "file_id": r["file_id"],
+                "filename": r["filename"],
+                "mime_type": r["mime_type"],
+                "symbol": r["symbol"],
+                "char_offset": r["char_offset"],
+                "snippet": r["snippet"],
+            }
+        )
+        blobs.append(r["embedding"])
+
+    if blobs:
+        # Vectors from another model (other dimension) can't be scored together
+        width = max(set(map(len, blobs)), key=[len(b) for b in blobs].count)
+        if any(len(b) != width for b in blobs):
+            keep = [i for i, b in enumerate(blobs) if len(b) == width]
+            logger.warning(f"Skipping {len(blobs) - len(keep)} symbol embeddings of another dimension")
+            rows = [rows[i] for i in keep]
+            blobs = [blobs[i] for i in keep]
+        matrix = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.maximum(norms, 1e-8)
+    else:
+        matrix = np.zeros((0, 0), dtype=np.float32)
+
+    built = _SymbolMatrix(fingerprint=_symbol_fingerprint(conn, project_id), rows=rows, matrix=matrix)
+    with _symbol_matrices_lock:
+        _symbol_matrices[project_id] = built
+        _symbol_matrices.move_to_end(project_id)
+        while len(_symbol_matrices) > SYMBOL_MATRIX_CACHE_PROJECTS:
+            _symbol_matrices.popitem(last=False)
+    return built
 
 
 def query_symbol(project_id: int, user_id: int, symbol: str, top_k: int = 10) -> Dict[str, Any]:
@@ -271,50 +586,39 @@ def query_symbol(project_id: int, user_id: int, symbol: str, top_k: int = 10) ->
     if not symbol.strip():
         return {"query": symbol, "hits": []}
 
-    q_emb = embed(symbol)
-
     conn = get_db()
     conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT fs.id, fs.file_id, fs.symbol, fs.char_offset, fs.snippet,
-               pf.filename, pf.mime_type
-        FROM file_symbols fs
-        JOIN project_files pf ON fs.file_id = pf.id
-        JOIN projects p ON pf.project_id = p.id
-        WHERE pf.project_id = ? AND p.user_id = ?
-        """,
-        (project_id, user_id),
-    )
-    rows = cur.fetchall()
-    if not rows:
+    try:
+        owned = conn.execute(
+            "SELECT 1 FROM projects WHERE id = ? AND user_id = ?",
+            (project_id, user_id),
+        ).fetchone()
+        if not owned:
+            return {"query": symbol, "hits": []}
+        sm = _get_symbol_matrix(conn, project_id)
+    finally:
+        conn.close()
+
+    if not sm.rows:
         return {"query": symbol, "hits": []}
 
-    symbol_ids = [row["id"] for row in rows]
-    emb_map = _embed_missing_symbols(symbol_ids)
-
-    embs = np.vstack([emb_map[row["id"]] for row in rows])
+    q_emb = np.frombuffer(embed(symbol), dtype=np.float32)
+    if q_emb.shape[0] != sm.matrix.shape[1]:
+        logger.warning("Symbol embeddings were made with a different model; re-extract symbols")
+        return {"query": symbol, "hits": []}
 
-    norms = np.linalg.norm(embs, axis=1) * np.linalg.norm(q_emb)
-    sims = np.dot(embs, q_emb) / np.maximum(norms, 1e-8)
+    sims = sm.matrix @ q_emb / max(float(np.linalg.norm(q_emb)), 1e-8)
 
-    top_indices = np.argsort(-sims)[:top_k]
+    k = min(top_k, len(sims))
+    if k <= 0:
+        return {"query": symbol, "hits": []}
+    top = np.argpartition(-sims, k - 1)[:k]
+    top_indices = top[np.argsort(-sims[top], kind="stable")]
 
     hits = []
     for idx in top_indices:
-        row = rows[int(idx)]
-        hits.append(
-            {
-                "file_id": row["file_id"],
-                "filename": row["filename"],
-                "mime_type": row["mime_type"],
-                "symbol": row["symbol"],
-                "char_offset": row["char_offset"],
-                "snippet": row["snippet"],
-                "score": float(sims[idx]),
-            }
-        )
+        hit = dict(sm.rows[int(idx)])
+        hit["score"] = float(sims[idx])
+        hits.append(hit)
 
     return {"query": symbol, "hits": hits}
-
@@ -14,12 +14,13 @@ from .ingest_service import IngestProgress, LibraryIngestService
 from .library_service import LibraryService
 from .reference_service import LibraryReferenceService
 from .scanner_service import LibraryScannerService, ScannedFile
+from .scripture_index_service import LibraryScriptureIndexService
 from .search_service import LibrarySearchService, SearchResult
 from .settings_service import LibrarySettingsService
 from .storage_service import LibraryStorageService
 from .text_service import LibraryTextService
 from .transcription_service import TranscriptionQueueService, WHISPER_MODELS, TRANSCRIBABLE_TYPES
-from .transcription_worker import TranscriptionWorker
+from .transcription_worker import TranscriptionPool, TranscriptionWorker
 from .ocr_service import LibraryOCRService
 from .ia_import_service import IAImportService
 
@@ -32,6 +33,7 @@ __all__ = [
     "LibraryChunkService",
     "LibraryScannerService",
     "ScannedFile",
+    "LibraryScriptureIndexService",
     "LibraryIngestService",
     "IngestProgress",
     "LibraryIndexQueueService",
@@ -44,6 +46,7 @@ __all__ = [
     "WHISPER_MODELS",
     "TRANSCRIBABLE_TYPES",
     "TranscriptionWorker",
+    "TranscriptionPool",
     "LibraryOCRService",
     "IAImportService",
 ]
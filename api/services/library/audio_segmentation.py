@@ -0,0 +1,174 @@
+# api/services/library/audio_segmentation.py
+
+"""
+Voice-activity segmentation of long recordings for parallel transcription.
+
+A recording is split into windows of at most MAX_WINDOW_SECONDS, cut
+only in silence, so each window can be transcribed independently (and
+concurrently) without splitting a word. Window boundaries depend only
+on the audio, so re-planning a recording after a crash gives the same
+windows and finished ones can be skipped.
+
+Speech detection uses faster-whisper's Silero VAD when it is installed
+and falls back to a frame-energy detector otherwise.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000          # faster-whisper's input rate
+
+MAX_WINDOW_SECONDS = 300.0   # Upper bound on one transcription unit
+MIN_SILENCE_SECONDS = 0.5    # Shorter pauses don't split speech
+MIN_SPEECH_SECONDS = 0.25    # Shorter blips are noise
+SPEECH_PAD_SECONDS = 0.2     # Context kept either side of speech
+
+# Energy detector
+FRAME_SECONDS = 0.03
+NOISE_PERCENTILE = 10        # Frame level taken as the noise floor
+SPEECH_MARGIN_DB = 12.0      # Speech is this far above the floor...
+MIN_SPEECH_DBFS = -50.0      # ...and at least this loud
+
+
+@dataclass
+class Window:
+    """A slice of the recording to transcribe on its own."""
+    index: int
+    start: float  # seconds
+    end: float
+
+    def samples(self, sample_rate: int = SAMPLE_RATE) -> Tuple[int, int]:
+        return int(self.start * sample_rate), int(self.end * sample_rate)
+
+
+def load_audio(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode any audio/video file to mono float32 at sample_rate."""
+    try:
+        from faster_whisper.audio import decode_audio
+    except ImportError:
+        raise RuntimeError("faster-whisper not installed. Run: pip install faster-whisper")
+    return decode_audio(path, sampling_rate=sample_rate)
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """[start, end) index pairs of consecutive True values."""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def energy_speech_regions(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_seconds: float = FRAME_SECONDS,
+) -> List[Tuple[float, float]]:
+    """Speech regions (seconds) from frame RMS against the noise floor."""
+    frame = max(1, int(frame_seconds * sample_rate))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+
+    frames = audio[: n_frames * frame].reshape(n_frames, frame).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    db = 20 * np.log10(np.maximum(rms, 1e-10))
+    threshold = max(np.percentile(db, NOISE_PERCENTILE) + SPEECH_MARGIN_DB, MIN_SPEECH_DBFS)
+    speech = db > threshold
+
+    return [(s * frame_seconds, e * frame_seconds) for s, e in _runs(speech)]
+
+
+def silero_speech_regions(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Optional[List[Tuple[float, float]]]:
+    """Speech regions from faster-whisper's Silero VAD, or None if unavailable."""
+    try:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+    except ImportError:
+        return None
+
+    try:
+        options = VadOptions(
+            min_silence_duration_ms=int(MIN_SILENCE_SECONDS * 1000),
+            speech_pad_ms=0,
+        )
+        stamps = get_speech_timestamps(audio, options)
+    except Exception as e:
+        logger.warning(f"Silero VAD failed, using energy detector: {e}")
+        return None
+    return [(s["start"] / sample_rate, s["end"] / sample_rate) for s in stamps]
+
+
+def clean_regions(
+    regions: List[Tuple[float, float]],
+    duration: float,
+    min_silence: float = MIN_SILENCE_SECONDS,
+    min_speech: float = MIN_SPEECH_SECONDS,
+    pad: float = SPEECH_PAD_SECONDS,
+) -> List[Tuple[float, float]]:
+    """Bridge short pauses, drop short blips, pad and clip to the recording."""
+    merged: List[List[float]] = []
+    for start, end in sorted(regions):
+        if merged and start - merged[-1][1] < min_silence:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    out: List[Tuple[float, float]] = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        start, end = max(0.0, start - pad), min(duration, end + pad)
+        if out and start <= out[-1][1]:
+            out[-1] = (out[-1][0], end)
+        else:
+            out.append((start, end))
+    return out
+
+
+def plan_windows(
+    regions: List[Tuple[float, float]],
+    max_window: float = MAX_WINDOW_SECONDS,
+) -> List[Window]:
+    """
+    Pack consecutive speech regions into windows of at most max_window.
+
+    Windows end in the silence between regions. A single region longer
+    than max_window (a speaker who never pauses for MIN_SILENCE_SECONDS)
+    is cut at fixed intervals as a last resort.
+    """
+    spans: List[Tuple[float, float]] = []
+    for start, end in regions:
+        while end - start > max_window:
+            spans.append((start, start + max_window))
+            start += max_window
+        spans.append((start, end))
+
+    windows: List[Window] = []
+    current: Optional[List[float]] = None
+    for start, end in spans:
+        if current and end - current[0] <= max_window:
+            current[1] = end
+            continue
+        if current:
+            windows.append(Window(len(windows), round(current[0], 3), round(current[1], 3)))
+        current = [start, end]
+    if current:
+        windows.append(Window(len(windows), round(current[0], 3), round(current[1], 3)))
+    return windows
+
+
+def segment_audio(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    max_window: float = MAX_WINDOW_SECONDS,
+    use_silero: bool = True,
+) -> List[Window]:
+    """Plan transcription windows for a decoded recording."""
+    duration = len(audio) / sample_rate
+    regions = silero_speech_regions(audio, sample_rate) if use_silero else None
+    if regions is None:
+        regions = energy_speech_regions(audio, sample_rate)
+    return plan_windows(clean_regions(regions, duration), max_window)
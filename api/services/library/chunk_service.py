@@ -11,10 +11,12 @@ from typing import Any, Dict, List, Optional
 
 import numpy as np
 
-from core.memory_core import embed_many
+from services.embedding_migration import embed_for_table, vector_columns, vector_dim
+from services.embedding_quant import encode_for_table, get_setting, load_embedding
 from utils.db import get_db
 
 from .library_service import LibraryService
+from .scripture_index_service import LibraryScriptureIndexService
 from .text_service import LibraryTextService
 
 
@@ -29,6 +31,7 @@ class LibraryChunkService:
     def __init__(self):
         self.text_service = LibraryTextService()
         self.library = LibraryService()
+        self.scripture_index = LibraryScriptureIndexService()
 
     def get_chunks(self, library_file_id: int) -> List[Dict[str, Any]]:
         """
@@ -55,8 +58,8 @@ class LibraryChunkService:
         """Get chunks from database cache."""
         conn = get_db()
         cur = conn.execute(
-            """
-            SELECT chunk_index, content, embedding, start_offset, page
+            f"""
+            SELECT chunk_index, content, {vector_columns(conn, "library_chunks")}, start_offset, page
             FROM library_chunks
             WHERE library_file_id = ?
             ORDER BY chunk_index ASC
@@ -70,8 +73,7 @@ class LibraryChunkService:
 
         chunks = []
         for row in rows:
-            emb_blob = row["embedding"]
-            embedding = np.frombuffer(emb_blob, dtype=np.float32) if emb_blob else None
+            embedding = load_embedding(row["embedding"], row["embedding_q"])
 
             chunks.append(
                 {
@@ -127,7 +129,7 @@ class LibraryChunkService:
             return []
 
         # Generate embeddings
-        embeddings = embed_many(chunks_to_embed)
+        embeddings, model_id = embed_for_table("library_chunks", chunks_to_embed)
 
         # Store in database
         conn = get_db()
@@ -137,28 +139,37 @@ class LibraryChunkService:
             "DELETE FROM library_chunks WHERE library_file_id = ?",
             (library_file_id,),
         )
+        self.scripture_index.remove_file(library_file_id, conn=conn)
 
         chunks = []
+        indexed = []
+        quant = get_setting(conn, "library_chunks")
         for i, (content, emb_blob) in enumerate(zip(chunks_to_embed, embeddings)):
             meta = chunk_metadata[i]
-            # embed_many returns bytes directly, convert to numpy for return value
+            # Embeddings are float32 BLOBs, convert to numpy for return value
             embedding = np.frombuffer(emb_blob, dtype=np.float32)
+            stored, quantized = encode_for_table(conn, "library_chunks", emb_blob, quant)
 
-            conn.execute(
+            cur = conn.execute(
                 """
                 INSERT INTO library_chunks
-                (library_file_id, chunk_index, content, embedding, start_offset, page)
-                VALUES (?, ?, ?, ?, ?, ?)
+                (library_file_id, chunk_index, content, embedding, embedding_q,
+                 embedding_model, embedding_dim, start_offset, page)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     library_file_id,
                     meta["chunk_index"],
                     content,
-                    emb_blob,
+                    stored,
+                    quantized,
+                    model_id,
+                    vector_dim(emb_blob),
                     meta["start_offset"],
                     meta["page"],
                 ),
             )
+            indexed.append((cur.lastrowid, content))
 
             chunks.append(
                 {
@@ -170,6 +181,9 @@ class LibraryChunkService:
                 }
             )
 
+        # Scripture references go in the same transaction as the chunks
+        self.scripture_index.index_chunks(library_file_id, indexed, conn=conn)
+
         conn.commit()
 
         # Mark file as indexed
@@ -222,6 +236,7 @@ class LibraryChunkService:
             "DELETE FROM library_chunks WHERE library_file_id = ?",
             (library_file_id,),
         )
+        self.scripture_index.remove_file(library_file_id, conn=conn)
         conn.commit()
         return cur.rowcount
 
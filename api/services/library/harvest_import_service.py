@@ -15,10 +15,13 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from services.embedding_migration import active_model, embed_for_table, same_model, vector_dim
+from services.embedding_quant import encode_for_table, get_setting
 from utils.db import get_db
 
 from .collection_service import LibraryCollectionService
 from .library_service import LibraryService
+from .scripture_index_service import LibraryScriptureIndexService
 
 # Expected package format version
 SUPPORTED_FORMAT_VERSIONS = ["1.0"]
@@ -34,6 +37,7 @@ class HarvestImportService:
     def __init__(self):
         self.library = LibraryService()
         self.collections = LibraryCollectionService()
+        self.scripture_index = LibraryScriptureIndexService()
         self._collection_id_cache = {}
 
     def list_pending(self) -> List[Dict[str, Any]]:
@@ -206,8 +210,19 @@ class HarvestImportService:
                 )
                 stored_path = f"harvest/{source_slug}/{filename}"
 
-            # Insert library_files record
+            # Package vectors are only comparable if they come from the
+            # model library search reads; otherwise re-embed the text
+            # before opening the write transaction
             conn = get_db()
+            table_model = active_model(conn, "library_chunks")
+            package_model = processing_info.get("embedding_model") or table_model
+            reembedded = None
+            if not same_model(package_model, table_model):
+                reembedded, package_model = embed_for_table(
+                    "library_chunks", [c.get("content", "") for c in chunks], conn
+                )
+
+            # Insert library_files record
             cur = conn.execute(
                 """
                 INSERT INTO library_files
@@ -232,30 +247,42 @@ class HarvestImportService:
             file_id = cur.lastrowid
 
             # Insert chunks with embeddings
-            for chunk in chunks:
+            indexed = []
+            quant = get_setting(conn, "library_chunks")
+            for i, chunk in enumerate(chunks):
                 embedding_b64 = chunk.get("embedding")
-                embedding_blob = (
-                    base64.b64decode(embedding_b64)
-                    if embedding_b64
-                    else None
-                )
-
-                conn.execute(
+                if reembedded is not None:
+                    embedding_blob = reembedded[i]
+                else:
+                    embedding_blob = (
+                        base64.b64decode(embedding_b64)
+                        if embedding_b64
+                        else None
+                    )
+                stored, quantized = encode_for_table(conn, "library_chunks", embedding_blob, quant)
+
+                chunk_cur = conn.execute(
                     """
                     INSERT INTO library_chunks
-                    (library_file_id, chunk_index, content, embedding,
-                     start_offset, page)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    (library_file_id, chunk_index, content, embedding, embedding_q,
+                     embedding_model, embedding_dim, start_offset, page)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
                     (
                         file_id,
                         chunk.get("index", 0),
                         chunk.get("content", ""),
-                        embedding_blob,
+                        stored,
+                        quantized,
+                        package_model if embedding_blob else None,
+                        vector_dim(embedding_blob),
                         chunk.get("start_offset", 0),
                         chunk.get("page"),
                     ),
                 )
+                indexed.append((chunk_cur.lastrowid, chunk.get("content", "")))
+
+            self.scripture_index.index_chunks(file_id, indexed, conn=conn)
 
             conn.commit()
 
@@ -300,6 +300,9 @@ class LibraryService:
         conn.execute(
             "DELETE FROM library_chunks WHERE library_file_id = ?", (file_id,)
         )
+        conn.execute(
+            "DELETE FROM library_chunk_refs WHERE library_file_id = ?", (file_id,)
+        )
 
         # Delete text cache
         conn.execute(
@@ -0,0 +1,330 @@
+# api/services/library/scripture_index_service.py
+
+"""
+Scripture reference index for library chunks.
+
+Extracts Bible references from library_chunks.content at ingest time and
+stores them as normalized (book, chapter, verse range) rows in
+library_chunk_refs. Lookups are range-overlap queries on an index, so
+"which chunks cite Romans 8:28" never needs an embedding scan.
+"""
+
+import json
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from services.references.reference_parser import (
+    ParsedReference,
+    find_references,
+    parse_reference,
+)
+from utils.db import get_db
+
+from .search_service import SearchResult
+
+
+# Chapter-only references cover the whole chapter. No chapter in the canon
+# has more verses than this, so 1..CHAPTER_END overlaps any verse in it.
+CHAPTER_END = 999
+
+# Rows fetched per batch when backfilling existing chunks
+BACKFILL_BATCH_SIZE = 500
+
+
+def reference_range(ref: ParsedReference) -> Tuple[int, int]:
+    """Return the inclusive (verse_start, verse_end) covered by a reference."""
+    if ref.is_chapter:
+        return 1, CHAPTER_END
+    verse_end = ref.verse_end or ref.verse_start
+    return ref.verse_start, max(ref.verse_start, verse_end)
+
+
+class LibraryScriptureIndexService:
+    """Maintains and queries the chunk -> scripture reference index."""
+
+    # =========================================================================
+    # INDEX MAINTENANCE
+    # =========================================================================
+
+    def extract_refs(self, content: str) -> List[ParsedReference]:
+        """Extract scripture references from chunk text."""
+        if not content:
+            return []
+        try:
+            return find_references(content)
+        except Exception:
+            return []
+
+    def index_chunks(
+        self,
+        library_file_id: int,
+        chunks: Iterable[Tuple[int, str]],
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> int:
+        """
+        Index references for a set of chunks.
+
+        Args:
+            library_file_id: Library file the chunks belong to
+            chunks: Iterable of (library_chunk_id, content)
+            conn: Optional connection to join the caller's transaction.
+                  When omitted, a new connection is opened and committed.
+
+        Returns:
+            Number of reference rows written (existing rows are skipped)
+        """
+        rows = []
+        for chunk_id, content in chunks:
+            for ref in self.extract_refs(content):
+                verse_start, verse_end = reference_range(ref)
+                rows.append(
+                    (
+                        chunk_id,
+                        library_file_id,
+                        ref.book,
+                        ref.chapter,
+                        verse_start,
+                        verse_end,
+                        ref.normalized,
+                    )
+                )
+
+        if not rows:
+            return 0
+
+        own_conn = conn is None
+        if own_conn:
+            conn = get_db()
+
+        cur = conn.executemany(
+            """
+            INSERT OR IGNORE INTO library_chunk_refs
+            (library_chunk_id, library_file_id, book, chapter,
+             verse_start, verse_end, ref_text)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+        if own_conn:
+            conn.commit()
+
+        return cur.rowcount
+
+    def remove_file(
+        self, library_file_id: int, conn: Optional[sqlite3.Connection] = None
+    ) -> int:
+        """Delete all reference rows for a library file."""
+        own_conn = conn is None
+        if own_conn:
+            conn = get_db()
+
+        cur = conn.execute(
+            "DELETE FROM library_chunk_refs WHERE library_file_id = ?",
+            (library_file_id,),
+        )
+
+        if own_conn:
+            conn.commit()
+
+        return cur.rowcount
+
+    def reindex_file(self, library_file_id: int) -> int:
+        """Rebuild reference rows for one file from its stored chunks."""
+        conn = get_db()
+        self.remove_file(library_file_id, conn=conn)
+
+        cur = conn.execute(
+            "SELECT id, content FROM library_chunks WHERE library_file_id = ?",
+            (library_file_id,),
+        )
+        count = self.index_chunks(
+            library_file_id,
+            [(row["id"], row["content"]) for row in cur.fetchall()],
+            conn=conn,
+        )
+        conn.commit()
+        return count
+
+    def backfill(self, batch_size: int = BACKFILL_BATCH_SIZE, progress=None) -> Dict[str, int]:
+        """
+        Index every existing chunk that has no reference rows yet.
+
+        Walks library_chunks by id (keyset pagination) so it can be stopped
+        and re-run safely; already-indexed chunks are skipped by the UNIQUE
+        constraint.
+
+        Args:
+            batch_size: Chunks per transaction
+            progress: Optional callback(chunks_scanned, refs_written)
+
+        Returns:
+            {'chunks_scanned': int, 'refs_written': int}
+        """
+        conn = get_db()
+        last_id = 0
+        scanned = 0
+        written = 0
+
+        while True:
+            rows = conn.execute(
+                """
+                SELECT id, library_file_id, content
+                FROM library_chunks
+                WHERE id > ?
+                ORDER BY id ASC
+                LIMIT ?
+                """,
+                (last_id, batch_size),
+            ).fetchall()
+
+            if not rows:
+                break
+
+            by_file: Dict[int, List[Tuple[int, str]]] = {}
+            for row in rows:
+                by_file.setdefault(row["library_file_id"], []).append(
+                    (row["id"], row["content"])
+                )
+
+            for file_id, chunks in by_file.items():
+                written += self.index_chunks(file_id, chunks, conn=conn)
+
+            conn.commit()
+
+            scanned += len(rows)
+            last_id = rows[-1]["id"]
+
+            if progress:
+                progress(scanned, written)
+
+        return {"chunks_scanned": scanned, "refs_written": written}
+
+    # =========================================================================
+    # LOOKUP
+    # =========================================================================
+
+    def find_chunks(
+        self,
+        reference: Union[str, ParsedReference],
+        project_id: Optional[int] = None,
+        limit: int = 10,
+    ) -> List[SearchResult]:
+        """
+        Find library chunks that cite a passage overlapping the reference.
+
+        A chunk citing "Romans 8:26-30" or "Romans 8" matches a query for
+        "Romans 8:28"; a query for "Romans 8" matches any verse in the chapter.
+
+        Args:
+            reference: Reference string ("Rom 8:28") or ParsedReference
+            project_id: If set, only files referenced by this project
+            limit: Maximum chunks to return
+
+        Returns:
+            List of SearchResult. Chunks citing a narrower passage score
+            higher than those citing a whole chapter.
+        """
+        ref = parse_reference(reference) if isinstance(reference, str) else reference
+        if ref is None:
+            return []
+
+        verse_start, verse_end = reference_range(ref)
+
+        params: list = [ref.book, ref.chapter, verse_end, verse_start]
+        project_join = ""
+        if project_id:
+            project_join = (
+                "JOIN project_library_refs plr "
+                "ON plr.library_file_id = r.library_file_id AND plr.project_id = ?"
+            )
+            params.insert(0, project_id)
+
+        params.append(limit)
+
+        conn = get_db()
+        cur = conn.execute(
+            f"""
+            SELECT
+                lc.library_file_id,
+                lc.chunk_index,
+                lc.content,
+                lc.page,
+                lf.filename,
+                lf.metadata_json,
+                MIN(r.verse_end - r.verse_start) AS span
+            FROM library_chunk_refs r
+            {project_join}
+            JOIN library_chunks lc ON lc.id = r.library_chunk_id
+            JOIN library_files lf ON lf.id = r.library_file_id
+            WHERE r.book = ?
+            AND r.chapter = ?
+            AND r.verse_start <= ?
+            AND r.verse_end >= ?
+            GROUP BY lc.id
+            ORDER BY span ASC, lc.library_file_id ASC, lc.chunk_index ASC
+            LIMIT ?
+            """,
+            params,
+        )
+
+        results = []
+        for row in cur.fetchall():
+            metadata = None
+            if row["metadata_json"]:
+                try:
+                    metadata = json.loads(row["metadata_json"])
+                except json.JSONDecodeError:
+                    pass
+
+            results.append(
+                SearchResult(
+                    library_file_id=row["library_file_id"],
+                    filename=row["filename"],
+                    chunk_index=row["chunk_index"],
+                    content=row["content"],
+                    score=1.0 / (1.0 + row["span"] / 10.0),
+                    page=row["page"],
+                    metadata=metadata,
+                )
+            )
+
+        return results
+
+    def find_chunks_for_text(
+        self,
+        text: str,
+        project_id: Optional[int] = None,
+        max_refs: int = 5,
+        per_ref: int = 3,
+    ) -> Dict[str, List[SearchResult]]:
+        """
+        Find passage-linked chunks for every reference mentioned in text.
+
+        Returns:
+            {normalized_reference: [SearchResult, ...]} for references with hits
+        """
+        found: Dict[str, List[SearchResult]] = {}
+        for ref in self.extract_refs(text)[:max_refs]:
+            hits = self.find_chunks(ref, project_id=project_id, limit=per_ref)
+            if hits:
+                found[ref.normalized] = hits
+        return found
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index coverage statistics."""
+        conn = get_db()
+        row = conn.execute(
+            """
+            SELECT
+                COUNT(*) AS ref_count,
+                COUNT(DISTINCT library_chunk_id) AS chunk_count,
+                COUNT(DISTINCT library_file_id) AS file_count
+            FROM library_chunk_refs
+            """
+        ).fetchone()
+        return {
+            "ref_count": row["ref_count"],
+            "chunk_count": row["chunk_count"],
+            "file_count": row["file_count"],
+        }
@@ -7,6 +7,11 @@ Provides semantic search across library_chunks with scope control:
 - library: Search entire library
 - project: Search only files referenced by a project
 - all: Search library + project files (hybrid)
+
+And retrieval mode:
+- semantic: cosine similarity over chunk embeddings
+- keyword: FTS5 bm25 over chunk text (library_chunks_fts)
+- hybrid: reciprocal rank fusion of keyword and semantic rankings
 """
 
 import json
@@ -15,10 +20,25 @@ from typing import Any, Dict, List, Optional
 
 import numpy as np
 
-from core.memory_core import embed
+from services.embedding_migration import embed_query, vector_columns
+from services.embedding_quant import cosine_scores, get_setting, load_embedding
+from services.fulltext_search import RRF_K, build_match_query, reciprocal_rank_fusion
 from utils.db import get_db
 
 
+SEARCH_MODES = ("semantic", "keyword", "hybrid")
+
+# Default share of the fused score given to the keyword ranking
+DEFAULT_KEYWORD_WEIGHT = 0.5
+
+# Each ranking contributes this many candidates per requested result
+HYBRID_CANDIDATE_FACTOR = 4
+
+# Score multiplier for project-referenced files in 'all' scope, applied to
+# cosine and bm25 scores alike before ranking or fusion
+PROJECT_BOOST = 1.1
+
+
 @dataclass
 class SearchResult:
     """A single search result."""
@@ -57,9 +77,11 @@ class LibrarySearchService:
         limit: int = 10,
         min_score: float = 0.0,
         file_types: Optional[List[str]] = None,
+        mode: str = "semantic",
+        keyword_weight: float = DEFAULT_KEYWORD_WEIGHT,
     ) -> List[SearchResult]:
         """
-        Semantic search across library.
+        Search across library.
 
         Args:
             query: Search query text
@@ -69,24 +91,77 @@ class LibrarySearchService:
                 - all: Search both (project results weighted higher)
             project_id: Required if scope is 'project' or 'all'
             limit: Maximum results to return
-            min_score: Minimum similarity score (0-1)
+            min_score: Minimum similarity score (0-1). Applies to semantic
+                candidates; keyword hits are not thresholded.
             file_types: Filter by mime type prefixes (e.g., ['application/pdf'])
+            mode: 'semantic' | 'keyword' | 'hybrid'
+            keyword_weight: Keyword share of the fused score in hybrid mode
+                (0.0 = pure semantic, 1.0 = pure keyword)
 
         Returns:
-            List of SearchResult sorted by score descending
+            List of SearchResult sorted by score descending. In keyword and
+            hybrid modes the score is a normalized rank score, not a cosine.
         """
-        # Embed query (returns bytes, convert to numpy)
-        query_bytes = embed(query)
-        query_embedding = np.frombuffer(query_bytes, dtype=np.float32)
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"mode must be one of {', '.join(SEARCH_MODES)}")
+
+        if scope in ("project", "all") and not project_id:
+            raise ValueError(f"project_id required for scope='{scope}'")
+
+        if mode == "semantic":
+            scored = self._semantic_candidates(
+                query, scope, project_id, min_score, file_types
+            )
+            return [self._to_result(score, chunk) for score, chunk in scored[:limit]]
+
+        if mode == "keyword":
+            keyword = self._keyword_candidates(
+                query, scope, project_id, limit, file_types
+            )
+            return [
+                self._to_result(score, chunk)
+                for score, chunk in self._rank_scores(keyword)
+            ]
+
+        # hybrid
+        n_candidates = limit * HYBRID_CANDIDATE_FACTOR
+        semantic = self._semantic_candidates(
+            query, scope, project_id, min_score, file_types
+        )[:n_candidates]
+        keyword = self._keyword_candidates(
+            query, scope, project_id, n_candidates, file_types
+        )
+
+        by_key: Dict[tuple, Dict] = {}
+        for _, chunk in semantic:
+            by_key[self._chunk_key(chunk)] = chunk
+        for chunk in keyword:
+            by_key.setdefault(self._chunk_key(chunk), chunk)
+
+        fused = reciprocal_rank_fusion(
+            [self._chunk_key(c) for c in keyword],
+            [self._chunk_key(c) for _, c in semantic],
+            keyword_weight=keyword_weight,
+        )
+
+        return [self._to_result(score, by_key[key]) for key, score in fused[:limit]]
+
+    def _semantic_candidates(
+        self,
+        query: str,
+        scope: str,
+        project_id: Optional[int],
+        min_score: float,
+        file_types: Optional[List[str]],
+    ) -> List[tuple]:
+        """Score every in-scope chunk by cosine similarity, best first."""
+        # Embed query with the model the stored vectors currently use
+        query_embedding = embed_query("library_chunks", query)
 
         # Get candidate chunks based on scope
         if scope == "project":
-            if not project_id:
-                raise ValueError("project_id required for scope='project'")
             chunks = self._get_project_chunks(project_id)
         elif scope == "all":
-            if not project_id:
-                raise ValueError("project_id required for scope='all'")
             chunks = self._get_all_chunks(project_id)
         else:  # library
             chunks = self._get_library_chunks()
@@ -95,58 +170,171 @@ class LibrarySearchService:
         if file_types:
             chunks = [c for c in chunks if self._matches_file_type(c, file_types)]
 
-        # Score all chunks
+        # Score all chunks in one pass, on the quantized column if present
+        setting = get_setting(get_db(), "library_chunks")
+        scores = cosine_scores(
+            query_embedding,
+            [c["embedding"] for c in chunks],
+            [c["embedding_q"] for c in chunks],
+            rerank=setting.rerank if setting else 0,
+        )
+
         scored = []
-        for chunk in chunks:
-            if chunk["embedding"] is None:
+        for chunk, score in zip(chunks, scores.tolist()):
+            if score != score:  # NaN: no embedding
                 continue
 
-            score = self._cosine_similarity(query_embedding, chunk["embedding"])
-
             # Boost project files in 'all' scope
             if scope == "all" and chunk.get("is_project_ref"):
-                score *= 1.1  # 10% boost for project-referenced files
+                score *= PROJECT_BOOST
 
             if score >= min_score:
                 scored.append((score, chunk))
 
         # Sort by score descending
         scored.sort(key=lambda x: x[0], reverse=True)
+        return scored
 
-        # Build results
-        results = []
-        for score, chunk in scored[:limit]:
-            results.append(
-                SearchResult(
-                    library_file_id=chunk["library_file_id"],
-                    filename=chunk["filename"],
-                    chunk_index=chunk["chunk_index"],
-                    content=chunk["content"],
-                    score=score,
-                    page=chunk.get("page"),
-                    metadata=chunk.get("metadata"),
-                )
+    def _keyword_candidates(
+        self,
+        query: str,
+        scope: str,
+        project_id: Optional[int],
+        limit: int,
+        file_types: Optional[List[str]],
+    ) -> List[Dict]:
+        """
+        Rank in-scope chunks by FTS5 bm25, best first.
+
+        In 'all' scope project-referenced files get PROJECT_BOOST, as in
+        the semantic ranking, before the LIMIT and any fusion.
+        """
+        match = build_match_query(query, match_all=False)
+        if not match:
+            return []
+
+        joins = ""
+        where = ""
+        select_ref = "0 AS is_project_ref"
+        order_by = "bm25(library_chunks_fts)"
+        params: list = []
+
+        if scope == "project":
+            joins = (
+                "JOIN project_library_refs plr "
+                "ON plr.library_file_id = lf.id AND plr.project_id = ?"
             )
+            select_ref = "1 AS is_project_ref"
+            params.append(project_id)
+        elif scope == "all":
+            joins = (
+                "LEFT JOIN project_library_refs plr "
+                "ON plr.library_file_id = lf.id AND plr.project_id = ?"
+            )
+            select_ref = "plr.id IS NOT NULL AS is_project_ref"
+            # bm25 is negative (lower is better), so scaling it up ranks higher
+            order_by = (
+                f"bm25(library_chunks_fts) * "
+                f"(CASE WHEN plr.id IS NULL THEN 1.0 ELSE {PROJECT_BOOST} END)"
+            )
+            params.append(project_id)
 
-        return results
+        params.append(match)
+
+        if file_types:
+            where = "AND ({})".format(
+                " OR ".join("lf.mime_type LIKE ?" for _ in file_types)
+            )
+            params.extend(f"{ft}%" for ft in file_types)
+
+        params.append(limit)
+
+        conn = get_db()
+        cur = conn.execute(
+            f"""
+            SELECT
+                lc.library_file_id,
+                lc.chunk_index,
+                lc.content,
+                lc.page,
+                lf.filename,
+                lf.mime_type,
+                lf.metadata_json,
+                {select_ref}
+            FROM library_chunks_fts
+            JOIN library_chunks lc ON lc.id = library_chunks_fts.rowid
+            JOIN library_files lf ON lf.id = lc.library_file_id
+            {joins}
+            WHERE library_chunks_fts MATCH ?
+            {where}
+            ORDER BY {order_by}
+            LIMIT ?
+            """,
+            params,
+        )
+
+        chunks = []
+        for row in cur.fetchall():
+            metadata = None
+            if row["metadata_json"]:
+                try:
+                    metadata = json.loads(row["metadata_json"])
+                except json.JSONDecodeError:
+                    pass
+            chunks.append(
+                {
+                    "library_file_id": row["library_file_id"],
+                    "chunk_index": row["chunk_index"],
+                    "content": row["content"],
+                    "embedding": None,
+                    "embedding_q": None,
+                    "page": row["page"],
+                    "filename": row["filename"],
+                    "mime_type": row["mime_type"],
+                    "metadata": metadata,
+                    "is_project_ref": bool(row["is_project_ref"]),
+                }
+            )
+        return chunks
+
+    def _rank_scores(self, ranked: List[Dict]) -> List[tuple]:
+        """Turn a best-first list into (score, chunk) using the RRF scale."""
+        return [
+            ((RRF_K + 1) / (RRF_K + rank), chunk)
+            for rank, chunk in enumerate(ranked, 1)
+        ]
+
+    def _chunk_key(self, chunk: Dict) -> tuple:
+        return (chunk["library_file_id"], chunk["chunk_index"])
+
+    def _to_result(self, score: float, chunk: Dict) -> SearchResult:
+        return SearchResult(
+            library_file_id=chunk["library_file_id"],
+            filename=chunk["filename"],
+            chunk_index=chunk["chunk_index"],
+            content=chunk["content"],
+            score=score,
+            page=chunk.get("page"),
+            metadata=chunk.get("metadata"),
+        )
 
     def _get_library_chunks(self) -> List[Dict]:
         """Get all chunks from library."""
         conn = get_db()
         cur = conn.execute(
-            """
+            f"""
             SELECT
                 lc.library_file_id,
                 lc.chunk_index,
                 lc.content,
-                lc.embedding,
+                {vector_columns(conn, "library_chunks", "lc")},
                 lc.page,
                 lf.filename,
                 lf.mime_type,
                 lf.metadata_json
             FROM library_chunks lc
             JOIN library_files lf ON lc.library_file_id = lf.id
-            WHERE lc.embedding IS NOT NULL
+            WHERE (lc.embedding IS NOT NULL OR lc.embedding_q IS NOT NULL)
         """
         )
 
@@ -156,12 +344,12 @@ class LibrarySearchService:
         """Get chunks only from files referenced by project."""
         conn = get_db()
         cur = conn.execute(
-            """
+            f"""
             SELECT
                 lc.library_file_id,
                 lc.chunk_index,
                 lc.content,
-                lc.embedding,
+                {vector_columns(conn, "library_chunks", "lc")},
                 lc.page,
                 lf.filename,
                 lf.mime_type,
@@ -170,7 +358,7 @@ class LibrarySearchService:
             JOIN library_files lf ON lc.library_file_id = lf.id
             JOIN project_library_refs plr ON lf.id = plr.library_file_id
             WHERE plr.project_id = ?
-            AND lc.embedding IS NOT NULL
+            AND (lc.embedding IS NOT NULL OR lc.embedding_q IS NOT NULL)
         """,
             (project_id,),
         )
@@ -201,10 +389,7 @@ class LibrarySearchService:
         return chunks
 
     def _row_to_chunk(self, row) -> Dict:
-        """Convert database row to chunk dict."""
-        embedding = None
-        if row["embedding"]:
-            embedding = np.frombuffer(row["embedding"], dtype=np.float32)
+        """Convert database row to chunk dict (embeddings stay raw BLOBs)."""
 
         metadata = None
         if row["metadata_json"]:
@@ -217,7 +402,8 @@ class LibrarySearchService:
             "library_file_id": row["library_file_id"],
             "chunk_index": row["chunk_index"],
             "content": row["content"],
-            "embedding": embedding,
+            "embedding": row["embedding"],
+            "embedding_q": row["embedding_q"],
             "page": row["page"],
             "filename": row["filename"],
             "mime_type": row["mime_type"],
@@ -249,32 +435,35 @@ class LibrarySearchService:
 
         Useful for finding relevant sections in a known document.
         """
-        query_bytes = embed(query)
-        query_embedding = np.frombuffer(query_bytes, dtype=np.float32)
+        query_embedding = embed_query("library_chunks", query)
 
         conn = get_db()
         cur = conn.execute(
-            """
+            f"""
             SELECT
                 lc.library_file_id,
                 lc.chunk_index,
                 lc.content,
-                lc.embedding,
+                {vector_columns(conn, "library_chunks", "lc")},
                 lc.page,
                 lf.filename
             FROM library_chunks lc
             JOIN library_files lf ON lc.library_file_id = lf.id
             WHERE lc.library_file_id = ?
-            AND lc.embedding IS NOT NULL
+            AND (lc.embedding IS NOT NULL OR lc.embedding_q IS NOT NULL)
         """,
             (library_file_id,),
         )
+        rows = cur.fetchall()
 
-        scored = []
-        for row in cur.fetchall():
-            embedding = np.frombuffer(row["embedding"], dtype=np.float32)
-            score = self._cosine_similarity(query_embedding, embedding)
-            scored.append((score, row))
+        setting = get_setting(conn, "library_chunks")
+        scores = cosine_scores(
+            query_embedding,
+            [row["embedding"] for row in rows],
+            [row["embedding_q"] for row in rows],
+            rerank=setting.rerank if setting else 0,
+        )
+        scored = list(zip(scores.tolist(), rows))
 
         scored.sort(key=lambda x: x[0], reverse=True)
 
@@ -307,7 +496,7 @@ class LibrarySearchService:
 
         # Get embeddings for source file
         cur = conn.execute(
-            "SELECT embedding FROM library_chunks WHERE library_file_id = ?",
+            f"SELECT {vector_columns(conn, 'library_chunks')} FROM library_chunks WHERE library_file_id = ?",
             (library_file_id,),
         )
         rows = cur.fetchall()
@@ -317,9 +506,9 @@ class LibrarySearchService:
 
         # Compute average embedding
         embeddings = [
-            np.frombuffer(r["embedding"], dtype=np.float32)
+            load_embedding(r["embedding"], r["embedding_q"])
             for r in rows
-            if r["embedding"]
+            if r["embedding"] or r["embedding_q"]
         ]
         if not embeddings:
             return []
@@ -327,6 +516,7 @@ class LibrarySearchService:
         avg_embedding = np.mean(embeddings, axis=0)
 
         # Get all other files
+        columns = vector_columns(conn, "library_chunks")
         cur = conn.execute(
             """
             SELECT DISTINCT lf.id, lf.filename, lf.mime_type
@@ -341,13 +531,13 @@ class LibrarySearchService:
         for row in cur.fetchall():
             # Get this file's chunks
             cur2 = conn.execute(
-                "SELECT embedding FROM library_chunks WHERE library_file_id = ?",
+                f"SELECT {columns} FROM library_chunks WHERE library_file_id = ?",
                 (row["id"],),
             )
             file_embeddings = [
-                np.frombuffer(r["embedding"], dtype=np.float32)
+                load_embedding(r["embedding"], r["embedding_q"])
                 for r in cur2.fetchall()
-                if r["embedding"]
+                if r["embedding"] or r["embedding_q"]
             ]
             if not file_embeddings:
                 continue
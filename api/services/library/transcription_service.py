@@ -3,6 +3,10 @@ Transcription queue service for library audio/video files.
 
 Manages background transcription using faster-whisper.
 Transcripts are stored as library files linked to source media.
+
+Workers claim items under a lease (migration 024) and store each
+finished VAD window in transcription_segments, which backs the partial
+transcript shown while a long recording is still being processed.
 """
 
 import os
@@ -11,6 +15,7 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+from services.fulltext_search import build_match_query
 from utils.db import get_db
 from .library_service import LibraryService
 from .storage_service import LibraryStorageService
@@ -25,6 +30,13 @@ WHISPER_MODELS = {
     'large-v2': {'speed': 'slowest', 'accuracy': 'best', 'vram': '~10GB'},
 }
 
+# Seconds a claim stays valid without renewal; workers renew at a third
+LEASE_SECONDS = 600
+
+# Claims an item gets before a lost lease fails it instead of re-leasing;
+# an item that keeps killing its worker (OOM, decoder crash) stops there
+MAX_ATTEMPTS = 3
+
 # Audio/video mime types we can transcribe
 TRANSCRIBABLE_TYPES = [
     'audio/mpeg', 'audio/mp3', 'audio/wav', 'audio/x-wav',
@@ -129,6 +141,8 @@ class TranscriptionQueueService:
             "DELETE FROM transcription_queue WHERE id = ? AND status = 'pending'",
             (queue_id,)
         )
+        if cur.rowcount:
+            conn.execute("DELETE FROM transcription_segments WHERE queue_id = ?", (queue_id,))
         conn.commit()
         return cur.rowcount > 0
 
@@ -314,16 +328,111 @@ class TranscriptionQueueService:
         row = cur.fetchone()
         return dict(row) if row else None
 
-    def mark_processing(self, queue_id: int) -> bool:
-        """Mark a queue item as processing."""
+    def claim_next(
+        self,
+        worker_id: str,
+        lease_seconds: int = LEASE_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Claim the next item (highest priority, oldest) under a lease.
+
+        Pending items and items whose lease has expired (their worker died)
+        are claimable. Selecting and claiming is one UPDATE ... RETURNING,
+        so concurrent workers never get the same item. An expired item
+        that has already been claimed max_attempts times is marked failed
+        rather than handed to another worker.
+        """
+        conn = get_db()
+        conn.execute(
+            """
+            UPDATE transcription_queue
+            SET status = 'failed',
+                completed_at = CURRENT_TIMESTAMP,
+                error_message = 'Worker lost the lease ' || attempts || ' times',
+                lease_owner = NULL,
+                lease_expires_at = NULL
+            WHERE status = 'processing'
+              AND lease_expires_at < CURRENT_TIMESTAMP
+              AND attempts >= ?
+            """,
+            (max_attempts,)
+        )
+        row = conn.execute(
+            """
+            UPDATE transcription_queue
+            SET status = 'processing',
+                started_at = CURRENT_TIMESTAMP,
+                lease_owner = ?,
+                lease_expires_at = datetime('now', ?),
+                attempts = attempts + 1
+            WHERE id = (
+                SELECT id FROM transcription_queue
+                WHERE status = 'pending'
+                   OR (status = 'processing' AND lease_expires_at < CURRENT_TIMESTAMP
+                       AND attempts < ?)
+                ORDER BY priority ASC, queued_at ASC, id ASC
+                LIMIT 1
+            )
+            RETURNING id
+            """,
+            (worker_id, f"+{int(lease_seconds)} seconds", max_attempts)
+        ).fetchone()
+        conn.commit()
+        if not row:
+            return None
+        return self._get_claimed_item(row['id'])
+
+    def _get_claimed_item(self, queue_id: int) -> Optional[Dict[str, Any]]:
+        conn = get_db()
+        cur = conn.execute(
+            """
+            SELECT tq.*, lf.filename, lf.stored_path, lf.mime_type
+            FROM transcription_queue tq
+            JOIN library_files lf ON tq.library_file_id = lf.id
+            WHERE tq.id = ?
+            """,
+            (queue_id,)
+        )
+        row = cur.fetchone()
+        return dict(row) if row else None
+
+    def renew_lease(
+        self,
+        queue_id: int,
+        worker_id: str,
+        lease_seconds: int = LEASE_SECONDS
+    ) -> bool:
+        """Extend a held lease. False if the item is no longer ours."""
+        conn = get_db()
+        cur = conn.execute(
+            """
+            UPDATE transcription_queue
+            SET lease_expires_at = datetime('now', ?)
+            WHERE id = ? AND status = 'processing' AND lease_owner = ?
+            """,
+            (f"+{int(lease_seconds)} seconds", queue_id, worker_id)
+        )
+        conn.commit()
+        return cur.rowcount > 0
+
+    def mark_processing(
+        self,
+        queue_id: int,
+        worker_id: str = None,
+        lease_seconds: int = LEASE_SECONDS
+    ) -> bool:
+        """Claim a specific pending item (see claim_next for the queue order)."""
         conn = get_db()
         cur = conn.execute(
             """
             UPDATE transcription_queue
-            SET status = 'processing', started_at = CURRENT_TIMESTAMP
+            SET status = 'processing', started_at = CURRENT_TIMESTAMP,
+                lease_owner = ?, lease_expires_at = datetime('now', ?),
+                attempts = attempts + 1
             WHERE id = ? AND status = 'pending'
             """,
-            (queue_id,)
+            (worker_id, f"+{int(lease_seconds)} seconds", queue_id)
         )
         conn.commit()
         return cur.rowcount > 0
@@ -342,7 +451,9 @@ class TranscriptionQueueService:
             SET status = 'completed',
                 completed_at = CURRENT_TIMESTAMP,
                 result_library_file_id = ?,
-                processing_time_seconds = ?
+                processing_time_seconds = ?,
+                lease_owner = NULL,
+                lease_expires_at = NULL
             WHERE id = ?
             """,
             (result_library_file_id, processing_time, queue_id)
@@ -358,7 +469,9 @@ class TranscriptionQueueService:
             UPDATE transcription_queue
             SET status = 'failed',
                 completed_at = CURRENT_TIMESTAMP,
-                error_message = ?
+                error_message = ?,
+                lease_owner = NULL,
+                lease_expires_at = NULL
             WHERE id = ?
             """,
             (error_message, queue_id)
@@ -367,7 +480,7 @@ class TranscriptionQueueService:
         return cur.rowcount > 0
 
     def retry_failed(self, queue_id: int) -> bool:
-        """Reset a failed item to pending for retry."""
+        """Reset a failed item to pending for retry, with fresh attempts."""
         conn = get_db()
         cur = conn.execute(
             """
@@ -375,10 +488,165 @@ class TranscriptionQueueService:
             SET status = 'pending',
                 started_at = NULL,
                 completed_at = NULL,
-                error_message = NULL
+                error_message = NULL,
+                attempts = 0
             WHERE id = ? AND status = 'failed'
             """,
             (queue_id,)
         )
         conn.commit()
         return cur.rowcount > 0
+
+    # =========================================================================
+    # PARTIAL TRANSCRIPTS (one row per finished VAD window)
+    # =========================================================================
+
+    def set_window_plan(self, queue_id: int, duration: float, windows_total: int) -> None:
+        """Record the recording length and how many windows it was split into."""
+        conn = get_db()
+        conn.execute(
+            """
+            UPDATE transcription_queue
+            SET duration_seconds = ?, windows_total = ?
+            WHERE id = ?
+            """,
+            (duration, windows_total, queue_id)
+        )
+        conn.commit()
+
+    def get_saved_windows(self, queue_id: int) -> Dict[int, Dict[str, Any]]:
+        """Windows already transcribed for an item, by window index."""
+        conn = get_db()
+        cur = conn.execute(
+            """
+            SELECT window_index, start_seconds, end_seconds, segments_json, language
+            FROM transcription_segments
+            WHERE queue_id = ?
+            """,
+            (queue_id,)
+        )
+        return {
+            row['window_index']: {
+                'start': row['start_seconds'],
+                'end': row['end_seconds'],
+                'segments': json.loads(row['segments_json']),
+                'language': row['language'],
+            }
+            for row in cur.fetchall()
+        }
+
+    def save_window(
+        self,
+        queue_id: int,
+        library_file_id: int,
+        window_index: int,
+        start: float,
+        end: float,
+        segments: List[Dict[str, Any]],
+        language: str = None
+    ) -> None:
+        """Store one transcribed window (segment times already absolute)."""
+        text = ' '.join(seg['text'] for seg in segments if seg.get('text'))
+        conn = get_db()
+        conn.execute(
+            "DELETE FROM transcription_segments WHERE queue_id = ? AND window_index = ?",
+            (queue_id, window_index)
+        )
+        conn.execute(
+            """
+            INSERT INTO transcription_segments
+            (queue_id, library_file_id, window_index, start_seconds, end_seconds,
+             text, segments_json, language)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (queue_id, library_file_id, window_index, start, end,
+             text, json.dumps(segments, ensure_ascii=False), language)
+        )
+        conn.execute(
+            """
+            UPDATE transcription_queue
+            SET windows_done = (
+                SELECT COUNT(*) FROM transcription_segments WHERE queue_id = ?
+            )
+            WHERE id = ?
+            """,
+            (queue_id, queue_id)
+        )
+        conn.commit()
+
+    def clear_windows(self, queue_id: int) -> None:
+        """Drop stored windows (after the final transcript is saved)."""
+        conn = get_db()
+        conn.execute("DELETE FROM transcription_segments WHERE queue_id = ?", (queue_id,))
+        conn.execute("UPDATE transcription_queue SET windows_done = 0 WHERE id = ?", (queue_id,))
+        conn.commit()
+
+    def get_partial_transcript(self, library_file_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Transcript so far for a file that is still being transcribed.
+
+        Windows finish out of order; the text covers the finished ones in
+        recording order. None if nothing has been transcribed yet.
+        """
+        conn = get_db()
+        item = conn.execute(
+            """
+            SELECT id, status, duration_seconds, windows_total, windows_done
+            FROM transcription_queue
+            WHERE library_file_id = ?
+            """,
+            (library_file_id,)
+        ).fetchone()
+        if not item:
+            return None
+
+        rows = conn.execute(
+            """
+            SELECT window_index, start_seconds, end_seconds, text, segments_json, language
+            FROM transcription_segments
+            WHERE queue_id = ?
+            ORDER BY start_seconds
+            """,
+            (item['id'],)
+        ).fetchall()
+        if not rows:
+            return None
+
+        segments = []
+        for row in rows:
+            segments.extend(json.loads(row['segments_json']))
+
+        return {
+            'queue_id': item['id'],
+            'status': item['status'],
+            'text': ' '.join(row['text'] for row in rows if row['text']),
+            'segments': segments,
+            'language': rows[0]['language'],
+            'duration_seconds': item['duration_seconds'],
+            'windows_total': item['windows_total'],
+            'windows_done': item['windows_done'],
+            'covered_until': max(row['end_seconds'] for row in rows),
+        }
+
+    def search_partial_transcripts(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Keyword search over windows of transcripts still in progress."""
+        match = build_match_query(query, match_all=False)
+        if not match:
+            return []
+
+        conn = get_db()
+        cur = conn.execute(
+            """
+            SELECT ts.library_file_id, lf.filename, ts.window_index,
+                   ts.start_seconds, ts.end_seconds,
+                   snippet(transcription_segments_fts, 0, '[', ']', '…', 16) AS snippet
+            FROM transcription_segments_fts
+            JOIN transcription_segments ts ON ts.id = transcription_segments_fts.rowid
+            JOIN library_files lf ON lf.id = ts.library_file_id
+            WHERE transcription_segments_fts MATCH ?
+            ORDER BY bm25(transcription_segments_fts)
+            LIMIT ?
+            """,
+            (match, limit)
+        )
+        return [dict(row) for row in cur.fetchall()]
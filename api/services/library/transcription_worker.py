@@ -3,62 +3,140 @@ Transcription worker for processing the queue.
 
 Uses faster-whisper for CPU-based transcription.
 Can be run as a background process or called directly.
+
+Recordings are split into VAD windows (audio_segmentation) that are
+transcribed concurrently and stitched back with their offsets; each
+finished window is stored straight away, so a long lecture has a
+readable, searchable partial transcript while it is still running. A
+TranscriptionPool runs several workers against the queue at once.
 """
 
 import os
+import socket
+import threading
 import time
 import json
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+import numpy as np
 
 from utils.db import get_db
-from .transcription_service import TranscriptionQueueService
+from .audio_segmentation import SAMPLE_RATE, MAX_WINDOW_SECONDS, Window, load_audio, segment_audio
+from .transcription_service import TranscriptionQueueService, LEASE_SECONDS
 from .library_service import LibraryService
 from .storage_service import LibraryStorageService
 
+# Windows transcribed at once per queue item. faster-whisper (CTranslate2)
+# releases the GIL, so threads scale with its num_workers.
+WINDOW_WORKERS = int(os.getenv("TRANSCRIPTION_WINDOW_WORKERS", "2"))
+# Queue items processed at once by a TranscriptionPool
+POOL_SIZE = int(os.getenv("TRANSCRIPTION_WORKERS", "1"))
 
-class TranscriptionWorker:
-    def __init__(self):
-        self.queue_service = TranscriptionQueueService()
-        self.library = LibraryService()
-        self.storage = LibraryStorageService()
-        self._model_cache = {}
 
-    def _get_whisper_model(self, model_name: str):
-        """
-        Load and cache a whisper model.
+class LeaseLost(Exception):
+    """Another worker reclaimed the item (our lease expired)."""
 
-        Uses faster-whisper for CPU inference.
-        """
-        if model_name in self._model_cache:
-            return self._model_cache[model_name]
 
-        try:
-            from faster_whisper import WhisperModel
+class WhisperTranscriber:
+    """
+    faster-whisper models shared by every window thread.
+
+    One WhisperModel serves num_workers concurrent transcribe() calls;
+    cpu_threads is per call (0 lets CTranslate2 decide).
+    """
+
+    def __init__(self, num_workers: int = WINDOW_WORKERS, cpu_threads: int = 0):
+        self.num_workers = max(1, num_workers)
+        self.cpu_threads = cpu_threads
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _get_model(self, model_name: str):
+        with self._lock:
+            if model_name in self._models:
+                return self._models[model_name]
+
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                raise RuntimeError("faster-whisper not installed. Run: pip install faster-whisper")
 
             # Use CPU with int8 quantization for efficiency
             model = WhisperModel(
                 model_name,
                 device="cpu",
-                compute_type="int8"
+                compute_type="int8",
+                cpu_threads=self.cpu_threads,
+                num_workers=self.num_workers,
             )
-
-            self._model_cache[model_name] = model
+            self._models[model_name] = model
             return model
 
-        except ImportError:
-            raise RuntimeError("faster-whisper not installed. Run: pip install faster-whisper")
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        model_name: str = 'base',
+        language: str = None
+    ) -> Dict[str, Any]:
+        """
+        Transcribe one window of 16 kHz mono audio.
+
+        Returns {'segments': [{start, end, text}], 'language': str} with
+        times relative to the start of `audio`.
+        """
+        model = self._get_model(model_name)
+        segments, info = model.transcribe(
+            audio,
+            language=language,
+            beam_size=5,
+            vad_filter=True  # Pauses inside the window
+        )
+        return {
+            'segments': [
+                {'start': segment.start, 'end': segment.end, 'text': segment.text.strip()}
+                for segment in segments
+            ],
+            'language': info.language,
+        }
+
+
+class TranscriptionWorker:
+    def __init__(
+        self,
+        transcriber=None,
+        window_workers: int = WINDOW_WORKERS,
+        worker_id: str = None,
+        max_window: float = MAX_WINDOW_SECONDS,
+        lease_seconds: int = LEASE_SECONDS
+    ):
+        self.queue_service = TranscriptionQueueService()
+        self.library = LibraryService()
+        self.storage = LibraryStorageService()
+        self.window_workers = max(1, window_workers)
+        self.transcriber = transcriber or WhisperTranscriber(num_workers=self.window_workers)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.max_window = max_window
+        self.lease_seconds = lease_seconds
 
     def transcribe_file(
         self,
         audio_path: str,
         model_name: str = 'base',
-        language: str = None
+        language: str = None,
+        queue_item: Dict[str, Any] = None,
+        lease: threading.Event = None
     ) -> Dict[str, Any]:
         """
         Transcribe an audio/video file.
 
+        With a queue_item, windows are stored as they finish and windows
+        already stored by an earlier (interrupted) attempt are reused.
+        `lease`, when set, means the item was lost and work stops.
+
         Returns:
             {
                 'text': str,           # Full transcript
@@ -67,36 +145,115 @@ class TranscriptionWorker:
                 'duration': float      # Audio duration in seconds
             }
         """
-        model = self._get_whisper_model(model_name)
+        audio = load_audio(audio_path)
+        duration = len(audio) / SAMPLE_RATE
+        windows = segment_audio(audio, max_window=self.max_window)
+
+        saved = {}
+        if queue_item:
+            self.queue_service.set_window_plan(queue_item['id'], round(duration, 2), len(windows))
+            saved = self.queue_service.get_saved_windows(queue_item['id'])
+
+        results: Dict[int, Dict[str, Any]] = {}
+        todo: List[Window] = []
+        for window in windows:
+            prior = saved.get(window.index)
+            if prior and (prior['start'], prior['end']) == (window.start, window.end):
+                results[window.index] = prior
+            else:
+                todo.append(window)
+
+        def run(window: Window) -> Dict[str, Any]:
+            if lease is not None and lease.is_set():
+                raise LeaseLost()
+            return self._transcribe_window(audio, window, model_name, language, queue_item)
+
+        # Detect the language once, on the first window, rather than per window
+        if language is None:
+            if results:
+                language = next(iter(results.values()))['language']
+            elif todo:
+                first = todo.pop(0)
+                results[first.index] = run(first)
+                language = results[first.index]['language']
+
+        if todo:
+            with ThreadPoolExecutor(max_workers=self.window_workers,
+                                    thread_name_prefix="transcribe-window") as executor:
+                pending = {executor.submit(run, w): w for w in todo}
+                try:
+                    while pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            window = pending.pop(future)
+                            results[window.index] = future.result()
+                except BaseException:
+                    for future in pending:
+                        future.cancel()
+                    raise
+
+        segments = []
+        for index in sorted(results):
+            segments.extend(results[index]['segments'])
 
-        # Transcribe
-        segments, info = model.transcribe(
-            audio_path,
-            language=language,
-            beam_size=5,
-            vad_filter=True  # Filter out silence
-        )
+        return {
+            'text': ' '.join(seg['text'] for seg in segments if seg['text']),
+            'segments': segments,
+            'language': language,
+            'duration': duration
+        }
 
-        # Collect segments
-        segment_list = []
-        full_text_parts = []
+    def _transcribe_window(
+        self,
+        audio: np.ndarray,
+        window: Window,
+        model_name: str,
+        language: Optional[str],
+        queue_item: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Transcribe one window, shift its times into the recording, store it."""
+        start, end = window.samples()
+        result = self.transcriber.transcribe(audio[start:end], model_name=model_name, language=language)
 
-        for segment in segments:
-            segment_list.append({
-                'start': round(segment.start, 2),
-                'end': round(segment.end, 2),
-                'text': segment.text.strip()
-            })
-            full_text_parts.append(segment.text.strip())
+        segments = [
+            {
+                'start': round(window.start + seg['start'], 2),
+                'end': round(window.start + seg['end'], 2),
+                'text': seg['text']
+            }
+            for seg in result['segments']
+            if seg['text']
+        ]
+        window_result = {
+            'start': window.start,
+            'end': window.end,
+            'segments': segments,
+            'language': result.get('language') or language,
+        }
 
-        full_text = ' '.join(full_text_parts)
+        if queue_item:
+            self.queue_service.save_window(
+                queue_item['id'],
+                queue_item['library_file_id'],
+                window.index,
+                window.start,
+                window.end,
+                segments,
+                window_result['language']
+            )
+        return window_result
 
-        return {
-            'text': full_text,
-            'segments': segment_list,
-            'language': info.language,
-            'duration': info.duration
-        }
+    def _keep_lease(self, queue_id: int, lost: threading.Event, stop: threading.Event):
+        """Renew the lease until stopped; set `lost` if it was taken over."""
+        interval = max(1.0, self.lease_seconds / 3)
+        while not stop.wait(interval):
+            if not self.queue_service.renew_lease(queue_id, self.worker_id, self.lease_seconds):
+                lost.set()
+                return
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Claim the next queue item for this worker."""
+        return self.queue_service.claim_next(self.worker_id, self.lease_seconds)
 
     def process_queue_item(self, queue_item: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -110,11 +267,23 @@ class TranscriptionWorker:
         model = queue_item.get('model', 'base')
         language = queue_item.get('language')
 
-        # Mark as processing
-        if not self.queue_service.mark_processing(queue_id):
+        # Items from claim_next are already ours; others must be claimed
+        claimed = (
+            queue_item.get('status') == 'processing'
+            and queue_item.get('lease_owner') == self.worker_id
+        )
+        if not claimed and not self.queue_service.mark_processing(
+            queue_id, self.worker_id, self.lease_seconds
+        ):
             return {'success': False, 'error': 'Could not acquire lock'}
 
         start_time = time.time()
+        lost, stop = threading.Event(), threading.Event()
+        heartbeat = threading.Thread(
+            target=self._keep_lease, args=(queue_id, lost, stop),
+            name=f"transcription-lease-{queue_id}", daemon=True
+        )
+        heartbeat.start()
 
         try:
             # Get file path
@@ -128,8 +297,12 @@ class TranscriptionWorker:
             result = self.transcribe_file(
                 str(full_path),
                 model_name=model,
-                language=language
+                language=language,
+                queue_item=queue_item,
+                lease=lost
             )
+            if lost.is_set():
+                raise LeaseLost()
 
             # Save transcript to file
             transcript_filename = f"{Path(queue_item['filename']).stem}_transcript.json"
@@ -155,12 +328,13 @@ class TranscriptionWorker:
 
             processing_time = int(time.time() - start_time)
 
-            # Mark completed
+            # Mark completed; the final transcript replaces the partial one
             self.queue_service.mark_completed(
                 queue_id,
                 result_library_file_id=transcript_result['id'],
                 processing_time=processing_time
             )
+            self.queue_service.clear_windows(queue_id)
 
             return {
                 'success': True,
@@ -168,10 +342,17 @@ class TranscriptionWorker:
                 'processing_time': processing_time
             }
 
+        except LeaseLost:
+            # Whoever holds the lease now finishes it (reusing our windows)
+            return {'success': False, 'error': 'Lease lost to another worker'}
+
         except Exception as e:
             self.queue_service.mark_failed(queue_id, str(e))
             return {'success': False, 'error': str(e)}
 
+        finally:
+            stop.set()
+
     def _save_transcript(
         self,
         filename: str,
@@ -216,7 +397,7 @@ class TranscriptionWorker:
 
         Returns result dict or None if queue is empty.
         """
-        item = self.queue_service.get_next_pending()
+        item = self.claim_next()
         if not item:
             return None
 
@@ -253,7 +434,7 @@ class TranscriptionWorker:
 
         return results
 
-    def run_continuous(self, poll_interval: int = 30):
+    def run_continuous(self, poll_interval: int = 30, workers: int = 1):
         """
         Run continuously, processing queue items as they appear.
 
@@ -261,7 +442,17 @@ class TranscriptionWorker:
 
         Args:
             poll_interval: Seconds to wait when queue is empty
+            workers: Queue items to process at once (see TranscriptionPool)
         """
+        if workers > 1:
+            TranscriptionPool(
+                size=workers,
+                poll_interval=poll_interval,
+                transcriber=self.transcriber,
+                window_workers=self.window_workers
+            ).run_forever()
+            return
+
         print(f"Transcription worker started. Poll interval: {poll_interval}s")
 
         while True:
@@ -283,3 +474,104 @@ class TranscriptionWorker:
             except Exception as e:
                 print(f"Worker error: {e}")
                 time.sleep(10)
+
+
+class TranscriptionPool:
+    """
+    Several TranscriptionWorkers draining the queue concurrently.
+
+    Each worker thread claims items with its own lease, so pools in
+    separate processes (or on separate machines sharing the database)
+    can run side by side. Workers share one transcriber, i.e. one
+    loaded model per model name.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        window_workers: int = WINDOW_WORKERS,
+        poll_interval: float = 30,
+        transcriber=None,
+        max_window: float = MAX_WINDOW_SECONDS,
+        lease_seconds: int = LEASE_SECONDS
+    ):
+        self.size = max(1, size)
+        self.poll_interval = poll_interval
+        transcriber = transcriber or WhisperTranscriber(num_workers=self.size * max(1, window_workers))
+        prefix = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.workers = [
+            TranscriptionWorker(
+                transcriber=transcriber,
+                window_workers=window_workers,
+                worker_id=f"{prefix}/{i}",
+                max_window=max_window,
+                lease_seconds=lease_seconds
+            )
+            for i in range(self.size)
+        ]
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.stats = {'processed': 0, 'success': 0, 'failed': 0}
+
+    def _run_worker(self, worker: TranscriptionWorker, until_empty: bool):
+        while not self._stop.is_set():
+            try:
+                result = worker.process_next()
+            except Exception as e:
+                print(f"Worker {worker.worker_id} error: {e}")
+                self._stop.wait(10)
+                continue
+
+            if result is None:
+                if until_empty:
+                    return
+                self._stop.wait(self.poll_interval)
+                continue
+
+            with self._lock:
+                self.stats['processed'] += 1
+                self.stats['success' if result['success'] else 'failed'] += 1
+            if result['success']:
+                print(f"Transcribed: {result.get('transcript_id')} in {result.get('processing_time')}s")
+            else:
+                print(f"Failed: {result.get('error')}")
+
+    def start(self, until_empty: bool = False):
+        """Start the worker threads (until_empty: exit once the queue is drained)."""
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(
+                target=self._run_worker, args=(worker, until_empty),
+                name=f"transcription-worker-{i}", daemon=True
+            )
+            for i, worker in enumerate(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = None):
+        """Stop after the items in progress finish."""
+        self._stop.set()
+        self.join(timeout)
+
+    def join(self, timeout: float = None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run_until_empty(self) -> Dict[str, int]:
+        """Drain the queue and return counts."""
+        self.start(until_empty=True)
+        self.join()
+        return dict(self.stats)
+
+    def run_forever(self):
+        print(f"Transcription pool started: {self.size} workers. Poll interval: {self.poll_interval}s")
+        self.start()
+        try:
+            while any(thread.is_alive() for thread in self._threads):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("Stopping after current items...")
+            self.stop()
+        print("Worker stopped")
@@ -0,0 +1,418 @@
+"""
+LLM Job Queue Service
+
+Persistent SQLite-backed queue for LLM post-processing (file insights,
+multi-file reasoning). Request handlers enqueue and return immediately;
+a worker process (workers/llm_job_worker.py) claims and runs jobs.
+
+- Priorities: 1 (highest) to 10 (lowest)
+- Dedupe: at most one pending/processing job per dedupe_key (kind + target;
+  forced regeneration is keyed apart so it is never folded into a plain job)
+- Retries: failed attempts are re-queued with exponential backoff until
+  max_attempts, then marked failed
+- Stale recovery: jobs left 'processing' by a dead worker are re-queued,
+  or failed once they have used max_attempts (a job that kills the worker)
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from utils.db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Job kinds
+JOB_KIND_INSIGHTS = "insights"
+JOB_KIND_REASONING = "reasoning"
+JOB_KINDS = (JOB_KIND_INSIGHTS, JOB_KIND_REASONING)
+
+DEFAULT_PRIORITY = 5
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Retry backoff: RETRY_BASE_SECONDS * 2^(attempt-1), capped
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 900
+
+# A 'processing' job older than this is assumed orphaned by a dead worker
+STALE_AFTER_SECONDS = 1800
+
+_JOB_COLUMNS = """
+    id, kind, project_id, file_id, user_id, payload_json, priority, status,
+    attempts, max_attempts, run_after, queued_at, started_at, completed_at,
+    result_json, error_message
+"""
+
+
+def make_dedupe_key(
+    kind: str,
+    project_id: Optional[int] = None,
+    file_id: Optional[int] = None,
+    payload: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Build the key that identifies 'the same work' for deduplication.
+
+    A job with payload force=true gets its own key: an active plain job
+    may just return cached output, so it cannot stand in for a forced
+    regeneration.
+    """
+    payload = payload or {}
+    suffix = ":force" if payload.get("force") else ""
+    if kind == JOB_KIND_INSIGHTS:
+        return f"insights:file:{file_id}{suffix}"
+    if kind == JOB_KIND_REASONING:
+        analysis = payload.get("analysis", "full")
+        return f"reasoning:project:{project_id}:{analysis}{suffix}"
+    return f"{kind}:project:{project_id}:file:{file_id}{suffix}"
+
+
+def _row_to_job(row) -> Dict[str, Any]:
+    job = dict(row)
+    for src, dst in (("payload_json", "payload"), ("result_json", "result")):
+        raw = job.pop(src, None)
+        try:
+            job[dst] = json.loads(raw) if raw else None
+        except json.JSONDecodeError:
+            job[dst] = None
+    return job
+
+
+# ---------------------------------------------------------------------------
+# Enqueue / inspect
+# ---------------------------------------------------------------------------
+
+def enqueue_job(
+    kind: str,
+    project_id: Optional[int] = None,
+    file_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    payload: Optional[Dict[str, Any]] = None,
+    priority: int = DEFAULT_PRIORITY,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> Dict[str, Any]:
+    """
+    Queue an LLM job, or return the active job already queued for the
+    same target.
+
+    Returns:
+        {'id': job_id, 'status': 'queued' | 'already_queued', 'job': {...}}
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    priority = max(1, min(10, int(priority)))
+    dedupe_key = make_dedupe_key(kind, project_id, file_id, payload)
+
+    conn = get_db()
+    # The partial unique index makes this a no-op while an equivalent
+    # job is pending/processing.
+    cur = conn.execute(
+        """
+        INSERT OR IGNORE INTO llm_jobs
+            (kind, project_id, file_id, user_id, dedupe_key, payload_json,
+             priority, max_attempts)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            kind,
+            project_id,
+            file_id,
+            user_id,
+            dedupe_key,
+            json.dumps(payload) if payload else None,
+            priority,
+            max_attempts,
+        ),
+    )
+
+    inserted = cur.rowcount
+    # Commit even when ignored: the INSERT opened a write transaction
+    conn.commit()
+    if inserted:
+        job_id = cur.lastrowid
+        return {"id": job_id, "status": "queued", "job": get_job(job_id)}
+
+    row = conn.execute(
+        f"""
+        SELECT {_JOB_COLUMNS} FROM llm_jobs
+        WHERE dedupe_key = ? AND status IN ('pending', 'processing')
+        """,
+        (dedupe_key,),
+    ).fetchone()
+
+    if not row:
+        # Raced with a worker finishing the job between INSERT and SELECT
+        return enqueue_job(kind, project_id, file_id, user_id, payload, priority, max_attempts)
+
+    # Bump priority if the new request is more urgent
+    if row["status"] == "pending" and priority < row["priority"]:
+        conn.execute(
+            "UPDATE llm_jobs SET priority = ? WHERE id = ? AND status = 'pending'",
+            (priority, row["id"]),
+        )
+        conn.commit()
+        return {"id": row["id"], "status": "already_queued", "job": get_job(row["id"])}
+
+    return {"id": row["id"], "status": "already_queued", "job": _row_to_job(row)}
+
+
+def get_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """Get a job by ID."""
+    conn = get_db()
+    row = conn.execute(
+        f"SELECT {_JOB_COLUMNS} FROM llm_jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+    return _row_to_job(row) if row else None
+
+
+def get_active_job(
+    kind: str,
+    project_id: Optional[int] = None,
+    file_id: Optional[int] = None,
+    payload: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Get the pending/processing job for a target, if any."""
+    conn = get_db()
+    row = conn.execute(
+        f"""
+        SELECT {_JOB_COLUMNS} FROM llm_jobs
+        WHERE dedupe_key = ? AND status IN ('pending', 'processing')
+        """,
+        (make_dedupe_key(kind, project_id, file_id, payload),),
+    ).fetchone()
+    return _row_to_job(row) if row else None
+
+
+def list_jobs(
+    project_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """List jobs, active first, then most recent."""
+    where = []
+    params: List[Any] = []
+    if project_id is not None:
+        where.append("project_id = ?")
+        params.append(project_id)
+    if user_id is not None:
+        where.append("user_id = ?")
+        params.append(user_id)
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if kind:
+        where.append("kind = ?")
+        params.append(kind)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    params.append(limit)
+
+    conn = get_db()
+    cur = conn.execute(
+        f"""
+        SELECT {_JOB_COLUMNS} FROM llm_jobs
+        {where_sql}
+        ORDER BY
+            CASE status
+                WHEN 'processing' THEN 0
+                WHEN 'pending' THEN 1
+                ELSE 2
+            END,
+            priority ASC,
+            id DESC
+        LIMIT ?
+        """,
+        params,
+    )
+    return [_row_to_job(row) for row in cur.fetchall()]
+
+
+def get_queue_stats(project_id: Optional[int] = None) -> Dict[str, int]:
+    """Count jobs by status."""
+    conn = get_db()
+    if project_id is not None:
+        cur = conn.execute(
+            "SELECT status, COUNT(*) AS count FROM llm_jobs WHERE project_id = ? GROUP BY status",
+            (project_id,),
+        )
+    else:
+        cur = conn.execute("SELECT status, COUNT(*) AS count FROM llm_jobs GROUP BY status")
+    by_status = {row["status"]: row["count"] for row in cur.fetchall()}
+    return {
+        "pending": by_status.get("pending", 0),
+        "processing": by_status.get("processing", 0),
+        "completed": by_status.get("completed", 0),
+        "failed": by_status.get("failed", 0),
+        "total": sum(by_status.values()),
+    }
+
+
+def retry_job(job_id: int) -> bool:
+    """Re-queue a failed job with a fresh attempt budget."""
+    conn = get_db()
+    cur = conn.execute(
+        """
+        UPDATE llm_jobs
+        SET status = 'pending', attempts = 0, error_message = NULL,
+            run_after = CURRENT_TIMESTAMP, started_at = NULL, completed_at = NULL
+        WHERE id = ? AND status = 'failed'
+          AND NOT EXISTS (
+              SELECT 1 FROM llm_jobs j2
+              WHERE j2.dedupe_key = llm_jobs.dedupe_key
+                AND j2.status IN ('pending', 'processing')
+          )
+        """,
+        (job_id,),
+    )
+    conn.commit()
+    return cur.rowcount > 0
+
+
+def cancel_project_jobs(project_id: int) -> int:
+    """Drop pending jobs for a project (e.g. when it is deleted)."""
+    conn = get_db()
+    cur = conn.execute(
+        "DELETE FROM llm_jobs WHERE project_id = ? AND status = 'pending'",
+        (project_id,),
+    )
+    conn.commit()
+    return cur.rowcount
+
+
+# ---------------------------------------------------------------------------
+# Processing (called by worker)
+# ---------------------------------------------------------------------------
+
+def claim_next_job() -> Optional[Dict[str, Any]]:
+    """
+    Claim the next runnable job (highest priority, oldest).
+
+    The claim is a guarded UPDATE, so concurrent workers never run the
+    same job twice.
+    """
+    conn = get_db()
+    while True:
+        row = conn.execute(
+            """
+            SELECT id FROM llm_jobs
+            WHERE status = 'pending' AND run_after <= CURRENT_TIMESTAMP
+            ORDER BY priority ASC, run_after ASC, id ASC
+            LIMIT 1
+            """
+        ).fetchone()
+        if not row:
+            return None
+
+        cur = conn.execute(
+            """
+            UPDATE llm_jobs
+            SET status = 'processing', started_at = CURRENT_TIMESTAMP,
+                attempts = attempts + 1
+            WHERE id = ? AND status = 'pending'
+            """,
+            (row["id"],),
+        )
+        conn.commit()
+        if cur.rowcount:
+            return get_job(row["id"])
+        # Another worker won the race; try the next job
+
+
+def mark_completed(job_id: int, result: Optional[Dict[str, Any]] = None) -> None:
+    """Record a successful run."""
+    conn = get_db()
+    conn.execute(
+        """
+        UPDATE llm_jobs
+        SET status = 'completed', completed_at = CURRENT_TIMESTAMP,
+            result_json = ?, error_message = NULL
+        WHERE id = ?
+        """,
+        (json.dumps(result) if result is not None else None, job_id),
+    )
+    conn.commit()
+
+
+def mark_failed(job_id: int, error: str, retryable: bool = True) -> str:
+    """
+    Record a failed attempt.
+
+    Re-queues with exponential backoff while attempts remain.
+
+    Returns:
+        The job's new status ('pending' or 'failed')
+    """
+    conn = get_db()
+    row = conn.execute(
+        "SELECT attempts, max_attempts FROM llm_jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+    if not row:
+        return "failed"
+
+    if retryable and row["attempts"] < row["max_attempts"]:
+        delay = min(RETRY_BASE_SECONDS * 2 ** (row["attempts"] - 1), RETRY_MAX_SECONDS)
+        conn.execute(
+            """
+            UPDATE llm_jobs
+            SET status = 'pending', error_message = ?,
+                run_after = datetime('now', ?)
+            WHERE id = ?
+            """,
+            (error, f"+{int(delay)} seconds", job_id),
+        )
+        status = "pending"
+    else:
+        conn.execute(
+            """
+            UPDATE llm_jobs
+            SET status = 'failed', error_message = ?, completed_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (error, job_id),
+        )
+        status = "failed"
+
+    conn.commit()
+    return status
+
+
+def requeue_stale_jobs(stale_after_seconds: int = STALE_AFTER_SECONDS) -> int:
+    """
+    Return orphaned 'processing' jobs to the queue.
+
+    A stale job that has already used max_attempts is failed instead, so
+    a job that keeps killing the worker does not loop forever.
+
+    Returns:
+        Number of jobs re-queued
+    """
+    conn = get_db()
+    cutoff = f"-{int(stale_after_seconds)} seconds"
+    failed = conn.execute(
+        """
+        UPDATE llm_jobs
+        SET status = 'failed', completed_at = CURRENT_TIMESTAMP,
+            error_message = 'Worker died during ' || attempts || ' attempt(s)'
+        WHERE status = 'processing'
+          AND started_at <= datetime('now', ?)
+          AND attempts >= max_attempts
+        """,
+        (cutoff,),
+    ).rowcount
+    cur = conn.execute(
+        """
+        UPDATE llm_jobs
+        SET status = 'pending', run_after = CURRENT_TIMESTAMP
+        WHERE status = 'processing'
+          AND started_at <= datetime('now', ?)
+        """,
+        (cutoff,),
+    )
+    conn.commit()
+    if failed:
+        logger.warning(f"Failed {failed} stale LLM job(s) out of attempts")
+    if cur.rowcount:
+        logger.warning(f"Re-queued {cur.rowcount} stale LLM job(s)")
+    return cur.rowcount
@@ -49,6 +49,9 @@ from typing import List, Dict, Any, Optional, Tuple
 
 from dotenv import load_dotenv
 
+from utils import metrics
+from utils.http_retry import get_session, post_with_retry
+
 load_dotenv()
 
 
@@ -128,6 +131,50 @@ class LLMProvider(ABC):
         """Return True if this provider is properly configured."""
         pass
 
+    def resolve_model(self, model: Optional[str] = None) -> Optional[str]:
+        """Return the model a call will actually use."""
+        return model or getattr(self, "DEFAULT_MODEL", None)
+
+    def cached_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        cache_ttl_hours: Optional[int] = None,
+        cache_refresh: bool = False,
+        **kwargs: Any,
+    ) -> str:
+        """
+        chat_completion() through the content-addressed response cache.
+
+        Opt-in for deterministic prompts only (low temperature, output
+        fully determined by the messages). Identical requests to the same
+        provider and model return the stored response without an API call.
+
+        Args:
+            messages: As for chat_completion().
+            model: As for chat_completion().
+            cache_ttl_hours: Override the cache TTL for this entry.
+            cache_refresh: Skip the lookup and overwrite the entry (for
+                           explicit "regenerate" requests).
+            **kwargs: Passed to chat_completion() and included in the key.
+        """
+        from services.cache.llm_response_cache import (
+            get_llm_response_cache,
+            make_cache_key,
+        )
+
+        provider = self.__class__.__name__
+        resolved = self.resolve_model(model)
+        key = make_cache_key(provider, resolved, messages, "chat", **kwargs)
+        return get_llm_response_cache().get_or_call(
+            key,
+            lambda: self.chat_completion(messages=messages, model=model, **kwargs),
+            provider,
+            resolved,
+            cache_ttl_hours,
+            refresh=cache_refresh,
+        )
+
     def supports_tool_use(self) -> bool:
         """
         Whether this provider supports tool-use completions.
@@ -183,6 +230,9 @@ class OpenAIProvider(LLMProvider):
     def is_configured(self) -> bool:
         return bool(self._api_key)
 
+    def resolve_model(self, model: Optional[str] = None) -> Optional[str]:
+        return model or get_model_name()
+
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -195,11 +245,15 @@ class OpenAIProvider(LLMProvider):
         client = self._get_client()
         model = model or get_model_name()
 
-        completion = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            **kwargs,
-        )
+        with metrics.llm_call("openai", model) as call:
+            completion = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                **kwargs,
+            )
+            usage = getattr(completion, "usage", None)
+            if usage is not None:
+                call.tokens(usage.prompt_tokens, usage.completion_tokens)
 
         return completion.choices[0].message.content or ""
 
@@ -263,35 +317,28 @@ class XAIProvider(LLMProvider):
         timeout = kwargs.get("timeout", self.DEFAULT_TIMEOUT)
 
         try:
-            response = requests.post(
-                self.XAI_API_URL,
-                json=payload,
-                headers=headers,
-                timeout=timeout,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # Parse response (OpenAI-compatible format)
-            choices = data.get("choices", [])
-            if not choices:
-                raise RuntimeError("xAI returned no choices in response")
-
-            return choices[0].get("message", {}).get("content", "")
-
-        except requests.Timeout:
-            raise RuntimeError(f"xAI request timed out after {timeout}s")
-        except requests.HTTPError as e:
-            # Extract error details if available
-            try:
-                error_data = e.response.json()
-                error_msg = error_data.get("error", {}).get("message", str(e))
-            except Exception:
-                error_msg = str(e)
-            raise RuntimeError(f"xAI API error: {error_msg}")
+            with metrics.llm_call("xai", model) as call:
+                response = post_with_retry(
+                    url=self.XAI_API_URL,
+                    json=payload,
+                    headers=headers,
+                    timeout=timeout,
+                    session=get_session("xai"),
+                    label="xAI",
+                )
+                data = response.json()
+                usage = data.get("usage") or {}
+                call.tokens(usage.get("prompt_tokens"), usage.get("completion_tokens"))
         except requests.RequestException as e:
             raise RuntimeError(f"xAI request failed: {e}")
 
+        # Parse response (OpenAI-compatible format)
+        choices = data.get("choices", [])
+        if not choices:
+            raise RuntimeError("xAI returned no choices in response")
+
+        return choices[0].get("message", {}).get("content", "")
+
 
 class AnthropicProvider(LLMProvider):
     """
@@ -382,42 +429,35 @@ class AnthropicProvider(LLMProvider):
         timeout = kwargs.get("timeout", self.DEFAULT_TIMEOUT)
 
         try:
-            response = requests.post(
-                self.ANTHROPIC_API_URL,
-                json=payload,
-                headers=headers,
-                timeout=timeout,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # Parse response — content is a LIST of blocks
-            content_blocks = data.get("content", [])
-            if not content_blocks:
-                raise RuntimeError("Anthropic returned no content in response")
-
-            # Extract text from all text blocks
-            text_parts = [
-                block.get("text", "")
-                for block in content_blocks
-                if block.get("type") == "text"
-            ]
-
-            return "".join(text_parts)
-
-        except requests.Timeout:
-            raise RuntimeError(f"Anthropic request timed out after {timeout}s")
-        except requests.HTTPError as e:
-            # Extract error details if available
-            try:
-                error_data = e.response.json()
-                error_msg = error_data.get("error", {}).get("message", str(e))
-            except Exception:
-                error_msg = str(e)
-            raise RuntimeError(f"Anthropic API error: {error_msg}")
+            with metrics.llm_call("anthropic", model) as call:
+                response = post_with_retry(
+                    url=self.ANTHROPIC_API_URL,
+                    json=payload,
+                    headers=headers,
+                    timeout=timeout,
+                    session=get_session("anthropic"),
+                    label="Anthropic",
+                )
+                data = response.json()
+                usage = data.get("usage") or {}
+                call.tokens(usage.get("input_tokens"), usage.get("output_tokens"))
         except requests.RequestException as e:
             raise RuntimeError(f"Anthropic request failed: {e}")
 
+        # Parse response — content is a LIST of blocks
+        content_blocks = data.get("content", [])
+        if not content_blocks:
+            raise RuntimeError("Anthropic returned no content in response")
+
+        # Extract text from all text blocks
+        text_parts = [
+            block.get("text", "")
+            for block in content_blocks
+            if block.get("type") == "text"
+        ]
+
+        return "".join(text_parts)
+
     def supports_tool_use(self) -> bool:
         """Anthropic Claude supports tool use natively."""
         return True
@@ -442,8 +482,6 @@ class AnthropicProvider(LLMProvider):
         if not self.is_configured():
             raise RuntimeError("Anthropic API key not configured (ANTHROPIC_API_KEY)")
 
-        from utils.http_retry import post_with_retry
-
         model = model or self.DEFAULT_MODEL
 
         # Convert ToolDefinitions to Anthropic wire format
@@ -494,14 +532,19 @@ class AnthropicProvider(LLMProvider):
         timeout = kwargs.get("timeout", self.DEFAULT_TIMEOUT)
 
         # POST with retry (important for tool-use loops: 10-25 sequential calls)
-        response = post_with_retry(
-            url=self.ANTHROPIC_API_URL,
-            json=payload,
-            headers=headers,
-            timeout=timeout,
-        )
+        with metrics.llm_call("anthropic", model) as call:
+            response = post_with_retry(
+                url=self.ANTHROPIC_API_URL,
+                json=payload,
+                headers=headers,
+                timeout=timeout,
+                session=get_session("anthropic"),
+                label="Anthropic",
+            )
 
-        data = response.json()
+            data = response.json()
+            usage = data.get("usage") or {}
+            call.tokens(usage.get("input_tokens"), usage.get("output_tokens"))
 
         # Parse response content blocks
         content_blocks = data.get("content", [])
@@ -536,6 +579,9 @@ class AnthropicProvider(LLMProvider):
 class OllamaProvider(LLMProvider):
     """Ollama local LLM provider implementation."""
 
+    # Local server: retry briefly (model loading returns 5xx / resets)
+    MAX_RETRIES = 2
+
     def __init__(
         self,
         base_url: Optional[str] = None,
@@ -545,13 +591,16 @@ class OllamaProvider(LLMProvider):
         self._default_model = model or os.getenv("OLLAMA_MODEL", "llama3.1:8b")
         self._available = None  # Cache availability check
 
+    def resolve_model(self, model: Optional[str] = None) -> Optional[str]:
+        return model or self._default_model
+
     def is_configured(self) -> bool:
         """Check if Ollama is running and accessible."""
         if self._available is not None:
             return self._available
 
         try:
-            response = requests.get(f"{self._base_url}/api/tags", timeout=2)
+            response = get_session("ollama").get(f"{self._base_url}/api/tags", timeout=2)
             self._available = response.status_code == 200
         except requests.RequestException:
             self._available = False
@@ -561,7 +610,7 @@ class OllamaProvider(LLMProvider):
     def list_models(self) -> List[str]:
         """List available models in Ollama."""
         try:
-            response = requests.get(f"{self._base_url}/api/tags", timeout=5)
+            response = get_session("ollama").get(f"{self._base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 return [m["name"] for m in data.get("models", [])]
@@ -604,17 +653,49 @@ class OllamaProvider(LLMProvider):
             payload["options"]["temperature"] = kwargs["temperature"]
 
         try:
-            response = requests.post(
-                f"{self._base_url}/api/chat",
-                json=payload,
-                timeout=300,  # 5 min timeout for slow CPU inference
-            )
-            response.raise_for_status()
-            data = response.json()
+            with metrics.llm_call("ollama", model) as call:
+                response = post_with_retry(
+                    url=f"{self._base_url}/api/chat",
+                    json=payload,
+                    timeout=300,  # 5 min timeout for slow CPU inference
+                    max_retries=self.MAX_RETRIES,
+                    session=get_session("ollama"),
+                    label="Ollama",
+                )
+                data = response.json()
+                call.tokens(data.get("prompt_eval_count"), data.get("eval_count"))
             return data.get("message", {}).get("content", "")
         except requests.RequestException as e:
             raise RuntimeError(f"Ollama request failed: {e}")
 
+    def cached_generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        cache_ttl_hours: Optional[int] = None,
+        cache_refresh: bool = False,
+        **kwargs: Any,
+    ) -> str:
+        """generate() through the LLM response cache (see cached_chat_completion)."""
+        from services.cache.llm_response_cache import (
+            get_llm_response_cache,
+            make_cache_key,
+        )
+
+        provider = self.__class__.__name__
+        resolved = self.resolve_model(model)
+        key = make_cache_key(
+            provider, resolved, [{"role": "user", "content": prompt}], "generate", **kwargs
+        )
+        return get_llm_response_cache().get_or_call(
+            key,
+            lambda: self.generate(prompt, model=model, **kwargs),
+            provider,
+            resolved,
+            cache_ttl_hours,
+            refresh=cache_refresh,
+        )
+
     def generate(
         self,
         prompt: str,
@@ -642,13 +723,17 @@ class OllamaProvider(LLMProvider):
             payload["options"]["temperature"] = kwargs["temperature"]
 
         try:
-            response = requests.post(
-                f"{self._base_url}/api/generate",
-                json=payload,
-                timeout=300,
-            )
-            response.raise_for_status()
-            data = response.json()
+            with metrics.llm_call("ollama", model) as call:
+                response = post_with_retry(
+                    url=f"{self._base_url}/api/generate",
+                    json=payload,
+                    timeout=300,
+                    max_retries=self.MAX_RETRIES,
+                    session=get_session("ollama"),
+                    label="Ollama",
+                )
+                data = response.json()
+                call.tokens(data.get("prompt_eval_count"), data.get("eval_count"))
             return data.get("response", "")
         except requests.RequestException as e:
             raise RuntimeError(f"Ollama request failed: {e}")
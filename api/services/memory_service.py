@@ -23,7 +23,9 @@ from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 
 from core.config import MEMORY_DB
-from core.memory_core import embed, search_memories as core_search_memories
+from core.memory_core import search_memories as core_search_memories
+from services.embedding_migration import embed_for_table, vector_dim
+from services.embedding_quant import encode_for_table
 from utils.db import get_db
 
 logger = logging.getLogger(__name__)
@@ -127,21 +129,24 @@ def add_memory(
             logger.warning(f"Core tier full ({core_count}), storing as long_term instead")
             memory_tier = "long_term"
 
-    emb = embed(content)
     now = datetime.utcnow().isoformat()
 
     conn = _get_memory_db()
     cursor = conn.cursor()
 
     try:
+        blobs, model_id = embed_for_table("memories", [content], conn)
+        emb, emb_q = encode_for_table(conn, "memories", blobs[0])
         cursor.execute(
             """
             INSERT INTO memories
-            (user_id, conversation_id, message_id, category, content, embedding,
+            (user_id, conversation_id, message_id, category, content, embedding, embedding_q,
+             embedding_model, embedding_dim,
              source, is_pinned, memory_tier, confidence, last_accessed, access_count, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
             """,
-            (user_id, conversation_id, message_id, category, content, emb,
+            (user_id, conversation_id, message_id, category, content, emb, emb_q,
+             model_id, vector_dim(blobs[0]),
              source, 1 if memory_tier == "core" else 0,
              memory_tier, confidence, now, now),
         )
@@ -201,10 +206,19 @@ def update_memory(
         if content is not None:
             updates.append("content = ?")
             params.append(content)
-            # Re-embed on content change
-            emb = embed(content)
+            # Re-embed on content change; a running model migration
+            # re-embeds the row again since embedding_next is cleared
+            blobs, model_id = embed_for_table("memories", [content], conn)
+            emb, emb_q = encode_for_table(conn, "memories", blobs[0])
             updates.append("embedding = ?")
             params.append(emb)
+            updates.append("embedding_q = ?")
+            params.append(emb_q)
+            updates.append("embedding_model = ?")
+            params.append(model_id)
+            updates.append("embedding_dim = ?")
+            params.append(vector_dim(blobs[0]))
+            updates.append("embedding_next = NULL")
 
         if category is not None:
             updates.append("category = ?")
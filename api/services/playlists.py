@@ -1,8 +1,8 @@
 import json
 import os
 import re
-import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from core.config import (
@@ -12,14 +12,15 @@ from core.config import (
     TMDB_BASE_URL,
     TMDB_API_KEY,
 )
-from .tmdb_service import tmdb_lookup_movie
+from .cache.tmdb_cache import TMDbCache, get_tmdb_cache
+from .tmdb_service import TMDB_MAX_WORKERS, tmdb_lookup_movie
 
 
 # TMDb image base (HTTPS) — prevents mixed-content "about:blank#blocked"
 TMDB_IMAGE_BASE = "https://image.tmdb.org/t/p/"
 TMDB_POSTER_SIZE = "w342"
 
-# Optional on-disk cache (safe even if TMDB_CACHE is already persistent elsewhere)
+# Legacy on-disk cache, imported into the tmdb_cache table on first use
 TMDB_CACHE_FILE = os.path.join(PLAYLIST_DIR, "tmdb_cache.json")
 
 
@@ -98,90 +99,43 @@ def _safe_https(url: str | None) -> str | None:
 
 
 # ----------------------------
-# TMDb cache (supports dict or filepath in core.config)
+# TMDb cache (SQLite, see services/cache/tmdb_cache.py)
 # ----------------------------
 
-def _load_disk_cache_into_memory() -> None:
-    """
-    If TMDB_CACHE is a dict, we can optionally merge an on-disk cache file into it.
-    This is intentionally best-effort.
-    """
-    if not isinstance(TMDB_CACHE, dict):
-        return
-    try:
-        if not os.path.exists(TMDB_CACHE_FILE):
-            return
-        with open(TMDB_CACHE_FILE, "r", encoding="utf-8") as f:
-            disk = json.load(f) or {}
-        if isinstance(disk, dict):
-            # Don't overwrite existing keys in memory
-            for k, v in disk.items():
-                TMDB_CACHE.setdefault(k, v)
-    except Exception:
-        pass
+def _legacy_cache_files() -> list[str]:
+    """Old JSON caches to import once: our file, and TMDB_CACHE if it's a path."""
+    paths = [TMDB_CACHE_FILE]
+    if isinstance(TMDB_CACHE, str) and TMDB_CACHE.strip():
+        paths.append(TMDB_CACHE)
+    return paths
 
 
-def _persist_memory_cache_to_disk() -> None:
-    """
-    Best-effort persistence if TMDB_CACHE is in-memory dict.
-    """
-    if not isinstance(TMDB_CACHE, dict):
-        return
+def _cache() -> TMDbCache:
+    cache = get_tmdb_cache()
     try:
-        os.makedirs(PLAYLIST_DIR, exist_ok=True)
-        with open(TMDB_CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(TMDB_CACHE, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+        cache.import_legacy(_legacy_cache_files())
+    except Exception as e:
+        print("TMDb cache import failed ->", e)
+    return cache
 
 
-def _cache_get(key: str) -> dict | None:
+def _cache_get(key: str, include_expired: bool = False) -> dict | None:
     if not key:
         return None
-
-    # If TMDB_CACHE is a dict, use it.
-    if isinstance(TMDB_CACHE, dict):
-        _load_disk_cache_into_memory()
-        v = TMDB_CACHE.get(key)
-        return v.copy() if isinstance(v, dict) else None
-
-    # If TMDB_CACHE is a string path, treat it as a JSON file.
-    if isinstance(TMDB_CACHE, str) and TMDB_CACHE.strip():
-        try:
-            with open(TMDB_CACHE, "r", encoding="utf-8") as f:
-                data = json.load(f) or {}
-            v = data.get(key)
-            return v.copy() if isinstance(v, dict) else None
-        except Exception:
-            return None
-
-    return None
+    try:
+        return _cache().get(key, include_expired=include_expired)
+    except Exception as e:
+        print("TMDb cache read failed for", key, "->", e)
+        return None
 
 
 def _cache_set(key: str, value: dict) -> None:
     if not key or not isinstance(value, dict):
         return
-
-    # Dict cache
-    if isinstance(TMDB_CACHE, dict):
-        TMDB_CACHE[key] = value
-        _persist_memory_cache_to_disk()
-        return
-
-    # File cache
-    if isinstance(TMDB_CACHE, str) and TMDB_CACHE.strip():
-        try:
-            path = TMDB_CACHE
-            existing = {}
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    existing = json.load(f) or {}
-            existing[key] = value
-            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(existing, f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
+    try:
+        _cache().set(key, value)
+    except Exception as e:
+        print("TMDb cache write failed for", key, "->", e)
 
 
 # ----------------------------
@@ -390,6 +344,14 @@ def _enrich_movie_item(item: dict) -> dict:
         print("TMDb enrich failed for", imdb_id or query, "->", e)
         info = {}
 
+    # 3b) TMDb unavailable: an expired entry beats no metadata
+    if not info:
+        stale = _cache_get(imdb_id, include_expired=True) or _cache_get(query_key, include_expired=True)
+        if stale:
+            stale.setdefault("title", base.get("title"))
+            stale.setdefault("year", base.get("year"))
+            return _enriched_from_tmdb_info(base, stale)
+
     if info:
         # Always backfill title/year from base if missing
         info.setdefault("title", base.get("title"))
@@ -419,13 +381,20 @@ def _enrich_movie_item(item: dict) -> dict:
     }
 
 
-def enrich_playlist_items(items: list[dict]) -> list[dict]:
-    # tiny throttle to avoid bursts; search reliability is the bigger fix, but this helps too
-    out: list[dict] = []
-    for m in (items or []):
-        out.append(_enrich_movie_item(m))
-        time.sleep(0.10)
-    return out
+def enrich_playlist_items(items: list[dict], max_workers: int = TMDB_MAX_WORKERS) -> list[dict]:
+    """
+    Enrich items concurrently, preserving order.
+
+    Cache hits return immediately; misses share tmdb_service's session and
+    rate limiter, which does the throttling a fixed per-item sleep used to.
+    """
+    items = list(items or [])
+    if len(items) <= 1 or max_workers <= 1:
+        return [_enrich_movie_item(m) for m in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items)),
+                            thread_name_prefix="tmdb-enrich") as executor:
+        return list(executor.map(_enrich_movie_item, items))
 
 
 # ----------------------------
@@ -494,9 +463,7 @@ def add_movie_to_christmas_by_title(title: str) -> str:
     # Bust caches for this imdb id
     try:
         if imdb_id:
-            if isinstance(TMDB_CACHE, dict):
-                TMDB_CACHE.pop(imdb_id, None)
-                _persist_memory_cache_to_disk()
+            _cache().delete(imdb_id)
     except Exception:
         pass
 
@@ -635,9 +602,8 @@ def add_tmdb_candidate_to_christmas(candidate: dict) -> str:
     save_christmas_playlist(movies)
 
     try:
-        if isinstance(TMDB_CACHE, dict):
-            TMDB_CACHE.pop(imdb_id, None)
-            _persist_memory_cache_to_disk()
+        if imdb_id:
+            _cache().delete(imdb_id)
     except Exception:
         pass
 
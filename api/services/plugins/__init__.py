@@ -3,9 +3,20 @@ Plugin Services
 
 Phase 6.4: Plugin Framework Expansion
 
-Services for managing plugin configurations.
+Services for managing plugin configurations and bulk import runs.
 """
 
+from .bulk_import import (
+    BulkImportJob,
+    ImportRun,
+    create_import_run,
+    get_import_run,
+    get_run_items,
+    pause_import_run,
+    run_import,
+    start_import_run,
+)
+
 from .config_manager import (
     PluginConfigManager,
     get_project_plugin_config,
@@ -13,7 +24,15 @@ from .config_manager import (
 )
 
 __all__ = [
+    "BulkImportJob",
+    "ImportRun",
     "PluginConfigManager",
+    "create_import_run",
+    "get_import_run",
+    "get_run_items",
+    "pause_import_run",
+    "run_import",
+    "start_import_run",
     "get_project_plugin_config",
     "set_project_plugin_config",
 ]
@@ -0,0 +1,623 @@
+"""
+Bulk Import Runs
+
+Phase 6.4: Plugin Framework Expansion
+
+Imports the items selected from an importer plugin as one resumable run
+(migration 027). plugin.import_item() copies a file, opens a connection,
+INSERTs and commits, then extracts text inline, once per item; for a
+folder of thousands of PDFs that is one fsync and one single-threaded
+parse after another. For plugins that set supports_bulk_import, a run
+instead:
+
+  - copies each batch's files into the project upload directory with a
+    bounded thread pool
+  - extracts text in a process pool (when bulk_extract_text() asks for it),
+    starting on each file as soon as its copy lands
+  - writes the batch's project_files, file_text_cache and plugin_imports
+    rows, the items' done/failed status and the run counters in one
+    transaction
+
+Progress is on the run row after every batch. A run that was paused or
+interrupted resumes from its pending items; a batch whose transaction
+failed removes its copied files, so nothing is half-imported. Plugins
+without bulk support run through import_item() one item at a time, with
+the same tracking.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from plugins import ImporterPlugin, ImportItem
+from utils.db import get_db
+
+# Flask import (may not be available during testing)
+try:
+    from flask import current_app
+except ImportError:
+    current_app = None
+
+logger = logging.getLogger(__name__)
+
+# Items per transaction
+IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "100"))
+
+# Concurrent file copies
+COPY_WORKERS = int(os.getenv("BULK_IMPORT_COPY_WORKERS", "8"))
+
+# Text extraction processes (0 = extract in the copy threads, the default
+# on a single CPU where a pool only adds spawn and pickling cost)
+_CPUS = os.cpu_count() or 1
+EXTRACT_WORKERS = int(os.getenv("BULK_IMPORT_EXTRACT_WORKERS", str(min(4, _CPUS) if _CPUS > 1 else 0)))
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_PAUSED = "paused"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+ITEM_PENDING = "pending"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+
+
+@dataclass
+class ImportRun:
+    """One row of plugin_import_runs."""
+    id: int
+    project_id: int
+    user_id: Optional[int]
+    plugin_id: str
+    config: Dict[str, Any]
+    upload_root: str
+    status: str
+    total: int
+    succeeded: int
+    failed: int
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    completed_at: Optional[str] = None
+
+    @property
+    def processed(self) -> int:
+        return self.succeeded + self.failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(self.__dict__)
+        data.pop("upload_root")
+        data["processed"] = self.processed
+        data["progress"] = self.processed / self.total if self.total else 1.0
+        return data
+
+
+def default_upload_root() -> str:
+    """Upload root, resolved the same way as the importer plugins."""
+    if current_app:
+        return current_app.config.get("UPLOAD_ROOT") or os.path.join(current_app.root_path, "uploads")
+    return os.environ.get(
+        "TAMOR_UPLOAD_ROOT",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads"),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+
+def _row_to_run(row) -> ImportRun:
+    return ImportRun(
+        id=row["id"],
+        project_id=row["project_id"],
+        user_id=row["user_id"],
+        plugin_id=row["plugin_id"],
+        config=json.loads(row["config_json"]) if row["config_json"] else {},
+        upload_root=row["upload_root"],
+        status=row["status"],
+        total=row["total"],
+        succeeded=row["succeeded"],
+        failed=row["failed"],
+        error=row["error_message"],
+        created_at=row["created_at"],
+        started_at=row["started_at"],
+        updated_at=row["updated_at"],
+        completed_at=row["completed_at"],
+    )
+
+
+def create_import_run(
+    plugin: ImporterPlugin,
+    project_id: int,
+    user_id: Optional[int],
+    config: Dict[str, Any],
+    items: List[ImportItem],
+    upload_root: Optional[str] = None,
+) -> ImportRun:
+    """
+    Record a run and its items (nothing is imported yet).
+
+    The upload root is resolved now, while an app context may exist, so
+    background threads and later resumes write to the same place.
+    """
+    conn = get_db()
+    try:
+        cur = conn.execute(
+            """
+            INSERT INTO plugin_import_runs
+                (project_id, user_id, plugin_id, config_json, upload_root, total, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """,
+            (project_id, user_id, plugin.id, json.dumps(config or {}),
+             upload_root or default_upload_root(), len(items)),
+        )
+        run_id = cur.lastrowid
+        conn.executemany(
+            """
+            INSERT INTO plugin_import_run_items
+                (run_id, item_id, name, source_path, mime_type, size_bytes, item_metadata_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (run_id, item.id, item.name, item.path, item.mime_type, item.size_bytes,
+                 json.dumps(item.metadata) if item.metadata else None)
+                for item in items
+            ],
+        )
+        conn.commit()
+        return get_import_run(run_id, conn)
+    finally:
+        conn.close()
+
+
+def get_import_run(run_id: int, conn=None) -> Optional[ImportRun]:
+    """Current state of a run, or None."""
+    own = conn is None
+    conn = conn or get_db()
+    try:
+        row = conn.execute("SELECT * FROM plugin_import_runs WHERE id = ?", (run_id,)).fetchone()
+        return _row_to_run(row) if row else None
+    finally:
+        if own:
+            conn.close()
+
+
+def get_run_items(
+    run_id: int,
+    status: Optional[str] = None,
+    after_id: int = 0,
+    limit: int = 500,
+) -> List[Dict[str, Any]]:
+    """Per-item results of a run, in selection order (keyset-paginated by id)."""
+    sql = "SELECT * FROM plugin_import_run_items WHERE run_id = ? AND id > ?"
+    params: List[Any] = [run_id, after_id]
+    if status:
+        sql += " AND status = ?"
+        params.append(status)
+    sql += " ORDER BY id LIMIT ?"
+    params.append(limit)
+
+    conn = get_db()
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+    return [
+        {
+            "id": r["id"],
+            "item_id": r["item_id"],
+            "item_name": r["name"],
+            "source_path": r["source_path"],
+            "status": r["status"],
+            "success": r["status"] == ITEM_DONE,
+            "file_id": r["file_id"],
+            "error": r["error"],
+            "metadata": json.loads(r["result_json"]) if r["result_json"] else {},
+        }
+        for r in rows
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+
+def _copy_file(source_path: str, upload_root: str, project_id: int, name: str) -> Dict[str, Any]:
+    """Copy one file into the project's upload directory."""
+    stored_name_rel = os.path.join(str(project_id), f"{uuid.uuid4().hex}_{name}")
+    full_path = os.path.join(upload_root, stored_name_rel)
+    shutil.copy2(source_path, full_path)
+    try:
+        size_bytes = os.path.getsize(full_path)
+    except OSError:
+        size_bytes = None
+    return {"stored_name": stored_name_rel, "full_path": full_path, "size_bytes": size_bytes}
+
+
+def _init_extract_worker() -> None:
+    # The pool is the parallelism; don't fan out again per PDF
+    from services import file_parsing
+    file_parsing.PDF_EXTRACT_WORKERS = 1
+
+
+def _extract_text(full_path: str, mime_type: str, filename: str) -> Dict[str, Any]:
+    """Process-pool worker: extract_text_from_file() reduced to what gets stored."""
+    from services.file_parsing import extract_text_from_file
+
+    result = extract_text_from_file(full_path, mime_type, filename)
+    return {
+        "text": result.get("text", ""),
+        "meta": result.get("meta", {}) or {},
+        "parser": result.get("parser", ""),
+    }
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Job
+# ---------------------------------------------------------------------------
+
+
+class BulkImportJob:
+    """Processes a run's pending items, batch by batch."""
+
+    def __init__(
+        self,
+        run_id: int,
+        plugin: Optional[ImporterPlugin] = None,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        copy_workers: int = COPY_WORKERS,
+        extract_workers: int = EXTRACT_WORKERS,
+        stop: Optional[threading.Event] = None,
+        progress: Optional[Callable[[ImportRun], None]] = None,
+    ):
+        self.run_id = run_id
+        self.plugin = plugin
+        self.batch_size = max(1, batch_size)
+        self.copy_workers = max(1, copy_workers)
+        self.extract_workers = extract_workers
+        self.stop = stop or threading.Event()
+        self.progress = progress
+        self._extract_pool: Optional[ProcessPoolExecutor] = None
+
+    def _resolve_plugin(self, plugin_id: str) -> ImporterPlugin:
+        if self.plugin is not None:
+            return self.plugin
+        from plugins.registry import REGISTRY, load_all_plugins
+
+        plugin = REGISTRY.get(plugin_id)
+        if plugin is None:
+            load_all_plugins()
+            plugin = REGISTRY.get(plugin_id)
+        if plugin is None:
+            raise ValueError(f"Importer plugin not found: {plugin_id}")
+        return plugin
+
+    def _set_status(self, conn, status: str, error: Optional[str] = None) -> None:
+        conn.execute(
+            """
+            UPDATE plugin_import_runs
+            SET status = ?, error_message = ?, updated_at = CURRENT_TIMESTAMP,
+                started_at = COALESCE(started_at, CURRENT_TIMESTAMP),
+                completed_at = CASE WHEN ? = 'completed' THEN CURRENT_TIMESTAMP END
+            WHERE id = ?
+            """,
+            (status, error, status, self.run_id),
+        )
+        conn.commit()
+
+    def run(self) -> ImportRun:
+        """Import pending items until none are left or stop is set."""
+        conn = get_db()
+        copy_pool = ThreadPoolExecutor(max_workers=self.copy_workers, thread_name_prefix="bulk-import-copy")
+        try:
+            run = get_import_run(self.run_id, conn)
+            if run is None:
+                raise ValueError(f"Import run not found: {self.run_id}")
+            if run.status == STATUS_COMPLETED:
+                return run
+
+            self._set_status(conn, STATUS_RUNNING)
+            try:
+                plugin = self._resolve_plugin(run.plugin_id)
+                os.makedirs(os.path.join(run.upload_root, str(run.project_id)), exist_ok=True)
+
+                while not self.stop.is_set():
+                    rows = conn.execute(
+                        """
+                        SELECT * FROM plugin_import_run_items
+                        WHERE run_id = ? AND status = ?
+                        ORDER BY id LIMIT ?
+                        """,
+                        (self.run_id, ITEM_PENDING, self.batch_size),
+                    ).fetchall()
+                    if not rows:
+                        break
+
+                    if plugin.supports_bulk_import:
+                        self._import_batch(conn, run, plugin, rows, copy_pool)
+                    else:
+                        self._import_each(conn, run, plugin, rows)
+
+                    if self.progress:
+                        self.progress(get_import_run(self.run_id, conn))
+            except Exception as e:
+                logger.error(f"Import run {self.run_id} failed: {e}")
+                self._set_status(conn, STATUS_FAILED, str(e))
+                raise
+
+            pending = conn.execute(
+                "SELECT 1 FROM plugin_import_run_items WHERE run_id = ? AND status = ? LIMIT 1",
+                (self.run_id, ITEM_PENDING),
+            ).fetchone()
+            self._set_status(conn, STATUS_PAUSED if pending else STATUS_COMPLETED)
+            run = get_import_run(self.run_id, conn)
+            logger.info(
+                f"Import run {self.run_id} {run.status}: "
+                f"{run.succeeded} imported, {run.failed} failed of {run.total}"
+            )
+            return run
+        finally:
+            copy_pool.shutdown(wait=True)
+            if self._extract_pool is not None:
+                self._extract_pool.shutdown(wait=True)
+                self._extract_pool = None
+            conn.close()
+
+    # -- bulk path ----------------------------------------------------------
+
+    def _submit_extract(self, copy_pool: ThreadPoolExecutor, full_path: str, mime_type: str, name: str) -> Future:
+        if self.extract_workers <= 0:
+            return copy_pool.submit(_extract_text, full_path, mime_type, name)
+        if self._extract_pool is None:
+            # spawn: the API process is multi-threaded, so forking it is unsafe
+            self._extract_pool = ProcessPoolExecutor(
+                max_workers=self.extract_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_extract_worker,
+            )
+        return self._extract_pool.submit(_extract_text, full_path, mime_type, name)
+
+    def _import_batch(self, conn, run: ImportRun, plugin: ImporterPlugin, rows, copy_pool: ThreadPoolExecutor) -> None:
+        items = {r["id"]: _row_to_item(r) for r in rows}
+        copies: Dict[int, Dict[str, Any]] = {}
+        errors: Dict[int, str] = {}
+        extractions: Dict[int, Future] = {}
+
+        futures = {
+            copy_pool.submit(_copy_file, item.path, run.upload_root, run.project_id, item.name): row_id
+            for row_id, item in items.items()
+        }
+        for future in as_completed(futures):
+            row_id = futures[future]
+            item = items[row_id]
+            try:
+                copies[row_id] = future.result()
+            except Exception as e:
+                logger.error(f"Failed to import {item.name}: {e}")
+                errors[row_id] = str(e)
+                continue
+            if plugin.bulk_extract_text(item, run.config):
+                extractions[row_id] = self._submit_extract(
+                    copy_pool, copies[row_id]["full_path"], plugin.bulk_mime_type(item), item.name
+                )
+
+        texts: Dict[int, Dict[str, Any]] = {}
+        for row_id, future in extractions.items():
+            try:
+                texts[row_id] = future.result()
+            except Exception as e:
+                logger.warning(f"Failed to extract text from {items[row_id].name}: {e}")
+                texts[row_id] = {"error": str(e)}
+
+        try:
+            succeeded = failed = 0
+            for row in rows:
+                row_id = row["id"]
+                item = items[row_id]
+                if row_id in errors:
+                    conn.execute(
+                        "UPDATE plugin_import_run_items SET status = ?, error = ?, result_json = ? WHERE id = ?",
+                        (ITEM_FAILED, errors[row_id], json.dumps({"source_path": item.path}), row_id),
+                    )
+                    failed += 1
+                    continue
+
+                copied = copies[row_id]
+                file_id = conn.execute(
+                    """
+                    INSERT INTO project_files
+                    (project_id, user_id, filename, stored_name, mime_type, size_bytes)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (run.project_id, run.user_id, item.name, copied["stored_name"],
+                     plugin.bulk_mime_type(item), copied["size_bytes"]),
+                ).lastrowid
+
+                metadata: Dict[str, Any] = {
+                    "source_path": item.path,
+                    "stored_name": copied["stored_name"],
+                    "size_bytes": copied["size_bytes"],
+                }
+                if row_id in texts:
+                    metadata.update(self._store_text(conn, file_id, texts[row_id]))
+
+                conn.execute(
+                    """
+                    INSERT INTO plugin_imports
+                    (project_id, plugin_id, file_id, source_path, metadata_json)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (run.project_id, run.plugin_id, file_id, item.path, json.dumps(metadata)),
+                )
+                conn.execute(
+                    "UPDATE plugin_import_run_items SET status = ?, file_id = ?, result_json = ? WHERE id = ?",
+                    (ITEM_DONE, file_id, json.dumps(metadata), row_id),
+                )
+                succeeded += 1
+
+            self._add_counts(conn, succeeded, failed)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            for copied in copies.values():
+                _remove_quietly(copied["full_path"])
+            raise
+
+    def _store_text(self, conn, file_id: int, extracted: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache extracted text; returns the page_count / text_extraction metadata."""
+        if "error" in extracted:
+            return {"page_count": None, "text_extraction": {"extracted": False, "error": extracted["error"]}}
+
+        text, meta, parser = extracted["text"], extracted["meta"], extracted["parser"]
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO file_text_cache
+            (file_id, text, meta_json, parser)
+            VALUES (?, ?, ?, ?)
+            """,
+            (file_id, text, json.dumps(meta) if meta else None, parser),
+        )
+        page_count = meta.get("page_count")
+        return {
+            "page_count": page_count,
+            "text_extraction": {
+                "extracted": True,
+                "parser": parser,
+                "text_length": len(text),
+                "page_count": page_count,
+            },
+        }
+
+    def _add_counts(self, conn, succeeded: int, failed: int) -> None:
+        conn.execute(
+            """
+            UPDATE plugin_import_runs
+            SET succeeded = succeeded + ?, failed = failed + ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (succeeded, failed, self.run_id),
+        )
+
+    # -- per-item path ------------------------------------------------------
+
+    def _import_each(self, conn, run: ImportRun, plugin: ImporterPlugin, rows) -> None:
+        # import_item() commits on its own, so record each item straight after
+        for row in rows:
+            if self.stop.is_set():
+                return
+            item = _row_to_item(row)
+            result = plugin.import_item(item, run.project_id, run.user_id)
+            if result.success:
+                conn.execute(
+                    """
+                    INSERT INTO plugin_imports
+                    (project_id, plugin_id, file_id, source_path, metadata_json)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (run.project_id, run.plugin_id, result.file_id, item.path,
+                     json.dumps(result.metadata) if result.metadata else None),
+                )
+            conn.execute(
+                "UPDATE plugin_import_run_items SET status = ?, file_id = ?, error = ?, result_json = ? WHERE id = ?",
+                (ITEM_DONE if result.success else ITEM_FAILED, result.file_id, result.error,
+                 json.dumps(result.metadata or {}), row["id"]),
+            )
+            self._add_counts(conn, int(result.success), int(not result.success))
+            conn.commit()
+
+
+def _row_to_item(row) -> ImportItem:
+    return ImportItem(
+        id=row["item_id"],
+        name=row["name"],
+        path=row["source_path"],
+        mime_type=row["mime_type"],
+        size_bytes=row["size_bytes"],
+        metadata=json.loads(row["item_metadata_json"]) if row["item_metadata_json"] else {},
+    )
+
+
+# ---------------------------------------------------------------------------
+# Background threads
+# ---------------------------------------------------------------------------
+
+_threads: Dict[int, Tuple[threading.Thread, threading.Event]] = {}
+_threads_lock = threading.Lock()
+
+
+def run_import(run_id: int, **job_options: Any) -> ImportRun:
+    """Run (or resume) an import run in the calling thread."""
+    return BulkImportJob(run_id, **job_options).run()
+
+
+def start_import_run(run_id: int, **job_options: Any) -> ImportRun:
+    """Run (or resume) an import run on a daemon thread."""
+    run = get_import_run(run_id)
+    if run is None:
+        raise ValueError(f"Import run not found: {run_id}")
+
+    with _threads_lock:
+        running = _threads.get(run_id)
+        if (running and running[0].is_alive()) or run.status == STATUS_COMPLETED:
+            return run
+
+        stop = threading.Event()
+        job = BulkImportJob(run_id, stop=stop, **job_options)
+
+        def target():
+            try:
+                job.run()
+            except Exception:
+                pass  # Recorded as failed by the job
+
+        thread = threading.Thread(target=target, name=f"plugin-import-{run_id}", daemon=True)
+        _threads[run_id] = (thread, stop)
+        thread.start()
+    return run
+
+
+def pause_import_run(run_id: int, timeout: float = 30.0) -> bool:
+    """Stop a background run after its current batch."""
+    with _threads_lock:
+        running = _threads.pop(run_id, None)
+    if not running:
+        return False
+    thread, stop = running
+    stop.set()
+    thread.join(timeout)
+    return True
+
+
+def resume_import_runs() -> List[int]:
+    """Restart every unfinished run (e.g. after a restart)."""
+    conn = get_db()
+    try:
+        run_ids = [
+            r["id"] for r in conn.execute(
+                "SELECT id FROM plugin_import_runs WHERE status IN (?, ?, ?)",
+                (STATUS_PENDING, STATUS_RUNNING, STATUS_PAUSED),
+            )
+        ]
+    finally:
+        conn.close()
+    for run_id in run_ids:
+        start_import_run(run_id)
+    return run_ids
@@ -0,0 +1,309 @@
+"""
+Reader Chunk Index
+
+Precomputed TTS chunk boundaries for reader seeking.
+
+tts_service.chunk_text() walks the whole document, so running it on every
+position lookup made seeking O(document). The boundaries (character span,
+first sentence, estimated audio duration) are computed once per content
+item, chunking parameters and content hash, stored in reader_chunk_indexes /
+reader_chunk_boundaries (migration 021), kept in a small in-process LRU,
+and searched with bisect by character position or by playback time.
+
+Offsets are the ones chunk_text() returns: relative to text.strip().
+"""
+
+import bisect
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.tts_service import (
+    DEFAULT_CHUNK_SIZE,
+    chunk_boundaries,
+    estimate_duration,
+    join_sentences,
+)
+from utils.db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Decoded indexes kept in memory (a 2 MB book is ~2,000 chunks)
+INDEX_CACHE_ENTRIES = 32
+
+_cache: "OrderedDict[Tuple, ChunkIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ChunkIndex:
+    """Chunk boundaries for one text, as parallel lists."""
+    content_hash: str
+    chunk_size: int
+    respect_sentences: bool
+    starts: List[int]
+    ends: List[int]
+    span_starts: List[int]
+    span_ends: List[int]
+    sentence_indexes: List[Optional[int]]
+    est_seconds: List[float]
+    # Derived: playback start of each chunk at speed 1.0
+    start_seconds: List[float] = field(init=False, repr=False)
+    # Derived: starts ascending and chunks disjoint, so bisect is exact
+    _sorted: bool = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.start_seconds = []
+        elapsed = 0.0
+        for est in self.est_seconds:
+            self.start_seconds.append(elapsed)
+            elapsed += est
+        self._sorted = all(
+            self.starts[i] >= self.ends[i - 1] and self.starts[i] < self.ends[i]
+            for i in range(1, len(self.starts))
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def total_seconds(self) -> float:
+        return (self.start_seconds[-1] + self.est_seconds[-1]) if self.starts else 0.0
+
+    def find_by_char(self, char_position: int) -> Optional[int]:
+        """Index of the first chunk with start_char <= position < end_char."""
+        if self._sorted:
+            i = bisect.bisect_right(self.starts, char_position) - 1
+            if i >= 0 and char_position < self.ends[i]:
+                return i
+            return None
+
+        # chunk_text() keeps its running estimate when it cannot re-find a
+        # chunk in the source, so boundaries can overlap; match its order
+        for i, (start, end) in enumerate(zip(self.starts, self.ends)):
+            if start <= char_position < end:
+                return i
+        return None
+
+    def find_by_seconds(self, seconds: float, speed: float = 1.0) -> Optional[int]:
+        """Index of the chunk playing at `seconds` of estimated audio."""
+        if not self.starts or seconds < 0:
+            return None
+        at = seconds * (speed or 1.0)
+        if at >= self.total_seconds:
+            return None
+        return bisect.bisect_right(self.start_seconds, at) - 1
+
+    def chunk(self, i: int, text: str, speed: float = 1.0) -> Dict[str, Any]:
+        """
+        Chunk i as chunk_text() would return it, plus timing.
+
+        text is the reader text the index was built from.
+        """
+        # Spans are relative to text.strip(); offset by the leading
+        # whitespace rather than copying the whole text
+        lead = len(text) - len(text.lstrip())
+        span = text[lead + self.span_starts[i]:lead + self.span_ends[i]]
+        speed = speed or 1.0
+        return {
+            "index": i,
+            "start_char": self.starts[i],
+            "end_char": self.ends[i],
+            "text": join_sentences(span) if self.respect_sentences else span,
+            "sentence_index": self.sentence_indexes[i],
+            "est_seconds": round(self.est_seconds[i] / speed, 2),
+            "start_seconds": round(self.start_seconds[i] / speed, 2),
+        }
+
+
+def build_chunk_index(
+    text: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    respect_sentences: bool = True,
+    digest: Optional[str] = None,
+) -> ChunkIndex:
+    """Run the chunker once and keep only the boundaries."""
+    chunks = chunk_boundaries(text, chunk_size, respect_sentences)
+    return ChunkIndex(
+        content_hash=digest or content_hash(text),
+        chunk_size=chunk_size,
+        respect_sentences=respect_sentences,
+        starts=[c["start_char"] for c in chunks],
+        ends=[c["end_char"] for c in chunks],
+        span_starts=[c["span_start"] for c in chunks],
+        span_ends=[c["span_end"] for c in chunks],
+        sentence_indexes=[c["sentence_index"] for c in chunks],
+        est_seconds=[estimate_duration(len(c["text"])) for c in chunks],
+    )
+
+
+def get_chunk_index(
+    content_type: str,
+    content_id: int,
+    text: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    respect_sentences: bool = True,
+) -> ChunkIndex:
+    """
+    Chunk index for a reader content item, building it on first use or
+    when the text's hash no longer matches the stored one.
+    """
+    digest = content_hash(text)
+    key = (content_type, content_id, chunk_size, bool(respect_sentences), digest)
+
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+
+    index = _load_index(content_type, content_id, chunk_size, respect_sentences, digest)
+    if index is None:
+        index = build_chunk_index(text, chunk_size, respect_sentences, digest)
+        try:
+            _store_index(content_type, content_id, index)
+        except Exception as e:
+            # The in-memory index still serves this process
+            logger.warning(f"Failed to store chunk index for {content_type} {content_id}: {e}")
+
+    with _cache_lock:
+        _cache[key] = index
+        _cache.move_to_end(key)
+        while len(_cache) > INDEX_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return index
+
+
+def invalidate_chunk_index(content_type: str, content_id: int) -> int:
+    """Drop stored indexes for a content item. Returns indexes removed."""
+    with _cache_lock:
+        for key in [k for k in _cache if k[0] == content_type and k[1] == content_id]:
+            del _cache[key]
+
+    conn = get_db()
+    try:
+        ids = [
+            (row["id"],)
+            for row in conn.execute(
+                "SELECT id FROM reader_chunk_indexes WHERE content_type = ? AND content_id = ?",
+                (content_type, content_id),
+            )
+        ]
+        conn.executemany("DELETE FROM reader_chunk_boundaries WHERE index_id = ?", ids)
+        conn.executemany("DELETE FROM reader_chunk_indexes WHERE id = ?", ids)
+        conn.commit()
+        return len(ids)
+    finally:
+        conn.close()
+
+
+def _load_index(
+    content_type: str,
+    content_id: int,
+    chunk_size: int,
+    respect_sentences: bool,
+    digest: str,
+) -> Optional[ChunkIndex]:
+    conn = get_db()
+    try:
+        header = conn.execute(
+            """
+            SELECT id, chunk_count FROM reader_chunk_indexes
+            WHERE content_type = ? AND content_id = ?
+              AND chunk_size = ? AND respect_sentences = ? AND content_hash = ?
+            """,
+            (content_type, content_id, chunk_size, int(bool(respect_sentences)), digest),
+        ).fetchone()
+        if not header:
+            return None
+
+        rows = conn.execute(
+            """
+            SELECT start_char, end_char, span_start, span_end, sentence_index, est_seconds
+            FROM reader_chunk_boundaries
+            WHERE index_id = ?
+            ORDER BY chunk_index
+            """,
+            (header["id"],),
+        ).fetchall()
+    except Exception as e:
+        logger.warning(f"Failed to load chunk index for {content_type} {content_id}: {e}")
+        return None
+    finally:
+        conn.close()
+
+    if len(rows) != header["chunk_count"]:
+        return None
+
+    columns = list(zip(*rows)) if rows else [[]] * 6
+    return ChunkIndex(
+        content_hash=digest,
+        chunk_size=chunk_size,
+        respect_sentences=bool(respect_sentences),
+        starts=list(columns[0]),
+        ends=list(columns[1]),
+        span_starts=list(columns[2]),
+        span_ends=list(columns[3]),
+        sentence_indexes=list(columns[4]),
+        est_seconds=list(columns[5]),
+    )
+
+
+def _store_index(content_type: str, content_id: int, index: ChunkIndex) -> None:
+    """Replace the stored index for (content, chunking parameters)."""
+    conn = get_db()
+    try:
+        old = conn.execute(
+            """
+            SELECT id FROM reader_chunk_indexes
+            WHERE content_type = ? AND content_id = ?
+              AND chunk_size = ? AND respect_sentences = ?
+            """,
+            (content_type, content_id, index.chunk_size, int(index.respect_sentences)),
+        ).fetchone()
+        if old:
+            conn.execute("DELETE FROM reader_chunk_boundaries WHERE index_id = ?", (old["id"],))
+            conn.execute("DELETE FROM reader_chunk_indexes WHERE id = ?", (old["id"],))
+
+        cur = conn.execute(
+            """
+            INSERT INTO reader_chunk_indexes (
+                content_type, content_id, chunk_size, respect_sentences,
+                content_hash, chunk_count
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                content_type,
+                content_id,
+                index.chunk_size,
+                int(index.respect_sentences),
+                index.content_hash,
+                len(index),
+            ),
+        )
+        index_id = cur.lastrowid
+        conn.executemany(
+            """
+            INSERT INTO reader_chunk_boundaries (
+                index_id, chunk_index, start_char, end_char,
+                span_start, span_end, sentence_index, est_seconds
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (index_id, i, *row)
+                for i, row in enumerate(zip(
+                    index.starts, index.ends, index.span_starts, index.span_ends,
+                    index.sentence_indexes, index.est_seconds,
+                ))
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
@@ -645,12 +645,11 @@ def generate_audio_for_session(
     Returns:
         Dict with chunks, audio info, or error
     """
+    from services.reader_chunk_index import get_chunk_index
     from services.tts_service import (
-        chunk_text,
         synthesize_chunk,
         get_piper_status,
         DEFAULT_VOICE,
-        DEFAULT_CHUNK_SIZE,
     )
 
     # Check TTS status
@@ -674,15 +673,17 @@ def generate_audio_for_session(
     voice = session.tts_voice or DEFAULT_VOICE
     speed = session.tts_speed or 1.0
 
-    # Chunk the text
-    chunks = chunk_text(content.text, DEFAULT_CHUNK_SIZE, respect_sentences=True)
+    # Chunk boundaries (computed once per content version)
+    index = get_chunk_index(session.content_type, session.content_id, content.text)
 
-    if not chunks:
+    if not len(index):
         return {"error": "No text to synthesize"}
 
     # Get requested chunk range
-    end_chunk = min(start_chunk + num_chunks, len(chunks))
-    requested_chunks = chunks[start_chunk:end_chunk]
+    end_chunk = min(start_chunk + num_chunks, len(index))
+    requested_chunks = [
+        index.chunk(i, content.text) for i in range(max(0, start_chunk), end_chunk)
+    ]
 
     if not requested_chunks:
         return {"error": f"No chunks in range {start_chunk}-{end_chunk}"}
@@ -717,7 +718,7 @@ def generate_audio_for_session(
         "session_id": session_id,
         "voice": voice,
         "speed": speed,
-        "total_chunks": len(chunks),
+        "total_chunks": len(index),
         "generated_chunks": results,
         "start_chunk": start_chunk,
         "end_chunk": end_chunk,
@@ -794,7 +795,39 @@ def get_chunk_for_position(
     Returns:
         Dict with chunk info including cached audio if available
     """
-    from services.tts_service import chunk_text, DEFAULT_CHUNK_SIZE
+    return _find_chunk(session_id, user_id, char_position=char_position)
+
+
+def get_chunk_for_time(
+    session_id: int,
+    user_id: int,
+    seconds: float,
+) -> Optional[Dict[str, Any]]:
+    """
+    Find which chunk is playing at an elapsed audio position.
+
+    Uses estimated chunk durations at the session's TTS speed, so it can
+    seek into audio that has not been synthesized yet.
+
+    Args:
+        session_id: Session ID
+        user_id: User ID
+        seconds: Elapsed playback time
+
+    Returns:
+        Dict with chunk info including cached audio if available
+    """
+    return _find_chunk(session_id, user_id, seconds=seconds)
+
+
+def _find_chunk(
+    session_id: int,
+    user_id: int,
+    char_position: int = None,
+    seconds: float = None,
+) -> Optional[Dict[str, Any]]:
+    """Chunk lookup through the precomputed boundary index."""
+    from services.reader_chunk_index import get_chunk_index
 
     session = get_session(session_id, user_id)
     if not session:
@@ -806,28 +839,29 @@ def get_chunk_for_position(
     if not content:
         return None
 
-    # Generate chunks
-    chunks = chunk_text(content.text, DEFAULT_CHUNK_SIZE, respect_sentences=True)
+    index = get_chunk_index(session.content_type, session.content_id, content.text)
+    speed = session.tts_speed or 1.0
 
-    # Find the chunk containing this position
-    for chunk in chunks:
-        if chunk["start_char"] <= char_position < chunk["end_char"]:
-            # Check for cached audio
-            cached_audio = _get_cached_audio_for_chunk(
-                session, chunk["index"],
-                session.tts_voice, session.tts_speed
-            )
+    if char_position is not None:
+        i = index.find_by_char(char_position)
+    else:
+        i = index.find_by_seconds(seconds, speed)
+    if i is None:
+        return None
 
-            return {
-                "index": chunk["index"],
-                "start_char": chunk["start_char"],
-                "end_char": chunk["end_char"],
-                "text": chunk["text"],
-                "has_audio": cached_audio is not None,
-                "audio": cached_audio,
-            }
+    chunk = index.chunk(i, content.text, speed)
 
-    return None
+    # Check for cached audio
+    cached_audio = _get_cached_audio_for_chunk(
+        session, chunk["index"],
+        session.tts_voice, session.tts_speed
+    )
+
+    return {
+        **chunk,
+        "has_audio": cached_audio is not None,
+        "audio": cached_audio,
+    }
 
 
 def _get_cached_audio_for_chunk(
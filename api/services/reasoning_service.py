@@ -285,13 +285,14 @@ def analyze_file_relationships(
         client = get_llm_client()
         model = get_model_name()
 
-        response = client.chat_completion(
+        response = client.cached_chat_completion(
             messages=[
                 {"role": "system", "content": RELATIONSHIPS_PROMPT},
                 {"role": "user", "content": f"Analyze relationships between these files:\n\n{context}"},
             ],
             model=model,
             temperature=0.3,
+            cache_refresh=force,
         )
 
         result = _parse_llm_json(response)
@@ -360,13 +361,14 @@ def detect_cross_file_contradictions(
         client = get_llm_client()
         model = get_model_name()
 
-        response = client.chat_completion(
+        response = client.cached_chat_completion(
             messages=[
                 {"role": "system", "content": CONTRADICTIONS_PROMPT},
                 {"role": "user", "content": f"Find contradictions BETWEEN these files:\n\n{context}"},
             ],
             model=model,
             temperature=0.3,
+            cache_refresh=force,
         )
 
         result = _parse_llm_json(response)
@@ -443,13 +445,14 @@ def analyze_logic_flow(
         client = get_llm_client()
         model = get_model_name()
 
-        response = client.chat_completion(
+        response = client.cached_chat_completion(
             messages=[
                 {"role": "system", "content": LOGIC_FLOW_PROMPT},
                 {"role": "user", "content": f"Analyze the logical coherence of this document set:\n\n{context}"},
             ],
             model=model,
             temperature=0.3,
+            cache_refresh=force,
         )
 
         result = _parse_llm_json(response)
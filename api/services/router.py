@@ -1041,7 +1041,12 @@ Example: ["general"]
 JSON array:"""
 
             # Use phi3:mini for faster classification
-            response = client.generate(prompt, model=CLASSIFICATION_MODEL, temperature=0.1)
+            # The persistent LLM cache survives restarts; the in-memory LRU
+            # above only covers this process.
+            if use_cache:
+                response = client.cached_generate(prompt, model=CLASSIFICATION_MODEL, temperature=0.1)
+            else:
+                response = client.generate(prompt, model=CLASSIFICATION_MODEL, temperature=0.1)
 
             # Parse JSON from response
             response = response.strip()
@@ -1160,7 +1165,7 @@ JSON array:"""
         self, ctx: RequestContext, intents: List[str]
     ) -> RequestContext:
         """
-        Run semantic retrieval to populate ctx.retrieved_chunks.
+        Run hybrid (keyword + semantic) retrieval to populate ctx.retrieved_chunks.
 
         For research/write intents, ensures coverage across all project files
         by retrieving more chunks and diversifying by file.
@@ -1197,6 +1202,7 @@ JSON array:"""
                     query=ctx.user_message,
                     top_k=top_k,
                     include_answer=False,
+                    mode="hybrid",
                 )
 
                 project_chunks = result.get("results", [])
@@ -1223,6 +1229,7 @@ JSON array:"""
                     project_id=ctx.project_id,
                     limit=10,
                     min_score=0.3,
+                    mode="hybrid",
                 )
 
                 # Convert SearchResult to dict format matching project chunks
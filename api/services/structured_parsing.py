@@ -15,6 +15,8 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional, Tuple
 import os
 
+from services.file_parsing import extract_pdf
+
 
 def extract_pdf_structure(file_path: str) -> Dict[str, Any]:
     """
@@ -22,20 +24,22 @@ def extract_pdf_structure(file_path: str) -> Dict[str, Any]:
     {
       "type": "pdf",
       "pages": [
-        {"index": 1, "heading": "Intro", "char_count": 1234},
-        {"index": 2, "heading": "Installation", "char_count": 2048},
+        {"index": 1, "heading": "Intro", "char_count": 1234, "offset": 0},
+        {"index": 2, "heading": "Installation", "char_count": 2048, "offset": 1190},
       ]
     }
 
     Implementation details:
-    - Use pypdf if available.
+    - Use pypdf if available, via file_parsing.extract_pdf(), so the pages
+      come from the same (cached) pass that produced the text.
     - For each page, record:
       - index (1-based)
       - char_count
       - a naive heading: first non-empty line, truncated to 120 chars.
+      - offset: where the page starts in the cleaned text
     """
     try:
-        from pypdf import PdfReader  # type: ignore
+        import pypdf  # type: ignore  # noqa: F401
     except Exception:
         # No PDF parser installed → we can still say "it's a PDF"
         return {
@@ -43,31 +47,8 @@ def extract_pdf_structure(file_path: str) -> Dict[str, Any]:
             "pages": [],
         }
 
-    pages: List[Dict[str, Any]] = []
     try:
-        with open(file_path, "rb") as f:
-            reader = PdfReader(f)
-            for idx, page in enumerate(reader.pages, start=1):
-                try:
-                    text = page.extract_text() or ""
-                except Exception:
-                    text = ""
-
-                char_count = len(text)
-                heading = ""
-
-                if text:
-                    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-                    if lines:
-                        heading = lines[0][:120]
-
-                pages.append(
-                    {
-                        "index": idx,
-                        "heading": heading,
-                        "char_count": char_count,
-                    }
-                )
+        structure = extract_pdf(file_path)["structure"]
     except Exception:
         # If reading fails entirely, just return an empty structure
         return {
@@ -77,7 +58,7 @@ def extract_pdf_structure(file_path: str) -> Dict[str, Any]:
 
     return {
         "type": "pdf",
-        "pages": pages,
+        "pages": [dict(page) for page in structure["pages"]],
     }
 
 
@@ -1,20 +1,32 @@
 # services/tmdb_service.py
+import os
 import time
 import random
 import re
+import threading
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 
 from core.config import TMDB_API_KEY, TMDB_BASE_URL, TMDB_IMAGE_BASE
 
 
+# Concurrent lookups (playlist enrichment) share this session; urllib3's
+# pool is thread-safe, sized so every worker keeps its connection alive
+TMDB_MAX_WORKERS = int(os.getenv("TMDB_MAX_WORKERS", "6"))
+
 _SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=TMDB_MAX_WORKERS))
 
 # Conservative defaults to prevent burst failures
 _MAX_RETRIES = 6
 _BASE_BACKOFF = 0.6  # seconds
 _TIMEOUT = 8         # seconds
 
+# Request rate across all threads (TMDb allows ~50/s; stay well under)
+TMDB_REQUESTS_PER_SECOND = float(os.getenv("TMDB_REQUESTS_PER_SECOND", "20"))
+_RATE_BURST = 5
+
 # Match trailing year patterns:
 #   "Title 1946"
 #   "Title (1946)"
@@ -27,6 +39,49 @@ def _sleep_with_jitter(seconds: float) -> None:
     time.sleep(seconds + random.uniform(0, 0.25))
 
 
+class _RateLimiter:
+    """
+    Token bucket shared by every thread making TMDb requests.
+
+    A 429 pauses the whole bucket for Retry-After, so concurrent workers
+    back off together instead of each hitting the limit in turn.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+_LIMITER = _RateLimiter(TMDB_REQUESTS_PER_SECOND, _RATE_BURST)
+
+
 def _request_with_retry(url: str, *, params: dict) -> Response:
     """
     Retries on:
@@ -39,6 +94,7 @@ def _request_with_retry(url: str, *, params: dict) -> Response:
 
     for attempt in range(_MAX_RETRIES):
         try:
+            _LIMITER.acquire()
             resp = _SESSION.get(url, params=params, timeout=_TIMEOUT)
 
             # Handle rate limit
@@ -52,6 +108,7 @@ def _request_with_retry(url: str, *, params: dict) -> Response:
                 else:
                     wait = _BASE_BACKOFF * (2 ** attempt)
 
+                _LIMITER.pause(min(wait, 15))
                 _sleep_with_jitter(min(wait, 15))
                 continue
 
@@ -88,6 +88,18 @@ def get_voice_path(voice_name: str = None) -> Optional[Path]:
     return None
 
 
+# Sentence-ending punctuation followed by whitespace
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Rough Piper speaking rate at speed 1.0, for durations before synthesis
+CHARS_PER_SECOND = 15.0
+
+
+def estimate_duration(char_count: int, speed: float = 1.0) -> float:
+    """Estimated audio seconds for char_count characters."""
+    return char_count / CHARS_PER_SECOND / (speed or 1.0)
+
+
 def chunk_text(
     text: str,
     chunk_size: int = DEFAULT_CHUNK_SIZE,
@@ -104,6 +116,28 @@ def chunk_text(
     Returns:
         List of dicts with: text, start_char, end_char, index
     """
+    chunks = chunk_boundaries(text, chunk_size, respect_sentences)
+    for chunk in chunks:
+        del chunk["sentence_index"], chunk["span_start"], chunk["span_end"]
+    return chunks
+
+
+def chunk_boundaries(
+    text: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    respect_sentences: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    chunk_text() plus where each chunk came from.
+
+    Adds to each chunk:
+        sentence_index: index of its first (non-empty) sentence, or None
+            for character chunking
+        span_start, span_end: the slice of text.strip() the chunk was
+            built from. chunk text is the sentences in that slice joined
+            by single spaces, which is not always text[start_char:end_char]
+            (see the position recalculation below).
+    """
     if not text or not text.strip():
         return []
 
@@ -111,18 +145,20 @@ def chunk_text(
     chunks = []
 
     if respect_sentences:
-        # Split into sentences first
-        # Match sentence-ending punctuation followed by space or end
-        sentence_pattern = r'(?<=[.!?])\s+'
-        sentences = re.split(sentence_pattern, text)
-
+        # Walk sentences (SENTENCE_SPLIT_RE pieces) with their positions
         current_chunk = ""
         chunk_start = 0
+        first_sentence = 0
+        span_start = span_end = 0
+        sentence_count = 0
 
-        for sentence in sentences:
-            sentence = sentence.strip()
+        for raw_start, raw_end in _sentence_spans(text):
+            raw = text[raw_start:raw_end]
+            sentence = raw.strip()
             if not sentence:
                 continue
+            sent_start = raw_start + len(raw) - len(raw.lstrip())
+            sent_end = sent_start + len(sentence)
 
             # Would adding this sentence exceed chunk size?
             test_chunk = f"{current_chunk} {sentence}".strip() if current_chunk else sentence
@@ -134,12 +170,23 @@ def chunk_text(
                     "start_char": chunk_start,
                     "end_char": chunk_start + len(current_chunk),
                     "index": len(chunks),
+                    "sentence_index": first_sentence,
+                    "span_start": span_start,
+                    "span_end": span_end,
                 })
                 current_chunk = sentence
                 chunk_start = chunk_start + len(chunks[-1]["text"]) + 1
+                first_sentence = sentence_count
+                span_start = sent_start
             else:
+                if not current_chunk:
+                    first_sentence = sentence_count
+                    span_start = sent_start
                 current_chunk = test_chunk
 
+            span_end = sent_end
+            sentence_count += 1
+
         # Don't forget the last chunk
         if current_chunk:
             chunks.append({
@@ -147,6 +194,9 @@ def chunk_text(
                 "start_char": chunk_start,
                 "end_char": chunk_start + len(current_chunk),
                 "index": len(chunks),
+                "sentence_index": first_sentence,
+                "span_start": span_start,
+                "span_end": span_end,
             })
     else:
         # Simple character-based chunking
@@ -157,6 +207,9 @@ def chunk_text(
                 "start_char": i,
                 "end_char": i + len(chunk_text),
                 "index": len(chunks),
+                "sentence_index": None,
+                "span_start": i,
+                "span_end": i + len(chunk_text),
             })
 
     # Recalculate positions based on original text
@@ -172,6 +225,22 @@ def chunk_text(
     return chunks
 
 
+def _sentence_spans(text: str):
+    """(start, end) of each re.split(SENTENCE_SPLIT_RE, text) piece."""
+    pos = 0
+    for match in SENTENCE_SPLIT_RE.finditer(text):
+        yield pos, match.start()
+        pos = match.end()
+    yield pos, len(text)
+
+
+def join_sentences(text: str) -> str:
+    """Chunk text for a span_start:span_end slice (sentences joined by spaces)."""
+    return " ".join(
+        s.strip() for s in SENTENCE_SPLIT_RE.split(text) if s.strip()
+    )
+
+
 def get_cache_key(text: str, voice: str, speed: float) -> str:
     """
     Generate cache key for audio.
@@ -0,0 +1,117 @@
+# api/tests/test_benchmark_suite.py
+"""
+Tests for the benchmark suite's building blocks (benchmarks/).
+
+Checks that bulk-generated library vectors match what the fake embedder
+returns for the same text, that generation is deterministic, and that
+measure() / compare() report percentiles and regressions correctly. The
+full suite is not run here: it replaces the embedding model process-wide.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from benchmarks import harness, synthetic
+from benchmarks.fakes import FakeEmbedder
+
+
+def test_synthetic_vectors():
+    """Test bulk vectors equal FakeEmbedder.encode of the generated text."""
+    print("\n=== Testing synthetic corpus ===")
+    embedder = FakeEmbedder(dim=32)
+    tokens = embedder.token_matrix(synthetic.VOCABULARY)
+
+    rng = np.random.default_rng(0)
+    _, idx = synthetic._word_indices(rng, 50, synthetic.WORDS_PER_CHUNK)
+    texts = synthetic._texts(idx)
+    assert np.allclose(synthetic._vectors(idx, tokens), embedder.encode(texts), atol=1e-5)
+    print("✓ bulk vectors match the embedder")
+
+    _, again = synthetic._word_indices(np.random.default_rng(0), 50, synthetic.WORDS_PER_CHUNK)
+    assert np.array_equal(idx, again)
+    assert synthetic.queries(5) == synthetic.queries(5)
+
+    # A topical query is closest to chunks of its own topic
+    topics, idx = synthetic._word_indices(np.random.default_rng(1), 200, synthetic.WORDS_PER_CHUNK)
+    vecs = synthetic._vectors(idx, tokens)
+    query = embedder.encode(synthetic.queries(1))[0]
+    best = np.argsort(vecs @ query)[-10:]
+    assert np.mean(topics[best] == 0) >= 0.8
+    print("✓ deterministic, and queries retrieve their topic")
+
+    scale = synthetic.Scale.for_size(1_000_000)
+    assert (scale.chunks, scale.memories, scale.ingest_files) == (1_000_000, 50_000, 200)
+
+
+def test_measure():
+    """Test percentiles, untimed setup and the allocation high-water mark."""
+    print("\n=== Testing measure ===")
+    calls = []
+
+    def run(i):
+        calls.append(i)
+        time.sleep(0.002)
+        return bytearray(1_000_000)
+
+    result = harness.measure("sleep", 10, run, iterations=10, warmup=2,
+                             before=lambda i: time.sleep(0.01))
+    assert calls == list(range(13))  # warmup + timed + traced
+    assert 2.0 <= result.p50_ms < 9.0  # before() not counted
+    assert result.p50_ms <= result.p95_ms <= result.p99_ms <= result.max_ms
+    assert result.peak_alloc_bytes >= 1_000_000
+    assert result.key == "sleep@10"
+    print(f"✓ p50 {result.p50_ms:.2f} ms, peak {harness.format_bytes(result.peak_alloc_bytes)}")
+
+
+def test_compare():
+    """Test regression / improvement detection against a baseline."""
+    print("\n=== Testing compare ===")
+
+    def result(case, p50, p95, peak):
+        return harness.CaseResult(case, 1000, 10, p50, p95, p95, p50, p95, peak, 0)
+
+    baseline = {
+        "search@1000": {"p50_ms": 100.0, "p95_ms": 120.0, "peak_alloc_bytes": 1000},
+        "tiny@1000": {"p50_ms": 0.2, "p95_ms": 0.3, "peak_alloc_bytes": 1000},
+    }
+    current = [
+        result("search", 115.0, 100.0, 1050),   # p50 +15%, p95 -17%, memory +5%
+        result("tiny", 0.4, 0.6, 1000),         # doubled, but under MIN_DELTA_MS
+        result("ingest", 50.0, 60.0, 1000),     # not in baseline
+    ]
+    rows = harness.compare(current, baseline, threshold=0.10)
+    status = {(r["key"], r["metric"]): r["status"] for r in rows}
+
+    assert status[("search@1000", "p50_ms")] == "regression"
+    assert status[("search@1000", "p95_ms")] == "improved"
+    assert status[("search@1000", "peak_alloc_bytes")] == "ok"
+    assert status[("tiny@1000", "p50_ms")] == "ok"
+    assert status[("ingest@1000", "p50_ms")] == "new"
+    assert harness.compare(current, baseline, threshold=0.20)[0]["status"] == "ok"
+    print("✓ regressions, improvements, noise floor and new cases")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Benchmark Suite Test Suite")
+    print("=" * 60)
+
+    test_synthetic_vectors()
+    test_measure()
+    test_compare()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -308,7 +308,7 @@ def test_tool_definitions():
 
     expected_tools = {
         "read_file", "write_file", "patch_file", "list_directory",
-        "run_command", "git_status", "git_diff", "git_commit"
+        "search_code", "run_command", "git_status", "git_diff", "git_commit"
     }
 
     actual_tools = {t.name for t in TOOL_DEFINITIONS}
@@ -337,7 +337,7 @@ def test_build_tool_dispatch():
         # Check all tools are present
         expected = {
             "read_file", "write_file", "patch_file", "list_directory",
-            "run_command", "git_status", "git_diff", "git_commit"
+            "search_code", "run_command", "git_status", "git_diff", "git_commit"
         }
         assert set(dispatch.keys()) == expected
         print("✓ All tools present in dispatch map")
@@ -0,0 +1,226 @@
+# api/tests/test_embedding_migration.py
+"""
+Tests for services/embedding_migration.py - online embedding model switch.
+
+Uses two tiny hashing "models" of different dimension in place of
+sentence-transformers, and a temporary database built from the real
+migrations. Covers resumable copy, the sweep of rows written mid-run,
+reads staying on the old model until the atomic cutover, finalize (with
+re-quantization) and throttling.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+
+import numpy as np
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from db_fixture import MigratedDB
+from services import embedding_migration as em
+from services.embedding_quant import cosine_scores, quantize_table
+from utils import db
+
+OLD, NEW = "test/old-model", "test/new-model"
+
+
+class HashingModel:
+    """Deterministic bag-of-words embedding; a stand-in for SentenceTransformer."""
+
+    def __init__(self, dim, salt):
+        self.dim = dim
+        self.salt = salt
+
+    def encode(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                h = hashlib.md5(f"{self.salt}:{word}".encode()).digest()
+                out[i, h[0] % self.dim] += 1.0 if h[1] & 1 else -1.0
+        return out
+
+
+WORDS = "covenant torah sabbath feast temple prophet psalm scroll law grace".split()
+
+
+def seed_chunks():
+    """50 library chunks embedded with the old model."""
+    conn = db.get_db()
+    rng = np.random.default_rng(0)
+    texts = [" ".join(rng.choice(WORDS, 6)) for _ in range(50)]
+    blobs = em.encode(OLD, texts)
+    conn.execute("INSERT INTO library_files (id, filename, stored_path) VALUES (1, 'a.txt', '/a.txt')")
+    conn.executemany(
+        "INSERT INTO library_chunks (library_file_id, chunk_index, content, embedding) VALUES (1, ?, ?, ?)",
+        [(i, t, b) for i, (t, b) in enumerate(zip(texts, blobs))],
+    )
+    conn.commit()
+    return conn
+
+
+def search(conn, text):
+    """What LibrarySearchService does: active model query, active columns."""
+    q = em.embed_query("library_chunks", text, conn)
+    rows = conn.execute(
+        f"SELECT id, {em.vector_columns(conn, 'library_chunks')} FROM library_chunks ORDER BY id"
+    ).fetchall()
+    return q, cosine_scores(q, [r[1] for r in rows], [r[2] for r in rows])
+
+
+def no_sleep():
+    return em.Throttle(duty_cycle=1.0, load_fn=lambda: 0.0)
+
+
+def test_migration_lifecycle():
+    """Test copy, pause/resume, sweep, cutover and finalize."""
+    print("\n=== Testing migration lifecycle ===")
+    saved = em.default_model_id
+    em.register_encoder(OLD, HashingModel(8, "old"))
+    em.register_encoder(NEW, HashingModel(16, "new"))
+    em.default_model_id = lambda: OLD
+
+    with MigratedDB():
+        conn = seed_chunks()
+        try:
+            state = em.create_migration(conn, "library_chunks", NEW, auto_cutover=False)
+            assert (state.source_model, state.total, state.status) == (OLD, 50, "pending")
+
+            # Stop after two batches of 10
+            stop = threading.Event()
+            batches = []
+
+            def progress(s):
+                batches.append(s.last_id)
+                if len(batches) == 2:
+                    stop.set()
+
+            job = em.EmbeddingMigrationJob("library_chunks", batch_size=10, throttle=no_sleep(),
+                                           stop=stop, progress=progress)
+            state = job.run()
+            assert state.status == "paused" and state.last_id == 20 and state.processed == 20
+            q, scores = search(conn, "torah feast")
+            assert q.shape == (8,) and not np.isnan(scores).any()
+            print("✓ paused at last_id=20; search still on the old model")
+
+            # Writes while paused: a new row and an edited row (writer clears next)
+            blob = em.encode(OLD, ["sabbath scroll"])[0]
+            conn.execute(
+                "INSERT INTO library_chunks (library_file_id, chunk_index, content, embedding, embedding_model) "
+                "VALUES (1, 50, 'sabbath scroll', ?, ?)",
+                (blob, OLD),
+            )
+            conn.execute("UPDATE library_chunks SET content = 'grace law', embedding_next = NULL WHERE id = 5")
+            conn.commit()
+
+            assert not em.cutover(conn, "library_chunks")
+            print("✓ cutover refused while rows lack new vectors")
+
+            state = em.EmbeddingMigrationJob("library_chunks", batch_size=10, throttle=no_sleep()).run()
+            assert state.status == "ready" and not state.cutover
+            missing = conn.execute(
+                "SELECT COUNT(*) FROM library_chunks WHERE embedding_next IS NULL"
+            ).fetchone()[0]
+            assert missing == 0
+            row5 = conn.execute("SELECT embedding_next FROM library_chunks WHERE id = 5").fetchone()[0]
+            assert row5 == em.encode(NEW, ["grace law"])[0]
+            assert em.active_model(conn, "library_chunks") == OLD
+            print("✓ resumed, swept new/edited rows, waiting for manual cutover")
+
+            # Quantize before finalize: old-model codes must be replaced
+            quantize_table(conn, "library_chunks", "int8")
+
+            assert em.cutover(conn, "library_chunks")
+            assert em.active_model(conn, "library_chunks") == NEW
+            q, scores = search(conn, "torah feast")
+            assert q.shape == (16,) and not np.isnan(scores).any()
+            print("✓ cutover: queries and stored vectors both switch to the new model")
+
+            state = em.EmbeddingMigrationJob("library_chunks", batch_size=10, throttle=no_sleep()).run()
+            assert state.status == "done" and state.target_dim == 16
+            rows = conn.execute(
+                "SELECT embedding_model, embedding_dim, LENGTH(embedding), LENGTH(embedding_q), embedding_next "
+                "FROM library_chunks"
+            ).fetchall()
+            assert len(rows) == 51
+            assert {tuple(r) for r in rows} == {(NEW, 16, 64, 1 + 4 + 16, None)}
+            q, final = search(conn, "torah feast")
+            assert np.allclose(final, scores, atol=0.02)
+            print("✓ finalize folded 51 vectors into embedding, re-quantized, stamped model")
+
+            assert em.vector_columns(conn, "library_chunks").startswith("embedding AS")
+            try:
+                em.create_migration(conn, "library_chunks", NEW)
+                assert False, "expected ValueError"
+            except ValueError:
+                pass
+        finally:
+            conn.close()
+            em.default_model_id = saved
+
+
+def test_background_thread():
+    """Test start_migration runs to completion on its own thread."""
+    print("\n=== Testing background job ===")
+    saved = em.default_model_id
+    em.register_encoder(OLD, HashingModel(8, "old"))
+    em.register_encoder(NEW, HashingModel(16, "new"))
+    em.default_model_id = lambda: OLD
+
+    with MigratedDB():
+        conn = seed_chunks()
+        try:
+            em.start_migration("library_chunks", NEW, batch_size=16)
+            thread, _stop = em._threads["library_chunks"]
+            thread.join(30)
+            state = em.get_state(conn, "library_chunks")
+            assert state.status == "done" and state.cutover
+            status = em.migration_status()
+            assert status["library_chunks"]["active_model"] == NEW
+            assert status["memories"]["migration"] is None
+            print("✓ auto cutover and finalize on a daemon thread")
+        finally:
+            em._threads.clear()
+            conn.close()
+            em.default_model_id = saved
+
+
+def test_throttle():
+    """Test duty cycle and load backoff."""
+    print("\n=== Testing throttle ===")
+    load = [0.1]
+    throttle = em.Throttle(duty_cycle=0.25, max_load=0.8, load_fn=lambda: load[0])
+    assert abs(throttle.delay(1.0) - 3.0) < 1e-9
+
+    load[0] = 2.0
+    assert throttle.delay(0.01) == 1.0
+    assert throttle.delay(0.01) == 2.0
+    assert throttle.delay(0.01) == 4.0
+    load[0] = 0.1
+    assert abs(throttle.delay(0.01) - 0.03) < 1e-9
+    print("✓ 25% duty cycle sleeps 3x batch time, doubles backoff under load")
+
+    assert em.same_model("BAAI/bge-m3", "bge-m3")
+    assert not em.same_model("all-MiniLM-L6-v2", "BAAI/bge-m3")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Embedding Model Migration Test Suite")
+    print("=" * 60)
+
+    test_migration_lifecycle()
+    test_background_thread()
+    test_throttle()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
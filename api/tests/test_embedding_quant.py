@@ -0,0 +1,184 @@
+# api/tests/test_embedding_quant.py
+"""
+Tests for services/embedding_quant.py - float16 / int8 embedding storage.
+
+Covers blob encoding, scoring quantized and float32 rows together, the
+float32 re-rank, and converting a table back and forth on a temporary
+database built from the real migrations.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from db_fixture import MigratedDB
+from services.embedding_quant import (
+    cosine_scores,
+    dequantize,
+    dequantize_table,
+    encode_for_table,
+    get_setting,
+    load_embedding,
+    quantize,
+    quantize_table,
+    table_stats,
+    top_k,
+)
+from utils import db
+
+DIM = 64
+
+
+def unit_vectors(n, seed=0):
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def exact(query, vecs):
+    return vecs @ query / (np.linalg.norm(vecs, axis=1) * np.linalg.norm(query))
+
+
+def test_encoding():
+    """Test blob sizes and round-trip error."""
+    print("\n=== Testing encoding ===")
+    v = unit_vectors(1)[0] * 3.0
+
+    half = quantize(v, "float16")
+    assert len(half) == 1 + 2 * DIM
+    assert np.max(np.abs(dequantize(half) - v)) < 3e-3
+
+    small = quantize(v.tobytes(), "int8")
+    assert len(small) == 1 + 4 + DIM
+    step = np.max(np.abs(v)) / 127
+    assert np.max(np.abs(dequantize(small) - v)) <= step / 2 + 1e-6
+    print("✓ float16 and int8 blobs decode within one quantization step")
+
+    zero = np.zeros(DIM, dtype=np.float32)
+    assert not dequantize(quantize(zero, "int8")).any()
+    assert load_embedding(None, None) is None
+    assert np.array_equal(load_embedding(v.tobytes(), small), v)
+    assert np.allclose(load_embedding(None, small), dequantize(small))
+    print("✓ zero vector, float32 preferred over quantized")
+
+    try:
+        quantize(v, "int4")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_scoring():
+    """Test mixed float32 / quantized rows and the re-rank."""
+    print("\n=== Testing scoring ===")
+    vecs = unit_vectors(500)
+    query = unit_vectors(1, seed=9)[0]
+    truth = exact(query, vecs)
+    floats = [v.tobytes() for v in vecs]
+
+    scores = cosine_scores(query, floats)
+    assert np.allclose(scores, truth, atol=1e-5)
+    print("✓ float32 rows score exactly")
+
+    # First 200 int8 only, next 200 float16 + float32, last 100 float32 only,
+    # and one row with no embedding at all
+    stored = [None] * 200 + floats[200:]
+    quant = [quantize(v, "int8") for v in vecs[:200]] + [quantize(v, "float16") for v in vecs[200:400]] + [None] * 100
+    stored[7], quant[7] = None, None
+
+    scores = cosine_scores(query, stored, quant)
+    assert np.isnan(scores[7])
+    mask = ~np.isnan(scores)
+    assert np.max(np.abs(scores[mask] - truth[mask])) < 0.02
+    assert np.allclose(scores[400:], truth[400:], atol=1e-5)
+    print("✓ int8 / float16 within 0.02 of exact, missing row is NaN")
+
+    quant_all = [quantize(v, "int8") for v in vecs]
+    approx = cosine_scores(query, floats, quant_all)
+    reranked = cosine_scores(query, floats, quant_all, rerank=20)
+    best = top_k(approx, 20)
+    assert np.allclose(reranked[best], truth[best], atol=1e-5)
+    assert top_k(reranked, 5) == top_k(truth.astype(np.float32), 5)
+    print("✓ re-rank restores exact scores and order for the top candidates")
+
+    assert top_k(np.array([0.1, np.nan, 0.9, 0.5], dtype=np.float32), 10) == [2, 3, 0]
+    assert top_k(scores, 0) == []
+
+
+def test_table_conversion():
+    """Test quantize_table / dequantize_table and writer encoding."""
+    print("\n=== Testing table conversion ===")
+    with MigratedDB():
+        conn = db.get_db()
+        assert get_setting(conn, "library_chunks") is None
+
+        vecs = unit_vectors(30)
+        conn.execute("INSERT INTO library_files (id, filename, stored_path) VALUES (1, 'a.txt', '/a.txt')")
+        conn.executemany(
+            "INSERT INTO library_chunks (library_file_id, chunk_index, content, embedding) VALUES (1, ?, 'x', ?)",
+            [(i, v.tobytes()) for i, v in enumerate(vecs)],
+        )
+        conn.execute("INSERT INTO library_chunks (library_file_id, chunk_index, content) VALUES (1, 99, 'no vector')")
+        conn.commit()
+
+        blob = vecs[0].tobytes()
+        assert encode_for_table(conn, "library_chunks", blob) == (blob, None)
+
+        assert quantize_table(conn, "library_chunks", "int8", batch_size=7) == 30
+        stats = table_stats(conn, "library_chunks")
+        assert stats["float32_rows"] == stats["quantized_rows"] == 30
+        assert stats["quantized_bytes"] == 30 * (5 + DIM)
+        stored, quantized = encode_for_table(conn, "library_chunks", blob)
+        assert stored == blob and quantized[:1] == b"b"
+        print("✓ int8 alongside float32; new rows encoded by writers")
+
+        assert quantize_table(conn, "library_chunks", "float16", keep_float32=False) == 30
+        setting = get_setting(conn, "library_chunks")
+        assert (setting.dtype, setting.keep_float32) == ("float16", False)
+        stats = table_stats(conn, "library_chunks")
+        assert (stats["float32_rows"], stats["quantized_rows"]) == (0, 30)
+        assert encode_for_table(conn, "library_chunks", blob)[0] is None
+
+        # Re-encoding from int8 compounds the error; it stays small
+        row = conn.execute("SELECT embedding_q FROM library_chunks WHERE chunk_index = 3").fetchone()
+        assert np.max(np.abs(dequantize(row[0]) - vecs[3])) < 0.01
+        print("✓ switch to float16 and drop float32")
+
+        assert dequantize_table(conn, "library_chunks") == 30
+        assert get_setting(conn, "library_chunks") is None
+        stats = table_stats(conn, "library_chunks")
+        assert (stats["float32_rows"], stats["quantized_rows"]) == (30, 0)
+        row = conn.execute("SELECT embedding FROM library_chunks WHERE chunk_index = 3").fetchone()
+        assert np.max(np.abs(np.frombuffer(row[0], dtype=np.float32) - vecs[3])) < 0.01
+        print("✓ revert restores float32 from quantized values")
+
+        try:
+            quantize_table(conn, "messages", "int8")
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        conn.close()
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Embedding Quantization Test Suite")
+    print("=" * 60)
+
+    test_encoding()
+    test_scoring()
+    test_table_conversion()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# api/tests/test_http_retry.py
+"""
+Tests for utils/http_retry.py - pooled sessions and retry/backoff.
+
+Runs against a local stub HTTP server, so no provider keys or network
+access are needed.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_retry import (
+    get_session,
+    close_sessions,
+    parse_retry_after,
+    post_with_retry,
+)
+
+
+class StubServer:
+    """
+    Keep-alive HTTP/1.1 server that replays a script of responses.
+
+    Records the client port of every request, so the number of distinct
+    ports is the number of TCP connections the client opened.
+    """
+
+    def __init__(self):
+        self.script = []          # [(status, headers, body)] consumed in order
+        self.client_ports = []
+        self.drop_next = 0        # Close the socket without responding N times
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this,
+            # Nagle + delayed ACK adds ~40ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                stub.client_ports.append(self.client_address[1])
+
+                if stub.drop_next:
+                    stub.drop_next -= 1
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+
+                status, headers, body = (
+                    stub.script.pop(0) if stub.script else (200, {}, {"ok": True})
+                )
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1/test"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        close_sessions()
+
+    @property
+    def connections(self) -> int:
+        return len(set(self.client_ports))
+
+
+def test_connection_reuse():
+    """Test that a pooled session reuses one connection."""
+    print("\n=== Testing connection reuse ===")
+
+    with StubServer() as stub:
+        session = get_session("stub-reuse")
+        for _ in range(20):
+            post_with_retry(stub.url, json={"q": 1}, session=session)
+        assert len(stub.client_ports) == 20
+        assert stub.connections == 1, f"Expected 1 connection, got {stub.connections}"
+        print("✓ 20 pooled requests over 1 connection")
+
+        before = stub.connections
+        for _ in range(5):
+            post_with_retry(stub.url, json={"q": 1})
+        assert stub.connections == before + 5
+        print("✓ bare requests open a connection each")
+
+    assert get_session("a") is get_session("a")
+    assert get_session("a") is not get_session("b")
+    close_sessions()
+    print("✓ one shared session per provider")
+
+    print("Connection reuse: All tests passed!")
+
+
+def test_retry_statuses():
+    """Test retry on 429/5xx and no retry on 4xx."""
+    print("\n=== Testing retry statuses ===")
+
+    with StubServer() as stub:
+        session = get_session("stub-retry")
+
+        stub.script = [(503, {}, {}), (502, {}, {}), (200, {}, {"ok": 1})]
+        response = post_with_retry(stub.url, json={}, session=session, backoff_base=0.01)
+        assert response.json() == {"ok": 1}
+        assert len(stub.client_ports) == 3
+        assert stub.connections == 1
+        print("✓ 5xx retried on the same pooled connection")
+
+        stub.client_ports.clear()
+        stub.script = [(429, {"Retry-After": "0"}, {}), (200, {}, {"ok": 2})]
+        response = post_with_retry(stub.url, json={}, session=session)
+        assert response.json() == {"ok": 2}
+        print("✓ 429 retried after Retry-After")
+
+        stub.client_ports.clear()
+        stub.script = [(400, {}, {"error": {"message": "bad request"}})]
+        try:
+            post_with_retry(stub.url, json={}, session=session, label="Stub")
+            assert False, "Should have raised RuntimeError"
+        except RuntimeError as e:
+            assert "Stub API error: bad request" in str(e)
+        assert len(stub.client_ports) == 1
+        print("✓ 4xx not retried")
+
+        stub.client_ports.clear()
+        stub.script = [(500, {}, {})] * 3
+        try:
+            post_with_retry(stub.url, json={}, session=session, backoff_base=0.01)
+            assert False, "Should have raised RuntimeError"
+        except RuntimeError as e:
+            assert "last status: 500" in str(e)
+        assert len(stub.client_ports) == 3
+        print("✓ gives up after max_retries")
+
+    print("Retry statuses: All tests passed!")
+
+
+def test_connection_reset():
+    """Test retry when the server drops the connection."""
+    print("\n=== Testing connection reset ===")
+
+    with StubServer() as stub:
+        session = get_session("stub-reset")
+        stub.drop_next = 1
+        response = post_with_retry(stub.url, json={}, session=session, backoff_base=0.01)
+        assert response.json() == {"ok": True}
+        assert len(stub.client_ports) == 2
+        print("✓ dropped connection retried")
+
+    print("Connection reset: All tests passed!")
+
+
+class FailingSession:
+    """Wraps a session; the first `failures` posts raise `error` instead."""
+
+    def __init__(self, session, error, failures):
+        self.session = session
+        self.error = error
+        self.failures = failures
+        self.calls = 0
+
+    def post(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("simulated")
+        return self.session.post(*args, **kwargs)
+
+
+def test_timeouts():
+    """Test connect timeouts are retried and read timeouts are not."""
+    print("\n=== Testing timeouts ===")
+
+    with StubServer() as stub:
+        session = FailingSession(get_session("stub-timeout"), requests.ConnectTimeout, 2)
+        response = post_with_retry(stub.url, json={}, session=session, backoff_base=0.01)
+        assert response.json() == {"ok": True}
+        assert session.calls == 3 and len(stub.client_ports) == 1
+        print("✓ connect timeout retried")
+
+        session = FailingSession(get_session("stub-timeout"), requests.ReadTimeout, 1)
+        try:
+            post_with_retry(stub.url, json={}, session=session, timeout=5, backoff_base=0.01)
+            assert False, "Should have raised RuntimeError"
+        except RuntimeError as e:
+            assert "timed out after 5s" in str(e)
+        assert session.calls == 1
+        print("✓ read timeout raised without retry")
+
+    print("Timeouts: All tests passed!")
+
+
+def test_parse_retry_after():
+    """Test Retry-After parsing."""
+    print("\n=== Testing parse_retry_after ===")
+
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    print("✓ delta-seconds")
+
+    future = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 10))
+    wait = parse_retry_after(future)
+    assert 8 <= wait <= 10, wait
+    past = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() - 10))
+    assert parse_retry_after(past) == 0.0
+    print("✓ HTTP-date")
+
+    print("parse_retry_after: All tests passed!")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("HTTP Retry Test Suite")
+    print("=" * 60)
+
+    test_connection_reuse()
+    test_retry_statuses()
+    test_connection_reset()
+    test_timeouts()
+    test_parse_retry_after()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
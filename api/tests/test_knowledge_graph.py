@@ -0,0 +1,284 @@
+# api/tests/test_knowledge_graph.py
+"""
+Tests for services/knowledge_graph.py - incremental symbol extraction and
+cached symbol search.
+
+Runs against a temp database and upload root with a deterministic hashing
+embedder that counts calls. Covers unchanged files being skipped, edited,
+touched and removed files, one embedding per distinct symbol name in
+batches, the per-project matrix being reused until symbols change,
+ranking against a brute-force scan, and extraction without an app
+context.
+"""
+
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from flask import Flask
+
+from db_fixture import MigratedDB
+from services import knowledge_graph as kg
+from utils import db
+
+DIM = 32
+
+
+def fake_vector(text):
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+    vec = np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+    # Names sharing a prefix land close together
+    vec[:4] += 3 * (ord(text[0]) % 4 == np.arange(4))
+    return vec
+
+
+class Embedder:
+    """Stand-in for core.memory_core.embed / embed_many."""
+
+    def __init__(self):
+        self.single = 0
+        self.batches = []
+
+    def embed(self, text):
+        self.single += 1
+        return fake_vector(text).tobytes()
+
+    def embed_many(self, texts):
+        self.batches.append(list(texts))
+        return [fake_vector(t).tobytes() for t in texts]
+
+
+class Env:
+    """Temp database and upload root with one project, patched embedder."""
+
+    def __enter__(self):
+        self.db = MigratedDB(users=("tester", "other"))
+        self.project_id = self.db.project_id
+        self._saved = (kg.embed, kg.embed_many, kg.SYMBOL_EMBED_BATCH)
+
+        self.embedder = Embedder()
+        kg.embed, kg.embed_many = self.embedder.embed, self.embedder.embed_many
+        kg.invalidate_symbol_matrix()
+
+        self.uploads = os.path.join(self.db.tmp, "uploads")
+        os.makedirs(self.uploads)
+        self.app = Flask(__name__)
+        self.app.config["UPLOAD_ROOT"] = self.uploads
+        return self
+
+    def add_file(self, name, text, mime="text/plain"):
+        self.write(name, text)
+        conn = db.get_db()
+        file_id = conn.execute(
+            """
+            INSERT INTO project_files (user_id, project_id, filename, stored_name, mime_type, size_bytes)
+            VALUES (1, ?, ?, ?, ?, ?)
+            """,
+            (self.project_id, name, name, mime, len(text)),
+        ).lastrowid
+        conn.commit()
+        conn.close()
+        return file_id
+
+    def write(self, name, text, mtime_ns=None):
+        path = os.path.join(self.uploads, name)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def sync(self):
+        with self.app.app_context():
+            return kg.sync_project_symbols(self.project_id, 1)
+
+    def query(self, sql, *params):
+        conn = db.get_db()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def __exit__(self, *exc):
+        kg.embed, kg.embed_many, kg.SYMBOL_EMBED_BATCH = self._saved
+        kg.invalidate_symbol_matrix()
+        self.db.close()
+
+
+def test_incremental_extraction():
+    """Test only new, edited and removed files are touched on re-sync."""
+    print("\n=== Testing incremental extraction ===")
+    with Env() as env:
+        a = env.add_file("a.ini", "width = 10\nheight = 20\n")
+        b = env.add_file("b.yaml", "port: 80\nhost: example\n")
+        c = env.add_file("c.cfg", "timeout = 5\n")
+        env.add_file("image.png", "not text", mime="image/png")
+
+        stats = env.sync()
+        assert stats["files_scanned"] == 3 and stats["files_changed"] == 3
+        assert stats["symbols_total"] == stats["symbols_written"] == 5
+        rows = env.query("SELECT DISTINCT project_id FROM file_symbols")
+        assert [r["project_id"] for r in rows] == [env.project_id]
+        print("✓ first sync extracts every text file, project_id filled in")
+
+        stats = env.sync()
+        assert (stats["files_changed"], stats["files_unchanged"], stats["symbols_written"]) == (0, 3, 0)
+        print("✓ unchanged files skipped on size / mtime")
+
+        # Edited in place: old text in the cache must not be reused
+        env.write("a.ini", "width = 10\ndepth = 30\nscale = 2\n")
+        ids_before = {r["id"] for r in env.query("SELECT id FROM file_symbols WHERE file_id = ?", b)}
+        stats = env.sync()
+        assert stats["files_changed"] == 1 and stats["symbols_total"] == 6
+        names = sorted(r["symbol"] for r in env.query("SELECT symbol FROM file_symbols WHERE file_id = ?", a))
+        assert names == ["depth", "scale", "width"]
+        assert {r["id"] for r in env.query("SELECT id FROM file_symbols WHERE file_id = ?", b)} == ids_before
+        print("✓ edited file re-extracted from disk, others untouched")
+
+        # Same bytes, new mtime: hashed, not re-extracted
+        st = os.stat(os.path.join(env.uploads, "c.cfg"))
+        env.write("c.cfg", "timeout = 5\n", mtime_ns=st.st_mtime_ns + 10**9)
+        stats = env.sync()
+        assert stats["files_changed"] == 0 and stats["files_unchanged"] == 3
+        (state,) = env.query("SELECT mtime_ns FROM file_symbol_state WHERE file_id = ?", c)
+        assert state["mtime_ns"] == st.st_mtime_ns + 10**9
+        assert env.sync()["files_unchanged"] == 3
+        print("✓ touched file matched on content hash")
+
+        conn = db.get_db()
+        conn.execute("DELETE FROM project_files WHERE id = ?", (b,))
+        conn.commit()
+        conn.close()
+        stats = env.sync()
+        assert stats["files_removed"] == 1 and stats["symbols_total"] == 4
+        assert env.query("SELECT 1 FROM file_symbol_state WHERE file_id = ?", b) == []
+        print("✓ symbols of removed files dropped")
+
+        # Someone else's project is not extracted
+        with env.app.app_context():
+            assert kg.sync_project_symbols(env.project_id, 2)["files_scanned"] == 0
+
+
+def test_embeddings_batched():
+    """Test each distinct name is embedded once, in batches, and kept on edits."""
+    print("\n=== Testing batched embeddings ===")
+    with Env() as env:
+        kg.SYMBOL_EMBED_BATCH = 4
+        names = [f"key{i}" for i in range(10)]
+        env.add_file("one.ini", "".join(f"{n} = 1\n" for n in names))
+        env.add_file("two.ini", "".join(f"{n} = 2\n" for n in names[:5]))
+        env.sync()
+
+        with env.app.app_context():
+            kg.query_symbol(env.project_id, 1, "key1")
+        assert [len(b) for b in env.embedder.batches] == [4, 4, 2]
+        assert sorted(sum(env.embedder.batches, [])) == sorted(names)
+        assert env.query("SELECT 1 FROM file_symbols WHERE embedding IS NULL") == []
+        print("✓ 10 distinct names in 15 rows embedded in batches of 4")
+
+        env.write("one.ini", "".join(f"{n} = 3\n" for n in names) + "extra = 1\n")
+        env.sync()
+        env.embedder.batches.clear()
+        with env.app.app_context():
+            kg.query_symbol(env.project_id, 1, "key1")
+        assert env.embedder.batches == [["extra"]]
+        print("✓ re-extraction keeps existing embeddings, embeds only new names")
+
+
+def test_symbol_matrix_cache():
+    """Test search reuses the project matrix and ranks like a full scan."""
+    print("\n=== Testing symbol matrix cache ===")
+    with Env() as env:
+        words = ["alpha", "beta", "gamma", "delta", "omega", "kappa", "sigma"]
+        for i in range(4):
+            env.add_file(f"f{i}.ini", "".join(f"{w}_{i} = {j}\n" for j, w in enumerate(words)))
+        env.sync()
+
+        with env.app.app_context():
+            result = kg.query_symbol(env.project_id, 1, "gamma_2", top_k=5)
+        hits = result["hits"]
+        assert len(hits) == 5 and hits[0]["symbol"] == "gamma_2"
+        assert set(hits[0]) == {"file_id", "filename", "mime_type", "symbol", "char_offset", "snippet", "score"}
+
+        # Brute force over every stored row
+        rows = env.query("SELECT symbol, embedding FROM file_symbols")
+        q = fake_vector("gamma_2")
+        scores = {
+            r["symbol"]: float(np.dot(v, q) / (np.linalg.norm(v) * np.linalg.norm(q)))
+            for r in rows
+            for v in [np.frombuffer(r["embedding"], dtype=np.float32)]
+        }
+        expected = sorted(scores, key=lambda s: -scores[s])[:5]
+        assert [h["symbol"] for h in hits] == expected
+        assert all(abs(h["score"] - scores[h["symbol"]]) < 1e-5 for h in hits)
+        print("✓ top 5 match a brute-force cosine scan")
+
+        cached = kg._symbol_matrices[env.project_id]
+        with env.app.app_context():
+            kg.query_symbol(env.project_id, 1, "sigma_0")
+            assert kg._symbol_matrices[env.project_id] is cached
+            print("✓ matrix reused between queries")
+
+            env.add_file("f9.ini", "brandnew = 1\n")
+            env.sync()
+            assert env.project_id not in kg._symbol_matrices
+            hits = kg.query_symbol(env.project_id, 1, "brandnew")["hits"]
+            assert hits[0]["symbol"] == "brandnew"
+            print("✓ extraction invalidates the matrix")
+
+            # Rows rewritten behind the cache's back change the fingerprint
+            conn = db.get_db()
+            conn.execute("DELETE FROM file_symbols WHERE symbol = 'brandnew'")
+            conn.commit()
+            conn.close()
+            assert kg.query_symbol(env.project_id, 1, "brandnew")["hits"][0]["symbol"] != "brandnew"
+            print("✓ external changes detected by fingerprint")
+
+            assert kg.query_symbol(env.project_id, 2, "alpha_0")["hits"] == []
+            assert kg.query_symbol(env.project_id, 1, "  ")["hits"] == []
+
+
+def test_without_app_context():
+    """Test extraction outside a request hashes the extracted text."""
+    print("\n=== Testing extraction without app context ===")
+    with Env() as env:
+        file_id = env.add_file("cfg.ini", "retry = 3\n")
+        conn = db.get_db()
+        conn.execute(
+            "INSERT INTO file_text_cache (file_id, text, parser) VALUES (?, ?, 'text')",
+            (file_id, "retry = 3\nlimit = 9\n"),
+        )
+        conn.commit()
+        conn.close()
+
+        assert kg.extract_symbols_for_project(env.project_id, 1) == 2
+        stats = kg.sync_project_symbols(env.project_id, 1)
+        assert stats["files_changed"] == 0 and stats["files_unchanged"] == 1
+        (state,) = env.query("SELECT size_bytes, content_hash FROM file_symbol_state")
+        assert state["size_bytes"] is None and len(state["content_hash"]) == 64
+        print("✓ cached text hashed when the upload root is unavailable")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Knowledge Graph Test Suite")
+    print("=" * 60)
+
+    test_incremental_extraction()
+    test_embeddings_batched()
+    test_symbol_matrix_cache()
+    test_without_app_context()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# api/tests/test_llm_job_service.py
+"""
+Tests for the LLM job queue (services/llm_job_service.py).
+
+Covers dedupe through the partial unique index, the priority bump,
+forced jobs keyed apart from plain ones, the guarded claim under
+concurrency, retry backoff in mark_failed, retry_job refusing to
+duplicate an active job, and stale-job recovery.
+"""
+
+import os
+import sys
+import threading
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from db_fixture import MigratedDB
+from services import llm_job_service as jobs
+from utils import db
+
+
+def add_files(env, n):
+    """n project files; returns their ids."""
+    conn = db.get_db()
+    ids = [
+        conn.execute(
+            "INSERT INTO project_files (user_id, project_id, filename, stored_name) VALUES (1, ?, ?, ?)",
+            (env.project_id, f"notes_{i}.txt", f"notes_{i}.txt"),
+        ).lastrowid
+        for i in range(n)
+    ]
+    conn.commit()
+    return ids
+
+
+def seconds_until_runnable(job_id):
+    row = db.get_db().execute(
+        "SELECT (julianday(run_after) - julianday('now')) * 86400 FROM llm_jobs WHERE id = ?",
+        (job_id,),
+    ).fetchone()
+    return row[0]
+
+
+def make_runnable(job_id):
+    conn = db.get_db()
+    conn.execute("UPDATE llm_jobs SET run_after = datetime('now', '-1 seconds') WHERE id = ?", (job_id,))
+    conn.commit()
+
+
+def test_dedupe_and_priority():
+    """Test one active job per target, priority bump, and forced jobs."""
+    print("\n=== Testing dedupe ===")
+    with MigratedDB() as env:
+        (file_id,) = add_files(env, 1)
+
+        first = jobs.enqueue_job(jobs.JOB_KIND_INSIGHTS, env.project_id, file_id, priority=5)
+        again = jobs.enqueue_job(jobs.JOB_KIND_INSIGHTS, env.project_id, file_id, priority=7)
+        assert first["status"] == "queued"
+        assert again["status"] == "already_queued" and again["id"] == first["id"]
+        assert again["job"]["priority"] == 5
+        print("✓ second request returns the active job")
+
+        urgent = jobs.enqueue_job(jobs.JOB_KIND_INSIGHTS, env.project_id, file_id, priority=1)
+        assert urgent["id"] == first["id"] and urgent["job"]["priority"] == 1
+        print("✓ more urgent request bumps the pending job's priority")
+
+        forced = jobs.enqueue_job(
+            jobs.JOB_KIND_INSIGHTS, env.project_id, file_id, payload={"force": True}, priority=1
+        )
+        assert forced["status"] == "queued" and forced["id"] != first["id"]
+        assert forced["job"]["payload"] == {"force": True}
+        assert jobs.get_active_job(jobs.JOB_KIND_INSIGHTS, file_id=file_id)["id"] == first["id"]
+        assert jobs.get_active_job(
+            jobs.JOB_KIND_INSIGHTS, file_id=file_id, payload={"force": True}
+        )["id"] == forced["id"]
+        print("✓ forced regeneration is not folded into the plain job")
+
+        # Once the job finishes, the same target can be queued again
+        claimed = jobs.claim_next_job()
+        jobs.mark_completed(claimed["id"], {"ok": True})
+        jobs.mark_completed(jobs.claim_next_job()["id"])
+        requeued = jobs.enqueue_job(jobs.JOB_KIND_INSIGHTS, env.project_id, file_id)
+        assert requeued["status"] == "queued" and requeued["id"] not in (first["id"], forced["id"])
+        print("✓ finished jobs do not block a new one")
+
+
+def test_concurrent_claim():
+    """Test concurrent workers never claim the same job."""
+    print("\n=== Testing guarded claim ===")
+    with MigratedDB() as env:
+        file_ids = add_files(env, 20)
+        queued = [
+            jobs.enqueue_job(jobs.JOB_KIND_INSIGHTS, env.project_id, fid)["id"] for fid in file_ids
+        ]
+
+        claimed, lock = [], threading.Lock()
+
+        def drain():
+            while True:
+                job = jobs.claim_next_job()
+                if not job:
+                    return
+                with lock:
+                    claimed.append(job["id"])
+
+        threads = [threading.Thread(target=drain) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(claimed) == sorted(queued)
+        stats = jobs.get_queue_stats(env.project_id)
+        assert stats["processing"] == len(queued) and stats["pending"] == 0
+        print(f"✓ {len(queued)} jobs claimed once each by {len(threads)} threads")
+
+
+def test_backoff_and_retry():
+    """Test failed attempts back off, then fail; retry_job respects dedupe."""
+    print("\n=== Testing retries ===")
+    with MigratedDB() as env:
+        (file_id,) = add_files(env, 1)
+        job_id = jobs.enqueue_job(jobs.JOB_KIND_INSIGHTS, env.project_id, file_id)["id"]
+
+        delays = []
+        for attempt in range(1, jobs.DEFAULT_MAX_ATTEMPTS + 1):
+            job = jobs.claim_next_job()
+            assert job["id"] == job_id and job["attempts"] == attempt
+            status = jobs.mark_failed(job_id, f"boom {attempt}")
+            if attempt < jobs.DEFAULT_MAX_ATTEMPTS:
+                assert status == "pending"
+                assert jobs.claim_next_job() is None
+                delays.append(seconds_until_runnable(job_id))
+                make_runnable(job_id)
+            else:
+                assert status == "failed"
+        for attempt, delay in enumerate(delays, 1):
+            expected = jobs.RETRY_BASE_SECONDS * 2 ** (attempt - 1)
+            assert abs(delay - expected) < 5, (delay, expected)
+        job = jobs.get_job(job_id)
+        assert job["status"] == "failed" and job["error_message"] == f"boom {jobs.DEFAULT_MAX_ATTEMPTS}"
+        print(f"✓ backed off {[round(d) for d in delays]}s, then failed")
+
+        # Non-retryable errors fail straight away
+        other = jobs.enqueue_job(jobs.JOB_KIND_REASONING, env.project_id, payload={"analysis": "full"})
+        jobs.claim_next_job()
+        assert jobs.mark_failed(other["id"], "bad input", retryable=False) == "failed"
+
+        # retry_job refuses while an equivalent job is active
+        jobs.enqueue_job(jobs.JOB_KIND_INSIGHTS, env.project_id, file_id)
+        assert not jobs.retry_job(job_id)
+        jobs.mark_completed(jobs.claim_next_job()["id"])
+        assert jobs.retry_job(job_id)
+        job = jobs.get_job(job_id)
+        assert job["status"] == "pending" and job["attempts"] == 0
+        assert not jobs.retry_job(job_id)
+        print("✓ retry_job only re-queues when no equivalent job is active")
+
+
+def test_stale_jobs():
+    """Test orphaned jobs are re-queued until they run out of attempts."""
+    print("\n=== Testing stale recovery ===")
+    with MigratedDB() as env:
+        (file_id,) = add_files(env, 1)
+        job_id = jobs.enqueue_job(jobs.JOB_KIND_INSIGHTS, env.project_id, file_id)["id"]
+        conn = db.get_db()
+
+        def orphan():
+            conn.execute(
+                "UPDATE llm_jobs SET started_at = datetime('now', '-1 hours') WHERE id = ?",
+                (job_id,),
+            )
+            conn.commit()
+
+        for attempt in range(1, jobs.DEFAULT_MAX_ATTEMPTS):
+            assert jobs.claim_next_job()["attempts"] == attempt
+            assert jobs.requeue_stale_jobs() == 0
+            orphan()
+            assert jobs.requeue_stale_jobs() == 1
+            assert jobs.get_job(job_id)["status"] == "pending"
+        print("✓ orphaned job re-queued while attempts remain")
+
+        assert jobs.claim_next_job()["attempts"] == jobs.DEFAULT_MAX_ATTEMPTS
+        orphan()
+        assert jobs.requeue_stale_jobs() == 0
+        job = jobs.get_job(job_id)
+        assert job["status"] == "failed" and "Worker died" in job["error_message"]
+        assert jobs.claim_next_job() is None
+        print("✓ job that keeps killing the worker is failed")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("LLM Job Queue Test Suite")
+    print("=" * 60)
+
+    test_dedupe_and_priority()
+    test_concurrent_claim()
+    test_backoff_and_retry()
+    test_stale_jobs()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
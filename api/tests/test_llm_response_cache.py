@@ -0,0 +1,141 @@
+# api/tests/test_llm_response_cache.py
+"""
+Tests for the LLM response cache (services/cache/llm_response_cache.py).
+
+Covers TTL expiry, LRU eviction by entry count and by bytes (including
+a burst of puts and hits within one second), hit/miss stats, and
+get_or_call.
+"""
+
+import os
+import sys
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from db_fixture import MigratedDB
+from services.cache.llm_response_cache import LLMResponseCache, make_cache_key
+from utils import db
+
+
+def key(n):
+    return make_cache_key("TestProvider", "test-model", [{"role": "user", "content": f"prompt {n}"}])
+
+
+def stored_keys():
+    return {r[0] for r in db.get_db().execute("SELECT cache_key FROM llm_response_cache")}
+
+
+def test_ttl():
+    """Test expired entries are misses and are cleaned up; ttl 0 never expires."""
+    print("\n=== Testing TTL ===")
+    with MigratedDB():
+        cache = LLMResponseCache(ttl_hours=1)
+        cache.put(key(1), "expiring", "TestProvider", "test-model")
+        cache.put(key(2), "forever", "TestProvider", "test-model", ttl_hours=0)
+        assert cache.get(key(1)) == "expiring"
+
+        conn = db.get_db()
+        row = conn.execute(
+            "SELECT expires_at FROM llm_response_cache WHERE cache_key = ?", (key(2),)
+        ).fetchone()
+        assert row["expires_at"] is None
+        conn.execute(
+            "UPDATE llm_response_cache SET expires_at = datetime('now', '-1 seconds') WHERE cache_key = ?",
+            (key(1),),
+        )
+        conn.commit()
+
+        assert cache.get(key(1)) is None
+        assert cache.get(key(2)) == "forever"
+        assert cache.cleanup_expired() == 1
+        assert stored_keys() == {key(2)}
+        print("✓ expired entry missed and removed, ttl 0 kept")
+
+
+def test_entry_limit():
+    """Test LRU eviction by entry count within a single second."""
+    print("\n=== Testing max_entries ===")
+    with MigratedDB():
+        cache = LLMResponseCache(max_entries=3)
+        for n in range(10):
+            cache.put(key(n), f"response {n}", "TestProvider", "test-model")
+            assert cache.get(key(n)) == f"response {n}"
+        assert stored_keys() == {key(7), key(8), key(9)}
+        print("✓ burst of puts keeps the newest entries")
+
+        # A hit makes the oldest entry the most recently used
+        assert cache.get(key(7)) == "response 7"
+        cache.put(key(10), "response 10", "TestProvider", "test-model")
+        assert stored_keys() == {key(7), key(9), key(10)}
+        assert cache.get_stats()["evictions"] == 8
+        print("✓ entry read in the same second survives eviction")
+
+
+def test_byte_limit():
+    """Test LRU eviction by total response bytes."""
+    print("\n=== Testing max_bytes ===")
+    with MigratedDB():
+        cache = LLMResponseCache(max_bytes=100)
+        for n in range(3):
+            cache.put(key(n), "x" * 40, "TestProvider", "test-model")
+        assert stored_keys() == {key(1), key(2)}
+
+        # Multi-byte characters count by their UTF-8 size
+        cache.put(key(3), "ש" * 31, "TestProvider", "test-model")
+        assert stored_keys() == {key(3)}
+        assert cache.get_stats()["total_bytes"] == 62
+        print("✓ oldest entries evicted until under max_bytes")
+
+
+def test_stats_and_get_or_call():
+    """Test hit/miss counters, per-entry hit counts and get_or_call."""
+    print("\n=== Testing stats ===")
+    with MigratedDB():
+        cache = LLMResponseCache()
+        calls = []
+
+        def call(text):
+            def run():
+                calls.append(text)
+                return text
+            return run
+
+        assert cache.get_or_call(key(1), call("first"), "TestProvider", "test-model") == "first"
+        assert cache.get_or_call(key(1), call("second"), "TestProvider", "test-model") == "first"
+        assert cache.get_or_call(key(1), call("third"), "TestProvider", "test-model", refresh=True) == "third"
+        assert cache.get(key(1)) == "third"
+        assert calls == ["first", "third"]
+
+        # Empty responses are not cached
+        assert cache.get_or_call(key(2), call(""), "OtherProvider", None) == ""
+        assert cache.get(key(2)) is None
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["stores"]) == (2, 3, 2)
+        assert stats["hit_rate"] == 2 / 5
+        assert stats["entries"] == 1
+        assert stats["lifetime_hits"] == 1  # refresh replaced the entry
+        assert stats["by_provider"] == {"TestProvider": {"entries": 1, "hits": 1}}
+        print("✓ 2 hits, 3 misses, refresh and empty responses handled")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("LLM Response Cache Test Suite")
+    print("=" * 60)
+
+    test_ttl()
+    test_entry_limit()
+    test_byte_limit()
+    test_stats_and_get_or_call()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
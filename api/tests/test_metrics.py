@@ -0,0 +1,246 @@
+# api/tests/test_metrics.py
+"""
+Tests for utils/metrics.py - request timing trees and /api/metrics.
+
+Covers span nesting inside a request, histogram buckets and the
+Prometheus text output, DB statement counting through get_db(), LLM and
+embedding recorders, the Flask hooks (Server-Timing header, endpoint
+latency) and that nothing is recorded or wrapped while metrics are off.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import time
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+
+from db_fixture import MigratedDB
+from routes import metrics_api
+from routes.metrics_api import metrics_bp
+from utils import db, metrics
+
+
+class MetricsOn:
+    """Enable metrics with an empty registry for the duration of a test."""
+
+    def __init__(self, server_timing=False):
+        self.server_timing = server_timing
+
+    def __enter__(self):
+        self.saved = (metrics.METRICS_ENABLED, metrics.SERVER_TIMING_ENABLED)
+        metrics.set_enabled(True)
+        metrics.SERVER_TIMING_ENABLED = self.server_timing
+        metrics.reset()
+        return self
+
+    def __exit__(self, *exc):
+        metrics.set_enabled(self.saved[0])
+        metrics.SERVER_TIMING_ENABLED = self.saved[1]
+        metrics.reset()
+
+
+def counter(name, **labels):
+    return metrics.snapshot()["counters"].get((name, tuple(sorted(labels.items()))), 0)
+
+
+def histogram(name, **labels):
+    return metrics.snapshot()["histograms"].get((name, tuple(sorted(labels.items()))))
+
+
+def test_span_tree():
+    """Test spans nest into the request tree and feed histograms."""
+    print("\n=== Testing span tree ===")
+    with MetricsOn():
+        token = metrics.begin_request("chat")
+        with metrics.span("context"):
+            with metrics.span("memory_search"):
+                time.sleep(0.002)
+            with metrics.span("library_search"):
+                pass
+        with metrics.span("llm"):
+            pass
+        tree = metrics.current_timing_tree()
+        timing = metrics.end_request(token)
+
+        assert [c["name"] for c in tree["children"]] == ["context", "llm"]
+        assert [c["name"] for c in tree["children"][0]["children"]] == ["memory_search", "library_search"]
+        assert tree["children"][0]["children"][0]["ms"] >= 2
+        assert metrics.current_timing_tree() is None
+        print("✓ nested spans recorded in order")
+
+        header = metrics.server_timing_header(timing)
+        assert re.match(r"context;dur=[\d.]+, llm;dur=[\d.]+, total;dur=[\d.]+$", header), header
+        print("✓ Server-Timing lists top-level spans and total")
+
+        hist = histogram("tamor_span_seconds", span="memory_search")
+        assert hist["count"] == 1 and hist["sum"] >= 0.002
+        # Outside a request, spans still reach the histograms
+        with metrics.span("memory_search"):
+            pass
+        assert histogram("tamor_span_seconds", span="memory_search")["count"] == 2
+        print("✓ span histograms, with and without a request")
+
+
+def test_prometheus_output():
+    """Test bucket counts are cumulative and labels are escaped."""
+    print("\n=== Testing Prometheus format ===")
+    with MetricsOn():
+        for seconds in (0.0005, 0.003, 0.003, 2.0, 100.0):
+            metrics.observe("tamor_span_seconds", seconds, span='we"ird')
+        metrics.inc("tamor_llm_tokens_total", 1_500_000, provider="xai", direction="input")
+        text = metrics.render_prometheus()
+
+        assert "# TYPE tamor_span_seconds histogram" in text
+        assert 'tamor_span_seconds_bucket{span="we\\"ird",le="0.001"} 1' in text
+        assert 'tamor_span_seconds_bucket{span="we\\"ird",le="0.005"} 3' in text
+        assert 'tamor_span_seconds_bucket{span="we\\"ird",le="60.0"} 4' in text
+        assert 'tamor_span_seconds_bucket{span="we\\"ird",le="+Inf"} 5' in text
+        assert 'tamor_span_seconds_count{span="we\\"ird"} 5' in text
+        assert 'tamor_llm_tokens_total{direction="input",provider="xai"} 1500000' in text
+        print("✓ cumulative buckets, +Inf, counters, escaping")
+
+
+def test_db_and_recorders():
+    """Test get_db() statement counting and the LLM / embedding recorders."""
+    print("\n=== Testing DB, LLM and embedding recorders ===")
+    # Migrations run before metrics are on, so only the test's statements count
+    with MigratedDB(), MetricsOn():
+        token = metrics.begin_request("test")
+        conn = db.get_db()
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+        conn.executemany("INSERT INTO t (v) VALUES (?)", [("a",), ("b",)])
+        cur = conn.cursor()
+        cur.execute("SELECT v FROM t WHERE id = ?", (1,))
+        assert cur.fetchone()["v"] == "a"
+        conn.close()
+        timing = metrics.end_request(token)
+
+        assert counter("tamor_db_queries_total") == 3
+        assert histogram("tamor_db_query_seconds")["count"] == 3
+        assert timing.db_queries == 3
+        assert 'db;dur=' in metrics.server_timing_header(timing)
+        print("✓ execute / executemany / cursor.execute counted, row_factory kept")
+
+        with metrics.llm_call("anthropic", "claude") as call:
+            call.tokens(120, 30)
+        try:
+            with metrics.llm_call("xai", "grok"):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+        assert counter("tamor_llm_tokens_total", provider="anthropic", direction="input") == 120
+        assert counter("tamor_llm_tokens_total", provider="anthropic", direction="output") == 30
+        assert counter("tamor_llm_requests_total", provider="anthropic", model="claude", status="ok") == 1
+        assert counter("tamor_llm_requests_total", provider="xai", model="grok", status="error") == 1
+        assert histogram("tamor_llm_request_seconds", provider="xai")["count"] == 1
+        print("✓ LLM latency, tokens and errors by provider")
+
+        metrics.record_embedding(8, 0.01, "minilm")
+        assert counter("tamor_embedding_calls_total", model="minilm") == 1
+        assert counter("tamor_embedding_texts_total", model="minilm") == 8
+        print("✓ embedding calls and texts")
+
+
+def test_flask_hooks():
+    """Test request latency, Server-Timing and the /api/metrics endpoint."""
+    print("\n=== Testing Flask integration ===")
+    with MetricsOn(server_timing=True):
+        app = Flask(__name__)
+        app.register_blueprint(metrics_bp)
+        metrics.init_app(app)
+
+        @app.get("/api/thing/<int:n>")
+        def thing(n):
+            with metrics.span("work"):
+                pass
+            return jsonify({"n": n})
+
+        @app.get("/api/broken")
+        def broken():
+            with metrics.span("work"):
+                raise ValueError("nope")
+
+        client = app.test_client()
+        response = client.get("/api/thing/3")
+        assert response.status_code == 200
+        assert response.headers["Server-Timing"].startswith("work;dur=")
+        assert histogram(
+            "tamor_request_seconds", endpoint="/api/thing/<int:n>", method="GET", status="200"
+        )["count"] == 1
+        print("✓ per-endpoint latency and Server-Timing header")
+
+        app.config["PROPAGATE_EXCEPTIONS"] = False
+        assert client.get("/api/broken").status_code == 500
+        assert metrics.current_timing_tree() is None
+        print("✓ timing tree cleared when a view raises")
+
+        response = client.get("/api/metrics")
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain")
+        assert 'tamor_span_seconds_count{span="work"} 2' in response.get_data(as_text=True)
+        print("✓ /api/metrics serves the registry")
+
+        saved_token = metrics_api.METRICS_TOKEN
+        metrics_api.METRICS_TOKEN = "s3cret"
+        try:
+            assert client.get("/api/metrics").status_code == 401
+            ok = client.get("/api/metrics", headers={"Authorization": "Bearer s3cret"})
+            assert ok.status_code == 200
+        finally:
+            metrics_api.METRICS_TOKEN = saved_token
+        print("✓ optional bearer token")
+
+
+def test_disabled_is_inert():
+    """Test nothing is wrapped or recorded while metrics are off."""
+    print("\n=== Testing disabled mode ===")
+    saved_enabled = metrics.METRICS_ENABLED
+    metrics.set_enabled(False)
+    metrics.reset()
+    try:
+        assert metrics.span("a") is metrics.span("b")
+        with metrics.llm_call("xai") as call:
+            call.tokens(1, 1)
+        metrics.record_embedding(1, 0.1)
+
+        with MigratedDB():
+            conn = db.get_db()
+            assert type(conn) is sqlite3.Connection
+            conn.execute("SELECT 1")
+            conn.close()
+
+        app = Flask(__name__)
+        app.register_blueprint(metrics_bp)
+        metrics.init_app(app)
+        assert not app.before_request_funcs and not app.after_request_funcs
+        assert app.test_client().get("/api/metrics").status_code == 404
+        assert metrics.snapshot() == {"histograms": {}, "counters": {}}
+        print("✓ shared no-op span, plain connections, no hooks, 404")
+    finally:
+        metrics.set_enabled(saved_enabled)
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Metrics Test Suite")
+    print("=" * 60)
+
+    test_span_tree()
+    test_prometheus_output()
+    test_db_and_recorders()
+    test_flask_hooks()
+    test_disabled_is_inert()
+
+    print("\n" + "=" * 60)
+    print("All tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# api/tests/test_pdf_extract.py
+"""
+Tests for services/file_parsing.py PDF extraction.
+
+Checks that page offsets point into the cleaned text that chunking uses,
+that page-parallel extraction matches the sequential pass, and that text
+and structure share one cached extraction. PDFs are generated on the fly
+by benchmarks/bench_pdf_extract.py.
+"""
+
+import bisect
+import os
+import sys
+import tempfile
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pdf_extract import write_text_pdf
+from services import file_parsing
+from services.file_parsing import clean_extracted_text, clean_pages, extract_text_from_file
+from services.structured_parsing import extract_structure_for_mime
+
+
+def page_for_offset(offsets, offset):
+    """Same mapping as ChunkService._offset_to_page()."""
+    return max(1, bisect.bisect_right(offsets, offset))
+
+
+def test_clean_pages_offsets():
+    """Test offsets survive footer removal and cross-page line merges."""
+    print("\n=== Testing clean_pages ===")
+
+    pages = [
+        "Intro:\nthe first page ends mid\n12 / 300",
+        "sentence on page two.\nPage 2",
+        "  \n42\n",
+        "Closing words.",
+    ]
+    text, offsets = clean_pages(pages)
+
+    assert text == clean_extracted_text("\n".join(pages))
+    assert text == "Intro:\nthe first page ends mid sentence on page two.\n\nClosing words."
+    assert text[offsets[1]:].startswith("sentence on page two.")
+    assert offsets[2] == offsets[3] and text[offsets[3]:] == "Closing words."
+    print("✓ merged page starts mid-line, empty page takes the next offset")
+
+    assert clean_pages([]) == ("", [])
+    assert clean_pages(["", ""]) == ("", [0, 0])
+    print("✓ empty input")
+
+
+def test_page_citations():
+    """Test every page offset lands on that page's heading in the cleaned text."""
+    print("\n=== Testing page citations ===")
+    file_parsing._pdf_cache.clear()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "doc.pdf")
+        write_text_pdf(path, pages=30)
+        result = extract_text_from_file(path, "application/pdf", "doc.pdf")
+
+    text = result["text"]
+    offsets = result["meta"]["page_offsets"]
+    assert result["parser"] == "pdf-pypdf2-cleaned"
+    assert len(offsets) == result["meta"]["page_count"] == 30
+    assert "Page 7" not in text
+
+    # Chunking re-cleans cached text; offsets must still line up
+    assert clean_extracted_text(text) == text
+
+    for n in range(1, 31):
+        start = offsets[n - 1]
+        heading = text.find(f"Chapter {n}", start)
+        assert heading == start, f"page {n}: offset {start}, heading at {heading}"
+        assert page_for_offset(offsets, heading + 5) == n
+    print("✓ 30 page offsets land on their headings")
+
+
+def test_parallel_matches_sequential():
+    """Test page-range extraction in a process pool gives the same result."""
+    print("\n=== Testing parallel extraction ===")
+    saved = file_parsing.PDF_PARALLEL_MIN_PAGES, file_parsing.PDF_PAGES_PER_TASK
+    file_parsing.PDF_PARALLEL_MIN_PAGES, file_parsing.PDF_PAGES_PER_TASK = 10, 7
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.pdf")
+            write_text_pdf(path, pages=40, seed=3)
+
+            file_parsing._pdf_cache.clear()
+            sequential = file_parsing.extract_pdf(path, workers=1)
+            file_parsing._pdf_cache.clear()
+            parallel = file_parsing.extract_pdf(path, workers=2)
+    finally:
+        file_parsing.PDF_PARALLEL_MIN_PAGES, file_parsing.PDF_PAGES_PER_TASK = saved
+
+    assert parallel == sequential
+    assert parallel["page_count"] == 40
+    print("✓ 2 workers x 6 page ranges == sequential")
+
+
+def test_text_and_structure_share_one_pass():
+    """Test structure comes from the cached text extraction."""
+    print("\n=== Testing shared extraction cache ===")
+    file_parsing._pdf_cache.clear()
+    calls = []
+    real = file_parsing._extract_page_texts
+
+    def counting(reader, start, stop):
+        calls.append((start, stop))
+        return real(reader, start, stop)
+
+    file_parsing._extract_page_texts = counting
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.pdf")
+            write_text_pdf(path, pages=12)
+            result = extract_text_from_file(path, "application/pdf", "doc.pdf")
+            structure = extract_structure_for_mime("application/pdf", path)
+
+            # Same bytes under another name hit the cache too
+            copy = os.path.join(tmp, "copy.pdf")
+            with open(path, "rb") as src, open(copy, "wb") as dst:
+                dst.write(src.read())
+            extract_structure_for_mime("", copy)
+    finally:
+        file_parsing._extract_page_texts = real
+
+    assert calls == [(0, 12)], calls
+    pages = structure["pages"]
+    assert [p["index"] for p in pages] == list(range(1, 13))
+    assert pages[4]["heading"] == "Chapter 5"
+    assert [p["offset"] for p in pages] == result["meta"]["page_offsets"]
+    print("✓ one pypdf pass for text, structure and a duplicate file")
+
+    # Callers mutating their copy must not corrupt the cache
+    pages[0]["heading"] = "changed"
+    result["meta"]["page_offsets"].clear()
+    cached = next(iter(file_parsing._pdf_cache.values()))
+    assert cached["structure"]["pages"][0]["heading"] == "Chapter 1"
+    assert len(cached["page_offsets"]) == 12
+    print("✓ returned meta/structure are copies")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("PDF Extraction Test Suite")
+    print("=" * 60)
+
+    test_clean_pages_offsets()
+    test_page_citations()
+    test_parallel_matches_sequential()
+    test_text_and_structure_share_one_pass()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
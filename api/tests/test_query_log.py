@@ -0,0 +1,293 @@
+# api/tests/test_query_log.py
+"""
+Tests for utils/query_log.py - slow-query log and index advisor.
+
+Covers SQL fingerprints, timing get_db() statements by fingerprint,
+EXPLAIN QUERY PLAN capture and full-scan flags for slow statements, the
+covering-index suggestions (equality / range / ORDER BY keys, prefix
+LIKE under NOCASE, existing indexes, rowid and BLOB columns), rebuilding
+a report from the log file, the /api/db/slow-queries endpoint and that
+migration 028's indexes serve the queries it was written for.
+"""
+
+import os
+import sqlite3
+import sys
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from flask import Flask
+
+from db_fixture import MigratedDB
+from routes.system_api import system_bp
+from utils import db, metrics, query_log
+
+
+# Advisor fixtures: a file_id lookup with no index, an ORDER BY the index
+# doesn't cover, and a mime_type index LIKE can't use
+SCHEMA = """
+CREATE TABLE file_text_cache (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_id INTEGER NOT NULL,
+    text TEXT,
+    parser TEXT
+);
+CREATE TABLE tasks (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    status TEXT,
+    title TEXT,
+    created_at TEXT,
+    embedding BLOB
+);
+CREATE INDEX idx_tasks_user ON tasks(user_id);
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    filename TEXT,
+    mime_type TEXT
+);
+CREATE INDEX idx_files_mime ON files(mime_type);
+"""
+
+
+def seed_file_text(conn):
+    conn.executemany(
+        "INSERT INTO file_text_cache (file_id, text, parser) VALUES (?, ?, 'text')",
+        [(i, "word " * 200) for i in range(200)],
+    )
+
+
+def advisor_db():
+    """In-memory database with SCHEMA and some rows."""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    seed_file_text(conn)
+    conn.executemany(
+        "INSERT INTO tasks (user_id, status, title, created_at) VALUES (?, 'open', ?, ?)",
+        [(i % 5, f"t{i}", f"2026-01-{i % 28 + 1:02d}") for i in range(200)],
+    )
+    conn.executemany(
+        "INSERT INTO files (filename, mime_type) VALUES (?, ?)",
+        [(f"f{i}.pdf", "application/pdf") for i in range(100)],
+    )
+    conn.commit()
+    return conn
+
+
+def unindexed_file_text():
+    """Seed the migrated database's file text cache without 028's file_id index."""
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.execute("DROP INDEX idx_file_text_cache_file")
+    seed_file_text(conn)
+    conn.commit()
+    conn.close()
+
+
+def test_fingerprint():
+    """Test literals, parameters, IN lists and whitespace normalize away."""
+    print("\n=== Testing fingerprints ===")
+    a = "SELECT * FROM t WHERE a = 'x''y' AND b IN (1, 2, 3)  -- note\n AND c > -3.5 LIMIT 10"
+    b = "select * FROM t WHERE a = :name AND b IN (?, ?) AND c > ? LIMIT ?"
+    assert query_log.normalize_sql(a) == "SELECT * FROM t WHERE a = ? AND b IN (...) AND c > ? LIMIT ?"
+    assert query_log.fingerprint(a) != query_log.fingerprint(b)  # keyword case is kept
+    assert query_log.fingerprint(a) == query_log.fingerprint(b.replace("select", "SELECT"))
+    assert query_log.normalize_sql("SELECT col1, t2.x FROM t2") == "SELECT col1, t2.x FROM t2"
+    assert query_log.normalize_sql(
+        "INSERT INTO t VALUES (1, 'a'), (2, 'b'), (3, 'c')"
+    ) == "INSERT INTO t VALUES (?, ?), ..."
+    print("✓ literals, named params, IN lists, multi-row VALUES, identifiers kept")
+
+
+def test_log_through_get_db():
+    """Test statements are grouped by fingerprint and slow ones explained."""
+    print("\n=== Testing slow-query capture ===")
+    with MigratedDB() as env:
+        unindexed_file_text()
+        log_file = os.path.join(env.tmp, "slow.jsonl")
+        log = query_log.enable(threshold_ms=0, log_file=log_file)
+        try:
+            conn = db.get_db()
+            assert isinstance(conn, metrics.TimedConnection)
+            for file_id in (3, 7, 11):
+                row = conn.execute(
+                    "SELECT text FROM file_text_cache WHERE file_id = ?", (file_id,)
+                ).fetchone()
+                assert row["text"].startswith("word")
+            conn.execute("SELECT id FROM projects WHERE id = 5").fetchall()
+            conn.close()
+
+            report = {r["sql"]: r for r in log.report()}
+            lookup = report["SELECT text FROM file_text_cache WHERE file_id = ?"]
+            assert lookup["count"] == 3 and lookup["slow_count"] == 3
+            assert lookup["plan"] == ["SCAN file_text_cache"]
+            assert lookup["full_scans"] == ["file_text_cache"]
+            assert lookup["suggestions"] == [
+                "CREATE INDEX IF NOT EXISTS idx_file_text_cache_file_id ON file_text_cache(file_id);"
+            ]
+            by_id = report["SELECT id FROM projects WHERE id = ?"]
+            assert by_id["full_scans"] == [] and by_id["suggestions"] == []
+            # The advisor's own EXPLAIN / PRAGMA statements aren't logged
+            assert not any("EXPLAIN" in sql or "PRAGMA" in sql for sql in report)
+            print("✓ grouped by fingerprint, full scan flagged, index suggested")
+
+            recommended = log.recommended_indexes()
+            assert [r["sql"] for r in recommended] == lookup["suggestions"]
+            assert "Recommended indexes:" in query_log.format_report(log)
+            print("✓ recommendations merged and reported")
+
+            with open(log_file) as f:
+                assert len(f.readlines()) == 4
+            rebuilt = query_log.QueryLog.from_file(log_file)
+            assert {r["fingerprint"] for r in rebuilt.report()} == {r["fingerprint"] for r in log.report()}
+
+            conn = sqlite3.connect(db.DB_PATH)
+            conn.execute("CREATE INDEX idx_ftc_file ON file_text_cache(file_id)")
+            conn.commit()
+            reexplained = query_log.QueryLog.from_file(log_file, conn)
+            conn.close()
+            assert reexplained.recommended_indexes() == []
+            print("✓ log file rebuilt, re-explained against the current schema")
+        finally:
+            query_log.disable()
+
+        if not metrics.METRICS_ENABLED:
+            conn = db.get_db()
+            assert type(conn) is sqlite3.Connection
+            conn.close()
+            print("✓ plain connections again once disabled")
+
+
+def test_suggestions():
+    """Test key order, covering columns, LIKE handling and existing indexes."""
+    print("\n=== Testing index suggestions ===")
+    conn = advisor_db()
+
+    def advise(sql, params=()):
+        plan = query_log.explain(conn, sql, params)
+        return query_log.suggest_indexes(conn, sql, plan, params)
+
+    # Index found the user's rows, but they still get sorted
+    suggestions, notes = advise(
+        "SELECT id, status FROM tasks WHERE user_id = ? ORDER BY created_at DESC LIMIT ?", (1, 5)
+    )
+    assert suggestions == [
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_id_created_at ON tasks(user_id, created_at, status);"
+    ], suggestions
+    assert "temp B-tree for ORDER BY" in notes
+    print("✓ equality then ORDER BY key, narrow selected column covered")
+
+    # Wide text, BLOBs and the rowid are never copied into an index;
+    # without text the index can't cover the query, so it stays a key
+    suggestions, _ = advise("SELECT id, text, parser FROM file_text_cache WHERE file_id = ?", (1,))
+    assert suggestions == [
+        "CREATE INDEX IF NOT EXISTS idx_file_text_cache_file_id ON file_text_cache(file_id);"
+    ], suggestions
+    assert advise("SELECT embedding FROM tasks WHERE embedding IS ?", (None,))[0] == []
+    assert advise("SELECT * FROM tasks ORDER BY id")[0] == []
+    print("✓ rowid, BLOB and wide columns left out")
+
+    # LIKE is case-insensitive: a prefix needs a NOCASE index
+    suggestions, notes = advise("SELECT id FROM files WHERE mime_type LIKE ?", ("application/%",))
+    assert suggestions == [
+        "CREATE INDEX IF NOT EXISTS idx_files_mime_type_nocase ON files(mime_type COLLATE NOCASE);"
+    ], suggestions
+    suggestions, notes = advise("SELECT id FROM files WHERE filename LIKE ?", ("%report%",))
+    assert suggestions == [] and "FTS5" in notes[0]
+    print("✓ bound prefix LIKE -> NOCASE index, leading wildcard -> FTS note")
+
+    conn.execute("CREATE INDEX idx_files_mime_nocase ON files(mime_type COLLATE NOCASE)")
+    assert advise("SELECT id FROM files WHERE mime_type LIKE ?", ("application/%",)) == ([], [])
+    suggestions, notes = advise("SELECT id FROM files WHERE filename = ?", ("b",))
+    assert suggestions == [
+        "CREATE INDEX IF NOT EXISTS idx_files_filename ON files(filename);"
+    ], suggestions
+    # An existing index the planner skipped is reported, not suggested again
+    conn.execute("CREATE INDEX idx_files_filename ON files(filename)")
+    suggestions, notes = advise("SELECT id FROM files NOT INDEXED WHERE filename = ?", ("b",))
+    assert suggestions == [] and "exists but wasn't used" in notes[0], notes
+    print("✓ existing indexes respected")
+
+    # Join: suggestion for the scanned side, keyed on the join column
+    conn.execute("DROP INDEX idx_tasks_user")
+    suggestions, _ = advise(
+        "SELECT f.filename, t.title FROM files f JOIN tasks t ON t.user_id = f.id WHERE f.mime_type = ?",
+        ("application/pdf",),
+    )
+    assert any("ON tasks(user_id" in s for s in suggestions), suggestions
+    print("✓ join column keys the inner table")
+    conn.close()
+
+
+def test_endpoint():
+    """Test /api/db/slow-queries reports the active log."""
+    print("\n=== Testing /api/db/slow-queries ===")
+    app = Flask(__name__)
+    app.register_blueprint(system_bp)
+    client = app.test_client()
+
+    query_log.disable()
+    assert client.get("/api/db/slow-queries").get_json()["enabled"] is False
+
+    with MigratedDB():
+        unindexed_file_text()
+        query_log.enable(threshold_ms=0, log_file="")
+        try:
+            conn = db.get_db()
+            conn.execute("SELECT text FROM file_text_cache WHERE file_id = ?", (1,)).fetchall()
+            conn.close()
+            body = client.get("/api/db/slow-queries").get_json()
+            assert body["enabled"] and body["threshold_ms"] == 0
+            assert body["queries"][0]["full_scans"] == ["file_text_cache"]
+            assert len(body["recommended_indexes"]) == 1
+            assert client.post("/api/db/slow-queries/reset").get_json() == {"reset": True}
+            assert client.get("/api/db/slow-queries").get_json()["queries"] == []
+            print("✓ report, recommendations and reset")
+        finally:
+            query_log.disable()
+
+
+def test_migration_028():
+    """Test the advisor's recommendations from migration 028 are used."""
+    print("\n=== Testing migration 028 ===")
+    hot = {
+        "SELECT text, meta_json, parser FROM file_text_cache WHERE file_id = ?":
+            ((1,), "idx_file_text_cache_file"),
+        "SELECT id, title, status FROM detected_tasks WHERE user_id = ? "
+        "AND status NOT IN ('completed', 'cancelled') ORDER BY created_at DESC LIMIT ?":
+            ((1, 10), "idx_detected_tasks_user_created"),
+        "SELECT COUNT(*) FROM library_files WHERE mime_type LIKE ?":
+            (("audio%",), "idx_library_files_mime_nocase"),
+    }
+    with MigratedDB():
+        conn = db.get_db()
+        for sql, (params, index) in hot.items():
+            plan = query_log.explain(conn, sql, params)
+            assert any(index in line for line in plan), (sql, plan)
+            problems = query_log.analyze_plan(plan)
+            assert not problems["full_scans"] and not problems["temp_btree"], plan
+            assert query_log.suggest_indexes(conn, sql, plan, params)[0] == []
+        conn.close()
+    print("✓ file text, task list and mime filter use 028's indexes")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Query Log Test Suite")
+    print("=" * 60)
+
+    test_fingerprint()
+    test_log_through_get_db()
+    test_suggestions()
+    test_endpoint()
+    test_migration_028()
+
+    print("\n" + "=" * 60)
+    print("All tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
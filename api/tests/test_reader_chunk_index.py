@@ -0,0 +1,162 @@
+# api/tests/test_reader_chunk_index.py
+"""
+Tests for services/reader_chunk_index.py - precomputed TTS chunk boundaries.
+
+Checks that the index reproduces tts_service.chunk_text() exactly (offsets,
+text and which chunk a position falls in), that playback-time lookup walks
+the estimated durations, and that indexes persist per content hash.
+"""
+
+import os
+import random
+import sys
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from db_fixture import MigratedDB
+from services import reader_chunk_index as rci
+from services.tts_service import chunk_text, estimate_duration
+from utils import db
+
+SENTENCES = [
+    "In the beginning was the Word.",
+    "And the Word was with God!",
+    "Who is like you?",
+    "The light shines in the darkness, and the darkness has not overcome it.",
+    "Mr. Smith went to Jerusalem.",
+    "No punctuation here",
+]
+
+
+def random_text(rng, sentences=300):
+    """Prose with single spaces, newlines and paragraph breaks between sentences."""
+    parts = ["  \n"]
+    for _ in range(sentences):
+        parts.append(rng.choice(SENTENCES))
+        parts.append(rng.choice([" ", " ", " ", "\n", "\n\n", "  "]))
+    return "".join(parts)
+
+
+def old_lookup(chunks, position):
+    """reader_service.get_chunk_for_position before the index."""
+    for chunk in chunks:
+        if chunk["start_char"] <= position < chunk["end_char"]:
+            return chunk
+    return None
+
+
+def test_boundaries_match_chunker():
+    """Test offsets, text and position lookup equal chunk_text()."""
+    print("\n=== Testing boundary equality ===")
+    rng = random.Random(37)
+
+    for trial in range(20):
+        text = random_text(rng)
+        for chunk_size, respect in ((1000, True), (120, True), (500, False)):
+            chunks = chunk_text(text, chunk_size, respect_sentences=respect)
+            index = rci.build_chunk_index(text, chunk_size, respect)
+
+            assert len(index) == len(chunks)
+            for i, chunk in enumerate(chunks):
+                got = index.chunk(i, text)
+                assert (got["start_char"], got["end_char"], got["text"]) == (
+                    chunk["start_char"], chunk["end_char"], chunk["text"]
+                ), (trial, chunk_size, i)
+
+            end = max(c["end_char"] for c in chunks) + 5
+            for position in range(-1, end, 7):
+                expected = old_lookup(chunks, position)
+                i = index.find_by_char(position)
+                assert (i is None) == (expected is None), (trial, chunk_size, position)
+                if expected is not None:
+                    assert i == expected["index"]
+
+    print("✓ 60 texts: offsets, text and lookups identical")
+
+    assert len(rci.build_chunk_index("   ")) == 0
+    assert rci.build_chunk_index("").find_by_char(0) is None
+    print("✓ empty text")
+
+
+def test_sentence_index_and_timing():
+    """Test sentence indexes and playback-time lookup."""
+    print("\n=== Testing sentence index and timing ===")
+    text = " ".join(f"Sentence number {n} is here." for n in range(100))
+    index = rci.build_chunk_index(text, chunk_size=100)
+
+    per_chunk = [len(c["text"]) for c in chunk_text(text, 100)]
+    first = [index.chunk(i, text)["sentence_index"] for i in range(len(index))]
+    assert first[0] == 0 and first == sorted(first) and len(set(first)) == len(first)
+    chunk = index.chunk(5, text)
+    assert chunk["text"].startswith(f"Sentence number {chunk['sentence_index']} ")
+    print("✓ sentence_index is each chunk's first sentence")
+
+    assert abs(index.total_seconds - estimate_duration(sum(per_chunk))) < 1e-6
+    assert index.find_by_seconds(0) == 0
+    for i in range(len(index)):
+        start = index.start_seconds[i]
+        assert index.find_by_seconds(start + 0.01) == i
+        # At 2x speed the same chunk starts at half the elapsed time
+        assert index.find_by_seconds(start / 2 + 0.01, speed=2.0) == i
+    assert index.find_by_seconds(index.total_seconds + 1) is None
+    assert index.find_by_seconds(-1) is None
+    print("✓ seconds -> chunk, scaled by speed")
+
+
+def test_persisted_per_content_hash():
+    """Test indexes are stored, reloaded, and rebuilt when the text changes."""
+    print("\n=== Testing persistence ===")
+    with MigratedDB():
+        rci._cache.clear()
+
+        try:
+            text = random_text(random.Random(1))
+            built = rci.get_chunk_index("library", 7, text)
+
+            rci._cache.clear()
+            loaded = rci.get_chunk_index("library", 7, text)
+            assert loaded is not built
+            assert (loaded.starts, loaded.ends, loaded.span_starts, loaded.sentence_indexes) == (
+                built.starts, built.ends, built.span_starts, built.sentence_indexes
+            )
+            assert rci.get_chunk_index("library", 7, text) is loaded
+            print("✓ stored, reloaded from the table, then served from memory")
+
+            edited = text + " A new closing sentence."
+            rebuilt = rci.get_chunk_index("library", 7, edited)
+            assert rebuilt.content_hash != built.content_hash
+            assert rebuilt.chunk(len(rebuilt) - 1, edited)["text"].endswith("A new closing sentence.")
+
+            conn = db.get_db()
+            headers = conn.execute("SELECT content_hash, chunk_count FROM reader_chunk_indexes").fetchall()
+            boundaries = conn.execute("SELECT COUNT(*) FROM reader_chunk_boundaries").fetchone()[0]
+            conn.close()
+            assert [tuple(h) for h in headers] == [(rebuilt.content_hash, len(rebuilt))]
+            assert boundaries == len(rebuilt)
+            print("✓ edited text replaces the stored index")
+
+            assert rci.invalidate_chunk_index("library", 7) == 1
+            assert not rci._cache
+        finally:
+            rci._cache.clear()
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Reader Chunk Index Test Suite")
+    print("=" * 60)
+
+    test_boundaries_match_chunker()
+    test_sentence_index_and_timing()
+    test_persisted_per_content_hash()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
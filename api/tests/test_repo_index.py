@@ -0,0 +1,229 @@
+# api/tests/test_repo_index.py
+"""
+Tests for services/agents/repo_index.py - the Code Agent's repository index.
+
+Checks search results against a brute-force scan of the tree (literal,
+case-insensitive and regex queries), .gitignore handling, incremental
+updates through write_file / patch_file, and that stat sweeps pick up
+files changed behind the index's back.
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.agents import repo_index
+from services.agents.code_tools import (
+    PathSandbox,
+    tool_list_directory,
+    tool_patch_file,
+    tool_run_command,
+    tool_search_code,
+    tool_write_file,
+)
+from services.agents.repo_index import RepoIndex, _required_literals
+
+WORDS = ["def", "class", "return", "import", "Widget", "widget", "parse_args",
+         "self", "value", "TODO", "x = 1", "café", "naïve", "(", ")", ":"]
+
+
+def brute_force(root, query, regex=False, case_sensitive=True):
+    """Every (path, line_number) matching, by reading every file."""
+    flags = 0 if case_sensitive else re.IGNORECASE
+    pattern = re.compile(query if regex else re.escape(query), flags)
+    found = set()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for i, line in enumerate(f.read().split("\n"), 1):
+                    if pattern.search(line):
+                        found.add((rel, i))
+    return found
+
+
+def make_tree(root, rng, files=120):
+    for i in range(files):
+        rel = f"pkg{i % 7}/mod{i % 3}/file_{i}.py"
+        os.makedirs(os.path.join(root, os.path.dirname(rel)), exist_ok=True)
+        lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))
+                 for _ in range(rng.randint(0, 30))]
+        with open(os.path.join(root, rel), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+
+def test_search_matches_brute_force():
+    """Test indexed search returns exactly what scanning every file does."""
+    print("\n=== Testing search against brute force ===")
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        make_tree(tmpdir, rng)
+        index = RepoIndex(tmpdir)
+
+        cases = [
+            ("Widget", False, True),
+            ("widget", False, False),
+            ("parse_args", False, True),
+            ("x = 1", False, True),
+            ("café", False, True),
+            ("NAÏVE", False, False),
+            ("ab", False, True),
+            (r"def\s+\w+\(", True, True),
+            (r"Widget|TODO", True, True),
+            (r"(?i)class widget", True, True),
+            (r"ret(urn)+ self", True, True),
+        ]
+        for query, regex, case_sensitive in cases:
+            matches, _ = index.search(query, regex=regex, case_sensitive=case_sensitive,
+                                      max_results=100000)
+            got = {(rel, line_no) for rel, line_no, _ in matches}
+            assert got == brute_force(tmpdir, query, regex, case_sensitive), query
+        print(f"✓ {len(cases)} queries match a full scan")
+
+        matches, searched = index.search("parse_args")
+        assert searched < index.stats()["indexed_files"]
+        print("✓ literal search reads only candidate files")
+
+
+def test_required_literals():
+    """Test regex literal extraction stays conservative."""
+    print("\n=== Testing required literals ===")
+    assert _required_literals(r"def\s+main")[0] == ["def", "main"]
+    assert _required_literals(r"foo|bar")[0] == []
+    assert _required_literals(r"colou?r")[0] == ["colo", "r"]
+    assert _required_literals(r"(ab)+cd")[0] == ["ab", "cd"]
+    assert _required_literals(r"[")[0] == []
+    print("✓ literals, alternation, optional and repeated groups")
+
+
+def test_gitignore():
+    """Test .gitignore rules hide files from listing and search."""
+    print("\n=== Testing .gitignore ===")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / ".gitignore").write_text("*.log\n/out/\nsecret*\n!secret_ok.txt\n")
+        (root / "src").mkdir()
+        (root / "src/app.py").write_text("needle\n")
+        (root / "src/debug.log").write_text("needle\n")
+        (root / "src/out").mkdir()
+        (root / "src/out/keep.py").write_text("needle\n")
+        (root / "out").mkdir()
+        (root / "out/gen.py").write_text("needle\n")
+        (root / "secret.txt").write_text("needle\n")
+        (root / "secret_ok.txt").write_text("needle\n")
+
+        index = RepoIndex(tmpdir)
+        matches, _ = index.search("needle")
+        assert {rel for rel, _, _ in matches} == {"src/app.py", "src/out/keep.py", "secret_ok.txt"}
+        listing = "\n".join(index.listing("", max_depth=3))
+        assert "debug.log" not in listing and "gen.py" not in listing
+        print("✓ globs, anchored dirs and negation")
+
+        # Editing .gitignore rebuilds on the next sweep
+        (root / ".gitignore").write_text("*.log\n")
+        index.mark_stale()
+        matches, _ = index.search("needle")
+        assert "out/gen.py" in {rel for rel, _, _ in matches}
+        print("✓ changed .gitignore is picked up")
+
+
+def test_tool_updates():
+    """Test write_file / patch_file update the index without a sweep."""
+    print("\n=== Testing incremental updates ===")
+    saved = repo_index.REPO_INDEX_SWEEP_SECONDS
+    repo_index.REPO_INDEX_SWEEP_SECONDS = 3600
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sandbox = PathSandbox(tmpdir)
+            (Path(tmpdir) / "a.py").write_text("alpha = 1\n")
+            assert "a.py:1: alpha = 1" in tool_search_code("alpha", sandbox)
+
+            tool_write_file("new/dir/b.py", "beta_value = 2\n", sandbox)
+            assert "new/dir/b.py:1:" in tool_search_code("beta_value", sandbox)
+            assert "b.py" in tool_list_directory("new", sandbox)
+            print("✓ write_file: new file and directories indexed")
+
+            tool_patch_file("a.py", "alpha", "gamma", sandbox)
+            assert tool_search_code("alpha", sandbox).startswith("No matches")
+            assert "a.py:1: gamma = 1" in tool_search_code("gamma", sandbox)
+            print("✓ patch_file: content re-indexed")
+
+            tool_run_command("echo 'delta_word' > c.txt && rm new/dir/b.py", tmpdir)
+            assert "c.txt:1: delta_word" in tool_search_code("delta_word", sandbox)
+            assert tool_search_code("beta_value", sandbox).startswith("No matches")
+            print("✓ run_command: changes found by the next sweep")
+
+            assert "ERROR" in tool_search_code("(", sandbox, regex=True)
+            assert "ERROR" in tool_search_code("x", sandbox, path="/")
+            print("✓ bad regex and paths outside the sandbox rejected")
+    finally:
+        repo_index.REPO_INDEX_SWEEP_SECONDS = saved
+
+
+def test_sweep_after_external_change():
+    """Test a timed sweep catches edits, deletes and new files."""
+    print("\n=== Testing stat sweep ===")
+    saved = repo_index.REPO_INDEX_SWEEP_SECONDS
+    repo_index.REPO_INDEX_SWEEP_SECONDS = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "pkg").mkdir()
+            (root / "pkg/one.py").write_text("first\n")
+            (root / "pkg/two.py").write_text("second\n")
+            index = RepoIndex(tmpdir)
+            index.ensure_fresh()
+
+            (root / "pkg/one.py").write_text("first edited and longer\n")
+            (root / "pkg/two.py").unlink()
+            (root / "pkg/sub").mkdir()
+            (root / "pkg/sub/three.py").write_text("third\n")
+
+            assert [m[0] for m in index.search("edited")[0]] == ["pkg/one.py"]
+            assert index.search("second")[0] == []
+            assert [m[0] for m in index.search("third")[0]] == ["pkg/sub/three.py"]
+            assert index.listing("pkg") == ["sub/", "  three.py", "one.py"]
+            print("✓ edits, deletes and new directories")
+
+            # Many changes spill the delta into the postings arrays
+            for i in range(30):
+                (root / f"pkg/gen_{i}.py").write_text(f"token_{i}\n")
+            saved_delta = repo_index.REPO_INDEX_DELTA_FILES
+            repo_index.REPO_INDEX_DELTA_FILES = 5
+            try:
+                assert [m[0] for m in index.search("token_17")[0]] == ["pkg/gen_17.py"]
+            finally:
+                repo_index.REPO_INDEX_DELTA_FILES = saved_delta
+            assert index.stats()["delta_files"] == 0
+            print("✓ delta compaction")
+    finally:
+        repo_index.REPO_INDEX_SWEEP_SECONDS = saved
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Repository Index Test Suite")
+    print("=" * 60)
+
+    test_search_matches_brute_force()
+    test_required_literals()
+    test_gitignore()
+    test_tool_updates()
+    test_sweep_after_external_change()
+
+    print("\n" + "=" * 60)
+    print("All tests passed!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
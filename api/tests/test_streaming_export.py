@@ -0,0 +1,229 @@
+# api/tests/test_streaming_export.py
+"""
+Tests for the streaming ZIP and JSON exporters (plugins/exporters).
+
+Exports a generated project with the streaming exporters and with the
+copies of the previous exporters in benchmarks/bench_export.py. Covers
+the JSON document being byte-identical, ZIP entries and manifest being
+identical, stream and export_project() file being the same bytes,
+per-MIME compression, paged row order, and peak memory not growing with
+the size of the project.
+"""
+
+import io
+import json
+import os
+import sys
+import tracemalloc
+import zipfile
+from datetime import datetime, timezone
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from benchmarks.bench_export import legacy_json_export, legacy_zip_export, populate_project
+from db_fixture import MigratedDB
+from plugins.exporters import json_export, streaming, zip_download
+from plugins.exporters.json_export import JsonExporter
+from plugins.exporters.streaming import compress_type_for, iter_json_document, iter_rows_by_created_at
+from plugins.exporters.zip_download import ZipDownloadExporter
+from utils import db
+
+FROZEN = datetime(2025, 6, 1, 12, 30, 0, tzinfo=timezone.utc)
+
+
+class Env:
+    """Temp project (text files, JPEGs, transcripts) with a frozen export clock."""
+
+    def __init__(self, n_files=8, file_bytes=40_000):
+        self.n_files = n_files
+        self.file_bytes = file_bytes
+
+    def __enter__(self):
+        self.db = MigratedDB(project="Field Notes")
+        self._saved = (zip_download._now, json_export._now, os.environ.get("TAMOR_UPLOAD_ROOT"))
+        self.project_id = self.db.project_id
+        self.uploads = os.path.join(self.db.tmp, "uploads")
+        populate_project(self.project_id, self.uploads, self.n_files, self.file_bytes)
+        os.environ["TAMOR_UPLOAD_ROOT"] = self.uploads
+        zip_download._now = json_export._now = lambda: FROZEN
+        self.out = os.path.join(self.db.tmp, "out")
+        os.makedirs(self.out)
+        return self
+
+    def stream(self, exporter, config=None):
+        result = exporter.stream_project(self.project_id, 1, config or {})
+        assert result.success and result.export_path is None
+        return result, b"".join(result.chunks)
+
+    def __exit__(self, *exc):
+        zip_download._now, json_export._now, upload_root = self._saved
+        if upload_root is None:
+            os.environ.pop("TAMOR_UPLOAD_ROOT", None)
+        else:
+            os.environ["TAMOR_UPLOAD_ROOT"] = upload_root
+        self.db.close()
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_json_document():
+    """Test iter_json_document() matches json.dumps(indent=2)."""
+    print("\n=== Testing incremental JSON ===")
+    docs = [
+        ({"a": 1, "items": [], "b": {}}, ["items"]),
+        ({"items": [{"x": [1, {"y": "é\n"}]}, [], "s", None], "nested": {"k": [1, 2]}}, ["items"]),
+        ({"files": [{"deep": {"deeper": ["v"]}}], "t": []}, ["files", "t"]),
+        ({}, []),
+    ]
+    for doc, streamed in docs:
+        members = [(k, iter(v) if k in streamed else v) for k, v in doc.items()]
+        assert "".join(iter_json_document(members)) == json.dumps(doc, indent=2, ensure_ascii=False)
+    print(f"✓ {len(docs)} documents identical to json.dumps")
+
+
+def test_json_export_identical():
+    """Test the streamed JSON export is byte-identical to the previous exporter."""
+    print("\n=== Testing JSON export ===")
+    with Env() as env:
+        legacy = read(legacy_json_export(env.project_id, 1, {}, env.out))
+        result, streamed = env.stream(JsonExporter())
+        assert streamed == legacy
+        assert result.metadata == {"project_name": "Field Notes", "total_files": 8, "total_transcripts": 3}
+        doc = json.loads(streamed)
+        assert doc["project"]["notes"] == "Notes — café"
+        assert doc["files"][0]["insights"] == {"themes": ["alpha"], "summary": "File 0 ✓"}
+        assert doc["transcripts"][0]["segments"][0]["text"] == "hello"
+        print(f"✓ {len(streamed)} bytes identical, notes / insights / transcripts included")
+
+        config = {"include_file_text": False, "include_insights": False,
+                  "include_transcripts": False, "include_notes": False}
+        legacy = read(legacy_json_export(env.project_id, 1, config, env.out))
+        assert env.stream(JsonExporter(), config)[1] == legacy
+        assert json.loads(legacy)["transcripts"] == []
+
+        exported = JsonExporter().export_project(env.project_id, 1, {})
+        assert read(exported.export_path) == streamed and exported.size_bytes == len(streamed)
+        assert exported.filename == "Field Notes-export-20250601_123000.json"
+        assert exported.metadata["total_files"] == 8
+        print("✓ export_project() writes the same bytes")
+
+        assert not JsonExporter().stream_project(env.project_id, 2, {}).success
+
+
+def test_zip_export_identical():
+    """Test streamed ZIP entries match the previous exporter's archive."""
+    print("\n=== Testing ZIP export ===")
+    with Env() as env:
+        config = {"include_text_cache": True}
+        legacy = zipfile.ZipFile(legacy_zip_export(env.project_id, 1, config, env.uploads, env.out))
+        result, streamed = env.stream(ZipDownloadExporter(), config)
+        archive = zipfile.ZipFile(io.BytesIO(streamed))
+        assert archive.testzip() is None
+
+        names = archive.namelist()
+        assert names == legacy.namelist()
+        assert names[-1] == "Field Notes-export/manifest.json"
+        for name in names:
+            assert archive.read(name) == legacy.read(name), name
+        for info in archive.infolist():
+            if "/files/" in info.filename:
+                assert info.date_time == legacy.getinfo(info.filename).date_time
+        assert result.metadata["total_files"] == 8 and result.metadata["total_transcripts"] == 3
+        print(f"✓ {len(names)} entries identical to the previous archive, manifest last")
+
+        kinds = {i.filename.rsplit(".", 1)[-1]: i.compress_type for i in archive.infolist() if "/files/" in i.filename}
+        assert kinds == {"txt": zipfile.ZIP_DEFLATED, "jpg": zipfile.ZIP_STORED}
+        assert compress_type_for(None, "scan.png") == zipfile.ZIP_STORED
+        assert compress_type_for("image/svg+xml") == compress_type_for("application/pdf") == zipfile.ZIP_DEFLATED
+        assert compress_type_for("application/zip; charset=binary") == zipfile.ZIP_STORED
+        print("✓ JPEGs stored, text deflated")
+
+        exported = ZipDownloadExporter().export_project(env.project_id, 1, config)
+        assert read(exported.export_path) == streamed
+        assert exported.filename == "Field Notes-export-20250601_123000.zip"
+        print("✓ export_project() writes the same bytes")
+
+
+def test_paged_rows():
+    """Test paging keeps ORDER BY created_at order, ties and NULLs included."""
+    print("\n=== Testing paged rows ===")
+    with Env(n_files=11) as env:
+        conn = db.get_db()
+        conn.execute("UPDATE project_files SET created_at = NULL WHERE id IN (4, 9)")
+        conn.commit()
+        expected = [r["id"] for r in conn.execute(
+            "SELECT id FROM project_files WHERE project_id = ? ORDER BY created_at, id", (env.project_id,)
+        )]
+        conn.close()
+        sql = "SELECT id, created_at FROM project_files WHERE project_id = ?"
+        for page_size in (1, 2, 3, 500):
+            got = [r["id"] for r in iter_rows_by_created_at(sql, (env.project_id,), page_size)]
+            assert got == expected, (page_size, got)
+        print("✓ pages of 1, 2, 3 and 500 give the same order")
+
+
+def mb(n):
+    return f"{n / 2**20:.1f} MB"
+
+
+def peak_bytes(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_bounded_memory():
+    """Test peak memory of streaming does not grow with the project size."""
+    print("\n=== Testing peak memory ===")
+    peaks = {}
+    saved = streaming.EXPORT_PAGE_SIZE
+    streaming.EXPORT_PAGE_SIZE = 10
+    try:
+        for n_files in (8, 40):
+            with Env(n_files=n_files, file_bytes=200_000) as env:
+                def drain(exporter, config):
+                    for _ in exporter.stream_project(env.project_id, 1, config).chunks:
+                        pass
+                peaks[n_files] = (
+                    peak_bytes(lambda: drain(ZipDownloadExporter(), {"include_text_cache": True})),
+                    peak_bytes(lambda: drain(JsonExporter(), {})),
+                    peak_bytes(lambda: legacy_json_export(env.project_id, 1, {}, env.out)),
+                )
+    finally:
+        streaming.EXPORT_PAGE_SIZE = saved
+
+    (zip_small, json_small, legacy_small), (zip_big, json_big, legacy_big) = peaks[8], peaks[40]
+    assert zip_big < 1.5 * zip_small + 256 * 1024 and zip_big < 4 * 2**20
+    assert json_big < 1.5 * json_small + 256 * 1024
+    assert legacy_big > 2 * legacy_small
+    print(f"✓ ZIP peak {mb(zip_small)} -> {mb(zip_big)}, JSON peak {mb(json_small)} -> {mb(json_big)} "
+          f"for 5x the files (previous JSON exporter {mb(legacy_small)} -> {mb(legacy_big)})")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Streaming Export Test Suite")
+    print("=" * 60)
+
+    test_json_document()
+    test_json_export_identical()
+    test_zip_export_identical()
+    test_paged_rows()
+    test_bounded_memory()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
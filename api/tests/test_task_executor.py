@@ -0,0 +1,328 @@
+# api/tests/test_task_executor.py
+"""
+Tests for workers/task_executor.py - indexed due times and deadline wakeups.
+
+Runs the executor loop in a thread against a temporary database, with the
+chat reminder replaced by a recorder, and checks that tasks fire on time
+(never early, and within FIRE_TOLERANCE of their due time) and that
+notify_task_change() wakes a sleeping executor.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add api directory (and repo root, for api.routes imports) to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+sys.path.insert(1, os.path.dirname(API_DIR))
+
+from utils import db
+from utils.task_schedule import TaskWakeListener, notify_task_change, scheduled_for_key
+from workers import task_executor
+
+MIGRATIONS = os.path.join(API_DIR, "migrations")
+
+# Allowed lateness; the old poller could be up to 30 s late
+FIRE_TOLERANCE = 0.15
+
+
+class ExecutorHarness:
+    """Temp database plus an executor thread that records each reminder."""
+
+    def __init__(self, max_sleep=30.0, wake_socket=None):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "tasks.db")
+        self.wake_socket = wake_socket or os.path.join(self.tmp.name, "wake.sock")
+        self.max_sleep = max_sleep
+        self.fired = {}  # title -> fire time (epoch seconds)
+        self.stop = threading.Event()
+
+    def __enter__(self):
+        self._saved = (db.DB_PATH, os.environ.get("TASK_WAKE_SOCKET"), task_executor.insert_system_message)
+        db.DB_PATH = self.db_path
+        os.environ["TASK_WAKE_SOCKET"] = self.wake_socket
+
+        conn = db.get_db()
+        with open(os.path.join(MIGRATIONS, "000_baseline.sql")) as f:
+            conn.executescript(f.read())
+        conn.close()
+
+        def record(conversation_id, content):
+            self.fired[content.split(": ", 1)[1]] = time.time()
+
+        task_executor.insert_system_message = record
+        self.thread = threading.Thread(
+            target=task_executor.run_task_executor,
+            kwargs={"max_sleep": self.max_sleep, "stop": self.stop, "wake_socket": self.wake_socket},
+            daemon=True,
+        )
+        return self
+
+    def migrate(self):
+        conn = db.get_db()
+        with open(os.path.join(MIGRATIONS, "020_task_scheduled_for.sql")) as f:
+            conn.executescript(f.read())
+        conn.close()
+
+    def start(self):
+        self.thread.start()
+        time.sleep(0.1)  # Let it bind the socket and go to sleep
+
+    def add_task(self, title, due, recurrence=None, status="confirmed", column=True):
+        normalized = {"scheduled_for": due.isoformat()}
+        if recurrence:
+            normalized["recurrence"] = recurrence
+        conn = db.get_db()
+        if column:
+            cur = conn.execute(
+                """
+                INSERT INTO detected_tasks (user_id, conversation_id, task_type, title,
+                                            normalized_json, status, scheduled_for)
+                VALUES (1, 1, 'reminder', ?, ?, ?, ?)
+                """,
+                (title, json.dumps(normalized), status, scheduled_for_key(due)),
+            )
+        else:
+            cur = conn.execute(
+                """
+                INSERT INTO detected_tasks (user_id, conversation_id, task_type, title,
+                                            normalized_json, status)
+                VALUES (1, 1, 'reminder', ?, ?, ?)
+                """,
+                (title, json.dumps(normalized), status),
+            )
+        conn.commit()
+        conn.close()
+        return cur.lastrowid
+
+    def row(self, task_id):
+        conn = db.get_db()
+        row = conn.execute("SELECT * FROM detected_tasks WHERE id = ?", (task_id,)).fetchone()
+        conn.close()
+        return row
+
+    def wait_for(self, titles, timeout):
+        deadline = time.time() + timeout
+        while time.time() < deadline and not all(t in self.fired for t in titles):
+            time.sleep(0.01)
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        notify_task_change()
+        if self.thread.is_alive():
+            self.thread.join(timeout=5)
+        db.DB_PATH, wake, task_executor.insert_system_message = self._saved
+        if wake is None:
+            os.environ.pop("TASK_WAKE_SOCKET", None)
+        else:
+            os.environ["TASK_WAKE_SOCKET"] = wake
+        self.tmp.cleanup()
+
+
+def utc_in(seconds):
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+def test_scheduled_for_key():
+    """Test column keys sort chronologically across offsets."""
+    print("\n=== Testing scheduled_for_key ===")
+
+    assert scheduled_for_key("2026-01-01T10:00+02:00") == "2026-01-01 08:00:00.000"
+    assert scheduled_for_key("2026-01-01T10:00:00.123456Z") == "2026-01-01 10:00:00.123"
+    assert scheduled_for_key("2026-01-01T10:00:00") == "2026-01-01 10:00:00.000"
+    assert scheduled_for_key(None) is None
+    assert scheduled_for_key("") is None
+    assert scheduled_for_key("next tuesday") is None
+    assert scheduled_for_key("2026-01-01T09:30+00:00") > scheduled_for_key("2026-01-01T10:00+02:00")
+    print("✓ UTC normalization, bad values -> None")
+
+
+def test_migration_backfill_and_index():
+    """Test migration 020 backfills the column and the due query uses the index."""
+    print("\n=== Testing migration backfill ===")
+
+    with ExecutorHarness() as h:
+        conn = db.get_db()
+        conn.execute(
+            "INSERT INTO detected_tasks (user_id, title, normalized_json, status) VALUES "
+            "(1, 'a', '{\"scheduled_for\": \"2026-03-01T09:00+01:00\"}', 'confirmed'), "
+            "(1, 'b', '{\"scheduled_for\": \"\"}', 'confirmed'), "
+            "(1, 'c', '{}', 'confirmed'), "
+            "(1, 'd', 'not json', 'confirmed')"
+        )
+        conn.commit()
+        conn.close()
+        h.migrate()
+
+        conn = db.get_db()
+        rows = dict(conn.execute("SELECT title, scheduled_for FROM detected_tasks").fetchall())
+        assert rows == {"a": "2026-03-01 08:00:00.000", "b": None, "c": None, "d": None}, rows
+        print("✓ backfill matches scheduled_for_key")
+
+        plan = " ".join(
+            r[3] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM detected_tasks "
+                "WHERE status='confirmed' AND scheduled_for IS NOT NULL AND scheduled_for <= ? "
+                "ORDER BY scheduled_for, id LIMIT 10",
+                ("2026-03-02",),
+            )
+        )
+        conn.close()
+        assert "idx_detected_tasks_status_scheduled" in plan, plan
+        print("✓ due-task query searches (status, scheduled_for)")
+
+
+def test_firing_accuracy():
+    """Test tasks fire at their due time, not early and not a poll later."""
+    print("\n=== Testing firing accuracy ===")
+
+    with ExecutorHarness() as h:
+        h.migrate()
+        due = {f"t{i}": utc_in(0.3 + 0.25 * i) for i in range(6)}
+        for title, when in due.items():
+            h.add_task(title, when)
+        h.add_task("paused", utc_in(0.2), status="dismissed")
+        h.add_task("later", utc_in(60))
+        h.start()
+
+        h.wait_for(due, timeout=5)
+        for title, when in due.items():
+            assert title in h.fired, f"{title} never fired"
+            late = h.fired[title] - when.timestamp()
+            assert -0.002 <= late <= FIRE_TOLERANCE, f"{title} fired {late * 1000:.0f}ms off"
+        assert "paused" not in h.fired and "later" not in h.fired
+        worst = max(h.fired[t] - w.timestamp() for t, w in due.items())
+        print(f"✓ 6 tasks fired on time (worst {worst * 1000:.0f}ms late)")
+
+
+def test_recurring_reschedules_column():
+    """Test a recurring task moves both normalized_json and the column."""
+    print("\n=== Testing recurrence ===")
+
+    with ExecutorHarness() as h:
+        h.migrate()
+        when = utc_in(0.3)
+        task_id = h.add_task("daily", when, recurrence={"type": "daily"})
+        h.start()
+        h.wait_for(["daily"], timeout=3)
+
+        time.sleep(0.1)
+        row = h.row(task_id)
+        nxt = when + timedelta(days=1)
+        assert row["status"] == "confirmed"
+        assert row["scheduled_for"] == scheduled_for_key(nxt)
+        assert json.loads(row["normalized_json"])["scheduled_for"] == nxt.isoformat()
+        print("✓ next occurrence written to both")
+
+
+def test_wake_on_change():
+    """Test notify_task_change() wakes an idle executor for new and edited tasks."""
+    print("\n=== Testing wake notifications ===")
+
+    # max_sleep far beyond the test: only a notification can wake it in time
+    with ExecutorHarness(max_sleep=30.0) as h:
+        h.migrate()
+        moved = h.add_task("moved", utc_in(20))
+        h.start()
+
+        when = utc_in(0.4)
+        h.add_task("new", when)
+        notify_task_change()
+        h.wait_for(["new"], timeout=3)
+        assert "new" in h.fired
+        assert 0 <= h.fired["new"] - when.timestamp() <= FIRE_TOLERANCE
+        print("✓ new task picked up without polling")
+
+        when = utc_in(0.3)
+        conn = db.get_db()
+        conn.execute(
+            "UPDATE detected_tasks SET normalized_json = ?, scheduled_for = ? WHERE id = ?",
+            (json.dumps({"scheduled_for": when.isoformat()}), scheduled_for_key(when), moved),
+        )
+        conn.commit()
+        conn.close()
+        notify_task_change()
+        h.wait_for(["moved"], timeout=3)
+        assert "moved" in h.fired
+        assert 0 <= h.fired["moved"] - when.timestamp() <= FIRE_TOLERANCE
+        print("✓ edited due time picked up without polling")
+
+
+def test_unbindable_socket_polls():
+    """Test the executor falls back to max_sleep polling if the wake socket can't bind."""
+    print("\n=== Testing wake socket fallback ===")
+
+    missing = os.path.join(tempfile.gettempdir(), "no-such-dir", "wake.sock")
+    listener = TaskWakeListener(missing)
+    start = time.monotonic()
+    assert listener.wait(0.05) is False
+    assert time.monotonic() - start >= 0.05
+    listener.close()
+    print("✓ bind error leaves a sleeping listener")
+
+    with ExecutorHarness(max_sleep=0.3, wake_socket=missing) as h:
+        h.migrate()
+        h.start()
+        assert h.thread.is_alive()
+
+        # No notification can arrive; the next max_sleep reload finds it
+        when = utc_in(0.2)
+        h.add_task("polled", when)
+        h.wait_for(["polled"], timeout=3)
+        assert "polled" in h.fired
+        assert 0 <= h.fired["polled"] - when.timestamp() <= 0.3 + FIRE_TOLERANCE
+        print("✓ executor keeps running and picks up tasks by polling")
+
+
+def test_failed_run_is_deferred():
+    """Test a failing task is retried later instead of in a hot loop."""
+    print("\n=== Testing failure retry ===")
+
+    with ExecutorHarness() as h:
+        h.migrate()
+        calls = []
+
+        def boom(conversation_id, content):
+            calls.append(time.time())
+            raise RuntimeError("chat unavailable")
+
+        task_executor.insert_system_message = boom
+        when = utc_in(0.2)
+        task_id = h.add_task("flaky", when)
+        h.start()
+        time.sleep(1.0)
+
+        assert len(calls) == 1, f"expected one attempt, got {len(calls)}"
+        row = h.row(task_id)
+        assert row["status"] == "confirmed"
+        assert row["scheduled_for"] > scheduled_for_key(utc_in(task_executor.FAILED_RETRY_DELAY - 5))
+        assert json.loads(row["normalized_json"])["scheduled_for"] == when.isoformat()
+        print("✓ one attempt, retry pushed out, user's time kept")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Task Executor Test Suite")
+    print("=" * 60)
+
+    test_scheduled_for_key()
+    test_migration_backfill_and_index()
+    test_firing_accuracy()
+    test_recurring_reschedules_column()
+    test_wake_on_change()
+    test_unbindable_socket_polls()
+    test_failed_run_is_deferred()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
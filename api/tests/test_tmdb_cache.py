@@ -0,0 +1,228 @@
+# api/tests/test_tmdb_cache.py
+"""
+Tests for services/cache/tmdb_cache.py and concurrent playlist enrichment.
+
+Runs against a local stub of the TMDb search/detail endpoints, so no API
+key or network access is needed. Covers the one-time legacy JSON import,
+TTL refresh with stale fallback, ordered concurrent enrichment sharing
+the rate limiter, and the limiter itself.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+os.environ.setdefault("PERSONALITY_FILE", os.path.join(API_DIR, "config", "personality.json"))
+
+from db_fixture import MigratedDB
+from services import playlists, tmdb_service
+from services.cache.tmdb_cache import TMDbCache
+from utils import db
+
+
+class StubTMDb:
+    """/search/movie and /movie/<id> for movies named 'Movie <n>'."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.requests = []
+        self.missing = set()      # titles answered with 404
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                    stub.requests.append(self.path)
+                try:
+                    time.sleep(stub.delay)
+                    status, body = stub.respond(urlparse(self.path))
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def respond(self, url):
+        if url.path == "/search/movie":
+            title = parse_qs(url.query)["query"][0]
+            if title in self.missing:
+                return 404, {"status_message": "not found"}
+            n = int(title.split()[-1])
+            return 200, {"results": [{
+                "id": 1000 + n,
+                "title": title,
+                "release_date": f"{1950 + n}-12-01",
+                "overview": f"Overview {n}",
+                "poster_path": f"/poster{n}.jpg",
+            }]}
+        if url.path.startswith("/movie/"):
+            n = int(url.path.rsplit("/", 1)[1]) - 1000
+            return 200, {"external_ids": {"imdb_id": f"tt{n:07d}"}}
+        return 404, {}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Env:
+    """Temp database, legacy cache file, stub server and fast limiter."""
+
+    def __enter__(self):
+        self.db = MigratedDB()
+        self.stub = StubTMDb()
+        self._saved = (playlists.TMDB_CACHE_FILE, tmdb_service.TMDB_BASE_URL,
+                       tmdb_service.TMDB_API_KEY, tmdb_service._LIMITER, playlists.get_tmdb_cache)
+
+        self.cache = TMDbCache(ttl_days=30)
+        playlists.get_tmdb_cache = lambda: self.cache
+        playlists.TMDB_CACHE_FILE = os.path.join(self.db.tmp, "tmdb_cache.json")
+        tmdb_service.TMDB_BASE_URL = self.stub.url
+        tmdb_service.TMDB_API_KEY = "test-key"
+        tmdb_service._LIMITER = tmdb_service._RateLimiter(rate=500, burst=20)
+        return self
+
+    def __exit__(self, *exc):
+        (playlists.TMDB_CACHE_FILE, tmdb_service.TMDB_BASE_URL,
+         tmdb_service.TMDB_API_KEY, tmdb_service._LIMITER, playlists.get_tmdb_cache) = self._saved
+        self.stub.close()
+        self.db.close()
+
+
+def items(n):
+    return [{"name": f"Movie {i} ({1950 + i})", "type": "movie"} for i in range(n)]
+
+
+def test_legacy_import():
+    """Test the old JSON cache is imported once and then ignored."""
+    print("\n=== Testing legacy import ===")
+    with Env() as env:
+        legacy = {"tt0000001": {"tmdb_id": 1001, "imdb_id": "tt0000001", "title": "Movie 1", "year": "1951"}}
+        with open(playlists.TMDB_CACHE_FILE, "w") as f:
+            json.dump(legacy, f)
+
+        assert playlists._cache_get("tt0000001")["tmdb_id"] == 1001
+        assert env.cache.get_stats()["entries"] == 1
+
+        # Later edits to the file are not re-imported (the table is authoritative)
+        with open(playlists.TMDB_CACHE_FILE, "w") as f:
+            json.dump({"tt0000002": {"title": "Movie 2"}}, f)
+        assert env.cache.import_legacy([playlists.TMDB_CACHE_FILE]) == 0
+        assert TMDbCache().import_legacy([playlists.TMDB_CACHE_FILE]) == 0
+        assert playlists._cache_get("tt0000002") is None
+        print("✓ imported once, by path")
+
+        playlists._cache_set("tt0000001", {"title": "Changed"})
+        assert playlists._cache_get("tt0000001") == {"title": "Changed"}
+        assert env.stub.requests == []
+        print("✓ set replaces a single row")
+
+
+def test_concurrent_enrichment():
+    """Test enrichment runs in parallel, keeps order and caches results."""
+    print("\n=== Testing concurrent enrichment ===")
+    with Env() as env:
+        start = time.perf_counter()
+        out = playlists.enrich_playlist_items(items(24), max_workers=6)
+        elapsed = time.perf_counter() - start
+
+        assert [m["title"] for m in out] == [f"Movie {i}" for i in range(24)]
+        assert [m["imdb_id"] for m in out] == [f"tt{i:07d}" for i in range(24)]
+        assert out[3]["poster"].endswith("/poster3.jpg") and out[3]["year"] == "1953"
+        assert len(env.stub.requests) == 48  # search + detail each
+        assert env.stub.max_active > 1
+        # Sequential with the old 100 ms sleep: 24 * (2 * 50 ms + 100 ms)
+        assert elapsed < 2.0, elapsed
+        print(f"✓ 24 items in {elapsed:.2f}s, up to {env.stub.max_active} requests at once")
+
+        again = playlists.enrich_playlist_items(items(24))
+        assert again == out
+        assert len(env.stub.requests) == 48
+        print("✓ second pass served from cache")
+
+
+def test_ttl_refresh():
+    """Test expired entries are refetched, and served stale if TMDb fails."""
+    print("\n=== Testing TTL refresh ===")
+    with Env() as env:
+        playlists.enrich_playlist_items(items(2))
+        conn = db.get_db()
+        conn.execute("UPDATE tmdb_cache SET expires_at = datetime('now', '-1 days')")
+        conn.commit()
+        conn.close()
+
+        assert playlists._cache_get("q:movie 0 1950") is None
+        assert playlists._cache_get("q:movie 0 1950", include_expired=True)["tmdb_id"] == 1000
+
+        before = len(env.stub.requests)
+        (fresh,) = playlists.enrich_playlist_items(items(1))
+        assert len(env.stub.requests) == before + 2 and fresh["tmdb_id"] == 1000
+        print("✓ expired entry refetched")
+
+        env.stub.missing.add("Movie 1")
+        (stale,) = playlists.enrich_playlist_items(items(2)[1:])
+        assert stale["tmdb_id"] == 1001 and stale["poster"].endswith("/poster1.jpg")
+        print("✓ stale entry used when the lookup fails")
+
+
+def test_rate_limiter():
+    """Test the token bucket spaces requests and pauses on 429."""
+    print("\n=== Testing rate limiter ===")
+    limiter = tmdb_service._RateLimiter(rate=50, burst=2)
+    start = time.perf_counter()
+    for _ in range(12):
+        limiter.acquire()
+    elapsed = time.perf_counter() - start
+    assert 0.18 <= elapsed < 0.5, elapsed  # 2 burst + 10 at 20 ms
+
+    limiter.pause(0.2)
+    start = time.perf_counter()
+    limiter.acquire()
+    assert time.perf_counter() - start >= 0.19
+    print(f"✓ 12 acquires in {elapsed:.2f}s, pause honoured")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("TMDb Cache Test Suite")
+    print("=" * 60)
+
+    test_legacy_import()
+    test_concurrent_enrichment()
+    test_ttl_refresh()
+    test_rate_limiter()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+# api/tests/test_transcription_pool.py
+"""
+Tests for parallel transcription (services/library/transcription_worker.py).
+
+Uses synthetic audio (numbered tone bursts separated by silence) and a
+stub transcriber that "hears" each burst's number from its pitch, so
+stitched timestamps can be checked against where the bursts really are.
+Covers VAD window planning, atomic claiming under concurrency, lease
+expiry and the attempt limit, parallel windows, partial transcripts and
+resuming after a failure.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from db_fixture import MigratedDB
+from services.library import TranscriptionPool, TranscriptionQueueService, TranscriptionWorker
+from services.library import audio_segmentation as seg
+from services.library import transcription_worker as tw
+from services.library.transcription_service import MAX_ATTEMPTS
+from utils import db
+
+SR = seg.SAMPLE_RATE
+BURST_SECONDS = 1.0
+GAP_SECONDS = 1.5
+N_BURSTS = 12
+MAX_WINDOW = 6.0
+
+
+def burst_freq(k):
+    return 200.0 + 50.0 * k
+
+
+def make_audio(n_bursts=N_BURSTS):
+    """Returns (audio, [(k, start, end)]) with burst k at burst_freq(k)."""
+    rng = np.random.default_rng(0)
+    bursts, parts, t = [], [], GAP_SECONDS
+    parts.append(np.zeros(int(GAP_SECONDS * SR)))
+    for k in range(n_bursts):
+        n = int(BURST_SECONDS * SR)
+        parts.append(0.3 * np.sin(2 * np.pi * burst_freq(k) * np.arange(n) / SR))
+        parts.append(np.zeros(int(GAP_SECONDS * SR)))
+        bursts.append((k, t, t + BURST_SECONDS))
+        t += BURST_SECONDS + GAP_SECONDS
+    audio = np.concatenate(parts) + rng.normal(0, 1e-4, sum(len(p) for p in parts))
+    return audio.astype(np.float32), bursts
+
+
+class StubTranscriber:
+    """One segment per tone burst: text 'word<k>', times relative to the window."""
+
+    def __init__(self, delay=0.05, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio, model_name='base', language=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            segments = []
+            for start, end in seg.energy_speech_regions(audio):
+                chunk = audio[int(start * SR):int(end * SR)]
+                freq = np.argmax(np.abs(np.fft.rfft(chunk))) * SR / len(chunk)
+                k = int(round((freq - 200.0) / 50.0))
+                if k == self.fail_on:
+                    raise RuntimeError(f"decoder error on word{k}")
+                segments.append({'start': start, 'end': end, 'text': f"word{k}"})
+            with self._lock:
+                self.calls.append([s['text'] for s in segments])
+            return {'segments': segments, 'language': language or 'en'}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def add_media(conn, tmp, n):
+    """n queued recordings; returns their queue ids."""
+    ids = []
+    for i in range(n):
+        path = os.path.join(tmp, f"lecture_{i}.mp3")
+        with open(path, "wb") as f:
+            f.write(b"fake")
+        file_id = conn.execute(
+            "INSERT INTO library_files (filename, stored_path, mime_type) VALUES (?, ?, 'audio/mpeg')",
+            (f"lecture_{i}.mp3", path),
+        ).lastrowid
+        ids.append(conn.execute(
+            "INSERT INTO transcription_queue (library_file_id) VALUES (?)", (file_id,)
+        ).lastrowid)
+    conn.commit()
+    return ids
+
+
+def test_plan_windows():
+    """Test windows are cut in silence and bounded by max_window."""
+    print("\n=== Testing VAD window planning ===")
+    audio, bursts = make_audio()
+    windows = seg.segment_audio(audio, max_window=MAX_WINDOW, use_silero=False)
+
+    assert len(windows) > 1
+    assert [w.index for w in windows] == list(range(len(windows)))
+    for w in windows:
+        assert w.end - w.start <= MAX_WINDOW + 1e-6
+    for _, start, end in bursts:
+        # Every burst lies wholly inside exactly one window
+        inside = [w for w in windows if w.start <= start and end <= w.end]
+        assert len(inside) == 1, (start, end, windows)
+    assert seg.segment_audio(audio, max_window=MAX_WINDOW, use_silero=False) == windows
+    print(f"✓ {len(windows)} windows for {len(audio) / SR:.0f}s, none splitting a burst")
+
+    # A region longer than max_window is cut at fixed intervals
+    forced = seg.plan_windows([(0.0, 14.0)], max_window=6.0)
+    assert [(w.start, w.end) for w in forced] == [(0.0, 6.0), (6.0, 12.0), (12.0, 14.0)]
+    print("✓ unbroken speech split at max_window")
+
+
+def test_atomic_claim():
+    """Test concurrent workers never claim the same item, and lease expiry."""
+    print("\n=== Testing atomic claiming ===")
+    with MigratedDB() as env:
+        conn = db.get_db()
+        ids = add_media(conn, env.tmp, 30)
+        queue = TranscriptionQueueService()
+
+        claimed, lock = [], threading.Lock()
+
+        def drain(worker_id):
+            while True:
+                item = queue.claim_next(worker_id)
+                if not item:
+                    return
+                with lock:
+                    claimed.append((item['id'], worker_id))
+
+        threads = [threading.Thread(target=drain, args=(f"w{i}",)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(i for i, _ in claimed) == ids
+        rows = conn.execute("SELECT id, lease_owner, attempts FROM transcription_queue").fetchall()
+        assert all(r['attempts'] == 1 for r in rows)
+        owners = dict(claimed)
+        assert all(owners[r['id']] == r['lease_owner'] for r in rows)
+        print(f"✓ {len(ids)} items claimed once each by {len(threads)} threads")
+
+        # A dead worker's lease expires and the item is claimable again
+        first = ids[0]
+        conn.execute(
+            "UPDATE transcription_queue SET lease_expires_at = datetime('now', '-1 seconds') WHERE id = ?",
+            (first,),
+        )
+        conn.commit()
+        item = queue.claim_next("rescuer")
+        assert item['id'] == first and item['attempts'] == 2
+        assert queue.claim_next("rescuer") is None
+        assert not queue.renew_lease(first, owners[first])
+        assert queue.renew_lease(first, "rescuer")
+        print("✓ expired lease reclaimed, old owner cannot renew")
+
+
+def test_lease_attempts_exhausted():
+    """Test an item whose worker keeps dying is failed after MAX_ATTEMPTS claims."""
+    print("\n=== Testing lease attempt limit ===")
+    with MigratedDB() as env:
+        conn = db.get_db()
+        (queue_id,) = add_media(conn, env.tmp, 1)
+        queue = TranscriptionQueueService()
+
+        def expire():
+            conn.execute(
+                "UPDATE transcription_queue SET lease_expires_at = datetime('now', '-1 seconds') WHERE id = ?",
+                (queue_id,),
+            )
+            conn.commit()
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            item = queue.claim_next(f"w{attempt}")
+            assert item['id'] == queue_id and item['attempts'] == attempt
+            expire()
+
+        assert queue.claim_next("w-last") is None
+        row = queue.get_queue_item(queue_id)
+        assert row['status'] == 'failed' and row['lease_owner'] is None
+        assert f"{MAX_ATTEMPTS} times" in row['error_message']
+        print(f"✓ failed after {MAX_ATTEMPTS} lost leases instead of re-leasing")
+
+        assert queue.retry_failed(queue_id)
+        assert queue.claim_next("w-retry")['attempts'] == 1
+        print("✓ manual retry starts with fresh attempts")
+
+
+def test_parallel_windows_stitched():
+    """Test windows run concurrently and segment times are absolute."""
+    print("\n=== Testing parallel transcription ===")
+    audio, bursts = make_audio()
+    original = tw.load_audio
+    tw.load_audio = lambda path: audio
+    try:
+        with MigratedDB() as env:
+            conn = db.get_db()
+            (queue_id,) = add_media(conn, env.tmp, 1)
+            stub = StubTranscriber()
+            worker = TranscriptionWorker(transcriber=stub, window_workers=3, max_window=MAX_WINDOW)
+
+            result = worker.process_next()
+            assert result['success'], result
+            assert stub.max_active >= 2
+            print(f"✓ {len(stub.calls)} windows, up to {stub.max_active} at once")
+
+            row = conn.execute("SELECT * FROM transcription_queue WHERE id = ?", (queue_id,)).fetchone()
+            assert row['status'] == 'completed' and row['lease_owner'] is None
+            assert row['windows_total'] == len(stub.calls)
+
+            path = conn.execute(
+                "SELECT stored_path FROM library_files WHERE id = ?", (result['transcript_id'],)
+            ).fetchone()[0]
+            with open(path) as f:
+                doc = json.load(f)
+            assert [s['text'] for s in doc['segments']] == [f"word{k}" for k, _, _ in bursts]
+            for s, (_, start, end) in zip(doc['segments'], bursts):
+                assert abs(s['start'] - start) < 0.1 and abs(s['end'] - end) < 0.1, (s, start)
+            assert doc['transcription']['language'] == 'en'
+            print("✓ segments in order with absolute timestamps")
+
+            # The final transcript replaces the partial windows
+            assert conn.execute("SELECT COUNT(*) FROM transcription_segments").fetchone()[0] == 0
+            assert TranscriptionQueueService().get_partial_transcript(row['library_file_id']) is None
+    finally:
+        tw.load_audio = original
+
+
+def test_partial_and_resume():
+    """Test finished windows are readable after a failure and reused on retry."""
+    print("\n=== Testing partial transcripts and resume ===")
+    audio, bursts = make_audio()
+    original = tw.load_audio
+    tw.load_audio = lambda path: audio
+    try:
+        with MigratedDB() as env:
+            conn = db.get_db()
+            (queue_id,) = add_media(conn, env.tmp, 1)
+            queue = TranscriptionQueueService()
+            file_id = queue.get_queue_item(queue_id)['library_file_id']
+
+            failing = StubTranscriber(delay=0.0, fail_on=N_BURSTS - 1)
+            worker = TranscriptionWorker(transcriber=failing, window_workers=1, max_window=MAX_WINDOW)
+            result = worker.process_next()
+            assert not result['success'] and 'decoder error' in result['error']
+
+            partial = queue.get_partial_transcript(file_id)
+            assert partial['status'] == 'failed'
+            assert partial['windows_done'] == len(failing.calls) < partial['windows_total']
+            assert partial['text'].startswith("word0 word1")
+            assert partial['segments'][0]['start'] > 1.0
+            hits = queue.search_partial_transcripts("word1")
+            assert hits and hits[0]['library_file_id'] == file_id
+            assert queue.search_partial_transcripts("nothing-like-this") == []
+            print(f"✓ {partial['windows_done']}/{partial['windows_total']} windows readable and searchable")
+
+            assert queue.retry_failed(queue_id)
+            resumed = StubTranscriber(delay=0.0)
+            worker = TranscriptionWorker(transcriber=resumed, window_workers=2, max_window=MAX_WINDOW)
+            result = worker.process_next()
+            assert result['success'], result
+            assert len(resumed.calls) == partial['windows_total'] - partial['windows_done']
+            print(f"✓ retry transcribed only the {len(resumed.calls)} unfinished windows")
+    finally:
+        tw.load_audio = original
+
+
+def test_pool_drains_queue():
+    """Test a pool of workers processes every item exactly once."""
+    print("\n=== Testing worker pool ===")
+    audio, _ = make_audio(n_bursts=3)
+    original = tw.load_audio
+    tw.load_audio = lambda path: audio
+    try:
+        with MigratedDB() as env:
+            conn = db.get_db()
+            add_media(conn, env.tmp, 6)
+            stub = StubTranscriber(delay=0.02)
+            pool = TranscriptionPool(size=3, window_workers=1, transcriber=stub, max_window=MAX_WINDOW)
+
+            stats = pool.run_until_empty()
+            assert stats == {'processed': 6, 'success': 6, 'failed': 0}
+            statuses = [r[0] for r in conn.execute("SELECT status FROM transcription_queue")]
+            assert statuses == ['completed'] * 6
+            print("✓ 3 workers completed 6 items")
+    finally:
+        tw.load_audio = original
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Transcription Pool Test Suite")
+    print("=" * 60)
+
+    test_plan_windows()
+    test_atomic_claim()
+    test_lease_attempts_exhausted()
+    test_parallel_windows_stitched()
+    test_partial_and_resume()
+    test_pool_drains_queue()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
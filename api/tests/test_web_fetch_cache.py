@@ -0,0 +1,236 @@
+# api/tests/test_web_fetch_cache.py
+"""
+Tests for cache-backed fetching in plugins/references/web_fetch.py.
+
+Runs against a local HTTP server that counts requests and honours
+If-None-Match / If-Modified-Since. Covers serving fresh entries without
+a request, 304 revalidation, skipping text extraction when the body is
+unchanged, new versions when it changes, and the body size cap.
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from db_fixture import MigratedDB
+from plugins.references import web_fetch
+from plugins.references.web_fetch import WebFetchReference
+from services.cache.reference_cache import ReferenceCache
+from utils import db
+
+LAST_MODIFIED = "Wed, 01 Oct 2025 12:00:00 GMT"
+
+
+def page(n):
+    return f"<html><head><title>Page {n}</title></head><body><p>Revision {n}</p></body></html>"
+
+
+class StubSite:
+    """Serves one page; the ETag changes with `revision` unless `etags` is off."""
+
+    def __init__(self):
+        self.revision = 1
+        self.body = page(1).encode()
+        self.etags = True
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests.append(dict(self.headers))
+                etag = f'"rev-{stub.revision}"'
+                if stub.etags and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                if stub.etags:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", LAST_MODIFIED)
+                self.send_header("Content-Length", str(len(stub.body)))
+                self.end_headers()
+                self.wfile.write(stub.body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/article"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def publish(self, n, body=None):
+        self.revision = n
+        self.body = body if body is not None else page(n).encode()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Env:
+    """Temp database with the reference cache, stub site, counted extraction."""
+
+    def __enter__(self):
+        self.db = MigratedDB()
+        self.site = StubSite()
+
+        self.plugin = WebFetchReference()
+        self.extractions = 0
+        extract = self.plugin._extract_text
+
+        def counted(html):
+            self.extractions += 1
+            return extract(html)
+
+        self.plugin._extract_text = counted
+        return self
+
+    def fetch(self, **config):
+        return self.plugin.fetch_item("", {"url": self.site.url, **config})
+
+    def age_cache(self, hours):
+        conn = db.get_db()
+        conn.execute("UPDATE reference_cache SET fetched_at = datetime('now', 'localtime', ?)",
+                     (f"-{hours} hours",))
+        conn.commit()
+        conn.close()
+
+    def versions(self):
+        conn = db.get_db()
+        try:
+            return ReferenceCache(conn).get_versions(self.site.url)
+        finally:
+            conn.close()
+
+    def __exit__(self, *exc):
+        self.site.close()
+        self.db.close()
+
+
+def test_fresh_and_not_modified():
+    """Test fresh entries skip the network and stale ones revalidate with a 304."""
+    print("\n=== Testing fresh hits and 304 revalidation ===")
+    with Env() as env:
+        first = env.fetch()
+        assert first.success and first.metadata["cache"] == "miss"
+        assert first.title == "Page 1" and "Revision 1" in first.content
+        assert env.extractions == 1 and len(env.site.requests) == 1
+        assert "If-None-Match" not in env.site.requests[0]
+
+        again = env.fetch()
+        assert again.metadata["cache"] == "fresh" and again.content == first.content
+        assert len(env.site.requests) == 1
+        print("✓ fresh entry served without a request")
+
+        env.age_cache(48)
+        revalidated = env.fetch()
+        assert revalidated.metadata["cache"] == "not_modified"
+        assert revalidated.content == first.content and revalidated.title == "Page 1"
+        headers = env.site.requests[-1]
+        assert headers["If-None-Match"] == '"rev-1"'
+        assert headers["If-Modified-Since"] == LAST_MODIFIED
+        assert env.extractions == 1
+        print("✓ stale entry revalidated with a 304, no re-extraction")
+
+        # The 304 refreshed fetched_at, so the entry is fresh again
+        assert env.fetch().metadata["cache"] == "fresh"
+        assert len(env.site.requests) == 2
+        assert env.fetch(max_age_hours=0).metadata["cache"] == "not_modified"
+        assert len(env.site.requests) == 3
+        print("✓ max_age_hours=0 always revalidates")
+
+
+def test_changed_and_unchanged_bodies():
+    """Test extraction only runs when the body hash changes."""
+    print("\n=== Testing body hashing ===")
+    with Env() as env:
+        env.site.etags = False  # No validators: every revalidation is a full 200
+        env.fetch()
+        env.age_cache(48)
+
+        same = env.fetch()
+        assert same.metadata["cache"] == "unchanged" and same.title == "Page 1"
+        assert env.extractions == 1 and len(env.site.requests) == 2
+        print("✓ identical body reused the extracted text")
+
+        env.age_cache(48)
+        env.site.publish(2)
+        changed = env.fetch()
+        assert changed.metadata["cache"] == "changed" and changed.metadata["version"] == 2
+        assert changed.title == "Page 2" and "Revision 2" in changed.content
+        assert env.extractions == 2
+        assert [v["version"] for v in env.versions()] == [2, 1]
+        print("✓ changed body extracted and stored as version 2")
+
+        # Raw HTML is cached separately from extracted text
+        raw = env.fetch(extract_text=False)
+        assert raw.metadata["cache"] == "miss" and raw.content.startswith("<html>")
+        assert env.extractions == 2
+
+
+def test_size_cap():
+    """Test large bodies are read in chunks and cut at the cap."""
+    print("\n=== Testing body size cap ===")
+    with Env() as env:
+        big = b"<html><head><title>Big</title></head><body>" + b"x" * 200_000 + b"</body></html>"
+        env.site.publish(3, big)
+        env.site.etags = False
+        saved = (web_fetch.MAX_BODY_BYTES, web_fetch.READ_CHUNK_BYTES)
+        web_fetch.MAX_BODY_BYTES, web_fetch.READ_CHUNK_BYTES = 50_000, 4096
+        try:
+            result = env.fetch(extract_text=False)
+            assert result.success and result.metadata["truncated"]
+            assert len(result.content) == 50_000 and result.title == "Big"
+
+            web_fetch.MAX_BODY_BYTES = len(big)
+            env.age_cache(48)
+            whole = env.fetch(extract_text=False, max_age_hours=1)
+            assert not whole.metadata["truncated"] and len(whole.content) == len(big)
+        finally:
+            web_fetch.MAX_BODY_BYTES, web_fetch.READ_CHUNK_BYTES = saved
+        print("✓ body cut at the cap and flagged, exact-size body kept whole")
+
+
+def test_cache_unavailable():
+    """Test fetching still works without the cache table."""
+    print("\n=== Testing missing cache ===")
+    with Env() as env:
+        conn = db.get_db()
+        conn.execute("DROP TABLE reference_cache")
+        conn.commit()
+        conn.close()
+
+        for _ in range(2):
+            result = env.fetch()
+            assert result.success and result.metadata["cache"] == "miss"
+        assert len(env.site.requests) == 2
+        print("✓ fetch falls back to plain requests")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Web Fetch Cache Test Suite")
+    print("=" * 60)
+
+    test_fresh_and_not_modified()
+    test_changed_and_unchanged_bodies()
+    test_size_cap()
+    test_cache_unavailable()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# api/tests/test_zotero_reader.py
+"""
+Tests for services/integrations/zotero.py - batched item loading.
+
+Runs against a generated database with Zotero's schema (from
+benchmarks/bench_zotero.py). Checks batched results against the old
+per-item queries, keyset pagination, SQL search, and that the snapshot
+is reused until zotero.sqlite changes and works while Zotero holds its
+exclusive lock.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add api directory to path
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from benchmarks.bench_zotero import legacy_get_items, legacy_search, make_zotero_db
+from services.integrations import zotero
+from services.integrations.zotero import ZoteroReader
+
+N_ITEMS = 300
+
+
+class Env:
+    def __enter__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self._saved = (zotero.SNAPSHOT_DIR, zotero.IN_BATCH_SIZE)
+        zotero.SNAPSHOT_DIR = os.path.join(self.tmp.name, "snapshots")
+        zotero.IN_BATCH_SIZE = 64  # Exercise batching of IN (...) lists
+        self.db_path = os.path.join(self.tmp.name, "zotero.sqlite")
+        make_zotero_db(self.db_path, N_ITEMS)
+        self.reader = ZoteroReader(self.tmp.name)
+        return self
+
+    def __exit__(self, *exc):
+        zotero.SNAPSHOT_DIR, zotero.IN_BATCH_SIZE = self._saved
+        zotero._snapshots.pop(self.db_path, None)
+        self.tmp.cleanup()
+
+
+def summary(item):
+    return (item.key, item.item_type, item.title, item.abstract,
+            [(c["firstName"], c["lastName"]) for c in item.creators],
+            sorted(item.tags), [a["key"] for a in item.attachments])
+
+
+def test_batched_matches_per_item():
+    """Test batched loading gives the same items as per-item queries."""
+    print("\n=== Testing batched item details ===")
+    with Env() as env:
+        items = env.reader.get_items(limit=N_ITEMS)
+        assert len(items) == N_ITEMS
+        old = legacy_get_items(env.reader, N_ITEMS)
+        assert [summary(i) for i in items] == [summary(i) for i in old]
+
+        item = items[5]
+        assert item.item_id == item.raw_data["itemID"]
+        assert item.raw_data["doi"] == item.doi and item.doi.startswith("10.1000/")
+        assert item.attachments[0]["content_type"] == "application/pdf"
+        assert item.creators[0]["type"] == "author"
+        print(f"✓ {len(items)} items identical to the per-item path")
+
+        by_key = env.reader.get_item_by_key(item.key)
+        assert summary(by_key) == summary(item)
+        assert env.reader.get_item_by_key(item.attachments[0]["key"]) is None
+        assert env.reader.get_item_by_key("NOPE0000") is None
+        print("✓ get_item_by_key")
+
+
+def test_keyset_pagination():
+    """Test pages chained by cursor cover every item exactly once."""
+    print("\n=== Testing keyset pagination ===")
+    with Env() as env:
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = env.reader.get_items(limit=70, after_id=cursor)
+            if not page:
+                break
+            pages += 1
+            seen.extend(i.key for i in page)
+            cursor = page[-1].item_id
+
+        assert pages == 5
+        assert seen == [i.key for i in env.reader.get_items(limit=N_ITEMS)]
+
+        books = env.reader.get_items(item_type="book", limit=20, after_id=100)
+        assert books and all(i.item_type == "book" and i.item_id > 100 for i in books)
+        in_collection = env.reader.get_items(collection_id=3, limit=N_ITEMS)
+        assert len(in_collection) == N_ITEMS // 10
+        print(f"✓ {len(seen)} items over {pages} pages, filters combine with the cursor")
+
+
+def test_search():
+    """Test SQL search matches the old in-Python scan."""
+    print("\n=== Testing search ===")
+    with Env() as env:
+        for query in ("messiah", "TEMPLE", "Item 12", "judah hebrew"):
+            new = [i.key for i in env.reader.search_items(query, limit=1000)]
+            old = [i.key for i in legacy_search(env.reader, query, 1000)]
+            assert new == old, query
+
+        assert len(env.reader.search_items("messiah", limit=7)) == 7
+        # LIKE wildcards in the query are literal
+        assert env.reader.search_items("%") == []
+        assert env.reader.search_items("_") == []
+        print("✓ same results as scanning items, wildcards escaped")
+
+
+def test_snapshot():
+    """Test the snapshot is reused until the source changes, and beats the lock."""
+    print("\n=== Testing snapshot cache ===")
+    with Env() as env:
+        reader = env.reader
+        before = reader.get_items(limit=N_ITEMS)
+        snapshot = zotero._snapshot_path(env.db_path)
+        copied_at = os.stat(snapshot).st_mtime_ns
+        reader.get_items(limit=1)
+        assert os.stat(snapshot).st_mtime_ns == copied_at
+        print("✓ unchanged source reuses the snapshot")
+
+        # Zotero running: exclusive lock held on the live database
+        live = sqlite3.connect(env.db_path)
+        live.execute("PRAGMA locking_mode=EXCLUSIVE")
+        live.execute("UPDATE items SET version = version + 1 WHERE itemID = 1")
+        live.commit()
+        try:
+            direct = ZoteroReader(env.tmp.name, use_snapshot=False)
+            try:
+                direct.get_items(limit=1)
+                raise AssertionError("expected the live database to be locked")
+            except sqlite3.OperationalError:
+                pass
+
+            # Add an item; the changed mtime/size invalidates the snapshot
+            time.sleep(0.01)
+            live.execute("INSERT INTO items (itemID, itemTypeID, key) VALUES (100001, 1, 'NEWITEM1')")
+            live.execute("INSERT INTO itemDataValues (valueID, value) VALUES (999999, 'Fresh title')")
+            live.execute("INSERT INTO itemData (itemID, fieldID, valueID) VALUES (100001, 1, 999999)")
+            live.commit()
+
+            after = reader.get_items(limit=N_ITEMS + 1)
+            assert len(after) == len(before) + 1
+            assert reader.get_item_by_key("NEWITEM1").title == "Fresh title"
+        finally:
+            live.close()
+        print("✓ changes picked up, readable while Zotero holds its lock")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Zotero Reader Test Suite")
+    print("=" * 60)
+
+    test_batched_matches_per_item()
+    test_keyset_pagination()
+    test_search()
+    test_snapshot()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@ import os
 import sqlite3
 from pathlib import Path
 
+from utils import metrics
+from utils import query_log  # noqa: F401  registers itself when TAMOR_QUERY_LOG=1
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 DEFAULT_DB = BASE_DIR / "memory" / "tamor.db"
 
@@ -10,7 +13,11 @@ DB_PATH = os.getenv("MEMORY_DB") or os.getenv("TAMOR_DB") or str(DEFAULT_DB)
 
 
 def get_db() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+    if metrics.timing_statements():
+        # Times every statement for metrics / the slow-query log
+        conn = sqlite3.connect(DB_PATH, factory=metrics.TimedConnection)
+    else:
+        conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
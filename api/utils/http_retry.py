@@ -3,51 +3,144 @@
 HTTP POST with retry for rate limits and transient errors.
 
 Shared utility for all providers that make direct HTTP requests.
-Not needed for Ollama (localhost) or SDK-based providers.
+
+Connections are pooled: each provider gets one shared requests.Session
+(keep-alive, HTTPAdapter pool sized by LLM_HTTP_POOL_SIZE), so sequential
+calls reuse the TCP/TLS connection instead of handshaking every time.
 
 Usage:
-    from utils.http_retry import post_with_retry
+    from utils.http_retry import get_session, post_with_retry
 
     response = post_with_retry(
         url="https://api.anthropic.com/v1/messages",
         json=payload,
         headers=headers,
         timeout=120,
+        session=get_session("anthropic"),
     )
     data = response.json()
 """
 
+import email.utils
 import logging
+import os
+import random
+import threading
 import time
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Connections kept alive per host, per provider session
+DEFAULT_POOL_SIZE = int(os.getenv("LLM_HTTP_POOL_SIZE", "10"))
+
+# Backoff: full jitter over min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2^attempt)
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 30.0
+
+# Statuses worth retrying (rate limit + transient server errors)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name: str, pool_size: Optional[int] = None) -> requests.Session:
+    """
+    Get the shared session for a provider, creating it on first use.
+
+    Urllib3's connection pool is thread-safe, so one session serves every
+    request thread for that provider.
+
+    Args:
+        name: Provider key ("xai", "anthropic", "ollama", ...)
+        pool_size: Max pooled connections per host (default: LLM_HTTP_POOL_SIZE)
+    """
+    session = _sessions.get(name)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            size = pool_size or DEFAULT_POOL_SIZE
+            session = requests.Session()
+            # Retries are handled in post_with_retry (Retry-After, jitter)
+            adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[name] = session
+    return session
+
+
+def close_sessions() -> None:
+    """Close all pooled sessions (tests, shutdown)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = RETRY_BASE_SECONDS,
+    cap: float = RETRY_MAX_SECONDS,
+) -> float:
+    """Full-jitter exponential backoff for a 0-based attempt number."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
 
 def post_with_retry(
     url: str,
     json: dict,
-    headers: dict,
+    headers: Optional[dict] = None,
     timeout: int = 120,
     max_retries: int = 3,
+    session: Optional[requests.Session] = None,
+    label: Optional[str] = None,
+    backoff_base: float = RETRY_BASE_SECONDS,
 ) -> requests.Response:
     """
     POST with automatic retry for rate limits and transient server errors.
 
     Retry behavior:
-    - 429 (rate limit): Respects Retry-After header, falls back to exponential backoff
-    - 5xx (server error): Exponential backoff
-    - Connection errors: Exponential backoff
+    - 429 / 503: Respects Retry-After (seconds or HTTP-date, capped at
+      RETRY_MAX_SECONDS), falls back to jittered exponential backoff
+    - Other 5xx: Jittered exponential backoff
+    - Connection errors (refused, reset, dropped keep-alive, connect
+      timeout): Jittered backoff
     - 4xx (client error): No retry (caller's problem)
-    - Timeout: No retry (raises immediately)
+    - Read timeout: No retry (raises immediately)
 
     Args:
         url: Endpoint URL
         json: Request payload
         headers: HTTP headers
         timeout: Request timeout in seconds
-        max_retries: Maximum number of retry attempts
+        max_retries: Maximum number of attempts
+        session: Pooled session (see get_session); a bare request if None
+        label: Name used in error messages (default: the URL)
+        backoff_base: Base delay for exponential backoff, in seconds
 
     Returns:
         requests.Response on success
@@ -55,62 +148,56 @@ def post_with_retry(
     Raises:
         RuntimeError: On timeout, client errors, or exhausted retries
     """
+    label = label or url
+    post = session.post if session is not None else requests.post
     last_response = None
 
     for attempt in range(max_retries):
+        is_last = attempt >= max_retries - 1
         try:
-            response = requests.post(
-                url, json=json, headers=headers, timeout=timeout
-            )
+            response = post(url, json=json, headers=headers, timeout=timeout)
 
-            # Rate limited — back off and retry
-            if response.status_code == 429:
-                retry_after = response.headers.get("retry-after")
-                if retry_after:
-                    try:
-                        wait = int(retry_after)
-                    except ValueError:
-                        wait = min(2 ** attempt * 2, 30)
-                else:
-                    wait = min(2 ** attempt * 2, 30)
-
-                logger.info(
-                    f"Rate limited by {url}, waiting {wait}s "
-                    f"(attempt {attempt + 1}/{max_retries})"
-                )
-                time.sleep(wait)
+            if response.status_code in RETRY_STATUSES:
                 last_response = response
-                continue
+                if is_last:
+                    break
+
+                wait = None
+                if response.status_code in (429, 503):
+                    wait = parse_retry_after(response.headers.get("retry-after"))
+                if wait is None:
+                    wait = backoff_delay(attempt, base=backoff_base)
+                wait = min(wait, RETRY_MAX_SECONDS)
 
-            # Server error — retry with backoff
-            if response.status_code >= 500:
-                wait = 2 ** attempt
                 logger.warning(
-                    f"Server error {response.status_code} from {url}, "
-                    f"retrying in {wait}s (attempt {attempt + 1}/{max_retries})"
+                    f"{label} returned {response.status_code}, retrying in {wait:.1f}s "
+                    f"(attempt {attempt + 1}/{max_retries})"
                 )
+                # Drain the body so the connection goes back to the pool
+                response.close()
                 time.sleep(wait)
-                last_response = response
                 continue
 
             # Client error or success — return immediately
             response.raise_for_status()
             return response
 
+        # Before Timeout: ConnectTimeout is both, and the request never
+        # reached the server, so it is retried like a refused connection
         except requests.ConnectionError as e:
-            if attempt < max_retries - 1:
-                wait = 2 ** attempt
+            if not is_last:
+                wait = backoff_delay(attempt, base=backoff_base)
                 logger.warning(
-                    f"Connection error to {url}, retrying in {wait}s: {e}"
+                    f"Connection error to {label}, retrying in {wait:.1f}s: {e}"
                 )
                 time.sleep(wait)
                 continue
             raise RuntimeError(
-                f"Connection to {url} failed after {max_retries} attempts: {e}"
+                f"Connection to {label} failed after {max_retries} attempts: {e}"
             )
 
         except requests.Timeout:
-            raise RuntimeError(f"Request to {url} timed out after {timeout}s")
+            raise RuntimeError(f"{label} request timed out after {timeout}s")
 
         except requests.HTTPError as e:
             # Extract provider-specific error message if available
@@ -119,11 +206,11 @@ def post_with_retry(
                 error_msg = error_data.get("error", {}).get("message", str(e))
             except Exception:
                 error_msg = str(e)
-            raise RuntimeError(f"API error from {url}: {error_msg}")
+            raise RuntimeError(f"{label} API error: {error_msg}")
 
     # Exhausted retries
-    status = last_response.status_code if last_response else "unknown"
+    status = last_response.status_code if last_response is not None else "unknown"
     raise RuntimeError(
-        f"Request to {url} failed after {max_retries} retries "
+        f"{label} request failed after {max_retries} attempts "
         f"(last status: {status})"
     )
@@ -0,0 +1,486 @@
+# api/utils/metrics.py
+"""
+Request timing and Prometheus-style metrics.
+
+Off unless TAMOR_METRICS=1. When off, span() hands back a shared no-op
+context manager, get_db() returns plain connections and no Flask hooks
+are installed, so instrumented code pays one boolean check per call.
+
+When on:
+- span(name) times a block. Inside a request, spans nest into that
+  request's timing tree; everywhere, they feed tamor_span_seconds{span}.
+- Connections from utils.db.get_db count and time every statement
+  (tamor_db_queries_total, tamor_db_query_seconds). The same
+  connections are used, metrics on or off, while a statement listener
+  such as the slow-query log (utils/query_log.py) is registered.
+- record_embedding() and llm_call() record embedding calls and LLM
+  latency / tokens by provider.
+- init_app() adds before/after request hooks: per-endpoint latency, a
+  Server-Timing header if TAMOR_SERVER_TIMING=1, and a logged timing
+  tree for requests slower than TAMOR_METRICS_SLOW_MS.
+
+routes/metrics_api.py serves render_prometheus() at GET /api/metrics.
+
+Usage:
+    from utils import metrics
+
+    with metrics.span("memory_search"):
+        memories = get_memories_for_context(message, user_id)
+
+    with metrics.llm_call("anthropic", model) as call:
+        data = post_with_retry(...).json()
+        call.tokens(usage["input_tokens"], usage["output_tokens"])
+"""
+
+import contextvars
+import logging
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+METRICS_ENABLED = _env_flag("TAMOR_METRICS")
+
+# Add a Server-Timing header to every response (needs TAMOR_METRICS)
+SERVER_TIMING_ENABLED = _env_flag("TAMOR_SERVER_TIMING")
+
+# Requests slower than this log their timing tree (0 = never)
+SLOW_REQUEST_MS = float(os.getenv("TAMOR_METRICS_SLOW_MS", "0"))
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_HELP = {
+    "tamor_request_seconds": ("histogram", "HTTP request latency by endpoint"),
+    "tamor_span_seconds": ("histogram", "Time spent in named spans"),
+    "tamor_db_queries_total": ("counter", "SQL statements executed via get_db connections"),
+    "tamor_db_query_seconds": ("histogram", "SQL statement execution time"),
+    "tamor_embedding_calls_total": ("counter", "Embedding model calls"),
+    "tamor_embedding_texts_total": ("counter", "Texts embedded"),
+    "tamor_embedding_seconds": ("histogram", "Embedding call latency"),
+    "tamor_llm_requests_total": ("counter", "LLM requests by provider and outcome"),
+    "tamor_llm_request_seconds": ("histogram", "LLM request latency by provider"),
+    "tamor_llm_tokens_total": ("counter", "LLM tokens by provider and direction"),
+}
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+_lock = threading.Lock()
+_histograms: Dict[Tuple[str, Labels], _Histogram] = {}
+_counters: Dict[Tuple[str, Labels], float] = {}
+
+
+def observe(metric: str, seconds: float, **labels: str) -> None:
+    """Add one observation to a histogram."""
+    if not METRICS_ENABLED:
+        return
+    _observe((metric, tuple(sorted(labels.items()))), seconds)
+
+
+def _observe(key: Tuple[str, Labels], seconds: float, count_key: Optional[Tuple[str, Labels]] = None) -> None:
+    """observe() for a prebuilt key, optionally bumping a counter under the same lock."""
+    slot = bisect_left(BUCKETS, seconds)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = _Histogram()
+        hist.counts[slot] += 1
+        hist.sum += seconds
+        hist.count += 1
+        if count_key is not None:
+            _counters[count_key] = _counters.get(count_key, 0) + 1
+
+
+def inc(metric: str, value: float = 1, **labels: str) -> None:
+    """Add to a counter."""
+    if not METRICS_ENABLED:
+        return
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_enabled(enabled: bool) -> None:
+    """Turn collection on or off at runtime (tests, benchmarks)."""
+    global METRICS_ENABLED
+    METRICS_ENABLED = enabled
+
+
+def reset() -> None:
+    """Drop everything recorded so far."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def snapshot() -> Dict[str, Any]:
+    """Copy of the registry: {"histograms": {...}, "counters": {...}}."""
+    with _lock:
+        return {
+            "histograms": {
+                key: {"counts": list(h.counts), "sum": h.sum, "count": h.count}
+                for key, h in _histograms.items()
+            },
+            "counters": dict(_counters),
+        }
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus() -> str:
+    """The registry in Prometheus text exposition format (version 0.0.4)."""
+    snap = snapshot()
+    by_metric: Dict[str, List[str]] = {}
+
+    for (metric, labels), h in sorted(snap["histograms"].items()):
+        lines = by_metric.setdefault(metric, [])
+        cumulative = 0
+        for bound, n in zip(BUCKETS, h["counts"]):
+            cumulative += n
+            lines.append(f"{metric}_bucket{_format_labels(labels, ('le', repr(bound)))} {cumulative}")
+        lines.append(f"{metric}_bucket{_format_labels(labels, ('le', '+Inf'))} {h['count']}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {h['sum']:.6f}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {h['count']}")
+
+    for (metric, labels), value in sorted(snap["counters"].items()):
+        by_metric.setdefault(metric, []).append(f"{metric}{_format_labels(labels)} {_number(value)}")
+
+    out: List[str] = []
+    for metric in sorted(by_metric):
+        kind, help_text = _HELP.get(metric, ("untyped", metric))
+        out.append(f"# HELP {metric} {help_text}")
+        out.append(f"# TYPE {metric} {kind}")
+        out.extend(by_metric[metric])
+    return "\n".join(out) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Spans and per-request timing trees
+# ---------------------------------------------------------------------------
+
+
+class _Node:
+    __slots__ = ("name", "start", "elapsed", "children", "parent")
+
+    def __init__(self, name: str, start: float, parent: Optional["_Node"]):
+        self.name = name
+        self.start = start
+        self.elapsed = 0.0
+        self.children: List["_Node"] = []
+        self.parent = parent
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"name": self.name, "ms": round(self.elapsed * 1000, 3)}
+        if self.children:
+            out["children"] = [c.to_dict() for c in self.children]
+        return out
+
+
+class _RequestTiming:
+    __slots__ = ("root", "current", "db_queries", "db_seconds")
+
+    def __init__(self, name: str):
+        self.root = _Node(name, time.perf_counter(), None)
+        self.current = self.root
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+_request: contextvars.ContextVar[Optional[_RequestTiming]] = contextvars.ContextVar(
+    "tamor_request_timing", default=None
+)
+
+
+class _NullSpan:
+    """Shared no-op for span() / llm_call() while metrics are off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def tokens(self, input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start", "elapsed", "node", "timing")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.timing = _request.get()
+        if self.timing is not None:
+            parent = self.timing.current
+            self.node = _Node(self.name, self.start, parent)
+            parent.children.append(self.node)
+            self.timing.current = self.node
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        if self.timing is not None:
+            self.node.elapsed = self.elapsed
+            self.timing.current = self.node.parent
+        _observe(("tamor_span_seconds", (("span", self.name),)), self.elapsed)
+        return False
+
+
+def span(name: str):
+    """Context manager timing a block as a named span."""
+    if not METRICS_ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def begin_request(name: str) -> contextvars.Token:
+    """Start a timing tree for the current request (or job); returns a reset token."""
+    return _request.set(_RequestTiming(name))
+
+
+def end_request(token: contextvars.Token) -> Optional[_RequestTiming]:
+    """Finish the current timing tree and return it."""
+    timing = _request.get()
+    _request.reset(token)
+    if timing is not None:
+        timing.root.elapsed = time.perf_counter() - timing.root.start
+    return timing
+
+
+def current_timing_tree() -> Optional[Dict[str, Any]]:
+    """The current request's spans so far, as nested dicts."""
+    timing = _request.get()
+    return timing.root.to_dict() if timing is not None else None
+
+
+def server_timing_header(timing: _RequestTiming) -> str:
+    """Server-Timing value: top-level spans (same names summed), DB time, total."""
+    totals: Dict[str, float] = {}
+    for child in timing.root.children:
+        totals[child.name] = totals.get(child.name, 0.0) + child.elapsed
+    parts = [f"{_token(name)};dur={seconds * 1000:.1f}" for name, seconds in totals.items()]
+    if timing.db_queries:
+        parts.append(f'db;dur={timing.db_seconds * 1000:.1f};desc="{timing.db_queries} queries"')
+    parts.append(f"total;dur={timing.root.elapsed * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def _token(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name) or "span"
+
+
+# ---------------------------------------------------------------------------
+# DB, embedding and LLM recorders
+# ---------------------------------------------------------------------------
+
+
+_DB_SECONDS_KEY = ("tamor_db_query_seconds", ())
+_DB_COUNT_KEY = ("tamor_db_queries_total", ())
+
+
+# Callables (connection, sql, parameters, seconds) run after every timed
+# statement; parameters is None for executemany / executescript
+_statement_listeners: List[Callable[[sqlite3.Connection, str, Any, float], None]] = []
+
+
+def add_statement_listener(listener: Callable[[sqlite3.Connection, str, Any, float], None]) -> None:
+    """Also hand every get_db() statement to listener (see utils/query_log.py)."""
+    if listener not in _statement_listeners:
+        _statement_listeners.append(listener)
+
+
+def remove_statement_listener(listener: Callable[[sqlite3.Connection, str, Any, float], None]) -> None:
+    if listener in _statement_listeners:
+        _statement_listeners.remove(listener)
+
+
+def timing_statements() -> bool:
+    """Whether get_db() should hand out TimedConnections."""
+    return METRICS_ENABLED or bool(_statement_listeners)
+
+
+def record_db_query(seconds: float) -> None:
+    _observe(_DB_SECONDS_KEY, seconds, _DB_COUNT_KEY)
+    timing = _request.get()
+    if timing is not None:
+        timing.db_queries += 1
+        timing.db_seconds += seconds
+
+
+def _statement_done(conn: sqlite3.Connection, sql: str, parameters: Any, seconds: float) -> None:
+    if METRICS_ENABLED:
+        record_db_query(seconds)
+    for listener in _statement_listeners:
+        listener(conn, sql, parameters, seconds)
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that records execute() time (to the first row) per statement."""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _statement_done(self.connection, sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _statement_done(self.connection, sql, None, time.perf_counter() - start)
+
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            _statement_done(self.connection, sql_script, None, time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection factory whose cursors are TimedCursors."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def record_embedding(texts: int, seconds: float, model: str = "") -> None:
+    """One embedding model call over `texts` inputs."""
+    inc("tamor_embedding_calls_total", model=model)
+    inc("tamor_embedding_texts_total", texts, model=model)
+    observe("tamor_embedding_seconds", seconds, model=model)
+
+
+class _LLMCall(_Span):
+    __slots__ = ("provider", "model", "input_tokens", "output_tokens")
+
+    def __init__(self, provider: str, model: Optional[str]):
+        super().__init__(f"llm.{provider}")
+        self.provider = provider
+        self.model = model or ""
+        self.input_tokens = None
+        self.output_tokens = None
+
+    def tokens(self, input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+        """Token usage reported by the provider (None if it didn't say)."""
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        status = "error" if exc_type is not None else "ok"
+        inc("tamor_llm_requests_total", provider=self.provider, model=self.model, status=status)
+        observe("tamor_llm_request_seconds", self.elapsed, provider=self.provider)
+        if self.input_tokens:
+            inc("tamor_llm_tokens_total", self.input_tokens, provider=self.provider, direction="input")
+        if self.output_tokens:
+            inc("tamor_llm_tokens_total", self.output_tokens, provider=self.provider, direction="output")
+        return False
+
+
+def llm_call(provider: str, model: Optional[str] = None):
+    """Context manager around one LLM request; call .tokens() with the usage."""
+    if not METRICS_ENABLED:
+        return _NULL_SPAN
+    return _LLMCall(provider, model)
+
+
+# ---------------------------------------------------------------------------
+# Flask integration
+# ---------------------------------------------------------------------------
+
+
+def init_app(app) -> None:
+    """Install request hooks on a Flask app (no-op while metrics are off)."""
+    if not METRICS_ENABLED:
+        return
+    from flask import g, request
+
+    @app.before_request
+    def _metrics_begin():
+        g._metrics_token = begin_request(request.endpoint or "unmatched")
+
+    @app.after_request
+    def _metrics_finish(response):
+        token = g.pop("_metrics_token", None)
+        if token is None:
+            return response
+        timing = end_request(token)
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        observe(
+            "tamor_request_seconds",
+            timing.root.elapsed,
+            endpoint=endpoint,
+            method=request.method,
+            status=str(response.status_code),
+        )
+        if SERVER_TIMING_ENABLED:
+            response.headers["Server-Timing"] = server_timing_header(timing)
+        if SLOW_REQUEST_MS and timing.root.elapsed * 1000 >= SLOW_REQUEST_MS:
+            logger.warning(
+                f"Slow request {request.method} {endpoint}: "
+                f"{timing.root.elapsed * 1000:.0f} ms, {timing.db_queries} queries, "
+                f"tree={timing.root.to_dict()}"
+            )
+        return response
+
+    @app.teardown_request
+    def _metrics_teardown(exc):
+        # after_request is skipped when a view raises
+        token = g.pop("_metrics_token", None)
+        if token is not None:
+            end_request(token)
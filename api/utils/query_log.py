@@ -0,0 +1,672 @@
+# api/utils/query_log.py
+"""
+Slow-query log and index advisor for connections from utils.db.get_db.
+
+Off unless TAMOR_QUERY_LOG=1 (or enable() is called). While on, every
+statement run through a get_db() connection is timed and grouped by
+fingerprint: the SQL with literals replaced by ?, IN lists collapsed and
+whitespace normalized. Statements slower than TAMOR_SLOW_QUERY_MS:
+
+- get an EXPLAIN QUERY PLAN (once per fingerprint, on the same connection)
+- are flagged for full table scans, automatic indexes, temp B-trees for
+  ORDER BY / GROUP BY and LIKE / GLOB patterns no index can serve
+- get covering-index suggestions for each scanned table, built from the
+  statement's equality, range, join and ORDER BY columns plus the
+  columns it reads, checked against the table's existing indexes
+- are appended to TAMOR_QUERY_LOG_FILE (JSON lines) if set; the first
+  of each fingerprint is also logged as a warning
+
+report() aggregates the fingerprints; recommended_indexes() merges the
+suggestions, ranked by the slow time they'd address. Both are served at
+GET /api/db/slow-queries, and scripts/index_advisor.py rebuilds the
+report from a log file.
+
+Usage:
+    from utils import query_log
+
+    query_log.enable(threshold_ms=20)
+    ...  # run the workload
+    print(query_log.format_report())
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+QUERY_LOG_ENABLED = os.getenv("TAMOR_QUERY_LOG", "0").strip().lower() in ("1", "true", "yes", "on")
+
+# Statements at least this slow are explained and logged
+SLOW_QUERY_MS = float(os.getenv("TAMOR_SLOW_QUERY_MS", "50"))
+
+# Slow statements are appended here as JSON lines (unset = log only)
+QUERY_LOG_FILE = os.getenv("TAMOR_QUERY_LOG_FILE", "")
+
+# Distinct fingerprints kept; later ones are counted under "(other)"
+MAX_FINGERPRINTS = int(os.getenv("TAMOR_QUERY_LOG_MAX_FINGERPRINTS", "2000"))
+
+# Suggested covering indexes carry at most this many columns, and only
+# copy in columns averaging this many bytes or fewer
+MAX_INDEX_COLUMNS = 6
+NARROW_COLUMN_BYTES = 64
+
+_EXPLAINABLE = ("select", "with", "update", "delete", "insert", "replace")
+
+_KEYWORDS = {
+    "where", "join", "left", "right", "inner", "outer", "cross", "natural", "on", "using",
+    "group", "order", "limit", "having", "union", "except", "intersect", "set", "values",
+    "as", "and", "or", "not", "select", "from", "window", "returning", "indexed",
+}
+
+
+# ---------------------------------------------------------------------------
+# Fingerprints
+# ---------------------------------------------------------------------------
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.I)
+_NAMED_PARAM_RE = re.compile(r"[:@$][A-Za-z_]\w*|\?\d+")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_VALUES_RE = re.compile(r"\bVALUES\s*(\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.I)
+_SPACE_RE = re.compile(r"\s+")
+
+_normalized_cache: Dict[str, str] = {}
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL with comments dropped, literals and parameters as ?, IN lists collapsed."""
+    cached = _normalized_cache.get(sql)
+    if cached is not None:
+        return cached
+    text = _COMMENT_RE.sub(" ", sql)
+    text = _STRING_RE.sub("?", text)
+    text = _NAMED_PARAM_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _IN_LIST_RE.sub("IN (...)", text)
+    text = _VALUES_RE.sub(r"VALUES \1, ...", text)
+    text = _SPACE_RE.sub(" ", text).strip().rstrip(";").strip()
+    if len(_normalized_cache) < 10_000:
+        _normalized_cache[sql] = text
+    return text
+
+
+def fingerprint(sql: str) -> str:
+    """Short stable id for a normalized statement."""
+    return hashlib.sha1(normalize_sql(sql).encode("utf-8")).hexdigest()[:12]
+
+
+# ---------------------------------------------------------------------------
+# Plans
+# ---------------------------------------------------------------------------
+
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(.*)$")
+_AUTO_INDEX_RE = re.compile(r"AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX \(([^)]*)\)")
+_SEARCH_RE = re.compile(r"^SEARCH (?:TABLE )?(\w+)(?: AS (\w+))?")
+
+
+def explain(conn: sqlite3.Connection, sql: str, parameters: Any = None) -> List[str]:
+    """EXPLAIN QUERY PLAN detail lines, indented by depth ([] if not explainable)."""
+    if not sql.lstrip().lower().startswith(_EXPLAINABLE):
+        return []
+    if parameters is None:
+        # executemany / no parameters: bind NULLs, the plan doesn't depend on values
+        count = len(re.findall(r"\?", _STRING_RE.sub("", sql)))
+        parameters = (None,) * count
+    try:
+        # The base class cursor, so the EXPLAIN itself isn't timed or logged
+        rows = sqlite3.Connection.cursor(conn).execute(
+            "EXPLAIN QUERY PLAN " + sql, parameters
+        ).fetchall()
+    except sqlite3.Error:
+        return []
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for row in rows:
+        node, parent, detail = row[0], row[1], row[3]
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return lines
+
+
+def analyze_plan(plan: Sequence[str]) -> Dict[str, Any]:
+    """
+    Problems in a plan.
+
+    Returns {"full_scans": [table or alias, ...], "automatic_indexes":
+    [(table or alias, [column, ...]), ...], "temp_btree": [...]}.
+    """
+    full_scans: List[str] = []
+    automatic: List[Tuple[str, List[str]]] = []
+    temp_btree: List[str] = []
+    for line in plan:
+        detail = line.strip()
+        m = _SCAN_RE.match(detail)
+        if m:
+            name = m.group(2) or m.group(1)
+            rest = m.group(3)
+            # Virtual tables (FTS) and constant rows aren't table scans
+            if "VIRTUAL TABLE" not in rest and not name.startswith("CONSTANT"):
+                full_scans.append(name)
+            continue
+        m = _SEARCH_RE.match(detail)
+        if m:
+            auto = _AUTO_INDEX_RE.search(detail)
+            if auto:
+                columns = [c.split("=")[0].split(">")[0].split("<")[0].strip()
+                           for c in auto.group(1).split(" AND ")]
+                automatic.append((m.group(2) or m.group(1), columns))
+            continue
+        if detail.startswith("USE TEMP B-TREE"):
+            temp_btree.append(detail[len("USE TEMP B-TREE FOR "):])
+    return {"full_scans": full_scans, "automatic_indexes": automatic, "temp_btree": temp_btree}
+
+
+# ---------------------------------------------------------------------------
+# Statement shape (heuristic)
+# ---------------------------------------------------------------------------
+
+_TABLE_REF_RE = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE|INTO)\s+([A-Za-z_]\w*)(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?", re.I
+)
+_COLUMN = r"(?:([A-Za-z_]\w*)\.)?([A-Za-z_]\w*)"
+_JSON_EXPR = r"json_extract\(\s*(?:([A-Za-z_]\w*)\.)?([A-Za-z_]\w*)\s*,\s*('[^']*')\s*\)"
+_EQ_RE = re.compile(rf"(?:{_JSON_EXPR}|{_COLUMN})\s*(?:==?|\bIS\b(?!\s+NOT)|\bIN\b)", re.I)
+_EQ_RIGHT_RE = re.compile(rf"(?:==?)\s*(?:{_JSON_EXPR}|{_COLUMN})(?!\s*\()", re.I)
+_RANGE_RE = re.compile(rf"(?:{_JSON_EXPR}|{_COLUMN})\s*(?:<=|>=|<(?!>)|>|\bBETWEEN\b)", re.I)
+_LIKE_RE = re.compile(rf"{_COLUMN}\s+(?:NOT\s+)?(LIKE|GLOB)\s+('(?:[^']|'')*'|\?)", re.I)
+_CLAUSE_END = r"\b(?:GROUP\s+BY|ORDER\s+BY|LIMIT|HAVING|UNION|EXCEPT|INTERSECT|RETURNING|WINDOW)\b"
+_WHERE_RE = re.compile(rf"\b(?:WHERE|ON)\b(.*?)(?={_CLAUSE_END}|\bJOIN\b|\bLEFT\b|\bINNER\b|\bCROSS\b|\bWHERE\b|$)", re.I | re.S)
+_ORDER_RE = re.compile(r"\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|\)|$)", re.I | re.S)
+_SELECT_RE = re.compile(r"^\s*SELECT\s+(?:DISTINCT\s+)?(.*?)\s+FROM\b", re.I | re.S)
+
+
+@dataclass
+class _Shape:
+    tables: Dict[str, str] = field(default_factory=dict)           # alias or name -> table
+    equality: List[Tuple[Optional[str], str]] = field(default_factory=list)
+    ranges: List[Tuple[Optional[str], str]] = field(default_factory=list)
+    order: List[Tuple[Optional[str], str]] = field(default_factory=list)
+    selected: List[Tuple[Optional[str], str]] = field(default_factory=list)
+    select_star: bool = False
+    prefix_like: List[Tuple[Optional[str], str]] = field(default_factory=list)
+    unindexable_like: List[str] = field(default_factory=list)
+
+
+def _column_ref(m: re.Match) -> Optional[Tuple[Optional[str], str]]:
+    """(qualifier, column or json_extract expression) from a _JSON_EXPR|_COLUMN match."""
+    if m.group(2):
+        return m.group(1), f"json_extract({m.group(2)}, {m.group(3)})"
+    if m.group(5) and m.group(5).lower() not in _KEYWORDS:
+        return m.group(4), m.group(5)
+    return None
+
+
+def _like_pattern(text: str, m: re.Match, parameters: Any) -> Optional[str]:
+    """The pattern of a LIKE / GLOB match: the literal, the bound value, or None."""
+    pattern = m.group(4)
+    if pattern != "?":
+        return pattern[1:-1].replace("''", "'")
+    if not isinstance(parameters, (list, tuple)):
+        return None
+    # Positional index of this ?, not counting ?s inside string literals
+    position = _STRING_RE.sub("''", text[:m.start(4)]).count("?")
+    value = parameters[position] if position < len(parameters) else None
+    return value if isinstance(value, str) else None
+
+
+def _statement_shape(sql: str, parameters: Any = None) -> _Shape:
+    shape = _Shape()
+    text = _COMMENT_RE.sub(" ", sql)
+    for m in _TABLE_REF_RE.finditer(text):
+        table, alias = m.group(1), m.group(2)
+        if table.lower() in _KEYWORDS:
+            continue
+        shape.tables[table] = table
+        if alias and alias.lower() not in _KEYWORDS:
+            shape.tables[alias] = table
+
+    for clause in _WHERE_RE.findall(text):
+        for m in _EQ_RE.finditer(clause):
+            ref = _column_ref(m)
+            if ref:
+                shape.equality.append(ref)
+        for m in _EQ_RIGHT_RE.finditer(clause):
+            ref = _column_ref(m)
+            if ref:
+                shape.equality.append(ref)
+        for m in _RANGE_RE.finditer(clause):
+            ref = _column_ref(m)
+            if ref:
+                shape.ranges.append(ref)
+
+    for m in _LIKE_RE.finditer(text):
+        pattern = _like_pattern(text, m, parameters)
+        glob = m.group(3).upper() == "GLOB"
+        if not pattern or pattern[0] in ("*?[" if glob else "%_"):
+            shape.unindexable_like.append(f"{m.group(1) + '.' if m.group(1) else ''}{m.group(2)}")
+        elif glob:
+            shape.ranges.append((m.group(1), m.group(2)))
+        else:
+            # LIKE is case-insensitive, so only a NOCASE index serves the prefix
+            shape.prefix_like.append((m.group(1), m.group(2)))
+
+    order = _ORDER_RE.search(text)
+    if order:
+        for part in order.group(1).split(","):
+            m = re.match(rf"\s*{_COLUMN}\s*(?:ASC|DESC)?\s*$", part, re.I)
+            if m and m.group(2).lower() not in _KEYWORDS:
+                shape.order.append((m.group(1), m.group(2)))
+
+    select = _SELECT_RE.match(text)
+    if select:
+        for part in select.group(1).split(","):
+            part = part.strip()
+            if part == "*" or part.endswith(".*"):
+                shape.select_star = True
+                continue
+            m = re.match(rf"{_COLUMN}(?:\s+(?:AS\s+)?\w+)?$", part, re.I)
+            if m:
+                shape.selected.append((m.group(1), m.group(2)))
+    return shape
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> Dict[str, Tuple[str, bool]]:
+    """{column: (declared type, is the INTEGER PRIMARY KEY rowid alias)}."""
+    try:
+        rows = sqlite3.Connection.cursor(conn).execute(f'PRAGMA table_info("{table}")').fetchall()
+    except sqlite3.Error:
+        return {}
+    rowid_pk = [r for r in rows if r[5]]
+    return {
+        r[1]: ((r[2] or "").upper(), len(rowid_pk) == 1 and r[5] == 1 and (r[2] or "").upper() == "INTEGER")
+        for r in rows
+    }
+
+
+def _is_narrow(conn: sqlite3.Connection, table: str, column: str, declared: str) -> bool:
+    """
+    Whether the column is small enough to copy into an index: by a sample
+    of its values, or by declared type when there are none yet.
+    """
+    try:
+        row = sqlite3.Connection.cursor(conn).execute(
+            f'SELECT AVG(LENGTH("{column}")) FROM (SELECT "{column}" FROM "{table}" LIMIT 200)'
+        ).fetchone()
+    except sqlite3.Error:
+        return False
+    if row[0] is None:
+        return not any(t in declared for t in ("TEXT", "CHAR", "CLOB", "BLOB"))
+    return row[0] <= NARROW_COLUMN_BYTES
+
+
+def _existing_indexes(conn: sqlite3.Connection, table: str) -> List[List[Optional[str]]]:
+    """Key columns of each index on table ("col COLLATE NOCASE" if so, expressions as None)."""
+    out = []
+    cur = sqlite3.Connection.cursor(conn)
+    try:
+        for idx in cur.execute(f'PRAGMA index_list("{table}")').fetchall():
+            cols = [
+                r[2] if r[4] == "BINARY" or r[2] is None else f"{r[2]} COLLATE {r[4]}"
+                for r in sqlite3.Connection.cursor(conn).execute(f'PRAGMA index_xinfo("{idx[1]}")')
+                if r[5]  # key columns only, not the trailing rowid
+            ]
+            out.append(cols)
+    except sqlite3.Error:
+        pass
+    return out
+
+
+def _resolve(
+    refs: Iterable[Tuple[Optional[str], str]],
+    aliases: Set[str],
+    columns: Set[str],
+) -> List[str]:
+    """
+    Columns of one table among refs, in order, deduplicated.
+
+    Qualified refs must use one of the table's aliases; unqualified ones
+    are taken if the table has a column of that name.
+    """
+    out: List[str] = []
+    for qualifier, column in refs:
+        if qualifier is not None and qualifier not in aliases:
+            continue
+        base = column[len("json_extract("):].split(",")[0] if column.startswith("json_extract(") else column
+        if base not in columns:
+            continue
+        if column not in out:
+            out.append(column)
+    return out
+
+
+def _index_name(table: str, columns: List[str]) -> str:
+    parts = [
+        re.sub(r"\W+", "_", c.replace("json_extract", "json").replace(" COLLATE NOCASE", "_nocase")).strip("_")
+        for c in columns
+    ]
+    return f"idx_{table}_{'_'.join(parts)}"[:64].rstrip("_")
+
+
+def suggest_indexes(
+    conn: sqlite3.Connection, sql: str, plan: Sequence[str], parameters: Any = None
+) -> Tuple[List[str], List[str]]:
+    """
+    (CREATE INDEX statements, notes) for the tables a plan scans or sorts.
+
+    Key columns: equality (incl. join) columns, then one range column,
+    or the ORDER BY columns when there is no range (only with a LIMIT
+    when nothing else filters). A prefix LIKE counts as a range on the
+    column under COLLATE NOCASE; parameters resolve bound patterns.
+    Narrow selected columns are appended to make the index covering
+    while it stays under MAX_INDEX_COLUMNS. BLOBs and the rowid never go
+    into a suggestion.
+    """
+    problems = analyze_plan(plan)
+    shape = _statement_shape(sql, parameters)
+    has_limit = re.search(r"\bLIMIT\b", sql, re.I) is not None
+    suggestions: List[str] = []
+    notes: List[str] = []
+
+    targets: List[Tuple[str, List[str]]] = [(name, []) for name in problems["full_scans"]]
+    targets.extend(problems["automatic_indexes"])
+    sorted_table = None
+    if "ORDER BY" in problems["temp_btree"] and len(set(shape.tables.values())) == 1:
+        # Rows were found by index but still sorted: try one that also orders them
+        sorted_table = next(iter(shape.tables.values()))
+        targets.append((sorted_table, []))
+
+    seen_tables = set()
+    for name, auto_columns in targets:
+        table = shape.tables.get(name, name)
+        if table in seen_tables:
+            continue
+        seen_tables.add(table)
+        info = _table_columns(conn, table)
+        if not info:
+            continue
+        columns = {c for c, (decl, rowid) in info.items() if not rowid and "BLOB" not in decl}
+        aliases = {a for a, t in shape.tables.items() if t == table}
+
+        def owned(refs):
+            return _resolve(refs, aliases, columns)
+
+        key = [c for c in auto_columns if c in columns] or owned(shape.equality)
+        ranges = [c for c in owned(shape.ranges) if c not in key]
+        ranges += [f"{c} COLLATE NOCASE" for c in owned(shape.prefix_like) if c not in key]
+        if ranges:
+            key.append(ranges[0])
+        elif not auto_columns and (key or has_limit):
+            key.extend(c for c in owned(shape.order) if c not in key)
+
+        if not key:
+            likes = [c for c in shape.unindexable_like if c.split(".")[-1] in columns]
+            if likes:
+                notes.append(
+                    f"{table}: LIKE on {', '.join(likes)} with a leading wildcard or bound "
+                    f"pattern can't use an index; consider an FTS5 table"
+                )
+            elif name in problems["full_scans"]:
+                notes.append(f"{table}: full scan with no indexable predicate")
+            continue
+
+        plain_key = [c for c in key if not c.startswith("json_extract(")]
+        covering = list(key)
+        if not shape.select_star and len(plain_key) == len(key):
+            extra = [c for c in owned(shape.selected) if c not in covering]
+            if len(covering) + len(extra) <= MAX_INDEX_COLUMNS and all(
+                _is_narrow(conn, table, c, info[c][0]) for c in extra
+            ):
+                covering.extend(extra)
+
+        if len(plain_key) == len(key) and any(idx[:len(key)] == key for idx in _existing_indexes(conn, table)):
+            if name == sorted_table and name not in problems["full_scans"]:
+                continue
+            notes.append(
+                f"{table}: an index on ({', '.join(key)}) exists but wasn't used; "
+                f"run ANALYZE or check column affinity / collation"
+            )
+            continue
+
+        suggestions.append(
+            f"CREATE INDEX IF NOT EXISTS {_index_name(table, key)} ON {table}({', '.join(covering)});"
+        )
+
+    for what in problems["temp_btree"]:
+        notes.append(f"temp B-tree for {what}")
+    return suggestions, notes
+
+
+# ---------------------------------------------------------------------------
+# Log
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class QueryStats:
+    """Timings and advice for one fingerprint."""
+    fingerprint: str
+    sql: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    slow_count: int = 0
+    slow_seconds: float = 0.0
+    plan: List[str] = field(default_factory=list)
+    full_scans: List[str] = field(default_factory=list)
+    suggestions: List[str] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+    explained: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out["mean_ms"] = round(self.total_seconds / self.count * 1000, 3) if self.count else 0.0
+        out["total_ms"] = round(self.total_seconds * 1000, 3)
+        out["max_ms"] = round(self.max_seconds * 1000, 3)
+        out["slow_ms"] = round(self.slow_seconds * 1000, 3)
+        for key in ("total_seconds", "max_seconds", "slow_seconds", "explained"):
+            out.pop(key)
+        return out
+
+
+class QueryLog:
+    """Statement timings by fingerprint, with plans for slow ones."""
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, log_file: str = QUERY_LOG_FILE):
+        self.threshold = threshold_ms / 1000
+        self.log_file = log_file
+        self._stats: Dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, conn: sqlite3.Connection, sql: str, parameters: Any, seconds: float) -> None:
+        """Count one statement; explain it if it's its fingerprint's first slow run."""
+        if getattr(self._local, "busy", False):
+            return
+        normalized = normalize_sql(sql)
+        with self._lock:
+            stats = self._stats.get(normalized)
+            if stats is None:
+                if len(self._stats) >= MAX_FINGERPRINTS:
+                    normalized = "(other)"
+                    stats = self._stats.get(normalized)
+                if stats is None:
+                    stats = self._stats[normalized] = QueryStats(
+                        fingerprint(normalized), normalized
+                    )
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            if seconds < self.threshold:
+                return
+            stats.slow_count += 1
+            stats.slow_seconds += seconds
+            first = not stats.explained
+            stats.explained = True
+
+        if first and normalized != "(other)":
+            self._local.busy = True
+            try:
+                plan = explain(conn, sql, parameters)
+                suggestions, notes = suggest_indexes(conn, sql, plan, parameters) if plan else ([], [])
+            finally:
+                self._local.busy = False
+            with self._lock:
+                stats.plan = plan
+                stats.full_scans = analyze_plan(plan)["full_scans"]
+                stats.suggestions = suggestions
+                stats.notes = notes
+            logger.warning(
+                f"Slow query {seconds * 1000:.1f} ms [{stats.fingerprint}]: {normalized[:300]}"
+                + (f" | plan: {' / '.join(p.strip() for p in plan)}" if plan else "")
+                + (f" | suggest: {' '.join(suggestions)}" if suggestions else "")
+            )
+        self._append(stats, seconds)
+
+    def _append(self, stats: QueryStats, seconds: float) -> None:
+        if not self.log_file:
+            return
+        entry = {
+            "ts": time.time(),
+            "fingerprint": stats.fingerprint,
+            "ms": round(seconds * 1000, 3),
+            "sql": stats.sql,
+            "plan": stats.plan,
+            "suggestions": stats.suggestions,
+            "notes": stats.notes,
+        }
+        try:
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write slow-query log {self.log_file}: {e}")
+
+    def report(self, slow_only: bool = False) -> List[Dict[str, Any]]:
+        """Fingerprints by total time, as dicts."""
+        with self._lock:
+            stats = [s for s in self._stats.values() if s.slow_count or not slow_only]
+            stats.sort(key=lambda s: s.total_seconds, reverse=True)
+            return [s.to_dict() for s in stats]
+
+    def recommended_indexes(self) -> List[Dict[str, Any]]:
+        """Distinct suggestions, by the slow time of the statements asking for them."""
+        merged: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for s in self._stats.values():
+                for statement in s.suggestions:
+                    entry = merged.setdefault(statement, {"sql": statement, "slow_ms": 0.0, "fingerprints": []})
+                    entry["slow_ms"] += s.slow_seconds * 1000
+                    entry["fingerprints"].append(s.fingerprint)
+        out = sorted(merged.values(), key=lambda e: e["slow_ms"], reverse=True)
+        for entry in out:
+            entry["slow_ms"] = round(entry["slow_ms"], 3)
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    @classmethod
+    def from_file(cls, path: str, conn: Optional[sqlite3.Connection] = None) -> "QueryLog":
+        """
+        Rebuild a log from TAMOR_QUERY_LOG_FILE lines (slow statements only).
+
+        With conn, every fingerprint is explained again against that
+        database, so the advice reflects its current indexes rather than
+        the ones in place when the line was written.
+        """
+        log = cls(threshold_ms=0, log_file="")
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                seconds = entry.get("ms", 0.0) / 1000
+                stats = log._stats.get(entry["sql"])
+                if stats is None:
+                    stats = log._stats[entry["sql"]] = QueryStats(entry["fingerprint"], entry["sql"])
+                stats.count += 1
+                stats.slow_count += 1
+                stats.total_seconds += seconds
+                stats.slow_seconds += seconds
+                stats.max_seconds = max(stats.max_seconds, seconds)
+                if entry.get("plan"):
+                    stats.plan = entry["plan"]
+                    stats.suggestions = entry.get("suggestions", [])
+                    stats.notes = entry.get("notes", [])
+        for stats in log._stats.values():
+            if conn is not None:
+                stats.plan = explain(conn, stats.sql)
+                stats.suggestions, stats.notes = suggest_indexes(conn, stats.sql, stats.plan)
+            stats.full_scans = analyze_plan(stats.plan)["full_scans"]
+        return log
+
+
+_query_log: Optional[QueryLog] = None
+
+
+def get_query_log() -> Optional[QueryLog]:
+    """The active log (None while disabled)."""
+    return _query_log
+
+
+def _listener(conn: sqlite3.Connection, sql: str, parameters: Any, seconds: float) -> None:
+    log = _query_log
+    if log is not None:
+        log.record(conn, sql, parameters, seconds)
+
+
+def enable(threshold_ms: Optional[float] = None, log_file: Optional[str] = None) -> QueryLog:
+    """Start logging get_db() statements (replaces any previous log)."""
+    global _query_log
+    _query_log = QueryLog(
+        SLOW_QUERY_MS if threshold_ms is None else threshold_ms,
+        QUERY_LOG_FILE if log_file is None else log_file,
+    )
+    metrics.add_statement_listener(_listener)
+    return _query_log
+
+
+def disable() -> None:
+    global _query_log
+    metrics.remove_statement_listener(_listener)
+    _query_log = None
+
+
+def format_report(log: Optional[QueryLog] = None, limit: int = 20) -> str:
+    """Plain-text report: top fingerprints, then recommended indexes."""
+    log = log or _query_log
+    if log is None:
+        return "Query log is disabled (TAMOR_QUERY_LOG=1)"
+    lines = [f"Slow-query report (threshold {log.threshold * 1000:g} ms)", ""]
+    for entry in log.report()[:limit]:
+        lines.append(
+            f"[{entry['fingerprint']}] {entry['count']}x  total {entry['total_ms']:.1f} ms  "
+            f"mean {entry['mean_ms']:.2f} ms  max {entry['max_ms']:.1f} ms  slow {entry['slow_count']}"
+        )
+        lines.append(f"    {entry['sql'][:200]}")
+        for p in entry["plan"]:
+            lines.append(f"    plan: {p}")
+        for note in entry["notes"]:
+            lines.append(f"    note: {note}")
+    recommended = log.recommended_indexes()
+    lines.append("")
+    lines.append("Recommended indexes:" if recommended else "No index recommendations.")
+    for entry in recommended:
+        lines.append(f"  {entry['sql']}  -- {entry['slow_ms']:.1f} ms slow, {len(entry['fingerprints'])} statement(s)")
+    return "\n".join(lines)
+
+
+if QUERY_LOG_ENABLED:
+    enable()
@@ -0,0 +1,139 @@
+# api/utils/task_schedule.py
+"""
+Due-time keys and wake notifications for the task executor.
+
+detected_tasks.scheduled_for holds each task's due time as a sortable UTC
+string, so "what is due" is an index range scan on (status, scheduled_for)
+rather than json_extract() over every row.
+
+The executor (workers/task_executor.py) sleeps until its next deadline.
+Anything that creates a task, changes its due time or changes its status
+calls notify_task_change(), which sends one datagram to the executor's
+Unix socket so it re-reads its deadlines immediately. The executor runs
+as its own process, so an in-process condition variable would not reach
+it. Notifications are best-effort: if no executor is listening they are
+dropped, and the executor still re-checks at least every MAX_IDLE_SLEEP
+seconds.
+"""
+
+import logging
+import os
+import select
+import socket
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from utils import db
+
+logger = logging.getLogger(__name__)
+
+UTC = ZoneInfo("UTC")
+
+# Matches strftime('%Y-%m-%d %H:%M:%f', ...) in migration 020
+KEY_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def scheduled_for_key(value) -> str | None:
+    """
+    Column value for a normalized scheduled_for (ISO string or datetime).
+
+    Returns UTC 'YYYY-MM-DD HH:MM:SS.SSS', or None when the value is empty
+    or unparseable. Naive values are taken as UTC, as SQLite does.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).strip())
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return dt.astimezone(UTC).strftime(KEY_FORMAT)[:-3]
+
+
+def key_to_datetime(key: str) -> datetime:
+    """Parse a scheduled_for column value back to an aware UTC datetime."""
+    return datetime.strptime(key, KEY_FORMAT).replace(tzinfo=UTC)
+
+
+def now_key() -> str:
+    return scheduled_for_key(datetime.now(tz=UTC))
+
+
+def wake_socket_path() -> str:
+    """Executor wake socket; lives next to the database unless overridden."""
+    return os.getenv("TASK_WAKE_SOCKET") or f"{db.DB_PATH}.task-wake.sock"
+
+
+def notify_task_change() -> None:
+    """Wake the task executor so it picks up new or changed due times."""
+    if not hasattr(socket, "AF_UNIX"):
+        return
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as s:
+            s.setblocking(False)
+            s.sendto(b"1", wake_socket_path())
+    except OSError:
+        # No executor listening, or its queue is full (a wake is pending)
+        pass
+
+
+class TaskWakeListener:
+    """
+    Executor side of notify_task_change().
+
+    wait(timeout) sleeps until the timeout elapses or a notification
+    arrives, and returns True if it was woken. If the socket can't be
+    bound (unwritable directory, path too long), wait() only sleeps and
+    the executor falls back to re-checking every max_sleep seconds.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or wake_socket_path()
+        self._sock = None
+        if not hasattr(socket, "AF_UNIX"):
+            return
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            sock.bind(self.path)
+            sock.setblocking(False)
+        except OSError as e:
+            sock.close()
+            logger.warning(f"Task wake socket {self.path} unavailable ({e}); polling instead")
+            return
+        self._sock = sock
+
+    def wait(self, timeout: float) -> bool:
+        timeout = max(0.0, timeout)
+        if self._sock is None:
+            time.sleep(timeout)
+            return False
+
+        ready, _, _ = select.select([self._sock], [], [], timeout)
+        if not ready:
+            return False
+
+        # Coalesce a burst of notifications into one wake
+        while True:
+            try:
+                self._sock.recv(64)
+            except BlockingIOError:
+                return True
+
+    def close(self) -> None:
+        if self._sock is None:
+            return
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
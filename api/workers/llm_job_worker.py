@@ -0,0 +1,213 @@
+"""
+Worker for the LLM job queue (services/llm_job_service.py).
+
+Runs file insights and multi-file reasoning outside request handlers.
+Can be run as a background process (scripts/run_llm_job_worker.py) or
+called directly.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.db import get_db
+from services import llm_job_service as jobs
+from services.insights_service import generate_insights
+from services.llm_service import llm_is_configured
+from services.reasoning_service import (
+    analyze_file_relationships,
+    analyze_logic_flow,
+    detect_cross_file_contradictions,
+    get_full_reasoning,
+)
+
+log = logging.getLogger(__name__)
+
+# Minimum extracted text for insights (matches insights_service)
+MIN_INSIGHTS_TEXT = 100
+
+
+class JobError(Exception):
+    """A job failure. retryable=False skips remaining attempts."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+# ---------------------------------------------------------------------------
+# Handlers
+# ---------------------------------------------------------------------------
+
+def _load_file_text(file_row) -> str:
+    conn = get_db()
+    row = conn.execute(
+        "SELECT text FROM file_text_cache WHERE file_id = ?", (file_row["id"],)
+    ).fetchone()
+    if row and row["text"] is not None:
+        return row["text"]
+
+    # Not extracted yet: extract (and cache) now
+    from routes.files_api import get_or_extract_file_text_for_row
+
+    text, _meta, _parser = get_or_extract_file_text_for_row(dict(file_row))
+    return text or ""
+
+
+def run_insights_job(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Generate (and cache) insights for one project file."""
+    if not llm_is_configured():
+        raise JobError("llm_not_configured", retryable=False)
+
+    conn = get_db()
+    file_row = conn.execute(
+        "SELECT id, project_id, filename, stored_name, mime_type FROM project_files WHERE id = ?",
+        (job["file_id"],),
+    ).fetchone()
+    if not file_row:
+        raise JobError("file_not_found", retryable=False)
+
+    text = _load_file_text(file_row)
+    if len(text.strip()) < MIN_INSIGHTS_TEXT:
+        return {"skipped": "insufficient_content"}
+
+    force = bool((job.get("payload") or {}).get("force"))
+    result = generate_insights(
+        file_id=file_row["id"],
+        project_id=file_row["project_id"],
+        text=text,
+        filename=file_row["filename"],
+        mime_type=file_row["mime_type"],
+        force=force,
+    )
+    if result is None:
+        raise JobError("insights_generation_failed")
+
+    return {"file_id": file_row["id"], "model_used": result.get("model_used")}
+
+
+_REASONING_FUNCS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "full": get_full_reasoning,
+    "relationships": analyze_file_relationships,
+    "contradictions": detect_cross_file_contradictions,
+    "logic_flow": analyze_logic_flow,
+}
+
+
+def run_reasoning_job(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Run one reasoning analysis for a project (results cached by the service)."""
+    payload = job.get("payload") or {}
+    analysis = payload.get("analysis", "full")
+    func = _REASONING_FUNCS.get(analysis)
+    if func is None:
+        raise JobError(f"unknown_analysis: {analysis}", retryable=False)
+
+    result = func(job["project_id"], job["user_id"], bool(payload.get("force")))
+    error = result.get("error")
+    if error:
+        raise JobError(error, retryable=error != "llm_not_configured")
+
+    return {"analysis": analysis, "model_used": result.get("model_used")}
+
+
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = {
+    jobs.JOB_KIND_INSIGHTS: run_insights_job,
+    jobs.JOB_KIND_REASONING: run_reasoning_job,
+}
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+class LLMJobWorker:
+    def __init__(self, handlers: Optional[Dict[str, Callable]] = None):
+        self.handlers = handlers or JOB_HANDLERS
+
+    def process_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a claimed job and record the outcome."""
+        start = time.time()
+        handler = self.handlers.get(job["kind"])
+
+        try:
+            if handler is None:
+                raise JobError(f"no handler for kind '{job['kind']}'", retryable=False)
+            result = handler(job)
+        except JobError as e:
+            status = jobs.mark_failed(job["id"], str(e), retryable=e.retryable)
+            return {"success": False, "job_id": job["id"], "status": status, "error": str(e)}
+        except Exception as e:
+            log.exception(f"LLM job {job['id']} crashed")
+            status = jobs.mark_failed(job["id"], str(e))
+            return {"success": False, "job_id": job["id"], "status": status, "error": str(e)}
+
+        jobs.mark_completed(job["id"], result)
+        return {
+            "success": True,
+            "job_id": job["id"],
+            "status": "completed",
+            "processing_time": round(time.time() - start, 1),
+        }
+
+    def process_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Claim and process the next job.
+
+        Returns result dict or None if nothing is runnable.
+        """
+        job = jobs.claim_next_job()
+        if not job:
+            return None
+        return self.process_job(job)
+
+    def process_batch(self, count: int = 5) -> Dict[str, Any]:
+        """
+        Process up to `count` jobs.
+
+        Returns:
+            {'processed': int, 'success': int, 'failed': int, 'details': [...]}
+        """
+        results = {"processed": 0, "success": 0, "failed": 0, "details": []}
+
+        for _ in range(count):
+            result = self.process_next()
+            if result is None:
+                break
+
+            results["processed"] += 1
+            if result["success"]:
+                results["success"] += 1
+            else:
+                results["failed"] += 1
+            results["details"].append(result)
+
+        return results
+
+    def run_continuous(self, poll_interval: int = 5):
+        """
+        Run continuously, processing jobs as they appear.
+
+        Args:
+            poll_interval: Seconds to wait when the queue is empty
+        """
+        print(f"LLM job worker started. Poll interval: {poll_interval}s")
+        jobs.requeue_stale_jobs()
+
+        while True:
+            try:
+                result = self.process_next()
+
+                if result is None:
+                    time.sleep(poll_interval)
+                    jobs.requeue_stale_jobs()
+                elif result["success"]:
+                    print(f"Job {result['job_id']} completed in {result['processing_time']}s")
+                else:
+                    print(f"Job {result['job_id']} {result['status']}: {result['error']}")
+
+            except KeyboardInterrupt:
+                print("Worker stopped")
+                break
+            except Exception as e:
+                print(f"Worker error: {e}")
+                time.sleep(10)
@@ -1,10 +1,13 @@
+import heapq
 import json
 import time
 import logging
+import threading
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
 from utils.db import get_db
+from utils.task_schedule import TaskWakeListener, key_to_datetime, now_key, scheduled_for_key
 from api.routes.chat_api import insert_system_message
 
 log = logging.getLogger(__name__)
@@ -122,38 +125,145 @@ def _compute_next_scheduled(prev: datetime, recurrence: dict) -> datetime | None
 
 
 # -----------------------------
-# Executor loop
+# Deadline queue
 # -----------------------------
 
-def run_task_executor(poll_interval: int = 30):
-    log.info("Task executor started")
+# Upcoming deadlines held in memory; refilled from the index when drained
+DEADLINE_WINDOW = 256
 
-    while True:
-        try:
-            _claim_and_execute()
-        except Exception:
-            log.exception("Executor loop error")
-        time.sleep(poll_interval)
+# Upper bound on any single sleep, in case a wake notification was lost
+MAX_IDLE_SLEEP = 300.0
+
+# Tasks claimed per _claim_and_execute() call
+CLAIM_BATCH = 10
+
+# Seconds before a failed run is retried
+FAILED_RETRY_DELAY = 30
+
+
+class DeadlineQueue:
+    """
+    Min-heap of (scheduled_for, task_id) for the next DEADLINE_WINDOW
+    confirmed tasks.
+
+    It only decides how long the executor sleeps: _claim_and_execute()
+    re-reads due tasks from the table, so stale entries (a task edited,
+    paused or deleted since the last reload) cost one no-op wakeup.
+    """
+
+    def __init__(self, window: int = DEADLINE_WINDOW):
+        self.window = window
+        self._heap: list[tuple[str, int]] = []
+        self._complete = True  # Window holds every upcoming deadline
+
+    def reload(self, conn) -> None:
+        rows = conn.execute(
+            """
+            SELECT scheduled_for, id
+            FROM detected_tasks
+            WHERE status='confirmed' AND scheduled_for IS NOT NULL
+            ORDER BY scheduled_for
+            LIMIT ?
+            """,
+            (self.window,),
+        ).fetchall()
+        self._heap = [(r[0], r[1]) for r in rows]
+        heapq.heapify(self._heap)
+        self._complete = len(rows) < self.window
+
+    def pop_due(self, now: str) -> list[int]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[1])
+        return due
 
+    def next_deadline(self) -> str | None:
+        return self._heap[0][0] if self._heap else None
 
-def _claim_and_execute():
+    @property
+    def needs_reload(self) -> bool:
+        return not self._heap and not self._complete
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+# -----------------------------
+# Executor loop
+# -----------------------------
+
+def run_task_executor(
+    max_sleep: float = MAX_IDLE_SLEEP,
+    stop: threading.Event | None = None,
+    wake_socket: str | None = None,
+):
+    """
+    Sleep until the next task deadline (or a wake notification from
+    tasks_api / chat_api), run whatever is due, repeat.
+
+    stop ends the loop; it is checked at least every max_sleep seconds and
+    after each wakeup.
+    """
+    log.info("Task executor started")
+
+    listener = TaskWakeListener(wake_socket)
+    queue = DeadlineQueue()
+    reload = True
+
+    try:
+        while not (stop and stop.is_set()):
+            try:
+                if reload or queue.needs_reload:
+                    conn = get_db()
+                    try:
+                        queue.reload(conn)
+                    finally:
+                        conn.close()
+                    reload = False
+
+                if queue.pop_due(now_key()):
+                    # Drain everything due, then re-read deadlines: recurring
+                    # tasks have moved and others may have completed
+                    while _claim_and_execute() == CLAIM_BATCH:
+                        pass
+                    reload = True
+                    continue
+
+                timeout = max_sleep
+                next_due = queue.next_deadline()
+                if next_due is not None:
+                    delta = key_to_datetime(next_due) - datetime.now(tz=UTC)
+                    timeout = min(max_sleep, delta.total_seconds())
+
+                if listener.wait(timeout) or timeout >= max_sleep:
+                    reload = True
+            except Exception:
+                log.exception("Executor loop error")
+                reload = True
+                time.sleep(1)
+    finally:
+        listener.close()
+        log.info("Task executor stopped")
+
+
+def _claim_and_execute() -> int:
+    """Run up to CLAIM_BATCH due tasks. Returns how many were selected."""
     conn = get_db()
     cur = conn.cursor()
 
-    now = datetime.now(tz=UTC).isoformat()
+    now = now_key()
 
     cur.execute(
         """
         SELECT *
         FROM detected_tasks
         WHERE status='confirmed'
-          AND json_extract(normalized_json, '$.scheduled_for') IS NOT NULL
-          AND json_extract(normalized_json, '$.scheduled_for') != '' 
-          AND json_extract(normalized_json, '$.scheduled_for') <= ?
-        ORDER BY id
-        LIMIT 10
+          AND scheduled_for IS NOT NULL
+          AND scheduled_for <= ?
+        ORDER BY scheduled_for, id
+        LIMIT ?
         """,
-        (now,),
+        (now, CLAIM_BATCH),
     )
 
     tasks = cur.fetchall()
@@ -161,9 +271,12 @@ def _claim_and_execute():
     for task in tasks:
         task_id = task["id"]
         normalized = json.loads(task["normalized_json"] or "{}")
-        scheduled_for = datetime.fromisoformat(
-            normalized["scheduled_for"]
-        ).astimezone(UTC)
+        if normalized.get("scheduled_for"):
+            scheduled_for = datetime.fromisoformat(
+                normalized["scheduled_for"]
+            ).astimezone(UTC)
+        else:
+            scheduled_for = key_to_datetime(task["scheduled_for"])
 
         log.info(f"Claiming task {task_id}")
 
@@ -204,10 +317,10 @@ def _claim_and_execute():
                 cur.execute(
                     """
                     UPDATE detected_tasks
-                    SET normalized_json=?, status='confirmed'
+                    SET normalized_json=?, scheduled_for=?, status='confirmed'
                     WHERE id=?
                     """,
-                    (json.dumps(normalized), task_id),
+                    (json.dumps(normalized), scheduled_for_key(next_dt), task_id),
                 )
             else:
                 cur.execute(
@@ -242,16 +355,28 @@ def _claim_and_execute():
                 (str(e), run_id),
             )
 
+            # Retry later without rewriting the user's scheduled_for in
+            # normalized_json; only the index column moves
+            retry_at = datetime.now(tz=UTC) + timedelta(seconds=FAILED_RETRY_DELAY)
             cur.execute(
                 """
                 UPDATE detected_tasks
-                SET status='confirmed'
+                SET status='confirmed', scheduled_for=?
                 WHERE id=?
                 """,
-                (task_id,),
+                (scheduled_for_key(retry_at), task_id),
             )
 
         conn.commit()
 
     conn.close()
+    return len(tasks)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    run_task_executor()
 
@@ -44,6 +44,9 @@ DEFAULT_CORRECTIONS = {
 
 _corrections_cache = None
 
+# Compiled matcher: (corrections dict it was built from, pattern, variant → term)
+_matcher = None
+
 
 def load_corrections():
     """Load correction dictionary (NAS file or defaults)."""
@@ -60,36 +63,85 @@ def load_corrections():
     return _corrections_cache
 
 
-def apply_corrections(text):
+def _trie_regex(words):
     """
-    Apply Hebrew term corrections to text.
+    Build a prefix-factored alternation for a set of lowercase words.
 
-    For each correction target, checks if any of its error variants
-    appear in the text (case-insensitive) and replaces them.
-
-    Returns: (corrected_text, corrections_made_count)
+    Sibling branches start with distinct characters, so the engine tries
+    at most one branch per character instead of every variant. Optional
+    suffixes are greedy: the longest variant is tried first, falling back
+    to shorter ones if the word boundary fails.
     """
-    corrections = load_corrections()
-    count = 0
-
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return ("(?:" + body + ")?") if len(branches) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+def _get_matcher(corrections):
+    """Compile (once per dictionary) a single regex matching every variant."""
+    global _matcher
+    if _matcher is not None and _matcher[0] is corrections:
+        return _matcher[1], _matcher[2]
+
+    canonical = {}
     for correct_term, variants in corrections.items():
         for variant in variants:
-            # Skip if the variant IS the correct term
-            if variant.lower() == correct_term.lower():
+            key = variant.lower()
+            # Skip if the variant IS the correct term; on duplicates the
+            # first term in dictionary order wins, as it always has
+            if key == correct_term.lower() or key in canonical:
                 continue
+            canonical[key] = correct_term
+
+    pattern = None
+    if canonical:
+        pattern = re.compile(r"\b(?:" + _trie_regex(canonical) + r")\b", re.IGNORECASE)
+
+    # IGNORECASE also matches text whose .lower() differs from the variant's
+    # (e.g. the long s 'ſ' for 's'), so hits are looked up by casefold()
+    lookup = {}
+    for key, correct_term in canonical.items():
+        lookup.setdefault(key.casefold(), correct_term)
+
+    _matcher = (corrections, pattern, lookup)
+    return pattern, lookup
 
-            # Case-insensitive replacement, preserving word boundaries
-            pattern = re.compile(r"\b" + re.escape(variant) + r"\b", re.IGNORECASE)
-            new_text, n = pattern.subn(correct_term, text)
-            if n > 0:
-                text = new_text
-                count += n
 
-    return text, count
+def apply_corrections(text):
+    """
+    Apply Hebrew term corrections to text.
+
+    All variants are matched case-insensitively, at word boundaries, in a
+    single pass over the text. Where variants overlap, the longest match
+    wins, and each hit is replaced by its canonical term.
+
+    Returns: (corrected_text, corrections_made_count)
+    """
+    pattern, lookup = _get_matcher(load_corrections())
+    if pattern is None:
+        return text, 0
+
+    return pattern.subn(lambda m: lookup.get(m.group(0).casefold(), m.group(0)), text)
 
 
 def save_corrections(corrections_dict, path=None):
     """Save corrections dictionary to NAS."""
+    global _corrections_cache, _matcher
     if path is None:
         path = CORRECTIONS_FILE
 
@@ -97,3 +149,7 @@ def save_corrections(corrections_dict, path=None):
 
     with open(path, "w", encoding="utf-8") as f:
         json.dump(corrections_dict, f, indent=2, ensure_ascii=False)
+
+    # Drop the cached dictionary and compiled matcher; next use reloads
+    _corrections_cache = None
+    _matcher = None
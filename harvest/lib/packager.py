@@ -49,6 +49,8 @@ def build_package(
     metadata=None,
     copyright_note="Personal research use only",
     hebrew_corrections_applied=False,
+    chunks=None,
+    embeddings=None,
 ):
     """
     Build a complete harvest package from raw text.
@@ -70,19 +72,25 @@ def build_package(
         metadata: Additional metadata dict.
         copyright_note: Copyright/usage note.
         hebrew_corrections_applied: Whether Hebrew term corrections were applied.
+        chunks: Pre-computed chunk_text_filtered(text) output (parallel
+                processing chunks in worker processes).
+        embeddings: Pre-computed embeddings aligned with chunks (batched
+                    across files by the caller).
 
     Returns:
         dict: Complete package ready for JSON serialization.
     """
     # Chunk the text
-    chunks = chunk_text_filtered(text)
+    if chunks is None:
+        chunks = chunk_text_filtered(text)
 
     if not chunks:
         return None
 
     # Generate embeddings for all chunks
-    chunk_texts = [c["content"] for c in chunks]
-    embeddings = embed_many(chunk_texts)
+    if embeddings is None:
+        chunk_texts = [c["content"] for c in chunks]
+        embeddings = embed_many(chunk_texts)
 
     # Attach embeddings to chunks
     package_chunks = []
@@ -158,8 +166,12 @@ def write_package(package, output_dir=None):
 
     output_path = os.path.join(output_dir, filename)
 
-    with open(output_path, "w", encoding="utf-8") as f:
+    # Write-then-rename so a killed run never leaves a truncated package
+    # for the importer to pick up
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(package, f, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
 
     return output_path
 
@@ -5,20 +5,33 @@ Main processor script: raw content → chunked → embedded → packaged.
 Watches /harvest/raw/{source}/ for content, processes it, writes
 ready packages to /harvest/ready/.
 
+With --workers N, loading, Hebrew correction and chunking fan out to a
+process pool; chunks are embedded in batches across files by the main
+process (one model instance) and packages are written in input order.
+
+Each file gets a completion marker in processed/{source}/ between packaging
+and the move out of raw/, so a killed run resumes without redoing finished
+files.
+
 Usage:
     python3 process_raw.py --source yavoh
     python3 process_raw.py --source lion-lamb-youtube
     python3 process_raw.py --source torah-class
     python3 process_raw.py --all
+    python3 process_raw.py --all --workers 8
 """
 
 import argparse
 import glob
 import json
 import logging
+import multiprocessing
 import os
 import sys
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from config.harvest_config import PROCESSED_DIR, RAW_DIR, READY_DIR
@@ -34,6 +47,15 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
+# Chunks accumulated across files before one embed_many() call
+EMBED_BATCH_CHUNKS = 256
+
+# Prepared files in flight per worker (bounds memory on large sources)
+PREFETCH_PER_WORKER = 4
+
+# Completion marker suffix, written to processed/{source}/
+DONE_MARKER_SUFFIX = ".done"
+
 
 def load_raw_item(path):
     """
@@ -75,7 +97,14 @@ def process_item(item, apply_hebrew=True):
             log.info(f"  Applied {corrections_count} Hebrew corrections")
 
     # Build the package (chunking + embedding happens inside)
-    package = build_package(
+    package = build_package(**_package_kwargs(item, text, corrections_count))
+
+    return package
+
+
+def _package_kwargs(item, text, corrections_count):
+    """build_package() keyword arguments for a raw item."""
+    return dict(
         text=text,
         filename=item.get("filename", "unknown.txt"),
         stored_path=item.get("stored_path", ""),
@@ -94,19 +123,225 @@ def process_item(item, apply_hebrew=True):
         hebrew_corrections_applied=(corrections_count > 0),
     )
 
-    return package
 
+def prepare_item(raw_path, apply_hebrew=True):
+    """
+    Load, correct and chunk one raw file. Runs in worker processes.
+
+    Returns:
+        dict with raw_path, item (without text), text, corrections_count
+        and chunks (empty if the item has no usable text).
+    """
+    item = load_raw_item(raw_path)
+    text = item.pop("text", "") or ""
+
+    corrections_count = 0
+    chunks = []
+    if text.strip():
+        if apply_hebrew:
+            text, corrections_count = apply_corrections(text)
+        chunks = chunk_text_filtered(text)
+
+    return {
+        "raw_path": raw_path,
+        "item": item,
+        "text": text,
+        "corrections_count": corrections_count,
+        "chunks": chunks,
+    }
+
+
+def _marker_path(processed_dir, basename):
+    return os.path.join(processed_dir, basename + DONE_MARKER_SUFFIX)
+
+
+def _raw_signature(raw_path):
+    """Size and mtime of a raw file, to tell a re-harvested file from the packaged one."""
+    st = os.stat(raw_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _finish_file(raw_path, processed_dir, output_path=None, chunk_count=None):
+    """
+    Record a file as done, then move it out of the raw directory.
+
+    The marker is written before the move, so a run killed in between
+    finds the marker on restart and only completes the move. It is
+    removed once the move succeeds, so a later file with the same name
+    is packaged again.
+    """
+    basename = os.path.basename(raw_path)
+    marker = _marker_path(processed_dir, basename)
+    if output_path is not None:
+        with open(marker, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "package": os.path.basename(output_path),
+                    "chunk_count": chunk_count,
+                    "completed_at": datetime.now(timezone.utc).isoformat(),
+                    **_raw_signature(raw_path),
+                },
+                f,
+            )
+    os.rename(raw_path, os.path.join(processed_dir, basename))
+    try:
+        os.remove(marker)
+    except FileNotFoundError:
+        pass
+
+
+def _marker_matches(marker, raw_path):
+    """True if the marker was written for this exact raw file."""
+    try:
+        with open(marker, "r", encoding="utf-8") as f:
+            done = json.load(f)
+    except (OSError, ValueError):
+        return False
+    signature = _raw_signature(raw_path)
+    return all(done.get(k) == v for k, v in signature.items())
+
+
+def _resume_finished(raw_files, processed_dir):
+    """Complete files packaged by a killed run; return the rest."""
+    remaining = []
+    for raw_path in raw_files:
+        basename = os.path.basename(raw_path)
+        marker = _marker_path(processed_dir, basename)
+        if not os.path.exists(marker):
+            remaining.append(raw_path)
+        elif _marker_matches(marker, raw_path):
+            log.info(f"Already packaged, finishing: {basename}")
+            _finish_file(raw_path, processed_dir)
+        else:
+            log.info(f"Stale completion marker, reprocessing: {basename}")
+            os.remove(marker)
+            remaining.append(raw_path)
+    return remaining
+
+
+def _process_files_parallel(raw_files, processed_dir, apply_hebrew, workers, ready_dir=None):
+    """
+    Process raw files with a worker pool.
+
+    Workers load, correct and chunk; this process embeds chunks in
+    batches of ~EMBED_BATCH_CHUNKS across files and writes packages in
+    input order.
+
+    Returns: (success, errors)
+    """
+    success = 0
+    errors = 0
+    pending = []
+    pending_chunks = 0
+
+    def flush():
+        nonlocal success, errors, pending_chunks
+        texts = [c["content"] for p in pending for c in p["chunks"]]
+        try:
+            embeddings = embed_many(texts)
+        except Exception as e:
+            log.error(f"  Embedding batch failed ({len(pending)} files): {e}")
+            errors += len(pending)
+            pending.clear()
+            pending_chunks = 0
+            return
+
+        pos = 0
+        for p in pending:
+            n = len(p["chunks"])
+            basename = os.path.basename(p["raw_path"])
+            try:
+                package = build_package(
+                    **_package_kwargs(p["item"], p["text"], p["corrections_count"]),
+                    chunks=p["chunks"],
+                    embeddings=embeddings[pos:pos + n],
+                )
+                output_path = write_package(package, output_dir=ready_dir)
+                _finish_file(p["raw_path"], processed_dir, output_path, n)
+                log.info(f"  {basename} → {os.path.basename(output_path)} ({n} chunks)")
+                success += 1
+            except Exception as e:
+                log.error(f"  {basename}: {e}")
+                errors += 1
+            pos += n
+
+        pending.clear()
+        pending_chunks = 0
+
+    total = len(raw_files)
+    window = max(1, workers * PREFETCH_PER_WORKER)
+    paths = iter(raw_files)
+
+    # spawn: workers never inherit the embedding model or its thread pools
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        in_flight = deque()
+        for raw_path in paths:
+            in_flight.append((raw_path, pool.submit(prepare_item, raw_path, apply_hebrew)))
+            if len(in_flight) >= window:
+                break
+
+        done = 0
+        while in_flight:
+            raw_path, future = in_flight.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                in_flight.append((next_path, pool.submit(prepare_item, next_path, apply_hebrew)))
+
+            done += 1
+            basename = os.path.basename(raw_path)
+            log.info(f"[{done}/{total}] {basename}")
+
+            try:
+                prepared = future.result()
+            except Exception as e:
+                log.error(f"  Error: {e}")
+                errors += 1
+                continue
+
+            if not prepared["chunks"]:
+                log.warning(f"Skipping {basename}: no text content")
+                errors += 1
+                continue
+
+            if prepared["corrections_count"] > 0:
+                log.info(f"  Applied {prepared['corrections_count']} Hebrew corrections")
+
+            pending.append(prepared)
+            pending_chunks += len(prepared["chunks"])
+            if pending_chunks >= EMBED_BATCH_CHUNKS:
+                flush()
 
-def process_source(source_name, apply_hebrew=True):
+        if pending:
+            flush()
+
+    return success, errors
+
+
+def process_source(
+    source_name,
+    apply_hebrew=True,
+    workers=1,
+    raw_root=RAW_DIR,
+    processed_root=PROCESSED_DIR,
+    ready_dir=None,
+):
     """
     Process all raw items for a given source.
 
     Looks in /harvest/raw/{source_name}/ for JSON files.
     Writes packages to /harvest/ready/.
     Moves processed raw files to /harvest/processed/{source_name}/.
+
+    Args:
+        source_name: Subdirectory of raw_root to process
+        apply_hebrew: Whether to apply Hebrew term corrections
+        workers: Worker processes for load/correct/chunk (1 = sequential)
+        raw_root, processed_root, ready_dir: Directory overrides (tests,
+            benchmarks); default to the NAS paths
     """
-    raw_dir = os.path.join(RAW_DIR, source_name)
-    processed_dir = os.path.join(PROCESSED_DIR, source_name)
+    raw_dir = os.path.join(raw_root, source_name)
+    processed_dir = os.path.join(processed_root, source_name)
     os.makedirs(processed_dir, exist_ok=True)
 
     if not os.path.isdir(raw_dir):
@@ -119,6 +354,11 @@ def process_source(source_name, apply_hebrew=True):
         log.info(f"No raw files found in {raw_dir}")
         return 0, 0
 
+    raw_files = _resume_finished(raw_files, processed_dir)
+    if not raw_files:
+        log.info(f"Nothing left to process in {raw_dir}")
+        return 0, 0
+
     log.info(f"Processing {len(raw_files)} items from {source_name}")
 
     # Pre-load the embedding model to avoid per-item loading
@@ -126,6 +366,15 @@ def process_source(source_name, apply_hebrew=True):
     get_model()
     log.info("Model loaded")
 
+    if workers > 1:
+        start = time.time()
+        success, errors = _process_files_parallel(
+            raw_files, processed_dir, apply_hebrew, workers, ready_dir=ready_dir
+        )
+        log.info(f"Done: {success} packaged, {errors} errors "
+                 f"({time.time() - start:.1f}s, {workers} workers)")
+        return success, errors
+
     success = 0
     errors = 0
 
@@ -142,13 +391,12 @@ def process_source(source_name, apply_hebrew=True):
                 continue
 
             # Write package to ready dir
-            output_path = write_package(package)
-            log.info(f"  → {os.path.basename(output_path)} "
-                     f"({package['processing']['chunk_count']} chunks)")
+            output_path = write_package(package, output_dir=ready_dir)
+            chunk_count = package["processing"]["chunk_count"]
+            log.info(f"  → {os.path.basename(output_path)} ({chunk_count} chunks)")
 
-            # Move raw file to processed
-            dest = os.path.join(processed_dir, basename)
-            os.rename(raw_path, dest)
+            # Mark done and move raw file to processed
+            _finish_file(raw_path, processed_dir, output_path, chunk_count)
 
             success += 1
 
@@ -160,7 +408,7 @@ def process_source(source_name, apply_hebrew=True):
     return success, errors
 
 
-def process_all(apply_hebrew=True):
+def process_all(apply_hebrew=True, workers=1):
     """Process all sources that have raw content waiting."""
     if not os.path.isdir(RAW_DIR):
         log.error(f"Raw directory not found: {RAW_DIR}")
@@ -181,7 +429,7 @@ def process_all(apply_hebrew=True):
     total_errors = 0
 
     for source in sorted(sources):
-        s, e = process_source(source, apply_hebrew=apply_hebrew)
+        s, e = process_source(source, apply_hebrew=apply_hebrew, workers=workers)
         total_success += s
         total_errors += e
 
@@ -196,6 +444,10 @@ def main():
         "--no-hebrew", action="store_true",
         help="Skip Hebrew term corrections"
     )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes for cleaning/chunking (default: 1, sequential)"
+    )
     args = parser.parse_args()
 
     if not args.source and not args.all:
@@ -204,9 +456,9 @@ def main():
     apply_hebrew = not args.no_hebrew
 
     if args.all:
-        process_all(apply_hebrew=apply_hebrew)
+        process_all(apply_hebrew=apply_hebrew, workers=args.workers)
     else:
-        process_source(args.source, apply_hebrew=apply_hebrew)
+        process_source(args.source, apply_hebrew=apply_hebrew, workers=args.workers)
 
 
 if __name__ == "__main__":
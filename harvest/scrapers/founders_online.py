@@ -31,6 +31,11 @@ Usage:
     # Retry failures
     python3 founders_online.py --download --all --resume --retry-failed
 
+Requests go through the shared runtime (runtime.py): --workers concurrent
+fetches held to --rate requests/sec by a token bucket, and a SQLite
+frontier recording each document as it is written, so --resume picks up
+exactly where a killed run stopped.
+
 Runs on: scraper machine or Tamor
 Output: /mnt/library/harvest/raw/founders-online/{Project}/*.json
 """
@@ -40,11 +45,9 @@ import json
 import logging
 import os
 import sys
-import time
-from datetime import datetime, timezone
-from pathlib import Path
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from collections import Counter
+
+from runtime import Crawl, write_json_atomic
 
 # ---------------------------------------------------------------------------
 # Config
@@ -54,7 +57,7 @@ HARVEST_BASE = "/mnt/library/harvest"
 RAW_DIR = os.path.join(HARVEST_BASE, "raw", "founders-online")
 CONFIG_DIR = os.path.join(HARVEST_BASE, "config")
 MANIFEST_PATH = os.path.join(CONFIG_DIR, "founders-online-manifest.json")
-LOG_PATH = os.path.join(CONFIG_DIR, "founders-online-download-log.json")
+LOG_PATH = os.path.join(CONFIG_DIR, "founders-online-download-log.json")  # legacy, imported into frontier
 
 BASE_URL = "https://founders.archives.gov"
 METADATA_URL = f"{BASE_URL}/Metadata/founders-online-metadata.json"
@@ -63,10 +66,10 @@ API_URL = f"{BASE_URL}/API/docdata"
 # Respectful rate limiting — their docs say max 10 req/sec.
 # Default 5/sec to be a good citizen. ~10 hours for full corpus.
 REQUESTS_PER_SECOND = 5
-REQUEST_DELAY = 1.0 / REQUESTS_PER_SECOND
+MAX_REQUESTS_PER_SECOND = 10.0
 
-MAX_RETRIES = 3
-RETRY_BACKOFF = 5  # seconds, doubles each retry
+# Concurrent fetches; the token bucket, not the pool, sets the rate
+WORKERS = 4
 
 HEADERS = {
     "User-Agent": "TamorHarvest/1.0 (personal research library)",
@@ -81,7 +84,7 @@ SOURCE_NAME = "Founders Online"
 THEOLOGICAL_STREAM = "founding-era"
 COLLECTION_NAME = "Founders Online"
 
-CHECKPOINT_INTERVAL = 100  # save progress every N documents
+PROGRESS_INTERVAL = 500  # log progress every N documents
 
 logging.basicConfig(
     level=logging.INFO,
@@ -95,20 +98,12 @@ log = logging.getLogger(__name__)
 # Helpers
 # ---------------------------------------------------------------------------
 
-def fetch_url(url: str, retries: int = MAX_RETRIES) -> bytes:
-    """Fetch URL with retry logic."""
-    req = Request(url, headers=HEADERS)
-    for attempt in range(retries):
-        try:
-            with urlopen(req, timeout=60) as resp:
-                return resp.read()
-        except (HTTPError, URLError, TimeoutError) as e:
-            wait = RETRY_BACKOFF * (2 ** attempt)
-            if attempt < retries - 1:
-                log.warning(f"Request failed ({e}), retrying in {wait}s... [{attempt+1}/{retries}]")
-                time.sleep(wait)
-            else:
-                raise
+def open_crawl(rate: float = REQUESTS_PER_SECOND, workers: int = WORKERS) -> Crawl:
+    """Shared runtime state (frontier) for this source."""
+    return Crawl(
+        "founders-online", CONFIG_DIR, headers=HEADERS,
+        rate=min(rate, MAX_REQUESTS_PER_SECOND), workers=workers,
+    )
 
 
 def extract_doc_id(permalink: str) -> str:
@@ -129,31 +124,6 @@ def extract_project(doc_id: str) -> str:
     return doc_id.split("/")[0]
 
 
-def load_download_log(path: str) -> dict:
-    """Load or initialize download progress log."""
-    if os.path.exists(path):
-        with open(path) as f:
-            return json.load(f)
-    return {
-        "started": datetime.now(timezone.utc).isoformat(),
-        "completed_ids": [],
-        "failed_ids": [],
-        "total_documents": 0,
-        "total_fetched": 0,
-        "total_bytes": 0,
-        "last_updated": None,
-    }
-
-
-def save_download_log(path: str, dl_log: dict):
-    """Save download progress atomically."""
-    dl_log["last_updated"] = datetime.now(timezone.utc).isoformat()
-    tmp = path + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(dl_log, f, indent=2)
-    os.replace(tmp, path)
-
-
 def format_authors(authors: list) -> str:
     """Join author list for metadata. 'Washington, George' → 'George Washington'."""
     result = []
@@ -183,10 +153,14 @@ def do_discover():
         log.info(f"Metadata file exists ({size_mb:.1f} MB), loading...")
     else:
         log.info(f"Downloading metadata index from {METADATA_URL}...")
-        data = fetch_url(METADATA_URL)
+        crawl = open_crawl()
+        resp = crawl.fetcher.get(METADATA_URL, timeout=300, cache=False)
+        crawl.close()
+        if resp.status == 404:
+            raise RuntimeError(f"Metadata index not found: {METADATA_URL}")
         with open(meta_file, "wb") as f:
-            f.write(data)
-        log.info(f"Downloaded {len(data) / 1e6:.1f} MB")
+            f.write(resp.content)
+        log.info(f"Downloaded {len(resp.content) / 1e6:.1f} MB")
 
     log.info("Parsing metadata...")
     with open(meta_file) as f:
@@ -223,15 +197,13 @@ def do_discover():
     log.info(f"Skipped {skipped_editorial:,} editorial items (no date)")
 
     # Breakdown by project
-    from collections import Counter
     counts = Counter(d["project"] for d in manifest)
     log.info("Documents by Founder:")
     for proj, count in sorted(counts.items()):
         log.info(f"  {proj}: {count:,}")
 
     # Save manifest
-    with open(MANIFEST_PATH, "w") as f:
-        json.dump(manifest, f, indent=2)
+    write_json_atomic(MANIFEST_PATH, manifest)
     log.info(f"Manifest saved: {MANIFEST_PATH}")
 
     return manifest
@@ -241,17 +213,15 @@ def do_discover():
 # Phase 2: Download full text
 # ---------------------------------------------------------------------------
 
-def fetch_document(doc_id: str) -> dict | None:
+def fetch_document(doc_id: str, fetcher) -> dict | None:
     """Fetch a single document's full text from the API."""
     url = f"{API_URL}/{doc_id}"
+    resp = fetcher.get(url, timeout=60, cache=False)
+    if resp.status == 404:
+        log.warning(f"404: {doc_id}")
+        return None
     try:
-        data = fetch_url(url)
-        return json.loads(data)
-    except HTTPError as e:
-        if e.code == 404:
-            log.warning(f"404: {doc_id}")
-            return None
-        raise
+        return resp.json()
     except json.JSONDecodeError:
         log.warning(f"Invalid JSON: {doc_id}")
         return None
@@ -328,11 +298,8 @@ def build_raw_json(api_doc: dict, manifest_entry: dict) -> dict:
 
 
 def do_download(project_filter=None, resume=False, retry_failed=False,
-                dry_run=False, rate=REQUESTS_PER_SECOND):
+                dry_run=False, rate=REQUESTS_PER_SECOND, workers=WORKERS):
     """Download full text for all documents in manifest."""
-    global REQUEST_DELAY
-    REQUEST_DELAY = 1.0 / min(rate, 10.0)
-
     # Load manifest
     if not os.path.exists(MANIFEST_PATH):
         log.error(f"Manifest not found: {MANIFEST_PATH}")
@@ -348,39 +315,48 @@ def do_download(project_filter=None, resume=False, retry_failed=False,
         manifest = [d for d in manifest if d["project"] == project_filter]
         log.info(f"Filtered to {project_filter}: {len(manifest):,} documents")
 
-    # Load download log
-    dl_log = load_download_log(LOG_PATH)
+    crawl = open_crawl(rate=rate, workers=workers)
+    by_project = {}
+    for d in manifest:
+        by_project.setdefault(d["project"], []).append(d)
+    added = sum(
+        crawl.frontier.add_many(docs, kind=project, key="doc_id")
+        for project, docs in by_project.items()
+    )
+    if added:
+        crawl.import_legacy_log(LOG_PATH, key="completed_ids")
 
+    kind = project_filter
     if retry_failed:
-        n_failed = len(dl_log.get("failed_ids", []))
+        n_failed = crawl.frontier.reset_failed(kind=kind)
         log.info(f"Clearing {n_failed} failed IDs for retry")
-        dl_log["failed_ids"] = []
-        save_download_log(LOG_PATH, dl_log)
 
-    completed = set(dl_log.get("completed_ids", []))
-    failed = set(dl_log.get("failed_ids", []))
+    counts = crawl.frontier.counts(kind=kind)
 
-    if not resume and completed:
+    if not resume and counts["done"]:
         log.warning(
-            f"Existing log has {len(completed):,} completed documents. "
-            f"Use --resume to continue, or delete {LOG_PATH} to start fresh."
+            f"Existing crawl has {counts['done']:,} completed documents. "
+            f"Use --resume to continue, or delete {crawl.db_path} to start fresh."
         )
+        crawl.close()
         return
 
-    # Filter to what still needs fetching
-    to_fetch = [d for d in manifest if d["doc_id"] not in completed]
-    log.info(f"To fetch: {len(to_fetch):,} ({len(completed):,} already done)")
+    log.info(f"To fetch: {counts['pending']:,} ({counts['done']:,} already done, "
+             f"{counts['failed']:,} failed)")
 
     if dry_run:
+        to_fetch = crawl.frontier.pending(kind=kind, limit=20)
         log.info("DRY RUN — would fetch:")
-        for d in to_fetch[:20]:
-            log.info(f"  {d['doc_id']}: {d['title'][:80]}")
-        if len(to_fetch) > 20:
-            log.info(f"  ... and {len(to_fetch) - 20:,} more")
+        for doc_id, d in to_fetch:
+            log.info(f"  {doc_id}: {d['title'][:80]}")
+        if counts["pending"] > 20:
+            log.info(f"  ... and {counts['pending'] - 20:,} more")
+        crawl.close()
         return
 
-    if not to_fetch:
+    if not counts["pending"]:
         log.info("Nothing to fetch — all done!")
+        crawl.close()
         return
 
     # Ensure output dirs exist
@@ -388,74 +364,33 @@ def do_download(project_filter=None, resume=False, retry_failed=False,
     for proj in VALID_PROJECTS:
         os.makedirs(os.path.join(RAW_DIR, proj), exist_ok=True)
 
-    dl_log["total_documents"] = len(manifest)
-    start_time = time.time()
-
-    for i, entry in enumerate(to_fetch):
+    def download_one(entry):
         doc_id = entry["doc_id"]
+        api_doc = fetch_document(doc_id, crawl.fetcher)
+        if api_doc is None:
+            return "failed"
 
-        try:
-            api_doc = fetch_document(doc_id)
-            if api_doc is None:
-                failed.add(doc_id)
-                dl_log["failed_ids"] = list(failed)
-                continue
-
-            raw = build_raw_json(api_doc, entry)
-
-            # Write to /harvest/raw/founders-online/{Project}/{id}.json
-            project = entry["project"]
-            id_slug = doc_id.split("/", 1)[1] if "/" in doc_id else doc_id
-            out_path = os.path.join(RAW_DIR, project, f"{id_slug}.json")
-            content = json.dumps(raw, indent=2, ensure_ascii=False)
-            with open(out_path, "w", encoding="utf-8") as f:
-                f.write(content)
-
-            nbytes = len(content.encode("utf-8"))
-            completed.add(doc_id)
-            dl_log["completed_ids"] = list(completed)
-            dl_log["total_fetched"] = len(completed)
-            dl_log["total_bytes"] = dl_log.get("total_bytes", 0) + nbytes
-
-        except Exception as e:
-            log.error(f"Error fetching {doc_id}: {e}")
-            failed.add(doc_id)
-            dl_log["failed_ids"] = list(failed)
-
-        # Progress
-        if (i + 1) % 100 == 0:
-            elapsed = time.time() - start_time
-            rate_actual = (i + 1) / elapsed if elapsed > 0 else 0
-            remaining_sec = (len(to_fetch) - i - 1) / rate_actual if rate_actual > 0 else 0
-            pct = len(completed) / len(manifest) * 100
-            log.info(
-                f"Progress: {len(completed):,}/{len(manifest):,} ({pct:.1f}%) | "
-                f"{rate_actual:.1f} docs/sec | ETA: {remaining_sec/3600:.1f}h | "
-                f"Failed: {len(failed)}"
-            )
-
-        # Checkpoint
-        if (i + 1) % CHECKPOINT_INTERVAL == 0:
-            save_download_log(LOG_PATH, dl_log)
-
-        time.sleep(REQUEST_DELAY)
-
-    # Final save
-    save_download_log(LOG_PATH, dl_log)
-    elapsed = time.time() - start_time
-    size_gb = dl_log.get("total_bytes", 0) / 1e9
+        raw = build_raw_json(api_doc, entry)
+
+        # Write to /harvest/raw/founders-online/{Project}/{id}.json
+        project = entry["project"]
+        id_slug = doc_id.split("/", 1)[1] if "/" in doc_id else doc_id
+        write_json_atomic(os.path.join(RAW_DIR, project, f"{id_slug}.json"), raw)
+
+    stats = crawl.run(download_one, kind=kind, progress_every=PROGRESS_INTERVAL)
+    counts = crawl.frontier.counts(kind=kind)
+    crawl.close()
 
     log.info("=" * 60)
     log.info("HARVEST COMPLETE")
-    log.info(f"  Total: {len(manifest):,}")
-    log.info(f"  Fetched: {len(completed):,}")
-    log.info(f"  Failed: {len(failed):,}")
-    log.info(f"  Size: {size_gb:.2f} GB")
-    log.info(f"  Time: {elapsed/3600:.1f} hours")
+    log.info(f"  Total: {counts['total']:,}")
+    log.info(f"  Fetched: {counts['done']:,} ({stats['done']:,} this run)")
+    log.info(f"  Failed: {counts['failed']:,}")
+    log.info(f"  Time: {stats['elapsed']/3600:.1f} hours")
     log.info("=" * 60)
 
-    if failed:
-        log.warning(f"Re-run with --resume --retry-failed to retry {len(failed)} failures")
+    if counts["failed"]:
+        log.warning(f"Re-run with --resume --retry-failed to retry {counts['failed']} failures")
 
 
 # ---------------------------------------------------------------------------
@@ -482,6 +417,8 @@ def main():
                         help="Show what would be fetched")
     parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND,
                         help=f"Requests per second (default: {REQUESTS_PER_SECOND}, max: 10)")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help=f"Concurrent fetches (default: {WORKERS})")
 
     args = parser.parse_args()
 
@@ -503,6 +440,7 @@ def main():
             retry_failed=args.retry_failed,
             dry_run=args.dry_run,
             rate=args.rate,
+            workers=args.workers,
         )
 
 
@@ -0,0 +1,636 @@
+"""
+Shared scraper runtime — polite concurrent fetching with resumable state.
+
+Used by the scrapers in this directory. Provides:
+
+- Fetcher: pooled HTTP session with per-host token-bucket rate limits,
+  retry/backoff on 429/5xx, and conditional GET (ETag / Last-Modified)
+  against an on-disk fetch cache
+- Frontier: crawl frontier persisted to SQLite, so a killed download
+  resumes where it stopped instead of re-walking the manifest
+- run_frontier: bounded worker pool that drains a frontier through a
+  per-item handler; each item's raw output is written as it completes
+
+State lives next to the manifests:
+    {CONFIG_DIR}/{source}-crawl.db      frontier + fetch cache index
+    {CONFIG_DIR}/{source}-cache/        cached response bodies
+
+Usage:
+    from runtime import Crawl, SkipItem, write_json_atomic
+
+    crawl = Crawl("yavoh", CONFIG_DIR, headers=HEADERS, delay=1.5, workers=4)
+    page = crawl.fetcher.get(url)                 # polite, cached
+    crawl.frontier.add_many(items, kind="article", key="url")
+
+    def handle(item):
+        ...
+        write_json_atomic(output_path, raw_item)
+
+    crawl.run(handle, kind="article", limit=10)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+MAX_RETRIES = 3
+RETRY_BACKOFF = 2.0        # seconds, doubles each retry
+RETRY_AFTER_CAP = 120.0    # never honour a Retry-After longer than this
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def write_json_atomic(path, obj, indent=2):
+    """Write JSON via temp file + rename, so readers never see a partial file."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Politeness
+# ---------------------------------------------------------------------------
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Callers reserve a token under the lock and sleep outside it, so
+    waiting threads are served in arrival order at exactly `rate`/s.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, blocking until it is available. Returns seconds waited."""
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay:
+            self._sleep(delay)
+        return delay
+
+
+class HostLimiter:
+    """One TokenBucket per host; rates can be overridden per host."""
+
+    def __init__(self, rate, burst=1, overrides=None):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.overrides.get(host, self.rate), self.burst)
+                self._buckets[host] = bucket
+        return bucket.acquire()
+
+
+# ---------------------------------------------------------------------------
+# Fetch cache (conditional GET)
+# ---------------------------------------------------------------------------
+
+class FetchCache:
+    """
+    Response bodies on disk, validators (ETag / Last-Modified) in SQLite.
+
+    Only successful GETs fetched with cache=True are stored.
+    """
+
+    def __init__(self, db, cache_dir):
+        self.db = db
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        with self.db.lock:
+            self.db.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fetch_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_type TEXT,
+                    body_path TEXT NOT NULL,
+                    size_bytes INTEGER,
+                    fetched_at TEXT,
+                    validated_at TEXT
+                )
+                """
+            )
+            self.db.conn.commit()
+
+    def _body_path(self, url):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(digest[:2], digest)
+
+    def lookup(self, url):
+        """Return the cache row for a URL if its body is still on disk."""
+        with self.db.lock:
+            row = self.db.conn.execute(
+                "SELECT * FROM fetch_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if row and os.path.exists(os.path.join(self.cache_dir, row["body_path"])):
+            return row
+        return None
+
+    def read(self, row):
+        with open(os.path.join(self.cache_dir, row["body_path"]), "rb") as f:
+            return f.read()
+
+    def store(self, url, content, headers):
+        rel = self._body_path(url)
+        path = os.path.join(self.cache_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+        now = _now()
+        with self.db.lock:
+            self.db.conn.execute(
+                """
+                INSERT OR REPLACE INTO fetch_cache
+                    (url, etag, last_modified, content_type, body_path,
+                     size_bytes, fetched_at, validated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    url,
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                    headers.get("Content-Type"),
+                    rel,
+                    len(content),
+                    now,
+                    now,
+                ),
+            )
+            self.db.conn.commit()
+
+    def touch(self, url):
+        """Record a successful revalidation (304)."""
+        with self.db.lock:
+            self.db.conn.execute(
+                "UPDATE fetch_cache SET validated_at = ? WHERE url = ?", (_now(), url)
+            )
+            self.db.conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Fetcher
+# ---------------------------------------------------------------------------
+
+class FetchResult:
+    """Response body plus the bits scrapers use. from_cache is True on a 304."""
+
+    def __init__(self, url, status, content, headers, from_cache=False):
+        self.url = url
+        self.status = status
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        content_type = self.headers.get("Content-Type") or ""
+        charset = "utf-8"
+        for part in content_type.split(";")[1:]:
+            key, _, value = part.strip().partition("=")
+            if key.lower() == "charset" and value:
+                charset = value.strip('"')
+        try:
+            return self.content.decode(charset, errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class Fetcher:
+    """
+    Pooled, rate-limited, retrying GET client.
+
+    Statuses other than 2xx/304/404 raise requests.HTTPError after retries;
+    404 is returned so callers can record it as a soft failure.
+    """
+
+    def __init__(self, headers=None, limiter=None, cache=None, pool_size=DEFAULT_WORKERS,
+                 max_retries=MAX_RETRIES, backoff=RETRY_BACKOFF):
+        self.headers = dict(headers or {})
+        self.limiter = limiter
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "not_modified": 0, "retries": 0, "bytes": 0}
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def get(self, url, timeout=30, cache=True):
+        """
+        GET a URL politely.
+
+        Args:
+            url: URL to fetch
+            timeout: Per-request timeout in seconds
+            cache: Revalidate against / store in the fetch cache. Use False
+                   for large one-shot downloads (PDFs, API documents).
+        """
+        cached = self.cache.lookup(url) if (cache and self.cache) else None
+        headers = dict(self.headers)
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.max_retries):
+            is_last = attempt >= self.max_retries - 1
+            if self.limiter:
+                self.limiter.acquire(url)
+            self._count("requests")
+            try:
+                resp = self.session.get(url, headers=headers, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if is_last:
+                    raise
+                wait_s = self.backoff * (2 ** attempt)
+                log.warning(f"Request failed ({e}), retrying in {wait_s:.0f}s... [{attempt + 1}/{self.max_retries}]")
+                self._count("retries")
+                time.sleep(wait_s)
+                continue
+
+            if resp.status_code in RETRY_STATUSES and not is_last:
+                wait_s = _retry_after(resp.headers.get("Retry-After"))
+                if wait_s is None:
+                    wait_s = self.backoff * (2 ** attempt)
+                log.warning(f"{url} returned {resp.status_code}, retrying in {wait_s:.0f}s "
+                            f"[{attempt + 1}/{self.max_retries}]")
+                resp.close()
+                self._count("retries")
+                time.sleep(wait_s)
+                continue
+
+            if resp.status_code == 304 and cached:
+                self._count("not_modified")
+                self.cache.touch(url)
+                return FetchResult(url, 200, self.cache.read(cached),
+                                   {"Content-Type": cached["content_type"] or ""}, from_cache=True)
+
+            if resp.status_code == 404:
+                return FetchResult(url, 404, resp.content, resp.headers)
+
+            resp.raise_for_status()
+            self._count("bytes", len(resp.content))
+            if cache and self.cache:
+                self.cache.store(url, resp.content, resp.headers)
+            return FetchResult(url, resp.status_code, resp.content, resp.headers)
+
+    def close(self):
+        self.session.close()
+
+
+def _retry_after(value):
+    """Retry-After (seconds or HTTP-date) → seconds, capped; None if absent."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return max(0.0, min(seconds, RETRY_AFTER_CAP))
+
+
+# ---------------------------------------------------------------------------
+# Frontier
+# ---------------------------------------------------------------------------
+
+class SkipItem(Exception):
+    """Raised by a handler to record an item as failed without a traceback."""
+
+
+class _StateDB:
+    """One SQLite connection shared by the runtime's threads."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.lock = threading.Lock()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class Frontier:
+    """
+    Crawl frontier persisted to SQLite.
+
+    Items keep manifest order (insertion order); states are
+    'pending' → 'done' | 'failed'. Re-adding a known key is a no-op,
+    so rebuilding the frontier from a fresh manifest only adds new items.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        with self.db.lock:
+            self.db.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS frontier (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL UNIQUE,
+                    kind TEXT NOT NULL DEFAULT '',
+                    data_json TEXT,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    updated_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_frontier_kind_state
+                    ON frontier(kind, state, seq);
+                CREATE TABLE IF NOT EXISTS frontier_imports (
+                    source TEXT PRIMARY KEY,
+                    keys INTEGER NOT NULL,
+                    imported_at TEXT
+                );
+                """
+            )
+            self.db.conn.commit()
+
+    def add_many(self, items, kind="", key="url"):
+        """Add manifest entries (dicts); returns how many were new."""
+        rows = [(item[key], kind, json.dumps(item, ensure_ascii=False)) for item in items]
+        with self.db.lock:
+            before = self.db.conn.total_changes
+            self.db.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (key, kind, data_json) VALUES (?, ?, ?)", rows
+            )
+            self.db.conn.commit()
+            return self.db.conn.total_changes - before
+
+    def mark_done_keys(self, keys, source=None):
+        """
+        Mark keys done without running them (e.g. imported from a legacy log).
+
+        With source, the import is recorded in the same transaction so
+        imported(source) is true afterwards.
+        """
+        keys = list(keys)
+        with self.db.lock:
+            self.db.conn.executemany(
+                "UPDATE frontier SET state = 'done', updated_at = ? WHERE key = ?",
+                [(_now(), k) for k in keys],
+            )
+            if source is not None:
+                self.db.conn.execute(
+                    "INSERT OR REPLACE INTO frontier_imports (source, keys, imported_at) VALUES (?, ?, ?)",
+                    (source, len(keys), _now()),
+                )
+            self.db.conn.commit()
+
+    def imported(self, source):
+        """True if mark_done_keys() already ran for this source."""
+        with self.db.lock:
+            row = self.db.conn.execute(
+                "SELECT 1 FROM frontier_imports WHERE source = ?", (source,)
+            ).fetchone()
+        return row is not None
+
+    def pending(self, kind=None, include_failed=False, limit=None):
+        """Items still to run, in manifest order."""
+        states = ("pending", "failed") if include_failed else ("pending",)
+        sql = f"SELECT key, data_json FROM frontier WHERE state IN ({','.join('?' * len(states))})"
+        params = list(states)
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        sql += " ORDER BY seq"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.db.lock:
+            rows = self.db.conn.execute(sql, params).fetchall()
+        return [(row["key"], json.loads(row["data_json"]) if row["data_json"] else {}) for row in rows]
+
+    def mark(self, key, state, error=None):
+        with self.db.lock:
+            self.db.conn.execute(
+                """
+                UPDATE frontier
+                SET state = ?, error = ?, attempts = attempts + 1, updated_at = ?
+                WHERE key = ?
+                """,
+                (state, error, _now(), key),
+            )
+            self.db.conn.commit()
+
+    def reset_failed(self, kind=None):
+        sql = "UPDATE frontier SET state = 'pending', error = NULL WHERE state = 'failed'"
+        params = []
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        with self.db.lock:
+            cur = self.db.conn.execute(sql, params)
+            self.db.conn.commit()
+            return cur.rowcount
+
+    def counts(self, kind=None):
+        sql = "SELECT state, COUNT(*) AS n FROM frontier"
+        params = []
+        if kind is not None:
+            sql += " WHERE kind = ?"
+            params.append(kind)
+        sql += " GROUP BY state"
+        with self.db.lock:
+            by_state = {r["state"]: r["n"] for r in self.db.conn.execute(sql, params)}
+        return {
+            "pending": by_state.get("pending", 0),
+            "done": by_state.get("done", 0),
+            "failed": by_state.get("failed", 0),
+            "total": sum(by_state.values()),
+        }
+
+    def failures(self, kind=None):
+        sql = "SELECT key, error FROM frontier WHERE state = 'failed'"
+        params = []
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        with self.db.lock:
+            return [(r["key"], r["error"]) for r in self.db.conn.execute(sql + " ORDER BY seq", params)]
+
+
+def run_frontier(frontier, handler, workers=DEFAULT_WORKERS, kind=None, limit=None,
+                 include_failed=False, progress_every=25):
+    """
+    Drain a frontier through `handler(item) -> str | None` with a bounded pool.
+
+    The handler fetches, extracts and writes one item's raw output. Return
+    "skipped" for items that needed no work (e.g. output already exists).
+    Raise SkipItem(reason), or return "failed", for expected failures; any
+    other exception is logged and recorded too. Each item's state is persisted as soon as it
+    finishes, so an interrupted run resumes with only unfinished items.
+
+    Returns:
+        {'done': n, 'skipped': n, 'failed': n, 'elapsed': seconds}
+    """
+    items = frontier.pending(kind=kind, include_failed=include_failed, limit=limit)
+    total = len(items)
+    stats = {"done": 0, "skipped": 0, "failed": 0}
+    start = time.time()
+    if not items:
+        stats["elapsed"] = 0.0
+        return stats
+
+    log.info(f"Running {total} items with {workers} workers")
+
+    def run_one(key, item):
+        try:
+            return key, handler(item) or "done", None
+        except SkipItem as e:
+            return key, "failed", str(e)
+        except Exception as e:
+            log.error(f"  Error on {key}: {e}")
+            return key, "failed", str(e)
+
+    queue = iter(items)
+    finished = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Keep at most 2x workers in flight so a huge frontier isn't
+        # materialised as futures up front
+        in_flight = set()
+        for key, item in queue:
+            in_flight.add(pool.submit(run_one, key, item))
+            if len(in_flight) >= workers * 2:
+                break
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, outcome, error = future.result()
+                if outcome == "failed":
+                    frontier.mark(key, "failed", error)
+                    if error:
+                        log.warning(f"  Failed {key}: {error}")
+                else:
+                    frontier.mark(key, "done")
+                stats["failed" if outcome == "failed" else ("skipped" if outcome == "skipped" else "done")] += 1
+                finished += 1
+
+                nxt = next(queue, None)
+                if nxt is not None:
+                    in_flight.add(pool.submit(run_one, *nxt))
+
+            if progress_every and finished % progress_every == 0 or not in_flight:
+                elapsed = time.time() - start
+                rate = finished / elapsed if elapsed > 0 else 0
+                log.info(f"Progress: {finished}/{total} | {rate:.2f} items/s | "
+                         f"done {stats['done']}, skipped {stats['skipped']}, failed {stats['failed']}")
+
+    stats["elapsed"] = time.time() - start
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Crawl — one scraper's runtime state
+# ---------------------------------------------------------------------------
+
+class Crawl:
+    """
+    Frontier, fetch cache and fetcher for one source, sharing one state DB.
+
+    Args:
+        name: Source slug ('yavoh', 'torah-class', ...)
+        state_dir: Directory for {name}-crawl.db and {name}-cache/
+        headers: Default request headers (User-Agent)
+        delay: Minimum seconds between requests to the same host
+        rate: Requests/second per host (overrides delay)
+        workers: Worker threads for run()
+        host_rates: Per-host rate overrides {host: req/s}
+    """
+
+    def __init__(self, name, state_dir, headers=None, delay=1.5, rate=None, workers=DEFAULT_WORKERS,
+                 host_rates=None):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.db_path = os.path.join(state_dir, f"{name}-crawl.db")
+        self.db = _StateDB(self.db_path)
+        self.frontier = Frontier(self.db)
+        self.cache = FetchCache(self.db, os.path.join(state_dir, f"{name}-cache"))
+        per_host = rate if rate else (1.0 / delay if delay and delay > 0 else 1000.0)
+        self.fetcher = Fetcher(
+            headers=headers,
+            limiter=HostLimiter(per_host, overrides=host_rates),
+            cache=self.cache,
+            pool_size=self.workers,
+        )
+
+    def run(self, handler, kind=None, limit=None, include_failed=False, progress_every=25):
+        return run_frontier(self.frontier, handler, workers=self.workers, kind=kind, limit=limit,
+                            include_failed=include_failed, progress_every=progress_every)
+
+    def import_legacy_log(self, log_path, key="downloaded"):
+        """
+        Mark items listed in an old JSON download log as done.
+
+        Runs once per log: the import is recorded in the frontier DB and
+        later calls return 0 without reading the log again.
+        """
+        source = f"{os.path.abspath(log_path)}#{key}"
+        if not os.path.exists(log_path) or self.frontier.imported(source):
+            return 0
+        with open(log_path, "r") as f:
+            keys = json.load(f).get(key, [])
+        self.frontier.mark_done_keys(keys, source=source)
+        return len(keys)
+
+    def close(self):
+        self.fetcher.close()
+        self.db.close()
@@ -13,6 +13,12 @@ Usage:
     python3 torah_class.py --download --book genesis --limit 5
     python3 torah_class.py --download --book genesis  # all Genesis
     python3 torah_class.py --download --all            # everything
+    python3 torah_class.py --download --all --workers 4
+
+Requests go through the shared runtime (runtime.py): per-host rate limit
+of --delay seconds (lesson pages and CDN PDFs are separate hosts, so they
+overlap), conditional GET for sitemaps and lesson pages, and a SQLite
+frontier so interrupted downloads resume.
 
 Runs on: scraper machine or Tamor (for testing)
 Output: /mnt/library/harvest/raw/torah-class/*.json
@@ -25,18 +31,17 @@ import logging
 import os
 import re
 import sys
-import time
 import xml.etree.ElementTree as ET
 from datetime import datetime
 
-import requests
-
 try:
     from pypdf import PdfReader
 except ImportError:
     print("ERROR: pypdf not installed. Run: pip install pypdf")
     sys.exit(1)
 
+from runtime import Crawl, SkipItem, write_json_atomic
+
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
@@ -45,7 +50,7 @@ HARVEST_BASE = "/mnt/library/harvest"
 RAW_DIR = os.path.join(HARVEST_BASE, "raw", "torah-class")
 CONFIG_DIR = os.path.join(HARVEST_BASE, "config")
 MANIFEST_PATH = os.path.join(CONFIG_DIR, "torah-class-manifest.json")
-LOG_PATH = os.path.join(CONFIG_DIR, "torah-class-download-log.json")
+LOG_PATH = os.path.join(CONFIG_DIR, "torah-class-download-log.json")  # legacy, imported into frontier
 
 # NAS storage for original PDFs (consistent with billcloud/, wildbranch ministries/, etc.)
 NAS_LIBRARY_BASE = "/mnt/library"
@@ -62,7 +67,8 @@ HEADERS = {
     "User-Agent": "TamorHarvest/1.0 (personal research library)",
 }
 
-REQUEST_DELAY = 1.5  # seconds between requests
+REQUEST_DELAY = 1.5  # seconds between requests to the same host
+WORKERS = 4
 
 SOURCE_NAME = "Torah Class"
 TEACHER_DEFAULT = "Tom Bradford"
@@ -158,11 +164,17 @@ def clean_extracted_text(text):
 # Discovery
 # ---------------------------------------------------------------------------
 
-def fetch_sitemap_urls(sitemap_url):
+def open_crawl(delay=REQUEST_DELAY, workers=WORKERS):
+    """Shared runtime state (frontier, fetch cache) for this source."""
+    return Crawl("torah-class", CONFIG_DIR, headers=HEADERS, delay=delay, workers=workers)
+
+
+def fetch_sitemap_urls(sitemap_url, fetcher):
     """Fetch and parse a sitemap XML, returning all URLs."""
     log.info(f"Fetching sitemap: {sitemap_url}")
-    resp = requests.get(sitemap_url, headers=HEADERS, timeout=30)
-    resp.raise_for_status()
+    resp = fetcher.get(sitemap_url, timeout=30)
+    if resp.status == 404:
+        raise RuntimeError(f"Sitemap not found: {sitemap_url}")
 
     # Parse XML (remove namespace for easier parsing)
     content = re.sub(r'\sxmlns="[^"]+"', '', resp.text, count=1)
@@ -216,15 +228,16 @@ def build_transcript_url_guess(book, lesson_num, slug):
     return CDN_TRANSCRIPT_GUESS.format(book=book, num=lesson_num, slug=slug)
 
 
-def extract_transcript_url(lesson_page_url):
+def extract_transcript_url(lesson_page_url, fetcher):
     """
     Fetch a lesson page and extract the real transcript URL from ALL_VIDEO_DATA.
 
     Returns transcript URL string, or None if not found.
     """
     try:
-        resp = requests.get(lesson_page_url, headers=HEADERS, timeout=30)
-        resp.raise_for_status()
+        resp = fetcher.get(lesson_page_url, timeout=30)
+        if resp.status == 404:
+            return None
         m = re.search(r'transcriptUrl":"(https?:[^"]+)"', resp.text)
         if m:
             return m.group(1).replace("\\/", "/")
@@ -233,14 +246,15 @@ def extract_transcript_url(lesson_page_url):
     return None
 
 
-def fetch_lesson_metadata(url):
+def fetch_lesson_metadata(url, fetcher):
     """
     Fetch a lesson page and extract metadata from ALL_VIDEO_DATA.
 
     Returns dict with title, duration, categoryName, etc.
     """
-    resp = requests.get(url, headers=HEADERS, timeout=30)
-    resp.raise_for_status()
+    resp = fetcher.get(url, timeout=30)
+    if resp.status == 404:
+        raise RuntimeError(f"Lesson page not found: {url}")
 
     metadata = {}
 
@@ -272,16 +286,17 @@ def discover(delay=REQUEST_DELAY):
     Writes manifest to CONFIG_DIR.
     """
     os.makedirs(CONFIG_DIR, exist_ok=True)
+    crawl = open_crawl(delay=delay)
 
     # Collect all URLs from sitemaps
     all_urls = []
     for sitemap_url in SITEMAPS:
         try:
-            urls = fetch_sitemap_urls(sitemap_url)
+            urls = fetch_sitemap_urls(sitemap_url, crawl.fetcher)
             all_urls.extend(urls)
-            time.sleep(delay)
         except Exception as e:
             log.error(f"Failed to fetch {sitemap_url}: {e}")
+    crawl.close()
 
     # Filter to English lessons
     lesson_urls = [u for u in all_urls if is_english_lesson(u)]
@@ -326,8 +341,7 @@ def discover(delay=REQUEST_DELAY):
     }
 
     # Write manifest
-    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    write_json_atomic(MANIFEST_PATH, manifest)
 
     log.info(f"Manifest written: {MANIFEST_PATH}")
     log.info(f"Total: {total} lessons across {len(books)} books")
@@ -384,28 +398,18 @@ def derive_scripture_refs(book, slug):
     return [f"{book_title}"]
 
 
-def load_download_log():
-    """Load download tracking log."""
-    if os.path.exists(LOG_PATH):
-        with open(LOG_PATH, "r") as f:
-            return json.load(f)
-    return {"downloaded": [], "failed": [], "skipped": []}
-
-
-def save_download_log(log_data):
-    """Save download tracking log."""
-    with open(LOG_PATH, "w") as f:
-        json.dump(log_data, f, indent=2)
-
-
-def download_lessons(book_filter=None, limit=None, delay=REQUEST_DELAY):
+def download_lessons(book_filter=None, limit=None, delay=REQUEST_DELAY, workers=WORKERS):
     """
     Download transcript PDFs, extract text, write raw JSON.
 
+    Lessons are queued in a SQLite frontier and processed by a bounded
+    worker pool; each raw JSON is written as soon as its lesson is done.
+
     Args:
         book_filter: Only download this book (e.g., "genesis")
         limit: Max lessons to download
-        delay: Seconds between requests
+        delay: Seconds between requests to the same host
+        workers: Concurrent downloads
     """
     # Load manifest
     if not os.path.exists(MANIFEST_PATH):
@@ -430,144 +434,104 @@ def download_lessons(book_filter=None, limit=None, delay=REQUEST_DELAY):
         log.error(f"No lessons found" + (f" for book '{book_filter}'" if book_filter else ""))
         return
 
-    if limit:
-        lessons = lessons[:limit]
-
-    log.info(f"Downloading {len(lessons)} lessons")
-
-    dl_log = load_download_log()
-    downloaded_urls = set(dl_log["downloaded"])
-
-    success = 0
-    errors = 0
+    crawl = open_crawl(delay=delay, workers=workers)
+    kind = f"lesson:{book_filter.lower()}" if book_filter else None
+    added = 0
+    for book, data in manifest["books"].items():
+        added += crawl.frontier.add_many(data["lessons"], kind=f"lesson:{book.lower()}", key="url")
+    if added:
+        crawl.import_legacy_log(LOG_PATH)
 
-    for i, lesson in enumerate(lessons, 1):
+    def download_one(lesson):
         url = lesson["url"]
         book = lesson["book"]
         num = lesson["lesson_number"]
         slug = lesson["slug"]
 
-        # Skip already downloaded
-        if url in downloaded_urls:
-            log.info(f"[{i}/{len(lessons)}] Skip (already done): lesson-{num}-{slug}")
-            continue
-
         filename = f"torah-class-{book}-l{num:02d}-{slug}.txt"
         output_path = os.path.join(RAW_DIR, filename.replace(".txt", ".json"))
 
         # Skip if raw JSON already exists
         if os.path.exists(output_path):
-            log.info(f"[{i}/{len(lessons)}] Skip (file exists): {filename}")
-            dl_log["downloaded"].append(url)
-            save_download_log(dl_log)
-            continue
-
-        log.info(f"[{i}/{len(lessons)}] {book} lesson {num}: {slug}")
+            log.info(f"Skip (file exists): {filename}")
+            return "skipped"
+
+        log.info(f"{book} lesson {num}: {slug}")
+
+        # Get real transcript URL from lesson page
+        transcript_url = extract_transcript_url(url, crawl.fetcher)
+        if not transcript_url:
+            raise SkipItem("no transcript URL on page")
+
+        # Download transcript PDF (not cached: the original is kept on the NAS)
+        resp = crawl.fetcher.get(transcript_url, timeout=60, cache=False)
+        if resp.status == 404:
+            raise SkipItem(f"transcript 404: {transcript_url}")
+
+        # Save original PDF to NAS
+        pdf_filename = f"text-{book}-l{num:02d}-{slug}.pdf"
+        nas_book_dir = os.path.join(NAS_TORAHCLASS_DIR, book)
+        os.makedirs(nas_book_dir, exist_ok=True)
+        nas_pdf_path = os.path.join(nas_book_dir, pdf_filename)
+        with open(nas_pdf_path, "wb") as pdf_f:
+            pdf_f.write(resp.content)
+
+        # stored_path is relative to /mnt/library/
+        stored_path = os.path.join("religious", "torahclass", book, pdf_filename)
+
+        # Extract text from PDF
+        raw_text = extract_pdf_text(resp.content)
+        if not raw_text or len(raw_text.strip()) < 100:
+            raise SkipItem(f"text too short ({len(raw_text)} chars)")
+
+        # Clean the text
+        text = clean_extracted_text(raw_text)
+        word_count = len(text.split())
+
+        # Derive metadata
+        book_title = book.replace("-", " ").title()
+        # Build readable title from slug, stripping trailing numbers
+        slug_label = re.sub(r"-\d+$", "", slug).replace("-", " ").title()
+        title = f"{book_title} Lesson {num}: {slug_label}"
+        scripture_refs = derive_scripture_refs(book, slug)
+
+        # Build raw JSON
+        raw_item = {
+            "text": text,
+            "filename": pdf_filename,
+            "stored_path": stored_path,
+            "mime_type": "application/pdf",
+            "source_name": SOURCE_NAME,
+            "title": title,
+            "teacher": TEACHER_DEFAULT,
+            "collection": COLLECTION_NAME,
+            "content_type": "lesson",
+            "url": url,
+            "topics": [book_title.lower(), "torah", "bible study"],
+            "series": book_title,
+            "metadata": {
+                "theological_stream": THEOLOGICAL_STREAM,
+                "scripture_refs": scripture_refs,
+                "language": "en",
+                "original_format": "pdf",
+                "word_count": word_count,
+                "lesson_number": num,
+                "transcript_pdf_url": transcript_url,
+            },
+            "copyright_note": "Personal research use only. Content from torahclass.com.",
+        }
 
-        try:
-            # Get real transcript URL from lesson page
-            transcript_url = extract_transcript_url(url)
-            if not transcript_url:
-                log.warning(f"  No transcript URL found on page")
-                dl_log["failed"].append({"url": url, "reason": "no transcript URL on page"})
-                save_download_log(dl_log)
-                errors += 1
-                time.sleep(delay)
-                continue
-
-            time.sleep(delay)  # rate limit between page fetch and PDF fetch
-
-            # Download transcript PDF
-            resp = requests.get(transcript_url, headers=HEADERS, timeout=60)
-
-            if resp.status_code == 404:
-                log.warning(f"  Transcript not found: {transcript_url}")
-                dl_log["failed"].append({"url": url, "reason": "transcript 404"})
-                save_download_log(dl_log)
-                errors += 1
-                time.sleep(delay)
-                continue
-
-            resp.raise_for_status()
-
-            # Save original PDF to NAS
-            pdf_filename = f"text-{book}-l{num:02d}-{slug}.pdf"
-            nas_book_dir = os.path.join(NAS_TORAHCLASS_DIR, book)
-            os.makedirs(nas_book_dir, exist_ok=True)
-            nas_pdf_path = os.path.join(nas_book_dir, pdf_filename)
-            with open(nas_pdf_path, "wb") as pdf_f:
-                pdf_f.write(resp.content)
-            log.info(f"  Saved PDF to NAS: {nas_pdf_path}")
-
-            # stored_path is relative to /mnt/library/
-            stored_path = os.path.join("religious", "torahclass", book, pdf_filename)
-
-            # Extract text from PDF
-            raw_text = extract_pdf_text(resp.content)
-            if not raw_text or len(raw_text.strip()) < 100:
-                log.warning(f"  Transcript too short ({len(raw_text)} chars)")
-                dl_log["failed"].append({"url": url, "reason": "text too short"})
-                save_download_log(dl_log)
-                errors += 1
-                time.sleep(delay)
-                continue
-
-            # Clean the text
-            text = clean_extracted_text(raw_text)
-            word_count = len(text.split())
-
-            # Derive metadata
-            book_title = book.replace("-", " ").title()
-            # Build readable title from slug, stripping trailing numbers
-            slug_label = re.sub(r"-\d+$", "", slug).replace("-", " ").title()
-            title = f"{book_title} Lesson {num}: {slug_label}"
-            scripture_refs = derive_scripture_refs(book, slug)
-
-            # Build raw JSON
-            raw_item = {
-                "text": text,
-                "filename": pdf_filename,
-                "stored_path": stored_path,
-                "mime_type": "application/pdf",
-                "source_name": SOURCE_NAME,
-                "title": title,
-                "teacher": TEACHER_DEFAULT,
-                "collection": COLLECTION_NAME,
-                "content_type": "lesson",
-                "url": url,
-                "topics": [book_title.lower(), "torah", "bible study"],
-                "series": book_title,
-                "metadata": {
-                    "theological_stream": THEOLOGICAL_STREAM,
-                    "scripture_refs": scripture_refs,
-                    "language": "en",
-                    "original_format": "pdf",
-                    "word_count": word_count,
-                    "lesson_number": num,
-                    "transcript_pdf_url": transcript_url,
-                },
-                "copyright_note": "Personal research use only. Content from torahclass.com.",
-            }
-
-            # Write raw JSON
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(raw_item, f, indent=2, ensure_ascii=False)
-
-            log.info(f"  OK: {word_count} words, {len(text)} chars → {os.path.basename(output_path)}")
-
-            dl_log["downloaded"].append(url)
-            save_download_log(dl_log)
-            success += 1
+        write_json_atomic(output_path, raw_item)
+        log.info(f"  OK: {word_count} words, {len(text)} chars → {os.path.basename(output_path)}")
 
-        except Exception as e:
-            log.error(f"  Error: {e}")
-            dl_log["failed"].append({"url": url, "reason": str(e)})
-            save_download_log(dl_log)
-            errors += 1
+    counts = crawl.frontier.counts(kind=kind)
+    log.info(f"Downloading lessons ({counts['done']} of {counts['total']} already done)")
 
-        time.sleep(delay)
+    stats = crawl.run(download_one, kind=kind, limit=limit, include_failed=True)
+    crawl.close()
 
-    log.info(f"Done: {success} downloaded, {errors} errors, {len(lessons) - success - errors} skipped")
+    log.info(f"Done: {stats['done']} downloaded, {stats['failed']} errors, "
+             f"{stats['skipped']} skipped ({stats['elapsed']:.0f}s)")
 
 
 # ---------------------------------------------------------------------------
@@ -602,6 +566,10 @@ def main():
         "--delay", type=float, default=REQUEST_DELAY,
         help=f"Delay between requests in seconds (default: {REQUEST_DELAY})"
     )
+    parser.add_argument(
+        "--workers", type=int, default=WORKERS,
+        help=f"Concurrent downloads (default: {WORKERS})"
+    )
     parser.add_argument(
         "--manifest", action="store_true",
         help="Print manifest summary"
@@ -631,6 +599,7 @@ def main():
             book_filter=args.book if not args.all else None,
             limit=args.limit,
             delay=args.delay,
+            workers=args.workers,
         )
     else:
         parser.error("Specify --discover or --download")
@@ -12,6 +12,12 @@ Usage:
     python3 torah_resource.py --download --type articles --limit 5
     python3 torah_resource.py --download --type commentaries
     python3 torah_resource.py --download --all
+    python3 torah_resource.py --download --all --workers 4
+
+Requests go through the shared runtime (runtime.py): per-host rate limit
+of --delay seconds (pages and S3 PDFs are separate hosts, so they
+overlap), conditional GET for sitemaps and pages, and a SQLite frontier
+so interrupted downloads resume.
 
 Runs on: scraper machine or Tamor (for testing)
 Output: /mnt/library/harvest/raw/torahresource/*.json
@@ -24,12 +30,9 @@ import logging
 import os
 import re
 import sys
-import time
 import xml.etree.ElementTree as ET
 from datetime import datetime
 
-import requests
-
 try:
     from pypdf import PdfReader
 except ImportError:
@@ -42,6 +45,8 @@ except ImportError:
     print("ERROR: beautifulsoup4 not installed. Run: pip install beautifulsoup4")
     sys.exit(1)
 
+from runtime import Crawl, SkipItem, write_json_atomic
+
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
@@ -50,7 +55,7 @@ HARVEST_BASE = "/mnt/library/harvest"
 RAW_DIR = os.path.join(HARVEST_BASE, "raw", "torahresource")
 CONFIG_DIR = os.path.join(HARVEST_BASE, "config")
 MANIFEST_PATH = os.path.join(CONFIG_DIR, "torahresource-manifest.json")
-LOG_PATH = os.path.join(CONFIG_DIR, "torahresource-download-log.json")
+LOG_PATH = os.path.join(CONFIG_DIR, "torahresource-download-log.json")  # legacy, imported into frontier
 
 NAS_LIBRARY_BASE = "/mnt/library"
 NAS_TR_DIR = os.path.join(NAS_LIBRARY_BASE, "religious", "torahresource")
@@ -68,7 +73,8 @@ HEADERS = {
     "User-Agent": "TamorHarvest/1.0 (personal research library)",
 }
 
-REQUEST_DELAY = 1.5  # seconds between requests
+REQUEST_DELAY = 1.5  # seconds between requests to the same host
+WORKERS = 4
 
 SOURCE_NAME = "TorahResource"
 TEACHER_DEFAULT = "Tim Hegg"
@@ -163,11 +169,17 @@ def clean_extracted_text(text):
 # Discovery
 # ---------------------------------------------------------------------------
 
-def fetch_sitemap_urls(sitemap_url):
+def open_crawl(delay=REQUEST_DELAY, workers=WORKERS):
+    """Shared runtime state (frontier, fetch cache) for this source."""
+    return Crawl("torahresource", CONFIG_DIR, headers=HEADERS, delay=delay, workers=workers)
+
+
+def fetch_sitemap_urls(sitemap_url, fetcher):
     """Fetch and parse a sitemap XML, returning all URLs."""
     log.info(f"Fetching sitemap: {sitemap_url}")
-    resp = requests.get(sitemap_url, headers=HEADERS, timeout=30)
-    resp.raise_for_status()
+    resp = fetcher.get(sitemap_url, timeout=30)
+    if resp.status == 404:
+        raise RuntimeError(f"Sitemap not found: {sitemap_url}")
 
     content = re.sub(r'\sxmlns="[^"]+"', '', resp.text, count=1)
     root = ET.fromstring(content)
@@ -201,6 +213,7 @@ def discover(delay=REQUEST_DELAY):
     Writes manifest to CONFIG_DIR.
     """
     os.makedirs(CONFIG_DIR, exist_ok=True)
+    crawl = open_crawl(delay=delay)
 
     manifest_data = {
         "source": SOURCE_NAME,
@@ -211,7 +224,7 @@ def discover(delay=REQUEST_DELAY):
 
     # Fetch article sitemap
     try:
-        article_urls = fetch_sitemap_urls(SITEMAPS["articles"])
+        article_urls = fetch_sitemap_urls(SITEMAPS["articles"], crawl.fetcher)
         log.info(f"Found {len(article_urls)} article URLs")
         for url in sorted(article_urls):
             slug = parse_article_slug(url)
@@ -221,13 +234,12 @@ def discover(delay=REQUEST_DELAY):
                     "slug": slug,
                     "type": "article",
                 })
-        time.sleep(delay)
     except Exception as e:
         log.error(f"Failed to fetch article sitemap: {e}")
 
     # Fetch commentary sitemap
     try:
-        commentary_urls = fetch_sitemap_urls(SITEMAPS["commentaries"])
+        commentary_urls = fetch_sitemap_urls(SITEMAPS["commentaries"], crawl.fetcher)
         log.info(f"Found {len(commentary_urls)} commentary URLs")
         for url in sorted(commentary_urls):
             slug = parse_commentary_slug(url)
@@ -239,13 +251,13 @@ def discover(delay=REQUEST_DELAY):
                 })
     except Exception as e:
         log.error(f"Failed to fetch commentary sitemap: {e}")
+    crawl.close()
 
     manifest_data["total_articles"] = len(manifest_data["articles"])
     manifest_data["total_commentaries"] = len(manifest_data["commentaries"])
     manifest_data["total"] = manifest_data["total_articles"] + manifest_data["total_commentaries"]
 
-    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
-        json.dump(manifest_data, f, indent=2, ensure_ascii=False)
+    write_json_atomic(MANIFEST_PATH, manifest_data)
 
     log.info(f"Manifest written: {MANIFEST_PATH}")
     log.info(f"  Articles: {manifest_data['total_articles']}")
@@ -259,14 +271,15 @@ def discover(delay=REQUEST_DELAY):
 # Page scraping helpers
 # ---------------------------------------------------------------------------
 
-def extract_article_info(url):
+def extract_article_info(url, fetcher):
     """
     Fetch an article page and extract title, date, and PDF download URL.
 
     Returns dict with keys: title, date, pdf_url, scripture_refs, topics
     """
-    resp = requests.get(url, headers=HEADERS, timeout=30)
-    resp.raise_for_status()
+    resp = fetcher.get(url, timeout=30)
+    if resp.status == 404:
+        raise SkipItem("page 404")
     soup = BeautifulSoup(resp.text, "html.parser")
 
     info = {
@@ -342,14 +355,15 @@ def extract_article_info(url):
     return info
 
 
-def extract_commentary_info(url):
+def extract_commentary_info(url, fetcher):
     """
     Fetch a commentary page and extract title, portion name, scripture refs, PDF URL.
 
     Returns dict with keys: title, pdf_url, scripture_refs, portion_name
     """
-    resp = requests.get(url, headers=HEADERS, timeout=30)
-    resp.raise_for_status()
+    resp = fetcher.get(url, timeout=30)
+    if resp.status == 404:
+        raise SkipItem("page 404")
     soup = BeautifulSoup(resp.text, "html.parser")
 
     info = {
@@ -424,28 +438,18 @@ def extract_pdf_text(pdf_bytes):
     return "\n\n".join(text_parts)
 
 
-def load_download_log():
-    """Load download tracking log."""
-    if os.path.exists(LOG_PATH):
-        with open(LOG_PATH, "r") as f:
-            return json.load(f)
-    return {"downloaded": [], "failed": [], "skipped": []}
-
-
-def save_download_log(log_data):
-    """Save download tracking log."""
-    with open(LOG_PATH, "w") as f:
-        json.dump(log_data, f, indent=2)
-
-
-def download_items(content_type="articles", limit=None, delay=REQUEST_DELAY):
+def download_items(content_type="articles", limit=None, delay=REQUEST_DELAY, workers=WORKERS):
     """
     Download PDFs, extract text, write raw JSON.
 
+    Items are queued in a SQLite frontier and processed by a bounded
+    worker pool; each raw JSON is written as soon as its item is done.
+
     Args:
         content_type: "articles" or "commentaries"
         limit: Max items to download
-        delay: Seconds between requests
+        delay: Seconds between requests to the same host
+        workers: Concurrent downloads
     """
     if not os.path.exists(MANIFEST_PATH):
         log.error(f"Manifest not found. Run --discover first.")
@@ -460,9 +464,6 @@ def download_items(content_type="articles", limit=None, delay=REQUEST_DELAY):
         log.error(f"No {content_type} found in manifest")
         return
 
-    if limit:
-        items = items[:limit]
-
     os.makedirs(RAW_DIR, exist_ok=True)
 
     # NAS directories
@@ -472,142 +473,103 @@ def download_items(content_type="articles", limit=None, delay=REQUEST_DELAY):
         nas_dir = os.path.join(NAS_TR_DIR, "commentaries")
     os.makedirs(nas_dir, exist_ok=True)
 
-    dl_log = load_download_log()
-    downloaded_urls = set(dl_log["downloaded"])
-
-    success = 0
-    errors = 0
-
-    log.info(f"Downloading {len(items)} {content_type}")
+    crawl = open_crawl(delay=delay, workers=workers)
+    if crawl.frontier.add_many(items, kind=content_type, key="url"):
+        crawl.import_legacy_log(LOG_PATH)
 
-    for i, item in enumerate(items, 1):
+    def download_one(item):
         url = item["url"]
         slug = item["slug"]
 
-        # Skip already downloaded
-        if url in downloaded_urls:
-            log.info(f"[{i}/{len(items)}] Skip (already done): {slug}")
-            continue
-
         # Check if raw JSON already exists
         output_filename = f"torahresource-{slug}.json"
         output_path = os.path.join(RAW_DIR, output_filename)
         if os.path.exists(output_path):
-            log.info(f"[{i}/{len(items)}] Skip (file exists): {slug}")
-            dl_log["downloaded"].append(url)
-            save_download_log(dl_log)
-            continue
+            log.info(f"Skip (file exists): {slug}")
+            return "skipped"
+
+        log.info(f"{content_type[:-1]}: {slug}")
 
-        log.info(f"[{i}/{len(items)}] {content_type[:-1]}: {slug}")
-
-        try:
-            # Fetch page and extract info
-            if content_type == "articles":
-                info = extract_article_info(url)
-            else:
-                info = extract_commentary_info(url)
-
-            time.sleep(delay)
-
-            pdf_url = info.get("pdf_url")
-            if not pdf_url:
-                log.warning(f"  No PDF URL found on page: {url}")
-                dl_log["failed"].append({"url": url, "reason": "no PDF URL on page"})
-                save_download_log(dl_log)
-                errors += 1
-                continue
-
-            # Download PDF
-            log.info(f"  Downloading PDF: {os.path.basename(pdf_url)}")
-            pdf_resp = requests.get(pdf_url, headers=HEADERS, timeout=120)
-
-            if pdf_resp.status_code == 404:
-                log.warning(f"  PDF not found: {pdf_url}")
-                dl_log["failed"].append({"url": url, "reason": "PDF 404"})
-                save_download_log(dl_log)
-                errors += 1
-                time.sleep(delay)
-                continue
-
-            pdf_resp.raise_for_status()
-
-            # Save original PDF to NAS
-            pdf_filename = f"{slug}.pdf"
-            nas_pdf_path = os.path.join(nas_dir, pdf_filename)
-            with open(nas_pdf_path, "wb") as pdf_f:
-                pdf_f.write(pdf_resp.content)
-            log.info(f"  Saved PDF to NAS: {nas_pdf_path}")
-
-            # stored_path relative to /mnt/library/
-            subdir = "articles" if content_type == "articles" else "commentaries"
-            stored_path = f"religious/torahresource/{subdir}/{pdf_filename}"
-
-            # Extract text
-            raw_text = extract_pdf_text(pdf_resp.content)
-            if not raw_text or len(raw_text.strip()) < 50:
-                log.warning(f"  Text too short ({len(raw_text) if raw_text else 0} chars) — may be scanned PDF")
-                dl_log["failed"].append({"url": url, "reason": "text too short (scanned?)"})
-                save_download_log(dl_log)
-                errors += 1
-                time.sleep(delay)
-                continue
-
-            text = clean_extracted_text(raw_text)
-            word_count = len(text.split())
-
-            # Build title
-            title = info.get("title") or slug.replace("-", " ").title()
-
-            # Build raw JSON
-            raw_item = {
-                "text": text,
-                "filename": pdf_filename,
-                "stored_path": stored_path,
-                "mime_type": "application/pdf",
-                "source_name": SOURCE_NAME,
-                "title": title,
-                "teacher": TEACHER_DEFAULT,
-                "collection": COLLECTION_NAME,
-                "content_type": "article" if content_type == "articles" else "commentary",
-                "url": url,
-                "topics": info.get("topics", []),
-                "series": "Torah Commentaries" if content_type == "commentaries" else None,
-                "metadata": {
-                    "theological_stream": THEOLOGICAL_STREAM,
-                    "scripture_refs": info.get("scripture_refs", []),
-                    "language": "en",
-                    "original_format": "pdf",
-                    "word_count": word_count,
-                    "pdf_url": pdf_url,
-                },
-                "copyright_note": "Personal research use only. Free content from torahresource.com.",
-            }
-
-            if info.get("date"):
-                raw_item["date"] = info["date"]
-
-            if content_type == "commentaries" and info.get("portion_name"):
-                raw_item["metadata"]["portion_name"] = info["portion_name"]
-
-            # Write raw JSON
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(raw_item, f, indent=2, ensure_ascii=False)
-
-            log.info(f"  OK: {word_count} words, {len(text)} chars → {output_filename}")
-
-            dl_log["downloaded"].append(url)
-            save_download_log(dl_log)
-            success += 1
-
-        except Exception as e:
-            log.error(f"  Error: {e}")
-            dl_log["failed"].append({"url": url, "reason": str(e)})
-            save_download_log(dl_log)
-            errors += 1
-
-        time.sleep(delay)
-
-    log.info(f"Done: {success} downloaded, {errors} errors, {len(items) - success - errors} skipped")
+        # Fetch page and extract info
+        if content_type == "articles":
+            info = extract_article_info(url, crawl.fetcher)
+        else:
+            info = extract_commentary_info(url, crawl.fetcher)
+
+        pdf_url = info.get("pdf_url")
+        if not pdf_url:
+            raise SkipItem("no PDF URL on page")
+
+        # Download PDF (not cached: the original is kept on the NAS)
+        pdf_resp = crawl.fetcher.get(pdf_url, timeout=120, cache=False)
+        if pdf_resp.status == 404:
+            raise SkipItem(f"PDF 404: {pdf_url}")
+
+        # Save original PDF to NAS
+        pdf_filename = f"{slug}.pdf"
+        nas_pdf_path = os.path.join(nas_dir, pdf_filename)
+        with open(nas_pdf_path, "wb") as pdf_f:
+            pdf_f.write(pdf_resp.content)
+
+        # stored_path relative to /mnt/library/
+        subdir = "articles" if content_type == "articles" else "commentaries"
+        stored_path = f"religious/torahresource/{subdir}/{pdf_filename}"
+
+        # Extract text
+        raw_text = extract_pdf_text(pdf_resp.content)
+        if not raw_text or len(raw_text.strip()) < 50:
+            raise SkipItem(
+                f"text too short ({len(raw_text) if raw_text else 0} chars) — may be scanned PDF"
+            )
+
+        text = clean_extracted_text(raw_text)
+        word_count = len(text.split())
+
+        # Build title
+        title = info.get("title") or slug.replace("-", " ").title()
+
+        # Build raw JSON
+        raw_item = {
+            "text": text,
+            "filename": pdf_filename,
+            "stored_path": stored_path,
+            "mime_type": "application/pdf",
+            "source_name": SOURCE_NAME,
+            "title": title,
+            "teacher": TEACHER_DEFAULT,
+            "collection": COLLECTION_NAME,
+            "content_type": "article" if content_type == "articles" else "commentary",
+            "url": url,
+            "topics": info.get("topics", []),
+            "series": "Torah Commentaries" if content_type == "commentaries" else None,
+            "metadata": {
+                "theological_stream": THEOLOGICAL_STREAM,
+                "scripture_refs": info.get("scripture_refs", []),
+                "language": "en",
+                "original_format": "pdf",
+                "word_count": word_count,
+                "pdf_url": pdf_url,
+            },
+            "copyright_note": "Personal research use only. Free content from torahresource.com.",
+        }
+
+        if info.get("date"):
+            raw_item["date"] = info["date"]
+
+        if content_type == "commentaries" and info.get("portion_name"):
+            raw_item["metadata"]["portion_name"] = info["portion_name"]
+
+        write_json_atomic(output_path, raw_item)
+        log.info(f"  OK: {word_count} words, {len(text)} chars → {output_filename}")
+
+    counts = crawl.frontier.counts(kind=content_type)
+    log.info(f"Downloading {content_type} ({counts['done']} of {counts['total']} already done)")
+
+    stats = crawl.run(download_one, kind=content_type, limit=limit, include_failed=True)
+    crawl.close()
+
+    log.info(f"Done: {stats['done']} downloaded, {stats['failed']} errors, "
+             f"{stats['skipped']} skipped ({stats['elapsed']:.0f}s)")
 
 
 # ---------------------------------------------------------------------------
@@ -642,6 +604,10 @@ def main():
         "--delay", type=float, default=REQUEST_DELAY,
         help=f"Delay between requests in seconds (default: {REQUEST_DELAY})"
     )
+    parser.add_argument(
+        "--workers", type=int, default=WORKERS,
+        help=f"Concurrent downloads (default: {WORKERS})"
+    )
     parser.add_argument(
         "--manifest", action="store_true",
         help="Print manifest summary"
@@ -668,10 +634,10 @@ def main():
         if not args.type and not args.all:
             parser.error("Specify --type articles|commentaries or --all with --download")
         if args.all:
-            download_items("articles", limit=args.limit, delay=args.delay)
-            download_items("commentaries", limit=args.limit, delay=args.delay)
+            download_items("articles", limit=args.limit, delay=args.delay, workers=args.workers)
+            download_items("commentaries", limit=args.limit, delay=args.delay, workers=args.workers)
         else:
-            download_items(args.type, limit=args.limit, delay=args.delay)
+            download_items(args.type, limit=args.limit, delay=args.delay, workers=args.workers)
     else:
         parser.error("Specify --discover or --download")
 
@@ -12,6 +12,11 @@ Usage:
     # Phase 2: Download articles and write raw JSON
     python3 yavoh.py --download --limit 10
     python3 yavoh.py --download --all
+    python3 yavoh.py --download --all --workers 4
+
+Requests go through the shared runtime (runtime.py): per-host rate limit
+of --delay seconds, conditional GET for listing/article pages, and a
+SQLite frontier so interrupted downloads resume.
 
 Runs on: scraper machine or Tamor (for testing)
 Output: /mnt/library/harvest/raw/yavoh/*.json
@@ -23,17 +28,16 @@ import logging
 import os
 import re
 import sys
-import time
 from datetime import datetime
 
-import requests
-
 try:
     from bs4 import BeautifulSoup
 except ImportError:
     print("ERROR: beautifulsoup4 not installed. Run: pip install beautifulsoup4")
     sys.exit(1)
 
+from runtime import Crawl, SkipItem, write_json_atomic
+
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
@@ -42,7 +46,7 @@ HARVEST_BASE = "/mnt/library/harvest"
 RAW_DIR = os.path.join(HARVEST_BASE, "raw", "yavoh")
 CONFIG_DIR = os.path.join(HARVEST_BASE, "config")
 MANIFEST_PATH = os.path.join(CONFIG_DIR, "yavoh-manifest.json")
-LOG_PATH = os.path.join(CONFIG_DIR, "yavoh-download-log.json")
+LOG_PATH = os.path.join(CONFIG_DIR, "yavoh-download-log.json")  # legacy, imported into frontier
 
 NAS_LIBRARY_BASE = "/mnt/library"
 NAS_YAVOH_DIR = os.path.join(NAS_LIBRARY_BASE, "religious", "lionlamb", "yavoh")
@@ -54,7 +58,8 @@ HEADERS = {
     "User-Agent": "TamorHarvest/1.0 (personal research library)",
 }
 
-REQUEST_DELAY = 1.5  # seconds between requests
+REQUEST_DELAY = 1.5  # seconds between requests to the same host
+WORKERS = 4
 
 SOURCE_NAME = "YAVOH Magazine"
 TEACHER_DEFAULT = "Monte Judah"
@@ -195,12 +200,21 @@ def find_next_page_url(html):
     return None
 
 
+def open_crawl(delay=REQUEST_DELAY, workers=WORKERS):
+    """Shared runtime state (frontier, fetch cache) for this source."""
+    return Crawl("yavoh", CONFIG_DIR, headers=HEADERS, delay=delay, workers=workers)
+
+
 def discover(delay=REQUEST_DELAY, max_pages=100):
     """
     Discover all articles by crawling pagination.
     Writes manifest to CONFIG_DIR.
+
+    Pagination is inherently sequential; pages unchanged since the last
+    discovery are served from the fetch cache via 304.
     """
     os.makedirs(CONFIG_DIR, exist_ok=True)
+    crawl = open_crawl(delay=delay)
 
     all_articles = []
     seen_urls = set()
@@ -211,8 +225,9 @@ def discover(delay=REQUEST_DELAY, max_pages=100):
         log.info(f"Page {page_num}: {current_url}")
 
         try:
-            resp = requests.get(current_url, headers=HEADERS, timeout=30)
-            resp.raise_for_status()
+            resp = crawl.fetcher.get(current_url, timeout=30)
+            if resp.status == 404:
+                raise RuntimeError("404 Not Found")
         except Exception as e:
             log.error(f"  Failed to fetch page: {e}")
             break
@@ -255,9 +270,6 @@ def discover(delay=REQUEST_DELAY, max_pages=100):
         current_url = next_url
         page_num += 1
 
-        if current_url:
-            time.sleep(delay)
-
     # Build manifest
     manifest = {
         "source": SOURCE_NAME,
@@ -267,8 +279,8 @@ def discover(delay=REQUEST_DELAY, max_pages=100):
         "articles": all_articles,
     }
 
-    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    write_json_atomic(MANIFEST_PATH, manifest)
+    crawl.close()
 
     log.info(f"Manifest written: {MANIFEST_PATH}")
     log.info(f"  Total articles: {len(all_articles)}")
@@ -281,14 +293,15 @@ def discover(delay=REQUEST_DELAY, max_pages=100):
 # Article text extraction
 # ---------------------------------------------------------------------------
 
-def extract_article_content(url):
+def extract_article_content(url, fetcher):
     """
     Fetch an article page and extract the full body text.
 
     Returns dict with: title, text, date, author, tags
     """
-    resp = requests.get(url, headers=HEADERS, timeout=30)
-    resp.raise_for_status()
+    resp = fetcher.get(url, timeout=30)
+    if resp.status == 404:
+        raise SkipItem("article 404")
     soup = BeautifulSoup(resp.text, "html.parser")
 
     result = {
@@ -434,27 +447,17 @@ def extract_article_content(url):
 # Download
 # ---------------------------------------------------------------------------
 
-def load_download_log():
-    """Load download tracking log."""
-    if os.path.exists(LOG_PATH):
-        with open(LOG_PATH, "r") as f:
-            return json.load(f)
-    return {"downloaded": [], "failed": [], "skipped": []}
-
-
-def save_download_log(log_data):
-    """Save download tracking log."""
-    with open(LOG_PATH, "w") as f:
-        json.dump(log_data, f, indent=2)
-
-
-def download_articles(limit=None, delay=REQUEST_DELAY):
+def download_articles(limit=None, delay=REQUEST_DELAY, workers=WORKERS):
     """
     Download article content, save HTML to NAS, write raw JSON.
 
+    Articles are queued in a SQLite frontier and fetched by a bounded
+    worker pool; each raw JSON is written as soon as its article is done.
+
     Args:
         limit: Max articles to download
-        delay: Seconds between requests
+        delay: Seconds between requests to the same host
+        workers: Concurrent downloads
     """
     if not os.path.exists(MANIFEST_PATH):
         log.error(f"Manifest not found. Run --discover first.")
@@ -469,58 +472,40 @@ def download_articles(limit=None, delay=REQUEST_DELAY):
         log.error("No articles found in manifest")
         return
 
-    if limit:
-        articles = articles[:limit]
-
     os.makedirs(RAW_DIR, exist_ok=True)
     os.makedirs(NAS_YAVOH_DIR, exist_ok=True)
 
-    dl_log = load_download_log()
-    downloaded_urls = set(dl_log["downloaded"])
+    crawl = open_crawl(delay=delay, workers=workers)
+    if crawl.frontier.add_many(articles, kind="article", key="url"):
+        crawl.import_legacy_log(LOG_PATH)
 
-    success = 0
-    errors = 0
-
-    log.info(f"Downloading {len(articles)} articles")
-
-    for i, article in enumerate(articles, 1):
+    def download_one(article):
         url = article["url"]
         slug = article.get("slug", url.rstrip("/").split("/")[-1])
 
-        # Skip already downloaded
-        if url in downloaded_urls:
-            log.info(f"[{i}/{len(articles)}] Skip (already done): {slug}")
-            continue
-
         # Check if raw JSON already exists
         output_filename = f"yavoh-{slug}.json"
         output_path = os.path.join(RAW_DIR, output_filename)
         if os.path.exists(output_path):
-            log.info(f"[{i}/{len(articles)}] Skip (file exists): {slug}")
-            dl_log["downloaded"].append(url)
-            save_download_log(dl_log)
-            continue
+            log.info(f"Skip (file exists): {slug}")
+            return "skipped"
 
-        log.info(f"[{i}/{len(articles)}] {article.get('title', slug)}")
+        log.info(f"{article.get('title', slug)}")
 
-        try:
-            # Fetch and extract article content
-            content = extract_article_content(url)
-
-            if not content["text"] or len(content["text"]) < 50:
-                log.warning(f"  Article text too short ({len(content['text']) if content['text'] else 0} chars)")
-                dl_log["failed"].append({"url": url, "reason": "text too short"})
-                save_download_log(dl_log)
-                errors += 1
-                time.sleep(delay)
-                continue
-
-            # Save HTML to NAS
-            html_filename = f"{slug}.html"
-            nas_html_path = os.path.join(NAS_YAVOH_DIR, html_filename)
-
-            # Build a simple HTML document with the extracted text
-            html_content = f"""<!DOCTYPE html>
+        # Fetch and extract article content
+        content = extract_article_content(url, crawl.fetcher)
+
+        if not content["text"] or len(content["text"]) < 50:
+            raise SkipItem(
+                f"text too short ({len(content['text']) if content['text'] else 0} chars)"
+            )
+
+        # Save HTML to NAS
+        html_filename = f"{slug}.html"
+        nas_html_path = os.path.join(NAS_YAVOH_DIR, html_filename)
+
+        # Build a simple HTML document with the extracted text
+        html_content = f"""<!DOCTYPE html>
 <html>
 <head><title>{content['title'] or slug}</title></head>
 <body>
@@ -529,62 +514,53 @@ def download_articles(limit=None, delay=REQUEST_DELAY):
 </body>
 </html>"""
 
-            with open(nas_html_path, "w", encoding="utf-8") as f:
-                f.write(html_content)
-            log.info(f"  Saved HTML to NAS: {nas_html_path}")
-
-            # stored_path relative to /mnt/library/
-            stored_path = f"religious/lionlamb/yavoh/{html_filename}"
-
-            word_count = len(content["text"].split())
-            title = content["title"] or article.get("title") or slug.replace("-", " ").title()
-
-            # Build raw JSON
-            raw_item = {
-                "text": content["text"],
-                "filename": html_filename,
-                "stored_path": stored_path,
-                "mime_type": "text/html",
-                "source_name": SOURCE_NAME,
-                "title": title,
-                "teacher": content.get("author") or TEACHER_DEFAULT,
-                "collection": COLLECTION_NAME,
-                "content_type": "article",
-                "url": url,
-                "topics": content.get("tags", []),
-                "metadata": {
-                    "theological_stream": THEOLOGICAL_STREAM,
-                    "scripture_refs": content.get("scripture_refs", []),
-                    "language": "en",
-                    "original_format": "html",
-                    "word_count": word_count,
-                    "tags": content.get("tags", []),
-                },
-                "copyright_note": "Personal research use only. Content from Lion & Lamb Ministries.",
-            }
-
-            if content.get("date"):
-                raw_item["date"] = content["date"]
-
-            # Write raw JSON
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(raw_item, f, indent=2, ensure_ascii=False)
-
-            log.info(f"  OK: {word_count} words → {output_filename}")
-
-            dl_log["downloaded"].append(url)
-            save_download_log(dl_log)
-            success += 1
-
-        except Exception as e:
-            log.error(f"  Error: {e}")
-            dl_log["failed"].append({"url": url, "reason": str(e)})
-            save_download_log(dl_log)
-            errors += 1
-
-        time.sleep(delay)
-
-    log.info(f"Done: {success} downloaded, {errors} errors, {len(articles) - success - errors} skipped")
+        with open(nas_html_path, "w", encoding="utf-8") as f:
+            f.write(html_content)
+
+        # stored_path relative to /mnt/library/
+        stored_path = f"religious/lionlamb/yavoh/{html_filename}"
+
+        word_count = len(content["text"].split())
+        title = content["title"] or article.get("title") or slug.replace("-", " ").title()
+
+        # Build raw JSON
+        raw_item = {
+            "text": content["text"],
+            "filename": html_filename,
+            "stored_path": stored_path,
+            "mime_type": "text/html",
+            "source_name": SOURCE_NAME,
+            "title": title,
+            "teacher": content.get("author") or TEACHER_DEFAULT,
+            "collection": COLLECTION_NAME,
+            "content_type": "article",
+            "url": url,
+            "topics": content.get("tags", []),
+            "metadata": {
+                "theological_stream": THEOLOGICAL_STREAM,
+                "scripture_refs": content.get("scripture_refs", []),
+                "language": "en",
+                "original_format": "html",
+                "word_count": word_count,
+                "tags": content.get("tags", []),
+            },
+            "copyright_note": "Personal research use only. Content from Lion & Lamb Ministries.",
+        }
+
+        if content.get("date"):
+            raw_item["date"] = content["date"]
+
+        write_json_atomic(output_path, raw_item)
+        log.info(f"  OK: {word_count} words → {output_filename}")
+
+    counts = crawl.frontier.counts(kind="article")
+    log.info(f"Downloading articles ({counts['done']} of {counts['total']} already done)")
+
+    stats = crawl.run(download_one, kind="article", limit=limit, include_failed=True)
+    crawl.close()
+
+    log.info(f"Done: {stats['done']} downloaded, {stats['failed']} errors, "
+             f"{stats['skipped']} skipped ({stats['elapsed']:.0f}s)")
 
 
 # ---------------------------------------------------------------------------
@@ -615,6 +591,10 @@ def main():
         "--delay", type=float, default=REQUEST_DELAY,
         help=f"Delay between requests in seconds (default: {REQUEST_DELAY})"
     )
+    parser.add_argument(
+        "--workers", type=int, default=WORKERS,
+        help=f"Concurrent downloads (default: {WORKERS})"
+    )
     parser.add_argument(
         "--manifest", action="store_true",
         help="Print manifest summary"
@@ -644,7 +624,7 @@ def main():
     elif args.download:
         if not args.all and not args.limit:
             parser.error("Specify --all or --limit N with --download")
-        download_articles(limit=args.limit, delay=args.delay)
+        download_articles(limit=args.limit, delay=args.delay, workers=args.workers)
     else:
         parser.error("Specify --discover or --download")
 
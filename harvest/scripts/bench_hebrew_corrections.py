@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark Hebrew term corrections: per-variant passes vs compiled matcher.
+
+Generates a synthetic dictionary (default 2,000 terms) and transcript
+(default 1 MB) salted with variants, then times the original algorithm
+(one regex compile + full-text pass per variant) against
+lib.hebrew_corrections.apply_corrections.
+
+Usage:
+    python3 bench_hebrew_corrections.py
+    python3 bench_hebrew_corrections.py --terms 500 --size-mb 4
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lib import hebrew_corrections
+
+SYLLABLES = ["ba", "ko", "shi", "ra", "tem", "lo", "vu", "nek", "da", "mi", "zor", "ha", "el", "yo"]
+FILLER = "the teaching of torah and the prophets said we read in the portion this week".split()
+
+
+def per_variant_corrections(text, corrections):
+    """The original algorithm: compile and scan once per variant."""
+    count = 0
+    for correct_term, variants in corrections.items():
+        for variant in variants:
+            if variant.lower() == correct_term.lower():
+                continue
+            pattern = re.compile(r"\b" + re.escape(variant) + r"\b", re.IGNORECASE)
+            new_text, n = pattern.subn(correct_term, text)
+            if n > 0:
+                text = new_text
+                count += n
+    return text, count
+
+
+def build_dictionary(rng, terms):
+    def word():
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+    corrections = {}
+    for i in range(terms):
+        corrections[f"term{i:04d}"] = [
+            " ".join(word() for _ in range(rng.randint(1, 2)))
+            for _ in range(rng.randint(1, 4))
+        ]
+    return corrections
+
+
+def build_transcript(rng, corrections, size_bytes, variant_rate=0.02):
+    variants = [v for vs in corrections.values() for v in vs]
+    pieces = []
+    size = 0
+    while size < size_bytes:
+        piece = rng.choice(variants) if rng.random() < variant_rate else rng.choice(FILLER)
+        pieces.append(piece)
+        size += len(piece) + 1
+    return " ".join(pieces)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Hebrew term corrections")
+    parser.add_argument("--terms", type=int, default=2000, help="Dictionary entries (default: 2000)")
+    parser.add_argument("--size-mb", type=float, default=1.0, help="Transcript size in MB (default: 1)")
+    parser.add_argument("--skip-baseline", action="store_true", help="Only time the compiled matcher")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    corrections = build_dictionary(rng, args.terms)
+    text = build_transcript(rng, corrections, int(args.size_mb * 1024 * 1024))
+    n_variants = sum(len(v) for v in corrections.values())
+    print(f"{args.terms} terms / {n_variants} variants, {len(text) / 1024 / 1024:.2f} MB transcript\n")
+
+    hebrew_corrections._corrections_cache = corrections
+    hebrew_corrections._matcher = None
+
+    compile_s, _ = timed(hebrew_corrections._get_matcher, corrections)
+    first_s, (fast_text, fast_count) = timed(hebrew_corrections.apply_corrections, text)
+    warm_s, _ = timed(hebrew_corrections.apply_corrections, text)
+
+    print(f"{'compiled matcher (build)':<28}{compile_s:>9.3f}s")
+    print(f"{'compiled matcher (apply)':<28}{warm_s:>9.3f}s  ({fast_count} corrections)")
+
+    if not args.skip_baseline:
+        slow_s, (slow_text, slow_count) = timed(per_variant_corrections, text, corrections)
+        print(f"{'per-variant passes':<28}{slow_s:>9.3f}s  ({slow_count} corrections)")
+        print(f"\nspeedup: {slow_s / warm_s:.1f}x warm, {slow_s / (compile_s + first_s):.1f}x cold")
+        if slow_text != fast_text:
+            print("note: outputs differ (overlapping variants resolve longest-match-first)")
+
+
+if __name__ == "__main__":
+    main()
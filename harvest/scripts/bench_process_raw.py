@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark process_raw throughput: sequential vs --workers N.
+
+Builds a synthetic corpus of raw JSON files in a temp directory, runs
+process_source() over a fresh copy once per worker count, and reports
+files/s and chunks/s. Nothing under /mnt/library is touched.
+
+--fake-embedder swaps the model for a deterministic hash encoder, which
+isolates the load/correct/chunk stages (and runs where
+sentence_transformers is not installed).
+
+Usage:
+    python3 bench_process_raw.py
+    python3 bench_process_raw.py --files 300 --workers 1 4 8
+    python3 bench_process_raw.py --fake-embedder --words 6000
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from config.harvest_config import EMBEDDING_DIM
+from lib import embedder
+from lib.hebrew_corrections import load_corrections
+from processor.process_raw import process_source
+
+SOURCE = "bench"
+
+WORDS = (
+    "the covenant at sinai was given to israel and the nations torah teaching "
+    "yeshua messiah shabbat feast of tabernacles passover lamb scripture prophet "
+    "elohim yahweh kingdom righteousness grace faith obedience commandment"
+).split()
+
+
+class HashEncoder:
+    """Deterministic stand-in for SentenceTransformer.encode()."""
+
+    def encode(self, texts):
+        vecs = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            vecs[i] = np.random.default_rng(seed).standard_normal(EMBEDDING_DIM)
+        return vecs
+
+
+def build_corpus(raw_dir, files, words, seed=0):
+    """Write synthetic raw items, salted with Hebrew misspellings. Returns total words."""
+    rng = random.Random(seed)
+    variants = [v for vs in load_corrections().values() for v in vs]
+    vocab = WORDS + variants[:50]
+
+    os.makedirs(raw_dir, exist_ok=True)
+    for i in range(files):
+        paragraphs = []
+        for _ in range(max(1, words // 120)):
+            paragraphs.append(" ".join(rng.choice(vocab) for _ in range(120)) + ".")
+        item = {
+            "text": "\n\n".join(paragraphs),
+            "filename": f"bench-{i:05d}.txt",
+            "stored_path": f"bench/bench-{i:05d}.txt",
+            "source_name": "Benchmark",
+            "title": f"Benchmark item {i}",
+            "content_type": "transcript",
+        }
+        with open(os.path.join(raw_dir, f"bench-{i:05d}.json"), "w", encoding="utf-8") as f:
+            json.dump(item, f)
+    return files * max(1, words // 120) * 120
+
+
+def run(corpus_dir, workdir, workers):
+    """Process a fresh copy of the corpus. Returns (seconds, success, chunks)."""
+    raw_root = os.path.join(workdir, "raw")
+    processed_root = os.path.join(workdir, "processed")
+    ready_dir = os.path.join(workdir, "ready")
+    shutil.rmtree(workdir, ignore_errors=True)
+    shutil.copytree(corpus_dir, os.path.join(raw_root, SOURCE))
+    os.makedirs(ready_dir)
+
+    start = time.perf_counter()
+    success, errors = process_source(
+        SOURCE,
+        workers=workers,
+        raw_root=raw_root,
+        processed_root=processed_root,
+        ready_dir=ready_dir,
+    )
+    elapsed = time.perf_counter() - start
+
+    chunks = 0
+    for name in os.listdir(ready_dir):
+        with open(os.path.join(ready_dir, name), encoding="utf-8") as f:
+            chunks += len(json.load(f)["chunks"])
+    return elapsed, success, errors, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark harvest raw processing")
+    parser.add_argument("--files", type=int, default=300, help="Synthetic raw files (default: 300)")
+    parser.add_argument("--words", type=int, default=3000, help="Words per file (default: 3000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 4],
+                        help="Worker counts to compare (default: 1 2 4 ncpu)")
+    parser.add_argument("--fake-embedder", action="store_true",
+                        help="Use a hash encoder instead of the embedding model")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.fake_embedder:
+        embedder._model = HashEncoder()
+
+    tmp = tempfile.mkdtemp(prefix="harvest-bench-")
+    try:
+        corpus_dir = os.path.join(tmp, "corpus")
+        total_words = build_corpus(corpus_dir, args.files, args.words)
+        print(f"{args.files} files, {total_words:,} words"
+              f"{' (hash embedder)' if args.fake_embedder else ''}\n")
+        print(f"{'workers':>8}{'seconds':>10}{'files/s':>10}{'chunks/s':>10}{'speedup':>9}")
+
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            elapsed, success, errors, chunks = run(corpus_dir, os.path.join(tmp, "run"), workers)
+            baseline = baseline or elapsed
+            print(f"{workers:>8}{elapsed:>10.2f}{success / elapsed:>10.1f}"
+                  f"{chunks / elapsed:>10.0f}{baseline / elapsed:>8.2f}x"
+                  f"{f'  ({errors} errors)' if errors else ''}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Hebrew Term Corrections Test
+
+Checks the single-pass compiled matcher in harvest/lib/hebrew_corrections.py
+against the original per-variant implementation (kept below as the
+reference), plus longest-match and cache invalidation behaviour.
+
+Usage:
+    python tests/test_hebrew_corrections.py
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "harvest"))
+
+from lib import hebrew_corrections as hc
+
+
+# =============================================================================
+# Reference (original implementation: one regex and one pass per variant)
+# =============================================================================
+
+def reference_apply(text, corrections):
+    count = 0
+    for correct_term, variants in corrections.items():
+        for variant in variants:
+            if variant.lower() == correct_term.lower():
+                continue
+            pattern = re.compile(r"\b" + re.escape(variant) + r"\b", re.IGNORECASE)
+            new_text, n = pattern.subn(correct_term, text)
+            if n > 0:
+                text = new_text
+                count += n
+    return text, count
+
+
+def use_dictionary(corrections):
+    """Point the module at an in-memory dictionary."""
+    hc._corrections_cache = corrections
+    hc._matcher = None
+
+
+def random_case(rng, s):
+    mode = rng.randrange(3)
+    if mode == 0:
+        return s.upper()
+    if mode == 1:
+        return s.capitalize()
+    return s
+
+
+def random_text(rng, corrections, words=400):
+    """Variants, canonical terms and filler with mixed case and punctuation."""
+    variants = [v for vs in corrections.values() for v in vs]
+    filler = ["the", "and", "of", "in", "said", "teaching", "a", "is", "we"]
+    pieces = []
+    for _ in range(words):
+        r = rng.random()
+        if r < 0.2:
+            pieces.append(random_case(rng, rng.choice(variants)))
+        elif r < 0.25:
+            pieces.append(rng.choice(list(corrections)))
+        else:
+            pieces.append(rng.choice(filler))
+        if rng.random() < 0.1:
+            pieces[-1] += rng.choice([",", ".", "?", "!", "'s", ";"])
+    return " ".join(pieces)
+
+
+def random_dictionary(rng, terms=200):
+    """
+    Synthetic dictionary with no variant containing another at word
+    boundaries, where longest-match and per-variant passes must agree.
+    """
+    syllables = ["ba", "ko", "shi", "ra", "tem", "lo", "vu", "nek", "da", "mi", "zor", "ha"]
+
+    def word():
+        return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 3)))
+
+    corrections = {}
+    seen = []
+    for i in range(terms):
+        variants = []
+        for _ in range(rng.randint(1, 4)):
+            v = " ".join(word() for _ in range(rng.randint(1, 2)))
+            if any(re.search(rf"\b{re.escape(a)}\b", b) for a, b in ((v, s) for s in seen)):
+                continue
+            if any(re.search(rf"\b{re.escape(s)}\b", v) for s in seen):
+                continue
+            seen.append(v)
+            variants.append(v)
+        corrections[f"term{i:04d}"] = variants
+    return corrections
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_default_dictionary_equivalence():
+    """Compiled matcher agrees with the reference on the built-in dictionary."""
+    print("\n=== Testing default dictionary equivalence ===")
+    use_dictionary(hc.DEFAULT_CORRECTIONS)
+    rng = random.Random(33)
+    # Counts may differ: the reference counts "half tora" twice (tora ->
+    # torah, then half torah -> haftarah); the single pass counts one hit
+    for _ in range(200):
+        text = random_text(rng, hc.DEFAULT_CORRECTIONS)
+        corrected, _ = hc.apply_corrections(text)
+        assert corrected == reference_apply(text, hc.DEFAULT_CORRECTIONS)[0], text
+    print("✓ 200 random transcripts match")
+
+    text = "Yes sure, the TORE A portion on shabbos; mid rash and half tora."
+    expected = reference_apply(text, hc.DEFAULT_CORRECTIONS)[0]
+    assert expected == "yeshua, the torah portion on shabbat; midrash and haftarah."
+    assert hc.apply_corrections(text) == (expected, 5)
+    print("✓ hand-written transcript matches")
+
+
+def test_synthetic_dictionary_equivalence():
+    """Compiled matcher agrees with the reference on a large dictionary."""
+    print("\n=== Testing synthetic dictionary equivalence ===")
+    rng = random.Random(2000)
+    corrections = random_dictionary(rng)
+    use_dictionary(corrections)
+    for _ in range(50):
+        text = random_text(rng, corrections)
+        assert hc.apply_corrections(text) == reference_apply(text, corrections), text
+    print(f"✓ {sum(len(v) for v in corrections.values())} variants, 50 transcripts match")
+
+
+def test_longest_match_and_edge_cases():
+    """Test overlapping variants, boundaries and skipped self-variants."""
+    print("\n=== Testing longest match ===")
+    use_dictionary({
+        "torah": ["tore a", "torah", "tora"],
+        "haftarah": ["half tora", "half torah"],
+        "shabbat": [],
+    })
+
+    assert hc.apply_corrections("the half tora reading") == ("the haftarah reading", 1)
+    assert hc.apply_corrections("the Half Torah reading") == ("the haftarah reading", 1)
+    assert hc.apply_corrections("a tora scroll") == ("a torah scroll", 1)
+    print("✓ longest variant wins, mapped to its canonical term")
+
+    # Replacements are not rescanned (the reference rewrote this twice)
+    assert hc.apply_corrections("half tore a") == ("half torah", 1)
+
+    assert hc.apply_corrections("torah and toras") == ("torah and toras", 0)
+    assert hc.apply_corrections("") == ("", 0)
+    print("✓ self-variants skipped, word boundaries respected")
+
+    use_dictionary({"torah": ["torah"]})
+    assert hc.apply_corrections("tora torah") == ("tora torah", 0)
+    print("✓ dictionary with no effective variants is a no-op")
+
+
+def test_case_fold_matches():
+    """IGNORECASE hits whose .lower() isn't the stored variant still map."""
+    print("\n=== Testing case-folded matches ===")
+    use_dictionary({"yeshua": ["yes sure", "yah shua"], "kohen": ["co hen"]})
+    try:
+        # The long s 'ſ' matches 's' under IGNORECASE, but 'ſ'.lower() == 'ſ'
+        assert hc.apply_corrections("x yeſ ſure y") == ("x yeshua y", 1)
+        assert hc.apply_corrections("YAH ſHUA and Co Hen") == ("yeshua and kohen", 2)
+        print("✓ long s case folds replaced, no KeyError")
+    finally:
+        use_dictionary(None)
+
+
+def test_save_invalidates_matcher():
+    """save_corrections() drops the compiled matcher."""
+    print("\n=== Testing invalidation on save ===")
+    original = hc.CORRECTIONS_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        hc.CORRECTIONS_FILE = os.path.join(tmp, "hebrew-terms.json")
+        try:
+            hc.save_corrections({"pesach": ["pay sock"]})
+            assert hc.apply_corrections("pay sock mid rash") == ("pesach mid rash", 1)
+
+            hc.save_corrections({"midrash": ["mid rash"]})
+            assert hc.apply_corrections("pay sock mid rash") == ("pay sock midrash", 1)
+            print("✓ new dictionary takes effect after save")
+        finally:
+            hc.CORRECTIONS_FILE = original
+            use_dictionary(None)
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Hebrew Corrections Test Suite")
+    print("=" * 60)
+
+    test_default_dictionary_equivalence()
+    test_synthetic_dictionary_equivalence()
+    test_longest_match_and_edge_cases()
+    test_case_fold_matches()
+    test_save_invalidates_matcher()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
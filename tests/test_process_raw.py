@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Raw Processing Resume Test
+
+Checks the completion markers in harvest/processor/process_raw.py: a
+killed run only finishes the move, and a file re-harvested under the
+same name is packaged again. Also checks that --workers produces the
+same packages and markers as the sequential run, including after a
+killed parallel run. The embedding model is replaced by a deterministic
+hash encoder.
+
+Usage:
+    python tests/test_process_raw.py
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "harvest"))
+
+from config.harvest_config import EMBEDDING_DIM
+from lib import embedder
+from processor import process_raw as pr
+
+SOURCE = "test"
+
+
+class HashEncoder:
+    """Deterministic stand-in for SentenceTransformer.encode()."""
+
+    def encode(self, texts):
+        vecs = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            vecs[i] = np.random.default_rng(seed).standard_normal(EMBEDDING_DIM)
+        return vecs
+
+
+@contextmanager
+def fake_embedder():
+    original = embedder._model
+    embedder._model = HashEncoder()
+    try:
+        yield
+    finally:
+        embedder._model = original
+
+
+class Dirs:
+    def __init__(self, tmp):
+        self.raw_root = os.path.join(tmp, "raw")
+        self.processed_root = os.path.join(tmp, "processed")
+        self.ready_dir = os.path.join(tmp, "ready")
+        self.raw_dir = os.path.join(self.raw_root, SOURCE)
+        self.processed_dir = os.path.join(self.processed_root, SOURCE)
+        os.makedirs(self.raw_dir)
+        os.makedirs(self.ready_dir)
+
+    def drop(self, name, text):
+        path = os.path.join(self.raw_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"text": text, "filename": name.replace(".json", ".txt"), "source_name": "Test"}, f)
+        return path
+
+    def process(self, workers=1):
+        return pr.process_source(
+            SOURCE,
+            workers=workers,
+            raw_root=self.raw_root,
+            processed_root=self.processed_root,
+            ready_dir=self.ready_dir,
+        )
+
+    def packaged_texts(self):
+        texts = []
+        for name in sorted(os.listdir(self.ready_dir)):
+            with open(os.path.join(self.ready_dir, name), encoding="utf-8") as f:
+                texts.append(" ".join(c["content"] for c in json.load(f)["chunks"]))
+        return texts
+
+    def packages(self):
+        """Package name → contents, without the processing timestamp."""
+        packages = {}
+        for name in os.listdir(self.ready_dir):
+            with open(os.path.join(self.ready_dir, name), encoding="utf-8") as f:
+                package = json.load(f)
+            del package["processing"]["processed_at"]
+            packages[name] = package
+        return packages
+
+    def state(self):
+        """(raw files left, processed files, markers left) for comparing runs."""
+        processed = sorted(os.listdir(self.processed_dir))
+        markers = [n for n in processed if n.endswith(pr.DONE_MARKER_SUFFIX)]
+        return sorted(os.listdir(self.raw_dir)), processed, markers
+
+
+CORPUS = [
+    (f"lesson-{i:02d}.json", (f"Lesson {i} on the appointed times of YHWH. " * (10 + 7 * i)))
+    for i in range(9)
+] + [("empty.json", "")]
+
+
+@contextmanager
+def recorded_writes():
+    """Records the filename of every package written, in order."""
+    original = pr.write_package
+    written = []
+
+    def write(package, output_dir=None):
+        written.append(package["file"]["filename"])
+        return original(package, output_dir=output_dir)
+
+    pr.write_package = write
+    try:
+        yield written
+    finally:
+        pr.write_package = original
+
+
+@contextmanager
+def killed_after(n):
+    """Simulates a kill after n files: the next file gets its marker, then the run dies."""
+    original = pr._finish_file
+    finished = []
+
+    def finish(raw_path, processed_dir, output_path=None, chunk_count=None):
+        if output_path is not None and len(finished) == n:
+            with open(pr._marker_path(processed_dir, os.path.basename(raw_path)), "w", encoding="utf-8") as f:
+                json.dump({"package": os.path.basename(output_path), **pr._raw_signature(raw_path)}, f)
+            raise KeyboardInterrupt
+        original(raw_path, processed_dir, output_path, chunk_count)
+        finished.append(raw_path)
+
+    pr._finish_file = finish
+    try:
+        yield
+    finally:
+        pr._finish_file = original
+
+
+def test_redrop_same_name():
+    """A file re-harvested under a packaged file's name is packaged again."""
+    print("\n=== Testing re-dropped file ===")
+    with fake_embedder(), tempfile.TemporaryDirectory() as tmp:
+        d = Dirs(tmp)
+        first = "The covenant at Sinai was given to Israel. " * 20
+        second = "The feast of tabernacles is a shadow of things to come. " * 20
+
+        d.drop("lesson.json", first)
+        assert d.process() == (1, 0)
+        assert os.path.exists(os.path.join(d.processed_dir, "lesson.json"))
+        assert not os.path.exists(pr._marker_path(d.processed_dir, "lesson.json"))
+        print("✓ marker removed after the move")
+
+        d.drop("lesson.json", second)
+        assert d.process() == (1, 0)
+        texts = d.packaged_texts()
+        assert len(texts) == 2, texts
+        assert any("tabernacles" in t for t in texts)
+        assert not os.listdir(d.raw_dir)
+        print("✓ new content under the same name is packaged")
+
+
+def test_resume_after_kill():
+    """A matching marker only completes the move; a stale one is reprocessed."""
+    print("\n=== Testing resume ===")
+    with fake_embedder(), tempfile.TemporaryDirectory() as tmp:
+        d = Dirs(tmp)
+        os.makedirs(d.processed_dir)
+        text = "Shabbat is a sign between Elohim and his people. " * 20
+
+        # Killed between writing the marker and the move
+        path = d.drop("killed.json", text)
+        with open(pr._marker_path(d.processed_dir, "killed.json"), "w", encoding="utf-8") as f:
+            json.dump({"package": "killed.pkg.json", **pr._raw_signature(path)}, f)
+        assert d.process() == (0, 0)
+        assert d.packaged_texts() == []
+        assert os.path.exists(os.path.join(d.processed_dir, "killed.json"))
+        assert not os.path.exists(pr._marker_path(d.processed_dir, "killed.json"))
+        print("✓ matching marker finishes the move without repackaging")
+
+        # Marker left behind for an older file of the same name
+        d.drop("stale.json", text)
+        with open(pr._marker_path(d.processed_dir, "stale.json"), "w", encoding="utf-8") as f:
+            json.dump({"package": "stale.pkg.json", "size": 1, "mtime_ns": 0}, f)
+        assert d.process() == (1, 0)
+        assert len(d.packaged_texts()) == 1
+        assert not os.path.exists(pr._marker_path(d.processed_dir, "stale.json"))
+        print("✓ stale marker is discarded and the file packaged")
+
+
+def test_workers_match_sequential():
+    """--workers 2 writes the same packages, in input order, as the sequential run."""
+    print("\n=== Testing --workers ===")
+    original_batch = pr.EMBED_BATCH_CHUNKS
+    pr.EMBED_BATCH_CHUNKS = 8  # several embedding batches across files
+    try:
+        with fake_embedder(), tempfile.TemporaryDirectory() as tmp:
+            seq = Dirs(os.path.join(tmp, "seq"))
+            par = Dirs(os.path.join(tmp, "par"))
+            for name, text in CORPUS:
+                seq.drop(name, text)
+                par.drop(name, text)
+
+            assert seq.process() == (len(CORPUS) - 1, 1)
+            with recorded_writes() as written:
+                assert par.process(workers=2) == (len(CORPUS) - 1, 1)
+
+            assert par.packages() == seq.packages()
+            assert written == [name.replace(".json", ".txt") for name, text in CORPUS if text]
+            assert par.state() == seq.state()
+            assert par.state()[0] == ["empty.json"] and par.state()[2] == []
+            print(f"✓ {len(written)} packages identical to the sequential run, written in order")
+    finally:
+        pr.EMBED_BATCH_CHUNKS = original_batch
+
+
+def test_workers_resume_after_kill():
+    """A killed parallel run resumes without repackaging finished files."""
+    print("\n=== Testing --workers resume ===")
+    with fake_embedder(), tempfile.TemporaryDirectory() as tmp:
+        seq = Dirs(os.path.join(tmp, "seq"))
+        par = Dirs(os.path.join(tmp, "par"))
+        for name, text in CORPUS:
+            seq.drop(name, text)
+            par.drop(name, text)
+        seq.process()
+
+        with killed_after(3):
+            try:
+                par.process(workers=2)
+                raise AssertionError("run was not killed")
+            except KeyboardInterrupt:
+                pass
+        raw_left, _, markers = par.state()
+        assert markers == ["lesson-03.json" + pr.DONE_MARKER_SUFFIX]
+        assert "lesson-03.json" in raw_left
+        print(f"✓ killed with {len(raw_left)} raw files left and one marker")
+
+        with recorded_writes() as written:
+            assert par.process(workers=2) == (len(CORPUS) - 5, 1)
+        assert "lesson-03.txt" not in written
+        assert par.packages() == seq.packages()
+        assert par.state() == seq.state()
+        print(f"✓ resumed: {len(written)} packaged, marked file only moved, same result as sequential")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Raw Processing Resume Test Suite")
+    print("=" * 60)
+
+    test_redrop_same_name()
+    test_resume_after_kill()
+    test_workers_match_sequential()
+    test_workers_resume_after_kill()
+
+    print("\n" + "=" * 60)
+    print("ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()